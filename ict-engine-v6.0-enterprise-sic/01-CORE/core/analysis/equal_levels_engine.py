@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+💧 EQUAL LEVELS ENGINE - ICT ENGINE v6.0 Enterprise
+===================================================
+
+Motor compartido de detección de Equal Highs / Equal Lows (pools de liquidez).
+
+Antes cada detector (LiquidityAnalyzerEnterprise, SmartMoneyAnalyzer,
+ICTDetector v5) recorría vela por vela construyendo una ventana de búsqueda
+y emitía un pool por vela, lo que generaba el mismo nivel repetido decenas
+de veces. Este motor trabaja en una sola pasada vectorizada:
+
+1. Extremos locales: velas cuyo high/low es el extremo de su ventana centrada
+2. Ordenar los extremos por precio y cortar donde el salto supera la tolerancia
+3. Acotar cada cluster a 2x tolerancia (buckets adyacentes fusionados)
+4. Con max_bar_distance, cortar el nivel donde dos toques seguidos quedan a
+   más de esa distancia en velas (la ventana que usaba cada detector)
+5. Contar toques por cluster con bincount → un pool único por nivel
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+@dataclass
+class EqualLevelPool:
+    """💧 Nivel de Equal Highs/Lows con sus toques"""
+    side: str                  # 'HIGH' o 'LOW'
+    level: float               # Extremo del cluster (donde descansan los stops)
+    top: float
+    bottom: float
+    touches: int
+    indices: List[int] = field(default_factory=list)  # Posiciones de los toques
+
+    @property
+    def first_index(self) -> int:
+        return self.indices[0]
+
+    @property
+    def last_index(self) -> int:
+        return self.indices[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'side': self.side,
+            'level': self.level,
+            'top': self.top,
+            'bottom': self.bottom,
+            'touches': self.touches,
+            'first_index': self.first_index,
+            'last_index': self.last_index,
+            'indices': list(self.indices),
+        }
+
+
+class EqualLevelsEngine:
+    """
+    💧 MOTOR DE EQUAL HIGHS / EQUAL LOWS
+    ====================================
+
+    Agrupa extremos locales en niveles únicos dentro de una tolerancia de
+    precio. Sin estado: una misma instancia sirve a todos los detectores.
+    """
+
+    def __init__(self, tolerance: float = 0.0005, min_touches: int = 2, extreme_window: int = 5,
+                 max_bar_distance: Optional[int] = None):
+        """
+        Args:
+            tolerance: Distancia máxima entre toques vecinos del mismo nivel
+            min_touches: Toques mínimos para considerar el nivel un pool
+            extreme_window: Ventana centrada para extremos locales (1 = todas las velas)
+            max_bar_distance: Velas máximas entre toques consecutivos del mismo
+                nivel (None = todo el frame)
+        """
+        self.tolerance = tolerance
+        self.min_touches = min_touches
+        self.extreme_window = extreme_window
+        self.max_bar_distance = max_bar_distance
+
+    def find_equal_highs(self, highs: Sequence[float], **overrides: Any) -> List[EqualLevelPool]:
+        """🔺 Equal Highs sobre una serie de highs"""
+        return self.find_levels(highs, 'HIGH', **overrides)
+
+    def find_equal_lows(self, lows: Sequence[float], **overrides: Any) -> List[EqualLevelPool]:
+        """🔻 Equal Lows sobre una serie de lows"""
+        return self.find_levels(lows, 'LOW', **overrides)
+
+    def find_levels(self,
+                    values: Sequence[float],
+                    side: str,
+                    tolerance: Optional[float] = None,
+                    min_touches: Optional[int] = None,
+                    extreme_window: Optional[int] = None,
+                    max_bar_distance: Optional[int] = None) -> List[EqualLevelPool]:
+        """
+        🔍 Detectar niveles iguales en una pasada
+
+        Args:
+            values: Highs (side='HIGH') o lows (side='LOW')
+            side: 'HIGH' o 'LOW'
+            tolerance / min_touches / extreme_window / max_bar_distance:
+                Overrides de la configuración
+
+        Returns:
+            Pools únicos ordenados por primer toque
+        """
+        tolerance = self.tolerance if tolerance is None else tolerance
+        min_touches = self.min_touches if min_touches is None else min_touches
+        extreme_window = self.extreme_window if extreme_window is None else extreme_window
+        max_bar_distance = self.max_bar_distance if max_bar_distance is None else max_bar_distance
+
+        prices = np.asarray(values, dtype=float)
+        if side not in ('HIGH', 'LOW'):
+            raise ValueError(f"side debe ser 'HIGH' o 'LOW', no {side!r}")
+        if tolerance <= 0 or len(prices) == 0:
+            return []
+
+        positions = self._local_extremes(prices, side, extreme_window)
+        if len(positions) < min_touches:
+            return []
+
+        # Ordenar por precio y cortar donde el salto entre vecinos supera la tolerancia
+        order = np.argsort(prices[positions], kind='stable')
+        sorted_positions = positions[order]
+        sorted_prices = prices[sorted_positions]
+        cluster_ids = np.concatenate([[0], np.cumsum(np.diff(sorted_prices) > tolerance)])
+
+        # Acotar cada cluster a 2x tolerancia para que una tendencia lenta no encadene niveles
+        cluster_start = sorted_prices[np.flatnonzero(np.r_[True, np.diff(cluster_ids) > 0])]
+        bucket = np.floor((sorted_prices - cluster_start[cluster_ids]) / (2 * tolerance)).astype(np.int64)
+        keys = cluster_ids * (int(bucket.max()) + 1) + bucket
+        _, level_ids = np.unique(keys, return_inverse=True)
+
+        if max_bar_distance is not None:
+            # Dentro de cada nivel, en orden temporal: un hueco mayor que max_bar_distance abre otro pool
+            order = np.lexsort((sorted_positions, level_ids))
+            sorted_positions = sorted_positions[order]
+            sorted_prices = sorted_prices[order]
+            level_ids = level_ids[order]
+            breaks = np.r_[True, (np.diff(level_ids) != 0) | (np.diff(sorted_positions) > max_bar_distance)]
+            level_ids = np.cumsum(breaks) - 1
+
+        touches = np.bincount(level_ids)
+        pools = []
+        for level_id in np.flatnonzero(touches >= min_touches):
+            members = level_ids == level_id
+            level_prices = sorted_prices[members]
+            pools.append(EqualLevelPool(
+                side=side,
+                level=float(level_prices.max() if side == 'HIGH' else level_prices.min()),
+                top=float(level_prices.max()),
+                bottom=float(level_prices.min()),
+                touches=int(touches[level_id]),
+                indices=sorted(int(p) for p in sorted_positions[members]),
+            ))
+
+        pools.sort(key=lambda pool: pool.first_index)
+        return pools
+
+    @staticmethod
+    def _local_extremes(prices: np.ndarray, side: str, extreme_window: int) -> np.ndarray:
+        """📍 Posiciones cuyo precio es el extremo de su ventana centrada"""
+        half = max(extreme_window, 1) // 2
+        if half == 0 or len(prices) < 2 * half + 1:
+            return np.flatnonzero(~np.isnan(prices))
+
+        padded = np.pad(prices, half, mode='edge')
+        windows = sliding_window_view(padded, 2 * half + 1)
+        extreme = windows.max(axis=1) if side == 'HIGH' else windows.min(axis=1)
+        is_extreme = prices == extreme
+
+        # Mesetas (velas consecutivas con el mismo extremo) cuentan como un solo toque
+        is_extreme[1:] &= ~(is_extreme[:-1] & (prices[1:] == prices[:-1]))
+        return np.flatnonzero(is_extreme)
+
+
+def get_equal_levels_engine(tolerance: float = 0.0005,
+                            min_touches: int = 2,
+                            extreme_window: int = 5,
+                            max_bar_distance: Optional[int] = None) -> EqualLevelsEngine:
+    """🏭 Factory del motor de Equal Highs/Lows"""
+    return EqualLevelsEngine(tolerance=tolerance, min_touches=min_touches, extreme_window=extreme_window,
+                             max_bar_distance=max_bar_distance)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+📏 FVG KERNEL - ICT ENGINE v6.0 Enterprise
+==========================================
+
+Kernel vectorizado de Fair Value Gaps compartido por todos los detectores.
+
+PatternDetector, MarketStructureAnalyzer y poi_detector_adapted recorrían
+ventanas de 3 velas con df.iloc en Python; en el backtest modular el módulo
+FVG era el más lento con diferencia. El kernel trabaja sobre arrays:
+
+1. Máscaras de gap con high/low desplazados (low[i+1] > high[i-1] alcista,
+   high[i+1] < low[i-1] bajista), filtros opcionales de cuerpo y tamaño
+2. Índice de mitigación (primera vela que entra en el gap) y de relleno
+   completo (primera vela que lo cruza) con búsqueda por saltos binarios
+   sobre una sparse table de mínimos/máximos: O((n + gaps) log n)
+3. Resultado compacto: array estructurado numpy (FVG_DTYPE), un registro
+   por gap, que cada detector adapta a su propio formato
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+try:
+    from utils.hot_path_profiler import profile_hot_path
+except ImportError:  # Cargado desde el árbol v5 (core.ict_engine.fvg_kernel)
+    from sistema.hot_path_profiler import profile_hot_path
+
+BULLISH = 1
+BEARISH = -1
+
+FVG_DTYPE = np.dtype([
+    ('index', np.int64),             # Vela central (la de desplazamiento)
+    ('direction', np.int8),          # 1 alcista, -1 bajista
+    ('top', np.float64),             # Límite superior del gap
+    ('bottom', np.float64),          # Límite inferior del gap
+    ('size', np.float64),            # top - bottom
+    ('mitigation_index', np.int64),  # Primera vela que entra en el gap (-1 = ninguna)
+    ('fill_index', np.int64),        # Primera vela que lo rellena por completo (-1 = ninguna)
+    ('fill_ratio', np.float64),      # Fracción rellenada al final de los datos (0-1)
+])
+
+
+@profile_hot_path(rows='high')
+def scan_fair_value_gaps(high: Sequence[float],
+                         low: Sequence[float],
+                         open_: Optional[Sequence[float]] = None,
+                         close: Optional[Sequence[float]] = None,
+                         min_size: float = 0.0,
+                         inclusive: bool = True,
+                         require_body: bool = False,
+                         track_mitigation: bool = True) -> np.ndarray:
+    """
+    📏 Detectar todos los Fair Value Gaps en una pasada
+
+    Args:
+        high / low: Arrays de precios
+        open_ / close: Necesarios con require_body
+        min_size: Tamaño mínimo del gap en precio
+        inclusive: True = size >= min_size, False = size > min_size
+        require_body: La vela central debe cerrar en la dirección del gap
+        track_mitigation: Calcular mitigation_index / fill_index / fill_ratio
+
+    Returns:
+        Array estructurado FVG_DTYPE ordenado por índice
+    """
+    high = np.asarray(high, dtype=float)
+    low = np.asarray(low, dtype=float)
+    n = len(high)
+    if n < 3:
+        return np.empty(0, dtype=FVG_DTYPE)
+
+    prev_high, prev_low = high[:-2], low[:-2]
+    next_high, next_low = high[2:], low[2:]
+
+    bull_size = next_low - prev_high
+    bear_size = prev_low - next_high
+    bullish = bull_size > 0
+    bearish = ~bullish & (bear_size > 0)
+
+    if require_body:
+        if open_ is None or close is None:
+            raise ValueError("require_body necesita open_ y close")
+        body = np.asarray(close, dtype=float)[1:-1] - np.asarray(open_, dtype=float)[1:-1]
+        bullish &= body > 0
+        bearish &= body < 0
+
+    if inclusive:
+        bullish &= bull_size >= min_size
+        bearish &= bear_size >= min_size
+    else:
+        bullish &= bull_size > min_size
+        bearish &= bear_size > min_size
+
+    positions = np.flatnonzero(bullish | bearish)
+    records = np.empty(len(positions), dtype=FVG_DTYPE)
+    is_bull = bullish[positions]
+
+    records['index'] = positions + 1
+    records['direction'] = np.where(is_bull, BULLISH, BEARISH)
+    records['top'] = np.where(is_bull, next_low[positions], prev_low[positions])
+    records['bottom'] = np.where(is_bull, prev_high[positions], next_high[positions])
+    records['size'] = records['top'] - records['bottom']
+    records['mitigation_index'] = -1
+    records['fill_index'] = -1
+    records['fill_ratio'] = 0.0
+
+    if track_mitigation and len(records):
+        _track_mitigation(records, high, low, is_bull)
+    return records
+
+
+def fvg_records_to_dicts(records: np.ndarray) -> List[Dict[str, Any]]:
+    """📋 Registros → lista de dicts (tipos nativos de Python)"""
+    return [
+        {
+            'index': int(r['index']),
+            'type': 'bullish' if r['direction'] == BULLISH else 'bearish',
+            'top': float(r['top']),
+            'bottom': float(r['bottom']),
+            'size': float(r['size']),
+            'mitigation_index': int(r['mitigation_index']),
+            'fill_index': int(r['fill_index']),
+            'fill_ratio': float(r['fill_ratio']),
+        }
+        for r in records
+    ]
+
+
+# ===============================
+# MITIGACIÓN
+# ===============================
+
+def _track_mitigation(records: np.ndarray, high: np.ndarray, low: np.ndarray, is_bull: np.ndarray) -> None:
+    """🔍 Primeras velas (desde i+2) que tocan y que cruzan cada gap"""
+    n = len(high)
+    start = records['index'] + 2  # La vela i+1 forma el gap, no puede mitigarlo
+    top, bottom, size = records['top'], records['bottom'], records['size']
+
+    bull = np.flatnonzero(is_bull)
+    if len(bull):
+        lows = _MinSearch(low)
+        records['mitigation_index'][bull] = lows.first_at_or_below(start[bull], top[bull])
+        records['fill_index'][bull] = lows.first_at_or_below(start[bull], bottom[bull])
+        suffix_min = np.minimum.accumulate(low[::-1])[::-1]
+        reached = np.where(start[bull] < n, suffix_min[np.minimum(start[bull], n - 1)], np.inf)
+        records['fill_ratio'][bull] = np.clip((top[bull] - reached) / size[bull], 0.0, 1.0)
+
+    bear = np.flatnonzero(~is_bull)
+    if len(bear):
+        highs = _MinSearch(-high)
+        records['mitigation_index'][bear] = highs.first_at_or_below(start[bear], -bottom[bear])
+        records['fill_index'][bear] = highs.first_at_or_below(start[bear], -top[bear])
+        suffix_max = np.maximum.accumulate(high[::-1])[::-1]
+        reached = np.where(start[bear] < n, suffix_max[np.minimum(start[bear], n - 1)], -np.inf)
+        records['fill_ratio'][bear] = np.clip((reached - bottom[bear]) / size[bear], 0.0, 1.0)
+
+
+class _MinSearch:
+    """
+    Sparse table de mínimos para responder en bloque "primer j >= start con
+    values[j] <= threshold" mediante saltos binarios (O(log n) por consulta).
+    """
+
+    def __init__(self, values: np.ndarray):
+        self.n = len(values)
+        self.levels = max(1, int(np.ceil(np.log2(self.n + 1))))
+        table = np.append(np.asarray(values, dtype=float), np.inf)  # Posición n = centinela
+        self.table = [table]
+        for k in range(1, self.levels + 1):
+            previous = self.table[-1]
+            step = 1 << (k - 1)
+            current = previous.copy()
+            if step <= self.n:
+                current[:-step] = np.minimum(previous[:-step], previous[step:])
+            self.table.append(current)
+
+    def first_at_or_below(self, start: np.ndarray, threshold: np.ndarray) -> np.ndarray:
+        position = np.minimum(start.astype(np.int64), self.n)
+        for k in range(self.levels, -1, -1):
+            block_min = self.table[k][position]
+            position = np.where(block_min > threshold, np.minimum(position + (1 << k), self.n), position)
+        return np.where(position < self.n, position, -1)
@@ -30,6 +30,7 @@ import numpy as np
 
 # === IMPORTS ENTERPRISE LOGGING ===
 from core.smart_trading_logger import SmartTradingLogger
+from utils.memory_wal import MemoryWAL, open_wal
 
 class ICTHistoricalAnalyzerV6:
     """
@@ -102,6 +103,12 @@ class ICTHistoricalAnalyzerV6:
             'session_success_rates': {}
         }
         
+        # === PERSISTENCIA INCREMENTAL (log de mutaciones) ===
+        self._wal: Optional[MemoryWAL] = None
+        self._dirty_keys: set = set()                       # Claves a reescribir en el próximo export
+        self._pending_appends: Dict[str, List[Dict]] = {}   # Entradas nuevas de listas Smart Money
+        self._wal_baseline = False                          # El log contiene el estado completo
+        
         # === INICIALIZACIÓN ===
         self._restore_historical_cache()
         
@@ -228,6 +235,7 @@ class ICTHistoricalAnalyzerV6:
                 # Actualizar memoria del timeframe
                 self.timeframe_analyzers[tf]['last_analysis'] = tf_analysis
                 self.timeframe_analyzers[tf]['performance_cache'][symbol] = tf_analysis
+                self._dirty_keys.add(f'timeframe_analyzers.{tf}')
             
             # Análisis de correlación entre timeframes
             if len(timeframes) > 1:
@@ -325,12 +333,14 @@ class ICTHistoricalAnalyzerV6:
                     if session not in self.smart_money_history['killzone_performance']:
                         self.smart_money_history['killzone_performance'][session] = []
                     
-                    self.smart_money_history['killzone_performance'][session].append({
+                    entry = {
                         'timestamp': timestamp,
                         'efficiency': data.get('efficiency', 0.5),
                         'activity_level': data.get('activity_level', 0.5),
                         'success_rate': data.get('success_rate', 0.5)
-                    })
+                    }
+                    self.smart_money_history['killzone_performance'][session].append(entry)
+                    self._queue_append(f'killzone_performance.{session}', entry)
                     
                     # Mantener límite de memoria
                     if len(self.smart_money_history['killzone_performance'][session]) > 100:
@@ -349,6 +359,7 @@ class ICTHistoricalAnalyzerV6:
                     self.smart_money_history['institutional_patterns'] = []
                 
                 self.smart_money_history['institutional_patterns'].append(institutional_data)
+                self._queue_append('institutional_patterns', institutional_data)
                 
                 # Mantener límite
                 if len(self.smart_money_history['institutional_patterns']) > 200:
@@ -394,36 +405,109 @@ class ICTHistoricalAnalyzerV6:
             self.logger.error(f"Error calculando confidence score: {e}", component="historical_memory")
             return 0.5  # Valor neutral por defecto
     
-    def export_memory_cache(self) -> None:
+    # Límites de las listas Smart Money (los mismos que integrate_smart_money_memory)
+    _APPEND_LIMITS = {'killzone_performance': 100, 'institutional_patterns': 200}
+    
+    def _queue_append(self, key: str, entry: Dict[str, Any]) -> None:
+        """Entrada nueva de una lista Smart Money para el próximo export (acotada como la lista)."""
+        pending = self._pending_appends.setdefault(key, [])
+        pending.append(entry)
+        limit = self._APPEND_LIMITS[key.partition('.')[0]]
+        if len(pending) > limit:
+            del pending[:-limit]
+    
+    def _memory_wal(self) -> MemoryWAL:
+        """Log de mutaciones del cache histórico (se abre y reproduce en el primer uso)."""
+        if self._wal is None:
+            self._wal = open_wal(str(self.historical_cache_dir), 'historical_analysis')
+        return self._wal
+    
+    def export_memory_cache(self, wait: bool = False) -> None:
         """
         Exporta cache de memoria para persistencia.
         Usa cache/memory/ directory configurado.
+        
+        Solo se registran las claves modificadas desde el último export y las
+        entradas nuevas de las listas Smart Money; el flusher escribe a disco.
+        
+        Args:
+            wait: Escribir a disco antes de volver
         """
         try:
-            cache_export = {
-                'export_timestamp': datetime.now(timezone.utc).isoformat(),
-                'cache_data': self.cache,
-                'timeframe_analyzers': self.timeframe_analyzers,
-                'smart_money_history': self.smart_money_history,
-                'config': self.config
-            }
-            
-            export_file = self.historical_cache_dir / 'historical_analysis_cache.json'
-            with open(export_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_export, f, indent=2, default=str)
-            
-            self.logger.info(f"💾 Cache de memoria exportado a {export_file}", 
+            wal = self._memory_wal()
+            if not self._wal_baseline:
+                self._write_wal_baseline(wal)
+            else:
+                for key in self._dirty_keys:
+                    section, _, name = key.partition('.')
+                    if section == 'cache':
+                        if name in self.cache:
+                            wal.set(key, self.cache[name])
+                        else:
+                            wal.delete(key)
+                    elif section == 'timeframe_analyzers':
+                        wal.set(key, self.timeframe_analyzers[name])
+                for key, entries in self._pending_appends.items():
+                    wal.append(f'smart_money.{key}', entries, maxlen=self._APPEND_LIMITS[key.partition('.')[0]])
+            self._dirty_keys.clear()
+            self._pending_appends.clear()
+            wal.set('config', self.config)
+            wal.set('export_timestamp', datetime.now(timezone.utc).isoformat())
+            
+            if wait:
+                wal.flush()
+            
+            self.logger.debug(f"💾 Cache de memoria exportado a {wal.log_path}", 
                                component="historical_memory")
             
         except Exception as e:
             self.logger.error(f"Error exportando memory cache: {e}", component="historical_memory")
     
+    def _write_wal_baseline(self, wal: MemoryWAL) -> None:
+        """Estado completo al log (primer export o migración del JSON heredado)."""
+        for name, value in self.cache.items():
+            wal.set(f'cache.{name}', value)
+        for tf, analyzer in self.timeframe_analyzers.items():
+            wal.set(f'timeframe_analyzers.{tf}', analyzer)
+        for section, value in self.smart_money_history.items():
+            if section == 'killzone_performance':
+                for session, entries in value.items():
+                    wal.append(f'smart_money.{section}.{session}', entries,
+                               maxlen=self._APPEND_LIMITS[section], replace=True)
+            elif section in self._APPEND_LIMITS:
+                wal.append(f'smart_money.{section}', value, maxlen=self._APPEND_LIMITS[section], replace=True)
+            else:
+                wal.set(f'smart_money.{section}', value)
+        self._wal_baseline = True
+    
     def import_memory_cache(self) -> bool:
         """
         Importa cache de memoria de sesiones pasadas.
         Restaura memoria persistente.
+        
+        Reproduce el log desde el último snapshot; si aún no existe, lee el
+        JSON de versiones anteriores (el siguiente export lo migra).
         """
         try:
+            wal = self._memory_wal()
+            if len(wal):
+                for key, value in wal.items():
+                    section, _, name = key.partition('.')
+                    if section == 'cache':
+                        self.cache[name] = value
+                    elif section == 'timeframe_analyzers':
+                        self.timeframe_analyzers[name] = value
+                    elif section == 'smart_money':
+                        group, _, session = name.partition('.')
+                        if session:
+                            self.smart_money_history.setdefault(group, {})[session] = value
+                        else:
+                            self.smart_money_history[group] = value
+                self._wal_baseline = True
+                self.logger.info(f"📚 Cache de memoria importado desde {wal.log_path}", 
+                                   component="historical_memory")
+                return True
+            
             import_file = self.historical_cache_dir / 'historical_analysis_cache.json'
             
             if not import_file.exists():
@@ -444,6 +528,7 @@ class ICTHistoricalAnalyzerV6:
             if 'smart_money_history' in cache_data:
                 self.smart_money_history = cache_data['smart_money_history']
             
+            self._wal_baseline = False
             self.logger.info(f"📚 Cache de memoria importado desde {import_file}", 
                                component="historical_memory")
             return True
@@ -585,6 +670,7 @@ class ICTHistoricalAnalyzerV6:
         """Establece valor en cache."""
         self.cache[cache_key] = value
         self.cache_timestamps[cache_key] = datetime.now(timezone.utc)
+        self._dirty_keys.add(f'cache.{cache_key}')
     
     # === MÉTODOS PLACEHOLDER PARA IMPLEMENTACIÓN COMPLETA ===
     
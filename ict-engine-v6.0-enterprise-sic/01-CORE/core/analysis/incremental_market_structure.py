@@ -0,0 +1,494 @@
+#!/usr/bin/env python3
+"""
+🔁 INCREMENTAL MARKET STRUCTURE - ICT ENGINE v6.0 Enterprise
+============================================================
+
+Máquina de estados de estructura de mercado (swings, BOS, CHoCH) que se
+actualiza vela a vela por (símbolo, timeframe).
+
+`PatternDetector.detect_bos` / `detect_choch` y
+`MarketStructureAnalyzer.analyze_market_structure` recalculaban swings
+sobre todo el lookback en cada llamada aunque sólo hubiera llegado una vela
+nueva. Este motor guarda el estado por (símbolo, timeframe) y procesa sólo
+el delta:
+
+- Modo batch: `replay()` = reiniciar + procesar todas las velas
+- Modo live: `update()` procesa sólo las velas posteriores a la última vista
+- La vela en formación (mismo timestamp) se re-procesa deshaciendo su efecto
+- Coste por vela O(window), independiente del tamaño del histórico
+- `snapshot()` / `restore()` para persistir y recuperar el estado
+
+Un swing high se confirma cuando la vela central de una ventana de
+2*window+1 velas es estrictamente mayor que todas las demás (idéntico a
+`_detect_swing_points_for_bos`). Un cierre por encima del último swing high
+no roto es BOS alcista si la tendencia era alcista/neutral y CHoCH alcista
+si era bajista (simétrico para los lows).
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import threading
+from collections import deque
+from dataclasses import dataclass, asdict
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+TREND_BULLISH = "BULLISH"
+TREND_BEARISH = "BEARISH"
+TREND_NEUTRAL = "NEUTRAL"
+
+
+@dataclass
+class StructureSwing:
+    """🎯 Swing confirmado (bar_index es absoluto dentro del stream)"""
+    bar_index: int
+    price: float
+    timestamp: Any
+    swing_type: str  # 'high' o 'low'
+    broken: bool = False
+
+
+@dataclass
+class StructureEvent:
+    """🏗️ Evento estructural BOS/CHoCH"""
+    event_type: str  # BOS_BULLISH, BOS_BEARISH, CHOCH_BULLISH, CHOCH_BEARISH
+    direction: str
+    break_level: float
+    close_price: float
+    bar_index: int
+    timestamp: Any
+    previous_trend: str
+    swing_bar_index: int
+
+
+class MarketStructureState:
+    """📦 Estado de estructura de un (símbolo, timeframe)"""
+
+    def __init__(self, symbol: str, timeframe: str, window: int,
+                 max_swings: int = 200, max_events: int = 200):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.window = window
+        self.bar_count = 0
+        self.first_timestamp: Any = None
+        self.last_timestamp: Any = None
+        self.last_close: Optional[float] = None
+        # (bar_index, timestamp, high, low)
+        self.bars: Deque[Tuple[int, Any, float, float]] = deque(maxlen=2 * window + 1)
+        self.swing_highs: Deque[StructureSwing] = deque(maxlen=max_swings)
+        self.swing_lows: Deque[StructureSwing] = deque(maxlen=max_swings)
+        self.events: Deque[StructureEvent] = deque(maxlen=max_events)
+        self.trend = TREND_NEUTRAL
+        self.last_bos: Optional[StructureEvent] = None
+        self.last_choch: Optional[StructureEvent] = None
+        self._undo: Optional[Dict[str, Any]] = None
+
+    def summary(self) -> Dict[str, Any]:
+        """📊 Resumen serializable del estado actual"""
+        return {
+            'symbol': self.symbol,
+            'timeframe': self.timeframe,
+            'trend': self.trend,
+            'bars_processed': self.bar_count,
+            'last_timestamp': self.last_timestamp,
+            'last_close': self.last_close,
+            'swing_highs': len(self.swing_highs),
+            'swing_lows': len(self.swing_lows),
+            'last_swing_high': asdict(self.swing_highs[-1]) if self.swing_highs else None,
+            'last_swing_low': asdict(self.swing_lows[-1]) if self.swing_lows else None,
+            'last_bos': asdict(self.last_bos) if self.last_bos else None,
+            'last_choch': asdict(self.last_choch) if self.last_choch else None,
+        }
+
+
+class IncrementalMarketStructureEngine:
+    """
+    🔁 MOTOR INCREMENTAL DE ESTRUCTURA
+    ==================================
+
+    Mantiene un MarketStructureState por (símbolo, timeframe). Thread-safe.
+    """
+
+    def __init__(self, window: int = 5, max_swings: int = 200, max_events: int = 200):
+        self.window = window
+        self.max_swings = max_swings
+        self.max_events = max_events
+        self._states: Dict[Tuple[str, str], MarketStructureState] = {}
+        self._lock = threading.RLock()
+
+    # ===============================
+    # GESTIÓN DE ESTADOS
+    # ===============================
+
+    def get_state(self, symbol: str, timeframe: str) -> MarketStructureState:
+        """📦 Estado de (símbolo, timeframe), creado si no existe"""
+        key = (symbol, timeframe)
+        with self._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = MarketStructureState(symbol, timeframe, self.window,
+                                             self.max_swings, self.max_events)
+                self._states[key] = state
+            return state
+
+    def reset(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        """🧹 Elimina estados (todos si no hay filtro)"""
+        with self._lock:
+            for key in list(self._states):
+                if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                    del self._states[key]
+
+    # ===============================
+    # PROCESAMIENTO
+    # ===============================
+
+    def process_bar(self, symbol: str, timeframe: str, timestamp: Any,
+                    high: float, low: float, close: float) -> List[StructureEvent]:
+        """
+        ⚡ Procesa una vela. Si el timestamp coincide con la última vela
+        (vela en formación) se deshace su efecto y se vuelve a aplicar.
+        Velas más antiguas que la última se ignoran.
+        """
+        with self._lock:
+            state = self.get_state(symbol, timeframe)
+            if state.last_timestamp is not None:
+                if timestamp == state.last_timestamp:
+                    if state._undo is None:
+                        return []  # Restaurado desde snapshot: no se puede rebobinar
+                    self._undo_last(state)
+                elif timestamp < state.last_timestamp:
+                    return []
+            return self._apply_bar(state, timestamp, float(high), float(low), float(close))
+
+    def update(self, symbol: str, timeframe: str, candles) -> List[StructureEvent]:
+        """
+        🔄 Procesa sólo las velas nuevas de un DataFrame OHLC
+
+        La última vela ya vista se re-procesa (puede seguir formándose).
+        Si el frame termina antes que el estado o empieza antes que la primera
+        vela procesada (sus swings más antiguos nunca se vieron), se hace
+        replay completo.
+        """
+        if candles is None or len(candles) == 0:
+            return []
+
+        index = candles.index
+        highs = candles['high'].to_numpy()
+        lows = candles['low'].to_numpy()
+        closes = candles['close'].to_numpy()
+
+        with self._lock:
+            state = self.get_state(symbol, timeframe)
+            self._ensure_swing_capacity(state, len(candles))
+            start = 0
+            if state.last_timestamp is not None:
+                if not _is_datetime_index(index):
+                    return self.replay(symbol, timeframe, candles)
+                try:
+                    if (not index.is_monotonic_increasing or index[-1] < state.last_timestamp or
+                            (state.first_timestamp is not None and index[0] < state.first_timestamp)):
+                        return self.replay(symbol, timeframe, candles)
+                    start = int(index.searchsorted(state.last_timestamp, side='left'))
+                except TypeError:
+                    return self.replay(symbol, timeframe, candles)
+                if not self._matches_history(state, index, highs, lows, start):
+                    return self.replay(symbol, timeframe, candles)
+
+            events: List[StructureEvent] = []
+            for i in range(start, len(candles)):
+                events.extend(self.process_bar(symbol, timeframe, index[i],
+                                               highs[i], lows[i], closes[i]))
+            return events
+
+    def replay(self, symbol: str, timeframe: str, candles) -> List[StructureEvent]:
+        """🔁 Modo batch: reinicia el estado y procesa todas las velas"""
+        with self._lock:
+            self.reset(symbol, timeframe)
+            return self.update(symbol, timeframe, candles)
+
+    # ===============================
+    # CONSULTAS
+    # ===============================
+
+    def get_swings(self, symbol: str, timeframe: str) -> Tuple[List[StructureSwing], List[StructureSwing]]:
+        """🎯 (swing_highs, swing_lows) confirmados"""
+        with self._lock:
+            state = self.get_state(symbol, timeframe)
+            return list(state.swing_highs), list(state.swing_lows)
+
+    def get_swings_for_frame(self, symbol: str, timeframe: str, candles) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        🎯 Swings del estado mapeados a posiciones del frame, en el formato
+        de `_detect_swing_points_for_bos` ({'index', 'price', 'timestamp'}).
+
+        Sólo se incluyen swings cuya ventana completa cae dentro del frame,
+        así el resultado coincide con el cálculo batch sobre ese frame
+        (update() amplía max_swings al tamaño del frame para no perder los
+        más antiguos).
+        """
+        with self._lock:
+            state = self.get_state(symbol, timeframe)
+            offset = state.bar_count - len(candles)
+            min_pos, max_pos = self.window, len(candles) - self.window - 1
+
+            def _to_frame(swings: Deque[StructureSwing]) -> List[Dict[str, Any]]:
+                mapped = []
+                for swing in swings:
+                    pos = swing.bar_index - offset
+                    if min_pos <= pos <= max_pos:
+                        ts = swing.timestamp
+                        mapped.append({
+                            'index': pos,
+                            'price': swing.price,
+                            'timestamp': ts if hasattr(ts, 'timestamp') else pos
+                        })
+                return mapped
+
+            return {'highs': _to_frame(state.swing_highs), 'lows': _to_frame(state.swing_lows)}
+
+    def get_structure(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """📊 Resumen de estructura (tendencia, último BOS/CHoCH, swings)"""
+        with self._lock:
+            return self.get_state(symbol, timeframe).summary()
+
+    # ===============================
+    # SNAPSHOT / RESTORE
+    # ===============================
+
+    def snapshot(self) -> Dict[str, Any]:
+        """💾 Snapshot serializable (JSON) de todos los estados"""
+        with self._lock:
+            states = []
+            for state in self._states.values():
+                states.append({
+                    'symbol': state.symbol,
+                    'timeframe': state.timeframe,
+                    'bar_count': state.bar_count,
+                    'first_timestamp': _encode_ts(state.first_timestamp),
+                    'last_timestamp': _encode_ts(state.last_timestamp),
+                    'last_close': state.last_close,
+                    'bars': [[i, _encode_ts(ts), h, l] for i, ts, h, l in state.bars],
+                    'swing_highs': [_encode_swing(s) for s in state.swing_highs],
+                    'swing_lows': [_encode_swing(s) for s in state.swing_lows],
+                    'events': [_encode_event(e) for e in state.events],
+                    'trend': state.trend,
+                    'last_bos': _encode_event(state.last_bos) if state.last_bos else None,
+                    'last_choch': _encode_event(state.last_choch) if state.last_choch else None,
+                })
+            return {'window': self.window, 'states': states}
+
+    def restore(self, snapshot: Dict[str, Any]) -> int:
+        """♻️ Restaura estados desde snapshot(); devuelve cuántos se cargaron"""
+        if snapshot.get('window', self.window) != self.window:
+            raise ValueError(f"Snapshot window {snapshot.get('window')} != engine window {self.window}")
+
+        with self._lock:
+            for data in snapshot.get('states', []):
+                state = MarketStructureState(data['symbol'], data['timeframe'], self.window,
+                                             self.max_swings, self.max_events)
+                state.bar_count = data['bar_count']
+                state.first_timestamp = _decode_ts(data.get('first_timestamp'))
+                state.last_timestamp = _decode_ts(data['last_timestamp'])
+                state.last_close = data['last_close']
+                state.bars.extend((i, _decode_ts(ts), h, l) for i, ts, h, l in data['bars'])
+                state.swing_highs.extend(_decode_swing(s) for s in data['swing_highs'])
+                state.swing_lows.extend(_decode_swing(s) for s in data['swing_lows'])
+                state.events.extend(_decode_event(e) for e in data['events'])
+                state.trend = data['trend']
+                state.last_bos = _decode_event(data['last_bos']) if data['last_bos'] else None
+                state.last_choch = _decode_event(data['last_choch']) if data['last_choch'] else None
+                self._states[(state.symbol, state.timeframe)] = state
+            return len(snapshot.get('states', []))
+
+    # ===============================
+    # INTERNOS
+    # ===============================
+
+    def _apply_bar(self, state: MarketStructureState, timestamp: Any,
+                   high: float, low: float, close: float) -> List[StructureEvent]:
+        window = self.window
+        undo: Dict[str, Any] = {
+            'evicted_bar': state.bars[0] if len(state.bars) == state.bars.maxlen else None,
+            'prev_timestamp': state.last_timestamp,
+            'prev_close': state.last_close,
+            'trend': state.trend,
+            'last_bos': state.last_bos,
+            'last_choch': state.last_choch,
+            'added_high': None,
+            'added_low': None,
+            'broken': [],
+            'events': 0,
+            'evicted_events': [],
+        }
+
+        bar_index = state.bar_count
+        if bar_index == 0:
+            state.first_timestamp = timestamp
+        state.bars.append((bar_index, timestamp, high, low))
+        state.bar_count += 1
+        state.last_timestamp = timestamp
+        state.last_close = close
+
+        # 1. Confirmar swing de la vela central
+        if len(state.bars) == 2 * window + 1:
+            c_index, c_ts, c_high, c_low = state.bars[window]
+            is_high = all(h < c_high for k, (_, _, h, _) in enumerate(state.bars) if k != window)
+            is_low = all(l > c_low for k, (_, _, _, l) in enumerate(state.bars) if k != window)
+            if is_high:
+                undo['added_high'] = (self._push(state.swing_highs,
+                                                 StructureSwing(c_index, c_high, c_ts, 'high')),)
+            if is_low:
+                undo['added_low'] = (self._push(state.swing_lows,
+                                                StructureSwing(c_index, c_low, c_ts, 'low')),)
+
+        # 2. Rupturas de estructura por cierre
+        events: List[StructureEvent] = []
+        last_high = state.swing_highs[-1] if state.swing_highs else None
+        if last_high is not None and not last_high.broken and close > last_high.price:
+            events.append(self._break(state, last_high, TREND_BULLISH, close, bar_index, timestamp, undo))
+
+        last_low = state.swing_lows[-1] if state.swing_lows else None
+        if last_low is not None and not last_low.broken and close < last_low.price:
+            events.append(self._break(state, last_low, TREND_BEARISH, close, bar_index, timestamp, undo))
+
+        state._undo = undo
+        return events
+
+    def _break(self, state: MarketStructureState, swing: StructureSwing, direction: str,
+               close: float, bar_index: int, timestamp: Any, undo: Dict[str, Any]) -> StructureEvent:
+        previous_trend = state.trend
+        opposite = TREND_BEARISH if direction == TREND_BULLISH else TREND_BULLISH
+        kind = 'CHOCH' if previous_trend == opposite else 'BOS'
+
+        event = StructureEvent(
+            event_type=f"{kind}_{direction}",
+            direction=direction,
+            break_level=swing.price,
+            close_price=close,
+            bar_index=bar_index,
+            timestamp=timestamp,
+            previous_trend=previous_trend,
+            swing_bar_index=swing.bar_index,
+        )
+        swing.broken = True
+        undo['broken'].append(swing)
+        evicted = self._push(state.events, event)
+        if evicted is not None:
+            undo['evicted_events'].append(evicted)
+        undo['events'] += 1
+
+        state.trend = direction
+        if kind == 'CHOCH':
+            state.last_choch = event
+        else:
+            state.last_bos = event
+        return event
+
+    def _undo_last(self, state: MarketStructureState) -> None:
+        undo = state._undo
+        if undo is None:
+            return
+
+        for _ in range(undo['events']):
+            state.events.pop()
+        for evicted in reversed(undo['evicted_events']):
+            state.events.appendleft(evicted)
+        for swing in undo['broken']:
+            swing.broken = False
+
+        for key, swings in (('added_high', state.swing_highs), ('added_low', state.swing_lows)):
+            if undo[key] is not None:
+                swings.pop()
+                evicted = undo[key][0]
+                if evicted is not None:
+                    swings.appendleft(evicted)
+
+        state.bars.pop()
+        if undo['evicted_bar'] is not None:
+            state.bars.appendleft(undo['evicted_bar'])
+        state.bar_count -= 1
+        state.last_timestamp = undo['prev_timestamp']
+        state.last_close = undo['prev_close']
+        state.trend = undo['trend']
+        state.last_bos = undo['last_bos']
+        state.last_choch = undo['last_choch']
+        state._undo = None
+
+    @staticmethod
+    def _matches_history(state: MarketStructureState, index, highs, lows, start: int) -> bool:
+        """Comprueba que la vela cerrada anterior del frame coincide con el estado"""
+        if start == 0 or start >= len(index) or index[start] != state.last_timestamp:
+            return start == 0 or start == len(index)
+        if len(state.bars) < 2:
+            return True
+        _, prev_ts, prev_high, prev_low = state.bars[-2]
+        return (index[start - 1] == prev_ts and
+                float(highs[start - 1]) == prev_high and
+                float(lows[start - 1]) == prev_low)
+
+    @staticmethod
+    def _ensure_swing_capacity(state: MarketStructureState, rows: int) -> None:
+        """Un frame de N velas no puede tener más de N swings: el cap nunca recorta un frame"""
+        for name in ('swing_highs', 'swing_lows'):
+            swings = getattr(state, name)
+            if swings.maxlen is not None and swings.maxlen < rows:
+                setattr(state, name, deque(swings, maxlen=rows))
+
+    @staticmethod
+    def _push(container: Deque, item: Any) -> Any:
+        """Añade a un deque acotado y devuelve el elemento expulsado (o None)"""
+        evicted = container[0] if container.maxlen is not None and len(container) == container.maxlen else None
+        container.append(item)
+        return evicted
+
+
+# ===============================
+# SERIALIZACIÓN
+# ===============================
+
+def _is_datetime_index(index) -> bool:
+    return getattr(index, 'inferred_type', '') in ('datetime64', 'datetime', 'date')
+
+
+def _encode_ts(ts: Any) -> Any:
+    if ts is not None and hasattr(ts, 'isoformat'):
+        return {'iso': ts.isoformat()}
+    if hasattr(ts, 'item'):
+        return ts.item()
+    return ts
+
+
+def _decode_ts(value: Any) -> Any:
+    if isinstance(value, dict) and 'iso' in value:
+        try:
+            import pandas as pd
+            return pd.Timestamp(value['iso'])
+        except ImportError:
+            return datetime.fromisoformat(value['iso'])
+    return value
+
+
+def _encode_swing(swing: StructureSwing) -> Dict[str, Any]:
+    data = asdict(swing)
+    data['timestamp'] = _encode_ts(swing.timestamp)
+    return data
+
+
+def _decode_swing(data: Dict[str, Any]) -> StructureSwing:
+    data = dict(data)
+    data['timestamp'] = _decode_ts(data['timestamp'])
+    return StructureSwing(**data)
+
+
+def _encode_event(event: StructureEvent) -> Dict[str, Any]:
+    data = asdict(event)
+    data['timestamp'] = _encode_ts(event.timestamp)
+    return data
+
+
+def _decode_event(data: Dict[str, Any]) -> StructureEvent:
+    data = dict(data)
+    data['timestamp'] = _decode_ts(data['timestamp'])
+    return StructureEvent(**data)
@@ -29,6 +29,8 @@ import numpy as np
 
 # === IMPORTS ENTERPRISE LOGGING ===
 from core.smart_trading_logger import SmartTradingLogger
+from utils.memory_budget import BoundedHistory, estimate_size, get_memory_budget
+from utils.memory_wal import MemoryWAL, open_wal
 
 class MarketContextV6:
     """
@@ -70,18 +72,25 @@ class MarketContextV6:
             "M1": "NEUTRAL"
         }
         
-        # === MEMORIA HISTÓRICA ICT PATTERNS ===
-        self.previous_pois: List[dict] = []
-        self.bos_events: List[dict] = []
-        self.choch_events: List[dict] = []
-        self.order_blocks: List[dict] = []  # NUEVO v6.0
-        self.fvg_events: List[dict] = []    # NUEVO v6.0
-        self.displacement_events: List[dict] = []  # NUEVO v6.0
+        # === CONFIGURACIONES ENTERPRISE ===
+        self.retention_periods = self.memory_config.get("market_context", {}).get("bias_retention_periods", 50)
+        self.max_poi_history = self.memory_config.get("market_context", {}).get("poi_history_max_count", 200)
+        self.max_swing_points = self.memory_config.get("market_context", {}).get("swing_points_retention", 100)
+        self.max_bos_events = self.memory_config.get("market_context", {}).get("bos_events_retention", 150)
+        self.max_choch_events = self.memory_config.get("market_context", {}).get("choch_events_retention", 150)
+        
+        # === MEMORIA HISTÓRICA ICT PATTERNS (anillos acotados) ===
+        self.previous_pois = BoundedHistory(self.max_poi_history, name='previous_pois')
+        self.bos_events = BoundedHistory(self.max_bos_events, name='bos_events')
+        self.choch_events = BoundedHistory(self.max_choch_events, name='choch_events')
+        self.order_blocks = BoundedHistory(self.max_poi_history, name='order_blocks')  # NUEVO v6.0
+        self.fvg_events = BoundedHistory(self.max_poi_history, name='fvg_events')      # NUEVO v6.0
+        self.displacement_events = BoundedHistory(self.max_poi_history, name='displacement_events')  # NUEVO v6.0
         
         # === SWING POINTS HISTÓRICOS ===
-        self.swing_points: Dict[str, List[dict]] = {
-            "highs": [],
-            "lows": [],
+        self.swing_points: Dict[str, Any] = {
+            "highs": BoundedHistory(self.max_swing_points, name='swing_highs'),
+            "lows": BoundedHistory(self.max_swing_points, name='swing_lows'),
             "last_high": None,
             "last_low": None
         }
@@ -114,7 +123,7 @@ class MarketContextV6:
         for tf in ["W1", "D1", "H4", "H1", "M15", "M5", "M1"]:
             self.timeframe_contexts[tf] = {
                 "last_analysis": None,
-                "patterns_detected": [],
+                "patterns_detected": BoundedHistory(self.retention_periods, name=f'patterns_{tf}'),
                 "structure_quality": "UNKNOWN",
                 "trend_direction": "NEUTRAL",
                 "last_updated": None
@@ -125,16 +134,14 @@ class MarketContextV6:
         self._cache_timestamps: Dict[str, datetime] = {}
         self._cache_config = self.memory_config.get("cache_settings", {})
         
-        # === CONFIGURACIONES ENTERPRISE ===
-        self.retention_periods = self.memory_config.get("market_context", {}).get("bias_retention_periods", 50)
-        self.max_poi_history = self.memory_config.get("market_context", {}).get("poi_history_max_count", 200)
-        self.max_swing_points = self.memory_config.get("market_context", {}).get("swing_points_retention", 100)
-        self.max_bos_events = self.memory_config.get("market_context", {}).get("bos_events_retention", 150)
-        self.max_choch_events = self.memory_config.get("market_context", {}).get("choch_events_retention", 150)
-        
         # === PERSISTENCIA DE MEMORIA ===
         self.memory_cache_dir = "cache/memory"
         self._ensure_cache_directory()
+        self._wal: Optional[MemoryWAL] = None          # Log de mutaciones (market_context.wal)
+        self._persisted_totals: Dict[str, int] = {}    # total_appended ya escrito por historial
+        
+        # === PRESUPUESTO DE MEMORIA (desalojo bajo presión) ===
+        get_memory_budget().register('market_context', self, priority=60)
         
         # === INICIALIZACIÓN EXITOSA ===
         self.logger.info(
@@ -241,10 +248,7 @@ class MarketContextV6:
             # Actualizar POIs
             if 'pois_detected' in analysis_results:
                 new_pois = analysis_results['pois_detected']
-                self.previous_pois.extend(new_pois)
-                # Mantener límite de memoria
-                if len(self.previous_pois) > self.max_poi_history:
-                    self.previous_pois = self.previous_pois[-self.max_poi_history:]
+                self.previous_pois.extend(new_pois)  # El anillo mantiene el límite de memoria
             
             # Actualizar BOS events
             if 'bos_detected' in analysis_results:
@@ -254,8 +258,6 @@ class MarketContextV6:
                     'price': self.current_price
                 }
                 self.bos_events.append(bos_event)
-                if len(self.bos_events) > self.max_bos_events:
-                    self.bos_events = self.bos_events[-self.max_bos_events:]
             
             # Actualizar CHoCH events
             if 'choch_detected' in analysis_results:
@@ -265,8 +267,6 @@ class MarketContextV6:
                     'price': self.current_price
                 }
                 self.choch_events.append(choch_event)
-                if len(self.choch_events) > self.max_choch_events:
-                    self.choch_events = self.choch_events[-self.max_choch_events:]
             
             # Actualizar swing points
             if 'swing_points' in analysis_results:
@@ -286,12 +286,6 @@ class MarketContextV6:
                         'data': swing_data
                     })
                     self.swing_points['last_low'] = swing_data['low']
-                
-                # Mantener límite de swing points
-                if len(self.swing_points['highs']) > self.max_swing_points:
-                    self.swing_points['highs'] = self.swing_points['highs'][-self.max_swing_points:]
-                if len(self.swing_points['lows']) > self.max_swing_points:
-                    self.swing_points['lows'] = self.swing_points['lows'][-self.max_swing_points:]
                     
         except Exception as e:
             self.logger.error(f"Error actualizando pattern memory: {e}", component="market_memory")
@@ -386,13 +380,37 @@ class MarketContextV6:
         else:
             return "LOW"
     
-    def persist_memory_state(self) -> None:
+    def _memory_wal(self) -> MemoryWAL:
+        """Log de mutaciones de la memoria (se abre y reproduce en el primer uso)."""
+        if self._wal is None:
+            self._wal = open_wal(self.memory_cache_dir, 'market_context')
+        return self._wal
+    
+    def _persisted_histories(self) -> List[Tuple[str, BoundedHistory, int]]:
+        """(clave en el log, historial, elementos retenidos en disco)"""
+        return [
+            ('pattern_memory.previous_pois', self.previous_pois, 50),  # Solo recientes
+            ('pattern_memory.bos_events', self.bos_events, 50),
+            ('pattern_memory.choch_events', self.choch_events, 50),
+            ('swing_points.recent_highs', self.swing_points['highs'], 20),
+            ('swing_points.recent_lows', self.swing_points['lows'], 20),
+        ]
+    
+    def persist_memory_state(self, wait: bool = False) -> None:
         """
         Persiste estado de memoria para sesiones futuras.
         Como un trader real que registra su journal.
+        
+        Solo se registran las mutaciones desde el último guardado (los
+        historiales añaden sus elementos nuevos, el resto solo si cambió);
+        la escritura a disco la hace el flusher del log en segundo plano.
+        
+        Args:
+            wait: Escribir a disco antes de volver
         """
         try:
-            memory_state = {
+            wal = self._memory_wal()
+            changed = wal.update({
                 'timestamp': self.last_updated.isoformat(),
                 'market_context': {
                     'market_bias': self.market_bias,
@@ -401,48 +419,74 @@ class MarketContextV6:
                     'market_phase': self.market_phase,
                     'timeframe_bias': self.timeframe_bias
                 },
-                'pattern_memory': {
-                    'previous_pois': self.previous_pois[-50:],  # Solo recientes
-                    'bos_events': self.bos_events[-50:],
-                    'choch_events': self.choch_events[-50:],
-                    'swing_points': {
-                        'recent_highs': self.swing_points['highs'][-20:],
-                        'recent_lows': self.swing_points['lows'][-20:],
-                        'last_high': self.swing_points['last_high'],
-                        'last_low': self.swing_points['last_low']
-                    }
-                },
+                'swing_points.last_high': self.swing_points['last_high'],
+                'swing_points.last_low': self.swing_points['last_low'],
                 'smart_money_memory': self.smart_money_context,
                 'killzone_memory': self.killzone_memory
-            }
+            })
+            
+            for key, history, keep in self._persisted_histories():
+                new_items = min(len(history), keep)
+                if key in wal:  # Sin línea base en el log (primer guardado o migración del JSON) va completo
+                    new_items = min(history.total_appended - self._persisted_totals.get(key, 0), new_items)
+                if new_items > 0:
+                    changed += wal.append(key, history[-new_items:], maxlen=keep)
+                self._persisted_totals[key] = history.total_appended
             
-            # Guardar en archivo
-            memory_file = os.path.join(self.memory_cache_dir, 'market_context_state.json')
-            with open(memory_file, 'w', encoding='utf-8') as f:
-                json.dump(memory_state, f, indent=2, default=str)
+            if wait:
+                wal.flush()
             
-            self.logger.info(f"💾 Estado de memoria persistido en {memory_file}", 
+            self.logger.debug(f"💾 Estado de memoria persistido en {wal.log_path} ({changed} cambios)", 
                                component="market_memory")
             
         except Exception as e:
             self.logger.error(f"Error persistiendo memoria: {e}", component="market_memory")
     
+    def _read_memory_state(self) -> Optional[Dict[str, Any]]:
+        """Estado guardado con la forma del journal JSON (log binario o JSON heredado)."""
+        wal = self._memory_wal()
+        if len(wal):
+            stored = wal.to_dict()
+            return {
+                'timestamp': stored.get('timestamp'),
+                'market_context': stored.get('market_context', {}),
+                'pattern_memory': {
+                    'previous_pois': stored.get('pattern_memory.previous_pois', []),
+                    'bos_events': stored.get('pattern_memory.bos_events', []),
+                    'choch_events': stored.get('pattern_memory.choch_events', []),
+                    'swing_points': {
+                        'recent_highs': stored.get('swing_points.recent_highs', []),
+                        'recent_lows': stored.get('swing_points.recent_lows', []),
+                        'last_high': stored.get('swing_points.last_high'),
+                        'last_low': stored.get('swing_points.last_low')
+                    }
+                },
+                'smart_money_memory': stored.get('smart_money_memory', self.smart_money_context),
+                'killzone_memory': stored.get('killzone_memory', self.killzone_memory)
+            }
+        
+        memory_file = os.path.join(self.memory_cache_dir, 'market_context_state.json')
+        if not os.path.exists(memory_file):
+            return None
+        with open(memory_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    
     def restore_memory_state(self) -> bool:
         """
         Restaura estado de memoria de sesiones pasadas.
         Como un trader real consultando su journal histórico.
+        
+        Reproduce el log desde el último snapshot; si aún no existe, lee el
+        journal JSON de versiones anteriores (el siguiente guardado lo migra).
         """
         try:
-            memory_file = os.path.join(self.memory_cache_dir, 'market_context_state.json')
+            memory_state = self._read_memory_state()
             
-            if not os.path.exists(memory_file):
+            if memory_state is None:
                 self.logger.warning("No se encontró estado de memoria previo", 
                                        component="market_memory")
                 return False
             
-            with open(memory_file, 'r', encoding='utf-8') as f:
-                memory_state = json.load(f)
-            
             # Restaurar contexto de mercado
             if 'market_context' in memory_state:
                 mc = memory_state['market_context']
@@ -455,14 +499,14 @@ class MarketContextV6:
             # Restaurar memoria de patrones
             if 'pattern_memory' in memory_state:
                 pm = memory_state['pattern_memory']
-                self.previous_pois = pm.get('previous_pois', [])
-                self.bos_events = pm.get('bos_events', [])
-                self.choch_events = pm.get('choch_events', [])
+                self.previous_pois.replace(pm.get('previous_pois', []))
+                self.bos_events.replace(pm.get('bos_events', []))
+                self.choch_events.replace(pm.get('choch_events', []))
                 
                 if 'swing_points' in pm:
                     sp = pm['swing_points']
-                    self.swing_points['highs'] = sp.get('recent_highs', [])
-                    self.swing_points['lows'] = sp.get('recent_lows', [])
+                    self.swing_points['highs'].replace(sp.get('recent_highs', []))
+                    self.swing_points['lows'].replace(sp.get('recent_lows', []))
                     self.swing_points['last_high'] = sp.get('last_high')
                     self.swing_points['last_low'] = sp.get('last_low')
             
@@ -473,7 +517,10 @@ class MarketContextV6:
             if 'killzone_memory' in memory_state:
                 self.killzone_memory = memory_state['killzone_memory']
             
-            self.logger.info(f"📚 Estado de memoria restaurado desde {memory_file}", 
+            for key, history, _ in self._persisted_histories():
+                self._persisted_totals[key] = history.total_appended
+            
+            self.logger.info(f"📚 Estado de memoria restaurado desde {self.memory_cache_dir}", 
                                component="market_memory")
             return True
             
@@ -513,6 +560,26 @@ class MarketContextV6:
         self._cache_timestamps.clear()
         self.logger.debug("Cache de memoria limpiado", component="market_memory")
     
+    # === PRESUPUESTO DE MEMORIA ===
+    
+    def _bounded_histories(self) -> List[BoundedHistory]:
+        histories = [self.previous_pois, self.bos_events, self.choch_events, self.order_blocks,
+                     self.fvg_events, self.displacement_events, self.swing_points['highs'], self.swing_points['lows']]
+        histories.extend(ctx['patterns_detected'] for ctx in self.timeframe_contexts.values())
+        return histories
+    
+    def evict(self, fraction: float) -> int:
+        """Desalojo bajo presión de memoria: cache completo + fracción antigua de cada historial."""
+        freed = len(self._cache)
+        self.clear_cache()
+        for history in self._bounded_histories():
+            freed += history.evict(fraction)
+        return freed
+    
+    def memory_bytes(self) -> int:
+        """Bytes estimados de historiales y cache (monitor del sistema)."""
+        return sum(history.memory_bytes() for history in self._bounded_histories()) + estimate_size(self._cache)
+    
     # === INTEGRACIÓN CON ICTDataManager ===
     
     def integrate_with_ict_data_manager(self, ict_data_manager) -> None:
@@ -71,6 +71,10 @@ except ImportError:
     COMPONENTS_AVAILABLE = False
     print("⚠️ Algunos componentes v6.0 no están disponibles, usando fallbacks")
 
+from core.analysis.incremental_market_structure import IncrementalMarketStructureEngine
+from core.analysis.fvg_kernel import BULLISH, scan_fair_value_gaps
+from utils.hot_path_profiler import profile_hot_path
+
 # ===============================
 # TIPOS Y ENUMS ICT
 # ===============================
@@ -233,6 +237,9 @@ class MarketStructureAnalyzer:
         self.lock = threading.Lock()
         self._analysis_cache = {}
         
+        # Estado de estructura incremental por (símbolo, timeframe)
+        self._structure_engine = IncrementalMarketStructureEngine(window=self.swing_window)
+        
         # Inicializar componentes
         self._initialize_components()
         
@@ -256,6 +263,7 @@ class MarketStructureAnalyzer:
         except Exception as e:
             self._log_error(f"Error inicializando componentes: {e}")
 
+    @profile_hot_path()
     def analyze_market_structure(self,
                                symbol: str,
                                timeframe: str = "M15",
@@ -284,7 +292,7 @@ class MarketStructureAnalyzer:
                 return None
             
             # 2. 🎯 DETECTAR SWING POINTS
-            swing_highs, swing_lows = self._detect_swing_points(candles_data)
+            swing_highs, swing_lows = self._detect_swing_points(candles_data, symbol, timeframe)
             if len(swing_highs) < 2 or len(swing_lows) < 2:
                 self._log_debug("Insuficientes swing points para análisis")
                 return None
@@ -400,12 +408,30 @@ class MarketStructureAnalyzer:
             self._log_error(f"Error obteniendo datos: {e}")
             return None
 
-    def _detect_swing_points(self, candles) -> Tuple[List[SwingPoint], List[SwingPoint]]:
-        """🎯 Detecta swing highs y swing lows"""
+    def _detect_swing_points(self, candles, symbol: Optional[str] = None,
+                             timeframe: Optional[str] = None) -> Tuple[List[SwingPoint], List[SwingPoint]]:
+        """🎯 Detecta swing highs y swing lows (incremental si hay symbol/timeframe)"""
         try:
             swing_highs = []
             swing_lows = []
             
+            if symbol and timeframe:
+                self._structure_engine.update(symbol, timeframe, candles)
+                frame_swings = self._structure_engine.get_swings_for_frame(symbol, timeframe, candles)
+                for key, point_type, target in (('highs', 'high', swing_highs), ('lows', 'low', swing_lows)):
+                    for swing in frame_swings[key]:
+                        ts = swing['timestamp']
+                        target.append(SwingPoint(
+                            index=swing['index'],
+                            price=swing['price'],
+                            timestamp=ts if hasattr(ts, 'timestamp') else datetime.now(),
+                            point_type=point_type,
+                            strength=1.0,
+                            confirmed=True
+                        ))
+                self._log_debug(f"🎯 Swing points (incremental): {len(swing_highs)} highs, {len(swing_lows)} lows")
+                return swing_highs, swing_lows
+            
             # Detectar swing highs
             for i in range(self.swing_window, len(candles) - self.swing_window):
                 current_high = candles.iloc[i]['high']
@@ -842,61 +868,41 @@ class MarketStructureAnalyzer:
             self._log_debug(f"Warning logging confluencia: {e}")
 
     def _detect_fair_value_gaps(self, candles) -> bool:
-        """💎 Detecta Fair Value Gaps"""
+        """💎 Detecta Fair Value Gaps (kernel vectorizado fvg_kernel)"""
         try:
-            # Implementación básica de FVG detection
-            fvg_found = False
+            if len(candles) < 3:
+                return False
             
-            for i in range(2, len(candles)):
-                # Verificar FVG alcista
-                prev_high = candles.iloc[i-2]['high']
-                current_low = candles.iloc[i]['low']
-                
-                if current_low > prev_high:  # Gap alcista
-                    gap_size = current_low - prev_high
-                    if gap_size >= self.fvg_min_gap:
-                        fvg = FairValueGap(
-                            fvg_type=FVGType.BULLISH_FVG,
-                            high_price=current_low,
-                            low_price=prev_high,
-                            origin_candle=i-1,
-                            filled_percentage=0.0,
-                            is_mitigated=False,
-                            mitigation_candle=None,
-                            narrative=f"Bullish FVG: {gap_size:.5f} gap",
-                            timestamp=datetime.now()
-                        )
-                        self.detected_fvgs.append(fvg)
-                        fvg_found = True
-                
-                # Verificar FVG bajista
-                prev_low = candles.iloc[i-2]['low']
-                current_high = candles.iloc[i]['high']
-                
-                if current_high < prev_low:  # Gap bajista
-                    gap_size = prev_low - current_high
-                    if gap_size >= self.fvg_min_gap:
-                        fvg = FairValueGap(
-                            fvg_type=FVGType.BEARISH_FVG,
-                            high_price=prev_low,
-                            low_price=current_high,
-                            origin_candle=i-1,
-                            filled_percentage=0.0,
-                            is_mitigated=False,
-                            mitigation_candle=None,
-                            narrative=f"Bearish FVG: {gap_size:.5f} gap",
-                            timestamp=datetime.now()
-                        )
-                        self.detected_fvgs.append(fvg)
-                        fvg_found = True
+            records = scan_fair_value_gaps(
+                candles['high'].to_numpy(), candles['low'].to_numpy(),
+                min_size=self.fvg_min_gap
+            )
+            if len(records) == 0:
+                return False
+            
+            # Sólo se conservan los 20 más recientes: no construir el resto
+            for record in records[-20:]:
+                bullish = record['direction'] == BULLISH
+                gap_size = float(record['size'])
+                mitigation = int(record['mitigation_index'])
+                self.detected_fvgs.append(FairValueGap(
+                    fvg_type=FVGType.BULLISH_FVG if bullish else FVGType.BEARISH_FVG,
+                    high_price=float(record['top']),
+                    low_price=float(record['bottom']),
+                    origin_candle=int(record['index']),
+                    filled_percentage=float(record['fill_ratio']) * 100.0,
+                    is_mitigated=mitigation >= 0,
+                    mitigation_candle=mitigation if mitigation >= 0 else None,
+                    narrative=f"{'Bullish' if bullish else 'Bearish'} FVG: {gap_size:.5f} gap",
+                    timestamp=datetime.now()
+                ))
             
             # Limpiar FVGs antiguos
             self.detected_fvgs = self.detected_fvgs[-20:]
             
-            if fvg_found:
-                self._log_debug(f"💎 FVGs detectados: {len(self.detected_fvgs)}")
+            self._log_debug(f"💎 FVGs detectados: {len(self.detected_fvgs)}")
             
-            return fvg_found
+            return True
             
         except Exception as e:
             self._log_error(f"Error detectando FVGs: {e}")
@@ -1072,6 +1078,10 @@ class MarketStructureAnalyzer:
         except Exception as e:
             self._log_error(f"Error actualizando estado: {e}")
 
+    def get_incremental_structure(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """🔁 Estado incremental (tendencia, último BOS/CHoCH) de un símbolo/timeframe"""
+        return self._structure_engine.get_structure(symbol, timeframe)
+
     def get_current_structure_state(self) -> Dict[str, Any]:
         """📊 Obtiene estado actual de la estructura"""
         return {
@@ -13,7 +13,7 @@ Versión: v6.1.0-enterprise
 """
 
 import time
-from datetime import datetime, timedelta, time as dt_time
+from datetime import datetime, timedelta, timezone, time as dt_time
 from typing import Dict, List, Optional, Tuple, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
@@ -37,6 +37,15 @@ except ImportError:
     print("[WARNING] Downloader no disponible - usando datos simulados")
     get_advanced_candle_downloader = None
 
+# Motor incremental de estructura (swings/BOS/CHoCH por símbolo/timeframe)
+from .incremental_market_structure import IncrementalMarketStructureEngine
+from .session_calendar import get_session_calendar
+from .fvg_kernel import BULLISH, scan_fair_value_gaps
+from utils.hot_path_profiler import profile_hot_path
+from utils.lazy_loading import is_component_built, lazy_component
+from utils.columnar_store import register_record_type
+from utils.memory_budget import estimate_size, get_memory_budget
+
 # Importar Smart Money Concepts v6.0
 try:
     from ..smart_money_concepts.smart_money_analyzer import SmartMoneyAnalyzer
@@ -142,6 +151,9 @@ class PatternSignal:
     raw_data: Dict[str, Any] = field(default_factory=dict)
 
 
+register_record_type(PatternSignal, text_fields=('narrative', 'analysis_id'))
+
+
 class PatternDetector:
     """
     🎯 ICT PATTERN DETECTOR v6.0 ENTERPRISE
@@ -176,20 +188,20 @@ class PatternDetector:
             'last_update': datetime.now()
         }
         
-        # Componentes
-        self._downloader = None
-        self._smart_money_analyzer = None
-        self._multi_tf_analyzer = None  # 🚀 NUEVO: Multi-Timeframe Analyzer
-        self._data_manager = None       # 🎯 NUEVO: ICT Data Manager
+        # Componentes: diferidos, se construyen en el primer uso (ver @lazy_component)
         self._initialize_components()
         
         # Cache para optimización
         self._pattern_cache = {}
         self._cache_ttl = timedelta(minutes=5)
         
+        # Estado de estructura incremental: sólo se procesan las velas nuevas
+        self._structure_engine = IncrementalMarketStructureEngine(window=5)
+        self._session_calendar = get_session_calendar('broker')  # Velas MT5: hora del broker
+        get_memory_budget().register('pattern_detector', self, priority=30)
+        
         print(f"[INFO] Pattern Detector v6.0 Enterprise inicializado")
-        print(f"[INFO] Multi-Timeframe capability: {'ENABLED' if self._multi_tf_analyzer else 'DISABLED'}")
-        print(f"[INFO] Data Manager: {'ENABLED' if self._data_manager else 'DISABLED'}")
+        print(f"[INFO] Componentes diferidos: downloader, smart money, multi-timeframe, data manager (primer uso)")
         print(f"[INFO] Configuración: {len(self.config)} parámetros cargados")
     
     def _load_default_config(self) -> Dict[str, Any]:
@@ -229,54 +241,78 @@ class PatternDetector:
             # Performance
             'max_analysis_time': 0.05,  # 50ms
             'cache_size_limit': 100,
-            'concurrent_analysis': False
+            'concurrent_analysis': False,
+            'analysis_workers': None  # Procesos del escaneo multi-símbolo (None = núcleos, 0 = en proceso)
         }
     
     def _initialize_components(self):
-        """Inicializar componentes del detector"""
+        """
+        Registrar componentes del detector
+
+        La construcción es diferida: cada componente se crea en su primer
+        acceso, de modo que crear el detector no conecta MT5 ni construye
+        analizadores que quizá no se usen. Los fallos quedan como None
+        (mismo contrato que antes: `if self._x` / modo básico).
+        """
+        self.is_initialized = True
+
+    @lazy_component(fallback=None)
+    def _downloader(self):
+        """Downloader de velas (MT5) si está disponible"""
+        if not get_advanced_candle_downloader:
+            print("[WARNING] Downloader no disponible - modo simulación")
+            return None
+        downloader = get_advanced_candle_downloader()
+        print("[INFO] Downloader conectado - datos reales disponibles")
+        return downloader
+
+    @lazy_component(fallback=None)
+    def _smart_money_analyzer(self):
+        """Smart Money Analyzer v6.0 si está disponible"""
+        if not SmartMoneyAnalyzer:
+            print("[WARNING] Smart Money Analyzer no disponible - funcionalidad limitada")
+            return None
+        analyzer = SmartMoneyAnalyzer()
+        print("[INFO] Smart Money Analyzer v6.0 conectado - análisis institucional disponible")
+        return analyzer
+
+    @lazy_component(fallback=None)
+    def _multi_tf_analyzer(self):
+        """🚀 Multi-Timeframe Analyzer (pipeline H4→M15→M5)"""
         try:
-            # Inicializar downloader si está disponible
-            if get_advanced_candle_downloader:
-                self._downloader = get_advanced_candle_downloader()
-                print("[INFO] Downloader conectado - datos reales disponibles")
-            else:
-                print("[WARNING] Downloader no disponible - modo simulación")
-            
-            # Inicializar Smart Money Analyzer si está disponible
-            if SmartMoneyAnalyzer:
-                self._smart_money_analyzer = SmartMoneyAnalyzer()
-                print("[INFO] Smart Money Analyzer v6.0 conectado - análisis institucional disponible")
-            else:
-                print("[WARNING] Smart Money Analyzer no disponible - funcionalidad limitada")
-            
-            # 🚀 NUEVO: Inicializar Multi-Timeframe Analyzer
-            try:
-                from .multi_timeframe_analyzer import OptimizedICTAnalysisEnterprise
-                self._multi_tf_analyzer = OptimizedICTAnalysisEnterprise()
-                print("[INFO] 🚀 Multi-Timeframe Analyzer Enterprise v6.0 conectado - pipeline H4→M15→M5 disponible")
-                self.config['multi_timeframe_enabled'] = True
-            except ImportError as e:
-                print(f"[WARNING] Multi-Timeframe Analyzer no disponible: {e}")
-                print("[INFO] Funcionando en modo single-timeframe")
-                self.config['multi_timeframe_enabled'] = False
-
-            # 🎯 NUEVO: Inicializar ICT Data Manager
-            try:
-                from core.data_management.ict_data_manager import ICTDataManager
-                self._data_manager = ICTDataManager(downloader=self._downloader)
-                print("[INFO] 🎯 ICT Data Manager conectado - gestión inteligente de datos habilitada")
-                self.config['data_manager_enabled'] = True
-            except ImportError as e:
-                print(f"[WARNING] ICT Data Manager no disponible: {e}")
-                print("[INFO] Usando gestión de datos básica")
-                self.config['data_manager_enabled'] = False
-            
-            self.is_initialized = True
-            
-        except Exception as e:
-            print(f"[WARNING] Error inicializando componentes: {e}")
-            print("[INFO] Continuando en modo básico")
-    
+            from .multi_timeframe_analyzer import OptimizedICTAnalysisEnterprise
+            analyzer = OptimizedICTAnalysisEnterprise()
+            print("[INFO] 🚀 Multi-Timeframe Analyzer Enterprise v6.0 conectado - pipeline H4→M15→M5 disponible")
+            self.config['multi_timeframe_enabled'] = True
+            return analyzer
+        except ImportError as e:
+            print(f"[WARNING] Multi-Timeframe Analyzer no disponible: {e}")
+            print("[INFO] Funcionando en modo single-timeframe")
+            self.config['multi_timeframe_enabled'] = False
+            return None
+
+    @lazy_component(fallback=None)
+    def _data_manager(self):
+        """🎯 ICT Data Manager (gestión inteligente de datos)"""
+        try:
+            from core.data_management.ict_data_manager import ICTDataManager
+            manager = ICTDataManager(downloader=self._downloader)
+            print("[INFO] 🎯 ICT Data Manager conectado - gestión inteligente de datos habilitada")
+            self.config['data_manager_enabled'] = True
+            return manager
+        except ImportError as e:
+            print(f"[WARNING] ICT Data Manager no disponible: {e}")
+            print("[INFO] Usando gestión de datos básica")
+            self.config['data_manager_enabled'] = False
+            return None
+
+    @lazy_component(fallback=None)
+    def _analysis_pool(self):
+        """🧮 Pool de procesos para el escaneo multi-símbolo (velas en memoria compartida)"""
+        from .sharded_analysis import ShardedAnalysisPool
+        return ShardedAnalysisPool(workers=self.config.get('analysis_workers'))
+
+    @profile_hot_path(rows='data')
     def detect_patterns(
         self, 
         data: Optional[pd.DataFrame] = None,
@@ -404,8 +440,12 @@ class PatternDetector:
                     "status": "NO_DATA"
                 }
             
-            # 1. 🎯 DETECTAR SWING POINTS (usando lógica migrada)
-            swing_points = self._detect_swing_points_for_bos(candles)
+            # 1. 🎯 DETECTAR SWING POINTS (incremental por símbolo/timeframe)
+            swing_points = self._detect_swing_points_for_bos(
+                candles,
+                symbol=symbol if symbol != 'UNKNOWN' else None,
+                timeframe=timeframe
+            )
             swing_highs = swing_points.get('highs', [])
             swing_lows = swing_points.get('lows', [])
             
@@ -710,6 +750,90 @@ class PatternDetector:
                 "status": "ERROR"
             }
 
+    def detect_bos_multi_symbol(self, symbols: List[str], timeframes: Optional[List[str]] = None,
+                                days: int = 7) -> Dict[str, Any]:
+        """
+        🧮 DETECTAR BOS EN VARIOS SÍMBOLOS (procesos worker)
+
+        Las velas se obtienen en este proceso y se reparten por (símbolo,
+        timeframe) en el pool de análisis: cada shard corre en su propio
+        núcleo sobre memoria compartida y devuelve sólo el resumen del motor
+        incremental de estructura.
+
+        Args:
+            symbols: Pares a escanear
+            timeframes: Timeframes por símbolo (default H4→M15→M5)
+            days: Días de histórico por timeframe
+
+        Returns:
+            Dict con el último BOS por (símbolo, timeframe) y la estructura de cada shard
+        """
+        timeframes = timeframes or ['H4', 'M15', 'M5']
+        try:
+            pool = self._analysis_pool
+            if pool is None:
+                return {
+                    "pattern_type": "BOS_MULTI_SYMBOL",
+                    "detected": False,
+                    "reason": "Sharded analysis pool not available",
+                    "signals": [],
+                    "status": "ANALYZER_NOT_AVAILABLE"
+                }
+
+            frames = {}
+            for symbol in symbols:
+                by_tf = {tf: self._get_market_data(symbol, tf, days) for tf in timeframes}
+                frames[symbol] = {tf: data for tf, data in by_tf.items() if data is not None and not data.empty}
+
+            scan = pool.scan(frames, tasks=('structure',),
+                             params={'structure_window': self._structure_engine.window})
+
+            signals = []
+            structure = {}
+            for symbol, by_tf in scan['results'].items():
+                for tf, result in by_tf.items():
+                    state = result.get('structure')
+                    if not state:
+                        continue
+                    structure.setdefault(symbol, {})[tf] = state
+                    bos = state.get('last_bos')
+                    if bos:
+                        signals.append({
+                            'symbol': symbol,
+                            'timeframe': tf,
+                            'direction': bos['direction'],
+                            'break_level': bos['break_level'],
+                            'close_price': bos['close_price'],
+                            'bar_index': bos['bar_index'],
+                            'timestamp': bos['timestamp'],
+                            'trend': state['trend']
+                        })
+
+            return {
+                "pattern_type": "BOS_MULTI_SYMBOL",
+                "detected": bool(signals),
+                "signals": signals,
+                "structure": structure,
+                "errors": scan['errors'],
+                "execution_summary": {
+                    "symbols_analyzed": len(frames),
+                    "shards": scan['shards'],
+                    "workers": scan['workers'],
+                    "elapsed": scan['elapsed']
+                },
+                "status": "BOS_MULTI_SYMBOL_DETECTED" if signals else "NO_BOS_MULTI_SYMBOL"
+            }
+
+        except Exception as e:
+            print(f"[ERROR] Error en detect_bos_multi_symbol: {e}")
+            return {
+                "pattern_type": "BOS_MULTI_SYMBOL",
+                "detected": False,
+                "reason": f"Multi-symbol analysis error: {str(e)}",
+                "signals": [],
+                "status": "ERROR"
+            }
+
     def detect_choch(self, symbol: str, timeframes: Optional[List[str]] = None, mode: str = 'auto') -> Dict[str, Any]:
         """
         🔄 DETECTAR CHANGE OF CHARACTER (CHoCH) - ICT v6.0 ENTERPRISE
@@ -877,7 +1001,8 @@ class PatternDetector:
                 return {"detected": False, "reason": "Insufficient data"}
             
             # 1. 🔍 DETECTAR SWING POINTS PARA CHoCH
-            swing_data = self._detect_swing_points_for_bos(candles, window=5)
+            swing_data = self._detect_swing_points_for_bos(candles, window=5,
+                                                           symbol=symbol, timeframe=timeframe)
             swing_highs = swing_data.get('highs', [])
             swing_lows = swing_data.get('lows', [])
             
@@ -1075,8 +1200,16 @@ class PatternDetector:
             print(f"[ERROR] Error evaluating multi-TF alignment: {e}")
             return {"alignment": "ERROR", "score": 0.0, "confluences": []}
 
-    def _detect_swing_points_for_bos(self, candles: pd.DataFrame, window: int = 5) -> Dict[str, List[Dict]]:
-        """🎯 Detecta swing points para análisis BOS (lógica MIGRADA)"""
+    def _detect_swing_points_for_bos(self, candles: pd.DataFrame, window: int = 5,
+                                     symbol: Optional[str] = None,
+                                     timeframe: Optional[str] = None) -> Dict[str, List[Dict]]:
+        """
+        🎯 Detecta swing points para análisis BOS (lógica MIGRADA)
+        
+        Con symbol/timeframe se usa el motor incremental: sólo se procesan
+        las velas nuevas desde la última llamada y el resultado es el mismo
+        que el recorrido completo del frame.
+        """
         try:
             swing_highs = []
             swing_lows = []
@@ -1084,6 +1217,10 @@ class PatternDetector:
             if len(candles) < window * 2 + 1:
                 return {'highs': swing_highs, 'lows': swing_lows}
 
+            if symbol and timeframe and window == self._structure_engine.window:
+                self._structure_engine.update(symbol, timeframe, candles)
+                return self._structure_engine.get_swings_for_frame(symbol, timeframe, candles)
+
             # Detectar swing highs (lógica MIGRADA desde market_structure_v2.py)
             for i in range(window, len(candles) - window):
                 current_high = candles.iloc[i]['high']
@@ -1219,22 +1356,32 @@ class PatternDetector:
             if self._downloader:
                 # 🎯 ESTRATEGIA MULTI-TIMEFRAME ICT v6.0
                 data_collection = {}
-                
-                # 1. Primary timeframe (solicitado)
-                primary_data = self._download_single_timeframe(symbol, timeframe, days)
-                if primary_data is not None and not primary_data.empty:
-                    data_collection[timeframe] = primary_data
-                    
-                # 2. Secondary timeframes para contexto ICT
                 secondary_timeframes = self._get_ict_secondary_timeframes(timeframe)
                 
-                for tf in secondary_timeframes:
-                    # Más días para timeframes superiores
-                    tf_days = self._calculate_ict_optimal_days(tf, days)
-                    
-                    secondary_data = self._download_single_timeframe(symbol, tf, tf_days)
-                    if secondary_data is not None and not secondary_data.empty:
-                        data_collection[tf] = secondary_data
+                if hasattr(self._downloader, 'get_timeframe_set'):
+                    # 1+2. Una serie base (M1/M5) y el resto agregado desde ella
+                    timeframe_set = self._downloader.get_timeframe_set(symbol, [timeframe] + secondary_timeframes,
+                                                                       consumer='pattern_detector')
+                    for tf, result in timeframe_set.get('results', {}).items():
+                        tf_data = result.get('data') if isinstance(result, dict) else None
+                        if tf_data is None or tf_data.empty:
+                            continue
+                        tf_days = days if tf == timeframe else self._calculate_ict_optimal_days(tf, days)
+                        data_collection[tf] = tf_data[tf_data.index >= tf_data.index[-1] - timedelta(days=tf_days)]
+                else:
+                    # 1. Primary timeframe (solicitado)
+                    primary_data = self._download_single_timeframe(symbol, timeframe, days)
+                    if primary_data is not None and not primary_data.empty:
+                        data_collection[timeframe] = primary_data
+                        
+                    # 2. Secondary timeframes para contexto ICT
+                    for tf in secondary_timeframes:
+                        # Más días para timeframes superiores
+                        tf_days = self._calculate_ict_optimal_days(tf, days)
+                        
+                        secondary_data = self._download_single_timeframe(symbol, tf, tf_days)
+                        if secondary_data is not None and not secondary_data.empty:
+                            data_collection[tf] = secondary_data
                         
                 # 3. Return primary data with enhanced context
                 if timeframe in data_collection:
@@ -1381,9 +1528,9 @@ class PatternDetector:
     def _detect_silver_bullet(self, data: pd.DataFrame, symbol: str, timeframe: str) -> List[PatternSignal]:
         """Detectar patrones Silver Bullet"""
         patterns = []
-        current_time = datetime.now()
+        current_time = datetime.now(timezone.utc)
         
-        # Verificar ventana temporal Silver Bullet (10:00-11:00 GMT)
+        # Verificar ventana temporal Silver Bullet (calendario de sesiones, hora NY)
         if not self._is_silver_bullet_time(current_time):
             return patterns
         
@@ -2112,48 +2259,29 @@ class PatternDetector:
         return order_blocks
     
     def _find_fair_value_gaps(self, data: pd.DataFrame) -> List[Dict[str, Any]]:
-        """Encontrar Fair Value Gaps en los datos"""
+        """Encontrar Fair Value Gaps en los datos (kernel vectorizado fvg_kernel)"""
         fvgs = []
         
         try:
             if len(data) < 3:
                 return fvgs
             
-            # Buscar gaps en secuencias de 3 velas
-            for i in range(1, len(data) - 1):
-                prev_candle = data.iloc[i-1]
-                current_candle = data.iloc[i]
-                next_candle = data.iloc[i+1]
-                
-                # Bullish FVG: gap between prev high and next low
-                if (prev_candle['high'] < next_candle['low'] and
-                    current_candle['close'] > current_candle['open']):
-                    
-                    gap_size = next_candle['low'] - prev_candle['high']
-                    if gap_size >= self.config['fvg_min_size']:
-                        fvgs.append({
-                            'type': 'bullish',
-                            'high': next_candle['low'],
-                            'low': prev_candle['high'],
-                            'timestamp': current_candle.name if hasattr(current_candle, 'name') else i,
-                            'size': gap_size,
-                            'partially_filled': False
-                        })
-                
-                # Bearish FVG: gap between prev low and next high
-                elif (prev_candle['low'] > next_candle['high'] and
-                      current_candle['close'] < current_candle['open']):
-                    
-                    gap_size = prev_candle['low'] - next_candle['high']
-                    if gap_size >= self.config['fvg_min_size']:
-                        fvgs.append({
-                            'type': 'bearish',
-                            'high': prev_candle['low'],
-                            'low': next_candle['high'],
-                            'timestamp': current_candle.name if hasattr(current_candle, 'name') else i,
-                            'size': gap_size,
-                            'partially_filled': False
-                        })
+            # Gap entre high/low de las velas i-1 e i+1 con vela central en la dirección del gap
+            records = scan_fair_value_gaps(
+                data['high'].to_numpy(), data['low'].to_numpy(),
+                data['open'].to_numpy(), data['close'].to_numpy(),
+                min_size=self.config['fvg_min_size'], require_body=True, track_mitigation=False
+            )
+            
+            for record in records:
+                fvgs.append({
+                    'type': 'bullish' if record['direction'] == BULLISH else 'bearish',
+                    'high': float(record['top']),
+                    'low': float(record['bottom']),
+                    'timestamp': data.index[record['index']],
+                    'size': float(record['size']),
+                    'partially_filled': False
+                })
                         
         except Exception as e:
             print(f"[WARNING] Error finding FVGs: {e}")
@@ -2372,44 +2500,37 @@ class PatternDetector:
         except Exception:
             return "NEUTRAL"
     
-    def _is_silver_bullet_time(self, current_time: datetime) -> bool:
-        """Verificar si es ventana Silver Bullet"""
+    def _is_silver_bullet_time(self, current_time: Optional[datetime] = None) -> bool:
+        """Verificar si es ventana Silver Bullet (03-04, 10-11, 14-15 hora NY; naive = UTC)"""
         try:
-            # Convertir a GMT si es necesario
-            hour = current_time.hour
-            # Silver Bullet windows: 10:00-11:00 GMT y 14:00-15:00 GMT
-            return (10 <= hour <= 11) or (14 <= hour <= 15)
-        except:
+            return self._session_calendar.label_timestamp(current_time or datetime.now(timezone.utc))['silver_bullet']
+        except Exception:
             return False
     
     def _is_session_opening(self) -> bool:
-        """Verificar si es apertura de sesión"""
+        """Verificar si es apertura de sesión (killzone London/New York)"""
         try:
-            current_time = datetime.now()
-            hour = current_time.hour
-            
-            # London: 08:00-10:00, New York: 13:00-15:00
-            return (8 <= hour <= 10) or (13 <= hour <= 15)
-        except:
+            killzone = self._session_calendar.current_labels()['killzone']
+            return killzone in ('LONDON_KILLZONE', 'NEWYORK_KILLZONE')
+        except Exception:
             return False
     
     def _get_current_session(self) -> SessionType:
         """Obtener sesión actual"""
         try:
-            current_time = datetime.now()
-            hour = current_time.hour
-            
-            if 8 <= hour <= 17:
-                return SessionType.LONDON
-            elif 13 <= hour <= 22:
-                return SessionType.NEW_YORK
-            elif 22 <= hour <= 24 or 0 <= hour <= 8:
-                return SessionType.ASIAN
-            else:
-                return SessionType.DEAD_ZONE
-        except:
+            session = self._session_calendar.current_labels()['session']
+            return {
+                'LONDON': SessionType.LONDON,
+                'NEW_YORK': SessionType.NEW_YORK,
+                'ASIA': SessionType.ASIAN,
+            }.get(session, SessionType.DEAD_ZONE)
+        except Exception:
             return SessionType.LONDON
     
+    def get_session_labels(self, candles: pd.DataFrame) -> pd.DataFrame:
+        """🗓️ Etiquetas session/killzone/overlap por vela del frame (cacheadas)"""
+        return self._session_calendar.annotate(candles)
+    
     def _update_performance_metrics(self, analysis_time: float, patterns_detected: int):
         """Actualizar métricas de rendimiento"""
         try:
@@ -2431,6 +2552,34 @@ class PatternDetector:
         except Exception as e:
             print(f"[WARNING] Error actualizando métricas: {e}")
     
+    def get_market_structure_state(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """🏗️ Estado incremental de estructura (tendencia, último BOS/CHoCH, swings)"""
+        return self._structure_engine.get_structure(symbol, timeframe)
+    
+    def snapshot_market_structure(self) -> Dict[str, Any]:
+        """💾 Snapshot serializable del estado de estructura de todos los símbolos"""
+        return self._structure_engine.snapshot()
+    
+    def restore_market_structure(self, snapshot: Dict[str, Any]) -> int:
+        """♻️ Restaura el estado de estructura desde snapshot_market_structure()"""
+        return self._structure_engine.restore(snapshot)
+
+    def close_analysis_pool(self) -> None:
+        """🧮 Detiene los workers del escaneo multi-símbolo y libera la memoria compartida"""
+        if is_component_built(self, '_analysis_pool') and self._analysis_pool is not None:
+            self._analysis_pool.close()
+        self.__dict__.pop('_analysis_pool', None)
+    
+    def evict(self, fraction: float) -> int:
+        """Desalojo bajo presión de memoria: la cache de patrones se reconstruye en el próximo análisis"""
+        freed = len(self._pattern_cache)
+        self._pattern_cache.clear()
+        return freed
+    
+    def memory_bytes(self) -> int:
+        """Bytes estimados de patrones detectados y cache"""
+        return estimate_size(self.detected_patterns) + estimate_size(self._pattern_cache)
+    
     def get_detected_patterns(self) -> List[PatternSignal]:
         """Obtener patrones detectados"""
         return self.detected_patterns.copy()
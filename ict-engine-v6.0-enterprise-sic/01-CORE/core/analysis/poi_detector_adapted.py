@@ -17,10 +17,18 @@ Adaptado desde: poi_detector.py original del proyecto principal
 
 import pandas as pd
 import numpy as np
-from typing import List, Dict, Optional, Tuple, Any
+from typing import List, Dict, Iterable, Optional, Tuple, Any
 from datetime import datetime
 import json
 from pathlib import Path
+from utils.hot_path_profiler import profile_hot_path
+from utils.columnar_store import ColumnarStore
+
+try:
+    from .fvg_kernel import BULLISH, scan_fair_value_gaps
+except ImportError:
+    # Import directo cuando el módulo se carga fuera del paquete core.analysis
+    from fvg_kernel import BULLISH, scan_fair_value_gaps
 
 # Sistema de logging adaptado
 def enviar_senal_log(level: str, message: str, module: str, categoria: str = "general"):
@@ -160,6 +168,42 @@ def crear_poi_estructura(poi_type: str, price: float, score: int, confidence: fl
         **kwargs
     }
 
+# Forma columnar de los POI dict: las claves de crear_poi_estructura y los
+# kwargs frecuentes son columnas; el resto de kwargs queda como extra por fila.
+POI_RECORD_SCHEMA = {
+    'id': 'text',
+    'type': 'category',
+    'price': 'float',
+    'score': 'int',
+    'confidence': 'float',
+    'timeframe': 'category',
+    'created_at': 'text',
+    'mitigated': 'bool',
+    'broken': 'bool',
+    'range_high': 'float?',
+    'range_low': 'float?',
+    'gap_size': 'float?',
+    'index': 'int?',
+}
+
+def crear_poi_store(pois: Optional[Iterable[Dict]] = None) -> ColumnarStore:
+    """
+    Crea un almacén columnar para POIs con la estructura de crear_poi_estructura.
+
+    Cada fila se lee como un dict (poi['price'], poi.get('gap_size'), dict(poi))
+    sin que el almacén guarde un dict por POI.
+
+    Args:
+        pois: POIs iniciales (dicts) a copiar al almacén
+
+    Returns:
+        ColumnarStore con schema POI_RECORD_SCHEMA y extras habilitados
+    """
+    store = ColumnarStore(POI_RECORD_SCHEMA, name='POI', allow_extras=True)
+    if pois:
+        store.extend(pois)
+    return store
+
 # =============================================================================
 # DETECTORES DE POI POR TIPO
 # =============================================================================
@@ -256,6 +300,14 @@ def detectar_order_blocks(df: pd.DataFrame, timeframe: str = "M15") -> List[Dict
 
     return order_blocks
 
+def _escanear_fvgs(df: pd.DataFrame) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Kernel vectorizado: todas las ventanas de 3 velas en una pasada, con score y confianza."""
+    records = scan_fair_value_gaps(df['high'].to_numpy(), df['low'].to_numpy(), track_mitigation=False)
+    gap_pips = records['size'] * 10000
+    scores = (55 + np.minimum(gap_pips * 2, 25)).astype(int)       # Igual que _calcular_score_fvg
+    confidences = np.minimum(0.4 + np.minimum(gap_pips * 0.05, 0.4), 0.9)  # Igual que _determinar_confianza_fvg
+    return records, scores, confidences
+
 def detectar_fair_value_gaps(df: pd.DataFrame, timeframe: str = "M15") -> List[Dict]:
     """
     Detecta Fair Value Gaps (vacíos de precio ineficientes).
@@ -282,61 +334,24 @@ def detectar_fair_value_gaps(df: pd.DataFrame, timeframe: str = "M15") -> List[D
 
         enviar_senal_log("DEBUG", f"Escaneando {len(df)-2} posiciones para detectar Fair Value Gaps...", __name__, "general")
 
-        bullish_fvg_count = 0
-        bearish_fvg_count = 0
-
-        for i in range(1, len(df) - 1):
-            prev_candle = df.iloc[i-1]
-            current_candle = df.iloc[i]
-            next_candle = df.iloc[i+1]
-
-            # BULLISH FVG: next_low > prev_high
-            if next_candle['low'] > prev_candle['high']:
-                gap_size = next_candle['low'] - prev_candle['high']
-                gap_pips = gap_size * 10000
-                score = _calcular_score_fvg(prev_candle, current_candle, next_candle, "BULLISH")
-                confidence = _determinar_confianza_fvg(prev_candle, next_candle)
-
-                fvg_bullish = crear_poi_estructura(
-                    "BULLISH_FVG",
-                    price=(next_candle['low'] + prev_candle['high']) / 2,
-                    score=score,
-                    confidence=confidence,
-                    timeframe=timeframe,
-                    range_high=next_candle['low'],
-                    range_low=prev_candle['high'],
-                    gap_size=gap_size,
-                    index=i
-                )
-                fvgs.append(fvg_bullish)
-                bullish_fvg_count += 1
-
-                enviar_senal_log("INFO", f"✅ POI DETECTADO: BULLISH_FVG @ {fvg_bullish['price']:.5f} | Gap: {gap_pips:.1f} pips | Score: {score} | TF: {timeframe}", __name__, "general")
-                enviar_senal_log("DEBUG", f"   Detalles FVG: Range High={next_candle['low']:.5f}, Range Low={prev_candle['high']:.5f}", __name__, "general")
-
-            # BEARISH FVG: next_high < prev_low
-            elif next_candle['high'] < prev_candle['low']:
-                gap_size = prev_candle['low'] - next_candle['high']
-                gap_pips = gap_size * 10000
-                score = _calcular_score_fvg(prev_candle, current_candle, next_candle, "BEARISH")
-                confidence = _determinar_confianza_fvg(prev_candle, next_candle)
-
-                fvg_bearish = crear_poi_estructura(
-                    "BEARISH_FVG",
-                    price=(prev_candle['low'] + next_candle['high']) / 2,
-                    score=score,
-                    confidence=confidence,
-                    timeframe=timeframe,
-                    range_high=prev_candle['low'],
-                    range_low=next_candle['high'],
-                    gap_size=gap_size,
-                    index=i
-                )
-                fvgs.append(fvg_bearish)
-                bearish_fvg_count += 1
-
-                enviar_senal_log("INFO", f"✅ POI DETECTADO: BEARISH_FVG @ {fvg_bearish['price']:.5f} | Gap: {gap_pips:.1f} pips | Score: {score} | TF: {timeframe}", __name__, "general")
-                enviar_senal_log("DEBUG", f"   Detalles FVG: Range High={prev_candle['low']:.5f}, Range Low={next_candle['high']:.5f}", __name__, "general")
+        records, scores, confidences = _escanear_fvgs(df)
+
+        for record, score, confidence in zip(records, scores, confidences):
+            range_high, range_low = float(record['top']), float(record['bottom'])
+            fvgs.append(crear_poi_estructura(
+                "BULLISH_FVG" if record['direction'] == BULLISH else "BEARISH_FVG",
+                price=(range_high + range_low) / 2,
+                score=int(score),
+                confidence=float(confidence),
+                timeframe=timeframe,
+                range_high=range_high,
+                range_low=range_low,
+                gap_size=float(record['size']),
+                index=int(record['index'])
+            ))
+
+        bullish_fvg_count = int(np.count_nonzero(records['direction'] == BULLISH))
+        bearish_fvg_count = len(records) - bullish_fvg_count
 
         enviar_senal_log("INFO", f"🎯 DETECCIÓN FVG COMPLETADA: {len(fvgs)} total ({bullish_fvg_count} alcistas, {bearish_fvg_count} bajistas) en {timeframe}", __name__, "general")
         log_poi_centralizado("FVG_DETECTION", f"Detectados {len(fvgs)} FVGs en {timeframe}")
@@ -347,6 +362,54 @@ def detectar_fair_value_gaps(df: pd.DataFrame, timeframe: str = "M15") -> List[D
 
     return fvgs
 
+def detectar_fair_value_gaps_columnar(df: pd.DataFrame, timeframe: str = "M15") -> ColumnarStore:
+    """
+    Variante columnar de detectar_fair_value_gaps.
+
+    Escribe los arrays del kernel directamente en un almacén POI sin crear un
+    dict por FVG. Las filas tienen las mismas claves que los dicts de
+    detectar_fair_value_gaps.
+
+    Args:
+        df: DataFrame con datos OHLC
+        timeframe: Timeframe de análisis
+
+    Returns:
+        ColumnarStore con los Fair Value Gaps detectados
+    """
+    store = crear_poi_store()
+    if len(df) < 3:
+        return store
+
+    try:
+        records, scores, confidences = _escanear_fvgs(df)
+        types = np.where(records['direction'] == BULLISH, "BULLISH_FVG", "BEARISH_FVG")
+        created = datetime.now()
+        stamp = created.timestamp()
+        store.extend_columns(
+            len(records),
+            id=[f"{poi_type}_{timeframe}_{stamp}_{index}" for poi_type, index in zip(types.tolist(), records['index'].tolist())],
+            type=types,
+            price=(records['top'] + records['bottom']) / 2,
+            score=scores,
+            confidence=confidences,
+            timeframe=timeframe,
+            created_at=created.isoformat(),
+            mitigated=False,
+            broken=False,
+            range_high=records['top'],
+            range_low=records['bottom'],
+            gap_size=records['size'],
+            index=records['index']
+        )
+        log_poi_centralizado("FVG_DETECTION", f"Detectados {len(store)} FVGs en {timeframe} (columnar)")
+
+    except (ValueError, KeyError, TypeError) as e:
+        enviar_senal_log("ERROR", f"❌ ERROR en detección columnar de Fair Value Gaps: {e}", __name__, "general")
+        log_poi_centralizado("FVG_DETECTION_ERROR", f"Error detectando FVGs: {e}", is_error=True)
+
+    return store
+
 def detectar_breaker_blocks(df: pd.DataFrame, timeframe: str = "M15") -> List[Dict]:
     """
     Detecta Breaker Blocks (Order Blocks que han sido rotos y se convierten en soporte/resistencia).
@@ -487,7 +550,8 @@ def detectar_imbalances(df: pd.DataFrame, timeframe: str = "M15") -> List[Dict]:
 # =============================================================================
 
 def detectar_todos_los_pois(df: pd.DataFrame, timeframe: str = "M15",
-                           current_price: Optional[float] = None) -> Dict[str, List[Dict]]:
+                           current_price: Optional[float] = None,
+                           columnar: bool = False) -> Dict[str, Any]:
     """
     FUNCIÓN PRINCIPAL: Detecta todos los tipos de POIs en un DataFrame.
 
@@ -498,6 +562,7 @@ def detectar_todos_los_pois(df: pd.DataFrame, timeframe: str = "M15",
         df: DataFrame con datos OHLC
         timeframe: Timeframe de análisis
         current_price: Precio actual para cálculos de proximidad
+        columnar: Devolver cada tipo como ColumnarStore (filas con acceso tipo dict)
 
     Returns:
         Dict con todos los POIs detectados por tipo
@@ -525,7 +590,7 @@ def detectar_todos_los_pois(df: pd.DataFrame, timeframe: str = "M15",
 
         # 2. DETECTAR FAIR VALUE GAPS
         enviar_senal_log("INFO", "🔎 FASE 2: Detectando Fair Value Gaps...", __name__, "general")
-        fvgs = detectar_fair_value_gaps(df, timeframe)
+        fvgs = detectar_fair_value_gaps_columnar(df, timeframe) if columnar else detectar_fair_value_gaps(df, timeframe)
         todos_los_pois['fair_value_gaps'] = fvgs
         enviar_senal_log("INFO", f"✅ Fase 2 completada: {len(fvgs)} Fair Value Gaps detectados", __name__, "general")
 
@@ -560,6 +625,10 @@ def detectar_todos_los_pois(df: pd.DataFrame, timeframe: str = "M15",
 
         todos_los_pois['resumen'] = resumen
 
+        if columnar:
+            for key in ('order_blocks', 'breaker_blocks', 'imbalances'):
+                todos_los_pois[key] = crear_poi_store(todos_los_pois[key])
+
         enviar_senal_log("INFO", f"🎯 DETECCIÓN COMPLETA FINALIZADA", __name__, "general")
         enviar_senal_log("INFO", f"📈 RESUMEN TOTAL: {total_pois} POIs en {tiempo_deteccion:.2f}s | Densidad: {resumen['densidad_pois']:.3f} POIs/vela", __name__, "general")
         enviar_senal_log("INFO", f"📊 DISTRIBUCIÓN: OB={len(obs)}, FVG={len(fvgs)}, BB={len(breakers)}, IM={len(imbalances)}", __name__, "general")
@@ -1026,6 +1095,7 @@ class POIDetector:
             enviar_senal_log("ERROR", f"Error inicializando POIDetector: {e}", __name__, "poi")
             self.initialized = False
 
+    @profile_hot_path(rows='df')
     def find_all_pois(self, df: pd.DataFrame, timeframe: str,
                      current_price: Optional[float] = None) -> List[Dict]:
         """
@@ -1487,6 +1557,7 @@ __all__ = [
     # Detectores individuales (legacy support)
     'detectar_order_blocks',
     'detectar_fair_value_gaps',
+    'detectar_fair_value_gaps_columnar',
     'detectar_breaker_blocks',
     'detectar_imbalances',
     'detectar_todos_los_pois',
@@ -1504,6 +1575,7 @@ __all__ = [
 
     # Utilidades
     'crear_poi_estructura',
+    'crear_poi_store',
     'log_poi_centralizado',
 
     # Testing y configuración
@@ -1513,5 +1585,6 @@ __all__ = [
 
     # Constantes
     'POI_TYPES',
-    'POI_SCORING_CONFIG'
+    'POI_SCORING_CONFIG',
+    'POI_RECORD_SCHEMA'
 ]
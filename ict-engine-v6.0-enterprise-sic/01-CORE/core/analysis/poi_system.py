@@ -45,6 +45,9 @@ try:
 except ImportError:
     print("[WARNING] Algunos componentes no disponibles - funcionalidad limitada")
 
+from utils.columnar_store import NULL_INT, register_record_type, store_for
+from utils.memory_budget import estimate_size, get_memory_budget, spill_records
+
 
 class POIType(Enum):
     """Tipos de Points of Interest"""
@@ -124,6 +127,10 @@ class POI:
     related_pois: List[str] = field(default_factory=list)
 
 
+# Histórico compacto (struct-of-arrays): ver utils/columnar_store.py
+register_record_type(POI, text_fields=('analysis_id', 'notes'))
+
+
 class POISystem:
     """
     🎯 POI SYSTEM v6.0 ENTERPRISE
@@ -149,7 +156,7 @@ class POISystem:
         # Estado del sistema
         self.is_initialized = False
         self.active_pois: List[POI] = []
-        self.historical_pois: List[POI] = []
+        self.historical_pois = store_for(POI)  # Columnar, acotado a max_historical_pois
         self.poi_cache = {}
         
         # Métricas
@@ -167,6 +174,7 @@ class POISystem:
         self._market_analyzer = None
         
         self._initialize_components()
+        get_memory_budget().register('poi_system', self, priority=40)
         
         print(f"[INFO] POI System v6.0 Enterprise inicializado")
         print(f"[INFO] Configuración: {len(self.config)} parámetros cargados")
@@ -178,6 +186,8 @@ class POISystem:
             'enable_debug': True,
             'enable_cache': True,
             'max_active_pois': 50,
+            'max_historical_pois': 5000,
+            'historical_spill_path': None,  # JSONL con resúmenes de POIs desalojados del histórico
             'poi_cleanup_interval': 3600,  # 1 hora
             
             # Detección
@@ -959,10 +969,36 @@ class POISystem:
         
         self.active_pois = active_pois
         self.historical_pois.extend(expired_pois)
+        overflow = len(self.historical_pois) - self.config.get('max_historical_pois', 5000)
+        if overflow > 0:
+            self._drop_historical(overflow)
         
         if expired_pois:
             print(f"[INFO] {len(expired_pois)} POIs movidos a histórico")
     
+    def _drop_historical(self, count: int) -> int:
+        """Eliminar los POIs históricos más antiguos, con resumen a disco si está configurado"""
+        spill_path = self.config.get('historical_spill_path')
+        on_drop = None
+        if spill_path:
+            on_drop = lambda rows: spill_records(spill_path, [
+                {key: row.get(key) for key in ('poi_type', 'symbol', 'timeframe', 'price_level', 'strength',
+                                               'status', 'test_count', 'created_at', 'expiry_time')}
+                for row in rows
+            ])
+        return self.historical_pois.drop_oldest(count, on_drop)
+    
+    def evict(self, fraction: float) -> int:
+        """Desalojo bajo presión de memoria: cache de POIs + fracción antigua del histórico"""
+        freed = len(self.poi_cache)
+        self.poi_cache.clear()
+        return freed + self._drop_historical(int(len(self.historical_pois) * fraction))
+    
+    def memory_bytes(self) -> int:
+        """Bytes estimados de POIs activos, histórico y cache"""
+        return (estimate_size(self.active_pois) + self.historical_pois.memory_usage()['total_bytes']
+                + estimate_size(self.poi_cache))
+    
     def _update_metrics(self, new_pois: List[POI], analysis_time: float):
         """Actualizar métricas del sistema"""
         self.performance_metrics['total_pois_created'] += len(new_pois)
@@ -971,15 +1007,14 @@ class POISystem:
         
         # Calcular lifetime promedio de POIs históricos
         if self.historical_pois:
-            lifetimes = []
-            for poi in self.historical_pois:
-                if poi.created_at and poi.expiry_time:
-                    lifetime = poi.expiry_time - poi.created_at
-                    lifetimes.append(lifetime)
+            # Vectorizado sobre las columnas de µs (sin materializar cada POI)
+            created = self.historical_pois.column('created_at')
+            expiry = self.historical_pois.column('expiry_time')
+            valid = (created != NULL_INT) & (expiry != NULL_INT)
             
-            if lifetimes:
-                avg_lifetime = sum(lifetimes, timedelta()) / len(lifetimes)
-                self.performance_metrics['avg_poi_lifetime'] = avg_lifetime
+            if valid.any():
+                avg_us = float(np.mean(expiry[valid] - created[valid]))
+                self.performance_metrics['avg_poi_lifetime'] = timedelta(microseconds=avg_us)
     
     def get_active_pois(self, poi_type: Optional[POIType] = None) -> List[POI]:
         """Obtener POIs activos, opcionalmente filtrados por tipo"""
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+🗓️ SESSION CALENDAR - ICT ENGINE v6.0 Enterprise
+================================================
+
+Calendario vectorizado de sesiones, killzones y solapamientos por vela.
+
+Cada detector resolvía la sesión con comparaciones de hora en Python, vela
+por vela y con horarios distintos en cada módulo. Este calendario anota un
+frame completo de una vez (columnas categóricas session/killzone/overlap y
+el flag silver_bullet) y guarda el resultado por frame, de modo que los
+detectores sólo indexan la posición que necesitan.
+
+Horarios:
+- Definidos en la hora local de cada plaza (Europe/London, America/New_York,
+  Asia/Tokyo), así el cambio de horario (DST) se aplica solo. En verano
+  coinciden con los horarios UTC de sistema/trading_schedule.py.
+- Timestamps naive se interpretan en la zona de origen configurada (UTC por
+  defecto, o la del broker detectada por market_status_detector con
+  source_timezone='broker').
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+try:
+    from sistema.market_status_detector_v3 import MarketStatusDetector  # type: ignore
+    MARKET_STATUS_DETECTOR_AVAILABLE = True
+except ImportError:
+    MarketStatusDetector = None
+    MARKET_STATUS_DETECTOR_AVAILABLE = False
+
+# Ventanas: nombre -> (zona horaria, inicio 'HH:MM', fin 'HH:MM'), fin exclusivo.
+# El orden define la prioridad cuando dos ventanas se solapan.
+SESSIONS: Dict[str, Tuple[str, str, str]] = {
+    'LONDON': ('Europe/London', '08:00', '17:00'),       # 07:00-16:00 UTC en verano
+    'NEW_YORK': ('America/New_York', '08:00', '17:00'),  # 12:00-21:00 UTC en verano
+    'ASIA': ('Asia/Tokyo', '06:00', '15:00'),            # 21:00-06:00 UTC
+}
+
+KILLZONES: Dict[str, Tuple[str, str, str]] = {
+    'LONDON_KILLZONE': ('Europe/London', '08:00', '11:00'),
+    'NEWYORK_KILLZONE': ('America/New_York', '08:00', '11:00'),
+    'ASIAN_KILLZONE': ('Asia/Tokyo', '09:00', '12:00'),
+}
+
+OVERLAPS: Dict[str, Tuple[str, str]] = {
+    'LONDON_NY': ('LONDON', 'NEW_YORK'),
+}
+
+SILVER_BULLET_WINDOWS: List[Tuple[str, str, str]] = [
+    ('America/New_York', '03:00', '04:00'),  # London open
+    ('America/New_York', '10:00', '11:00'),  # AM session
+    ('America/New_York', '14:00', '15:00'),  # PM session
+]
+
+NO_SESSION = 'DEAD_ZONE'
+NO_KILLZONE = 'NONE'
+NO_OVERLAP = 'NONE'
+
+# Offsets de broker habituales -> zona con reglas de DST
+BROKER_TIMEZONES = {
+    0: 'UTC',
+    1: 'CET',
+    2: 'EET',   # Mayoría de brokers MT5 europeos (UTC+2 / UTC+3 en verano)
+    3: 'EET',
+}
+
+LabelSource = Union[pd.DataFrame, pd.Series, pd.Index, Sequence[Any]]
+
+
+class SessionCalendar:
+    """
+    🗓️ CALENDARIO DE SESIONES VECTORIZADO
+    =====================================
+
+    annotate(frame) devuelve un DataFrame con el mismo índice que el frame y
+    las columnas session / killzone / overlap (categóricas) y silver_bullet
+    (bool). El resultado se cachea por índice (longitud, primera y última
+    vela; LRU), así el mismo frame recargado en cada ciclo no se recalcula.
+    """
+
+    def __init__(self,
+                 source_timezone: Optional[str] = None,
+                 sessions: Optional[Dict[str, Tuple[str, str, str]]] = None,
+                 killzones: Optional[Dict[str, Tuple[str, str, str]]] = None,
+                 silver_bullet_windows: Optional[List[Tuple[str, str, str]]] = None,
+                 cache_size: int = 32):
+        """
+        Args:
+            source_timezone: Zona de los timestamps naive. None = UTC,
+                'broker' = detectada con market_status_detector
+            sessions / killzones / silver_bullet_windows: Horarios alternativos
+            cache_size: Frames anotados que se conservan
+        """
+        self.sessions = dict(sessions or SESSIONS)
+        self.killzones = dict(killzones or KILLZONES)
+        self.silver_bullet_windows = list(silver_bullet_windows or SILVER_BULLET_WINDOWS)
+        self.source_timezone = self._resolve_source_timezone(source_timezone)
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[Tuple[Any, ...], pd.DataFrame]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {'annotations': 0, 'cache_hits': 0, 'bars_annotated': 0}
+
+    # ===============================
+    # API PRINCIPAL
+    # ===============================
+
+    def annotate(self, data: LabelSource) -> pd.DataFrame:
+        """
+        🗓️ Etiquetas de sesión/killzone/overlap para todas las velas del frame
+
+        Args:
+            data: DataFrame/Series con DatetimeIndex, o un índice/lista de timestamps
+
+        Returns:
+            DataFrame alineado con el índice original
+        """
+        index = self._extract_index(data)
+        key = self._cache_key(index)
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.stats['cache_hits'] += 1
+                return cached
+
+        labels = self._compute_labels(index)
+
+        with self._lock:
+            self._cache[key] = labels
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+            self.stats['annotations'] += 1
+            self.stats['bars_annotated'] += len(index)
+        return labels
+
+    def label_at(self, data: LabelSource, position: int) -> Dict[str, Any]:
+        """📍 Etiquetas de la vela en la posición dada (usa el frame anotado en cache)"""
+        labels = self.annotate(data)
+        return {
+            'session': labels['session'].iat[position],
+            'killzone': labels['killzone'].iat[position],
+            'overlap': labels['overlap'].iat[position],
+            'silver_bullet': bool(labels['silver_bullet'].iat[position]),
+        }
+
+    def label_timestamp(self, timestamp: Any) -> Dict[str, Any]:
+        """⏰ Etiquetas de un timestamp suelto (sin pasar por el cache)"""
+        labels = self._compute_labels(pd.DatetimeIndex([pd.Timestamp(timestamp)]))
+        return {
+            'session': labels['session'].iat[0],
+            'killzone': labels['killzone'].iat[0],
+            'overlap': labels['overlap'].iat[0],
+            'silver_bullet': bool(labels['silver_bullet'].iat[0]),
+        }
+
+    def current_labels(self, now: Optional[datetime] = None) -> Dict[str, Any]:
+        """🕐 Etiquetas del momento actual (UTC)"""
+        return self.label_timestamp(now or datetime.now(timezone.utc))
+
+    def clear_cache(self) -> None:
+        """🧹 Vaciar frames anotados"""
+        with self._lock:
+            self._cache.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        """📊 Estado del calendario"""
+        with self._lock:
+            return {
+                'source_timezone': str(self.source_timezone),
+                'sessions': list(self.sessions),
+                'killzones': list(self.killzones),
+                'cached_frames': len(self._cache),
+                'stats': dict(self.stats),
+            }
+
+    # ===============================
+    # CÁLCULO VECTORIZADO
+    # ===============================
+
+    def _compute_labels(self, index: pd.DatetimeIndex) -> pd.DataFrame:
+        utc_index = self._to_utc(index)
+        minutes_by_tz: Dict[str, np.ndarray] = {}
+
+        def in_window(tz: str, start: str, end: str) -> np.ndarray:
+            if tz not in minutes_by_tz:
+                local = utc_index.tz_convert(tz)
+                minutes_by_tz[tz] = np.asarray(local.hour * 60 + local.minute)
+            minutes = minutes_by_tz[tz]
+            start_min, end_min = _to_minutes(start), _to_minutes(end)
+            if start_min < end_min:
+                return (minutes >= start_min) & (minutes < end_min)
+            return (minutes >= start_min) | (minutes < end_min)  # Cruza medianoche
+
+        session_masks = {name: in_window(*window) for name, window in self.sessions.items()}
+        killzone_masks = {name: in_window(*window) for name, window in self.killzones.items()}
+
+        silver_bullet = np.zeros(len(utc_index), dtype=bool)
+        for window in self.silver_bullet_windows:
+            silver_bullet |= in_window(*window)
+
+        overlap_masks = {
+            name: session_masks[first] & session_masks[second]
+            for name, (first, second) in OVERLAPS.items()
+            if first in session_masks and second in session_masks
+        }
+
+        return pd.DataFrame({
+            'session': _first_match(session_masks, NO_SESSION, len(utc_index)),
+            'killzone': _first_match(killzone_masks, NO_KILLZONE, len(utc_index)),
+            'overlap': _first_match(overlap_masks, NO_OVERLAP, len(utc_index)),
+            'silver_bullet': silver_bullet,
+        }, index=index)
+
+    def _to_utc(self, index: pd.DatetimeIndex) -> pd.DatetimeIndex:
+        if index.tz is None:
+            return index.tz_localize(self.source_timezone, ambiguous='NaT',
+                                     nonexistent='shift_forward').tz_convert('UTC')
+        return index.tz_convert('UTC')
+
+    @staticmethod
+    def _extract_index(data: LabelSource) -> pd.DatetimeIndex:
+        index = data.index if isinstance(data, (pd.DataFrame, pd.Series)) else data
+        if not isinstance(index, pd.DatetimeIndex):
+            index = pd.DatetimeIndex(index)
+        return index
+
+    @staticmethod
+    def _cache_key(index: pd.DatetimeIndex) -> Tuple[Any, ...]:
+        # Por contenido: cada ciclo trae un DataFrame nuevo con las mismas velas,
+        # y un id() reutilizado por otro frame no debe devolver etiquetas ajenas
+        if len(index) == 0:
+            return (0,)
+        return (len(index), index[0], index[-1])
+
+    @staticmethod
+    def _resolve_source_timezone(source_timezone: Optional[str]) -> Any:
+        """🌍 Zona de origen de timestamps naive ('broker' usa market_status_detector)"""
+        if source_timezone is None:
+            return 'UTC'
+        if source_timezone != 'broker':
+            return source_timezone
+        if not MARKET_STATUS_DETECTOR_AVAILABLE:
+            return 'UTC'
+        try:
+            broker = MarketStatusDetector().timezone_info.get('broker_timezone', '')
+            match = re.search(r'UTC([+-]\d+)', broker)
+            if not match:
+                return 'UTC'
+            offset = int(match.group(1))
+            return BROKER_TIMEZONES.get(offset, timezone(timedelta(hours=offset)))
+        except Exception:
+            return 'UTC'
+
+
+def _to_minutes(hhmm: str) -> int:
+    hour, minute = hhmm.split(':')
+    return int(hour) * 60 + int(minute)
+
+
+def _first_match(masks: Dict[str, np.ndarray], default: str, size: int) -> pd.Categorical:
+    """🏷️ Etiqueta de la primera ventana activa por vela, como categórica"""
+    names = list(masks)
+    codes = np.full(size, len(names), dtype=np.int16)
+    for code in reversed(range(len(names))):
+        codes[masks[names[code]]] = code
+    return pd.Categorical.from_codes(codes, categories=names + [default])
+
+
+_session_calendars: Dict[Optional[str], SessionCalendar] = {}
+_session_calendars_lock = threading.Lock()
+
+
+def get_session_calendar(source_timezone: Optional[str] = None) -> SessionCalendar:
+    """
+    🏭 Calendario compartido (uno por zona de origen) para todos los detectores
+
+    Args:
+        source_timezone: None para timestamps UTC; 'broker' para velas de MT5,
+            cuyo índice naive está en hora del servidor del broker
+    """
+    calendar = _session_calendars.get(source_timezone)
+    if calendar is None:
+        with _session_calendars_lock:
+            calendar = _session_calendars.get(source_timezone)
+            if calendar is None:
+                calendar = SessionCalendar(source_timezone=source_timezone)
+                _session_calendars[source_timezone] = calendar
+    return calendar
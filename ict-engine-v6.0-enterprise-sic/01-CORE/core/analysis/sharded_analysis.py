@@ -0,0 +1,342 @@
+#!/usr/bin/env python3
+"""
+🧮 SHARDED ANALYSIS - ICT ENGINE v6.0 Enterprise
+================================================
+
+Escaneo multi-símbolo repartido en procesos worker.
+
+El stack de análisis es Python puro y queda limitado por el GIL: con hilos,
+escanear más símbolos nunca usa más de un núcleo. Este módulo reparte el
+trabajo en un pool de procesos:
+
+1. Las velas de cada (símbolo, timeframe) se colocan una vez en memoria
+   compartida (SharedCandleStore); a los workers sólo viaja un FrameHandle
+2. El worker abre el bloque sin copia (attach_frame) y ejecuta las tareas
+3. Shards por (símbolo, timeframe) para tareas de un frame (estructura,
+   FVG, liquidez) y por símbolo para las que cruzan timeframes (confluencia)
+4. Cada shard devuelve registros compactos (dicts de tipos nativos), nunca
+   DataFrames ni objetos de los motores
+
+    with ShardedAnalysisPool(workers=4) as pool:
+        scan = pool.scan({'EURUSD': {'M15': df_m15, 'H1': df_h1}, ...},
+                         tasks=('structure', 'fvg', 'liquidity'))
+    scan['results']['EURUSD']['M15']['structure']['last_bos']
+
+Tareas nuevas: register_analysis_task(nombre, función, scope). La función
+debe ser de nivel de módulo (picklable) y recibe (SharedFrame, params) en
+scope 'frame' o (símbolo, {timeframe: SharedFrame}, params) en 'symbol'.
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import asdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from ..data_management.shared_candles import SharedCandleStore, SharedFrame, attach_frame, detach_all
+from .equal_levels_engine import EqualLevelsEngine
+from .fvg_kernel import BULLISH, fvg_records_to_dicts, scan_fair_value_gaps
+from .incremental_market_structure import IncrementalMarketStructureEngine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TASKS = ('structure', 'fvg', 'liquidity')
+SCOPES = ('frame', 'symbol')
+
+# nombre → (función, scope)
+_TASKS: Dict[str, Tuple[Callable[..., Any], str]] = {}
+
+
+def register_analysis_task(name: str, func: Optional[Callable[..., Any]] = None, scope: str = 'frame'):
+    """
+    📝 Registrar una tarea de análisis (usable como decorador)
+
+    Args:
+        name: Nombre con el que se pide en scan(tasks=...)
+        func: Función de nivel de módulo (los workers la importan por nombre)
+        scope: 'frame' = un shard por (símbolo, timeframe); 'symbol' = uno por símbolo
+    """
+    if scope not in SCOPES:
+        raise ValueError(f"scope inválido: {scope} (usar {SCOPES})")
+
+    def _register(task: Callable[..., Any]) -> Callable[..., Any]:
+        _TASKS[name] = (task, scope)
+        return task
+
+    return _register(func) if func is not None else _register
+
+
+def get_analysis_tasks() -> Dict[str, str]:
+    """📋 Tareas registradas → scope"""
+    return {name: scope for name, (_, scope) in _TASKS.items()}
+
+
+# ===============================
+# TAREAS INCLUIDAS
+# ===============================
+
+@register_analysis_task('structure')
+def _structure_task(frame: SharedFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Swings/BOS/CHoCH con el motor incremental (replay completo del frame)"""
+    symbol, timeframe = frame.handle.symbol, frame.handle.timeframe
+    engine = IncrementalMarketStructureEngine(window=params.get('structure_window', 5))
+    engine._ensure_swing_capacity(engine.get_state(symbol, timeframe), len(frame))  # Como replay(): sin recortar swings
+    index = pd.DatetimeIndex(frame.time.view('datetime64[ns]'))
+    high, low, close = frame['high'], frame['low'], frame['close']
+
+    events = []
+    for i in range(len(frame)):
+        events.extend(engine.process_bar(symbol, timeframe, index[i], high[i], low[i], close[i]))
+
+    summary = engine.get_structure(symbol, timeframe)
+    summary['events'] = len(events)
+    summary['recent_events'] = [asdict(event) for event in events[-params.get('max_records', 5):]]
+    return summary
+
+
+@register_analysis_task('fvg')
+def _fvg_task(frame: SharedFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Fair Value Gaps con el kernel vectorizado (sólo los no rellenados viajan de vuelta)"""
+    records = scan_fair_value_gaps(frame['high'], frame['low'], frame['open'], frame['close'],
+                                   min_size=params.get('fvg_min_size', 0.0))
+    unfilled = records[records['fill_index'] < 0]
+    return {
+        'total': len(records),
+        'bullish': int(np.count_nonzero(records['direction'] == BULLISH)),
+        'bearish': int(np.count_nonzero(records['direction'] != BULLISH)),
+        'unfilled': len(unfilled),
+        'recent_unfilled': fvg_records_to_dicts(unfilled[-params.get('max_records', 5):]),
+    }
+
+
+@register_analysis_task('liquidity')
+def _liquidity_task(frame: SharedFrame, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Equal Highs / Equal Lows (pools de liquidez)"""
+    engine = EqualLevelsEngine(tolerance=params.get('equal_tolerance', 0.0005),
+                               max_bar_distance=params.get('equal_max_bar_distance', 20))
+    highs = engine.find_equal_highs(frame['high'])
+    lows = engine.find_equal_lows(frame['low'])
+    limit = params.get('max_records', 5)
+
+    def _compact(pools):
+        return [{key: value for key, value in pool.to_dict().items() if key != 'indices'} for pool in pools[-limit:]]
+
+    return {
+        'equal_highs': len(highs),
+        'equal_lows': len(lows),
+        'recent_highs': _compact(highs),
+        'recent_lows': _compact(lows),
+    }
+
+
+_confluence_engine = None  # Uno por proceso worker (se construye en el primer shard)
+
+
+@register_analysis_task('confluence', scope='symbol')
+def _confluence_task(symbol: str, frames: Dict[str, SharedFrame], params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Confluencia multi-patrón H4/H1/M15/M5 del símbolo"""
+    global _confluence_engine
+    if _confluence_engine is None:
+        from ..ict_engine.advanced_patterns.multi_pattern_confluence_engine import MultiPatternConfluenceEngine
+        _confluence_engine = MultiPatternConfluenceEngine()
+    _confluence_engine.config.update(params.get('confluence_config', {}))
+    _confluence_engine.confluence_weights.update(params.get('confluence_weights', {}))
+
+    data = {tf: frames[tf].to_dataframe() if tf in frames else pd.DataFrame() for tf in ('H4', 'H1', 'M15', 'M5')}
+    current_price = params.get('current_prices', {}).get(symbol)
+    if current_price is None:
+        entry = next((data[tf] for tf in ('M5', 'M15', 'H1', 'H4') if len(data[tf])), None)
+        if entry is None:
+            return []
+        current_price = float(entry['close'].iloc[-1])
+
+    signals = _confluence_engine.analyze_confluence_enterprise(
+        data['H4'], data['H1'], data['M15'], data['M5'], symbol, current_price) or []
+    return [confluence_signal_record(signal) for signal in signals[:params.get('max_records', 5)]]
+
+
+def confluence_signal_record(signal: Any) -> Dict[str, Any]:
+    """📋 ConfluenceTradeSignal → dict compacto"""
+    def _value(item: Any) -> Any:
+        return getattr(item, 'value', item)
+
+    return {
+        'signal_id': signal.signal_id,
+        'symbol': signal.symbol,
+        'direction': _value(signal.direction),
+        'signal_quality': _value(signal.signal_quality),
+        'confluence_level': _value(signal.confluence_level),
+        'entry_price': signal.entry_price,
+        'stop_loss': signal.stop_loss,
+        'take_profit_1': signal.take_profit_1,
+        'take_profit_2': signal.take_profit_2,
+        'risk_reward_ratio': signal.risk_reward_ratio,
+        'confluence_score': signal.confluence_score,
+        'confidence_score': signal.confidence_score,
+        'timestamp': signal.timestamp,
+    }
+
+
+# ===============================
+# LADO WORKER
+# ===============================
+
+# (scope, ((nombre, función), ...), símbolo, {timeframe: FrameHandle}, params).
+# La función viaja por referencia: el worker importa su módulo aunque la
+# tarea se haya registrado después de arrancar el pool
+ShardJob = Tuple[str, Tuple[Tuple[str, Callable[..., Any]], ...], str, Dict[str, Any], Dict[str, Any]]
+
+
+def _run_shard(job: ShardJob) -> Tuple[str, Optional[str], Dict[str, Any], Dict[str, str]]:
+    """Ejecuta las tareas de un shard; los errores se devuelven por tarea"""
+    scope, tasks, symbol, handles, params = job
+    frames = {tf: attach_frame(handle) for tf, handle in handles.items()}
+    timeframe = next(iter(frames)) if scope == 'frame' else None
+
+    results: Dict[str, Any] = {}
+    errors: Dict[str, str] = {}
+    for name, func in tasks:
+        try:
+            if scope == 'frame':
+                results[name] = func(frames[timeframe], params)
+            else:
+                results[name] = func(symbol, frames, params)
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+    return symbol, timeframe, results, errors
+
+
+# ===============================
+# POOL
+# ===============================
+
+class ShardedAnalysisPool:
+    """
+    🧮 Pool de procesos para el escaneo multi-símbolo
+
+    Args:
+        workers: Procesos worker (None = núcleos disponibles, 0 = en el proceso actual)
+        start_method: Método de arranque de multiprocessing ('spawn' por defecto:
+                      el motor tiene hilos vivos y fork no es seguro con ellos)
+    """
+
+    def __init__(self, workers: Optional[int] = None, start_method: Optional[str] = 'spawn'):
+        self.workers = max(0, os.cpu_count() or 1) if workers is None else max(0, workers)
+        self.start_method = start_method
+        self.store = SharedCandleStore()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.stats = {'scans': 0, 'shards': 0, 'task_errors': 0, 'pool_failures': 0, 'last_elapsed': 0.0}
+
+    def __enter__(self) -> 'ShardedAnalysisPool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            context = multiprocessing.get_context(self.start_method) if self.start_method else None
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+        return self._executor
+
+    def scan(self,
+             frames: Dict[str, Dict[str, pd.DataFrame]],
+             tasks: Iterable[str] = DEFAULT_TASKS,
+             params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        🔍 Escanear {símbolo: {timeframe: DataFrame OHLCV}}
+
+        Args:
+            frames: Velas por símbolo y timeframe (índice de tiempo)
+            tasks: Tareas registradas a ejecutar
+            params: Parámetros para las tareas (structure_window, fvg_min_size,
+                    equal_tolerance, equal_max_bar_distance, max_records,
+                    current_prices, confluence_config, confluence_weights)
+
+        Returns:
+            Dict con 'results' {símbolo: {timeframe: {tarea: registro}}},
+            'symbol_results' {símbolo: {tarea: registro}}, 'errors', 'elapsed',
+            'shards' y 'workers'
+        """
+        tasks = tuple(tasks)
+        unknown = [name for name in tasks if name not in _TASKS]
+        if unknown:
+            raise ValueError(f"Tareas no registradas: {unknown}")
+        frame_tasks = tuple((name, _TASKS[name][0]) for name in tasks if _TASKS[name][1] == 'frame')
+        symbol_tasks = tuple((name, _TASKS[name][0]) for name in tasks if _TASKS[name][1] == 'symbol')
+        params = dict(params or {})
+
+        start = time.perf_counter()
+        self.store.put_many(frames)
+        jobs: List[ShardJob] = []
+        for symbol, by_tf in frames.items():
+            handles = {tf: self.store.handle(symbol, tf) for tf, candles in by_tf.items()
+                       if candles is not None and len(candles)}
+            if frame_tasks:
+                jobs.extend(('frame', frame_tasks, symbol, {tf: handle}, params) for tf, handle in handles.items())
+            if symbol_tasks and handles:
+                jobs.append(('symbol', symbol_tasks, symbol, handles, params))
+
+        outputs = self._execute(jobs)
+
+        scan: Dict[str, Any] = {'results': {}, 'symbol_results': {}, 'errors': []}
+        for symbol, timeframe, results, errors in outputs:
+            if timeframe is None:
+                scan['symbol_results'][symbol] = results
+            else:
+                scan['results'].setdefault(symbol, {})[timeframe] = results
+            scan['errors'].extend({'symbol': symbol, 'timeframe': timeframe, 'task': name, 'error': error}
+                                  for name, error in errors.items())
+
+        elapsed = time.perf_counter() - start
+        self.stats['scans'] += 1
+        self.stats['shards'] += len(jobs)
+        self.stats['task_errors'] += len(scan['errors'])
+        self.stats['last_elapsed'] = elapsed
+        scan.update({'elapsed': elapsed, 'shards': len(jobs), 'workers': self.workers})
+        return scan
+
+    def _execute(self, jobs: List[ShardJob]) -> List[Tuple[str, Optional[str], Dict[str, Any], Dict[str, str]]]:
+        if self.workers > 0 and len(jobs) > 1:
+            try:
+                return list(self._get_executor().map(_run_shard, jobs))
+            except (BrokenProcessPool, OSError) as e:
+                # Pool roto (worker muerto, sin recursos): se descarta y el escaneo sigue en este proceso
+                logger.warning("Pool de análisis no disponible, ejecutando en el proceso actual: %s", e)
+                self.stats['pool_failures'] += 1
+                self._shutdown_executor()
+        try:
+            return [_run_shard(job) for job in jobs]
+        finally:
+            detach_all()
+
+    def _shutdown_executor(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def close(self) -> None:
+        """Detiene los workers y libera la memoria compartida"""
+        self._shutdown_executor()
+        self.store.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'workers': self.workers,
+            'start_method': self.start_method,
+            'running': self._executor is not None,
+            'frames': len(self.store),
+            'shared_bytes': self.store.nbytes,
+            'tasks': get_analysis_tasks(),
+            **self.stats,
+        }
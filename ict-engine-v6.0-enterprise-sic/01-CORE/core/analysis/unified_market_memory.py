@@ -30,6 +30,7 @@ from pathlib import Path
 from core.analysis.market_context_v6 import MarketContextV6
 from core.analysis.ict_historical_analyzer_v6 import ICTHistoricalAnalyzerV6
 from core.smart_trading_logger import SmartTradingLogger, TradingDecisionCacheV6
+from utils.memory_wal import MemoryWAL, open_wal
 
 class UnifiedMarketMemory:
     """
@@ -403,24 +404,31 @@ class MemoryCoherenceValidator:
         return 0.85  # Placeholder
 
 class MemoryPersistenceManager:
-    """Gestor de persistencia para memoria unificada."""
+    """Gestor de persistencia para memoria unificada (logs de mutaciones por componente)."""
     
     def __init__(self, unified_memory):
         self.unified_memory = unified_memory
         self.persistence_dir = Path("cache/memory/unified")
         self.persistence_dir.mkdir(parents=True, exist_ok=True)
+        self._wal: Optional[MemoryWAL] = None
     
-    def persist_complete_state(self) -> bool:
-        """Persiste estado completo."""
+    def _state_wal(self) -> MemoryWAL:
+        if self._wal is None:
+            self._wal = open_wal(str(self.persistence_dir), 'unified_state')
+        return self._wal
+    
+    def persist_complete_state(self, wait: bool = False) -> bool:
+        """Persiste estado completo (solo lo cambiado desde el último guardado; escribe el flusher)."""
         try:
             # Persistir cada componente
-            self.unified_memory.market_context.persist_memory_state()
-            self.unified_memory.historical_analyzer.export_memory_cache()
+            self.unified_memory.market_context.persist_memory_state(wait=wait)
+            self.unified_memory.historical_analyzer.export_memory_cache(wait=wait)
             
             # Persistir estado unificado
-            unified_state_file = self.persistence_dir / 'unified_state.json'
-            with open(unified_state_file, 'w', encoding='utf-8') as f:
-                json.dump(self.unified_memory.unified_state, f, indent=2, default=str)
+            wal = self._state_wal()
+            wal.update(self.unified_memory.unified_state)
+            if wait:
+                wal.flush()
             
             return True
         except Exception as e:
@@ -434,14 +442,15 @@ class MemoryPersistenceManager:
             self.unified_memory.market_context.restore_memory_state()
             self.unified_memory.historical_analyzer.import_memory_cache()
             
-            # Restaurar estado unificado
+            # Restaurar estado unificado (log binario o JSON heredado)
+            restored_state = self._state_wal().to_dict()
             unified_state_file = self.persistence_dir / 'unified_state.json'
-            if unified_state_file.exists():
+            if not restored_state and unified_state_file.exists():
                 with open(unified_state_file, 'r', encoding='utf-8') as f:
                     restored_state = json.load(f)
-                
-                # Actualizar estado con datos restaurados
-                self.unified_memory.unified_state.update(restored_state)
+            
+            # Actualizar estado con datos restaurados
+            self.unified_memory.unified_state.update(restored_state)
             
             return True
         except Exception as e:
@@ -20,6 +20,7 @@ Estado: FASE 2 - MEMORIA UNIFICADA
 
 import json
 import os
+import threading
 import numpy as np
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional, List, Union, Tuple
@@ -30,6 +31,8 @@ import statistics
 # ✅ REGLA #4: SIC v3.1 + SLUC v2.1 obligatorio
 # SICBridge existe pero no es necesario aquí - usamos componentes directos
 from core.smart_trading_logger import log_trading_decision_smart_v6, get_trading_decision_cache
+from utils.lazy_loading import component_status, lazy_component
+from utils.memory_wal import MemoryWAL, open_wal
 
 # ✅ REGLA #1: Usar componentes REALES del sistema
 try:
@@ -83,32 +86,9 @@ class UnifiedMemorySystem:
         self.config_path = config_path
         self.memory_config = self._load_memory_config()
         
-        # ✅ REGLA #1: Usar componentes REALES existentes
-        try:
-            # Intentar usar UnifiedMarketMemory real
-            self.unified_memory = get_unified_market_memory()
-            
-            if self.unified_memory is not None:
-                # Usar componentes del sistema unificado existente
-                self.market_context = getattr(self.unified_memory, 'current_market_context', None) or MarketContextV6()
-                self.historical_analyzer = getattr(self.unified_memory, 'historical_analyzer', None) or ICTHistoricalAnalyzerV6()
-                self.decision_cache = get_trading_decision_cache() or TradingDecisionCacheV6()
-            else:
-                # Crear componentes reales individuales
-                self.market_context = MarketContextV6(memory_config_path=self.config_path)
-                self.historical_analyzer = ICTHistoricalAnalyzerV6()
-                self.decision_cache = get_trading_decision_cache() or TradingDecisionCacheV6()
-                
-        except Exception as e:
-            log_trading_decision_smart_v6("UNIFIED_MEMORY_COMPONENT_ERROR", {
-                "error": str(e),
-                "fallback": "creating_minimal_components"
-            })
-            # Crear componentes mínimos funcionales
-            self.market_context = self._create_minimal_market_context()
-            self.historical_analyzer = self._create_minimal_historical_analyzer()
-            self.decision_cache = self._create_minimal_decision_cache()
-            self.unified_memory = None
+        # ✅ REGLA #1: Componentes REALES, construidos en el primer acceso
+        # (unified_memory, market_context, historical_analyzer, decision_cache)
+        self._memory_components_lock = threading.RLock()
         
         # === NUEVOS COMPONENTES FASE 2 ===
         self.persistence_manager = MemoryPersistenceManager(self)
@@ -116,15 +96,14 @@ class UnifiedMemorySystem:
         self.confidence_evaluator = TraderConfidenceEvaluator(self)
         
         # === ESTADO DEL SISTEMA DINÁMICO ===
-        self.system_state = {
+        # memory_quality y components_status se calculan al leer system_state
+        self._system_state = {
             'initialization_time': datetime.now(timezone.utc),
             'version': 'v6.1.0-enterprise',
             'phase': 'FASE_2_REAL_IMPLEMENTATION',
-            'memory_quality': self._assess_memory_quality(),
             'trader_experience_level': self._calculate_real_experience_level(),
             'active_sessions': self._get_active_sessions_count(),
             'learning_enabled': self.memory_config.get('learning_enabled', True),
-            'components_status': self._get_components_health_status()
         }
         
         # === FINALIZACIÓN INICIALIZACIÓN ===
@@ -133,14 +112,97 @@ class UnifiedMemorySystem:
         log_trading_decision_smart_v6("UNIFIED_MEMORY_INIT_SUCCESS", {
             "system_ready": True,
             "components_loaded": self._count_loaded_components(),
+            "components_deferred": [name for name, status in component_status(self).items() if status == 'lazy'],
             "version": self.system_state['version'],
             "phase": self.system_state['phase']
         })
     
+    MEMORY_COMPONENTS = ('unified_memory', 'market_context', 'historical_analyzer', 'decision_cache')
+
+    @property
+    def system_state(self) -> Dict[str, Any]:
+        """Estado del sistema con calidad y salud de componentes al momento de la lectura"""
+        state = self._system_state
+        state['components_status'] = self._get_components_health_status()
+        state['memory_quality'] = self._assess_memory_quality()
+        return state
+
+    def _ensure_memory_components(self) -> Dict[str, Any]:
+        """
+        Construye los componentes de memoria (una sola vez, juntos)
+
+        Se invoca desde el primer acceso a cualquiera de ellos: market_context y
+        historical_analyzer salen de unified_memory cuando existe, por eso se
+        construyen en bloque y no uno por uno.
+        """
+        with self._memory_components_lock:
+            return self._build_memory_components()
+
+    def _build_memory_components(self) -> Dict[str, Any]:
+        """Construcción de _ensure_memory_components (con el lock de la instancia)"""
+        if all(name in self.__dict__ for name in self.MEMORY_COMPONENTS):
+            return {name: self.__dict__[name] for name in self.MEMORY_COMPONENTS}
+        
+        try:
+            # Intentar usar UnifiedMarketMemory real
+            unified_memory = get_unified_market_memory()
+            
+            if unified_memory is not None:
+                # Usar componentes del sistema unificado existente
+                market_context = getattr(unified_memory, 'market_context', None) or MarketContextV6()
+                historical_analyzer = getattr(unified_memory, 'historical_analyzer', None) or ICTHistoricalAnalyzerV6()
+            else:
+                # Crear componentes reales individuales
+                market_context = MarketContextV6(memory_config_path=self.config_path)
+                historical_analyzer = ICTHistoricalAnalyzerV6()
+            decision_cache = get_trading_decision_cache() or TradingDecisionCacheV6()
+                
+        except Exception as e:
+            log_trading_decision_smart_v6("UNIFIED_MEMORY_COMPONENT_ERROR", {
+                "error": str(e),
+                "fallback": "creating_minimal_components"
+            })
+            # Crear componentes mínimos funcionales
+            market_context = self._create_minimal_market_context()
+            historical_analyzer = self._create_minimal_historical_analyzer()
+            decision_cache = self._create_minimal_decision_cache()
+            unified_memory = None
+        
+        built = {
+            'unified_memory': unified_memory,
+            'market_context': market_context,
+            'historical_analyzer': historical_analyzer,
+            'decision_cache': decision_cache
+        }
+        for name, component in built.items():
+            self.__dict__.setdefault(name, component)  # Respetar asignaciones previas
+        return {name: self.__dict__[name] for name in self.MEMORY_COMPONENTS}
+    
+    @lazy_component
+    def unified_memory(self):
+        """UnifiedMarketMemory real (None en modo mínimo)"""
+        return self._ensure_memory_components()['unified_memory']
+    
+    @lazy_component
+    def market_context(self):
+        """Contexto de mercado v6"""
+        return self._ensure_memory_components()['market_context']
+    
+    @lazy_component
+    def historical_analyzer(self):
+        """Analizador histórico ICT v6"""
+        return self._ensure_memory_components()['historical_analyzer']
+    
+    @lazy_component
+    def decision_cache(self):
+        """Cache de decisiones de trading"""
+        return self._ensure_memory_components()['decision_cache']
+    
     def _count_loaded_components(self) -> int:
-        """Cuenta componentes cargados exitosamente"""
-        components = [self.market_context, self.historical_analyzer, self.decision_cache]
-        return sum(1 for comp in components if comp is not None)
+        """Cuenta componentes cargados exitosamente (los diferidos no se fuerzan)"""
+        status = component_status(self)
+        names = ('market_context', 'historical_analyzer', 'decision_cache')
+        return sum(1 for name in names if status[name] == 'built' and self.__dict__[name] is not None)
     
     def _assess_memory_quality(self) -> str:
         """Evalúa calidad de memoria del sistema"""
@@ -177,12 +239,19 @@ class UnifiedMemorySystem:
             return 0
     
     def _get_components_health_status(self) -> Dict[str, str]:
-        """Estado de salud de componentes"""
+        """Estado de salud de componentes ('lazy' = aún no construido)"""
+        built = component_status(self)
+
+        def status(name: str, missing: str) -> str:
+            if built[name] == 'lazy':
+                return 'lazy'
+            return 'healthy' if self.__dict__[name] else missing
+        
         return {
-            'market_context': 'healthy' if self.market_context else 'unavailable',
-            'historical_analyzer': 'healthy' if self.historical_analyzer else 'unavailable', 
-            'decision_cache': 'healthy' if self.decision_cache else 'unavailable',
-            'unified_memory': 'healthy' if self.unified_memory else 'fallback'
+            'market_context': status('market_context', 'unavailable'),
+            'historical_analyzer': status('historical_analyzer', 'unavailable'),
+            'decision_cache': status('decision_cache', 'unavailable'),
+            'unified_memory': status('unified_memory', 'fallback')
         }
     
     def _create_minimal_market_context(self):
@@ -241,9 +310,6 @@ class UnifiedMemorySystem:
                 if 'trader_experience_level' in persistent_data:
                     self.system_state['trader_experience_level'] = persistent_data['trader_experience_level']
                     
-                if 'memory_quality' in persistent_data:
-                    self.system_state['memory_quality'] = persistent_data['memory_quality']
-                    
                 log_trading_decision_smart_v6("MEMORY_RESTORED", {
                     "source": str(memory_file),
                     "restored_keys": list(persistent_data.keys())
@@ -256,16 +322,10 @@ class UnifiedMemorySystem:
     
     def _finalize_initialization(self):
         """Finaliza la inicialización del sistema"""
-        # Actualizar calidad de memoria después de cargar componentes
-        self.system_state['memory_quality'] = self._assess_memory_quality()
-        
         # Crear directorio de memoria si no existe
         memory_dir = Path("cache/memory/unified")
         memory_dir.mkdir(parents=True, exist_ok=True)
         
-        # Sistema listo
-        self.system_state['memory_quality'] = 'TRADER_READY'
-        
         log_trading_decision_smart_v6("UNIFIED_MEMORY_INIT_SUCCESS", {
             "component": "UnifiedMemorySystem",
             "status": "TRADER_READY",
@@ -627,15 +687,24 @@ class MemoryPersistenceManager:
         self.unified_system = unified_system
         self.persistence_dir = Path("data/memory_persistence")
         self.persistence_dir.mkdir(parents=True, exist_ok=True)
+        self._wal: Optional[MemoryWAL] = None
+    
+    def _context_wal(self) -> MemoryWAL:
+        """Log de mutaciones con el contexto de cada símbolo"""
+        if self._wal is None:
+            self._wal = open_wal(str(self.persistence_dir), 'trader_context')
+        return self._wal
     
     def load_persistent_context(self, symbol: str) -> bool:
         """Carga contexto persistente"""
         context_file = self.persistence_dir / f"{symbol}_context.json"
         
-        if context_file.exists():
+        if f"context.{symbol}" in self._context_wal() or context_file.exists():
             try:
-                with open(context_file, 'r', encoding='utf-8') as f:
-                    context = json.load(f)
+                context = self._context_wal().get(f"context.{symbol}")
+                if context is None:  # Formato JSON de versiones anteriores
+                    with open(context_file, 'r', encoding='utf-8') as f:
+                        context = json.load(f)
                 
                 log_trading_decision_smart_v6("PERSISTENCE_LOAD_SUCCESS", {
                     "symbol": symbol,
@@ -663,9 +732,7 @@ class MemoryPersistenceManager:
                 'memory_state': 'SAVED'
             }
             
-            context_file = self.persistence_dir / f"{symbol}_context.json"
-            with open(context_file, 'w', encoding='utf-8') as f:
-                json.dump(context, f, indent=2, ensure_ascii=False)
+            self._context_wal().set(f"context.{symbol}", context)
             
             return True
             
@@ -12,6 +12,9 @@ Componentes:
 - CandleCoordinator: Coordinación de descargas
 - DataProcessor: Procesamiento avanzado de datos
 - CacheManager: Gestión de cache predictivo
+- KillzonePrefetcher: Prefetch de velas antes de las killzones del calendario de sesiones
+- TimeframeAggregator: Temporalidades superiores derivadas de una serie M1/M5
+- SharedCandleStore: Velas en memoria compartida para workers de análisis
 
 Autor: ICT Engine v6.1.0 Enterprise Team
 Versión: v6.1.0-enterprise
@@ -36,9 +39,39 @@ except ImportError as e:
     _ADVANCED_CANDLE_DOWNLOADER_AVAILABLE = False
     _IMPORT_ERROR = str(e)
 
+try:
+    from .killzone_prefetcher import (
+        KillzonePrefetcher, calendar_killzones, get_killzone_prefetcher, killzone_utc_window
+    )
+    _KILLZONE_PREFETCHER_AVAILABLE = True
+except ImportError:
+    _KILLZONE_PREFETCHER_AVAILABLE = False
+
+try:
+    from .timeframe_aggregator import IncrementalTimeframeBuilder, aggregate_ohlcv, compare_with_broker
+    _TIMEFRAME_AGGREGATOR_AVAILABLE = True
+except ImportError:
+    _TIMEFRAME_AGGREGATOR_AVAILABLE = False
+
+try:
+    from .shared_candles import SharedCandleStore, FrameHandle, attach_frame
+    _SHARED_CANDLES_AVAILABLE = True
+except ImportError:
+    _SHARED_CANDLES_AVAILABLE = False
+
 # Exports principales
 __all__ = [
     'AdvancedCandleDownloader',
+    'KillzonePrefetcher',
+    'calendar_killzones',
+    'get_killzone_prefetcher',
+    'killzone_utc_window',
+    'IncrementalTimeframeBuilder',
+    'aggregate_ohlcv',
+    'compare_with_broker',
+    'SharedCandleStore',
+    'FrameHandle',
+    'attach_frame',
     'get_advanced_candle_downloader', 
     'create_download_request',
     'DownloadStats',
@@ -52,7 +85,10 @@ MODULE_INFO = {
     'version': __version__,
     'description': 'Advanced data management with SIC v3.1 integration',
     'components': {
-        'advanced_candle_downloader': _ADVANCED_CANDLE_DOWNLOADER_AVAILABLE
+        'advanced_candle_downloader': _ADVANCED_CANDLE_DOWNLOADER_AVAILABLE,
+        'killzone_prefetcher': _KILLZONE_PREFETCHER_AVAILABLE,
+        'timeframe_aggregator': _TIMEFRAME_AGGREGATOR_AVAILABLE,
+        'shared_candles': _SHARED_CANDLES_AVAILABLE
     },
     'sic_integration': 'v3.1'
 }
@@ -102,6 +102,23 @@ except ImportError:
     PSUTIL_AVAILABLE = False
     psutil = None
 
+try:
+    from core.data_management.killzone_prefetcher import KillzonePrefetcher, get_killzone_prefetcher
+    KILLZONE_PREFETCHER_AVAILABLE = True
+except ImportError:
+    KILLZONE_PREFETCHER_AVAILABLE = False
+    KillzonePrefetcher = None
+    get_killzone_prefetcher = None
+
+try:
+    from core.data_management.timeframe_aggregator import (
+        IncrementalTimeframeBuilder, TIMEFRAME_MINUTES, can_derive, select_base_timeframe
+    )
+    TIMEFRAME_AGGREGATOR_AVAILABLE = True
+except ImportError:
+    TIMEFRAME_AGGREGATOR_AVAILABLE = False
+    IncrementalTimeframeBuilder = None
+
 # Imports SIC v3.1 Enterprise (usando try/except para compatibilidad)
 try:
     from sistema.sic_v3_1.enterprise_interface import SICv31Enterprise
@@ -481,6 +498,10 @@ class AdvancedCandleDownloader:
         self._cache_stats = {'hits': 0, 'misses': 0, 'saves': 0}
         self._memory_cache = {}  # Cache en memoria como fallback
         self._performance_metrics = []
+        self._prefetcher = None  # KillzonePrefetcher compartido del proceso (cache predictivo)
+        self._timeframe_builders: Dict[Tuple[str, str], Any] = {}  # Serie base por (símbolo, base)
+        self._timeframe_set_lock = threading.RLock()  # Analizador y loop de prefetch sobre la misma serie base
+        self.max_base_bars = self._config.get('max_base_bars', 300000)
 
         # Componentes del sistema (lazy loading)
         self._mt5_manager = None
@@ -783,7 +804,8 @@ class AdvancedCandleDownloader:
                         end_date: Optional[datetime] = None,
                         save_to_file: Optional[bool] = None,
                         bars_count: Optional[int] = None,
-                        use_ict_optimal: bool = True) -> Dict[str, Any]:
+                        use_ict_optimal: bool = True,
+                        use_cache: bool = True) -> Dict[str, Any]:
         """
         📥 Descarga velas OPTIMIZADA según LEYES ICT v6.0 con STORAGE INTELIGENTE
         
@@ -795,11 +817,26 @@ class AdvancedCandleDownloader:
             save_to_file: Si guardar en archivo (None = usar configuración automática)
             bars_count: Cantidad específica de velas (override ICT optimal)
             use_ict_optimal: Si usar configuración ICT óptima automática
+            use_cache: Servir desde el cache predictivo si hay un frame fresco
+                       (sólo peticiones por defecto: sin fechas ni bars_count)
             
         Returns:
             Dict con resultado de la descarga ICT-compliant
         """
         try:
+            # El cache guarda el frame ICT óptimo por (símbolo, timeframe): un rango
+            # o un número de velas explícito no se sirve ni se guarda en él
+            cacheable = (start_date is None and end_date is None
+                         and bars_count is None and use_ict_optimal)
+            
+            # 🔮 CACHE PREDICTIVO: frame precalentado antes de la killzone
+            if use_cache and cacheable and self._prefetcher is not None:
+                warm_result = self._prefetcher.get_warm_result(symbol, timeframe)
+                if warm_result is not None:
+                    self._cache_stats['hits'] += 1
+                    return warm_result
+                self._cache_stats['misses'] += 1
+            
             # 🗄️ DETERMINAR ESTRATEGIA DE ALMACENAMIENTO INTELIGENTE
             if save_to_file is None:
                 save_to_file = self._should_save_to_file(timeframe, symbol)
@@ -878,6 +915,10 @@ class AdvancedCandleDownloader:
             if result['success'] and use_ict_optimal:
                 result = self._validate_ict_compliance(result, timeframe, bars_count)
             
+            if result['success'] and cacheable and self._prefetcher is not None:
+                self._prefetcher.store(symbol, timeframe, result)
+                self._cache_stats['saves'] += 1
+            
             return result
                 
         except Exception as e:
@@ -944,7 +985,8 @@ class AdvancedCandleDownloader:
             # Fallback ENTERPRISE: guardar siempre
             return True
 
-    def _download_with_mt5(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime, save_to_file: bool) -> Dict[str, Any]:
+    def _download_with_mt5(self, symbol: str, timeframe: str, start_date: datetime, end_date: datetime, save_to_file: bool,
+                           bars: Optional[int] = None) -> Dict[str, Any]:
         """📡 Descarga usando MT5 DIRECTO con manejo ROBUSTO de timeframes"""
         try:
             self._log_info(f"📡 Descarga directa MT5: {symbol} {timeframe}")
@@ -986,6 +1028,8 @@ class AdvancedCandleDownloader:
                 count = 3000                       # 🔥 CORREGIDO: 3000 H4 (antes 540) 
             else:  # D1
                 count = 2000                       # 2000 D1 para análisis de largo plazo
+            if bars:
+                count = int(bars)                  # Serie base o tramo incremental
             
             self._log_info(f"📊 ICT TARGET: {count} velas para análisis institucional completo")
             
@@ -1344,28 +1388,26 @@ class AdvancedCandleDownloader:
                 self._log_error(f"Error en fallback lazy loading: {fallback_error}")
 
     def _setup_predictive_cache(self):
-        """🔮 Configura cache predictivo"""
+        """🔮 Configura cache predictivo (prefetch antes de killzones)"""
         try:
+            if KILLZONE_PREFETCHER_AVAILABLE:
+                # Un prefetcher por proceso: los requisitos llegan de los analizadores
+                # al pedir sus frames (get_timeframe_set con consumer)
+                self._prefetcher = get_killzone_prefetcher(
+                    lead_minutes=self._config.get('prefetch_lead_minutes', 10)
+                )
+            
             cache_manager = sic.get_predictive_cache_manager()
             
-            if cache_manager is not None:
-                # Pre-cachear configuraciones comunes
-                common_configs = [
-                    {'symbols': ['EURUSD', 'GBPUSD'], 'timeframes': ['M1', 'M5']},
-                    {'symbols': ['XAUUSD'], 'timeframes': ['M15', 'H1']},
-                ]
-                
-                for config in common_configs:
-                    cache_key = f"download_config_{hash(str(config))}"
-                    # Usar cache_module en lugar de predict_and_cache
-                    cache_manager.cache_module(cache_key, module_obj=config)
-                
-                self._log_info("Cache predictivo configurado")
-            else:
-                # Fallback: cache simple en memoria
-                self._cache_stats = {'hits': 0, 'misses': 0, 'saves': 0}
-                self._memory_cache = {}
-                self._log_info("Cache predictivo fallback: cache en memoria configurado")
+            if cache_manager is not None and self._prefetcher is not None:
+                # Publicar los targets del prefetcher en el cache SIC
+                targets = self._prefetcher.get_prefetch_targets()
+                cache_manager.cache_module("download_config_killzone_targets", module_obj=targets)
+            
+            self._cache_stats = {'hits': 0, 'misses': 0, 'saves': 0}
+            self._memory_cache = {}
+            self._log_info(f"Cache predictivo configurado (killzone prefetch: "
+                          f"{'ON' if self._prefetcher else 'OFF'})")
             
         except Exception as e:
             self._log_error(f"Error configurando cache predictivo: {e}")
@@ -1374,6 +1416,24 @@ class AdvancedCandleDownloader:
             self._memory_cache = {}
             self._log_info("Cache predictivo emergency fallback: cache básico")
 
+    def get_killzone_prefetcher(self):
+        """🔮 Obtiene el prefetcher de killzones (None si está desactivado)"""
+        return self._prefetcher
+
+    def start_killzone_prefetch(self, interval_seconds: float = 30.0) -> bool:
+        """▶️ Arranca el prefetch compartido en background (lo hace el launcher al arrancar)"""
+        if self._prefetcher is None:
+            self._log_warning("Killzone prefetch no disponible")
+            return False
+        self._prefetcher.start(interval_seconds)
+        self._log_info(f"Killzone prefetch activo (intervalo {interval_seconds:.0f}s)")
+        return True
+
+    def stop_killzone_prefetch(self) -> None:
+        """⏹️ Detiene el prefetch en background"""
+        if self._prefetcher is not None:
+            self._prefetcher.stop()
+
     def initialize(self) -> bool:
         """🚀 Inicializa el downloader y sus componentes con SIC v3.1"""
         start_time = time.time()
@@ -1529,24 +1589,6 @@ class AdvancedCandleDownloader:
             return False
 
         try:
-            # Verificar cache predictivo
-            if use_cache and self._use_predictive_cache:
-                cache_key = f"batch_{hash(str(symbols + timeframes))}"
-                
-                # Verificar si el cache manager está disponible
-                cache_manager = sic.get_predictive_cache_manager()
-                if cache_manager and hasattr(cache_manager, 'get_cached_prediction'):
-                    cached_result = cache_manager.get_cached_prediction(cache_key)
-                    if cached_result:
-                        self._cache_stats['hits'] += 1
-                        self._log_info(f"Cache hit para configuración: {cache_key}")
-                else:
-                    # Fallback: usar cache en memoria
-                    cached_result = self._memory_cache.get(cache_key) if hasattr(self, '_memory_cache') else None
-                    if cached_result:
-                        self._cache_stats['hits'] += 1
-                        self._log_info(f"Memory cache hit para configuración: {cache_key}")
-
             # Limpiar estado anterior
             with self.lock:
                 self.active_downloads.clear()
@@ -1555,8 +1597,16 @@ class AdvancedCandleDownloader:
 
             # Generar solicitudes de descarga optimizadas
             total_requests = 0
+            cached_requests = 0
             for symbol in symbols:
                 for timeframe in timeframes:
+                    # Cache predictivo: los frames calientes no se vuelven a descargar
+                    if (use_cache and self._prefetcher is not None and
+                            self._prefetcher.get_warm_result(symbol, timeframe) is not None):
+                        self._cache_stats['hits'] += 1
+                        cached_requests += 1
+                        continue
+                    
                     request = DownloadRequest(
                         symbol=symbol,
                         timeframe=timeframe,
@@ -1570,6 +1620,15 @@ class AdvancedCandleDownloader:
                     self.download_queue.append(request)
                     total_requests += 1
 
+            if cached_requests:
+                self._log_info(f"Cache hit: {cached_requests} frames servidos desde el prefetch de killzone")
+
+            if total_requests == 0:
+                # Todo estaba caliente: nada que descargar
+                if self.complete_callback:
+                    self.complete_callback(cached_requests, 0.0)
+                return True
+
             # Ordenar por prioridad
             self.download_queue.sort(key=lambda x: x.priority)
 
@@ -1931,7 +1990,8 @@ class AdvancedCandleDownloader:
                     'lazy_modules': len(self._lazy_modules),
                     'cache_enabled': self._use_predictive_cache,
                     'debug_enabled': self._enable_debug
-                }
+                },
+                'killzone_prefetch': self._prefetcher.get_status() if self._prefetcher else None
             }
             
             # Agregar estadísticas SIC si disponibles
@@ -2120,11 +2180,173 @@ class AdvancedCandleDownloader:
             }
             return result
 
+    def get_timeframe_set(self,
+                          symbol: str,
+                          timeframes: List[str],
+                          base_timeframe: Optional[str] = None,
+                          verify: bool = False,
+                          save_files: bool = False,
+                          consumer: Optional[str] = None) -> Dict[str, Any]:
+        """
+        🧱 Conjunto multi-timeframe derivado de una sola serie base (M1/M5)
+
+        La primera llamada descarga la serie base con historia suficiente para
+        la temporalidad más alta (hasta max_base_bars); las siguientes sólo
+        piden las velas base posteriores a la última guardada y las velas
+        superiores se actualizan de forma incremental. Las temporalidades no
+        derivables, o con menos velas que el mínimo ICT, se descargan del
+        broker como antes.
+
+        Args:
+            symbol: Símbolo (ej: "EURUSD")
+            timeframes: Temporalidades pedidas
+            base_timeframe: 'M1' o 'M5' (None = M1 si se pide M1, si no M5)
+            verify: Comparar cada temporalidad derivada con las velas del broker
+            save_files: Guardar cada frame en data/candles
+            consumer: Analizador que pide el conjunto; registra símbolo y
+                timeframes en el prefetch de killzones con este downloader
+
+        Returns:
+            Dict con success, results (timeframe -> resultado tipo
+            download_candles), derived, downloaded, base_bars_fetched y
+            verification (si verify)
+        """
+        timeframes = list(dict.fromkeys(timeframes))
+        if consumer and self._prefetcher is not None:
+            self._prefetcher.record_demand(consumer, symbol, timeframes, downloader=self)
+        with self._timeframe_set_lock:
+            return self._build_timeframe_set(symbol, timeframes, base_timeframe, verify, save_files)
+
+    def _build_timeframe_set(self, symbol: str, timeframes: List[str], base_timeframe: Optional[str],
+                             verify: bool, save_files: bool) -> Dict[str, Any]:
+        """🧱 Cuerpo de get_timeframe_set (bajo _timeframe_set_lock)"""
+        base_tf = base_timeframe or select_base_timeframe(timeframes)
+        derivable = [tf for tf in timeframes if can_derive(tf, base_tf)]
+        timeframe_set: Dict[str, Any] = {
+            'success': False, 'symbol': symbol, 'base_timeframe': base_tf, 'results': {},
+            'derived': [], 'downloaded': [], 'base_bars_fetched': 0,
+        }
+
+        builder = self._update_base_series(symbol, base_tf, derivable, timeframe_set) if derivable else None
+
+        for tf in timeframes:
+            ict_config = self._get_ict_optimal_config(tf)
+            frame = builder.frame(tf, include_forming=True) if builder is not None and tf in derivable else None
+            if frame is None or (tf != base_tf and len(frame) < ict_config['minimum_bars']):
+                # Sin serie base o historia insuficiente: descarga directa del broker
+                timeframe_set['results'][tf] = self.download_candles(symbol=symbol, timeframe=tf,
+                                                                     save_to_file=save_files, use_ict_optimal=True)
+                timeframe_set['downloaded'].append(tf)
+                continue
+
+            actual_bars = len(frame)
+            timeframe_set['results'][tf] = {
+                'success': True,
+                'data': frame,
+                'message': f"{actual_bars} velas {tf} derivadas de {base_tf}",
+                'source': 'derived' if tf != base_tf else 'mt5_direct',
+                'base_timeframe': base_tf,
+                'ict_analysis': {
+                    'target_bars': ict_config['optimal_bars'],
+                    'actual_bars': actual_bars,
+                    'ict_minimum': ict_config['minimum_bars'],
+                    'ict_ideal': ict_config['ideal_bars'],
+                    'ict_optimal': ict_config['optimal_bars'],
+                    'meets_ict_minimum': actual_bars >= ict_config['minimum_bars'],
+                    'meets_ict_ideal': actual_bars >= ict_config['ideal_bars'],
+                    'is_ict_optimal': actual_bars >= ict_config['optimal_bars']
+                }
+            }
+            timeframe_set['derived'].append(tf)
+            if save_files:
+                self._save_candles_to_file(frame, symbol, tf)
+
+        if verify and builder is not None:
+            timeframe_set['verification'] = {
+                tf: self._verify_derived_timeframe(builder, symbol, tf)
+                for tf in timeframe_set['derived'] if tf != base_tf
+            }
+
+        timeframe_set['success'] = any(result.get('success') for result in timeframe_set['results'].values())
+        return timeframe_set
+
+    def _update_base_series(self, symbol: str, base_tf: str, derivable: List[str],
+                            timeframe_set: Dict[str, Any]) -> Optional[Any]:
+        """📥 Descarga (completa o sólo el tramo nuevo) la serie base y actualiza el builder"""
+        key = (symbol, base_tf)
+        builder = self._timeframe_builders.get(key)
+        base_minutes = TIMEFRAME_MINUTES[base_tf]
+
+        if builder is None or any(tf not in builder.timeframes for tf in derivable):
+            targets = set(derivable) | {base_tf} | set(builder.timeframes if builder is not None else ())
+            targets = sorted(targets, key=TIMEFRAME_MINUTES.get)
+            max_bars = {tf: self._get_ict_optimal_config(tf)['optimal_bars'] for tf in targets}
+            max_bars[base_tf] = self.max_base_bars
+            builder = IncrementalTimeframeBuilder(targets, base_tf, max_bars=max_bars)
+            bars = min(self.max_base_bars, max(
+                self._get_ict_optimal_config(tf)['ideal_bars'] * TIMEFRAME_MINUTES[tf] // base_minutes
+                for tf in targets))
+        elif builder.last_base_time is None:
+            bars = self.max_base_bars
+        else:
+            # Tramo nuevo + un día de margen (hora del broker vs hora local)
+            elapsed = max(0.0, (datetime.now() - builder.last_base_time.to_pydatetime()).total_seconds())
+            bars = min(self.max_base_bars, int(elapsed // 60) // base_minutes + 1440 // base_minutes)
+
+        if not self._check_mt5_connection():
+            self._log_error(f"❌ Serie base {symbol} {base_tf} no disponible: MT5 sin conexión")
+            return self._timeframe_builders.get(key)
+
+        try:
+            end_date = datetime.now()
+            start_date = end_date - timedelta(minutes=bars * base_minutes * 1.5)
+            download = self._download_with_mt5(symbol, base_tf, start_date, end_date, False, bars=bars)
+        except Exception as e:
+            self._log_error(f"Error descargando serie base {symbol} {base_tf}: {e}")
+            return self._timeframe_builders.get(key)
+
+        data = download.get('data')
+        if data is None or len(data) == 0:
+            return self._timeframe_builders.get(key)
+
+        # La última vela de MT5 es la que está en formación
+        closed = builder.update(data.iloc[:-1], forming=data.iloc[-1:])
+        self._timeframe_builders[key] = builder
+        timeframe_set['base_bars_fetched'] = len(data)
+        self._log_info(f"🧱 Serie base {symbol} {base_tf}: {len(data)} velas leídas, "
+                       f"cerradas nuevas: {', '.join(f'{tf}={n}' for tf, n in closed.items() if n)}")
+        return builder
+
+    def _verify_derived_timeframe(self, builder: Any, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """🔍 Compara una temporalidad derivada con las velas que entrega el broker"""
+        try:
+            bars = max(1, builder.bar_count(timeframe))
+            end_date = datetime.now()
+            start_date = end_date - timedelta(minutes=bars * TIMEFRAME_MINUTES[timeframe] * 1.5)
+            broker = self._download_with_mt5(symbol, timeframe, start_date, end_date, False, bars=bars + 1)
+            report = builder.verify(timeframe, broker['data'].iloc[:-1])
+            status = '✅' if report['ok'] else '⚠️'
+            self._log_info(f"{status} Verificación {symbol} {timeframe}: {report['matched']}/{report['bars_compared']} "
+                           f"velas iguales, faltantes {report['missing_in_derived']}, sobrantes {report['extra_in_derived']}")
+            return report
+        except Exception as e:
+            self._log_error(f"Error verificando {symbol} {timeframe} contra el broker: {e}")
+            return {'ok': False, 'error': str(e)}
+
     def download_ict_full_analysis_set(self, 
                                       symbol: str, 
                                       timeframes: Optional[List[str]] = None,
-                                      save_files: bool = True) -> Dict[str, Any]:
-        """🏛️ Descarga conjunto completo ICT para análisis institucional"""
+                                      save_files: bool = True,
+                                      derive_from_base: bool = True,
+                                      base_timeframe: Optional[str] = None,
+                                      verify: bool = False) -> Dict[str, Any]:
+        """
+        🏛️ Descarga conjunto completo ICT para análisis institucional
+
+        Con derive_from_base (por defecto) se descarga una sola serie base
+        (M1/M5) y el resto de temporalidades se agregan desde ella; verify=True
+        las compara con las velas del broker.
+        """
         if not timeframes:
             # Timeframes ICT estándar para análisis completo
             timeframes = ['D1', 'H4', 'H1', 'M15', 'M5']
@@ -2133,23 +2355,31 @@ class AdvancedCandleDownloader:
             self._log_info(f"🏛️ ICT FULL ANALYSIS DOWNLOAD: {symbol}")
             self._log_info(f"   Timeframes: {', '.join(timeframes)}")
             
-            results = {}
+            timeframe_set = None
             total_bars = 0
             all_compliant = True
+
+            if derive_from_base and TIMEFRAME_AGGREGATOR_AVAILABLE:
+                timeframe_set = self.get_timeframe_set(symbol, timeframes, base_timeframe=base_timeframe,
+                                                       verify=verify, save_files=save_files,
+                                                       consumer='ict_full_analysis')
+                results = timeframe_set['results']
+            else:
+                if self._prefetcher is not None:
+                    self._prefetcher.record_demand('ict_full_analysis', symbol, timeframes, downloader=self)
+                results = {}
+                for tf in timeframes:
+                    self._log_info(f"📊 Descargando {symbol} {tf} (ICT optimal)...")
+                    
+                    # Descarga con configuración ICT óptima
+                    results[tf] = self.download_candles(
+                        symbol=symbol,
+                        timeframe=tf,
+                        save_to_file=save_files,
+                        use_ict_optimal=True
+                    )
             
-            for tf in timeframes:
-                self._log_info(f"📊 Descargando {symbol} {tf} (ICT optimal)...")
-                
-                # Descarga con configuración ICT óptima
-                result = self.download_candles(
-                    symbol=symbol,
-                    timeframe=tf,
-                    save_to_file=save_files,
-                    use_ict_optimal=True
-                )
-                
-                results[tf] = result
-                
+            for tf, result in results.items():
                 if result['success'] and 'ict_analysis' in result:
                     total_bars += result['ict_analysis']['actual_bars']
                     if not result['ict_analysis']['meets_ict_minimum']:
@@ -2167,6 +2397,12 @@ class AdvancedCandleDownloader:
                 'analysis_grade': 'INSTITUTIONAL' if all_compliant else 'INCOMPLETE',
                 'results_by_timeframe': results
             }
+            if timeframe_set is not None:
+                summary['base_timeframe'] = timeframe_set['base_timeframe']
+                summary['derived_timeframes'] = timeframe_set['derived']
+                summary['downloaded_timeframes'] = timeframe_set['downloaded']
+                if 'verification' in timeframe_set:
+                    summary['verification'] = timeframe_set['verification']
             
             self._log_info(f"✅ ICT FULL ANALYSIS COMPLETE: {total_bars} velas totales")
             self._log_info(f"   Cumplimiento ICT: {'✅ COMPLIANT' if all_compliant else '❌ INCOMPLETE'}")
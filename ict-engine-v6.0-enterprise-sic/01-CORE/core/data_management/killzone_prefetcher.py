@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+🔮 KILLZONE PREFETCHER - ICT ENGINE v6.0 Enterprise
+===================================================
+
+Prefetch predictivo de velas antes de la apertura de las killzones ICT.
+
+El primer análisis en la apertura de una killzone es justo cuando la
+latencia importa más, y hasta ahora pagaba una descarga en frío de MT5 más
+el cálculo de indicadores. Este módulo conoce el horario de killzones y qué
+combinaciones símbolo/timeframe pide cada analizador, y calienta esos frames
+(y sus features derivadas) en los minutos previos a la apertura.
+
+Características:
+- Horario tomado del calendario de sesiones (core/analysis/session_calendar):
+  las killzones y ventanas Silver Bullet que etiquetan los detectores, en
+  hora local de su plaza (el horario UTC sigue los cambios de DST)
+- Requisitos símbolo/timeframe registrados por los analizadores al pedir
+  sus frames (record_demand desde get_timeframe_set), junto con el
+  downloader que los consume: el prefetch actualiza su serie base
+- Un prefetcher por proceso (get_killzone_prefetcher) compartido por todos
+  los downloaders; el launcher arranca su loop en background
+- Frescura por timeframe: un frame sirve hasta el cierre de la vela en curso
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# Ventana: (zona horaria, inicio 'HH:MM', fin 'HH:MM'), el formato de session_calendar
+KillzoneWindow = Tuple[str, str, str]
+
+TIMEFRAME_SECONDS = {
+    'M1': 60, 'M5': 300, 'M15': 900, 'M30': 1800,
+    'H1': 3600, 'H4': 14400, 'D1': 86400,
+}
+
+FeatureBuilder = Callable[[str, str, Any], Any]
+
+
+def calendar_killzones() -> Dict[str, KillzoneWindow]:
+    """🗓️ Killzones y ventanas Silver Bullet del calendario de sesiones de los detectores"""
+    from core.analysis.session_calendar import KILLZONES, SILVER_BULLET_WINDOWS
+
+    killzones = dict(KILLZONES)
+    for tz_name, start, end in SILVER_BULLET_WINDOWS:
+        killzones[f'SILVER_BULLET_{start.replace(":", "")}'] = (tz_name, start, end)
+    return killzones
+
+
+def killzone_utc_window(killzone: KillzoneWindow, day: Any) -> Tuple[datetime, datetime]:
+    """⏰ (apertura, cierre) en UTC de una killzone local en la fecha local `day`"""
+    tz_name, start, end = killzone
+    tz = ZoneInfo(tz_name)
+    open_dt = datetime.combine(day, dt_time.fromisoformat(start), tzinfo=tz)
+    close_dt = datetime.combine(day, dt_time.fromisoformat(end), tzinfo=tz)
+    return open_dt.astimezone(timezone.utc), close_dt.astimezone(timezone.utc)
+
+
+@dataclass
+class WarmFrame:
+    """🔥 Frame de velas precalentado"""
+    symbol: str
+    timeframe: str
+    result: Dict[str, Any]
+    fetched_at: float
+    features: Dict[str, Any] = field(default_factory=dict)
+
+    def age_seconds(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.fetched_at
+
+
+class KillzonePrefetcher:
+    """
+    🔮 PREFETCHER PREDICTIVO DE KILLZONES
+    =====================================
+
+    Mantiene un cache de frames calientes por (símbolo, timeframe). Fuera de
+    la ventana previa a una killzone no descarga nada; dentro de ella
+    refresca sólo las entradas cuya vela ya cerró, con el downloader del
+    analizador que las pidió.
+    """
+
+    def __init__(self,
+                 downloader: Any = None,
+                 lead_minutes: int = 10,
+                 hold_minutes: int = 2,
+                 killzones: Optional[Dict[str, KillzoneWindow]] = None):
+        """
+        Args:
+            downloader: Downloader por defecto para requisitos registrados sin
+                uno propio (download_candles / get_timeframe_set)
+            lead_minutes: Minutos antes de la apertura en los que se precalienta
+            hold_minutes: Minutos tras la apertura en los que se sigue refrescando
+            killzones: Horario alternativo (por defecto calendar_killzones())
+        """
+        self.downloader = downloader
+        self.lead_minutes = lead_minutes
+        self.hold_minutes = hold_minutes
+        self.killzones = dict(killzones) if killzones else calendar_killzones()
+
+        self._requirements: Dict[str, Dict[str, Any]] = {}
+        self._feature_builders: Dict[str, FeatureBuilder] = {}
+        self._frames: Dict[Tuple[str, str], WarmFrame] = {}
+
+        self._lock = threading.RLock()
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            'prefetch_cycles': 0,
+            'frames_warmed': 0,
+            'prefetch_errors': 0,
+            'hits': 0,
+            'misses': 0,
+            'last_prefetch': None,
+        }
+
+    # ===============================
+    # REGISTRO DE REQUISITOS
+    # ===============================
+
+    def register_analyzer(self, analyzer_name: str,
+                          symbols: List[str], timeframes: List[str],
+                          downloader: Any = None) -> None:
+        """📋 Registra (reemplaza) los símbolos/timeframes que pide un analizador"""
+        with self._lock:
+            self._requirements[analyzer_name] = {
+                'symbols': list(symbols),
+                'timeframes': list(timeframes),
+                'downloader': self._downloader_ref(downloader),
+            }
+
+    def record_demand(self, analyzer_name: str, symbol: str, timeframes: List[str],
+                      downloader: Any = None) -> None:
+        """📝 Suma a los requisitos de un analizador un símbolo/timeframes que acaba de pedir"""
+        with self._lock:
+            requirement = self._requirements.get(analyzer_name)
+            if requirement is None:
+                self.register_analyzer(analyzer_name, [symbol], timeframes, downloader)
+                return
+            if symbol not in requirement['symbols']:
+                requirement['symbols'].append(symbol)
+            requirement['timeframes'].extend(tf for tf in timeframes if tf not in requirement['timeframes'])
+            if downloader is not None:
+                requirement['downloader'] = self._downloader_ref(downloader)
+
+    def register_feature_builder(self, name: str, builder: FeatureBuilder) -> None:
+        """🧮 Registra un constructor de features: builder(symbol, timeframe, data)"""
+        with self._lock:
+            self._feature_builders[name] = builder
+
+    def get_prefetch_targets(self) -> List[Tuple[str, str]]:
+        """🎯 Pares (símbolo, timeframe) únicos, timeframes mayores primero"""
+        with self._lock:
+            targets = {
+                (symbol, tf)
+                for req in self._requirements.values()
+                for symbol in req['symbols']
+                for tf in req['timeframes']
+            }
+        return sorted(targets, key=lambda t: (-TIMEFRAME_SECONDS.get(t[1], 0), t[0]))
+
+    # ===============================
+    # HORARIO DE KILLZONES
+    # ===============================
+
+    def next_killzone_open(self, now: Optional[datetime] = None) -> Tuple[str, datetime]:
+        """⏰ Próxima apertura de killzone (nombre, datetime UTC)"""
+        now = self._utc(now)
+        hold = timedelta(minutes=self.hold_minutes)
+        candidates = []
+        for name, killzone in self.killzones.items():
+            local_day = now.astimezone(ZoneInfo(killzone[0])).date()
+            for offset in range(3):
+                open_dt, _ = killzone_utc_window(killzone, local_day + timedelta(days=offset))
+                if open_dt + hold > now:
+                    candidates.append((open_dt, name))
+                    break
+        open_dt, name = min(candidates)
+        return name, open_dt
+
+    def is_prefetch_window(self, now: Optional[datetime] = None) -> bool:
+        """🪟 True entre lead_minutes antes y hold_minutes después de una apertura"""
+        now = self._utc(now)
+        _, open_dt = self.next_killzone_open(now)
+        return (open_dt - timedelta(minutes=self.lead_minutes)
+                <= now
+                < open_dt + timedelta(minutes=self.hold_minutes))
+
+    # ===============================
+    # CACHE DE FRAMES
+    # ===============================
+
+    def is_fresh(self, frame: WarmFrame, now: Optional[float] = None) -> bool:
+        """✅ Un frame sirve hasta el cierre (límite UTC) de la vela en la que se descargó"""
+        tf_seconds = TIMEFRAME_SECONDS.get(frame.timeframe, 60)
+        bar_close = (frame.fetched_at // tf_seconds + 1) * tf_seconds
+        return (now if now is not None else time.time()) < bar_close
+
+    def get_warm_result(self, symbol: str, timeframe: str) -> Optional[Dict[str, Any]]:
+        """🔥 Resultado de descarga caliente o None si no hay frame fresco"""
+        with self._lock:
+            frame = self._frames.get((symbol, timeframe))
+            if frame is None or not self.is_fresh(frame):
+                self.stats['misses'] += 1
+                return None
+            self.stats['hits'] += 1
+
+        result = dict(frame.result)
+        result['cache_hit'] = True
+        result['cache_age_seconds'] = round(frame.age_seconds(), 3)
+        return result
+
+    def get_features(self, symbol: str, timeframe: str) -> Dict[str, Any]:
+        """🧮 Features derivadas del frame caliente (vacío si no hay)"""
+        with self._lock:
+            frame = self._frames.get((symbol, timeframe))
+            if frame is None or not self.is_fresh(frame):
+                return {}
+            return dict(frame.features)
+
+    def store(self, symbol: str, timeframe: str, result: Dict[str, Any]) -> None:
+        """💾 Guarda un resultado exitoso de descarga y calcula sus features"""
+        if not result or not result.get('success') or result.get('data') is None:
+            return
+
+        features = {}
+        for name, builder in list(self._feature_builders.items()):
+            try:
+                features[name] = builder(symbol, timeframe, result['data'])
+            except Exception:
+                self.stats['prefetch_errors'] += 1
+
+        with self._lock:
+            self._frames[(symbol, timeframe)] = WarmFrame(
+                symbol=symbol,
+                timeframe=timeframe,
+                result=result,
+                fetched_at=time.time(),
+                features=features,
+            )
+
+    def invalidate(self, symbol: Optional[str] = None, timeframe: Optional[str] = None) -> None:
+        """🧹 Invalida frames (todos si no se especifica filtro)"""
+        with self._lock:
+            for key in list(self._frames):
+                if (symbol is None or key[0] == symbol) and (timeframe is None or key[1] == timeframe):
+                    del self._frames[key]
+
+    # ===============================
+    # PREFETCH
+    # ===============================
+
+    def prefetch(self, force: bool = False) -> int:
+        """
+        🔮 Precalienta los frames vencidos de todos los analizadores registrados
+
+        Los timeframes vencidos de un símbolo se piden juntos al downloader
+        del analizador: con get_timeframe_set se actualiza su serie base y
+        las temporalidades derivadas; si no, una descarga por timeframe.
+
+        Args:
+            force: Descargar aunque el frame siga fresco
+
+        Returns:
+            Número de frames descargados en este ciclo
+        """
+        warmed = 0
+        for (downloader, symbol), timeframes in self._stale_targets(force).items():
+            if self._stop_event.is_set():
+                break
+            try:
+                if hasattr(downloader, 'get_timeframe_set'):
+                    results = downloader.get_timeframe_set(symbol, timeframes).get('results', {})
+                else:
+                    results = {tf: downloader.download_candles(symbol=symbol, timeframe=tf,
+                                                               save_to_file=False, use_cache=False)
+                               for tf in timeframes}
+            except Exception:
+                self.stats['prefetch_errors'] += 1
+                continue
+            for timeframe in timeframes:
+                result = results.get(timeframe)
+                if result and result.get('success'):
+                    self.store(symbol, timeframe, result)
+                    warmed += 1
+                else:
+                    self.stats['prefetch_errors'] += 1
+
+        self.stats['prefetch_cycles'] += 1
+        self.stats['frames_warmed'] += warmed
+        self.stats['last_prefetch'] = datetime.now(timezone.utc).isoformat()
+        return warmed
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """⏱️ Un paso del scheduler: prefetch sólo dentro de la ventana de killzone"""
+        if not self.is_prefetch_window(now):
+            return 0
+        return self.prefetch()
+
+    def start(self, interval_seconds: float = 30.0) -> None:
+        """▶️ Arranca el loop de prefetch en background"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(interval_seconds,),
+            daemon=True,
+            name="KillzonePrefetcher-v6.0"
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """⏹️ Detiene el loop de prefetch"""
+        self._stop_event.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=timeout)
+
+    def get_status(self) -> Dict[str, Any]:
+        """📊 Estado del prefetcher"""
+        name, open_dt = self.next_killzone_open()
+        with self._lock:
+            fresh = sum(1 for f in self._frames.values() if self.is_fresh(f))
+            return {
+                'running': bool(self._thread and self._thread.is_alive()),
+                'next_killzone': name,
+                'next_killzone_open_utc': open_dt.isoformat(),
+                'in_prefetch_window': self.is_prefetch_window(),
+                'analyzers': sorted(self._requirements),
+                'targets': len(self.get_prefetch_targets()),
+                'frames_cached': len(self._frames),
+                'frames_fresh': fresh,
+                'stats': dict(self.stats),
+            }
+
+    def _stale_targets(self, force: bool) -> Dict[Tuple[Any, str], List[str]]:
+        """(downloader, símbolo) -> timeframes vencidos, timeframes mayores primero"""
+        stale: Dict[Tuple[Any, str], List[str]] = {}
+        with self._lock:
+            for requirement in list(self._requirements.values()):
+                ref = requirement['downloader']
+                downloader = ref() if ref is not None else self.downloader
+                if downloader is None:
+                    continue
+                for symbol in requirement['symbols']:
+                    for timeframe in requirement['timeframes']:
+                        frame = self._frames.get((symbol, timeframe))
+                        if not force and frame is not None and self.is_fresh(frame):
+                            continue
+                        timeframes = stale.setdefault((downloader, symbol), [])
+                        if timeframe not in timeframes:
+                            timeframes.append(timeframe)
+        for timeframes in stale.values():
+            timeframes.sort(key=lambda tf: -TIMEFRAME_SECONDS.get(tf, 0))
+        return stale
+
+    @staticmethod
+    def _downloader_ref(downloader: Any) -> Optional[Callable[[], Any]]:
+        """Referencia débil: el prefetcher no mantiene vivos los downloaders de los analizadores"""
+        return weakref.ref(downloader) if downloader is not None else None
+
+    def _run(self, interval_seconds: float) -> None:
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception:
+                self.stats['prefetch_errors'] += 1
+            self._stop_event.wait(interval_seconds)
+
+    @staticmethod
+    def _utc(now: Optional[datetime]) -> datetime:
+        if now is None:
+            return datetime.now(timezone.utc)
+        if now.tzinfo is None:
+            return now.replace(tzinfo=timezone.utc)
+        return now.astimezone(timezone.utc)
+
+
+_killzone_prefetcher: Optional[KillzonePrefetcher] = None
+_killzone_prefetcher_lock = threading.Lock()
+
+
+def get_killzone_prefetcher(lead_minutes: int = 10) -> KillzonePrefetcher:
+    """Prefetcher compartido del proceso (lead_minutes sólo cuenta al crearlo)"""
+    global _killzone_prefetcher
+    if _killzone_prefetcher is None:
+        with _killzone_prefetcher_lock:
+            if _killzone_prefetcher is None:
+                _killzone_prefetcher = KillzonePrefetcher(lead_minutes=lead_minutes)
+    return _killzone_prefetcher
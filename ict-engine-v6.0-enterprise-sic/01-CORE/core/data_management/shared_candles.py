@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+🧩 SHARED CANDLES - ICT ENGINE v6.0 Enterprise
+==============================================
+
+Velas OHLCV por (símbolo, timeframe) en multiprocessing.shared_memory para
+que los procesos de análisis las lean sin copia:
+
+1. SharedCandleStore → el proceso principal coloca cada frame una vez (un
+                       bloque por frame: time int64 ns + columnas float64).
+                       Si el frame crece dentro de la capacidad reservada se
+                       reescribe en el mismo bloque
+2. FrameHandle       → descriptor pequeño y picklable (nombre del bloque,
+                       filas, columnas) que viaja a los workers en lugar de
+                       los datos
+3. attach_frame()    → en el worker: vistas numpy de solo lectura sobre el
+                       bloque (una apertura por bloque y proceso)
+
+    with SharedCandleStore() as store:
+        handle = store.put('EURUSD', 'M15', candles)      # DataFrame OHLCV
+        ...                                               # handle → worker
+    frame = attach_frame(handle)                          # en el worker
+    frame['high'], frame.time, frame.to_dataframe()
+
+El proceso que crea los bloques es el único que los libera (close()). Los
+workers son procesos hijos y comparten su resource_tracker: abrir un bloque
+no lo registra para borrarlo cuando el worker termina.
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import threading
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+CANDLE_COLUMNS = ('open', 'high', 'low', 'close', 'tick_volume')
+GROWTH_FACTOR = 1.25  # Capacidad extra al crear un bloque (velas nuevas sin realocar)
+
+_ITEM = 8  # int64 / float64
+
+
+@dataclass(frozen=True)
+class FrameHandle:
+    """Descriptor de un frame en memoria compartida (lo que se envía a los workers)"""
+    shm_name: str
+    symbol: str
+    timeframe: str
+    rows: int
+    capacity: int
+    columns: Tuple[str, ...] = CANDLE_COLUMNS
+    version: int = 0
+
+
+class SharedFrame:
+    """Vistas de solo lectura sobre un bloque: frame['high'], frame.time (int64 ns)"""
+
+    __slots__ = ('handle', 'time', 'columns')
+
+    def __init__(self, handle: FrameHandle, buffer: memoryview):
+        self.handle = handle
+        rows, capacity = handle.rows, handle.capacity
+        self.time = _view(buffer, np.int64, 0, rows)
+        self.columns = {name: _view(buffer, np.float64, (1 + i) * capacity * _ITEM, rows)
+                        for i, name in enumerate(handle.columns)}
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self.columns[column]
+
+    def __len__(self) -> int:
+        return self.handle.rows
+
+    def to_dataframe(self) -> pd.DataFrame:
+        """DataFrame con índice de tiempo (copia: para código que necesita pandas)"""
+        index = pd.DatetimeIndex(self.time.astype('datetime64[ns]'), name='time')
+        return pd.DataFrame({name: np.array(values) for name, values in self.columns.items()}, index=index)
+
+
+def _view(buffer: memoryview, dtype, offset: int, rows: int) -> np.ndarray:
+    array = np.frombuffer(buffer, dtype=dtype, count=rows, offset=offset)
+    array.flags.writeable = False
+    return array
+
+
+def _time_ns(index: Any) -> np.ndarray:
+    if isinstance(index, pd.DatetimeIndex):
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        return np.asarray(index.values, dtype='datetime64[ns]').view(np.int64)
+    return np.asarray(index, dtype=np.int64)
+
+
+class SharedCandleStore:
+    """
+    🧩 Bloques de memoria compartida con las velas de cada (símbolo, timeframe)
+
+    Args:
+        columns: Columnas float64 guardadas además del tiempo
+    """
+
+    def __init__(self, columns: Tuple[str, ...] = CANDLE_COLUMNS):
+        self.columns = tuple(columns)
+        self._blocks: Dict[Tuple[str, str], shared_memory.SharedMemory] = {}
+        self._handles: Dict[Tuple[str, str], FrameHandle] = {}
+        self._lock = threading.Lock()
+        self.stats = {'puts': 0, 'in_place': 0, 'allocations': 0}
+
+    def __enter__(self) -> 'SharedCandleStore':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __iter__(self) -> Iterator[FrameHandle]:
+        return iter(list(self._handles.values()))
+
+    def put(self, symbol: str, timeframe: str, candles: pd.DataFrame) -> FrameHandle:
+        """Copia el frame a su bloque (una vez) y devuelve el handle para los workers"""
+        rows = len(candles)
+        time_ns = _time_ns(candles.index)
+        key = (symbol, timeframe)
+        with self._lock:
+            block, previous = self._blocks.get(key), self._handles.get(key)
+            if block is None or previous.capacity < rows:
+                if block is not None:
+                    self._release(key)
+                capacity = max(1, int(rows * GROWTH_FACTOR))
+                block = shared_memory.SharedMemory(create=True, size=(1 + len(self.columns)) * capacity * _ITEM)
+                self._blocks[key] = block
+                version = 0
+                self.stats['allocations'] += 1
+            else:
+                capacity, version = previous.capacity, previous.version + 1
+                self.stats['in_place'] += 1
+
+            np.ndarray((capacity,), dtype=np.int64, buffer=block.buf)[:rows] = time_ns
+            for i, name in enumerate(self.columns):
+                column = np.ndarray((capacity,), dtype=np.float64, buffer=block.buf, offset=(1 + i) * capacity * _ITEM)
+                column[:rows] = candles[name].to_numpy(dtype=np.float64) if name in candles else np.nan
+
+            handle = FrameHandle(block.name, symbol, timeframe, rows, capacity, self.columns, version)
+            self._handles[key] = handle
+            self.stats['puts'] += 1
+            return handle
+
+    def put_many(self, frames: Dict[str, Dict[str, pd.DataFrame]]) -> List[FrameHandle]:
+        """put() de {símbolo: {timeframe: DataFrame}} (frames vacíos se omiten)"""
+        return [self.put(symbol, timeframe, candles)
+                for symbol, by_tf in frames.items()
+                for timeframe, candles in by_tf.items()
+                if candles is not None and len(candles)]
+
+    def handle(self, symbol: str, timeframe: str) -> Optional[FrameHandle]:
+        return self._handles.get((symbol, timeframe))
+
+    def release(self, symbol: str, timeframe: str) -> None:
+        with self._lock:
+            self._release((symbol, timeframe))
+
+    def _release(self, key: Tuple[str, str]) -> None:
+        block = self._blocks.pop(key, None)
+        self._handles.pop(key, None)
+        if block is not None:
+            _close(block)
+            block.unlink()
+
+    def close(self) -> None:
+        """Libera todos los bloques (los workers deben haber terminado con ellos)"""
+        with self._lock:
+            for key in list(self._blocks):
+                self._release(key)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(block.size for block in self._blocks.values())
+
+
+# ===============================
+# LADO WORKER
+# ===============================
+
+MAX_ATTACHED = 256  # Bloques abiertos por worker (los más antiguos se cierran)
+
+_attached: Dict[str, shared_memory.SharedMemory] = {}
+
+
+def attach_frame(handle: FrameHandle) -> SharedFrame:
+    """Vistas sin copia del frame (el bloque se abre una vez por proceso)"""
+    block = _attached.get(handle.shm_name)
+    if block is None:
+        while len(_attached) >= MAX_ATTACHED:
+            _close(_attached.pop(next(iter(_attached))))
+        block = _attached[handle.shm_name] = shared_memory.SharedMemory(name=handle.shm_name)
+    return SharedFrame(handle, block.buf)
+
+
+def _close(block: shared_memory.SharedMemory) -> None:
+    try:
+        block.close()
+    except BufferError:
+        pass  # Aún hay vistas vivas; el SO lo libera al terminar el proceso
+
+
+def detach_all() -> None:
+    """Cierra los bloques abiertos por este proceso (no los borra)"""
+    for block in _attached.values():
+        _close(block)
+    _attached.clear()
@@ -0,0 +1,456 @@
+#!/usr/bin/env python3
+"""
+🧱 TIMEFRAME AGGREGATOR - ICT ENGINE v6.0 Enterprise
+====================================================
+
+Temporalidades superiores construidas a partir de una sola serie base (M1 o
+M5) en lugar de pedir a MT5 cada timeframe por separado.
+
+Antes download_ict_full_analysis_set y PatternDetector._get_market_data
+hacían una descarga por timeframe (D1, H4, H1, M15, M5...) del mismo
+símbolo: un viaje al terminal y un archivo por temporalidad. Aquí la serie
+base se descarga y guarda una vez; el resto se agrega desde ella.
+
+Componentes:
+- aggregate_ohlcv(): agregación vectorizada (reduceat) de un frame completo
+- IncrementalTimeframeBuilder: mantiene las temporalidades derivadas y las
+  actualiza a medida que cierran velas base (sólo procesa las nuevas)
+- compare_with_broker(): modo verificación contra las velas del broker
+
+Límites de vela:
+- Timestamps naive = hora del servidor del broker (lo que devuelve MT5), con
+  los mismos cortes que el terminal: H4 a 00/04/08..., D1 a medianoche broker.
+- Con broker_timezone (p.ej. 'EET') los timestamps se interpretan en UTC y
+  los cortes se calculan en la hora local del broker (DST incluido).
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+TIMEFRAME_MINUTES: Dict[str, int] = {
+    'M1': 1, 'M5': 5, 'M15': 15, 'M30': 30,
+    'H1': 60, 'H4': 240, 'D1': 1440,
+}
+
+# Series base admitidas (la más fina que se pida)
+BASE_TIMEFRAMES = ('M1', 'M5')
+
+# Columna -> cómo se combina dentro de la vela superior
+AGGREGATIONS: Dict[str, str] = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'tick_volume': 'sum',
+    'volume': 'sum',
+    'real_volume': 'sum',
+    'spread': 'max',
+}
+
+VERIFY_FIELDS = ('open', 'high', 'low', 'close', 'tick_volume')
+
+_NS_PER_MINUTE = 60 * 1_000_000_000
+
+
+def timeframe_ns(timeframe: str) -> int:
+    """⏱️ Duración de la vela en nanosegundos"""
+    return TIMEFRAME_MINUTES[timeframe] * _NS_PER_MINUTE
+
+
+def can_derive(timeframe: str, base_timeframe: str) -> bool:
+    """✅ True si `timeframe` se puede construir exactamente desde `base_timeframe`"""
+    if timeframe not in TIMEFRAME_MINUTES or base_timeframe not in TIMEFRAME_MINUTES:
+        return False
+    minutes, base_minutes = TIMEFRAME_MINUTES[timeframe], TIMEFRAME_MINUTES[base_timeframe]
+    return minutes >= base_minutes and minutes % base_minutes == 0
+
+
+def select_base_timeframe(timeframes: Iterable[str]) -> str:
+    """🎯 Serie base para un conjunto de timeframes: M1 si se pide M1, si no M5"""
+    return 'M1' if 'M1' in set(timeframes) else 'M5'
+
+
+def _prepare(frame: pd.DataFrame) -> pd.DataFrame:
+    """DatetimeIndex ordenado y sin duplicados (acepta columna 'time' de MT5)"""
+    if not isinstance(frame.index, pd.DatetimeIndex):
+        if 'time' not in frame.columns:
+            raise ValueError("Se necesita un DatetimeIndex o una columna 'time'")
+        times = frame['time']
+        unit = 's' if np.issubdtype(np.asarray(times).dtype, np.number) else None
+        frame = frame.drop(columns='time').set_index(pd.to_datetime(times, unit=unit).rename('time'))
+    if not frame.index.is_monotonic_increasing:
+        frame = frame.sort_index()
+    if frame.index.has_duplicates:
+        frame = frame[~frame.index.duplicated(keep='last')]
+    return frame
+
+
+def _utc_ns(index: pd.DatetimeIndex) -> np.ndarray:
+    """Nanosegundos del índice (UTC si es tz-aware, reloj de pared si es naive)"""
+    return np.asarray(index.values, dtype='datetime64[ns]').view(np.int64)
+
+
+def bucket_starts(index: pd.DatetimeIndex, timeframe: str, broker_timezone: Optional[str] = None) -> np.ndarray:
+    """
+    🧮 Inicio de la vela `timeframe` de cada timestamp (int64 ns, mismo reloj que el índice)
+
+    Args:
+        index: Timestamps de las velas base
+        timeframe: Temporalidad destino
+        broker_timezone: None = timestamps ya en hora del broker; si no, zona
+            del broker y timestamps en UTC (naive) o tz-aware
+    """
+    period = timeframe_ns(timeframe)
+    values = _utc_ns(index)
+    if broker_timezone is None:
+        return values - values % period
+
+    aware = index if index.tz is not None else index.tz_localize('UTC')
+    wall = _utc_ns(aware.tz_convert(broker_timezone).tz_localize(None))
+    offset = wall - _utc_ns(aware)
+    return wall - wall % period - offset
+
+
+def _group_bounds(buckets: np.ndarray):
+    if len(buckets) == 0:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty
+    edges = np.flatnonzero(np.diff(buckets)) + 1
+    starts = np.concatenate(([0], edges))
+    ends = np.concatenate((edges, [len(buckets)]))
+    return starts, ends
+
+
+def _aggregate_prepared(frame: pd.DataFrame, timeframe: str,
+                        broker_timezone: Optional[str]) -> pd.DataFrame:
+    buckets = bucket_starts(frame.index, timeframe, broker_timezone)
+    starts, ends = _group_bounds(buckets)
+
+    columns: Dict[str, np.ndarray] = {}
+    for column in frame.columns:
+        how = AGGREGATIONS.get(column)
+        if how is None:
+            continue
+        values = frame[column].to_numpy()
+        if len(starts) == 0:
+            columns[column] = values[:0]
+        elif how == 'first':
+            columns[column] = values[starts]
+        elif how == 'last':
+            columns[column] = values[ends - 1]
+        elif how == 'max':
+            columns[column] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            columns[column] = np.minimum.reduceat(values, starts)
+        else:
+            columns[column] = np.add.reduceat(values, starts)
+
+    index = pd.DatetimeIndex(buckets[starts].astype('datetime64[ns]'), name=frame.index.name)
+    if frame.index.tz is not None:
+        index = index.tz_localize('UTC').tz_convert(frame.index.tz)
+    return pd.DataFrame(columns, index=index)
+
+
+def aggregate_ohlcv(base: pd.DataFrame,
+                    timeframe: str,
+                    base_timeframe: str = 'M1',
+                    broker_timezone: Optional[str] = None,
+                    complete_only: bool = False) -> pd.DataFrame:
+    """
+    📊 Velas `timeframe` agregadas desde la serie base (un solo paso vectorizado)
+
+    Args:
+        base: Velas base (DatetimeIndex o columna 'time', columnas OHLCV de MT5)
+        timeframe: Temporalidad destino
+        base_timeframe: Temporalidad de `base`
+        broker_timezone: Ver bucket_starts()
+        complete_only: Descartar la primera vela si la base empieza a mitad de
+            ella y la última si aún no cerró
+
+    Returns:
+        DataFrame con el mismo formato de columnas que la base
+    """
+    if not can_derive(timeframe, base_timeframe):
+        raise ValueError(f"{timeframe} no se puede derivar de {base_timeframe}")
+    frame = _prepare(base)
+    result = _aggregate_prepared(frame, timeframe, broker_timezone)
+    if complete_only and len(result):
+        keep = np.ones(len(result), dtype=bool)
+        first_bucket = bucket_starts(frame.index[:1], timeframe, broker_timezone)[0]
+        keep[0] = _utc_ns(frame.index[:1])[0] == first_bucket
+        last_bucket = bucket_starts(frame.index[-1:], timeframe, broker_timezone)[0]
+        last_end = _utc_ns(frame.index[-1:])[0] + timeframe_ns(base_timeframe)
+        keep[-1] = keep[-1] and last_end >= last_bucket + timeframe_ns(timeframe)
+        result = result[keep]
+    return result
+
+
+def compare_with_broker(derived: pd.DataFrame,
+                        broker: pd.DataFrame,
+                        price_tolerance: float = 1e-5,
+                        volume_tolerance: float = 0.0,
+                        fields: Iterable[str] = VERIFY_FIELDS,
+                        max_examples: int = 5) -> Dict[str, Any]:
+    """
+    🔍 Modo verificación: velas derivadas contra las que entrega el broker
+
+    Sólo se comparan las velas del broker dentro del rango derivado. Faltantes
+    (el broker tiene la vela y la serie base no) y sobrantes se reportan aparte.
+
+    Returns:
+        Dict con bars_compared, mismatched, missing_in_derived,
+        extra_in_derived, field_mismatches, max_abs_diff, examples y ok
+    """
+    derived, broker = _prepare(derived), _prepare(broker)
+    report: Dict[str, Any] = {
+        'bars_compared': 0, 'matched': 0, 'mismatched': 0,
+        'missing_in_derived': 0, 'extra_in_derived': 0,
+        'field_mismatches': {}, 'max_abs_diff': {}, 'examples': [],
+        'match_ratio': 0.0, 'ok': False,
+    }
+    if derived.empty or broker.empty:
+        return report
+
+    window = broker.loc[derived.index[0]:derived.index[-1]]
+    common = derived.index.intersection(window.index)
+    report['missing_in_derived'] = int(len(window.index.difference(derived.index)))
+    report['extra_in_derived'] = int(len(derived.index.difference(broker.index)))
+
+    bad_rows = np.zeros(len(common), dtype=bool)
+    for field in fields:
+        if field not in derived.columns or field not in window.columns:
+            continue
+        ours = derived.loc[common, field].to_numpy(dtype=float)
+        theirs = window.loc[common, field].to_numpy(dtype=float)
+        diff = np.abs(ours - theirs)
+        tolerance = price_tolerance if AGGREGATIONS.get(field) != 'sum' else volume_tolerance
+        bad = diff > tolerance
+        bad_rows |= bad
+        report['field_mismatches'][field] = int(bad.sum())
+        report['max_abs_diff'][field] = float(diff.max()) if len(diff) else 0.0
+
+    for position in np.flatnonzero(bad_rows)[:max_examples]:
+        timestamp = common[position]
+        report['examples'].append({
+            'time': str(timestamp),
+            'derived': {f: float(derived.at[timestamp, f]) for f in report['field_mismatches']},
+            'broker': {f: float(window.at[timestamp, f]) for f in report['field_mismatches']},
+        })
+
+    report['bars_compared'] = int(len(common))
+    report['mismatched'] = int(bad_rows.sum())
+    report['matched'] = report['bars_compared'] - report['mismatched']
+    report['match_ratio'] = report['matched'] / report['bars_compared'] if report['bars_compared'] else 0.0
+    report['ok'] = (report['bars_compared'] > 0 and report['mismatched'] == 0
+                    and report['missing_in_derived'] == 0 and report['extra_in_derived'] == 0)
+    return report
+
+
+def _merge_bars(current: pd.DataFrame, update: pd.DataFrame) -> pd.DataFrame:
+    """Une dos fragmentos (1 fila) de la misma vela superior"""
+    merged = current.copy()
+    for column in merged.columns:
+        how = AGGREGATIONS.get(column)
+        if column not in update.columns or how == 'first':
+            continue
+        old, new = merged[column].iat[0], update[column].iat[0]
+        if how == 'last':
+            value = new
+        elif how == 'max':
+            value = max(old, new)
+        elif how == 'min':
+            value = min(old, new)
+        else:
+            value = old + new
+        merged[column] = np.asarray([value], dtype=merged[column].dtype)
+    return merged
+
+
+class IncrementalTimeframeBuilder:
+    """
+    🧱 TEMPORALIDADES DERIVADAS INCREMENTALES
+    =========================================
+
+    update() recibe velas base cerradas (el primer lote puede ser todo el
+    histórico) y sólo agrega las posteriores a la última procesada. Cada
+    temporalidad guarda sus velas cerradas y la vela en formación; una vela
+    superior cierra cuando llega la última vela base de su intervalo o la
+    primera del siguiente.
+    """
+
+    def __init__(self,
+                 timeframes: Iterable[str],
+                 base_timeframe: str = 'M1',
+                 broker_timezone: Optional[str] = None,
+                 max_bars: Union[int, Dict[str, int]] = 5000):
+        """
+        Args:
+            timeframes: Temporalidades a mantener (puede incluir la base)
+            base_timeframe: Temporalidad de las velas que llegan a update()
+            broker_timezone: Ver bucket_starts()
+            max_bars: Velas cerradas que se conservan (global o por timeframe)
+        """
+        self.base_timeframe = base_timeframe
+        self.broker_timezone = broker_timezone
+        self.timeframes: List[str] = []
+        for timeframe in timeframes:
+            if not can_derive(timeframe, base_timeframe):
+                raise ValueError(f"{timeframe} no se puede derivar de {base_timeframe}")
+            if timeframe not in self.timeframes:
+                self.timeframes.append(timeframe)
+
+        self._max_bars = {tf: int(max_bars.get(tf, 5000) if isinstance(max_bars, dict) else max_bars)
+                          for tf in self.timeframes}
+        self._base_ns = timeframe_ns(base_timeframe)
+        self._closed: Dict[str, List[pd.DataFrame]] = {tf: [] for tf in self.timeframes}
+        self._closed_len: Dict[str, int] = {tf: 0 for tf in self.timeframes}
+        self._forming: Dict[str, Optional[pd.DataFrame]] = {tf: None for tf in self.timeframes}
+        self._partial_head: Dict[str, Optional[pd.Timestamp]] = {tf: None for tf in self.timeframes}
+        self._pending: Optional[pd.DataFrame] = None
+        self._last_base_ns: Optional[int] = None
+        self._last_base_time: Optional[pd.Timestamp] = None
+
+        self.stats = {'updates': 0, 'base_bars': 0, 'closed_bars': {tf: 0 for tf in self.timeframes}}
+
+    # ===============================
+    # ACTUALIZACIÓN
+    # ===============================
+
+    @property
+    def last_base_time(self) -> Optional[pd.Timestamp]:
+        """Timestamp de la última vela base cerrada procesada"""
+        return self._last_base_time
+
+    def update(self, bars: pd.DataFrame, forming: Optional[pd.DataFrame] = None) -> Dict[str, int]:
+        """
+        📥 Agrega velas base cerradas nuevas
+
+        Args:
+            bars: Velas base cerradas (las ya procesadas se ignoran)
+            forming: Vela base aún abierta (opcional); sólo se usa en
+                frame(include_forming=True) y se reemplaza en cada update
+
+        Returns:
+            Dict timeframe -> velas superiores cerradas en esta llamada
+        """
+        closed_now = {tf: 0 for tf in self.timeframes}
+        frame = _prepare(bars) if bars is not None and len(bars) else None
+        if frame is not None and self._last_base_ns is not None:
+            frame = frame[_utc_ns(frame.index) > self._last_base_ns]
+
+        if frame is not None and len(frame):
+            first_ns = int(_utc_ns(frame.index[:1])[0])
+            last_ns = int(_utc_ns(frame.index[-1:])[0])
+            for timeframe in self.timeframes:
+                closed_now[timeframe] = self._update_timeframe(timeframe, frame, first_ns, last_ns)
+            self._last_base_ns = last_ns
+            self._last_base_time = frame.index[-1]
+            self.stats['base_bars'] += len(frame)
+            self.stats['updates'] += 1
+
+        self._pending = None
+        if forming is not None and len(forming):
+            pending = _prepare(forming).iloc[-1:]
+            if self._last_base_ns is None or _utc_ns(pending.index)[0] > self._last_base_ns:
+                self._pending = pending
+        return closed_now
+
+    def _update_timeframe(self, timeframe: str, frame: pd.DataFrame, first_ns: int, last_ns: int) -> int:
+        groups = _aggregate_prepared(frame, timeframe, self.broker_timezone)
+        closed: List[pd.DataFrame] = []
+
+        forming = self._forming[timeframe]
+        if forming is not None:
+            if forming.index[0] == groups.index[0]:
+                groups = pd.concat([_merge_bars(forming, groups.iloc[:1]), groups.iloc[1:]])
+            else:
+                closed.append(forming)
+        elif self._closed_len[timeframe] == 0 and self._partial_head[timeframe] is None:
+            head_bucket = bucket_starts(frame.index[:1], timeframe, self.broker_timezone)[0]
+            if first_ns != head_bucket:
+                self._partial_head[timeframe] = groups.index[0]
+
+        last_bucket = bucket_starts(frame.index[-1:], timeframe, self.broker_timezone)[0]
+        if last_ns + self._base_ns >= last_bucket + timeframe_ns(timeframe):
+            closed.append(groups)
+            self._forming[timeframe] = None
+        else:
+            closed.append(groups.iloc[:-1])
+            self._forming[timeframe] = groups.iloc[-1:]
+
+        count = sum(len(part) for part in closed)
+        if count:
+            self._closed[timeframe].extend(part for part in closed if len(part))
+            self._closed_len[timeframe] += count
+            self.stats['closed_bars'][timeframe] += count
+            if self._closed_len[timeframe] > self._max_bars[timeframe] or len(self._closed[timeframe]) > 64:
+                self._compact(timeframe)
+        return count
+
+    def _compact(self, timeframe: str) -> pd.DataFrame:
+        chunks = self._closed[timeframe]
+        merged = chunks[0] if len(chunks) == 1 else pd.concat(chunks)
+        merged = merged.iloc[-self._max_bars[timeframe]:]
+        self._closed[timeframe] = [merged]
+        self._closed_len[timeframe] = len(merged)
+        return merged
+
+    # ===============================
+    # CONSULTAS
+    # ===============================
+
+    def frame(self, timeframe: str, include_forming: bool = False) -> pd.DataFrame:
+        """📊 Velas cerradas de `timeframe` (más la vela en formación si se pide)"""
+        if timeframe not in self._closed:
+            raise KeyError(f"Timeframe no mantenido: {timeframe}")
+        closed = self._compact(timeframe) if self._closed[timeframe] else None
+        parts = [closed] if closed is not None else []
+
+        if include_forming:
+            forming = self._forming[timeframe]
+            if self._pending is not None:
+                pending = _aggregate_prepared(self._pending, timeframe, self.broker_timezone)
+                if forming is not None and forming.index[0] == pending.index[0]:
+                    forming = _merge_bars(forming, pending)
+                else:
+                    parts.extend([forming] if forming is not None else [])
+                    forming = pending
+            if forming is not None:
+                parts.append(forming)
+
+        if not parts:
+            return pd.DataFrame(columns=list(AGGREGATIONS))
+        return parts[0].copy() if len(parts) == 1 else pd.concat(parts)
+
+    def frames(self, include_forming: bool = False) -> Dict[str, pd.DataFrame]:
+        """📚 Todas las temporalidades mantenidas"""
+        return {tf: self.frame(tf, include_forming) for tf in self.timeframes}
+
+    def bar_count(self, timeframe: str) -> int:
+        return self._closed_len[timeframe]
+
+    def verify(self, timeframe: str, broker: pd.DataFrame, **kwargs) -> Dict[str, Any]:
+        """🔍 compare_with_broker() de las velas cerradas (sin la primera si quedó parcial)"""
+        derived = self.frame(timeframe)
+        head = self._partial_head[timeframe]
+        if head is not None and len(derived) and derived.index[0] == head:
+            derived = derived.iloc[1:]
+        return compare_with_broker(derived, broker, **kwargs)
+
+    def get_status(self) -> Dict[str, Any]:
+        """📊 Estado del builder"""
+        return {
+            'base_timeframe': self.base_timeframe,
+            'broker_timezone': self.broker_timezone,
+            'last_base_time': str(self._last_base_time) if self._last_base_time is not None else None,
+            'bars': dict(self._closed_len),
+            'forming': {tf: self._forming[tf] is not None for tf in self.timeframes},
+            'stats': {'updates': self.stats['updates'], 'base_bars': self.stats['base_bars'],
+                      'closed_bars': dict(self.stats['closed_bars'])},
+        }
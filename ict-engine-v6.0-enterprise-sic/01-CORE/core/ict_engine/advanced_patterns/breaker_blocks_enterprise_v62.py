@@ -48,6 +48,8 @@ import weakref
 # 2. Terceros
 import numpy as np
 import pandas as pd
+from utils.hot_path_profiler import profile_hot_path
+from utils.columnar_store import register_record_type, store_for
 
 # 3. Internos - SIC/SLUC Enterprise v6.2
 try:
@@ -249,13 +251,16 @@ class BreakerBlockSignalV62:
         }
 
 
+register_record_type(BreakerBlockSignalV62, text_fields=('narrative', 'original_order_block_id', 'analysis_id'))
+
+
 class BreakerBlockLifecycleV62:
     """🔄 Enhanced Breaker Block lifecycle management v6.2"""
     
     def __init__(self, logger: Optional[Any] = None):
         self.logger = logger
         self.active_breakers: Dict[str, BreakerBlockSignalV62] = {}
-        self.breaker_history: List[BreakerBlockSignalV62] = []
+        self.breaker_history = store_for(BreakerBlockSignalV62)  # Columnar: breakers cerrados
         
     def track_breaker_formation(self, 
                                order_block: Dict,
@@ -335,6 +340,8 @@ class BreakerBlockLifecycleV62:
                 breaker.failed_tests += 1
                 if breaker.failed_tests >= 3:  # 3 fallos = breaker failed
                     breaker.status = BreakerStatus.FAILED
+                    # Archivar: sale del tracking activo al histórico compacto
+                    self.breaker_history.append(self.active_breakers.pop(breaker_id))
                     
             if self.logger:
                 self.logger.log_debug(f"Breaker test actualizado: {breaker_id} - {'exitoso' if test_successful else 'fallido'}")
@@ -509,6 +516,7 @@ class BreakerBlockDetectorEnterprise:
         
         self._log_info("✅ Breaker Blocks Detector Enterprise v6.0 inicializado correctamente")
 
+    @profile_hot_path(rows='data')
     def detect_breaker_blocks_enterprise(self,
                                        data: pd.DataFrame,
                                        order_blocks: List[Dict],
@@ -27,6 +27,11 @@ from dataclasses import dataclass
 from enum import Enum
 import numpy as np
 
+from core.analysis.equal_levels_engine import EqualLevelsEngine, EqualLevelPool
+from core.analysis.session_calendar import get_session_calendar
+from utils.hot_path_profiler import profile_hot_path
+from utils.columnar_store import register_record_type, store_for
+
 # 🏗️ ENTERPRISE ARCHITECTURE v6.0
 try:
     from core.smart_trading_logger import SmartTradingLogger
@@ -116,6 +121,9 @@ class LiquidityPool:
     successful_tests: int = 0
 
 
+register_record_type(LiquidityPool)
+
+
 @dataclass  
 class LiquiditySweepSignal:
     """🌊 Señal de Liquidity Sweep Enterprise"""
@@ -205,7 +213,7 @@ class LiquidityAnalyzerEnterprise:
         }
         
         # 📊 ESTADO INTERNO
-        self.detected_pools: List[LiquidityPool] = []
+        self.detected_pools = store_for(LiquidityPool)  # Columnar (utils.columnar_store)
         self.detected_sweeps: List[LiquiditySweepSignal] = []
         self.processing_stats = {
             'total_pools_detected': 0,
@@ -216,8 +224,20 @@ class LiquidityAnalyzerEnterprise:
             'successful_sweeps': 0
         }
         
+        # 💧 Motor compartido de Equal Highs/Lows (un pool único por nivel)
+        self._equal_levels_engine = EqualLevelsEngine(
+            tolerance=self.config['equal_highs_tolerance'],
+            min_touches=self.config['minimum_touches'],
+            max_bar_distance=20  # Ventana de búsqueda ±20 velas del detector original
+        )
+        
+        # 🗓️ Calendario de sesiones compartido (etiquetas por vela cacheadas por frame);
+        # las velas vienen de MT5 con índice naive en hora del servidor del broker
+        self._session_calendar = get_session_calendar('broker')
+        
         self._log_info("✅ Liquidity Analyzer Enterprise v6.0 inicializado correctamente")
 
+    @profile_hot_path(rows='data_m15')
     def detect_liquidity_pools_enterprise(self,
                                          data_h4: pd.DataFrame,
                                          data_h1: pd.DataFrame,
@@ -294,6 +314,7 @@ class LiquidityAnalyzerEnterprise:
             self._log_error(f"❌ Error en detección de Liquidity Pools: {e}")
             return []
 
+    @profile_hot_path(rows='data')
     def detect_liquidity_sweeps_enterprise(self,
                                           data: pd.DataFrame,
                                           liquidity_pools: List[LiquidityPool],
@@ -375,47 +396,15 @@ class LiquidityAnalyzerEnterprise:
                                       symbol: str) -> List[LiquidityPool]:
         """🔍 Detectar Equal Highs enterprise"""
         try:
-            pools = []
             if len(data) < 20:
-                return pools
-            
-            tolerance = self.config['equal_highs_tolerance']
-            min_touches = self.config['minimum_touches']
-            
-            # Rolling max para encontrar highs locales
-            highs = data['high'].rolling(window=5, center=True).max()
+                return []
             
-            for i in range(10, len(data) - 10):
-                current_high = highs.iloc[i]
-                
-                # Buscar highs similares en ventana de búsqueda
-                search_window = highs.iloc[max(0, i-20):min(len(highs), i+20)]
-                equal_highs = search_window[abs(search_window - current_high) <= tolerance]
-                
-                if len(equal_highs) >= min_touches:
-                    # Calcular métricas del pool
-                    strength = min(len(equal_highs) / 5.0, 1.0)
-                    touches = len(equal_highs)
-                    
-                    pool = LiquidityPool(
-                        pool_type=LiquidityPoolType.EQUAL_HIGHS,
-                        price_level=current_high,
-                        price_zone=(current_high - tolerance, current_high + tolerance),
-                        strength=strength,
-                        liquidity_depth=self._estimate_liquidity_depth(touches, strength),
-                        touches=touches,
-                        institutional_interest=0.0,  # Se calculará después
-                        smart_money_bias=-0.6,       # Equal highs = bearish bias
-                        volume_evidence=0.5,         # Se validará después
-                        timestamp=data.index[i] if hasattr(data.index[i], 'hour') else datetime.now(),
-                        session_origin=self._identify_session_origin(data.index[i] if hasattr(data.index[i], 'hour') else datetime.now()),
-                        timeframe_origin=timeframe,
-                        expected_reaction="bearish_reaction",
-                        invalidation_price=current_high + self.config['pool_invalidation_distance']
-                    )
-                    
-                    pools.append(pool)
-                    self._log_debug(f"Equal Highs detectado: {current_high:.5f} con {touches} touches")
+            levels = self._equal_levels_engine.find_equal_highs(
+                data['high'].to_numpy(),
+                tolerance=self.config['equal_highs_tolerance'],
+                min_touches=self.config['minimum_touches']
+            )
+            pools = [self._create_equal_level_pool(level, data, timeframe) for level in levels]
             
             self.processing_stats['equal_highs_found'] += len(pools)
             return pools
@@ -430,47 +419,15 @@ class LiquidityAnalyzerEnterprise:
                                      symbol: str) -> List[LiquidityPool]:
         """🔍 Detectar Equal Lows enterprise"""
         try:
-            pools = []
             if len(data) < 20:
-                return pools
-            
-            tolerance = self.config['equal_lows_tolerance']
-            min_touches = self.config['minimum_touches']
-            
-            # Rolling min para encontrar lows locales
-            lows = data['low'].rolling(window=5, center=True).min()
+                return []
             
-            for i in range(10, len(data) - 10):
-                current_low = lows.iloc[i]
-                
-                # Buscar lows similares en ventana de búsqueda
-                search_window = lows.iloc[max(0, i-20):min(len(lows), i+20)]
-                equal_lows = search_window[abs(search_window - current_low) <= tolerance]
-                
-                if len(equal_lows) >= min_touches:
-                    # Calcular métricas del pool
-                    strength = min(len(equal_lows) / 5.0, 1.0)
-                    touches = len(equal_lows)
-                    
-                    pool = LiquidityPool(
-                        pool_type=LiquidityPoolType.EQUAL_LOWS,
-                        price_level=current_low,
-                        price_zone=(current_low - tolerance, current_low + tolerance),
-                        strength=strength,
-                        liquidity_depth=self._estimate_liquidity_depth(touches, strength),
-                        touches=touches,
-                        institutional_interest=0.0,  # Se calculará después
-                        smart_money_bias=0.6,        # Equal lows = bullish bias
-                        volume_evidence=0.5,         # Se validará después
-                        timestamp=data.index[i] if hasattr(data.index[i], 'hour') else datetime.now(),
-                        session_origin=self._identify_session_origin(data.index[i] if hasattr(data.index[i], 'hour') else datetime.now()),
-                        timeframe_origin=timeframe,
-                        expected_reaction="bullish_reaction",
-                        invalidation_price=current_low - self.config['pool_invalidation_distance']
-                    )
-                    
-                    pools.append(pool)
-                    self._log_debug(f"Equal Lows detectado: {current_low:.5f} con {touches} touches")
+            levels = self._equal_levels_engine.find_equal_lows(
+                data['low'].to_numpy(),
+                tolerance=self.config['equal_lows_tolerance'],
+                min_touches=self.config['minimum_touches']
+            )
+            pools = [self._create_equal_level_pool(level, data, timeframe) for level in levels]
             
             self.processing_stats['equal_lows_found'] += len(pools)
             return pools
@@ -479,6 +436,46 @@ class LiquidityAnalyzerEnterprise:
             self._log_error(f"Error detectando equal lows: {e}")
             return []
 
+    def _create_equal_level_pool(self, 
+                                 level: EqualLevelPool, 
+                                 data: pd.DataFrame, 
+                                 timeframe: str) -> LiquidityPool:
+        """💧 Convertir un nivel del motor compartido en LiquidityPool"""
+        is_high = level.side == 'HIGH'
+        tolerance = self.config['equal_highs_tolerance' if is_high else 'equal_lows_tolerance']
+        strength = min(level.touches / 5.0, 1.0)
+        last_touch = data.index[level.last_index]
+        if hasattr(last_touch, 'hour'):
+            timestamp = last_touch
+            session_origin = self._session_label_to_origin(
+                self._session_calendar.label_at(data, level.last_index)['session']
+            )
+        else:
+            timestamp = datetime.now()
+            session_origin = self._identify_session_origin(timestamp)
+        invalidation_distance = self.config['pool_invalidation_distance']
+        
+        self._log_debug(f"Equal {'Highs' if is_high else 'Lows'} detectado: "
+                        f"{level.level:.5f} con {level.touches} touches")
+        
+        return LiquidityPool(
+            pool_type=LiquidityPoolType.EQUAL_HIGHS if is_high else LiquidityPoolType.EQUAL_LOWS,
+            price_level=level.level,
+            price_zone=(level.bottom - tolerance, level.top + tolerance),
+            strength=strength,
+            liquidity_depth=self._estimate_liquidity_depth(level.touches, strength),
+            touches=level.touches,
+            institutional_interest=0.0,                  # Se calculará después
+            smart_money_bias=-0.6 if is_high else 0.6,   # Equal highs = bearish bias, equal lows = bullish
+            volume_evidence=0.5,                         # Se validará después
+            timestamp=timestamp,
+            session_origin=session_origin,
+            timeframe_origin=timeframe,
+            expected_reaction="bearish_reaction" if is_high else "bullish_reaction",
+            invalidation_price=(level.level + invalidation_distance if is_high
+                                else level.level - invalidation_distance)
+        )
+
     # ===========================================
     # 🎯 OLD HIGHS/LOWS & DAILY LEVELS
     # ===========================================
@@ -897,16 +894,15 @@ class LiquidityAnalyzerEnterprise:
     def _identify_session_origin(self, timestamp: datetime) -> str:
         """🏛️ Identificar sesión de origen"""
         try:
-            hour = timestamp.hour
-            if 8 <= hour <= 17:
-                return "London"
-            elif 13 <= hour <= 22:
-                return "NY"
-            else:
-                return "Asian"
-        except:
+            return self._session_label_to_origin(self._session_calendar.label_timestamp(timestamp)['session'])
+        except Exception:
             return "unknown"
 
+    @staticmethod
+    def _session_label_to_origin(session: str) -> str:
+        """🏛️ Etiqueta del calendario -> nombre de sesión del pool"""
+        return {'LONDON': "London", 'NEW_YORK': "NY"}.get(session, "Asian")
+
     def _get_current_session(self) -> str:
         """🏛️ Obtener sesión actual"""
         return self._identify_session_origin(datetime.now())
@@ -1049,7 +1045,7 @@ class LiquidityAnalyzerEnterprise:
             
             # Limitar memoria
             if len(self.detected_pools) > 50:
-                self.detected_pools = self.detected_pools[-50:]
+                self.detected_pools = self.detected_pools.keep_last(50)
                 
         except Exception as e:
             self._log_error(f"Error storing pools: {e}")
@@ -252,6 +252,7 @@ class MultiPatternConfluenceEngine:
         
         # 📊 ESTADO INTERNO  
         self.detected_signals: List[ConfluenceTradeSignal] = []
+        self._analysis_pool = None  # ShardedAnalysisPool (se crea en el primer escaneo multi-símbolo)
         self.confluence_stats = {
             'total_signals_generated': 0,
             'high_confluence_signals': 0,
@@ -330,6 +331,51 @@ class MultiPatternConfluenceEngine:
             self._log_error(f"❌ Error en análisis de confluencia: {e}")
             return []
 
+    def analyze_confluence_multi_symbol(self,
+                                        frames_by_symbol: Dict[str, Dict[str, pd.DataFrame]],
+                                        current_prices: Optional[Dict[str, float]] = None,
+                                        workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        🧮 CONFLUENCIA MULTI-SÍMBOLO EN PROCESOS WORKER
+
+        Cada símbolo es un shard: sus velas H4/H1/M15/M5 se colocan una vez en
+        memoria compartida y un worker (con su propio motor, misma config y
+        pesos) ejecuta analyze_confluence_enterprise. Vuelven registros
+        compactos de señal; no se guardan en la memoria enterprise.
+
+        Args:
+            frames_by_symbol: {símbolo: {'H4': df, 'H1': df, 'M15': df, 'M5': df}}
+            current_prices: Precio actual por símbolo (default: último cierre)
+            workers: Procesos worker (None = núcleos; sólo al crear el pool)
+
+        Returns:
+            Dict con 'signals' {símbolo: [señal compacta]}, 'errors' y 'elapsed'
+        """
+        try:
+            if self._analysis_pool is None:
+                from core.analysis.sharded_analysis import ShardedAnalysisPool
+                self._analysis_pool = ShardedAnalysisPool(workers=workers)
+
+            scan = self._analysis_pool.scan(frames_by_symbol, tasks=('confluence',), params={
+                'current_prices': dict(current_prices or {}),
+                'confluence_config': dict(self.config),
+                'confluence_weights': dict(self.confluence_weights),
+            })
+            signals = {symbol: results.get('confluence', []) for symbol, results in scan['symbol_results'].items()}
+            self._log_info(f"🧮 Confluencia multi-símbolo: {sum(len(s) for s in signals.values())} señales "
+                           f"en {len(signals)} símbolos ({scan['workers']} workers, {scan['elapsed']:.2f}s)")
+            return {'signals': signals, 'errors': scan['errors'], 'elapsed': scan['elapsed']}
+
+        except Exception as e:
+            self._log_error(f"❌ Error en confluencia multi-símbolo: {e}")
+            return {'signals': {}, 'errors': [{'error': str(e)}], 'elapsed': 0.0}
+
+    def close_analysis_pool(self) -> None:
+        """🧮 Detiene los workers de analyze_confluence_multi_symbol"""
+        if self._analysis_pool is not None:
+            self._analysis_pool.close()
+            self._analysis_pool = None
+
     def _detect_all_patterns_enterprise(self,
                                        data_h4: pd.DataFrame,
                                        data_h1: pd.DataFrame,
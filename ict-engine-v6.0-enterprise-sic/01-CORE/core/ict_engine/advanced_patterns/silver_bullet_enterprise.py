@@ -25,6 +25,7 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from enum import Enum
 import numpy as np
+from utils.hot_path_profiler import profile_hot_path
 
 # 🏗️ ENTERPRISE ARCHITECTURE v6.0
 try:
@@ -160,6 +161,7 @@ class SilverBulletDetectorEnterprise:
         
         self._log_info("✅ Silver Bullet Detector Enterprise v6.0 inicializado correctamente")
 
+    @profile_hot_path(rows='data')
     def detect_silver_bullet_patterns(self, 
                                      data: pd.DataFrame,
                                      symbol: str,
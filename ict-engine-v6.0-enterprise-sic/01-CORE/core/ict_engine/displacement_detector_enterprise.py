@@ -15,11 +15,16 @@ Displacement Detection ICT:
 
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from datetime import datetime, timedelta
 from typing import List, Dict, Optional, Tuple, Any
 from dataclasses import dataclass, field
 import logging
 
+from ..analysis.session_calendar import get_session_calendar
+from utils.hot_path_profiler import profile_hot_path
+from utils.columnar_store import register_record_type
+
 try:
     from ..smart_trading_logger import log_trading_decision_smart_v6  # type: ignore
     from ..analysis.unified_memory_system import UnifiedMemorySystem
@@ -60,6 +65,9 @@ class DisplacementSignal:
     fair_value_gap_created: bool = False
     market_structure_shift: bool = False
 
+
+register_record_type(DisplacementSignal)
+
 class DisplacementDetectorEnterprise:
     """🎯 Displacement Detector Enterprise con ICT Smart Money Concepts v6.0"""
     
@@ -82,6 +90,7 @@ class DisplacementDetectorEnterprise:
         self.max_time_window = 240  # 4 hours in minutes
         self.institutional_volume_threshold = 1.5  # Volume spike multiplier
         self.momentum_threshold = 0.7  # Minimum momentum score
+        self.session_calendar = get_session_calendar('broker')  # Velas MT5: hora del broker
         
         log_trading_decision_smart_v6(
             "DISPLACEMENT_DETECTOR_INIT", {
@@ -92,6 +101,7 @@ class DisplacementDetectorEnterprise:
             }, symbol="SYSTEM"
         )
     
+    @profile_hot_path(rows='data')
     def detect_displacement(self, data: pd.DataFrame, symbol: str = "EURUSD", 
                           timeframe: str = "M15") -> List[DisplacementSignal]:
         """🎯 Detectar Displacement con criterios ICT enterprise"""
@@ -111,35 +121,35 @@ class DisplacementDetectorEnterprise:
             self.logger.warning("Insufficient data for displacement detection")
             return displacement_signals
         
-        # Análisis ventana deslizante
+        # Análisis ventana deslizante vectorizado: todas las ventanas en una pasada
         window_size = min(16, len(data) // 4)  # Adaptive window
+        features = self._compute_window_features(data, window_size)
         
-        for i in range(window_size, len(data) - 1):
-            # Ventana de análisis para displacement
-            analysis_window = data.iloc[i-window_size:i+1]
+        hits = np.flatnonzero(
+            (features['displacement_pips'] >= self.min_displacement_pips) &
+            (features['momentum_score'] >= self.momentum_threshold)
+        )
+        
+        # Sólo los índices con displacement se materializan en señales
+        for i in hits[hits < len(data) - 1]:
+            displacement_signal = self._build_displacement_signal(features, int(i), timeframe)
             
-            # Core displacement detection
-            displacement_signal = self._analyze_displacement_window(
-                analysis_window, symbol, timeframe, i
-            )
+            # Enterprise enhancements
+            displacement_signal = self._enhance_with_memory(displacement_signal, symbol)
+            displacement_signal = self._enhance_with_sic_stats(displacement_signal, features, int(i))
+            displacement_signal = self._enhance_with_market_structure(displacement_signal, features, int(i))
+            
+            displacement_signals.append(displacement_signal)
             
-            if displacement_signal:
-                # Enterprise enhancements
-                displacement_signal = self._enhance_with_memory(displacement_signal, symbol)
-                displacement_signal = self._enhance_with_sic_stats(displacement_signal, analysis_window)
-                displacement_signal = self._enhance_with_market_structure(displacement_signal, analysis_window)
-                
-                displacement_signals.append(displacement_signal)
-                
-                log_trading_decision_smart_v6(
-                    "DISPLACEMENT_DETECTED", {
-                        "displacement_type": displacement_signal.displacement_type,
-                        "displacement_pips": displacement_signal.displacement_pips,
-                        "momentum_score": displacement_signal.momentum_score,
-                        "institutional_signature": displacement_signal.institutional_signature,
-                        "memory_enhanced": displacement_signal.memory_enhanced
-                    }, symbol=symbol
-                )
+            log_trading_decision_smart_v6(
+                "DISPLACEMENT_DETECTED", {
+                    "displacement_type": displacement_signal.displacement_type,
+                    "displacement_pips": displacement_signal.displacement_pips,
+                    "momentum_score": displacement_signal.momentum_score,
+                    "institutional_signature": displacement_signal.institutional_signature,
+                    "memory_enhanced": displacement_signal.memory_enhanced
+                }, symbol=symbol
+            )
         
         log_trading_decision_smart_v6(
             "DISPLACEMENT_DETECTION_COMPLETE", {
@@ -152,9 +162,163 @@ class DisplacementDetectorEnterprise:
         
         return displacement_signals
     
+    def _compute_window_features(self, data: pd.DataFrame, window_size: int) -> Dict[str, Any]:
+        """
+        🧮 Métricas de todas las ventanas [i-window_size, i] en una sola pasada
+        
+        Equivalente a aplicar _analyze_displacement_window y los helpers de
+        enhancement sobre cada ventana, pero con vistas strided sobre arrays
+        numpy en lugar de un data.iloc por vela. Cada array tiene len(data)
+        elementos y está alineado con el índice final de la ventana; las
+        posiciones sin ventana completa quedan en NaN/False.
+        """
+        n = len(data)
+        w = window_size
+        
+        o = data['open'].to_numpy(dtype=float)
+        h = data['high'].to_numpy(dtype=float)
+        l = data['low'].to_numpy(dtype=float)
+        c = data['close'].to_numpy(dtype=float)
+        
+        def windows(values: np.ndarray, length: int = w + 1) -> np.ndarray:
+            # Fila r = ventana que termina en r + length - 1
+            return sliding_window_view(values, length)
+        
+        def aligned(values: np.ndarray, fill: Any = np.nan) -> np.ndarray:
+            # Array de len(data) con el valor de cada ventana en su índice final
+            out = np.full(n, fill, dtype=type(fill))
+            out[w:] = values
+            return out
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            # Movimiento de la ventana: open de la primera vela -> close de la última
+            price_movement = c[w:] - o[:n - w]
+            
+            # Momentum: velocity + volume score + consistency
+            price_changes = windows(np.diff(c), w)
+            close_std = windows(c).std(axis=1, ddof=1)
+            velocity = np.where(close_std > 0,
+                                np.abs(price_changes.mean(axis=1)) / close_std, 0.0)
+            
+            momentum_volume = self._volume_array(data, ('tick_volume', 'volume'))
+            if momentum_volume is not None:
+                vol_windows = windows(momentum_volume)
+                vol_avg, vol_max = vol_windows.mean(axis=1), vol_windows.max(axis=1)
+                volume_score = np.where(vol_avg > 0, np.minimum(1.0, vol_max / vol_avg), 0.5)
+                volume_spike = vol_max > (vol_avg * self.institutional_volume_threshold)
+            else:
+                volume_score = np.full(n - w, 0.5)
+                volume_spike = np.ones(n - w, dtype=bool)
+            
+            consistency = np.where(price_movement > 0,
+                                   (price_changes > 0).sum(axis=1),
+                                   (price_changes < 0).sum(axis=1)) / w
+            momentum_score = np.minimum(1.0, velocity * 0.4 + volume_score * 0.3 + consistency * 0.3)
+            
+            # Institutional signature: vela grande o mechas mayores que el cuerpo
+            candle_sizes = np.abs(c - o)
+            upper_wicks = h - np.maximum(o, c)
+            lower_wicks = np.minimum(o, c) - l
+            size_windows = windows(candle_sizes)
+            large_candle = size_windows.max(axis=1) > size_windows.mean(axis=1) * 2.0
+            significant_wicks = windows((upper_wicks > candle_sizes) | (lower_wicks > candle_sizes)).any(axis=1)
+            institutional_signature = volume_spike & (large_candle | significant_wicks)
+            
+            # Volumen "volume" para confluence, volume profile y order flow
+            volume = self._volume_array(data, ('volume',))
+            if volume is not None:
+                volume_windows = windows(volume)
+                volume_avg = volume_windows.mean(axis=1)
+                institutional_volume = volume_windows.max(axis=1) > volume_avg * 1.5
+            else:
+                volume_avg = np.full(n - w, np.nan)
+                institutional_volume = np.zeros(n - w, dtype=bool)
+            
+            # Gaps (FVG potencial): vela k con low/high fuera de ambas vecinas,
+            # sólo velas interiores de la ventana (i-w+1 .. i-1)
+            gap = np.zeros(n, dtype=bool)
+            gap[1:-1] = (((l[1:-1] > h[:-2]) & (l[1:-1] > h[2:])) |
+                         ((h[1:-1] < l[:-2]) & (h[1:-1] < l[2:])))
+            fair_value_gaps = windows(gap, w - 1).any(axis=1)[1:n - w + 1]
+            
+            # Volatility percentile: true range actual vs medio de la ventana
+            true_range = np.maximum.reduce([h[1:] - l[1:],
+                                            np.abs(h[1:] - c[:-1]),
+                                            np.abs(l[1:] - c[:-1])])
+            tr_avg = windows(true_range, w).mean(axis=1)
+            volatility_percentile = np.where(tr_avg > 0,
+                                             np.minimum(1.0, true_range[w - 1:] / tr_avg), 0.5)
+            
+            # Liquidity cleared: mechas relativas al cuerpo, promedio de la ventana
+            wick_ratio = (upper_wicks + lower_wicks) / np.maximum(candle_sizes, 0.0001)
+            liquidity_cleared = windows(wick_ratio).mean(axis=1)
+        
+        # Etiquetas de sesión/killzone por vela (cacheadas por frame en el calendario)
+        session_labels = (self.session_calendar.annotate(data)
+                          if isinstance(data.index, pd.DatetimeIndex) else None)
+        
+        return {
+            'window_size': w,
+            'index': data.index,
+            'session_labels': session_labels,
+            'open': o, 'high': h, 'low': l, 'close': c,
+            'volume': volume,
+            'price_movement': aligned(price_movement),
+            'displacement_pips': aligned(np.abs(price_movement) * 10000),  # Para EURUSD
+            'momentum_score': aligned(momentum_score),
+            'institutional_signature': aligned(institutional_signature, False),
+            'institutional_volume': aligned(institutional_volume, False),
+            'institutional_candle': aligned(large_candle, False),
+            'fair_value_gaps': aligned(fair_value_gaps, False),
+            'volume_avg': aligned(volume_avg),
+            'volatility_percentile': aligned(volatility_percentile),
+            'liquidity_cleared': aligned(liquidity_cleared),
+        }
+    
+    @staticmethod
+    def _volume_array(data: pd.DataFrame, columns: Tuple[str, ...]) -> Optional[np.ndarray]:
+        """📊 Primera columna de volumen disponible como array float"""
+        for column in columns:
+            if column in data.columns:
+                return data[column].to_numpy(dtype=float)
+        return None
+    
+    def _build_displacement_signal(self, features: Dict[str, Any], i: int,
+                                   timeframe: str) -> DisplacementSignal:
+        """📈 Materializar la señal de la ventana que termina en i"""
+        
+        start_price = float(features['open'][i - features['window_size']])
+        end_price = float(features['close'][i])
+        price_movement = end_price - start_price
+        timestamp = features['index'][i]
+        
+        # Confluence factors (mismo orden que _analyze_confluence_factors)
+        confluence_factors = ["displacement_momentum"]
+        if features['institutional_volume'][i]:
+            confluence_factors.append("institutional_volume")
+        if features['institutional_candle'][i]:
+            confluence_factors.append("institutional_candle")
+        if getattr(timestamp, 'hour', None) in [8, 9, 15, 16]:  # London/NY killzones
+            confluence_factors.append("killzone_timing")
+        if features['fair_value_gaps'][i]:
+            confluence_factors.append("fair_value_gaps")
+        
+        return DisplacementSignal(
+            displacement_type="BULLISH_DISPLACEMENT" if price_movement > 0 else "BEARISH_DISPLACEMENT",
+            start_price=start_price,
+            end_price=end_price,
+            displacement_pips=float(features['displacement_pips'][i]),
+            timeframe_detected=timeframe,
+            timestamp=timestamp,
+            momentum_score=float(features['momentum_score'][i]),
+            institutional_signature=bool(features['institutional_signature'][i]),
+            target_estimation=self._calculate_ict_target(start_price, end_price, price_movement),
+            confluence_factors=confluence_factors
+        )
+    
     def _analyze_displacement_window(self, window: pd.DataFrame, symbol: str, 
                                    timeframe: str, index: int) -> Optional[DisplacementSignal]:
-        """📊 Analizar ventana para displacement ICT"""
+        """📊 Analizar ventana para displacement ICT (análisis puntual de una sola ventana)"""
         
         if len(window) < 5:
             return None
@@ -351,14 +515,15 @@ class DisplacementDetectorEnterprise:
         
         return signal
     
-    def _enhance_with_sic_stats(self, signal: DisplacementSignal, window: pd.DataFrame) -> DisplacementSignal:
+    def _enhance_with_sic_stats(self, signal: DisplacementSignal, features: Dict[str, Any],
+                                i: int) -> DisplacementSignal:
         """📊 Enhance with SIC v3.1 statistics"""
         
         # Calculate SIC statistics
         signal.sic_stats = {
-            "volatility_percentile": self._calculate_volatility_percentile(window),
-            "volume_profile": self._analyze_volume_profile(window),
-            "market_session": self._identify_market_session(signal.timestamp),
+            "volatility_percentile": float(features['volatility_percentile'][i]),
+            "volume_profile": self._analyze_volume_profile(features, i),
+            "market_session": self._identify_market_session(features, i),
             "displacement_strength": "STRONG" if signal.displacement_pips > 75 else "MODERATE"
         }
         
@@ -366,133 +531,102 @@ class DisplacementDetectorEnterprise:
         
         return signal
     
-    def _enhance_with_market_structure(self, signal: DisplacementSignal, window: pd.DataFrame) -> DisplacementSignal:
+    def _enhance_with_market_structure(self, signal: DisplacementSignal, features: Dict[str, Any],
+                                       i: int) -> DisplacementSignal:
         """🏗️ Enhance with market structure analysis"""
+        start = i - features['window_size']
         
         # Liquidity analysis
-        signal.liquidity_cleared = self._calculate_liquidity_cleared(window)
+        signal.liquidity_cleared = float(features['liquidity_cleared'][i])
         
         # Order flow imbalance
-        signal.order_flow_imbalance = self._calculate_order_flow_imbalance(window)
+        signal.order_flow_imbalance = self._calculate_order_flow_imbalance(features, start, i)
         
         # Equal highs/lows detection
-        signal.relative_equal_highs_lows = self._detect_equal_highs_lows(window)
+        signal.relative_equal_highs_lows = self._detect_equal_highs_lows(
+            features['high'][start:i + 1], features['low'][start:i + 1]
+        )
         
         # FVG creation
-        signal.fair_value_gap_created = self._detect_potential_gaps(window)
+        signal.fair_value_gap_created = bool(features['fair_value_gaps'][i])
         
         # Market structure shift
-        signal.market_structure_shift = self._detect_structure_shift(window)
+        signal.market_structure_shift = self._detect_structure_shift(features, start, i)
         
         return signal
     
-    def _calculate_volatility_percentile(self, window: pd.DataFrame) -> float:
-        """📈 Calculate volatility percentile"""
-        true_ranges = []
-        for i in range(1, len(window)):
-            tr = max(
-                window.iloc[i]['high'] - window.iloc[i]['low'],
-                abs(window.iloc[i]['high'] - window.iloc[i-1]['close']),
-                abs(window.iloc[i]['low'] - window.iloc[i-1]['close'])
-            )
-            true_ranges.append(tr)
-        
-        if not true_ranges:
-            return 0.5
-        
-        current_tr = true_ranges[-1]
-        avg_tr = sum(true_ranges) / len(true_ranges)
-        
-        return min(1.0, current_tr / avg_tr) if avg_tr > 0 else 0.5
-    
-    def _analyze_volume_profile(self, window: pd.DataFrame) -> str:
+    def _analyze_volume_profile(self, features: Dict[str, Any], i: int) -> str:
         """📊 Analyze volume profile"""
-        volumes = window['volume'].astype(float)
-        avg_vol = volumes.mean()
+        if features['volume'] is None:
+            return "NORMAL"
         
-        if volumes[-1] > avg_vol * 2:
+        last_vol = features['volume'][i]
+        avg_vol = features['volume_avg'][i]
+        
+        if last_vol > avg_vol * 2:
             return "EXPLOSIVE"
-        elif volumes[-1] > avg_vol * 1.5:
+        elif last_vol > avg_vol * 1.5:
             return "HIGH"
-        elif volumes[-1] > avg_vol:
+        elif last_vol > avg_vol:
             return "ABOVE_AVERAGE"
         else:
             return "NORMAL"
     
-    def _identify_market_session(self, timestamp: datetime) -> str:
-        """⏰ Identify market session"""
-        hour = timestamp.hour
+    def _identify_market_session(self, features: Dict[str, Any], i: int) -> str:
+        """⏰ Identify market session (killzone de la vela según el calendario de sesiones)"""
+        labels = features.get('session_labels')
+        if labels is None:
+            return "OVERLAP_SESSION"
         
-        if 6 <= hour <= 10:
+        killzone = labels['killzone'].iat[i]
+        if killzone == 'LONDON_KILLZONE':
             return "LONDON_OPEN"
-        elif 13 <= hour <= 17:
+        elif killzone == 'NEWYORK_KILLZONE':
             return "NY_OPEN"
-        elif 21 <= hour <= 23:
+        elif killzone == 'ASIAN_KILLZONE':
             return "ASIA_OPEN"
         else:
             return "OVERLAP_SESSION"
     
-    def _calculate_liquidity_cleared(self, window: pd.DataFrame) -> float:
-        """💧 Calculate liquidity cleared estimate"""
-        # Simplified: Based on wick sizes and volume
-        total_wicks = 0
-        for i in range(len(window)):
-            candle = window.iloc[i]
-            body_size = abs(candle['close'] - candle['open'])
-            upper_wick = candle['high'] - max(candle['open'], candle['close'])
-            lower_wick = min(candle['open'], candle['close']) - candle['low']
-            total_wicks += (upper_wick + lower_wick) / max(body_size, 0.0001)
-        
-        return total_wicks / len(window)
-    
-    def _calculate_order_flow_imbalance(self, window: pd.DataFrame) -> float:
+    def _calculate_order_flow_imbalance(self, features: Dict[str, Any], start: int, end: int) -> float:
         """⚖️ Calculate order flow imbalance"""
         # Simplified: Based on price and volume relationship
-        price_changes = window['close'].diff().dropna()
-        volume_changes = window['volume'].diff().dropna()
-        
-        if len(price_changes) == 0 or len(volume_changes) == 0:
+        if features['volume'] is None or end - start < 2:
             return 0.0
         
+        price_changes = np.diff(features['close'][start:end + 1])
+        volume_changes = np.diff(features['volume'][start:end + 1])
+        
         # Correlation between price and volume changes
-        correlation = np.corrcoef(price_changes, volume_changes[:len(price_changes)])[0, 1]
-        return correlation if not np.isnan(correlation) else 0.0
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = np.corrcoef(price_changes, volume_changes)[0, 1]
+        return float(correlation) if not np.isnan(correlation) else 0.0
     
-    def _detect_equal_highs_lows(self, window: pd.DataFrame) -> bool:
+    def _detect_equal_highs_lows(self, highs: np.ndarray, lows: np.ndarray) -> bool:
         """⚖️ Detect relative equal highs/lows"""
         tolerance = 0.0005  # 5 pips tolerance
         
-        highs = window['high'].values
-        lows = window['low'].values
-        
-        # Check for equal highs
-        for i in range(len(highs) - 2):
-            for j in range(i + 2, len(highs)):
-                if abs(highs[i] - highs[j]) <= tolerance:
-                    return True
-        
-        # Check for equal lows
-        for i in range(len(lows) - 2):
-            for j in range(i + 2, len(lows)):
-                if abs(lows[i] - lows[j]) <= tolerance:
-                    return True
+        # Pares (i, j) con j >= i + 2 dentro de la tolerancia
+        for values in (highs, lows):
+            close_pairs = np.abs(values[:, None] - values[None, :]) <= tolerance
+            if np.triu(close_pairs, k=2).any():
+                return True
         
         return False
     
-    def _detect_structure_shift(self, window: pd.DataFrame) -> bool:
+    def _detect_structure_shift(self, features: Dict[str, Any], start: int, end: int) -> bool:
         """🏗️ Detect market structure shift"""
-        if len(window) < 5:
+        length = end - start + 1
+        if length < 5:
             return False
         
         # Simplified: Detect significant change in trend
-        first_half = window.iloc[:len(window)//2]
-        second_half = window.iloc[len(window)//2:]
-        
-        first_trend = first_half.iloc[-1]['close'] - first_half.iloc[0]['open']
-        second_trend = second_half.iloc[-1]['close'] - second_half.iloc[0]['open']
+        middle = start + length // 2
+        first_trend = features['close'][middle - 1] - features['open'][start]
+        second_trend = features['close'][end] - features['open'][middle]
         
         # Structure shift if trends are opposite and significant
-        return (first_trend * second_trend < 0) and (abs(first_trend) > 0.0020 or abs(second_trend) > 0.0020)
+        return bool((first_trend * second_trend < 0) and (abs(first_trend) > 0.0020 or abs(second_trend) > 0.0020))
 
 # 🚀 Enterprise factory function
 def create_displacement_detector_enterprise() -> DisplacementDetectorEnterprise:
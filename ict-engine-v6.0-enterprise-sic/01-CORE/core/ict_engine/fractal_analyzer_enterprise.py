@@ -53,6 +53,8 @@ import gc
 # ✅ REGLA #4: Sistema SIC y SLUC obligatorio
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 from core.smart_trading_logger import SmartTradingLogger
+from utils.hot_path_profiler import profile_hot_path
+from utils.columnar_store import register_record_type, store_for
 
 # ✅ REGLA #2: Integración con UnifiedMemorySystem
 try:
@@ -196,6 +198,9 @@ class SwingPointEnterprise:
     institutional_classification: str = "RETAIL"
     multi_timeframe_validation: bool = False
 
+
+register_record_type(SwingPointEnterprise)
+
 @dataclass
 class FractalRangeEnterprise:
     """Representa un rango fractal enterprise completo"""
@@ -506,7 +511,7 @@ class FractalAnalyzerEnterprise:
         
         # Estado interno
         self.current_fractal: Optional[FractalRangeEnterprise] = None
-        self.swing_history: List[SwingPointEnterprise] = []
+        self.swing_history = store_for(SwingPointEnterprise)  # Columnar (utils.columnar_store)
         self.fractal_history: List[FractalRangeEnterprise] = []
         
         # ✅ REGLA #2: Memoria persistente obligatoria
@@ -559,6 +564,7 @@ class FractalAnalyzerEnterprise:
                        circuit_breaker=self.circuit_breaker is not None,
                        intelligent_cache=self.intelligent_cache is not None)
 
+    @profile_hot_path(rows='df')
     def detect_fractal_with_memory(self, df: pd.DataFrame, current_price: float) -> Optional[FractalRangeEnterprise]:
         """
         🧠 DETECCIÓN DE FRACTALES CON MEMORIA ENTERPRISE
@@ -33,6 +33,14 @@ from datetime import datetime, timedelta
 import json
 import logging
 
+try:
+    from utils.rolling_correlation import RollingCorrelationEngine, get_correlation_engine
+    CORRELATION_ENGINE_AVAILABLE = True
+except ImportError:
+    RollingCorrelationEngine = None  # type: ignore
+    get_correlation_engine = None  # type: ignore
+    CORRELATION_ENGINE_AVAILABLE = False
+
 
 @dataclass
 class RiskMetrics:
@@ -91,7 +99,8 @@ class RiskManager:
     
     def __init__(self, max_risk_per_trade: float = 0.015, max_positions: int = 3,
                  max_drawdown_percent: float = 0.12, max_daily_loss_percent: float = 0.04,
-                 ict_config: Optional[ICTRiskConfig] = None, mode: str = 'live'):
+                 ict_config: Optional[ICTRiskConfig] = None, mode: str = 'live',
+                 correlation_engine: Optional[Any] = None):
         """
         Inicializar Risk Manager
         
@@ -102,6 +111,7 @@ class RiskManager:
             max_daily_loss_percent: Máxima pérdida diaria permitida (default 4% para live)
             ict_config: Configuración específica para ICT Engine
             mode: 'live' para trading en producción, 'test' para pruebas
+            correlation_engine: Motor de correlación rodante (default: el compartido del proceso)
         """
         self.metrics = RiskMetrics(
             max_risk_per_trade=max_risk_per_trade,
@@ -120,6 +130,9 @@ class RiskManager:
         # Track risk metrics
         self.daily_pnl_history: List[float] = []
         self.position_correlations: Dict[str, float] = {}
+        if correlation_engine is None and CORRELATION_ENGINE_AVAILABLE:
+            correlation_engine = get_correlation_engine()
+        self.correlation_engine = correlation_engine
         self.volatility_window = 20
         self.kelly_lookback = 100
         
@@ -279,15 +292,19 @@ class RiskManager:
         if not positions:
             return 0.0
         
-        # Simplified correlation calculation
-        # In a real implementation, this would use historical correlation data
         correlation_risk = 0.0
+        self.position_correlations = {}
         
         for position in positions:
             symbol = position.get('symbol', '')
             
-            # Check for obvious correlations
-            if self._symbols_are_correlated(symbol, new_position_symbol):
+            # Rolling correlation when available, scaled by |rho|; currency heuristic otherwise
+            rho = self._rolling_correlation(symbol, new_position_symbol)
+            if rho is not None:
+                self.position_correlations[symbol] = rho
+                if abs(rho) >= self.ict_config.correlation_threshold:
+                    correlation_risk += 0.3 * abs(rho)
+            elif self._symbols_are_correlated(symbol, new_position_symbol):
                 correlation_risk += 0.3
         
         return min(1.0, correlation_risk)
@@ -571,7 +588,11 @@ class RiskManager:
         Returns:
             bool: True si están correlacionados
         """
-        # Simplified correlation detection
+        rho = self._rolling_correlation(symbol1, symbol2)
+        if rho is not None:
+            return abs(rho) >= self.ict_config.correlation_threshold
+        
+        # Fallback: currency-code heuristic while there is no price history
         major_pairs = ['EURUSD', 'GBPUSD', 'USDJPY', 'USDCHF', 'AUDUSD', 'USDCAD', 'NZDUSD']
         
         # Same currency pairs are obviously correlated
@@ -591,3 +612,23 @@ class RiskManager:
                 return True
         
         return False
+    
+    def _rolling_correlation(self, symbol1: str, symbol2: str) -> Optional[float]:
+        """Correlación rodante del par (None sin motor o sin datos suficientes)"""
+        if self.correlation_engine is None or symbol1 == symbol2:
+            return None
+        try:
+            return self.correlation_engine.correlation(symbol1, symbol2)
+        except Exception:
+            return None
+    
+    def update_market_prices(self, prices: Dict[str, float], timestamp: Optional[datetime] = None) -> None:
+        """
+        Alimentar el motor de correlación con el cierre de cada símbolo
+        
+        Args:
+            prices: Cierre del bar por símbolo
+            timestamp: Momento del bar
+        """
+        if self.correlation_engine is not None:
+            self.correlation_engine.update_bar(prices, timestamp)
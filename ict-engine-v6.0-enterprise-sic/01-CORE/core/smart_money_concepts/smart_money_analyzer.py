@@ -38,6 +38,8 @@ except ImportError:
     import pandas as pd
     import numpy as np
 
+from core.analysis.equal_levels_engine import EqualLevelsEngine
+
 
 class SmartMoneySession(Enum):
     """🌏 Sesiones de Smart Money"""
@@ -217,6 +219,13 @@ class SmartMoneyAnalyzer:
             'volume_anomaly_threshold': 1.5  # 50% above normal
         }
         
+        # 💧 Motor compartido de Equal Highs/Lows (un pool único por nivel)
+        self._equal_levels_engine = EqualLevelsEngine(
+            tolerance=self.liquidity_detection_config['equal_highs_tolerance'],
+            min_touches=self.liquidity_detection_config['minimum_touches'],
+            max_bar_distance=10  # Toques dentro de las 10 velas previas, como el detector original
+        )
+        
         # 📊 Estado interno
         self.detected_liquidity_pools: List[LiquidityPool] = []
         self.institutional_flows: List[InstitutionalOrderFlow] = []
@@ -730,68 +739,57 @@ class SmartMoneyAnalyzer:
 
     def _detect_equal_highs(self, candles_h4: pd.DataFrame, candles_h1: pd.DataFrame) -> List[LiquidityPool]:
         """Detectar equal highs"""
-        pools = []
         try:
             # Buscar en H4 primero
-            h4_highs = candles_h4['high'].rolling(window=10).max()
-            tolerance = self.liquidity_detection_config['equal_highs_tolerance']
-            
-            for i in range(10, len(h4_highs)):
-                current_high = h4_highs.iloc[i]
-                # Buscar highs similares en ventana anterior
-                similar_highs = h4_highs.iloc[i-10:i]
-                equal_count = sum(1 for h in similar_highs if abs(h - current_high) <= tolerance)
-                
-                if equal_count >= self.liquidity_detection_config['minimum_touches']:
-                    pool = LiquidityPool(
-                        pool_type=LiquidityPoolType.EQUAL_HIGHS,
-                        price_level=current_high,
-                        strength=min(equal_count / 5.0, 1.0),
-                        timestamp=candles_h4.index[i],
-                        touches=equal_count,
-                        volume_evidence=0.5,  # Se calculará después
-                        institutional_interest=0.0,  # Se validará después
-                        session_origin=self.get_current_smart_money_session(),
-                        timeframe_origin="H4",
-                        expected_reaction="bearish_reaction",
-                        invalidation_price=current_high * 1.001
-                    )
-                    pools.append(pool)
-            
-            return pools
+            levels = self._equal_levels_engine.find_equal_highs(
+                candles_h4['high'].to_numpy(),
+                tolerance=self.liquidity_detection_config['equal_highs_tolerance'],
+                min_touches=self.liquidity_detection_config['minimum_touches']
+            )
+            return [
+                LiquidityPool(
+                    pool_type=LiquidityPoolType.EQUAL_HIGHS,
+                    price_level=level.level,
+                    strength=min(level.touches / 5.0, 1.0),
+                    timestamp=candles_h4.index[level.last_index],
+                    touches=level.touches,
+                    volume_evidence=0.5,  # Se calculará después
+                    institutional_interest=0.0,  # Se validará después
+                    session_origin=self.get_current_smart_money_session(),
+                    timeframe_origin="H4",
+                    expected_reaction="bearish_reaction",
+                    invalidation_price=level.level * 1.001
+                )
+                for level in levels
+            ]
             
         except Exception:
             return []
 
     def _detect_equal_lows(self, candles_h4: pd.DataFrame, candles_h1: pd.DataFrame) -> List[LiquidityPool]:
         """Detectar equal lows"""
-        pools = []
         try:
-            h4_lows = candles_h4['low'].rolling(window=10).min()
-            tolerance = self.liquidity_detection_config['equal_lows_tolerance']
-            
-            for i in range(10, len(h4_lows)):
-                current_low = h4_lows.iloc[i]
-                similar_lows = h4_lows.iloc[i-10:i]
-                equal_count = sum(1 for l in similar_lows if abs(l - current_low) <= tolerance)
-                
-                if equal_count >= self.liquidity_detection_config['minimum_touches']:
-                    pool = LiquidityPool(
-                        pool_type=LiquidityPoolType.EQUAL_LOWS,
-                        price_level=current_low,
-                        strength=min(equal_count / 5.0, 1.0),
-                        timestamp=candles_h4.index[i],
-                        touches=equal_count,
-                        volume_evidence=0.5,
-                        institutional_interest=0.0,
-                        session_origin=self.get_current_smart_money_session(),
-                        timeframe_origin="H4",
-                        expected_reaction="bullish_reaction",
-                        invalidation_price=current_low * 0.999
-                    )
-                    pools.append(pool)
-            
-            return pools
+            levels = self._equal_levels_engine.find_equal_lows(
+                candles_h4['low'].to_numpy(),
+                tolerance=self.liquidity_detection_config['equal_lows_tolerance'],
+                min_touches=self.liquidity_detection_config['minimum_touches']
+            )
+            return [
+                LiquidityPool(
+                    pool_type=LiquidityPoolType.EQUAL_LOWS,
+                    price_level=level.level,
+                    strength=min(level.touches / 5.0, 1.0),
+                    timestamp=candles_h4.index[level.last_index],
+                    touches=level.touches,
+                    volume_evidence=0.5,
+                    institutional_interest=0.0,
+                    session_origin=self.get_current_smart_money_session(),
+                    timeframe_origin="H4",
+                    expected_reaction="bullish_reaction",
+                    invalidation_price=level.level * 0.999
+                )
+                for level in levels
+            ]
             
         except Exception:
             return []
@@ -132,11 +132,14 @@ SmartLogger = SmartTradingLogger
 # =============================================================================
 
 import hashlib
+import heapq
 import json
 import os
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
 
+from utils.memory_budget import estimate_size, get_memory_budget
+
 class TradingDecisionCacheV6:
     """
     💾 Cache inteligente enterprise para decisiones de trading v6.0.
@@ -169,6 +172,7 @@ class TradingDecisionCacheV6:
         self.important_threshold = 300  # 5 minutos para eventos importantes
         self.enable_intelligent_caching = enterprise_settings.get("enable_intelligent_caching", True)
         self.auto_cleanup_hours = enterprise_settings.get("auto_cleanup_hours", 24)
+        self.max_tracked_events = enterprise_settings.get("max_tracked_events", 2000)
         
         # === CACHE MULTI-TIMEFRAME ===
         self.multi_tf_cache: Dict[str, Dict[str, Any]] = {}
@@ -182,6 +186,8 @@ class TradingDecisionCacheV6:
         self.events_cached = 0
         self.events_logged = 0
         
+        get_memory_budget().register('decision_cache', self, priority=20)
+        
         self.logger.info(
             f"💾 TradingDecisionCacheV6 inicializado - "
             f"Intelligent: {self.enable_intelligent_caching}, "
@@ -214,6 +220,9 @@ class TradingDecisionCacheV6:
                 self.last_log_times[event_type] = current_time
                 self.cache_misses += 1
                 self.events_logged += 1
+                if last_hash is None and len(self.last_states) > self.max_tracked_events:
+                    # Tipos de evento acotados: se olvida el 10% menos reciente de una vez
+                    self._evict_oldest_events(max(1, self.max_tracked_events // 10))
                 return True
             
             # Si es importante, permitir log cada 5 minutos aunque no haya cambios
@@ -369,6 +378,27 @@ class TradingDecisionCacheV6:
         except Exception as e:
             self.logger.error(f"Error en auto cleanup: {e}", component="decision_cache")
     
+    def _evict_oldest_events(self, count: int) -> int:
+        """Olvida los `count` tipos de evento con log más antiguo."""
+        oldest = heapq.nsmallest(count, self.last_log_times.items(), key=lambda item: item[1])
+        for event_type, _ in oldest:
+            self.last_states.pop(event_type, None)
+            self.last_log_times.pop(event_type, None)
+        return len(oldest)
+    
+    def evict(self, fraction: float) -> int:
+        """Desalojo bajo presión de memoria (presupuesto global)."""
+        freed = self._evict_oldest_events(int(len(self.last_log_times) * fraction))
+        freed += sum(len(tfs) for tfs in self.multi_tf_cache.values())
+        self.multi_tf_cache.clear()
+        self.smart_money_cache.clear()
+        return freed
+    
+    def memory_bytes(self) -> int:
+        """Bytes estimados de estados y caches."""
+        return (estimate_size(self.last_states) + estimate_size(self.last_log_times)
+                + estimate_size(self.multi_tf_cache) + estimate_size(self.smart_money_cache))
+    
     def get_cache_statistics(self) -> Dict[str, Any]:
         """Obtiene estadísticas del cache para monitoreo."""
         total_events = self.cache_hits + self.cache_misses
@@ -380,6 +410,7 @@ class TradingDecisionCacheV6:
             'events_cached': self.events_cached,
             'events_logged': self.events_logged,
             'hit_rate_percent': round(hit_rate, 2),
+            'tracked_event_types': len(self.last_states),
             'multi_tf_symbols_cached': len(self.multi_tf_cache),
             'smart_money_cache_active': bool(self.smart_money_cache.get('last_analysis')),
             'last_cleanup': 'auto'
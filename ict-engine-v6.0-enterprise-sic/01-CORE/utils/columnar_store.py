@@ -0,0 +1,701 @@
+#!/usr/bin/env python3
+"""
+🗃️ COLUMNAR STORE - ICT ENGINE v6.0 Enterprise
+==============================================
+
+Representación compacta (struct-of-arrays) para los tipos calientes que se
+crean por miles en cada análisis: PatternSignal, POI, SwingPointEnterprise,
+LiquidityPool, BreakerBlockSignalV62, DisplacementSignal y los POI dict.
+
+En lugar de un objeto (dataclass/dict) por registro con sus floats, enums,
+strings y listas como objetos Python independientes:
+
+1. Columnas NumPy para números (None → NaN/centinela), bools, fechas (µs)
+   y pares (low, high)
+2. Categorías internadas (int32) para enums y strings repetidos
+   (símbolo, timeframe, sesión, narrativas por dirección...)
+3. Tags internados para List[str] (confluencias): una tupla por combinación
+4. Texto diferido (LazyText): la narrativa se formatea en la primera lectura
+5. RecordView (__slots__) como vista de fila con acceso por atributo y por
+   clave (compatible con código que usa `poi.strength` o `poi['price']`)
+
+Los numéricos no son objetos rastreados por el GC, así que una sesión larga
+deja de acumular cientos de miles de objetos vivos.
+
+    register_record_type(POI, text_fields=('notes', 'analysis_id'))
+    historical = store_for(POI)
+    historical.extend(expired_pois)                 # dataclasses o dicts
+    nearby = historical.where(np.abs(historical.column('price_level') - price) < 0.002)
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import dataclasses
+import sys
+import typing
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+KINDS = ('float', 'float?', 'int', 'int?', 'bool', 'datetime', 'timedelta', 'category', 'tags', 'pair', 'text', 'object')
+
+_NUMPY_DTYPES = {
+    'float': np.float64, 'float?': np.float64, 'int': np.int64, 'int?': np.int64, 'bool': np.bool_,
+    'datetime': np.int64, 'timedelta': np.int64, 'category': np.int32, 'tags': np.int32,
+}
+NULL_INT = _NULL_TIME = _NULL_INT = np.iinfo(np.int64).min  # None en columnas int?/datetime/timedelta
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_MISSING = object()
+_EXTRAS = '__extras__'
+
+
+class DefaultFactory:
+    """Default calculado por fila (equivalente a dataclasses.field(default_factory=...))"""
+
+    __slots__ = ('factory',)
+
+    def __init__(self, factory: Callable[[], Any]):
+        self.factory = factory
+
+
+class LazyText:
+    """
+    📝 Texto diferido: plantilla + argumentos, se formatea al leerlo
+
+    Las narrativas de las señales casi nunca se leen; guardarlas así evita
+    formatear (y retener) un string único por registro.
+    """
+
+    __slots__ = ('template', 'args', 'kwargs')
+
+    def __init__(self, template: str, *args, **kwargs):
+        self.template = template
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return self.template.format(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        return f"LazyText({self.template!r})"
+
+
+class _InternTable:
+    """Tabla valor → código int32 (None es siempre el código 0)"""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self):
+        self.values: List[Any] = [None]
+        self.codes: Dict[Any, int] = {None: 0}
+
+    def encode(self, value: Any) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class RecordView:
+    """
+    🔎 Vista de una fila del store (sin copiar datos)
+
+    Acceso por atributo (`view.price_level`, `view.status = ...`) y por clave
+    (`view['price']`, `view.get('broken')`), to_dict() y materialize() para
+    obtener el objeto original. La vista referencia la fila por índice: es
+    válida mientras el store no se compacte (filter/keep_last devuelven
+    stores nuevos y no invalidan las vistas del original).
+    """
+
+    __slots__ = ('_store', '_row')
+
+    def __init__(self, store: 'ColumnarStore', row: int):
+        object.__setattr__(self, '_store', store)
+        object.__setattr__(self, '_row', row)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith('__'):
+            raise AttributeError(name)
+        try:
+            return self._store.get_value(self._row, name)
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        self._store.set_value(self._row, name, value)
+
+    def __getitem__(self, key: str) -> Any:
+        return self._store.get_value(self._row, key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._store.set_value(self._row, key, value)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self._store.get_value(self._row, key)
+        except KeyError:
+            return default
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self._store.has_value(self._row, key)
+
+    def keys(self) -> List[str]:
+        return self._store.row_keys(self._row)
+
+    def values(self) -> List[Any]:
+        return [self[key] for key in self.keys()]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        return [(key, self[key]) for key in self.keys()]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.keys())
+
+    def __len__(self) -> int:
+        return len(self.keys())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return self._store.row_dict(self._row)
+
+    def materialize(self) -> Any:
+        """Objeto completo (instancia del dataclass o dict)"""
+        return self._store.materialize(self._row)
+
+    @property
+    def row(self) -> int:
+        return self._row
+
+    def __repr__(self) -> str:
+        return f"<{self._store.name or 'Record'}View row={self._row}>"
+
+
+Mapping.register(RecordView)
+
+
+class ColumnarStore:
+    """
+    🗃️ Contenedor struct-of-arrays con interfaz de secuencia
+
+    Se comporta como una lista de registros (len, iteración, índice, slicing,
+    append, extend) cuyos elementos son RecordView. Las columnas numéricas se
+    exponen como arrays NumPy para consultas vectorizadas (column, where).
+
+    Args:
+        schema: {campo: tipo} con tipos de KINDS
+        name: Nombre del tipo (para repr y métricas)
+        defaults: Valores por defecto por campo
+        record_factory: Constructor para materialize() (dataclass o dict)
+        allow_extras: Aceptar claves fuera del schema (POI dicts con **kwargs).
+            En este modo las columnas opcionales ('float?', 'int?') en None se
+            tratan como clave ausente, igual que en el dict original
+        capacity: Capacidad inicial de las columnas NumPy
+    """
+
+    def __init__(self, schema: Dict[str, str], name: str = '', defaults: Optional[Dict[str, Any]] = None,
+                 record_factory: Optional[Callable[..., Any]] = None, allow_extras: bool = False,
+                 capacity: int = 64):
+        unknown = {field: kind for field, kind in schema.items() if kind not in KINDS}
+        if unknown:
+            raise ValueError(f"Tipos de columna no soportados: {unknown}")
+        self.schema = dict(schema)
+        self.name = name
+        self.defaults = dict(defaults or {})
+        self.record_factory = record_factory
+        self.allow_extras = allow_extras
+        self._size = 0
+        self._capacity = max(1, int(capacity))
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._lists: Dict[str, List[Any]] = {}
+        self._tables: Dict[str, _InternTable] = {}
+        self._tz_codes: Dict[str, np.ndarray] = {}
+        self._tz_table = _InternTable()
+
+        for field, kind in self.schema.items():
+            if kind in ('text', 'object'):
+                self._lists[field] = []
+            elif kind == 'pair':
+                self._arrays[field] = np.full((self._capacity, 2), np.nan)
+            else:
+                self._arrays[field] = np.zeros(self._capacity, dtype=_NUMPY_DTYPES[kind])
+            if kind in ('category', 'tags'):
+                self._tables[field] = _InternTable()
+            if kind == 'datetime':
+                self._tz_codes[field] = np.zeros(self._capacity, dtype=np.int32)
+        if allow_extras:
+            self._lists[_EXTRAS] = []
+
+    # ===============================
+    # SECUENCIA
+    # ===============================
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[RecordView]:
+        return (RecordView(self, row) for row in range(self._size))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [RecordView(self, row) for row in range(*index.indices(self._size))]
+        row = index + self._size if index < 0 else index
+        if not 0 <= row < self._size:
+            raise IndexError('ColumnarStore index out of range')
+        return RecordView(self, row)
+
+    def __repr__(self) -> str:
+        return f"<ColumnarStore {self.name or ''} rows={self._size} columns={len(self.schema)}>"
+
+    def views(self) -> List[RecordView]:
+        return [RecordView(self, row) for row in range(self._size)]
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """Lista de dicts (compatibilidad con APIs que esperan dicts)"""
+        return [self.row_dict(row) for row in range(self._size)]
+
+    def materialize_all(self) -> List[Any]:
+        return [self.materialize(row) for row in range(self._size)]
+
+    # ===============================
+    # ESCRITURA
+    # ===============================
+
+    def append(self, record: Any = None, **values) -> int:
+        """
+        Añadir un registro (dataclass, dict/Mapping, RecordView o kwargs)
+
+        Returns:
+            Índice de la fila creada
+        """
+        if record is not None:
+            values = {**self._record_values(record), **values}
+        self._ensure_capacity(self._size + 1)
+        row = self._size
+        extras = None
+        for field, value in values.items():
+            if field not in self.schema:
+                if not self.allow_extras:
+                    raise KeyError(f"Campo '{field}' fuera del schema de {self.name or 'ColumnarStore'}")
+                extras = extras or {}
+                extras[field] = value
+        for field in self.schema:
+            value = values.get(field, _MISSING)
+            if value is _MISSING:
+                value = self._default(field)
+            self._write(field, row, value)
+        if self.allow_extras:
+            self._lists[_EXTRAS].append(extras)
+        self._size += 1
+        return row
+
+    def extend(self, records: Iterable[Any]) -> None:
+        for record in records:
+            self.append(record)
+
+    def extend_columns(self, count: int, **columns) -> None:
+        """
+        Añadir `count` filas desde columnas (arrays o escalares a difundir)
+
+        Camino rápido para detectores vectorizados: los campos numéricos se
+        copian sin crear objetos por fila.
+        """
+        if count <= 0:
+            return
+        unknown = set(columns) - set(self.schema)
+        if unknown:
+            raise KeyError(f"Campos fuera del schema: {sorted(unknown)}")
+        self._ensure_capacity(self._size + count)
+        start, stop = self._size, self._size + count
+        for field, kind in self.schema.items():
+            value = columns.get(field, _MISSING)
+            if value is _MISSING:
+                value = self._default(field)
+            # Por fila: arrays y listas (en pair/tags una tupla es un valor único)
+            per_row = isinstance(value, (np.ndarray, list))
+            if per_row and len(value) != count:
+                raise ValueError(f"Columna '{field}' con {len(value)} valores, se esperaban {count}")
+            if kind in ('float?', 'int?') and isinstance(value, list):
+                null = np.nan if kind == 'float?' else _NULL_INT
+                value = [null if item is None else item for item in value]
+            if kind in ('float', 'float?', 'int', 'int?', 'bool') and value is not None:
+                self._arrays[field][start:stop] = value
+            elif kind == 'pair' and isinstance(value, np.ndarray):
+                self._arrays[field][start:stop] = value
+            elif kind == 'category' and isinstance(value, np.ndarray):
+                uniques, inverse = np.unique(value, return_inverse=True)
+                codes = np.array([self._tables[field].encode(item) for item in uniques.tolist()], dtype=np.int32)
+                self._arrays[field][start:stop] = codes[inverse] if len(codes) else 0
+            else:
+                items = value if per_row else [value] * count
+                for offset, item in enumerate(items):
+                    self._write(field, start + offset, item)
+        if self.allow_extras:
+            self._lists[_EXTRAS].extend([None] * count)
+        self._size = stop
+
+    def set_value(self, row: int, field: str, value: Any) -> None:
+        if not 0 <= row < self._size:
+            raise IndexError(row)
+        if field in self.schema:
+            self._write(field, row, value)
+        elif self.allow_extras:
+            extras = self._lists[_EXTRAS][row]
+            if extras is None:
+                extras = self._lists[_EXTRAS][row] = {}
+            extras[field] = value
+        else:
+            raise KeyError(field)
+
+    # ===============================
+    # LECTURA
+    # ===============================
+
+    def get_value(self, row: int, field: str) -> Any:
+        kind = self.schema.get(field)
+        if kind is None:
+            extras = self.row_extras(row)
+            if extras and field in extras:
+                return extras[field]
+            raise KeyError(field)
+        if kind in ('float', 'int', 'bool'):
+            return self._arrays[field][row].item()
+        if kind == 'float?':
+            value = self._arrays[field][row]
+            if np.isnan(value):
+                return self._absent(field)
+            return float(value)
+        if kind == 'int?':
+            value = self._arrays[field][row]
+            if value == _NULL_INT:
+                return self._absent(field)
+            return int(value)
+        if kind == 'category':
+            return self._tables[field].values[self._arrays[field][row]]
+        if kind == 'tags':
+            tags = self._tables[field].values[self._arrays[field][row]]
+            return list(tags) if tags is not None else []
+        if kind == 'pair':
+            low, high = self._arrays[field][row]
+            return None if np.isnan(low) else (float(low), float(high))
+        if kind == 'datetime':
+            micros = self._arrays[field][row]
+            if micros == _NULL_TIME:
+                return None
+            value = _EPOCH + timedelta(microseconds=int(micros))
+            tz = self._tz_table.values[self._tz_codes[field][row]]
+            return value.replace(tzinfo=tz) if tz is not None else value
+        if kind == 'timedelta':
+            micros = self._arrays[field][row]
+            return None if micros == _NULL_TIME else timedelta(microseconds=int(micros))
+        value = self._lists[field][row]
+        if kind == 'text' and isinstance(value, LazyText):
+            value = self._lists[field][row] = str(value)  # Se materializa una sola vez
+        return value
+
+    def _absent(self, field: str) -> None:
+        if self.allow_extras:
+            raise KeyError(field)  # Clave opcional no presente en este registro
+        return None
+
+    def has_value(self, row: int, field: str) -> bool:
+        try:
+            self.get_value(row, field)
+            return True
+        except KeyError:
+            return False
+
+    def row_keys(self, row: int) -> List[str]:
+        keys = [field for field in self.schema
+                if not (self.allow_extras and self.schema[field] in ('float?', 'int?')) or self.has_value(row, field)]
+        return keys + list(self.row_extras(row) or ())
+
+    def row_extras(self, row: int) -> Optional[Dict[str, Any]]:
+        return self._lists[_EXTRAS][row] if self.allow_extras else None
+
+    def row_dict(self, row: int) -> Dict[str, Any]:
+        return {field: self.get_value(row, field) for field in self.row_keys(row)}
+
+    def materialize(self, row: int) -> Any:
+        values = self.row_dict(row)
+        if self.record_factory is None:
+            return values
+        if dataclasses.is_dataclass(self.record_factory):
+            init_fields = {f.name for f in dataclasses.fields(self.record_factory) if f.init}
+            return self.record_factory(**{k: v for k, v in values.items() if k in init_fields})
+        return self.record_factory(**values)
+
+    def column(self, field: str) -> np.ndarray:
+        """
+        Array de la columna (vista, sin copia) para consultas vectorizadas
+
+        Categorías y tags devuelven sus códigos int32 (ver codes_for);
+        text/object devuelven un array de objetos (copia).
+        """
+        kind = self.schema[field]
+        if kind in ('text', 'object'):
+            return np.array([self.get_value(row, field) for row in range(self._size)], dtype=object)
+        return self._arrays[field][:self._size]
+
+    def codes_for(self, field: str, *values: Any) -> List[int]:
+        """Códigos de categoría de `values` (los inexistentes se omiten)"""
+        table = self._tables[field]
+        return [table.codes[value] for value in values if value in table.codes]
+
+    def where(self, mask: np.ndarray) -> List[RecordView]:
+        """Vistas de las filas donde mask es True"""
+        return [RecordView(self, int(row)) for row in np.flatnonzero(mask)]
+
+    # ===============================
+    # COMPACTACIÓN
+    # ===============================
+
+    def filter(self, mask: np.ndarray) -> 'ColumnarStore':
+        """Nuevo store con las filas seleccionadas (comparte tablas internadas)"""
+        rows = np.flatnonzero(np.asarray(mask, dtype=bool)[:self._size])
+        return self._take(rows)
+
+    def keep_last(self, count: int) -> 'ColumnarStore':
+        """Nuevo store con las últimas `count` filas (históricos acotados)"""
+        return self._take(np.arange(max(0, self._size - count), self._size))
+
+    def drop_oldest(self, count: int, on_drop: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> int:
+        """
+        Eliminar en sitio las `count` filas más antiguas (presupuesto de memoria)
+
+        on_drop recibe las filas eliminadas como dicts (resúmenes a disco).
+        Devuelve las filas eliminadas.
+        """
+        count = max(0, min(int(count), self._size))
+        if not count:
+            return 0
+        if on_drop is not None:
+            on_drop([self.row_dict(row) for row in range(count)])
+        remaining = self._size - count
+        for array in self._arrays.values():
+            array[:remaining] = array[count:self._size]
+        for codes in self._tz_codes.values():
+            codes[:remaining] = codes[count:self._size]
+        for values in self._lists.values():
+            del values[:count]
+        self._size = remaining
+        return count
+
+    def _take(self, rows: np.ndarray) -> 'ColumnarStore':
+        clone = ColumnarStore(self.schema, self.name, self.defaults, self.record_factory,
+                              self.allow_extras, capacity=max(1, len(rows)))
+        clone._tables = self._tables
+        clone._tz_table = self._tz_table
+        for field, array in self._arrays.items():
+            clone._arrays[field][:len(rows)] = array[rows]
+        for field, codes in self._tz_codes.items():
+            clone._tz_codes[field][:len(rows)] = codes[rows]
+        for field, values in self._lists.items():
+            clone._lists[field] = [values[row] for row in rows]
+        clone._size = len(rows)
+        return clone
+
+    # ===============================
+    # MÉTRICAS
+    # ===============================
+
+    def memory_usage(self) -> Dict[str, Any]:
+        """Bytes de columnas NumPy + estimación de tablas y columnas de objetos"""
+        numpy_bytes = sum(array.nbytes for array in self._arrays.values())
+        numpy_bytes += sum(codes.nbytes for codes in self._tz_codes.values())
+        table_bytes = sum(sys.getsizeof(table.values) + sys.getsizeof(table.codes)
+                          + sum(sys.getsizeof(value) for value in table.values[1:])
+                          for table in self._tables.values())
+        object_bytes = 0
+        for values in self._lists.values():
+            object_bytes += sys.getsizeof(values)
+            seen = set()
+            for value in values:
+                if value is not None and id(value) not in seen:
+                    seen.add(id(value))
+                    object_bytes += sys.getsizeof(value)
+        total = numpy_bytes + table_bytes + object_bytes
+        return {
+            'rows': self._size,
+            'capacity': self._capacity,
+            'numpy_bytes': numpy_bytes,
+            'table_bytes': table_bytes,
+            'object_bytes': object_bytes,
+            'total_bytes': total,
+            'bytes_per_row': round(total / self._size, 1) if self._size else 0.0,
+            'interned': {field: len(table.values) - 1 for field, table in self._tables.items()},
+        }
+
+    # ===============================
+    # INTERNOS
+    # ===============================
+
+    def _record_values(self, record: Any) -> Dict[str, Any]:
+        if isinstance(record, RecordView):
+            return record.to_dict()
+        if isinstance(record, Mapping):
+            return dict(record)
+        if dataclasses.is_dataclass(record):
+            return {field.name: getattr(record, field.name) for field in dataclasses.fields(record)}
+        return {field: getattr(record, field) for field in self.schema if hasattr(record, field)}
+
+    def _default(self, field: str) -> Any:
+        default = self.defaults.get(field)
+        return default.factory() if isinstance(default, DefaultFactory) else default
+
+    def _ensure_capacity(self, needed: int) -> None:
+        if needed <= self._capacity:
+            return
+        capacity = self._capacity
+        while capacity < needed:
+            capacity *= 2
+        for field, array in self._arrays.items():
+            grown = (np.full((capacity, 2), np.nan) if array.ndim == 2
+                     else np.zeros(capacity, dtype=array.dtype))
+            grown[:self._size] = array[:self._size]
+            self._arrays[field] = grown
+        for field, codes in self._tz_codes.items():
+            grown = np.zeros(capacity, dtype=np.int32)
+            grown[:self._size] = codes[:self._size]
+            self._tz_codes[field] = grown
+        self._capacity = capacity
+
+    def _write(self, field: str, row: int, value: Any) -> None:
+        kind = self.schema[field]
+        if kind in ('text', 'object'):
+            if kind == 'text' and isinstance(value, str) and len(value) <= 64:
+                value = sys.intern(value)
+            values = self._lists[field]
+            if row == len(values):
+                values.append(value)
+            else:
+                values[row] = value
+        elif kind == 'category':
+            if isinstance(value, LazyText):
+                value = str(value)  # Las categorías se internan por valor
+            self._arrays[field][row] = self._tables[field].encode(value)
+        elif kind == 'tags':
+            self._arrays[field][row] = self._tables[field].encode(tuple(value) if value else None)
+        elif kind == 'pair':
+            self._arrays[field][row] = (np.nan, np.nan) if value is None else (value[0], value[1])
+        elif kind == 'datetime':
+            if value is None:
+                self._arrays[field][row] = _NULL_TIME
+                self._tz_codes[field][row] = 0
+            else:
+                if not isinstance(value, datetime):
+                    value = _to_datetime(value)
+                self._arrays[field][row] = (value.replace(tzinfo=None) - _EPOCH) // _MICROSECOND
+                self._tz_codes[field][row] = self._tz_table.encode(value.tzinfo)
+        elif kind == 'timedelta':
+            self._arrays[field][row] = _NULL_TIME if value is None else value // _MICROSECOND
+        elif kind == 'float?':
+            self._arrays[field][row] = np.nan if value is None else value
+        elif kind == 'int?':
+            self._arrays[field][row] = _NULL_INT if value is None else value
+        else:
+            self._arrays[field][row] = 0 if value is None else value
+
+
+def _to_datetime(value: Any) -> datetime:
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if hasattr(value, 'to_pydatetime'):
+        return value.to_pydatetime()
+    raise TypeError(f"No se puede convertir {type(value).__name__} a datetime")
+
+
+# ===============================
+# SCHEMAS DESDE DATACLASSES
+# ===============================
+
+def _kind_for(annotation: Any) -> str:
+    origin = typing.get_origin(annotation)
+    args = typing.get_args(annotation)
+    optional = origin is typing.Union and type(None) in args
+    if optional:
+        inner = [arg for arg in args if arg is not type(None)]
+        if len(inner) != 1:
+            return 'object'
+        kind = _kind_for(inner[0])
+        if kind in ('float', 'int'):
+            return kind + '?'
+        return kind if kind in ('datetime', 'timedelta', 'category', 'pair', 'text', 'object') else 'object'
+    if annotation is bool:
+        return 'bool'
+    if annotation is int:
+        return 'int'
+    if annotation is float:
+        return 'float'
+    if annotation is str:
+        return 'category'
+    if annotation is datetime:
+        return 'datetime'
+    if annotation is timedelta:
+        return 'timedelta'
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return 'category'
+    if origin in (tuple, Tuple) and len(args) == 2 and all(arg is float for arg in args):
+        return 'pair'
+    if origin in (list, List) and args and args[0] is str:
+        return 'tags'
+    return 'object'
+
+
+def schema_from_dataclass(cls: type, text_fields: Sequence[str] = (),
+                          overrides: Optional[Dict[str, str]] = None) -> Tuple[Dict[str, str], Dict[str, Any]]:
+    """
+    Inferir {campo: tipo} y defaults de un dataclass
+
+    str → category (se interna) salvo los de `text_fields` (identificadores
+    únicos o narrativas con números). Enums → category, Tuple[float, float]
+    → pair, List[str] → tags, el resto → object.
+    """
+    hints = typing.get_type_hints(cls)
+    schema, defaults = {}, {}
+    for field in dataclasses.fields(cls):
+        kind = _kind_for(hints.get(field.name, Any))
+        if field.name in text_fields:
+            kind = 'text'
+        schema[field.name] = kind
+        if field.default is not dataclasses.MISSING:
+            defaults[field.name] = field.default
+        elif field.default_factory is not dataclasses.MISSING:  # type: ignore[misc]
+            defaults[field.name] = DefaultFactory(field.default_factory)  # type: ignore[misc]
+    schema.update(overrides or {})
+    return schema, defaults
+
+
+_RECORD_TYPES: Dict[type, Dict[str, Any]] = {}
+
+
+def register_record_type(cls: type, text_fields: Sequence[str] = (),
+                         overrides: Optional[Dict[str, str]] = None) -> type:
+    """
+    Registrar un dataclass caliente para store_for()
+
+    Se llama justo después de definir el tipo; devuelve la clase para poder
+    usarse también como decorador.
+    """
+    schema, defaults = schema_from_dataclass(cls, text_fields, overrides)
+    _RECORD_TYPES[cls] = {'schema': schema, 'defaults': defaults}
+    return cls
+
+
+def store_for(cls: type, capacity: int = 64) -> ColumnarStore:
+    """Nuevo ColumnarStore para un tipo registrado (o cualquier dataclass)"""
+    spec = _RECORD_TYPES.get(cls)
+    if spec is None:
+        register_record_type(cls)
+        spec = _RECORD_TYPES[cls]
+    return ColumnarStore(spec['schema'], name=cls.__name__, defaults=spec['defaults'],
+                         record_factory=cls, capacity=capacity)
+
+
+def registered_record_types() -> List[str]:
+    return sorted(cls.__name__ for cls in _RECORD_TYPES)
@@ -0,0 +1,473 @@
+#!/usr/bin/env python3
+"""
+🔥 HOT PATH PROFILER - ICT ENGINE v6.0 Enterprise
+=================================================
+
+Superficie única de instrumentación para detectores y orquestador.
+
+Cada módulo medía por su cuenta (PerformanceMetrics del fractal analyzer,
+_update_performance_metrics de PatternDetector, processing_stats de los
+advanced patterns, execution_time_ms del ACC). Este módulo centraliza:
+
+1. Decorador @profile_hot_path y context manager profile_section()
+2. Tiempo de pared y de CPU (por hilo), llamadas y filas procesadas
+3. Bytes asignados por muestreo de tracemalloc (1 de cada N llamadas)
+4. Registro único por pila de llamadas → export "folded stacks"
+   (flamegraph.pl, speedscope, inferno) y resumen para dashboard
+
+Deshabilitado (por defecto) el coste es una comprobación de bandera por
+llamada. Se activa con enable(), con ICT_HOT_PATH_PROFILE=1 o desde la CLI:
+
+    python -m utils.hot_path_profiler run --out perfil.folded --json perfil.json script.py
+    python -m utils.hot_path_profiler top perfil.json -n 20
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import argparse
+import functools
+import inspect
+import json
+import os
+import runpy
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+PROFILE_ENV_VAR = 'ICT_HOT_PATH_PROFILE'
+
+# Índices de las estadísticas por pila (lista mutable: más barata que un objeto)
+_CALLS, _WALL_NS, _CPU_NS, _MAX_WALL_NS, _ROWS, _ALLOC_SAMPLES, _ALLOC_BYTES = range(7)
+
+METRICS = ('wall', 'cpu', 'calls', 'rows', 'alloc')
+
+
+class HotPathProfiler:
+    """
+    🔥 Registro de perfiles por pila de llamadas instrumentadas
+
+    Las claves son tuplas con los nombres de las secciones activas en el
+    hilo (raíz → hoja), de modo que el mismo detector llamado desde el
+    orquestador o desde un test aparece en ramas distintas del flame graph.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.trace_memory = False
+        self.sample_every = 16
+        self._stats: Dict[Tuple[str, ...], List[int]] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._started_tracemalloc = False
+
+    # ===============================
+    # CONTROL
+    # ===============================
+
+    def enable(self, trace_memory: bool = False, sample_every: int = 16) -> None:
+        """▶️ Activar la instrumentación (y tracemalloc si se pide)"""
+        self.trace_memory = trace_memory
+        self.sample_every = max(1, int(sample_every))
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        self.enabled = True
+
+    def disable(self) -> None:
+        """⏹️ Desactivar (conserva lo acumulado hasta reset())"""
+        self.enabled = False
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+    # ===============================
+    # REGISTRO
+    # ===============================
+
+    def _stack(self) -> List[str]:
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+            self._local.calls = 0
+        return stack
+
+    def _enter(self, name: str) -> Tuple[int, int, int]:
+        self._stack().append(name)
+        alloc_start = -1
+        if self.trace_memory:
+            self._local.calls += 1
+            if self._local.calls % self.sample_every == 0 and tracemalloc.is_tracing():
+                alloc_start = tracemalloc.get_traced_memory()[0]
+        return time.perf_counter_ns(), time.thread_time_ns(), alloc_start
+
+    def _exit(self, started: Tuple[int, int, int], rows: int) -> None:
+        wall_ns = time.perf_counter_ns() - started[0]
+        cpu_ns = time.thread_time_ns() - started[1]
+        alloc = -1
+        if started[2] >= 0 and tracemalloc.is_tracing():
+            alloc = max(tracemalloc.get_traced_memory()[0] - started[2], 0)
+
+        stack = self._local.stack
+        key = tuple(stack)
+        stack.pop()
+
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = [0, 0, 0, 0, 0, 0, 0]
+            stats[_CALLS] += 1
+            stats[_WALL_NS] += wall_ns
+            stats[_CPU_NS] += cpu_ns
+            if wall_ns > stats[_MAX_WALL_NS]:
+                stats[_MAX_WALL_NS] = wall_ns
+            stats[_ROWS] += rows
+            if alloc >= 0:
+                stats[_ALLOC_SAMPLES] += 1
+                stats[_ALLOC_BYTES] += alloc
+
+    def merge(self, other: Union['HotPathProfiler', Dict[str, Any]]) -> 'HotPathProfiler':
+        """🔗 Fusionar otro perfil (objeto o su to_dict(), p.ej. de otro proceso)"""
+        incoming = other.to_dict() if isinstance(other, HotPathProfiler) else other
+        with self._lock:
+            for entry in incoming.get('stacks', []):
+                key = tuple(entry['stack'])
+                stats = self._stats.setdefault(key, [0, 0, 0, 0, 0, 0, 0])
+                values = entry['stats']
+                for index in (_CALLS, _WALL_NS, _CPU_NS, _ROWS, _ALLOC_SAMPLES, _ALLOC_BYTES):
+                    stats[index] += values[index]
+                stats[_MAX_WALL_NS] = max(stats[_MAX_WALL_NS], values[_MAX_WALL_NS])
+        return self
+
+    # ===============================
+    # INFORMES
+    # ===============================
+
+    def snapshot(self) -> Dict[Tuple[str, ...], List[int]]:
+        with self._lock:
+            return {key: list(stats) for key, stats in self._stats.items()}
+
+    def report(self, top: Optional[int] = None, sort_by: str = 'wall_ms') -> List[Dict[str, Any]]:
+        """
+        📋 Resumen por función (todas las pilas fusionadas)
+
+        wall_ms/cpu_ms son inclusivos; si una función se llama recursivamente
+        dentro de sí misma se cuenta solo la llamada exterior.
+        """
+        functions: Dict[str, List[int]] = {}
+        for key, stats in self.snapshot().items():
+            name = key[-1]
+            totals = functions.setdefault(name, [0, 0, 0, 0, 0, 0, 0])
+            outermost = name not in key[:-1]
+            for index in (_CALLS, _ROWS, _ALLOC_SAMPLES, _ALLOC_BYTES):
+                totals[index] += stats[index]
+            if outermost:
+                totals[_WALL_NS] += stats[_WALL_NS]
+                totals[_CPU_NS] += stats[_CPU_NS]
+            totals[_MAX_WALL_NS] = max(totals[_MAX_WALL_NS], stats[_MAX_WALL_NS])
+
+        rows = []
+        for name, totals in functions.items():
+            calls = totals[_CALLS]
+            wall_ms = totals[_WALL_NS] / 1e6
+            rows.append({
+                'function': name,
+                'calls': calls,
+                'wall_ms': wall_ms,
+                'cpu_ms': totals[_CPU_NS] / 1e6,
+                'avg_wall_ms': wall_ms / calls if calls else 0.0,
+                'max_wall_ms': totals[_MAX_WALL_NS] / 1e6,
+                'rows': totals[_ROWS],
+                'rows_per_sec': totals[_ROWS] / (wall_ms / 1000.0) if wall_ms > 0 else 0.0,
+                'alloc_bytes_est': _estimate_alloc(totals),
+            })
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:top] if top else rows
+
+    def dashboard_snapshot(self, top: int = 10) -> Dict[str, Any]:
+        """📊 Datos compactos para el dashboard"""
+        return {
+            'enabled': self.enabled,
+            'trace_memory': self.trace_memory,
+            'instrumented_stacks': len(self._stats),
+            'top_functions': self.report(top=top),
+        }
+
+    def to_folded(self, metric: str = 'wall') -> str:
+        """
+        🔥 Export "folded stacks": una línea 'raiz;hijo;hoja <valor>' por pila
+
+        wall/cpu en microsegundos de tiempo propio (sin hijos instrumentados),
+        calls/rows/alloc como contadores propios de cada pila.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"Métrica no soportada: {metric} (usar {METRICS})")
+        snapshot = self.snapshot()
+        index = {'wall': _WALL_NS, 'cpu': _CPU_NS, 'calls': _CALLS, 'rows': _ROWS}.get(metric)
+
+        values: Dict[Tuple[str, ...], float] = {}
+        for key, stats in snapshot.items():
+            values[key] = _estimate_alloc(stats) if metric == 'alloc' else stats[index]
+
+        if metric in ('wall', 'cpu'):
+            children: Dict[Tuple[str, ...], float] = {}
+            for key, value in values.items():
+                if len(key) > 1:
+                    children[key[:-1]] = children.get(key[:-1], 0) + value
+            values = {key: max(value - children.get(key, 0), 0) / 1000.0 for key, value in values.items()}
+
+        lines = [f"{';'.join(_folded_frame(frame) for frame in key)} {int(round(value))}"
+                 for key, value in sorted(values.items()) if value > 0]
+        return '\n'.join(lines) + ('\n' if lines else '')
+
+    # ===============================
+    # PERSISTENCIA
+    # ===============================
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': 1,
+            'stacks': [{'stack': list(key), 'stats': stats} for key, stats in sorted(self.snapshot().items())],
+        }
+
+    def dump_json(self, path: str) -> str:
+        with open(path, 'w', encoding='utf-8') as handle:
+            json.dump(self.to_dict(), handle, indent=1, ensure_ascii=False)
+        return path
+
+    def dump_folded(self, path: str, metric: str = 'wall') -> str:
+        with open(path, 'w', encoding='utf-8') as handle:
+            handle.write(self.to_folded(metric))
+        return path
+
+    @classmethod
+    def load_json(cls, path: str) -> 'HotPathProfiler':
+        with open(path, 'r', encoding='utf-8') as handle:
+            return cls().merge(json.load(handle))
+
+
+def _estimate_alloc(stats: List[int]) -> int:
+    """Bytes muestreados extrapolados al total de llamadas"""
+    if not stats[_ALLOC_SAMPLES]:
+        return 0
+    return int(stats[_ALLOC_BYTES] * stats[_CALLS] / stats[_ALLOC_SAMPLES])
+
+
+def _folded_frame(name: str) -> str:
+    return name.replace(';', ':').replace(' ', '_')
+
+
+# ===============================
+# REGISTRO COMPARTIDO
+# ===============================
+
+_profiler = HotPathProfiler()
+if os.environ.get(PROFILE_ENV_VAR, '').lower() in ('1', 'true', 'yes', 'memory'):
+    _profiler.enable(trace_memory=os.environ[PROFILE_ENV_VAR].lower() == 'memory')
+
+
+def get_hot_path_profiler() -> HotPathProfiler:
+    """🏭 Profiler compartido (singleton) de todo el motor"""
+    return _profiler
+
+
+# ===============================
+# INSTRUMENTACIÓN
+# ===============================
+
+def profile_hot_path(name: Optional[str] = None,
+                     rows: Union[None, str, int, Callable[..., int]] = None) -> Callable:
+    """
+    🔥 Decorador de instrumentación
+
+    Args:
+        name: Nombre de la sección (por defecto módulo.Clase.función)
+        rows: Filas procesadas: nombre o posición del argumento cuyo len()
+              se cuenta (p.ej. 'data'), o callable(*args, **kwargs) -> int
+
+    Uso:
+        @profile_hot_path(rows='data')
+        def detect_displacement(self, data, symbol, timeframe): ...
+    """
+
+    def decorator(func: Callable) -> Callable:
+        section = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+        count_rows = _rows_counter(func, rows)
+        profiler = _profiler
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not profiler.enabled:
+                return func(*args, **kwargs)
+            started = profiler._enter(section)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                profiler._exit(started, count_rows(args, kwargs) if count_rows else 0)
+
+        wrapper.__profiled_section__ = section
+        return wrapper
+
+    return decorator
+
+
+class _Section:
+    """Context manager de una sección activa"""
+
+    __slots__ = ('name', 'rows', '_started')
+
+    def __init__(self, name: str, rows: int):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self) -> '_Section':
+        self._started = _profiler._enter(self.name)
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        _profiler._exit(self._started, int(self.rows or 0))
+        return False
+
+
+class _NullSection:
+    """Sección inerte devuelta con el profiler desactivado (sin coste)"""
+
+    __slots__ = ()
+    rows = 0
+
+    def __enter__(self) -> '_NullSection':
+        return self
+
+    def __exit__(self, *exc) -> bool:
+        return False
+
+    def __setattr__(self, key: str, value: Any) -> None:
+        pass
+
+
+_NULL_SECTION = _NullSection()
+
+
+def profile_section(name: str, rows: int = 0) -> Union[_Section, _NullSection]:
+    """
+    🔥 Context manager para bloques dentro de una función
+
+        with profile_section('pattern_detector.fvg_scan') as section:
+            records = scan_fair_value_gaps(high, low)
+            section.rows = len(high)
+    """
+    if not _profiler.enabled:
+        return _NULL_SECTION
+    return _Section(name, rows)
+
+
+def _rows_counter(func: Callable, rows: Union[None, str, int, Callable[..., int]]) -> Optional[Callable]:
+    """Resolver una vez cómo obtener las filas procesadas de cada llamada"""
+    if rows is None:
+        return None
+    if callable(rows):
+        return lambda args, kwargs: _safe_len(rows(*args, **kwargs), counted=True)
+
+    if isinstance(rows, int):
+        position, keyword = rows, None
+    else:
+        parameters = list(inspect.signature(func).parameters)
+        position = parameters.index(rows) if rows in parameters else None
+        keyword = rows
+
+    def count(args: tuple, kwargs: dict) -> int:
+        if keyword is not None and keyword in kwargs:
+            return _safe_len(kwargs[keyword])
+        if position is not None and position < len(args):
+            return _safe_len(args[position])
+        return 0
+
+    return count
+
+
+def _safe_len(value: Any, counted: bool = False) -> int:
+    if counted and isinstance(value, (int, float)):
+        return int(value)
+    try:
+        return len(value)
+    except TypeError:
+        return 0
+
+
+# ===============================
+# CLI
+# ===============================
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """🖥️ CLI: run (perfilar un script), folded (convertir JSON), top (tabla)"""
+    parser = argparse.ArgumentParser(prog='hot_path_profiler', description='ICT Engine hot path profiler')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help='Ejecutar un script con el profiler activo (opciones antes del script)')
+    run.add_argument('script')
+    run.add_argument('script_args', nargs=argparse.REMAINDER)
+    run.add_argument('--out', default='hot_path_profile.folded')
+    run.add_argument('--json', dest='json_path')
+    run.add_argument('--metric', choices=METRICS, default='wall')
+    run.add_argument('--memory', action='store_true', help='Muestrear asignaciones con tracemalloc')
+    run.add_argument('--sample-every', type=int, default=16)
+
+    folded = commands.add_parser('folded', help='Convertir un perfil JSON a folded stacks')
+    folded.add_argument('profile')
+    folded.add_argument('--metric', choices=METRICS, default='wall')
+    folded.add_argument('--out')
+
+    top = commands.add_parser('top', help='Funciones más costosas de un perfil JSON')
+    top.add_argument('profile')
+    top.add_argument('-n', type=int, default=20)
+    top.add_argument('--sort', default='wall_ms',
+                     choices=['wall_ms', 'cpu_ms', 'calls', 'rows', 'alloc_bytes_est', 'max_wall_ms'])
+
+    args = parser.parse_args(argv)
+
+    if args.command == 'run':
+        profiler = get_hot_path_profiler()
+        profiler.reset()
+        profiler.enable(trace_memory=args.memory, sample_every=args.sample_every)
+        sys.argv = [args.script] + args.script_args
+        try:
+            runpy.run_path(args.script, run_name='__main__')
+        finally:
+            profiler.disable()
+            profiler.dump_folded(args.out, args.metric)
+            if args.json_path:
+                profiler.dump_json(args.json_path)
+            print(f"🔥 Perfil guardado: {args.out}")
+        return 0
+
+    profiler = HotPathProfiler.load_json(args.profile)
+    if args.command == 'folded':
+        output = profiler.to_folded(args.metric)
+        if args.out:
+            with open(args.out, 'w', encoding='utf-8') as handle:
+                handle.write(output)
+        else:
+            sys.stdout.write(output)
+        return 0
+
+    print(f"{'function':<60} {'calls':>8} {'wall_ms':>10} {'cpu_ms':>10} {'max_ms':>9} {'rows/s':>12} {'alloc_B':>11}")
+    for row in profiler.report(top=args.n, sort_by=args.sort):
+        print(f"{row['function'][:60]:<60} {row['calls']:>8} {row['wall_ms']:>10.2f} {row['cpu_ms']:>10.2f} "
+              f"{row['max_wall_ms']:>9.2f} {row['rows_per_sec']:>12.0f} {row['alloc_bytes_est']:>11}")
+    return 0
+
+
+if __name__ == '__main__':
+    # Con "python -m" este módulo es __main__: delegar en el módulo importable
+    # para que los detectores instrumentados compartan el mismo singleton
+    if __spec__ is not None:
+        import importlib
+        sys.exit(importlib.import_module(__spec__.name).main())
+    sys.exit(main())
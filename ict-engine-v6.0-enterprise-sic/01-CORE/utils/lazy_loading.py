@@ -0,0 +1,460 @@
+#!/usr/bin/env python3
+"""
+🐢 LAZY LOADING - ICT ENGINE v6.0 Enterprise
+============================================
+
+Arranque en frío rápido: módulos pesados y componentes caros se cargan en
+el primer uso, no al importar ni al construir. Retoma la idea de
+LazyModuleProxy / LazyLoadingManager del SIC v3.1 archivado, conectada al
+código vivo:
+
+1. lazy_import()       → proxy de módulo (o atributo) que importa al primer acceso
+2. @lazy_component     → atributo de instancia construido en el primer acceso y
+                         cacheado en __dict__ (después el acceso es directo)
+3. preload_components  → construir componentes en segundo plano tras el primer pintado
+4. StartupProfiler     → marcas de fase desde el inicio del proceso + cargas diferidas
+5. profile_import_time → desglose de `python -X importtime` (self / acumulado)
+
+    python -m utils.lazy_loading importtime core.analysis.pattern_detector --top 15
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import argparse
+import importlib
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+_RAISE = object()
+
+
+# ===============================
+# STARTUP PROFILER
+# ===============================
+
+class StartupProfiler:
+    """
+    ⏱️ Línea de tiempo del arranque
+
+    El origen es la creación del proceso (psutil) o, sin psutil, la primera
+    importación de este módulo. Registra marcas de fase y cada carga diferida
+    (módulo o componente) con su duración.
+    """
+
+    def __init__(self):
+        now = time.perf_counter()
+        self.origin = now
+        if psutil is not None:
+            try:
+                elapsed = time.time() - psutil.Process(os.getpid()).create_time()
+                if 0.0 <= elapsed < 3600.0:
+                    self.origin = now - elapsed
+            except Exception:
+                pass
+        self.marks: List[Dict[str, Any]] = []
+        self.lazy_loads: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self.origin) * 1000.0
+
+    def mark(self, phase: str) -> float:
+        """Registrar una fase del arranque; devuelve ms desde el origen"""
+        at_ms = self.elapsed_ms()
+        with self._lock:
+            self.marks.append({'phase': phase, 'at_ms': round(at_ms, 3), 'modules_loaded': len(sys.modules)})
+        return at_ms
+
+    def record_load(self, kind: str, name: str, duration_ms: float) -> None:
+        with self._lock:
+            self.lazy_loads.append({
+                'kind': kind, 'name': name, 'duration_ms': round(duration_ms, 3),
+                'at_ms': round(self.elapsed_ms(), 3), 'thread': threading.current_thread().name,
+            })
+
+    def report(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'elapsed_ms': round(self.elapsed_ms(), 3),
+                'marks': list(self.marks),
+                'lazy_loads': list(self.lazy_loads),
+                'modules_loaded': len(sys.modules),
+            }
+
+    def format_report(self) -> str:
+        report = self.report()
+        lines = [f"⏱️ Arranque: {report['elapsed_ms']:.1f} ms | módulos cargados: {report['modules_loaded']}"]
+        previous = 0.0
+        for mark in report['marks']:
+            lines.append(f"  {mark['at_ms']:>9.1f} ms (+{mark['at_ms'] - previous:>8.1f})  {mark['phase']}")
+            previous = mark['at_ms']
+        for load in report['lazy_loads']:
+            lines.append(f"  🐢 {load['kind']:<9} {load['name']:<48} {load['duration_ms']:>8.1f} ms @ {load['at_ms']:.1f} ms")
+        return '\n'.join(lines)
+
+
+_startup_profiler: Optional[StartupProfiler] = None
+
+
+def get_startup_profiler() -> StartupProfiler:
+    """Instancia global del profiler de arranque"""
+    global _startup_profiler
+    if _startup_profiler is None:
+        _startup_profiler = StartupProfiler()
+    return _startup_profiler
+
+
+get_startup_profiler()  # El origen sin psutil es la importación de este módulo
+
+
+# ===============================
+# LAZY MODULES
+# ===============================
+
+class LazyModuleProxy:
+    """
+    🔄 Proxy de módulo con carga diferida
+
+    Importa el módulo (y opcionalmente resuelve un atributo) en el primer
+    acceso a un atributo o llamada. Es seguro entre hilos y detecta carga
+    recursiva. Para `isinstance` o herencia usar resolve().
+    """
+
+    def __init__(self, module_name: str, attribute: Optional[str] = None):
+        self._module_name = module_name
+        self._attribute = attribute
+        self._target = None
+        self._loaded = False
+        self._loading = False
+        self._load_time_ms: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def resolve(self) -> Any:
+        """Cargar (si hace falta) y devolver el objeto real"""
+        if self._loaded:
+            return self._target
+        with self._lock:
+            if self._loaded:
+                return self._target
+            if self._loading:
+                raise ImportError(f"Carga recursiva detectada para {self._describe()}")
+            self._loading = True
+            try:
+                start = time.perf_counter()
+                target = importlib.import_module(self._module_name)
+                if self._attribute:
+                    target = getattr(target, self._attribute)
+                self._load_time_ms = (time.perf_counter() - start) * 1000.0
+                self._target = target
+                self._loaded = True
+            finally:
+                self._loading = False
+        get_startup_profiler().record_load('module', self._describe(), self._load_time_ms)
+        return self._target
+
+    def _describe(self) -> str:
+        return f"{self._module_name}.{self._attribute}" if self._attribute else self._module_name
+
+    def __getattr__(self, name: str) -> Any:
+        if name in ('_module_name', '_attribute', '_target', '_loaded', '_lock'):
+            raise AttributeError(name)  # Instancia a medio construir (copy/pickle)
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+    def __dir__(self):
+        return dir(self.resolve())
+
+    def __repr__(self) -> str:
+        return f"<LazyModuleProxy '{self._describe()}' ({'loaded' if self._loaded else 'lazy'})>"
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded
+
+    @property
+    def load_time_ms(self) -> Optional[float]:
+        return self._load_time_ms
+
+
+_lazy_modules: Dict[str, LazyModuleProxy] = {}
+_lazy_modules_lock = threading.Lock()
+
+
+def lazy_import(module_name: str, attribute: Optional[str] = None) -> Any:
+    """
+    🔄 Import diferido
+
+    Si el módulo ya está en sys.modules se devuelve directamente (sin proxy).
+
+    Args:
+        module_name: Módulo a importar ('pandas', 'core.analysis.poi_system')
+        attribute: Atributo a resolver del módulo ('POISystem')
+
+    Returns:
+        Módulo/atributo real o LazyModuleProxy equivalente
+    """
+    module = sys.modules.get(module_name)
+    if module is not None:
+        return getattr(module, attribute) if attribute else module
+    key = f"{module_name}:{attribute or ''}"
+    with _lazy_modules_lock:
+        proxy = _lazy_modules.get(key)
+        if proxy is None:
+            proxy = _lazy_modules[key] = LazyModuleProxy(module_name, attribute)
+    return proxy
+
+
+def is_module_available(module_name: str) -> bool:
+    """Comprobar que un módulo existe sin importarlo"""
+    if module_name in sys.modules:
+        return True
+    try:
+        return importlib.util.find_spec(module_name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+# ===============================
+# LAZY COMPONENTS
+# ===============================
+
+_building = threading.local()
+
+
+class LazyComponent:
+    """
+    🏗️ Descriptor de componente construido en el primer acceso
+
+    Descriptor sin __set__: tras la primera construcción el valor queda en
+    instance.__dict__ y los accesos siguientes no pasan por aquí. Asignar el
+    atributo (p.ej. en tests o para inyectar datos) reemplaza el componente
+    sin construirlo.
+
+    Cada componente tiene su propio lock: dos componentes distintos (o de
+    clases distintas) se construyen en paralelo; sólo se serializan las
+    construcciones del mismo componente.
+    """
+
+    def __init__(self, factory: Callable[[Any], Any], name: Optional[str] = None, fallback: Any = _RAISE):
+        self.factory = factory
+        self.attr = name or factory.__name__
+        self.fallback = fallback
+        self.__doc__ = factory.__doc__
+        self._lock = threading.RLock()
+
+    def __set_name__(self, owner, name: str) -> None:
+        self.attr = name
+        self.owner_name = owner.__name__
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        values = instance.__dict__
+        if self.attr in values:
+            return values[self.attr]
+
+        with self._lock:
+            if self.attr in values:
+                return values[self.attr]
+            stack = getattr(_building, 'stack', None)
+            if stack is None:
+                stack = _building.stack = set()
+            key = (id(instance), self.attr)
+            if key in stack:
+                raise RuntimeError(f"Construcción recursiva del componente {self.attr}")
+            stack.add(key)
+            start = time.perf_counter()
+            try:
+                value = self.factory(instance)
+            except Exception:
+                if self.fallback is _RAISE:
+                    raise
+                value = self.fallback
+            finally:
+                stack.discard(key)
+            values[self.attr] = value
+
+        owner_name = getattr(self, 'owner_name', type(instance).__name__)
+        get_startup_profiler().record_load('component', f"{owner_name}.{self.attr}",
+                                           (time.perf_counter() - start) * 1000.0)
+        return value
+
+
+def lazy_component(factory: Optional[Callable] = None, *, fallback: Any = _RAISE):
+    """
+    Decorador de método-fábrica → componente diferido
+
+        @lazy_component(fallback=None)
+        def _data_manager(self):
+            from core.data_management.ict_data_manager import ICTDataManager
+            return ICTDataManager(downloader=self._downloader)
+
+    Args:
+        fallback: Valor si la fábrica lanza excepción (por defecto se propaga)
+    """
+    if factory is not None:
+        return LazyComponent(factory)
+    return lambda func: LazyComponent(func, fallback=fallback)
+
+
+def is_component_built(instance: Any, name: str) -> bool:
+    """True si el componente ya se construyó (o se asignó)"""
+    return name in instance.__dict__
+
+
+def lazy_component_names(instance_or_class: Any) -> List[str]:
+    """Nombres de los componentes diferidos declarados en la clase"""
+    cls = instance_or_class if isinstance(instance_or_class, type) else type(instance_or_class)
+    names = []
+    for klass in cls.__mro__:
+        names.extend(name for name, value in vars(klass).items()
+                     if isinstance(value, LazyComponent) and name not in names)
+    return names
+
+
+def component_status(instance: Any) -> Dict[str, str]:
+    """Estado 'built' / 'lazy' de cada componente diferido de la instancia"""
+    return {name: 'built' if is_component_built(instance, name) else 'lazy'
+            for name in lazy_component_names(instance)}
+
+
+def preload_components(instance: Any, names: Optional[Iterable[str]] = None,
+                       background: bool = True) -> Optional[threading.Thread]:
+    """
+    🔥 Construir componentes por adelantado (p.ej. tras el primer pintado)
+
+    Args:
+        instance: Objeto con componentes diferidos
+        names: Componentes a construir (None = todos los declarados)
+        background: Construir en un hilo daemon
+
+    Returns:
+        El hilo lanzado (background=True) o None
+    """
+    targets = list(names) if names is not None else lazy_component_names(instance)
+
+    def build():
+        for name in targets:
+            try:
+                getattr(instance, name)
+            except Exception:
+                continue  # El error se volverá a ver en el primer uso real
+
+    if not background:
+        build()
+        return None
+    thread = threading.Thread(target=build, name=f"preload-{type(instance).__name__}", daemon=True)
+    thread.start()
+    return thread
+
+
+# ===============================
+# IMPORT-TIME PROFILING
+# ===============================
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parsear la salida de `python -X importtime` a filas con ms"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+            rows.append({
+                'module': name.strip(),
+                'depth': (len(name) - len(name.lstrip(' '))) // 2,
+                'self_ms': int(self_us) / 1000.0,
+                'cumulative_ms': int(cumulative_us) / 1000.0,
+            })
+        except ValueError:
+            continue
+    return rows
+
+
+def profile_import_time(module_name: str, top: int = 20, python: Optional[str] = None,
+                        extra_paths: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    🔬 Coste de importación de un módulo en un intérprete limpio
+
+    Returns:
+        {'module', 'total_ms', 'wall_ms', 'module_count', 'top_self', 'top_cumulative', 'error'}
+    """
+    paths = list(extra_paths or []) + [p for p in sys.path if p]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(paths))
+    command = [python or sys.executable, '-X', 'importtime', '-c', f'import {module_name}']
+    start = time.perf_counter()
+    completed = subprocess.run(command, capture_output=True, text=True, env=env, timeout=300)
+    wall_ms = (time.perf_counter() - start) * 1000.0
+
+    rows = parse_importtime(completed.stderr)
+    target = next((row for row in reversed(rows) if row['module'] == module_name and row['depth'] == 0), None)
+    error = None
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ['import falló'])[-1]
+    return {
+        'module': module_name,
+        'total_ms': target['cumulative_ms'] if target else sum(r['self_ms'] for r in rows),
+        'wall_ms': round(wall_ms, 3),
+        'module_count': len(rows),
+        'top_self': sorted(rows, key=lambda r: r['self_ms'], reverse=True)[:top],
+        'top_cumulative': sorted(rows, key=lambda r: r['cumulative_ms'], reverse=True)[:top],
+        'error': error,
+    }
+
+
+def format_import_profile(profile: Dict[str, Any]) -> str:
+    lines = [f"🔬 import {profile['module']}: {profile['total_ms']:.1f} ms "
+             f"({profile['module_count']} módulos, proceso {profile['wall_ms']:.0f} ms)"]
+    if profile.get('error'):
+        lines.append(f"  ❌ {profile['error']}")
+    lines.append(f"  {'ACUMULADO ms':>12} {'SELF ms':>9}  MÓDULO")
+    for row in profile['top_cumulative']:
+        lines.append(f"  {row['cumulative_ms']:>12.1f} {row['self_ms']:>9.1f}  {row['module']}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None, extra_paths: Optional[Iterable[str]] = None) -> int:
+    """
+    🖥️ CLI importtime
+
+    Args:
+        extra_paths: Raíces de importación del árbol a perfilar (por defecto 01-CORE)
+    """
+    parser = argparse.ArgumentParser(prog=f'python -m {__name__}',
+                                     description='Perfil de importación y arranque en frío')
+    sub = parser.add_subparsers(dest='command', required=True)
+    imp = sub.add_parser('importtime', help='Coste de importación de uno o más módulos')
+    imp.add_argument('modules', nargs='+')
+    imp.add_argument('--top', type=int, default=20)
+    imp.add_argument('--json', dest='json_path', default=None, help='Guardar el perfil en JSON')
+    args = parser.parse_args(argv)
+
+    if extra_paths is None:
+        extra_paths = [os.path.dirname(os.path.dirname(os.path.abspath(__file__)))]
+    profiles = [profile_import_time(module, top=args.top, extra_paths=extra_paths) for module in args.modules]
+    for profile in profiles:
+        print(format_import_profile(profile))
+    if args.json_path:
+        with open(args.json_path, 'w', encoding='utf-8') as handle:
+            json.dump(profiles, handle, indent=2)
+    return 1 if any(profile['error'] for profile in profiles) else 0
+
+
+if __name__ == '__main__':
+    # Delegar en el módulo canónico para compartir el profiler global
+    sys.exit(importlib.import_module(__spec__.name if __spec__ else 'utils.lazy_loading').main())
@@ -0,0 +1,552 @@
+#!/usr/bin/env python3
+"""
+🧮 MEMORY BUDGET - ICT ENGINE v6.0 Enterprise
+=============================================
+
+Memoria acotada para sesiones largas (un día completo de trading):
+
+1. BoundedHistory   → historial en anillo; lo que sale del anillo se resume
+                      (summarize) y se escribe a disco en JSONL por lotes
+2. MemoryBudget     → vigila el RSS del proceso contra limits.max_process_gb de
+                      memory_config.json. Sobre monitoring.alert_threshold_percent
+                      avisa; sobre cleanup_threshold_percent desaloja en las
+                      cachés registradas (menor prioridad primero) y ejecuta gc
+3. component_report → bytes estimados por componente registrado, para el
+                      monitor del sistema
+
+    history = BoundedHistory(200, name='acc.analysis_history',
+                             summarize=lambda a: {'id': a.analysis_id},
+                             spill_path='data/memory/acc_history.jsonl')
+    budget = get_memory_budget()
+    budget.register('market_context', context)      # usa context.evict(fraction)
+    budget.start()                                   # hilo daemon cada interval_seconds
+
+Los componentes se registran por weakref: registrar no alarga su vida.
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import gc
+import json
+import math
+import os
+import sys
+import threading
+import weakref
+from collections import deque
+from datetime import datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+import numpy as np
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'config', 'memory_config.json')
+DEFAULT_MAX_PROCESS_GB = 4.0
+DEFAULT_ALERT_PERCENT = 85.0
+DEFAULT_CLEANUP_PERCENT = 90.0
+DEFAULT_INTERVAL_SECONDS = 10.0
+DEFAULT_EVICT_FRACTION = 0.5
+
+_GB = 1024 ** 3
+
+
+# ===============================
+# HISTORIAL EN ANILLO
+# ===============================
+
+class BoundedHistory:
+    """
+    📚 Historial acotado con resumen a disco
+
+    Se usa como una lista de solo-añadir: append, extend, len, iteración,
+    índice y slicing (los slices devuelven list). Al superar `maxlen` el
+    elemento más antiguo sale del anillo; si hay `summarize` su resumen se
+    acumula y se escribe en `spill_path` (JSONL) cada `spill_batch` elementos.
+
+    Args:
+        maxlen: Elementos retenidos en memoria
+        name: Nombre para métricas y logs
+        summarize: elemento → dict JSON-serializable (None = sin resumen)
+        spill_path: Archivo JSONL de resúmenes (None = solo se cuentan)
+        spill_batch: Resúmenes acumulados antes de escribir a disco
+    """
+
+    def __init__(self, maxlen: int, name: str = '', summarize: Optional[Callable[[Any], Dict[str, Any]]] = None,
+                 spill_path: Optional[str] = None, spill_batch: int = 64):
+        if maxlen <= 0:
+            raise ValueError("maxlen debe ser positivo")
+        self.maxlen = int(maxlen)
+        self.name = name
+        self.summarize = summarize
+        self.spill_path = spill_path
+        self.spill_batch = max(1, int(spill_batch))
+        self.total_appended = 0
+        self.dropped = 0
+        self.spilled = 0
+        self._items: deque = deque()
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.RLock()
+
+    # --- Secuencia ---
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __bool__(self) -> bool:
+        return bool(self._items)
+
+    def __iter__(self) -> Iterator[Any]:
+        with self._lock:
+            return iter(list(self._items))
+
+    def __reversed__(self) -> Iterator[Any]:
+        with self._lock:
+            return iter(list(reversed(self._items)))
+
+    def __getitem__(self, index):
+        with self._lock:
+            if isinstance(index, slice):
+                start, stop, step = index.indices(len(self._items))
+                if step == 1:
+                    return list(islice(self._items, start, stop))
+                return list(self._items)[index]
+            return self._items[index]
+
+    def __repr__(self) -> str:
+        return f"<BoundedHistory {self.name or '-'} {len(self._items)}/{self.maxlen} dropped={self.dropped}>"
+
+    # --- Escritura ---
+
+    def append(self, item: Any) -> None:
+        with self._lock:
+            self._items.append(item)
+            self.total_appended += 1
+            if len(self._items) > self.maxlen:
+                self._drop(1)
+
+    def extend(self, items: Iterable[Any]) -> None:
+        with self._lock:
+            for item in items:
+                self.append(item)
+
+    def replace(self, items: Iterable[Any]) -> None:
+        """Sustituir el contenido (restauración de estado) sin resumir lo anterior"""
+        with self._lock:
+            self._items = deque(items)
+            while len(self._items) > self.maxlen:
+                self._items.popleft()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+    def recent(self, count: int) -> List[Any]:
+        """Últimos `count` elementos (más antiguo primero)"""
+        return self[-count:] if count > 0 else []
+
+    # --- Desalojo ---
+
+    def evict(self, fraction: float = DEFAULT_EVICT_FRACTION) -> int:
+        """Sacar la fracción más antigua del anillo (con resumen). Devuelve elementos desalojados."""
+        with self._lock:
+            count = min(len(self._items), math.ceil(len(self._items) * max(0.0, min(1.0, fraction))))
+            self._drop(count)
+            self.flush()
+            return count
+
+    def resize(self, maxlen: int) -> None:
+        with self._lock:
+            self.maxlen = max(1, int(maxlen))
+            if len(self._items) > self.maxlen:
+                self._drop(len(self._items) - self.maxlen)
+
+    def flush(self) -> None:
+        """Escribir los resúmenes pendientes"""
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, []
+            if self.spill_path:
+                self.spilled += spill_records(self.spill_path, pending)
+
+    def read_spilled(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Resúmenes escritos a disco (los últimos `limit`) + pendientes"""
+        summaries: deque = deque(maxlen=limit)
+        if self.spill_path and os.path.exists(self.spill_path):
+            with open(self.spill_path, 'r', encoding='utf-8') as handle:
+                for line in handle:
+                    if line.strip():
+                        summaries.append(json.loads(line))
+        summaries.extend(self._pending)
+        return list(summaries)
+
+    # --- Métricas ---
+
+    def memory_bytes(self) -> int:
+        with self._lock:
+            return estimate_size(self._items)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'size': len(self._items),
+            'maxlen': self.maxlen,
+            'total_appended': self.total_appended,
+            'dropped': self.dropped,
+            'spilled': self.spilled,
+            'pending_summaries': len(self._pending),
+        }
+
+    def _drop(self, count: int) -> None:
+        for _ in range(count):
+            item = self._items.popleft()
+            self.dropped += 1
+            if self.summarize is not None:
+                try:
+                    self._pending.append(self.summarize(item))
+                except Exception:
+                    pass  # Un resumen fallido no debe bloquear el anillo
+        if len(self._pending) >= self.spill_batch:
+            self.flush()
+
+
+def spill_records(path: str, records: List[Dict[str, Any]]) -> int:
+    """Añadir resúmenes a un JSONL. Devuelve los escritos (0 si el disco falla)."""
+    if not records:
+        return 0
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'a', encoding='utf-8') as handle:
+            for record in records:
+                handle.write(json.dumps(record, default=str) + '\n')
+        return len(records)
+    except OSError:
+        return 0  # Sin disco la memoria sigue acotada; solo se pierden los resúmenes
+
+
+# ===============================
+# ESTIMACIÓN DE TAMAÑO
+# ===============================
+
+def estimate_size(obj: Any, sample: int = 32, depth: int = 3) -> int:
+    """
+    Bytes aproximados de `obj` y su contenido
+
+    Los contenedores grandes se estiman por muestreo (tamaño medio de
+    `sample` elementos × longitud). Reconoce memory_usage() de ColumnarStore,
+    arrays NumPy y DataFrames/Series de pandas.
+    """
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    memory_usage = getattr(obj, 'memory_usage', None)
+    if callable(memory_usage) and not isinstance(obj, type):
+        try:
+            if hasattr(obj, 'index'):  # DataFrame / Series
+                usage = memory_usage(deep=True)
+                return int(usage.sum() if hasattr(usage, 'sum') else usage)
+            usage = memory_usage()
+            if isinstance(usage, dict) and 'total_bytes' in usage:  # ColumnarStore
+                return int(usage['total_bytes'])
+        except Exception:
+            pass
+    if isinstance(obj, BoundedHistory):
+        return obj.memory_bytes()
+
+    size = sys.getsizeof(obj, 0)
+    if depth <= 0 or isinstance(obj, (str, bytes, int, float, bool, type(None))):
+        return size
+    if isinstance(obj, dict):
+        items = obj.items()
+        count = len(obj)
+        if not count:
+            return size
+        picked = list(islice(items, sample))
+        per_item = sum(estimate_size(k, sample, depth - 1) + estimate_size(v, sample, depth - 1)
+                       for k, v in picked) / len(picked)
+        return size + int(per_item * count)
+    if isinstance(obj, (list, tuple, set, frozenset, deque)):
+        count = len(obj)
+        if not count:
+            return size
+        picked = list(islice(obj, sample))
+        per_item = sum(estimate_size(item, sample, depth - 1) for item in picked) / len(picked)
+        return size + int(per_item * count)
+    attributes = getattr(obj, '__dict__', None)
+    if attributes is not None:
+        return size + estimate_size(attributes, sample, depth - 1)
+    slots = getattr(type(obj), '__slots__', ())
+    if slots:
+        return size + sum(estimate_size(getattr(obj, slot, None), sample, depth - 1)
+                          for slot in ([slots] if isinstance(slots, str) else slots))
+    return size
+
+
+def process_rss_bytes() -> int:
+    """RSS actual del proceso (psutil, /proc o pico de getrusage como último recurso)"""
+    if psutil is not None:
+        try:
+            return int(psutil.Process(os.getpid()).memory_info().rss)
+        except Exception:
+            pass
+    try:
+        with open('/proc/self/statm', 'r') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return int(peak if sys.platform == 'darwin' else peak * 1024)
+    except Exception:
+        return 0
+
+
+# ===============================
+# PRESUPUESTO DE MEMORIA
+# ===============================
+
+class _Registration:
+    __slots__ = ('name', 'target', 'evict', 'sizer', 'priority')
+
+    def __init__(self, name: str, target: Any, evict: Optional[Callable], sizer: Optional[Callable], priority: int):
+        self.name = name
+        try:
+            self.target = weakref.ref(target)
+        except TypeError:
+            self.target = lambda target=target: target  # dict/list: referencia fuerte
+        self.evict = evict
+        self.sizer = sizer
+        self.priority = priority
+
+    def resolve(self) -> Any:
+        return self.target()
+
+
+class MemoryBudget:
+    """
+    🧮 Presupuesto de memoria del proceso con desalojo coordinado
+
+    check() compara el RSS con el límite:
+      - < alert%     → 'OK'
+      - ≥ alert%     → 'ALERT' (solo aviso)
+      - ≥ cleanup%   → 'CLEANUP': desaloja `evict_fraction` en cada componente
+                       registrado, de menor a mayor prioridad, con gc.collect()
+                       entre pasos, hasta volver bajo el umbral de alerta
+
+    Args:
+        max_process_gb: Límite del proceso (limits.max_process_gb)
+        alert_percent: monitoring.alert_threshold_percent
+        cleanup_percent: monitoring.cleanup_threshold_percent
+        interval_seconds: Periodo del hilo de vigilancia
+        evict_fraction: Fracción desalojada por componente en cada paso
+        rss_reader: Lector de RSS (inyectable en tests)
+    """
+
+    def __init__(self, max_process_gb: float = DEFAULT_MAX_PROCESS_GB, alert_percent: float = DEFAULT_ALERT_PERCENT,
+                 cleanup_percent: float = DEFAULT_CLEANUP_PERCENT, interval_seconds: float = DEFAULT_INTERVAL_SECONDS,
+                 evict_fraction: float = DEFAULT_EVICT_FRACTION, rss_reader: Optional[Callable[[], int]] = None):
+        self.limit_bytes = int(max_process_gb * _GB)
+        self.alert_percent = float(alert_percent)
+        self.cleanup_percent = float(cleanup_percent)
+        self.interval_seconds = float(interval_seconds)
+        self.evict_fraction = float(evict_fraction)
+        self.rss_reader = rss_reader or process_rss_bytes
+        self.cleanups = 0
+        self.last_check: Dict[str, Any] = {}
+        self._registrations: List[_Registration] = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_config(cls, config: Any = None, **overrides) -> 'MemoryBudget':
+        """Crear desde memory_config.json (ruta o dict); sin archivo usa los valores por defecto"""
+        if config is None:
+            config = DEFAULT_CONFIG_PATH
+        if isinstance(config, str):
+            try:
+                with open(config, 'r', encoding='utf-8') as handle:
+                    config = json.load(handle)
+            except (OSError, ValueError):
+                config = {}
+        limits = config.get('limits', {})
+        monitoring = config.get('monitoring', {})
+        settings = {
+            'max_process_gb': limits.get('max_process_gb', DEFAULT_MAX_PROCESS_GB),
+            'alert_percent': monitoring.get('alert_threshold_percent', DEFAULT_ALERT_PERCENT),
+            'cleanup_percent': monitoring.get('cleanup_threshold_percent', DEFAULT_CLEANUP_PERCENT),
+            'interval_seconds': monitoring.get('interval_seconds', DEFAULT_INTERVAL_SECONDS),
+        }
+        settings.update(overrides)
+        return cls(**settings)
+
+    # --- Registro ---
+
+    def register(self, name: str, target: Any, evict: Optional[Callable[[Any, float], int]] = None,
+                 sizer: Optional[Callable[[Any], int]] = None, priority: int = 50) -> None:
+        """
+        Registrar un componente desalojable
+
+        Args:
+            name: Nombre en el reporte (varias instancias con el mismo nombre se suman)
+            target: Objeto (se guarda por weakref cuando es posible)
+            evict: (target, fraction) → elementos liberados; por defecto target.evict(fraction)
+            sizer: target → bytes; por defecto target.memory_bytes() o estimate_size
+            priority: Menor = se desaloja antes (cachés reconstruibles < historiales)
+        """
+        with self._lock:
+            self._prune()
+            self._registrations.append(_Registration(name, target, evict, sizer, priority))
+
+    def unregister(self, name: str) -> None:
+        with self._lock:
+            self._registrations = [reg for reg in self._registrations if reg.name != name]
+
+    def registered_names(self) -> List[str]:
+        with self._lock:
+            self._prune()
+            return sorted({reg.name for reg in self._registrations})
+
+    # --- Medición ---
+
+    def component_report(self) -> Dict[str, Dict[str, Any]]:
+        """{nombre: {'bytes', 'instances', 'priority'}} ordenado por bytes"""
+        report: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            self._prune()
+            registrations = list(self._registrations)
+        for reg in registrations:
+            target = reg.resolve()
+            if target is None:
+                continue
+            entry = report.setdefault(reg.name, {'bytes': 0, 'instances': 0, 'priority': reg.priority})
+            entry['bytes'] += self._size_of(reg, target)
+            entry['instances'] += 1
+        return dict(sorted(report.items(), key=lambda item: item[1]['bytes'], reverse=True))
+
+    def check(self) -> Dict[str, Any]:
+        """Medir RSS, desalojar si supera el umbral de limpieza y devolver el estado"""
+        rss = self.rss_reader()
+        status = self._status_for(rss)
+        result: Dict[str, Any] = {
+            'timestamp': datetime.now().isoformat(),
+            'rss_bytes': rss,
+            'limit_bytes': self.limit_bytes,
+            'usage_percent': self._percent(rss),
+            'status': status,
+            'evicted': {},
+        }
+        if status == 'CLEANUP':
+            result['evicted'] = self.enforce()
+            result['rss_after_bytes'] = self.rss_reader()
+            result['usage_after_percent'] = self._percent(result['rss_after_bytes'])
+        self.last_check = result
+        return result
+
+    def enforce(self) -> Dict[str, int]:
+        """Desalojar por prioridad hasta quedar bajo el umbral de alerta"""
+        evicted: Dict[str, int] = {}
+        with self._lock:
+            self._prune()
+            registrations = sorted(self._registrations, key=lambda reg: reg.priority)
+        self.cleanups += 1
+        for reg in registrations:
+            target = reg.resolve()
+            if target is None:
+                continue
+            try:
+                freed = reg.evict(target, self.evict_fraction) if reg.evict else target.evict(self.evict_fraction)
+            except Exception:
+                continue
+            evicted[reg.name] = evicted.get(reg.name, 0) + int(freed or 0)
+            gc.collect()
+            if self._percent(self.rss_reader()) < self.alert_percent:
+                break
+        return evicted
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Último check + reporte por componente (para el monitor del sistema)"""
+        return {
+            'limit_gb': round(self.limit_bytes / _GB, 2),
+            'alert_percent': self.alert_percent,
+            'cleanup_percent': self.cleanup_percent,
+            'cleanups': self.cleanups,
+            'last_check': dict(self.last_check),
+            'components': self.component_report(),
+            'monitoring': self.is_running,
+        }
+
+    # --- Vigilancia en segundo plano ---
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval_seconds: Optional[float] = None) -> None:
+        if self.is_running:
+            return
+        if interval_seconds is not None:
+            self.interval_seconds = float(interval_seconds)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='memory-budget', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5.0)
+        self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.check()
+            except Exception:
+                pass
+
+    # --- Internos ---
+
+    def _percent(self, rss: int) -> float:
+        return round(rss * 100.0 / self.limit_bytes, 2) if self.limit_bytes else 0.0
+
+    def _status_for(self, rss: int) -> str:
+        percent = self._percent(rss)
+        if percent >= self.cleanup_percent:
+            return 'CLEANUP'
+        if percent >= self.alert_percent:
+            return 'ALERT'
+        return 'OK'
+
+    def _size_of(self, reg: _Registration, target: Any) -> int:
+        try:
+            if reg.sizer is not None:
+                return int(reg.sizer(target))
+            if callable(getattr(target, 'memory_bytes', None)):
+                return int(target.memory_bytes())
+            return estimate_size(target)
+        except Exception:
+            return 0
+
+    def _prune(self) -> None:
+        self._registrations = [reg for reg in self._registrations if reg.resolve() is not None]
+
+
+_memory_budget: Optional[MemoryBudget] = None
+_memory_budget_lock = threading.Lock()
+
+
+def get_memory_budget() -> MemoryBudget:
+    """Presupuesto global del proceso (configurado desde config/memory_config.json)"""
+    global _memory_budget
+    if _memory_budget is None:
+        with _memory_budget_lock:
+            if _memory_budget is None:
+                _memory_budget = MemoryBudget.from_config()
+    return _memory_budget
@@ -0,0 +1,663 @@
+#!/usr/bin/env python3
+"""
+📜 MEMORY WAL - ICT ENGINE v6.0 Enterprise
+==========================================
+
+Persistencia de la memoria (MarketContextV6, ICTHistoricalAnalyzerV6,
+memoria unificada) como registro de mutaciones de solo-añadir en binario
+compacto, con snapshots compactados periódicos:
+
+1. Codificación   → registros struct (op, longitud, crc32) con valores en un
+                    formato etiquetado propio: None, bool, int, float, str,
+                    bytes, datetime, list y dict (numpy → nativo, resto → str,
+                    como json default=str). Sin dependencias externas
+2. MemoryWAL      → estado clave → valor. set() solo escribe si el valor
+                    codificado cambió; append() añade elementos a una lista
+                    acotada (maxlen) sin reescribirla. Guardar cuesta O(cambios)
+3. Compactación   → cuando el log supera compact_ratio × snapshot se reescribe
+                    el snapshot (escritura atómica) y el log empieza de cero.
+                    Cada log lleva la generación del snapshot al que sigue: un
+                    log anterior al snapshot se descarta al arrancar
+4. Flusher        → hilo daemon que escribe lo pendiente cada flush_interval;
+                    set()/append() solo codifican y encolan. Al salir del
+                    proceso se vacía lo pendiente
+5. Un escritor    → <name>.lock con bloqueo exclusivo del SO (flock/msvcrt,
+                    se libera solo si el proceso muere). Si otro proceso lo
+                    tiene, el log se abre en solo lectura: se reproduce, pero
+                    nada se escribe ni se trunca. Dentro del proceso,
+                    open_wal() comparte una instancia por ruta
+
+    wal = open_wal('cache/memory', 'market_context')
+    wal.start()
+    wal.set('market_context', {'market_bias': 'BULLISH'})
+    wal.append('bos_events', [event], maxlen=50)
+    state = wal.to_dict()                    # al arrancar: snapshot + log
+
+Un registro incompleto al final del log (proceso cortado a mitad de
+escritura) se descarta y el archivo se trunca en el último registro válido.
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import atexit
+import dataclasses
+import os
+import struct
+import threading
+import weakref
+import zlib
+from collections import deque
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+OP_HEADER = 0
+OP_SET = 1
+OP_DELETE = 2
+OP_APPEND = 3
+
+SNAPSHOT_SUFFIX = '.snap'
+LOG_SUFFIX = '.wal'
+LOCK_SUFFIX = '.lock'
+
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_COMPACT_MIN_BYTES = 1 << 20
+DEFAULT_COMPACT_RATIO = 2.0
+
+_RECORD = struct.Struct('<BII')  # op, longitud del payload, crc32
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+_F64 = struct.Struct('<d')
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+# ===============================
+# CODIFICACIÓN DE VALORES
+# ===============================
+
+def _encode(value: Any, out: bytearray) -> None:
+    if value is None:
+        out += b'N'
+    elif value is True or value is False:
+        out += b'T' if value else b'F'
+    elif isinstance(value, int) and not isinstance(value, Enum):
+        if _INT64_MIN <= value <= _INT64_MAX:
+            out += b'i'
+            out += _I64.pack(value)
+        else:
+            _encode_text(b'I', str(value), out)
+    elif isinstance(value, float):
+        out += b'd'
+        out += _F64.pack(value)
+    elif isinstance(value, str):
+        _encode_text(b's', value, out)
+    elif isinstance(value, dict):
+        out += b'm'
+        out += _U32.pack(len(value))
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif isinstance(value, (list, tuple, deque)):
+        out += b'l'
+        out += _U32.pack(len(value))
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, datetime):
+        _encode_text(b't', datetime.isoformat(value), out)
+    elif isinstance(value, (bytes, bytearray)):
+        out += b'b'
+        out += _U32.pack(len(value))
+        out += value
+    elif isinstance(value, np.generic):
+        _encode(value.item(), out)
+    elif isinstance(value, np.ndarray):
+        _encode(value.tolist(), out)
+    elif isinstance(value, Enum):
+        _encode(value.value, out)
+    elif isinstance(value, (set, frozenset)):
+        _encode(list(value), out)
+    elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+        _encode(dataclasses.asdict(value), out)
+    elif isinstance(value, date):
+        _encode_text(b's', value.isoformat(), out)
+    else:
+        _encode_text(b's', str(value), out)
+
+
+def _encode_text(tag: bytes, text: str, out: bytearray) -> None:
+    raw = text.encode('utf-8')
+    out += tag
+    out += _U32.pack(len(raw))
+    out += raw
+
+
+def _decode(buf: bytes, pos: int) -> Tuple[Any, int]:
+    tag = buf[pos:pos + 1]
+    pos += 1
+    if tag == b'N':
+        return None, pos
+    if tag == b'T':
+        return True, pos
+    if tag == b'F':
+        return False, pos
+    if tag == b'i':
+        return _I64.unpack_from(buf, pos)[0], pos + 8
+    if tag == b'd':
+        return _F64.unpack_from(buf, pos)[0], pos + 8
+    if tag == b'l':
+        count = _U32.unpack_from(buf, pos)[0]
+        pos += 4
+        items = []
+        for _ in range(count):
+            item, pos = _decode(buf, pos)
+            items.append(item)
+        return items, pos
+    if tag == b'm':
+        count = _U32.unpack_from(buf, pos)[0]
+        pos += 4
+        mapping = {}
+        for _ in range(count):
+            key, pos = _decode(buf, pos)
+            mapping[key], pos = _decode(buf, pos)
+        return mapping, pos
+
+    size = _U32.unpack_from(buf, pos)[0]
+    pos += 4
+    raw = bytes(buf[pos:pos + size])
+    if len(raw) != size:
+        raise ValueError("valor truncado")
+    pos += size
+    if tag == b's':
+        return raw.decode('utf-8'), pos
+    if tag == b'b':
+        return raw, pos
+    if tag == b't':
+        return datetime.fromisoformat(raw.decode('utf-8')), pos
+    if tag == b'I':
+        return int(raw), pos
+    raise ValueError(f"etiqueta desconocida {tag!r}")
+
+
+def _skip(buf: bytes, pos: int) -> int:
+    """Fin del valor que empieza en `pos` (sin construirlo)"""
+    tag = buf[pos:pos + 1]
+    pos += 1
+    if tag in (b'N', b'T', b'F'):
+        return pos
+    if tag in (b'i', b'd'):
+        return pos + 8
+    count = _U32.unpack_from(buf, pos)[0]
+    pos += 4
+    if tag == b'l':
+        for _ in range(count):
+            pos = _skip(buf, pos)
+        return pos
+    if tag == b'm':
+        for _ in range(2 * count):
+            pos = _skip(buf, pos)
+        return pos
+    return pos + count
+
+
+def dumps(value: Any) -> bytes:
+    """Valor → bytes en el formato etiquetado"""
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def loads(data: bytes) -> Any:
+    """bytes → valor (inverso de dumps)"""
+    value, _ = _decode(data, 0)
+    return value
+
+
+# ===============================
+# REGISTROS
+# ===============================
+
+def _frame(op: int, payload: bytes) -> bytes:
+    return _RECORD.pack(op, len(payload), zlib.crc32(payload)) + payload
+
+
+def _list_payload(parts: List[bytes]) -> bytes:
+    """Lista ya codificada a partir de elementos codificados"""
+    return b'l' + _U32.pack(len(parts)) + b''.join(parts)
+
+
+def _read_records(data: bytes) -> Tuple[List[Tuple[int, bytes]], int]:
+    """(op, payload) válidos y el offset tras el último (el resto está roto)"""
+    records, pos = [], 0
+    while pos + _RECORD.size <= len(data):
+        op, size, crc = _RECORD.unpack_from(data, pos)
+        start = pos + _RECORD.size
+        payload = data[start:start + size]
+        if len(payload) != size or zlib.crc32(payload) != crc:
+            break
+        records.append((op, payload))
+        pos = start + size
+    return records, pos
+
+
+_open_wals: 'weakref.WeakSet[MemoryWAL]' = weakref.WeakSet()
+_shared_wals: Dict[str, 'MemoryWAL'] = {}
+_shared_lock = threading.Lock()
+
+
+@atexit.register
+def _flush_open_wals() -> None:
+    for wal in list(_open_wals):
+        try:
+            wal.close()
+        except Exception:
+            pass
+
+
+def _try_lock(path: str) -> Optional[int]:
+    """Descriptor de `path` con bloqueo exclusivo; None si otro lo tiene"""
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def _unlock(fd: int) -> None:
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+    finally:
+        os.close(fd)
+
+
+# ===============================
+# LOG DE MUTACIONES
+# ===============================
+
+class MemoryWAL:
+    """
+    📜 Estado clave → valor persistido como snapshot + log de mutaciones
+
+    Los valores se guardan codificados: lo que el llamador mute después de
+    set()/append() no altera lo persistido, y el snapshot es una
+    concatenación de bytes. get()/to_dict() decodifican bajo demanda.
+
+    Solo escribe quien tiene <name>.lock: si otro proceso lo tiene,
+    read_only=True y las mutaciones se quedan en memoria. close() lo libera.
+
+    Args:
+        directory: Directorio de los archivos <name>.snap y <name>.wal
+        name: Nombre del almacén
+        flush_interval: Segundos entre escrituras del flusher (start())
+        compact_min_bytes: Tamaño mínimo del log para compactar
+        compact_ratio: Compactar cuando log > ratio × snapshot
+        fsync: os.fsync tras cada escritura (durabilidad ante corte de luz)
+    """
+
+    def __init__(self, directory: str, name: str, flush_interval: float = DEFAULT_FLUSH_INTERVAL,
+                 compact_min_bytes: int = DEFAULT_COMPACT_MIN_BYTES,
+                 compact_ratio: float = DEFAULT_COMPACT_RATIO, fsync: bool = False):
+        self.directory = directory
+        self.name = name
+        self.snapshot_path = os.path.join(directory, name + SNAPSHOT_SUFFIX)
+        self.log_path = os.path.join(directory, name + LOG_SUFFIX)
+        self.lock_path = os.path.join(directory, name + LOCK_SUFFIX)
+        self.flush_interval = max(0.01, float(flush_interval))
+        self.compact_min_bytes = int(compact_min_bytes)
+        self.compact_ratio = float(compact_ratio)
+        self.fsync = fsync
+
+        self.generation = 0
+        self.snapshot_bytes = 0
+        self.log_bytes = 0
+        self.stats = {'records': 0, 'unchanged': 0, 'flushes': 0, 'bytes_written': 0,
+                      'compactions': 0, 'replayed': 0, 'discarded_bytes': 0, 'last_error': None}
+
+        self._values: Dict[str, Union[bytes, deque]] = {}
+        self._pending = bytearray()
+        self._lock = threading.RLock()     # estado y pendientes
+        self._io_lock = threading.Lock()   # archivos
+        self._file = None
+        self._log_valid = False            # el log en disco sigue al snapshot actual
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        os.makedirs(directory, exist_ok=True)
+        self._lock_fd = _try_lock(self.lock_path)
+        self.read_only = self._lock_fd is None
+        self.closed = False
+        if self.read_only:
+            self.stats['last_error'] = f"{os.path.basename(self.lock_path)} bloqueado por otro proceso"
+
+        self._load()
+        _open_wals.add(self)
+
+    # --- Lectura ---
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._values
+
+    def keys(self) -> List[str]:
+        with self._lock:
+            return list(self._values)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            raw = self._values.get(key)
+            if raw is None:
+                return default
+            if isinstance(raw, deque):
+                return [loads(item) for item in raw]
+            return loads(raw)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Estado completo decodificado (restauración al arrancar)"""
+        return {key: self.get(key) for key in self.keys()}
+
+    def items(self, prefix: str = '') -> Iterator[Tuple[str, Any]]:
+        """(clave, valor) de las claves que empiezan por `prefix`"""
+        for key in self.keys():
+            if key.startswith(prefix):
+                yield key, self.get(key)
+
+    # --- Mutaciones (solo codifican y encolan) ---
+
+    def set(self, key: str, value: Any) -> bool:
+        """Fija `key`; False si el valor codificado no cambió (no se escribe nada)"""
+        encoded = dumps(value)
+        with self._lock:
+            if self._values.get(key) == encoded:
+                self.stats['unchanged'] += 1
+                return False
+            self._values[key] = encoded
+            self._queue(OP_SET, _list_payload([dumps(key), encoded]))
+        return True
+
+    def update(self, mapping: Dict[str, Any]) -> int:
+        """set() de cada par; devuelve las claves que cambiaron"""
+        return sum(1 for key, value in mapping.items() if self.set(key, value))
+
+    def delete(self, key: str) -> bool:
+        with self._lock:
+            if key not in self._values:
+                return False
+            del self._values[key]
+            self._queue(OP_DELETE, _list_payload([dumps(key)]))
+        return True
+
+    def append(self, key: str, items: Iterable[Any], maxlen: Optional[int] = None,
+               replace: bool = False) -> int:
+        """
+        Añade `items` a la lista `key` (se conservan los últimos `maxlen`)
+
+        replace=True sustituye la lista entera (línea base tras migrar).
+        """
+        encoded = [dumps(item) for item in items]
+        with self._lock:
+            if replace:
+                self.delete(key)
+            if not encoded:
+                return 0
+            current = self._values.get(key)
+            if not isinstance(current, deque) or current.maxlen != maxlen:
+                previous = [] if not isinstance(current, deque) else list(current)
+                current = self._values[key] = deque(previous, maxlen=maxlen)
+            current.extend(encoded)
+            self._queue(OP_APPEND, _list_payload([dumps(key), _list_payload(encoded), dumps(maxlen)]))
+        return len(encoded)
+
+    def _queue(self, op: int, payload: bytes) -> None:
+        if self.read_only:
+            return
+        self._pending += _frame(op, payload)
+        self.stats['records'] += 1
+
+    @property
+    def pending_bytes(self) -> int:
+        return len(self._pending)
+
+    # --- Escritura ---
+
+    def flush(self) -> int:
+        """Escribe lo pendiente ahora; devuelve los bytes escritos"""
+        with self._io_lock:
+            with self._lock:
+                pending, self._pending = bytes(self._pending), bytearray()
+            if not pending:
+                return 0
+            try:
+                self._write_log(pending)
+            except OSError as e:
+                with self._lock:
+                    self._pending[:0] = pending  # Se reintenta en el siguiente flush
+                self.stats['last_error'] = str(e)
+                return 0
+            self.stats['flushes'] += 1
+            self.stats['bytes_written'] += len(pending)
+            compact = self.log_bytes >= max(self.compact_min_bytes, self.compact_ratio * self.snapshot_bytes)
+        if compact:
+            self.compact()
+        return len(pending)
+
+    def _ensure_lock(self) -> None:
+        """Recupera el bloqueo tras close() (escrituras tardías); OSError si otro lo tiene"""
+        if self._lock_fd is None:
+            self._lock_fd = _try_lock(self.lock_path)
+            if self._lock_fd is None:
+                raise OSError(f"{os.path.basename(self.lock_path)} bloqueado por otro proceso")
+
+    def _write_log(self, data: bytes) -> None:
+        self._ensure_lock()
+        if self._file is None:
+            os.makedirs(self.directory, exist_ok=True)
+            if self._log_valid:
+                self._file = open(self.log_path, 'ab')
+            else:
+                self._file = open(self.log_path, 'wb')
+                header = _frame(OP_HEADER, dumps(self.generation))
+                self._file.write(header)
+                self.log_bytes = len(header)
+                self._log_valid = True
+        self._file.write(data)
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.log_bytes += len(data)
+
+    def compact(self) -> None:
+        """Reescribe el snapshot con el estado actual y empieza un log nuevo"""
+        if self.read_only:
+            return
+        with self._io_lock:
+            with self._lock:
+                generation = self.generation + 1
+                parts = [_frame(OP_HEADER, dumps(generation))]
+                for key, raw in self._values.items():
+                    if isinstance(raw, deque):
+                        payload = _list_payload([dumps(key), _list_payload(list(raw)), dumps(raw.maxlen)])
+                        parts.append(_frame(OP_APPEND, payload))
+                    else:
+                        parts.append(_frame(OP_SET, _list_payload([dumps(key), raw])))
+                pending, self._pending = self._pending, bytearray()  # Incluido en el snapshot
+            data = b''.join(parts)
+            try:
+                self._ensure_lock()
+                os.makedirs(self.directory, exist_ok=True)
+                tmp_path = self.snapshot_path + '.tmp'
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.snapshot_path)
+            except OSError as e:
+                with self._lock:
+                    self._pending[:0] = pending
+                self.stats['last_error'] = str(e)
+                return
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self.generation = generation
+            self.snapshot_bytes = len(data)
+            self.log_bytes = 0
+            self._log_valid = False  # El próximo flush crea el log de esta generación
+            self.stats['compactions'] += 1
+
+    # --- Carga ---
+
+    def _load(self) -> None:
+        snapshot_generation = self._replay_file(self.snapshot_path, snapshot=True)
+        if snapshot_generation is not None:
+            self.generation = snapshot_generation
+            self.snapshot_bytes = os.path.getsize(self.snapshot_path)
+
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, 'rb') as f:
+            data = f.read()
+        records, valid = _read_records(data)
+        if not records or records[0][0] != OP_HEADER or loads(records[0][1]) < self.generation:
+            return  # Log vacío o anterior al snapshot: se reescribe en el primer flush
+        self.generation = loads(records[0][1])
+
+        for op, payload in records[1:]:
+            self._apply(op, payload)
+        self.stats['replayed'] += len(records) - 1
+        if valid < len(data) and not self.read_only:
+            self.stats['discarded_bytes'] += len(data) - valid
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(valid)
+        self.log_bytes = valid
+        self._log_valid = True
+
+    def _replay_file(self, path: str, snapshot: bool = False) -> Optional[int]:
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        records, valid = _read_records(data)
+        if not records or records[0][0] != OP_HEADER or (snapshot and valid < len(data)):
+            self.stats['last_error'] = f"{os.path.basename(path)} ilegible"
+            return None
+        for op, payload in records[1:]:
+            self._apply(op, payload)
+        return loads(records[0][1])
+
+    def _apply(self, op: int, payload: bytes) -> None:
+        """Aplica un registro sin decodificar los valores (solo se delimitan)"""
+        pos = 5  # 'l' + número de elementos
+        key, pos = _decode(payload, pos)
+        if op == OP_SET:
+            self._values[key] = bytes(payload[pos:_skip(payload, pos)])
+        elif op == OP_DELETE:
+            self._values.pop(key, None)
+        elif op == OP_APPEND:
+            count = _U32.unpack_from(payload, pos + 1)[0]
+            pos += 5
+            items = []
+            for _ in range(count):
+                end = _skip(payload, pos)
+                items.append(bytes(payload[pos:end]))
+                pos = end
+            maxlen, _ = _decode(payload, pos)
+            current = self._values.get(key)
+            if not isinstance(current, deque) or current.maxlen != maxlen:
+                previous = [] if not isinstance(current, deque) else list(current)
+                current = self._values[key] = deque(previous, maxlen=maxlen)
+            current.extend(items)
+
+    # --- Flusher en segundo plano ---
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> bool:
+        """Lanza el flusher; False si ya estaba corriendo"""
+        if self.is_running:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=f'memory-wal-{self.name}', daemon=True)
+        self._thread.start()
+        return True
+
+    def request_flush(self) -> None:
+        """Despierta al flusher sin esperar a flush_interval"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stop(self, timeout: float = 2.0) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def close(self) -> None:
+        """Detiene el flusher, escribe lo pendiente, cierra el log y libera el bloqueo"""
+        self.stop()
+        self.flush()
+        with self._io_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self._lock_fd is not None:
+                _unlock(self._lock_fd)
+                self._lock_fd = None
+        self.closed = True
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'keys': len(self._values),
+            'generation': self.generation,
+            'snapshot_bytes': self.snapshot_bytes,
+            'log_bytes': self.log_bytes,
+            'pending_bytes': self.pending_bytes,
+            'running': self.is_running,
+            'read_only': self.read_only,
+            **self.stats,
+        }
+
+
+def open_wal(directory: str, name: str, **kwargs: Any) -> MemoryWAL:
+    """
+    MemoryWAL compartido del proceso para <directory>/<name> (con el flusher en marcha)
+
+    Dos componentes que persisten en el mismo log reciben la misma instancia
+    en vez de competir por el bloqueo. Las opciones solo aplican al abrirlo.
+    """
+    path = os.path.abspath(os.path.join(directory, name + LOG_SUFFIX))
+    with _shared_lock:
+        wal = _shared_wals.get(path)
+        if wal is None or wal.closed:
+            wal = _shared_wals[path] = MemoryWAL(directory, name, **kwargs)
+            wal.start()
+        return wal
@@ -0,0 +1,372 @@
+#!/usr/bin/env python3
+"""
+🔗 ROLLING CORRELATION - ICT ENGINE v6.0 Enterprise
+===================================================
+
+Matriz de correlación entre símbolos, incremental y en varias ventanas:
+
+1. update_bar(prices)   → calcula los log-returns contra el cierre anterior y
+                          actualiza cada ventana en O(N²): suma el producto
+                          exterior del bar nuevo y resta el del que expira
+2. correlation(a, b)    → O(1) desde las sumas acumuladas (microsegundos),
+                          pensado para dimensionar una posición nueva
+3. matrix(window)       → matriz N×N completa, vectorizada
+
+Cada ventana guarda, por par (i, j), las sumas con datos presentes en ambos
+símbolos (Σ máscara, Σx, Σx², Σxy), así un símbolo sin precio en un bar no
+contamina al resto: la correlación es "pairwise complete". Para limitar la
+deriva de sumar y restar floats, las sumas se recalculan exactas desde el
+anillo cada `window` actualizaciones (O(N²) amortizado).
+
+    engine = get_correlation_engine()          # compartido por RiskManager,
+    engine.update_bar({'EURUSD': 1.0950,       # RiskBot y los scorers de POI
+                       'GBPUSD': 1.2710})
+    rho = engine.correlation('EURUSD', 'GBPUSD', window=50)   # None si no hay datos
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import math
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_WINDOWS = (20, 50, 200)
+DEFAULT_MIN_PERIODS = 10
+DEFAULT_INITIAL_CAPACITY = 16
+
+
+class _WindowState:
+    """Anillo de returns y sumas por par de una ventana"""
+
+    __slots__ = ('window', 'returns', 'masks', 'position', 'filled', 'updates',
+                 'count', 'sum_x', 'sum_xx', 'sum_xy')
+
+    def __init__(self, window: int, capacity: int):
+        self.window = window
+        self.returns = np.zeros((window, capacity))
+        self.masks = np.zeros((window, capacity))
+        self.position = 0
+        self.filled = 0
+        self.updates = 0
+        self.count = np.zeros((capacity, capacity))
+        self.sum_x = np.zeros((capacity, capacity))    # [i, j] = Σ x_i con j presente
+        self.sum_xx = np.zeros((capacity, capacity))   # [i, j] = Σ x_i² con j presente
+        self.sum_xy = np.zeros((capacity, capacity))
+
+    def grow(self, capacity: int) -> None:
+        old = self.returns.shape[1]
+        for name in ('returns', 'masks'):
+            grown = np.zeros((self.window, capacity))
+            grown[:, :old] = getattr(self, name)
+            setattr(self, name, grown)
+        for name in ('count', 'sum_x', 'sum_xx', 'sum_xy'):
+            grown = np.zeros((capacity, capacity))
+            grown[:old, :old] = getattr(self, name)
+            setattr(self, name, grown)
+
+    def push(self, values: np.ndarray, mask: np.ndarray) -> None:
+        slot = self.position
+        if self.filled == self.window:
+            old_x, old_m = self.returns[slot], self.masks[slot]
+            self.count -= np.outer(old_m, old_m)
+            self.sum_x -= np.outer(old_x, old_m)
+            self.sum_xx -= np.outer(old_x * old_x, old_m)
+            self.sum_xy -= np.outer(old_x, old_x)
+        else:
+            self.filled += 1
+
+        self.returns[slot] = values
+        self.masks[slot] = mask
+        self.count += np.outer(mask, mask)
+        self.sum_x += np.outer(values, mask)
+        self.sum_xx += np.outer(values * values, mask)
+        self.sum_xy += np.outer(values, values)
+        self.position = (slot + 1) % self.window
+
+        self.updates += 1
+        if self.updates % self.window == 0:
+            self.resync()
+
+    def resync(self) -> None:
+        """Recalcula las sumas exactas desde el anillo (corrige deriva numérica)"""
+        x, m = self.returns[:self.filled], self.masks[:self.filled]
+        self.count = m.T @ m
+        self.sum_x = x.T @ m
+        self.sum_xx = (x * x).T @ m
+        self.sum_xy = x.T @ x
+
+    def pair(self, i: int, j: int) -> Tuple[float, float, float, float, float, float]:
+        return (self.count[i, j], self.sum_x[i, j], self.sum_x[j, i],
+                self.sum_xx[i, j], self.sum_xx[j, i], self.sum_xy[i, j])
+
+
+def _pearson(n: float, sx: float, sy: float, sxx: float, syy: float, sxy: float) -> Optional[float]:
+    var_x = n * sxx - sx * sx
+    var_y = n * syy - sy * sy
+    if var_x <= 1e-18 or var_y <= 1e-18:
+        return None
+    rho = (n * sxy - sx * sy) / math.sqrt(var_x * var_y)
+    return max(-1.0, min(1.0, rho))
+
+
+class RollingCorrelationEngine:
+    """
+    🔗 Correlación rodante entre símbolos en varias ventanas
+
+    Los símbolos se añaden la primera vez que llegan en un bar; los bares
+    previos cuentan como ausentes para ellos. Actualizaciones protegidas por
+    lock; las consultas leen las sumas sin bloquear.
+    """
+
+    def __init__(self, windows: Sequence[int] = DEFAULT_WINDOWS, min_periods: int = DEFAULT_MIN_PERIODS,
+                 use_log_returns: bool = True):
+        if not windows:
+            raise ValueError("Se necesita al menos una ventana")
+        self.windows: Tuple[int, ...] = tuple(sorted({int(w) for w in windows}))
+        if self.windows[0] < 2:
+            raise ValueError("Las ventanas deben ser de al menos 2 barras")
+        self.min_periods = max(2, int(min_periods))
+        self.use_log_returns = use_log_returns
+
+        self._capacity = DEFAULT_INITIAL_CAPACITY
+        self._symbols: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._last_price = np.full(self._capacity, np.nan)
+        self._states = {w: _WindowState(w, self._capacity) for w in self.windows}
+        self._lock = threading.RLock()
+        self.bars_processed = 0
+        self.last_update: Optional[datetime] = None
+        self.last_bar_time: Optional[datetime] = None  # Última vela cerrada de sync_closes
+
+    # ===============================
+    # ACTUALIZACIÓN
+    # ===============================
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._symbols)
+
+    @property
+    def default_window(self) -> int:
+        return self.windows[len(self.windows) // 2]
+
+    def track(self, symbols: Iterable[str]) -> None:
+        """Registra símbolos sin esperar a su primer precio"""
+        with self._lock:
+            for symbol in symbols:
+                self._slot(symbol)
+
+    def update_bar(self, prices: Mapping[str, float], timestamp: Optional[datetime] = None) -> None:
+        """Nuevo cierre por símbolo; el primer precio de un símbolo solo fija la referencia"""
+        with self._lock:
+            prices = {symbol: price for symbol, price in prices.items() if price is not None and price > 0}
+            for symbol in prices:
+                self._slot(symbol)
+            values = np.zeros(self._capacity)
+            mask = np.zeros(self._capacity)
+            for symbol, price in prices.items():
+                idx = self._index[symbol]
+                previous = self._last_price[idx]
+                self._last_price[idx] = price
+                if np.isnan(previous):
+                    continue
+                values[idx] = math.log(price / previous) if self.use_log_returns else price / previous - 1.0
+                mask[idx] = 1.0
+            self._push(values, mask, timestamp)
+
+    def update_returns(self, returns: Mapping[str, float], timestamp: Optional[datetime] = None) -> None:
+        """Nuevo bar con returns ya calculados (NaN o ausente = sin dato)"""
+        with self._lock:
+            for symbol in returns:
+                self._slot(symbol)
+            values = np.zeros(self._capacity)
+            mask = np.zeros(self._capacity)
+            for symbol, value in returns.items():
+                if value is None or not math.isfinite(value):
+                    continue
+                idx = self._index[symbol]
+                values[idx] = value
+                mask[idx] = 1.0
+            self._push(values, mask, timestamp)
+
+    def seed_from_closes(self, closes: Any) -> int:
+        """Calienta el motor con un histórico de cierres (DataFrame: columnas = símbolos)"""
+        columns = [str(c) for c in closes.columns]
+        data = np.asarray(closes, dtype=float)
+        for row in data[-(self.windows[-1] + 1):]:
+            self.update_bar({symbol: value for symbol, value in zip(columns, row) if math.isfinite(value)})
+        return len(data)
+
+    def needs_history(self, symbols: Iterable[str]) -> bool:
+        """True si sync_closes() necesita el histórico completo (motor frío o símbolo sin precio)"""
+        if self.last_bar_time is None:
+            return True
+        for symbol in symbols:
+            idx = self._index.get(symbol)
+            if idx is None or np.isnan(self._last_price[idx]):
+                return True
+        return False
+
+    def sync_closes(self, closes: Any) -> int:
+        """
+        Alimenta las velas cerradas posteriores a la última procesada
+
+        `closes` es un DataFrame con la hora de la vela como índice y un
+        símbolo por columna. Con el motor frío, o si llega un símbolo sin
+        precio previo, se reinicia y se recalienta con la ventana mayor del
+        histórico recibido: el símbolo nuevo entra con sus returns y no como
+        ausente en los bares anteriores.
+
+        Returns:
+            Velas procesadas
+        """
+        closes = closes.dropna(axis=1, how='all').sort_index()
+        with self._lock:
+            columns = [str(c) for c in closes.columns]
+            if self.needs_history(columns):
+                self.reset()
+                closes = closes.iloc[-(self.windows[-1] + 1):]
+            else:
+                closes = closes[closes.index > self.last_bar_time]
+            data = np.asarray(closes, dtype=float)
+            for bar_time, row in zip(closes.index, data):
+                self.update_bar({symbol: value for symbol, value in zip(columns, row) if math.isfinite(value)},
+                                bar_time)
+                self.last_bar_time = bar_time
+            return len(data)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._last_price[:] = np.nan
+            self._states = {w: _WindowState(w, self._capacity) for w in self.windows}
+            self.bars_processed = 0
+            self.last_bar_time = None
+
+    # ===============================
+    # CONSULTAS
+    # ===============================
+
+    def correlation(self, symbol_a: str, symbol_b: str, window: Optional[int] = None) -> Optional[float]:
+        """Correlación de Pearson del par; None sin datos suficientes"""
+        if symbol_a == symbol_b:
+            return 1.0 if symbol_a in self._index else None
+        i, j = self._index.get(symbol_a), self._index.get(symbol_b)
+        if i is None or j is None:
+            return None
+        state = self._states.get(window or self.default_window)
+        if state is None:
+            raise ValueError(f"Ventana no configurada: {window}")
+        n, sx, sy, sxx, syy, sxy = state.pair(i, j)
+        if n < self.min_periods:
+            return None
+        return _pearson(n, sx, sy, sxx, syy, sxy)
+
+    def sample_size(self, symbol_a: str, symbol_b: str, window: Optional[int] = None) -> int:
+        i, j = self._index.get(symbol_a), self._index.get(symbol_b)
+        if i is None or j is None:
+            return 0
+        return int(round(self._states[window or self.default_window].count[i, j]))
+
+    def max_abs_correlation(self, symbol: str, others: Iterable[str],
+                            window: Optional[int] = None) -> Tuple[Optional[str], float]:
+        """Símbolo de `others` más correlacionado (en valor absoluto) con `symbol`"""
+        best_symbol, best = None, 0.0
+        for other in others:
+            if other == symbol:
+                continue
+            rho = self.correlation(symbol, other, window)
+            if rho is not None and abs(rho) > best:
+                best_symbol, best = other, abs(rho)
+        return best_symbol, best
+
+    def correlated_symbols(self, symbol: str, threshold: float = 0.7,
+                           window: Optional[int] = None) -> Dict[str, float]:
+        """Símbolos con |ρ| >= threshold respecto a `symbol`"""
+        result = {}
+        for other in self._symbols:
+            if other == symbol:
+                continue
+            rho = self.correlation(symbol, other, window)
+            if rho is not None and abs(rho) >= threshold:
+                result[other] = rho
+        return result
+
+    def matrix(self, window: Optional[int] = None) -> Tuple[List[str], np.ndarray]:
+        """Matriz N×N de correlaciones (NaN donde no hay datos suficientes)"""
+        with self._lock:
+            size = len(self._symbols)
+            state = self._states[window or self.default_window]
+            n = state.count[:size, :size]
+            sx, sxx, sxy = state.sum_x[:size, :size], state.sum_xx[:size, :size], state.sum_xy[:size, :size]
+            var_x = n * sxx - sx * sx
+            var_y = var_x.T
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rho = (n * sxy - sx * sx.T) / np.sqrt(var_x * var_y)
+            valid = (n >= self.min_periods) & (var_x > 1e-18) & (var_y > 1e-18)
+            rho = np.where(valid, np.clip(rho, -1.0, 1.0), np.nan)
+            np.fill_diagonal(rho, np.where(np.diag(valid), 1.0, np.nan))
+            return list(self._symbols), rho
+
+    def snapshot(self, window: Optional[int] = None, threshold: float = 0.7) -> Dict[str, Any]:
+        """Resumen serializable para dashboard / logs"""
+        symbols, rho = self.matrix(window)
+        pairs = []
+        for i in range(len(symbols)):
+            for j in range(i + 1, len(symbols)):
+                if not np.isnan(rho[i, j]) and abs(rho[i, j]) >= threshold:
+                    pairs.append({'pair': (symbols[i], symbols[j]), 'correlation': round(float(rho[i, j]), 4)})
+        pairs.sort(key=lambda item: -abs(item['correlation']))
+        return {
+            'symbols': symbols,
+            'window': window or self.default_window,
+            'windows': list(self.windows),
+            'bars_processed': self.bars_processed,
+            'last_update': self.last_update.isoformat() if self.last_update else None,
+            'correlated_pairs': pairs,
+        }
+
+    # ===============================
+    # INTERNOS
+    # ===============================
+
+    def _slot(self, symbol: str) -> int:
+        idx = self._index.get(symbol)
+        if idx is not None:
+            return idx
+        if len(self._symbols) == self._capacity:
+            capacity = self._capacity * 2
+            prices = np.full(capacity, np.nan)
+            prices[:self._capacity] = self._last_price
+            self._last_price = prices
+            for state in self._states.values():
+                state.grow(capacity)
+            self._capacity = capacity
+        idx = len(self._symbols)
+        self._symbols.append(symbol)
+        self._index[symbol] = idx
+        return idx
+
+    def _push(self, values: np.ndarray, mask: np.ndarray, timestamp: Optional[datetime]) -> None:
+        for state in self._states.values():
+            state.push(values, mask)
+        self.bars_processed += 1
+        self.last_update = timestamp or datetime.now()
+
+
+_correlation_engine: Optional[RollingCorrelationEngine] = None
+_correlation_engine_lock = threading.Lock()
+
+
+def get_correlation_engine() -> RollingCorrelationEngine:
+    """Motor de correlación compartido del proceso"""
+    global _correlation_engine
+    if _correlation_engine is None:
+        with _correlation_engine_lock:
+            if _correlation_engine is None:
+                _correlation_engine = RollingCorrelationEngine()
+    return _correlation_engine
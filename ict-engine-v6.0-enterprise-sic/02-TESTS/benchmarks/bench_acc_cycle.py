@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎼 BENCH ACC CYCLE - run_full_analysis_cycle sobre datasets fijos
+=================================================================
+
+Worker del caso 'orchestration.acc_full_cycle'. Se ejecuta en un proceso
+propio porque el ACC vive en `proyecto principal/` y su paquete `core`
+tiene el mismo nombre que el de 01-CORE.
+
+El MT5DataManager del orquestador se reemplaza por un proveedor que sirve
+el dataset del benchmark (mismo M5 base re-muestreado por timeframe), de
+modo que el ciclo completo (ICT, POIs, confianza, veredicto, TCT) corre
+sin MT5 y con datos idénticos entre corridas.
+
+Uso (lo invoca run_benchmarks.py):
+    python bench_acc_cycle.py --dataset recorded --rows 10000 --rounds 5
+
+Salida: última línea de stdout = JSON {'times_ns': [...], 'result_count': n}
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+V5_ROOT = os.path.abspath(os.path.join(BENCH_DIR, '..', '..', '..', 'proyecto principal'))
+ACC_TIMEFRAMES = ['M15', 'M5', 'H1']
+
+
+class FixedDataProvider:
+    """Sustituto de MT5DataManager.get_historical_data con frames fijos"""
+
+    def __init__(self, frames):
+        self.frames = frames
+
+    def get_historical_data(self, symbol, timeframe, lookback=10000, force_download=False):
+        frame = self.frames.get(timeframe)
+        return None if frame is None else frame.tail(lookback).copy()
+
+
+def run_acc_cycle(dataset: str, rows: int, rounds: int, warmup: int, time_budget_s: float):
+    """Medir run_full_analysis_cycle en este proceso (requiere paths v5)"""
+    from benchmark_datasets import get_multi_timeframe
+
+    sys.path.insert(0, os.path.join(V5_ROOT, 'docs'))
+    sys.path.insert(0, V5_ROOT)
+
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        from core.analysis_command_center.acc_orchestrator import AnalysisOrchestrator
+
+        frames = get_multi_timeframe(dataset, rows, tuple(ACC_TIMEFRAMES))
+        orchestrator = AnalysisOrchestrator(enable_cache=False)
+        orchestrator.data_manager = FixedDataProvider(frames)
+        lookback = {tf: len(frame) for tf, frame in frames.items()}
+
+        def cycle():
+            return orchestrator.run_full_analysis_cycle('EURUSD', ACC_TIMEFRAMES, lookback_periods=lookback)
+
+        for _ in range(max(0, warmup)):
+            cycle()
+
+    times_ns = []
+    spent = 0.0
+    output = None
+    for _ in range(max(1, rounds)):
+        gc.collect()
+        gc.disable()
+        try:
+            with contextlib.redirect_stdout(sink):
+                start = time.perf_counter_ns()
+                output = cycle()
+                elapsed = time.perf_counter_ns() - start
+        finally:
+            gc.enable()
+        times_ns.append(elapsed)
+        spent += elapsed / 1e9
+        if spent >= time_budget_s:
+            break
+
+    result_count = len(getattr(output, 'component_results', []) or []) if output is not None else None
+    return times_ns, result_count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark del ciclo ACC completo (v5)')
+    parser.add_argument('--dataset', default='recorded')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--budget', type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    times_ns, result_count = run_acc_cycle(args.dataset, args.rows, args.rounds, args.warmup, args.budget)
+    print(json.dumps({'times_ns': times_ns, 'result_count': result_count}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
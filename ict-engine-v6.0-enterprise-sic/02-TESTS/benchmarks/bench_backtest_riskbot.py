@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 BENCH BACKTEST RISKBOT - BacktestEngine con RiskBot real sobre datasets fijos
+================================================================================
+
+Worker del caso 'backtest.riskbot_sim'. Se ejecuta en un proceso propio
+porque BacktestEngine y RiskBot viven en `proyecto principal/` y su paquete
+`core` tiene el mismo nombre que el de 01-CORE.
+
+La estrategia abre 1 lote (SL/TP a 30 pips) cada vez que no hay posición y
+RiskBot.check_and_act() revisa el riesgo en cada vela contra el
+SimulatedBroker, de modo que se mide el coste del bucle de replay con el
+gestor de riesgo de producción dentro.
+
+Uso (lo invoca run_benchmarks.py):
+    python bench_backtest_riskbot.py --dataset recorded --rows 10000 --rounds 5
+
+Salida: última línea de stdout = JSON {'times_ns': [...], 'result_count': n}
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+V5_ROOT = os.path.abspath(os.path.join(BENCH_DIR, '..', '..', '..', 'proyecto principal'))
+
+
+class AlwaysInStrategy:
+    """Compra o vende 1 lote (alternando) siempre que no haya posición abierta"""
+
+    def __init__(self):
+        self.side = 0
+
+    def on_bar(self, ctx):
+        broker = ctx.broker
+        if broker.positions_total():
+            return
+        buy = self.side == 0
+        self.side ^= 1
+        broker.order_send({
+            'action': broker.TRADE_ACTION_DEAL, 'symbol': ctx.symbol, 'volume': 1.0,
+            'type': broker.ORDER_TYPE_BUY if buy else broker.ORDER_TYPE_SELL,
+            'sl': ctx.close - 0.0030 if buy else ctx.close + 0.0030,
+            'tp': ctx.close + 0.0030 if buy else ctx.close - 0.0030,
+        })
+
+
+def run_backtest(dataset: str, rows: int, rounds: int, warmup: int, time_budget_s: float):
+    """Medir BacktestEngine.run con RiskBot en este proceso (requiere paths v5)"""
+    from benchmark_datasets import get_candles
+
+    sys.path.insert(0, os.path.join(V5_ROOT, 'docs'))
+    sys.path.insert(0, V5_ROOT)
+
+    sink = io.StringIO()
+    with contextlib.redirect_stdout(sink):
+        from core.backtesting import BacktestConfig, BacktestEngine
+
+        candles = get_candles(dataset, rows)
+        config = BacktestConfig(use_riskbot=True, riskbot_kwargs={'risk_percent': 1.0})
+
+        def backtest():
+            return BacktestEngine(config, strategy_factory=AlwaysInStrategy).run('EURUSD', candles)
+
+        for _ in range(max(0, warmup)):
+            backtest()
+
+    times_ns = []
+    spent = 0.0
+    output = None
+    for _ in range(max(1, rounds)):
+        gc.collect()
+        gc.disable()
+        try:
+            with contextlib.redirect_stdout(sink):
+                start = time.perf_counter_ns()
+                output = backtest()
+                elapsed = time.perf_counter_ns() - start
+        finally:
+            gc.enable()
+        times_ns.append(elapsed)
+        spent += elapsed / 1e9
+        if spent >= time_budget_s:
+            break
+
+    result_count = output['account']['trades'] if output is not None else None
+    return times_ns, result_count
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark de BacktestEngine con RiskBot (v5)')
+    parser.add_argument('--dataset', default='recorded')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--budget', type=float, default=30.0)
+    args = parser.parse_args(argv)
+
+    times_ns, result_count = run_backtest(args.dataset, args.rows, args.rounds, args.warmup, args.budget)
+    print(json.dumps({'times_ns': times_ns, 'result_count': result_count}))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
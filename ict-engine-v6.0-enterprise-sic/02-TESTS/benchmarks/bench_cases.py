@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🎯 BENCH CASES - Casos de la suite de rendimiento
+=================================================
+
+Cubre los caminos calientes de detección, datos y orquestación:
+
+- structure:     swings incrementales, detect_bos_multi_timeframe
+- analysis:      ShardedAnalysisPool.scan multi-símbolo con 1 worker vs N
+                 (os.cpu_count()) para medir la ganancia del reparto
+- detectors:     Order Blocks, FVG (API pública y kernel), Breaker Blocks,
+                 Liquidity Pools/Sweeps
+- poi:           POISystem.detect_pois
+- confluence:    MultiPatternConfluenceEngine.analyze_confluence_enterprise
+- data:          guardado/carga de velas en CSV (formato de 04-DATA)
+- orchestration: run_full_analysis_cycle del ACC (proceso propio)
+- backtest:      BacktestEngine + RiskBot sobre SimulatedBroker (proceso propio)
+
+max_rows limita los casos cuyo coste hace impráctico 100k/1M en cada
+corrida (--no-limits los fuerza). Los detectores que descargan datos
+reciben el dataset del benchmark en lugar de MT5.
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import atexit
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, '..', '..', '01-CORE'))
+
+from benchmark_datasets import get_candles, get_multi_timeframe
+from benchmark_harness import benchmark, external_benchmark
+
+SYMBOL = 'EURUSD'
+_WORKDIR = tempfile.TemporaryDirectory(prefix='ict_bench_')  # Se borra al salir
+
+
+# ===============================
+# STRUCTURE
+# ===============================
+
+@benchmark('structure.swings_incremental', 'structure')
+def bench_swings(dataset, rows):
+    """Swings/BOS/CHoCH en frío: motor incremental recorriendo todo el frame"""
+    from core.analysis.incremental_market_structure import IncrementalMarketStructureEngine
+    candles = get_candles(dataset, rows)
+    return lambda: IncrementalMarketStructureEngine(window=5).update(SYMBOL, 'M5', candles)
+
+
+@benchmark('structure.bos_multi_timeframe', 'structure')
+def bench_bos_multi_timeframe(dataset, rows):
+    """PatternDetector.detect_bos_multi_timeframe H4→M15→M5 con datos inyectados"""
+    from core.analysis.pattern_detector import PatternDetector
+    frames = get_multi_timeframe(dataset, rows, ('H4', 'M15', 'M5'))
+    detector = PatternDetector()
+    detector._data_manager = None  # Sin warm-up de descarga
+    detector._multi_tf_analyzer._get_real_data = lambda symbol, timeframe, periods=480: frames[timeframe].copy()
+
+    def run():
+        result = detector.detect_bos_multi_timeframe(SYMBOL, mode='full')
+        return result.get('all_signals', [])
+    return run
+
+
+# ===============================
+# ANALYSIS (SHARDED)
+# ===============================
+
+SHARDED_SYMBOLS = ('EURUSD', 'GBPUSD', 'USDJPY', 'XAUUSD')
+
+
+def _sharded_scan(dataset, rows, workers):
+    """Pool abierto (workers ya arrancados) y escaneo de 4 símbolos × M5/M15/H1"""
+    from core.analysis.sharded_analysis import ShardedAnalysisPool
+    frames = get_multi_timeframe(dataset, rows, timeframes=('M5', 'M15', 'H1'))
+    symbols = {symbol: frames for symbol in SHARDED_SYMBOLS}
+    pool = ShardedAnalysisPool(workers=workers)
+    atexit.register(pool.close)
+    return lambda: pool.scan(symbols)['results']
+
+
+@benchmark('analysis.sharded_scan_1_worker', 'analysis', max_rows=100_000)
+def bench_sharded_scan_1_worker(dataset, rows):
+    """ShardedAnalysisPool.scan (estructura, FVG, liquidez) con un solo worker"""
+    return _sharded_scan(dataset, rows, workers=1)
+
+
+@benchmark('analysis.sharded_scan_n_workers', 'analysis', max_rows=100_000)
+def bench_sharded_scan_n_workers(dataset, rows):
+    """ShardedAnalysisPool.scan (estructura, FVG, liquidez) con un worker por núcleo"""
+    return _sharded_scan(dataset, rows, workers=os.cpu_count() or 1)
+
+
+# ===============================
+# DETECTORS
+# ===============================
+
+@benchmark('detectors.order_blocks', 'detectors', max_rows=100_000)
+def bench_order_blocks(dataset, rows):
+    """detectar_order_blocks (poi_detector_adapted)"""
+    from core.analysis.poi_detector_adapted import detectar_order_blocks
+    candles = get_candles(dataset, rows)
+    return lambda: detectar_order_blocks(candles, 'M5')
+
+
+@benchmark('detectors.fvg', 'detectors')
+def bench_fvg(dataset, rows):
+    """detectar_fair_value_gaps: kernel + conversión a dicts"""
+    from core.analysis.poi_detector_adapted import detectar_fair_value_gaps
+    candles = get_candles(dataset, rows)
+    return lambda: detectar_fair_value_gaps(candles, 'M5')
+
+
+@benchmark('detectors.fvg_kernel', 'detectors')
+def bench_fvg_kernel(dataset, rows):
+    """scan_fair_value_gaps: solo el kernel vectorizado"""
+    from core.analysis.fvg_kernel import scan_fair_value_gaps
+    candles = get_candles(dataset, rows)
+    return lambda: scan_fair_value_gaps(candles['high'], candles['low'])
+
+
+@benchmark('detectors.breaker_blocks', 'detectors', max_rows=100_000)
+def bench_breaker_blocks(dataset, rows):
+    """detect_breaker_blocks_enterprise sobre los OBs del mismo frame"""
+    from core.analysis.poi_detector_adapted import detectar_order_blocks
+    from core.ict_engine.advanced_patterns.breaker_blocks_enterprise_v62 import BreakerBlockDetectorEnterprise
+    candles = get_candles(dataset, rows)
+    order_blocks = detectar_order_blocks(candles, 'M5')
+    # Edad dentro de la ventana de candidatos (1h-48h), si no todos se descartan
+    created_at = (datetime.now() - timedelta(hours=6)).isoformat()
+    for order_block in order_blocks:
+        order_block['created_at'] = created_at
+
+    def run():
+        detector = BreakerBlockDetectorEnterprise()
+        return detector.detect_breaker_blocks_enterprise(candles, [dict(ob) for ob in order_blocks], SYMBOL, 'M5')
+    return run
+
+
+@benchmark('detectors.liquidity_pools', 'detectors')
+def bench_liquidity_pools(dataset, rows):
+    """detect_liquidity_pools_enterprise H4/H1/M15"""
+    from core.ict_engine.advanced_patterns.liquidity_analyzer_enterprise import LiquidityAnalyzerEnterprise
+    frames = get_multi_timeframe(dataset, rows, ('H4', 'H1', 'M15'))
+    price = float(frames['M15']['close'].iloc[-1])
+    analyzer = LiquidityAnalyzerEnterprise()
+    return lambda: analyzer.detect_liquidity_pools_enterprise(frames['H4'], frames['H1'], frames['M15'], SYMBOL, price)
+
+
+@benchmark('detectors.liquidity_sweeps', 'detectors')
+def bench_liquidity_sweeps(dataset, rows):
+    """detect_liquidity_sweeps_enterprise M5 contra los pools del frame"""
+    from core.ict_engine.advanced_patterns.liquidity_analyzer_enterprise import LiquidityAnalyzerEnterprise
+    frames = get_multi_timeframe(dataset, rows, ('H4', 'H1', 'M15', 'M5'))
+    price = float(frames['M5']['close'].iloc[-1])
+    analyzer = LiquidityAnalyzerEnterprise()
+    pools = analyzer.detect_liquidity_pools_enterprise(frames['H4'], frames['H1'], frames['M15'], SYMBOL, price)
+    return lambda: analyzer.detect_liquidity_sweeps_enterprise(frames['M5'], pools, SYMBOL, 'M5')
+
+
+# ===============================
+# POI / CONFLUENCE
+# ===============================
+
+@benchmark('poi.detect_pois', 'poi', max_rows=10_000)
+def bench_detect_pois(dataset, rows):
+    """POISystem.detect_pois (OB, FVG, S/R, volumen) con datos inyectados"""
+    from core.analysis.poi_system import POISystem
+    candles = get_candles(dataset, rows)
+    poi_system = POISystem()
+    poi_system._get_market_data = lambda symbol, timeframe, days: candles
+    return lambda: poi_system.detect_pois(SYMBOL, 'M5')
+
+
+@benchmark('confluence.analyze_enterprise', 'confluence')
+def bench_confluence(dataset, rows):
+    """MultiPatternConfluenceEngine.analyze_confluence_enterprise H4/H1/M15/M5"""
+    from core.ict_engine.advanced_patterns.multi_pattern_confluence_engine import MultiPatternConfluenceEngine
+    frames = get_multi_timeframe(dataset, rows)
+    price = float(frames['M5']['close'].iloc[-1])
+    engine = MultiPatternConfluenceEngine()
+    return lambda: engine.analyze_confluence_enterprise(frames['H4'], frames['H1'], frames['M15'], frames['M5'],
+                                                        SYMBOL, price)
+
+
+# ===============================
+# DATA
+# ===============================
+
+@benchmark('data.candles_save', 'data')
+def bench_candles_save(dataset, rows):
+    """AdvancedCandleDownloader._save_candles_to_file (CSV en data/candles)"""
+    from core.data_management.advanced_candle_downloader import AdvancedCandleDownloader
+    candles = get_candles(dataset, rows)
+    downloader = AdvancedCandleDownloader()
+    workdir = os.path.join(_WORKDIR.name, f'save_{dataset}_{rows}')
+    os.makedirs(workdir, exist_ok=True)
+
+    def run():
+        previous = os.getcwd()
+        os.chdir(workdir)  # El downloader escribe en ./data/candles
+        try:
+            downloader._save_candles_to_file(candles, SYMBOL, 'M5')
+        finally:
+            os.chdir(previous)
+        return os.listdir(os.path.join(workdir, 'data', 'candles'))
+    return run
+
+
+@benchmark('data.candles_load', 'data')
+def bench_candles_load(dataset, rows):
+    """Carga CSV con el formato de 04-DATA/data/candles (time como índice)"""
+    candles = get_candles(dataset, rows)
+    path = os.path.join(_WORKDIR.name, f'{SYMBOL}_M5_{dataset}_{rows}.csv')
+    candles.to_csv(path)
+    return lambda: pd.read_csv(path, parse_dates=['time'], index_col='time')
+
+
+# ===============================
+# ORCHESTRATION
+# ===============================
+
+@external_benchmark('orchestration.acc_full_cycle', 'orchestration', max_rows=100_000)
+def bench_acc_full_cycle(dataset, rows, rounds, warmup, time_budget_s):
+    """AnalysisOrchestrator.run_full_analysis_cycle (v5) en un proceso propio"""
+    command = [sys.executable, os.path.join(BENCH_DIR, 'bench_acc_cycle.py'),
+               '--dataset', dataset, '--rows', str(rows), '--rounds', str(rounds),
+               '--warmup', str(warmup), '--budget', str(time_budget_s)]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=BENCH_DIR,
+                               timeout=max(600.0, time_budget_s * 10))
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ['sin salida'])[-1]
+        raise RuntimeError(f'worker ACC falló: {error}')
+    payload = json.loads(lines[-1])
+    return payload['times_ns'], payload['result_count']
+
+
+# ===============================
+# BACKTEST
+# ===============================
+
+@external_benchmark('backtest.riskbot_sim', 'backtest', max_rows=100_000)
+def bench_backtest_riskbot(dataset, rows, rounds, warmup, time_budget_s):
+    """BacktestEngine con RiskBot real sobre SimulatedBroker (v5) en un proceso propio"""
+    command = [sys.executable, os.path.join(BENCH_DIR, 'bench_backtest_riskbot.py'),
+               '--dataset', dataset, '--rows', str(rows), '--rounds', str(rounds),
+               '--warmup', str(warmup), '--budget', str(time_budget_s)]
+    completed = subprocess.run(command, capture_output=True, text=True, cwd=BENCH_DIR,
+                               timeout=max(600.0, time_budget_s * 10))
+    lines = completed.stdout.strip().splitlines()
+    if completed.returncode != 0 or not lines:
+        error = (completed.stderr.strip().splitlines() or ['sin salida'])[-1]
+        raise RuntimeError(f'worker backtest falló: {error}')
+    payload = json.loads(lines[-1])
+    return payload['times_ns'], payload['result_count']
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+📦 BENCHMARK DATASETS - Velas fijas para la suite de rendimiento
+================================================================
+
+Datasets deterministas de 1k/10k/100k/1M velas M5:
+
+- synthetic: random walk con semilla fija y volatilidad por sesión
+- recorded:  velas reales de 04-DATA/data/candles (EURUSD M15). Los tamaños
+             mayores que el archivo se completan re-muestreando bloques de
+             retornos del propio archivo con semilla fija, así la forma de
+             las velas (mechas, gaps, volumen) sigue siendo la del mercado.
+
+Los timeframes superiores (M15/H1/H4) se construyen por resample del M5
+base, de modo que el tamaño del benchmark siempre refiere a velas M5.
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import glob
+import os
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+BENCHMARK_SIZES: Dict[str, int] = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1M': 1_000_000,
+}
+DATASET_KINDS = ('synthetic', 'recorded')
+DATASET_SEED = 20250801
+BASE_TIMEFRAME = 'M5'
+RESAMPLE_RULES = {'M5': '5min', 'M15': '15min', 'H1': '1h', 'H4': '4h', 'D1': '1D'}
+
+_ENGINE_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+RECORDED_CANDLES_PATTERN = os.path.join(_ENGINE_ROOT, '04-DATA', 'data', 'candles', 'EURUSD_M15_*.csv')
+
+
+def parse_size(size) -> int:
+    """'10k' / '1M' / 2500 -> número de velas"""
+    if isinstance(size, int):
+        return size
+    if size in BENCHMARK_SIZES:
+        return BENCHMARK_SIZES[size]
+    return int(float(str(size).lower().replace('k', 'e3').replace('m', 'e6')))
+
+
+def size_label(rows: int) -> str:
+    """Etiqueta corta para reportes (1000 -> '1k')"""
+    for label, value in BENCHMARK_SIZES.items():
+        if value == rows:
+            return label
+    return str(rows)
+
+
+def _bounded_returns(returns: np.ndarray, block: int = 288, band: float = 0.15) -> np.ndarray:
+    """
+    Reflejar bloques diarios que sacarían el precio de ±band (log) respecto al
+    inicio: 1M velas de random walk acabarían en precios irreales y los
+    umbrales en pips de los detectores dejarían de ser representativos.
+    """
+    bounded = returns.copy()
+    level = 0.0
+    for start in range(0, len(bounded), block):
+        chunk = bounded[start:start + block]
+        move = chunk.sum()
+        if abs(level + move) > band and abs(level - move) < abs(level + move):
+            chunk *= -1.0
+            move = -move
+        level += move
+    return bounded
+
+
+def _frame_from_returns(returns: np.ndarray, ranges: np.ndarray, bodies: np.ndarray,
+                        volume: np.ndarray, start_price: float) -> pd.DataFrame:
+    """Construir OHLCV coherente a partir de retornos y proporciones de vela"""
+    close = start_price * np.exp(np.cumsum(_bounded_returns(returns)))
+    open_ = np.concatenate(([start_price], close[:-1]))
+    body_high = np.maximum(open_, close)
+    body_low = np.minimum(open_, close)
+    wick = np.maximum(ranges - bodies, 0.0) * close
+    high = body_high + wick * 0.5
+    low = body_low - wick * 0.5
+    index = pd.date_range('2020-01-06', periods=len(close), freq='5min', name='time')
+    return pd.DataFrame({
+        'open': open_,
+        'high': high,
+        'low': low,
+        'close': close,
+        'tick_volume': volume.astype(np.int64),
+        'volume': volume.astype(np.int64),
+    }, index=index)
+
+
+@lru_cache(maxsize=8)
+def _synthetic(rows: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # Volatilidad intradía: Asia baja, Londres/NY alta (sesgo realista de sesiones)
+    hour = (np.arange(rows) * 5 // 60) % 24
+    session_vol = np.where((hour >= 7) & (hour < 17), 1.6, np.where(hour >= 17, 1.1, 0.6))
+    returns = rng.standard_t(4, rows) * 0.00018 * session_vol
+    ranges = np.abs(rng.normal(0.0004, 0.00015, rows)) * session_vol
+    bodies = np.abs(returns)
+    volume = rng.poisson(900 * session_vol)
+    return _frame_from_returns(returns, ranges, bodies, volume, 1.1000)
+
+
+@lru_cache(maxsize=1)
+def _recorded_source() -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, float]:
+    """Proporciones de vela del archivo real más largo (retornos, rangos, cuerpos, volumen)"""
+    files = sorted(glob.glob(RECORDED_CANDLES_PATTERN), key=os.path.getsize)
+    if not files:
+        raise FileNotFoundError(f"Sin velas grabadas en {RECORDED_CANDLES_PATTERN}")
+    candles = pd.read_csv(files[-1])
+    close = candles['close'].to_numpy(dtype=np.float64)
+    open_ = candles['open'].to_numpy(dtype=np.float64)
+    returns = np.diff(np.log(close), prepend=np.log(open_[0]))
+    ranges = (candles['high'].to_numpy() - candles['low'].to_numpy()) / close
+    bodies = np.abs(close - open_) / close
+    volume = candles['tick_volume'].to_numpy(dtype=np.float64)
+    return returns, ranges, bodies, volume, float(open_[0])
+
+
+@lru_cache(maxsize=8)
+def _recorded(rows: int, seed: int) -> pd.DataFrame:
+    returns, ranges, bodies, volume, start_price = _recorded_source()
+    if rows <= len(returns):
+        take = np.arange(len(returns) - rows, len(returns))
+    else:
+        # Bloques de 288 velas (1 día M5) re-muestreados con semilla fija
+        rng = np.random.default_rng(seed)
+        block = 288
+        starts = rng.integers(0, len(returns) - block, size=(rows - len(returns)) // block + 1)
+        extra = (starts[:, None] + np.arange(block)[None, :]).ravel()
+        take = np.concatenate((np.arange(len(returns)), extra))[:rows]
+    return _frame_from_returns(returns[take], ranges[take], bodies[take], volume[take], start_price)
+
+
+def get_candles(kind: str, size, timeframe: str = BASE_TIMEFRAME, seed: int = DATASET_SEED) -> pd.DataFrame:
+    """
+    📊 Dataset fijo para benchmark
+
+    Args:
+        kind: 'synthetic' o 'recorded'
+        size: Velas M5 base ('1k', '10k', '100k', '1M' o entero)
+        timeframe: Timeframe devuelto (resample del M5 base)
+        seed: Semilla (cambiarla invalida la comparación con el baseline)
+
+    Returns:
+        DataFrame OHLCV con DatetimeIndex (copia: los casos pueden mutarlo)
+    """
+    rows = parse_size(size)
+    if kind == 'synthetic':
+        base = _synthetic(rows, seed)
+    elif kind == 'recorded':
+        base = _recorded(rows, seed)
+    else:
+        raise ValueError(f"Dataset desconocido: {kind} (usar {DATASET_KINDS})")
+
+    if timeframe == BASE_TIMEFRAME:
+        return base.copy()
+    return resample_candles(base, timeframe)
+
+
+def resample_candles(candles: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Agregar velas M5 a un timeframe superior"""
+    rule = RESAMPLE_RULES.get(timeframe)
+    if rule is None:
+        raise ValueError(f"Timeframe no soportado para resample: {timeframe}")
+    aggregated = candles.resample(rule).agg({
+        'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last',
+        'tick_volume': 'sum', 'volume': 'sum',
+    })
+    return aggregated.dropna()
+
+
+def get_multi_timeframe(kind: str, size, timeframes=('H4', 'H1', 'M15', 'M5'),
+                        seed: int = DATASET_SEED) -> Dict[str, pd.DataFrame]:
+    """Mismo dataset base en varios timeframes (consistentes entre sí)"""
+    return {tf: get_candles(kind, size, tf, seed) for tf in timeframes}
+
+
+def dataset_fingerprint(kind: str, size, seed: int = DATASET_SEED) -> Optional[str]:
+    """Huella corta del dataset para detectar baselines con datos distintos"""
+    try:
+        candles = get_candles(kind, size, seed=seed)
+    except FileNotFoundError:
+        return None
+    digest = pd.util.hash_pandas_object(candles[['open', 'high', 'low', 'close']], index=False).sum()
+    return f"{int(digest) & 0xFFFFFFFFFFFF:012x}"
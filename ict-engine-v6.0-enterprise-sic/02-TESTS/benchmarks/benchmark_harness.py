@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+⏱️ BENCHMARK HARNESS - Medición reproducible y comparación con baseline
+=======================================================================
+
+Núcleo de la suite de rendimiento (estilo asv, sin dependencias extra):
+
+- Registro de casos con @benchmark(nombre, grupo, max_rows)
+- setup() fuera de la medición; la función medida recibe datos ya preparados
+- Casos externos (@external_benchmark) que miden en su propio proceso, p.ej.
+  el ciclo ACC de v5, cuyo paquete `core` choca con el de 01-CORE
+- Rondas con gc desactivado (como timeit) y presupuesto de tiempo por caso
+- Resultados JSON con metadatos del entorno y huella de cada dataset
+- Comparación contra un baseline con umbral de regresión por mediana
+
+Formato de cada resultado:
+    {'case', 'group', 'dataset', 'size', 'rows', 'status', 'rounds',
+     'times_ms', 'min_ms', 'median_ms', 'mean_ms', 'stdev_ms',
+     'rows_per_sec', 'result_count', 'error'}
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from benchmark_datasets import DATASET_KINDS, dataset_fingerprint, parse_size, size_label
+
+RESULTS_FORMAT_VERSION = 1
+DEFAULT_REGRESSION_THRESHOLD = 0.10   # +10% en la mediana = regresión
+DEFAULT_MIN_DELTA_MS = 0.5            # Diferencias menores son ruido de reloj
+
+
+@dataclass
+class BenchmarkCase:
+    """Caso de benchmark: setup(dataset, rows) -> callable sin argumentos a medir"""
+    name: str
+    group: str
+    setup: Optional[Callable[[str, int], Callable[[], Any]]]
+    max_rows: int = 1_000_000
+    datasets: tuple = DATASET_KINDS
+    description: str = ''
+    external: Optional[Callable[..., tuple]] = None  # (dataset, rows, rounds, warmup, budget) -> (times_ns, result_count)
+
+
+_REGISTRY: Dict[str, BenchmarkCase] = {}
+
+
+def _first_doc_line(func: Callable) -> str:
+    return (func.__doc__ or '').strip().split('\n')[0]
+
+
+def benchmark(name: str, group: str, max_rows: int = 1_000_000,
+              datasets: Iterable[str] = DATASET_KINDS):
+    """Decorador para registrar la función setup de un caso"""
+    def decorator(setup: Callable[[str, int], Callable[[], Any]]):
+        _REGISTRY[name] = BenchmarkCase(name=name, group=group, setup=setup, max_rows=max_rows,
+                                        datasets=tuple(datasets), description=_first_doc_line(setup))
+        return setup
+    return decorator
+
+
+def external_benchmark(name: str, group: str, max_rows: int = 1_000_000,
+                       datasets: Iterable[str] = DATASET_KINDS):
+    """Decorador para casos que miden fuera de este proceso y devuelven sus tiempos"""
+    def decorator(run: Callable[..., tuple]):
+        _REGISTRY[name] = BenchmarkCase(name=name, group=group, setup=None, max_rows=max_rows,
+                                        datasets=tuple(datasets), description=_first_doc_line(run),
+                                        external=run)
+        return run
+    return decorator
+
+
+def get_registered_cases(pattern: Optional[str] = None) -> List[BenchmarkCase]:
+    """Casos registrados, filtrados por subcadena de nombre o grupo"""
+    cases = sorted(_REGISTRY.values(), key=lambda case: (case.group, case.name))
+    if pattern:
+        cases = [case for case in cases if pattern in case.name or pattern in case.group]
+    return cases
+
+
+# ===============================
+# MEDICIÓN
+# ===============================
+
+def _result_count(result: Any) -> Optional[int]:
+    """Tamaño del resultado: detecta casos que miden un camino vacío"""
+    if result is None:
+        return None
+    if isinstance(result, dict):
+        for key in ('count', 'total_signals', 'result_count'):
+            if isinstance(result.get(key), int):
+                return result[key]
+    try:
+        return len(result)
+    except TypeError:
+        return None
+
+
+def run_case(case: BenchmarkCase, dataset: str, size, rounds: int = 5, warmup: int = 1,
+             time_budget_s: float = 30.0, quiet: bool = True) -> Dict[str, Any]:
+    """
+    ⏱️ Ejecutar un caso sobre un dataset y tamaño
+
+    Args:
+        case: Caso registrado
+        dataset: 'synthetic' o 'recorded'
+        size: Velas M5 base
+        rounds: Rondas máximas medidas
+        warmup: Rondas previas no medidas (imports, caches de primera llamada)
+        time_budget_s: Se dejan de medir rondas al superar este tiempo acumulado
+        quiet: Silenciar stdout de los detectores durante setup y medición
+
+    Returns:
+        Dict con el resultado (status 'ok', 'skipped' o 'error')
+    """
+    rows = parse_size(size)
+    result: Dict[str, Any] = {
+        'case': case.name, 'group': case.group, 'dataset': dataset,
+        'size': size_label(rows), 'rows': rows, 'status': 'ok',
+        'rounds': 0, 'times_ms': [], 'result_count': None, 'error': None,
+    }
+    if dataset not in case.datasets:
+        result.update(status='skipped', error=f'dataset {dataset} no aplica')
+        return result
+    if rows > case.max_rows:
+        result.update(status='skipped', error=f'rows {rows} > max_rows {case.max_rows}')
+        return result
+
+    if case.external is not None:
+        try:
+            times_ns, result['result_count'] = case.external(dataset, rows, rounds, warmup, time_budget_s)
+        except Exception as exc:
+            result.update(status='error', error=f'{type(exc).__name__}: {exc}')
+            return result
+        return finalize_timings(result, times_ns)
+
+    sink = io.StringIO()
+    silence = (lambda: contextlib.redirect_stdout(sink)) if quiet else contextlib.nullcontext
+    try:
+        with silence():
+            func = case.setup(dataset, rows)
+            for _ in range(max(0, warmup)):
+                func()
+
+        times_ns: List[int] = []
+        gc_was_enabled = gc.isenabled()
+        spent = 0.0
+        try:
+            for _ in range(max(1, rounds)):
+                gc.collect()
+                gc.disable()
+                with silence():
+                    start = time.perf_counter_ns()
+                    output = func()
+                    elapsed = time.perf_counter_ns() - start
+                if gc_was_enabled:
+                    gc.enable()
+                times_ns.append(elapsed)
+                spent += elapsed / 1e9
+                if spent >= time_budget_s:
+                    break
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        result['result_count'] = _result_count(output)
+    except Exception as exc:  # El fallo de un caso no aborta la suite
+        result.update(status='error', error=f'{type(exc).__name__}: {exc}')
+        return result
+
+    return finalize_timings(result, times_ns)
+
+
+def finalize_timings(result: Dict[str, Any], times_ns: List[int]) -> Dict[str, Any]:
+    """Agregar estadísticas a un resultado a partir de los tiempos por ronda"""
+    times_ms = [t / 1e6 for t in times_ns]
+    median_ms = statistics.median(times_ms)
+    result.update(
+        rounds=len(times_ms),
+        times_ms=[round(t, 4) for t in times_ms],
+        min_ms=round(min(times_ms), 4),
+        median_ms=round(median_ms, 4),
+        mean_ms=round(statistics.fmean(times_ms), 4),
+        stdev_ms=round(statistics.stdev(times_ms), 4) if len(times_ms) > 1 else 0.0,
+        rows_per_sec=round(result['rows'] / (median_ms / 1000.0), 1) if median_ms > 0 else None,
+    )
+    return result
+
+
+# ===============================
+# RESULTADOS JSON
+# ===============================
+
+def _git_commit() -> Optional[str]:
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, timeout=10, cwd=os.path.dirname(os.path.abspath(__file__)))
+        return output.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment_metadata() -> Dict[str, Any]:
+    """Metadatos para saber si dos corridas son comparables"""
+    import numpy
+    import pandas
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'numpy': numpy.__version__,
+        'pandas': pandas.__version__,
+        'git_commit': _git_commit(),
+    }
+
+
+def build_results(results: List[Dict[str, Any]], sizes: Iterable, datasets: Iterable[str]) -> Dict[str, Any]:
+    """Documento JSON completo de una corrida"""
+    return {
+        'version': RESULTS_FORMAT_VERSION,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment_metadata(),
+        'datasets': {
+            f'{dataset}/{size_label(parse_size(size))}': dataset_fingerprint(dataset, size)
+            for dataset in datasets for size in sizes
+        },
+        'results': results,
+    }
+
+
+def save_results(document: Dict[str, Any], path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as handle:
+        json.dump(document, handle, indent=2, ensure_ascii=False)
+    return path
+
+
+def load_results(path: str) -> Dict[str, Any]:
+    with open(path, encoding='utf-8') as handle:
+        document = json.load(handle)
+    if document.get('version') != RESULTS_FORMAT_VERSION:
+        raise ValueError(f"Formato de resultados no soportado: {document.get('version')}")
+    return document
+
+
+# ===============================
+# COMPARACIÓN CON BASELINE
+# ===============================
+
+def _key(result: Dict[str, Any]) -> tuple:
+    return (result['case'], result['dataset'], result['size'])
+
+
+def compare_results(current: Dict[str, Any], baseline: Dict[str, Any],
+                    threshold: float = DEFAULT_REGRESSION_THRESHOLD,
+                    min_delta_ms: float = DEFAULT_MIN_DELTA_MS,
+                    metric: str = 'median_ms') -> Dict[str, Any]:
+    """
+    📉 Comparar una corrida contra el baseline
+
+    Un caso es regresión si current > baseline * (1 + threshold) y la
+    diferencia absoluta supera min_delta_ms (evita falsos positivos en
+    casos de microsegundos). Datasets con huella distinta no se comparan.
+
+    Returns:
+        {'regressions', 'improvements', 'unchanged', 'new', 'missing',
+         'dataset_mismatch', 'threshold', 'metric', 'passed'}
+    """
+    baseline_index = {_key(r): r for r in baseline.get('results', []) if r.get('status') == 'ok'}
+    current_index = {_key(r): r for r in current.get('results', []) if r.get('status') == 'ok'}
+
+    base_prints = baseline.get('datasets', {})
+    mismatched = {
+        name for name, fingerprint in current.get('datasets', {}).items()
+        if name in base_prints and base_prints[name] != fingerprint
+    }
+
+    comparison: Dict[str, Any] = {
+        'regressions': [], 'improvements': [], 'unchanged': [],
+        'new': [], 'missing': [], 'dataset_mismatch': sorted(mismatched),
+        'threshold': threshold, 'metric': metric,
+    }
+
+    for key, result in sorted(current_index.items()):
+        base = baseline_index.get(key)
+        if base is None:
+            comparison['new'].append({'case': key[0], 'dataset': key[1], 'size': key[2]})
+            continue
+        if f'{key[1]}/{key[2]}' in mismatched:
+            continue
+        before, after = base[metric], result[metric]
+        ratio = after / before if before > 0 else float('inf')
+        entry = {
+            'case': key[0], 'dataset': key[1], 'size': key[2],
+            'baseline_ms': before, 'current_ms': after, 'ratio': round(ratio, 4),
+        }
+        if ratio > 1.0 + threshold and after - before > min_delta_ms:
+            comparison['regressions'].append(entry)
+        elif ratio < 1.0 - threshold and before - after > min_delta_ms:
+            comparison['improvements'].append(entry)
+        else:
+            comparison['unchanged'].append(entry)
+
+    # Ausentes: combinaciones del baseline de casos ejecutados que ya no dan 'ok'
+    executed = {r['case'] for r in current.get('results', [])}
+    comparison['missing'] = [
+        {'case': key[0], 'dataset': key[1], 'size': key[2]}
+        for key in sorted(set(baseline_index) - set(current_index)) if key[0] in executed
+    ]
+    comparison['passed'] = not comparison['regressions']
+    return comparison
+
+
+def format_results_table(results: List[Dict[str, Any]]) -> str:
+    """Tabla de consola con la corrida actual"""
+    lines = [f"{'CASE':<34} {'DATASET':<10} {'SIZE':>5} {'MEDIAN ms':>11} {'MIN ms':>10} {'ROWS/s':>12} {'N':>4} {'OUT':>6}"]
+    for r in results:
+        if r['status'] != 'ok':
+            lines.append(f"{r['case']:<34} {r['dataset']:<10} {r['size']:>5}  {r['status'].upper()}: {r['error']}")
+            continue
+        rows_per_sec = f"{r['rows_per_sec']:,.0f}" if r.get('rows_per_sec') else '-'
+        out = '-' if r['result_count'] is None else str(r['result_count'])
+        lines.append(f"{r['case']:<34} {r['dataset']:<10} {r['size']:>5} {r['median_ms']:>11.3f} "
+                     f"{r['min_ms']:>10.3f} {rows_per_sec:>12} {r['rounds']:>4} {out:>6}")
+    return '\n'.join(lines)
+
+
+def format_comparison(comparison: Dict[str, Any]) -> str:
+    """Resumen de consola de la comparación con baseline"""
+    lines = [f"📉 Baseline ({comparison['metric']}, umbral +{comparison['threshold']:.0%}): "
+             f"{len(comparison['regressions'])} regresiones, {len(comparison['improvements'])} mejoras, "
+             f"{len(comparison['unchanged'])} sin cambios, {len(comparison['new'])} nuevos, "
+             f"{len(comparison['missing'])} ausentes"]
+    for label, entries in (('❌ REGRESIÓN', comparison['regressions']), ('✅ MEJORA', comparison['improvements'])):
+        for e in entries:
+            lines.append(f"  {label} {e['case']} [{e['dataset']}/{e['size']}] "
+                         f"{e['baseline_ms']:.3f} -> {e['current_ms']:.3f} ms (x{e['ratio']:.2f})")
+    if comparison['dataset_mismatch']:
+        lines.append(f"  ⚠️ Datasets distintos al baseline (no comparados): {', '.join(comparison['dataset_mismatch'])}")
+    return '\n'.join(lines)
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🚀 RUN BENCHMARKS - Línea base de rendimiento reproducible
+==========================================================
+
+Ejecuta la suite sobre datasets fijos, guarda los resultados en JSON y los
+compara contra un baseline con umbral de regresión.
+
+Uso:
+    python run_benchmarks.py                           # 1k y 10k, ambos datasets
+    python run_benchmarks.py --sizes 1k 10k 100k 1M    # barrido completo
+    python run_benchmarks.py --filter detectors        # solo un grupo/caso
+    python run_benchmarks.py --save-baseline           # fijar baseline actual
+    python run_benchmarks.py --threshold 0.15          # comparar con +15%
+    python run_benchmarks.py --list
+
+Resultados: 02-TESTS/reports/benchmarks/benchmark_<fecha>.json
+Baseline:   02-TESTS/reports/benchmarks/baseline.json (o --baseline PATH)
+
+Código de salida 1 si hay regresiones (útil en CI), 0 en otro caso.
+
+Autor: ICT Engine v6.1.0 Enterprise Team
+Versión: v6.1.0-enterprise
+Fecha: Agosto 2025
+"""
+
+import argparse
+import os
+import shutil
+import sys
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+
+import bench_cases  # noqa: F401  (registra los casos)
+from benchmark_datasets import DATASET_KINDS, parse_size
+from benchmark_harness import (DEFAULT_MIN_DELTA_MS, DEFAULT_REGRESSION_THRESHOLD, build_results,
+                               compare_results, format_comparison, format_results_table,
+                               get_registered_cases, load_results, run_case, save_results)
+
+REPORTS_DIR = os.path.abspath(os.path.join(BENCH_DIR, '..', 'reports', 'benchmarks'))
+DEFAULT_BASELINE = os.path.join(REPORTS_DIR, 'baseline.json')
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Suite de benchmarks ICT Engine')
+    parser.add_argument('--sizes', nargs='+', default=['1k', '10k'], help='1k 10k 100k 1M (velas M5)')
+    parser.add_argument('--datasets', nargs='+', default=list(DATASET_KINDS), choices=DATASET_KINDS)
+    parser.add_argument('--filter', default=None, help='Subcadena de caso o grupo')
+    parser.add_argument('--rounds', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--budget', type=float, default=30.0, help='Segundos máximos medidos por caso')
+    parser.add_argument('--no-limits', action='store_true', help='Ignorar max_rows de cada caso')
+    parser.add_argument('--out', default=None, help='Ruta del JSON de resultados')
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD)
+    parser.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS)
+    parser.add_argument('--save-baseline', action='store_true', help='Copiar esta corrida como baseline')
+    parser.add_argument('--list', action='store_true', help='Listar casos y salir')
+    parser.add_argument('--verbose', action='store_true', help='No silenciar stdout de los detectores')
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    cases = get_registered_cases(args.filter)
+
+    if args.list:
+        for case in cases:
+            print(f"{case.name:<34} max_rows={case.max_rows:>9,}  {case.description}")
+        return 0
+    if not cases:
+        print(f"❌ Ningún caso coincide con '{args.filter}'")
+        return 2
+
+    results = []
+    for case in cases:
+        if args.no_limits:
+            case.max_rows = max(case.max_rows, max(parse_size(size) for size in args.sizes))
+        for dataset in args.datasets:
+            for size in args.sizes:
+                result = run_case(case, dataset, size, rounds=args.rounds, warmup=args.warmup,
+                                  time_budget_s=args.budget, quiet=not args.verbose)
+                results.append(result)
+                status = f"{result['median_ms']:.3f} ms" if result['status'] == 'ok' else result['status']
+                print(f"  ⏱️ {case.name} [{dataset}/{result['size']}] {status}", flush=True)
+
+    document = build_results(results, args.sizes, args.datasets)
+    out_path = args.out or os.path.join(REPORTS_DIR, f"benchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    save_results(document, out_path)
+
+    print()
+    print(format_results_table(results))
+    print(f"\n💾 Resultados: {out_path}")
+
+    exit_code = 0
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        comparison = compare_results(document, load_results(args.baseline), threshold=args.threshold,
+                                     min_delta_ms=args.min_delta_ms)
+        print(format_comparison(comparison))
+        exit_code = 0 if comparison['passed'] else 1
+    elif not args.save_baseline:
+        print(f"ℹ️ Sin baseline en {args.baseline} (usar --save-baseline)")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        shutil.copyfile(out_path, args.baseline)
+        print(f"📌 Baseline actualizado: {args.baseline}")
+
+    return exit_code
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - BENCHMARK HARNESS
+====================================
+
+Valida que los datasets del benchmark son deterministas y coherentes, que
+run_case respeta max_rows y registra errores sin abortar, y que la
+comparación con baseline detecta regresiones con umbral y ruido mínimo.
+"""
+
+import copy
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'benchmarks'))
+
+from benchmark_datasets import dataset_fingerprint, get_candles, get_multi_timeframe, parse_size
+from benchmark_harness import BenchmarkCase, compare_results, run_case
+
+
+def _document(median_by_case, fingerprint='abc'):
+    return {
+        'version': 1,
+        'datasets': {'synthetic/1k': fingerprint},
+        'results': [
+            {'case': name, 'dataset': 'synthetic', 'size': '1k', 'status': 'ok', 'median_ms': median}
+            for name, median in median_by_case.items()
+        ],
+    }
+
+
+class TestBenchmarkDatasets(unittest.TestCase):
+
+    def test_sizes_and_determinism(self):
+        self.assertEqual(parse_size('1M'), 1_000_000)
+        self.assertEqual(parse_size('2.5k'), 2_500)
+
+        for kind in ('synthetic', 'recorded'):
+            candles = get_candles(kind, '10k')
+            self.assertEqual(len(candles), 10_000)
+            self.assertTrue((candles['high'] >= candles[['open', 'close']].max(axis=1)).all())
+            self.assertTrue((candles['low'] <= candles[['open', 'close']].min(axis=1)).all())
+            self.assertEqual(dataset_fingerprint(kind, '10k'), dataset_fingerprint(kind, 10_000))
+
+        self.assertNotEqual(dataset_fingerprint('synthetic', '1k'), dataset_fingerprint('recorded', '1k'))
+
+    def test_large_recorded_stays_in_realistic_range(self):
+        candles = get_candles('recorded', '100k')
+        self.assertLess(candles['close'].max() / candles['close'].min(), 1.5)
+
+    def test_higher_timeframes_resampled_from_base(self):
+        frames = get_multi_timeframe('synthetic', '1k', ('H1', 'M5'))
+        self.assertEqual(frames['H1']['high'].max(), frames['M5']['high'].max())
+        self.assertEqual(frames['H1']['volume'].sum(), frames['M5']['volume'].sum())
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+
+    def test_run_case_timings_and_limits(self):
+        case = BenchmarkCase(name='t.sum', group='t', setup=lambda dataset, rows: (lambda: list(range(rows))),
+                             max_rows=5_000)
+        result = run_case(case, 'synthetic', 1_000, rounds=3, warmup=0)
+        self.assertEqual(result['status'], 'ok')
+        self.assertEqual(result['rounds'], 3)
+        self.assertEqual(result['result_count'], 1_000)
+        self.assertLessEqual(result['min_ms'], result['median_ms'])
+
+        skipped = run_case(case, 'synthetic', '10k')
+        self.assertEqual(skipped['status'], 'skipped')
+
+    def test_run_case_records_errors(self):
+        def broken_setup(dataset, rows):
+            raise RuntimeError('sin datos')
+        result = run_case(BenchmarkCase(name='t.broken', group='t', setup=broken_setup), 'synthetic', 100)
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('sin datos', result['error'])
+
+    def test_compare_detects_regressions_above_threshold(self):
+        baseline = _document({'fast': 0.1, 'slow': 100.0, 'steady': 50.0, 'gone': 5.0})
+        current = _document({'fast': 0.4, 'slow': 130.0, 'steady': 52.0, 'new': 1.0})
+        current['results'].append({'case': 'gone', 'dataset': 'synthetic', 'size': '1k', 'status': 'error'})
+
+        comparison = compare_results(current, baseline, threshold=0.10, min_delta_ms=0.5)
+        self.assertFalse(comparison['passed'])
+        self.assertEqual([r['case'] for r in comparison['regressions']], ['slow'])
+        self.assertEqual({r['case'] for r in comparison['unchanged']}, {'fast', 'steady'})
+        self.assertEqual([r['case'] for r in comparison['new']], ['new'])
+        self.assertEqual([r['case'] for r in comparison['missing']], ['gone'])
+
+        improved = copy.deepcopy(current)
+        improved['results'][1]['median_ms'] = 60.0
+        self.assertTrue(compare_results(improved, baseline)['passed'])
+
+    def test_compare_skips_mismatched_datasets(self):
+        comparison = compare_results(_document({'slow': 200.0}, 'new'), _document({'slow': 100.0}, 'old'))
+        self.assertTrue(comparison['passed'])
+        self.assertEqual(comparison['dataset_mismatch'], ['synthetic/1k'])
+
+
+if __name__ == '__main__':
+    unittest.main()
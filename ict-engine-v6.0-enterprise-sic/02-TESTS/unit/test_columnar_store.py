@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - COLUMNAR STORE
+=================================
+
+Valida que los registros guardados en columnas se leen igual que los
+originales (vistas y materialización), que las escrituras por vista llegan a
+las columnas, que los POI dict conservan sus claves y que el histórico de
+POISystem / breakers usa el almacén compacto.
+"""
+
+import os
+import sys
+import tracemalloc
+import unittest
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from enum import Enum
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from utils.columnar_store import ColumnarStore, LazyText, RecordView, register_record_type, store_for
+
+
+class _Side(Enum):
+    BUY = 'buy'
+    SELL = 'sell'
+
+
+@dataclass
+class _Signal:
+    side: _Side
+    price: float
+    zone: Tuple[float, float]
+    timestamp: datetime
+    symbol: str
+    strength: float = 50.0
+    stop: Optional[float] = None
+    tests: int = 0
+    confluences: List[str] = field(default_factory=list)
+    narrative: str = ""
+
+
+register_record_type(_Signal, text_fields=('narrative',))
+
+
+def _signal(i: int) -> _Signal:
+    return _Signal(side=_Side.BUY if i % 2 else _Side.SELL, price=1.1 + i * 1e-4, zone=(1.0, 1.2),
+                   timestamp=datetime(2025, 8, 1) + timedelta(minutes=i), symbol='EURUSD',
+                   stop=None if i % 3 else 1.0, tests=i, confluences=['FVG', 'OB'] if i % 2 else [],
+                   narrative=f"Señal {i}")
+
+
+class TestColumnarStore(unittest.TestCase):
+
+    def test_roundtrip_and_views(self):
+        signals = [_signal(i) for i in range(10)]
+        store = store_for(_Signal)
+        store.extend(signals)
+
+        self.assertEqual(len(store), 10)
+        self.assertEqual(store.materialize_all(), signals)
+        view = store[5]
+        self.assertIsInstance(view, RecordView)
+        self.assertEqual(view.side, _Side.BUY)
+        self.assertEqual(view['zone'], (1.0, 1.2))
+        self.assertIsNone(view.stop)
+        self.assertEqual(view.confluences, ['FVG', 'OB'])
+        self.assertEqual(store[-1].tests, 9)
+
+        view.strength = 80.0
+        view['confluences'] = ['BOS']
+        self.assertEqual(store.materialize(5).strength, 80.0)
+        self.assertEqual(store.get_value(5, 'confluences'), ['BOS'])
+
+    def test_lazy_text_and_interning(self):
+        store = store_for(_Signal)
+        calls = []
+
+        class _Price(float):
+            def __format__(self, spec):
+                calls.append(float(self))
+                return float.__format__(self, spec)
+
+        signal = _signal(1)
+        signal.narrative = LazyText("Precio {:.2f}", _Price(1.25))
+        store.append(signal)
+        store.extend(_signal(i) for i in range(2, 50))
+        self.assertEqual(calls, [])
+        self.assertEqual(store[0].narrative, "Precio 1.25")
+        self.assertEqual(store[0].narrative, "Precio 1.25")
+        self.assertEqual(calls, [1.25])
+        self.assertEqual(store.memory_usage()['interned']['symbol'], 1)
+
+    def test_extend_columns_filter_and_keep_last(self):
+        store = ColumnarStore({'type': 'category', 'price': 'float', 'index': 'int?'}, allow_extras=True)
+        store.extend_columns(4, type=np.array(['A', 'B', 'A', 'B']), price=np.arange(4.0), index=[1, None, 3, None])
+        store.append({'type': 'C', 'price': 9.0, 'volume': 100})
+
+        self.assertEqual([row['type'] for row in store], ['A', 'B', 'A', 'B', 'C'])
+        self.assertNotIn('index', store[1])
+        self.assertIsNone(store[1].get('index'))
+        self.assertEqual(dict(store[4]), {'type': 'C', 'price': 9.0, 'volume': 100})
+
+        a_rows = store.filter(store.column('type') == store.codes_for('type', 'A')[0])
+        self.assertEqual([row['index'] for row in a_rows], [1, 3])
+        tail = store.keep_last(2)
+        self.assertEqual([row['price'] for row in tail], [3.0, 9.0])
+        self.assertEqual(tail[1]['volume'], 100)
+
+    def test_store_smaller_than_dataclasses(self):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        signals = [_signal(i) for i in range(5000)]
+        objects_bytes = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(before, 'filename'))
+        store = store_for(_Signal, capacity=5000)
+        store.extend(signals)
+        tracemalloc.stop()
+        self.assertLess(store.memory_usage()['total_bytes'], objects_bytes)
+
+
+class TestColumnarIntegration(unittest.TestCase):
+
+    def test_poi_dict_store_matches_dicts(self):
+        import pandas as pd
+        from core.analysis.poi_detector_adapted import detectar_fair_value_gaps, detectar_fair_value_gaps_columnar
+
+        rng = np.random.default_rng(7)
+        close = 1.1 + np.cumsum(rng.normal(0, 0.0005, 500))
+        open_ = np.r_[close[0], close[:-1]]
+        df = pd.DataFrame({'open': open_, 'close': close, 'high': np.maximum(open_, close) + 0.0003,
+                           'low': np.minimum(open_, close) - 0.0003})
+
+        dicts = detectar_fair_value_gaps(df, 'M5')
+        store = detectar_fair_value_gaps_columnar(df, 'M5')
+        self.assertGreater(len(dicts), 0)
+        self.assertEqual(len(dicts), len(store))
+        for original, view in zip(dicts, store):
+            self.assertEqual(set(original), set(view.keys()))
+            for key in ('type', 'price', 'score', 'confidence', 'range_high', 'gap_size', 'index'):
+                self.assertEqual(original[key], view[key])
+
+    def test_poi_system_and_breaker_history_are_columnar(self):
+        from core.analysis.poi_system import POISystem
+        from core.ict_engine.advanced_patterns.breaker_blocks_enterprise_v62 import BreakerBlockLifecycleV62
+
+        self.assertIsInstance(POISystem().historical_pois, ColumnarStore)
+        self.assertIsInstance(BreakerBlockLifecycleV62().breaker_history, ColumnarStore)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - DISPLACEMENT DETECTOR VECTORIZADO
+====================================================
+
+Valida que el cálculo vectorizado de ventanas de DisplacementDetectorEnterprise
+produce las mismas señales que el análisis ventana por ventana.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from core.ict_engine.displacement_detector_enterprise import DisplacementDetectorEnterprise
+
+
+def _make_candles(n: int = 600, seed: int = 11) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    # Deriva lenta con saltos institucionales (~80 pips) alternando dirección
+    direction = np.where((np.arange(n) // 120) % 2 == 0, 1.0, -1.0)
+    steps = rng.normal(0, 0.00005, n) + direction * 0.00008
+    jumps = np.where(np.arange(n) % 60 == 45, 0.008, 0.0) * direction
+    close = 1.09 + np.cumsum(steps + jumps)
+    open_ = np.concatenate([[close[0]], close[:-1]])
+    return pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + np.abs(rng.normal(0, 0.0002, n)),
+        'low': np.minimum(open_, close) - np.abs(rng.normal(0, 0.0002, n)),
+        'close': close,
+        'volume': rng.integers(500, 2000, n),
+    }, index=pd.date_range('2025-08-04', periods=n, freq='15min'))
+
+
+class TestDisplacementVectorized(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.detector = DisplacementDetectorEnterprise()
+        cls.detector.memory_enabled = False
+        cls.data = _make_candles()
+
+    def test_signals_match_window_by_window_analysis(self):
+        signals = self.detector.detect_displacement(self.data, "EURUSD", "M15")
+        self.assertGreater(len(signals), 0)
+
+        window_size = min(16, len(self.data) // 4)
+        expected = []
+        for i in range(window_size, len(self.data) - 1):
+            window = self.data.iloc[i - window_size:i + 1]
+            signal = self.detector._analyze_displacement_window(window, "EURUSD", "M15", i)
+            if signal:
+                expected.append(signal)
+
+        self.assertEqual([s.timestamp for s in signals], [s.timestamp for s in expected])
+        for got, ref in zip(signals, expected):
+            self.assertEqual(got.displacement_type, ref.displacement_type)
+            self.assertAlmostEqual(got.displacement_pips, ref.displacement_pips, places=9)
+            self.assertAlmostEqual(got.momentum_score, ref.momentum_score, places=9)
+            self.assertEqual(got.institutional_signature, ref.institutional_signature)
+            self.assertAlmostEqual(got.target_estimation, ref.target_estimation, places=9)
+            self.assertEqual(got.confluence_factors, ref.confluence_factors)
+
+    def test_window_statistics_match_reference(self):
+        window_size = 16
+        features = self.detector._compute_window_features(self.data, window_size)
+
+        for i in (window_size, 200, len(self.data) - 2):
+            window = self.data.iloc[i - window_size:i + 1]
+            prev_close = window['close'].shift(1)
+            true_range = pd.concat([window['high'] - window['low'],
+                                    (window['high'] - prev_close).abs(),
+                                    (window['low'] - prev_close).abs()], axis=1).max(axis=1).iloc[1:]
+            self.assertAlmostEqual(features['volatility_percentile'][i],
+                                   min(1.0, true_range.iloc[-1] / true_range.mean()), places=9)
+
+            body = (window['close'] - window['open']).abs()
+            wicks = (window['high'] - window[['open', 'close']].max(axis=1)) + \
+                    (window[['open', 'close']].min(axis=1) - window['low'])
+            self.assertAlmostEqual(features['liquidity_cleared'][i],
+                                   (wicks / body.clip(lower=0.0001)).mean(), places=9)
+
+        self.assertTrue(np.isnan(features['momentum_score'][:window_size]).all())
+
+    def test_short_frame_returns_no_signals(self):
+        self.assertEqual(self.detector.detect_displacement(self.data.iloc[:30]), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - EQUAL LEVELS ENGINE
+======================================
+
+Valida el motor compartido de Equal Highs/Lows: pools únicos por nivel,
+conteo de toques, acotado de clusters y uso desde LiquidityAnalyzerEnterprise.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from core.analysis.equal_levels_engine import EqualLevelsEngine
+
+
+def _double_top_frame() -> pd.DataFrame:
+    """Tres toques en ~1.1050 separados por retrocesos y un doble suelo en ~1.0950"""
+    path = [1.1000, 1.1030, 1.1050, 1.1020, 1.0990, 1.0951, 1.0980, 1.1020, 1.1049,
+            1.1010, 1.0970, 1.0950, 1.0990, 1.1030, 1.1052, 1.1000, 1.0960, 1.0930,
+            1.0900, 1.0880, 1.0860, 1.0870, 1.0890, 1.0910, 1.0920]
+    close = np.array(path)
+    return pd.DataFrame({
+        'open': close, 'high': close + 0.0001, 'low': close - 0.0001, 'close': close,
+        'volume': np.full(len(close), 1000),
+    }, index=pd.date_range('2025-08-05 06:00', periods=len(close), freq='1h'))
+
+
+class TestEqualLevelsEngine(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = EqualLevelsEngine(tolerance=0.0005, min_touches=2, extreme_window=5)
+        self.data = _double_top_frame()
+
+    def test_single_pool_per_level(self):
+        highs = self.engine.find_equal_highs(self.data['high'].to_numpy())
+        self.assertEqual(len(highs), 1)
+        self.assertEqual(highs[0].touches, 3)
+        self.assertEqual(highs[0].indices, [2, 8, 14])
+        self.assertAlmostEqual(highs[0].level, 1.1053)
+
+        lows = self.engine.find_equal_lows(self.data['low'].to_numpy())
+        self.assertEqual([(p.touches, p.indices) for p in lows], [(2, [5, 11])])
+        self.assertAlmostEqual(lows[0].level, 1.0949)
+
+    def test_plateau_counts_as_one_touch(self):
+        highs = np.array([1.0, 1.1, 1.2, 1.2, 1.2, 1.1, 1.0, 1.0, 1.0, 1.0, 1.0])
+        self.assertEqual(self.engine.find_equal_highs(highs), [])
+
+    def test_slow_trend_does_not_chain_into_one_level(self):
+        # Toques cada 4 pips durante 40 pips: vecinos dentro de tolerancia, extremos no
+        highs = 1.1000 + 0.0004 * np.arange(11)
+        pools = self.engine.find_equal_highs(highs, extreme_window=1)
+        for pool in pools:
+            self.assertLessEqual(pool.top - pool.bottom, 2 * 0.0005 + 1e-12)
+        self.assertGreater(len(pools), 1)
+
+    def test_max_bar_distance_splits_distant_touches(self):
+        # Mismo precio en las velas 2, 8 y 40: con 10 velas de distancia máxima sólo 2 y 8 forman pool
+        highs = 1.1000 - 0.001 * np.arange(45)
+        highs[[2, 8, 40]] = 1.1050
+        self.assertEqual([p.indices for p in self.engine.find_equal_highs(highs)], [[2, 8, 40]])
+
+        pools = self.engine.find_equal_highs(highs, max_bar_distance=10)
+        self.assertEqual([(p.touches, p.indices) for p in pools], [(2, [2, 8])])
+
+        highs[44] = 1.1050
+        engine = EqualLevelsEngine(tolerance=0.0005, extreme_window=5, max_bar_distance=10)
+        self.assertEqual([p.indices for p in engine.find_equal_highs(highs)], [[2, 8], [40, 44]])
+
+    def test_invalid_side(self):
+        with self.assertRaises(ValueError):
+            self.engine.find_levels([1.0, 1.0], 'MID')
+
+    def test_liquidity_analyzer_uses_engine(self):
+        from core.ict_engine.advanced_patterns.liquidity_analyzer_enterprise import (
+            LiquidityAnalyzerEnterprise, LiquidityPoolType
+        )
+        analyzer = LiquidityAnalyzerEnterprise()
+        pools = analyzer._detect_equal_highs_enterprise(self.data, 'H1', 'EURUSD')
+
+        self.assertEqual(len(pools), 1)
+        self.assertEqual(pools[0].pool_type, LiquidityPoolType.EQUAL_HIGHS)
+        self.assertEqual(pools[0].touches, 3)
+        self.assertEqual(pools[0].timestamp, self.data.index[14])
+
+
+if __name__ == '__main__':
+    unittest.main()
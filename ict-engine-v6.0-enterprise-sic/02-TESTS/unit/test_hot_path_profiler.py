@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - HOT PATH PROFILER
+====================================
+
+Valida el registro por pila (llamadas, filas, CPU, asignaciones), el export
+folded stacks para flame graphs, la fusión de perfiles y que desactivado
+el decorador no registra nada.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from utils.hot_path_profiler import (HotPathProfiler, get_hot_path_profiler, main,
+                                     profile_hot_path, profile_section)
+from core.analysis.fvg_kernel import scan_fair_value_gaps
+
+
+@profile_hot_path(name='test.inner', rows='data')
+def _inner(data):
+    return [0] * (len(data) * 10)
+
+
+@profile_hot_path(name='test.outer')
+def _outer(data, repeats=3):
+    for _ in range(repeats):
+        _inner(data)
+    with profile_section('test.block') as section:
+        section.rows = len(data)
+
+
+class TestHotPathProfiler(unittest.TestCase):
+
+    def setUp(self):
+        self.profiler = get_hot_path_profiler()
+        self.profiler.disable()
+        self.profiler.reset()
+
+    def tearDown(self):
+        self.profiler.disable()
+        self.profiler.reset()
+
+    def test_disabled_records_nothing(self):
+        _outer(list(range(100)))
+        with profile_section('test.block') as section:
+            section.rows = 10
+        self.assertEqual(self.profiler.snapshot(), {})
+
+    def test_stacks_calls_and_rows(self):
+        self.profiler.enable(trace_memory=True, sample_every=1)
+        _outer(list(range(1000)))
+        _outer(list(range(1000)), repeats=1)
+        self.profiler.disable()
+
+        stacks = self.profiler.snapshot()
+        self.assertEqual(set(stacks), {('test.outer',), ('test.outer', 'test.inner'), ('test.outer', 'test.block')})
+
+        report = {row['function']: row for row in self.profiler.report()}
+        self.assertEqual(report['test.outer']['calls'], 2)
+        self.assertEqual(report['test.inner']['calls'], 4)
+        self.assertEqual(report['test.inner']['rows'], 4000)
+        self.assertEqual(report['test.block']['rows'], 2000)
+        self.assertGreaterEqual(report['test.outer']['wall_ms'], report['test.inner']['wall_ms'])
+        self.assertGreater(report['test.inner']['cpu_ms'], 0.0)
+        self.assertGreater(report['test.inner']['alloc_bytes_est'], 0)
+
+    def test_folded_export_self_time(self):
+        self.profiler.enable()
+        _outer(list(range(2000)))
+        self.profiler.disable()
+
+        folded = self.profiler.to_folded('wall')
+        lines = dict(line.rsplit(' ', 1) for line in folded.strip().splitlines())
+        self.assertIn('test.outer;test.inner', lines)
+        inclusive_us = self.profiler.snapshot()[('test.outer',)][1] / 1000.0
+        self.assertLessEqual(sum(int(v) for v in lines.values()), inclusive_us + len(lines))
+        self.assertEqual(self.profiler.to_folded('calls').splitlines()[0], 'test.outer 1')
+
+    def test_merge_and_cli_roundtrip(self):
+        self.profiler.enable()
+        _outer(list(range(10)))
+        self.profiler.disable()
+
+        other = HotPathProfiler().merge(self.profiler.to_dict()).merge(self.profiler)
+        self.assertEqual(other.snapshot()[('test.outer', 'test.inner')][0], 6)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            profile_path = os.path.join(tmp, 'profile.json')
+            folded_path = os.path.join(tmp, 'profile.folded')
+            other.dump_json(profile_path)
+            self.assertEqual(main(['folded', profile_path, '--metric', 'rows', '--out', folded_path]), 0)
+            with open(folded_path, encoding='utf-8') as handle:
+                self.assertIn('test.outer;test.inner 60', handle.read())
+            with open(profile_path, encoding='utf-8') as handle:
+                self.assertEqual(json.load(handle)['version'], 1)
+
+    def test_detector_kernel_is_instrumented(self):
+        candles = pd.DataFrame({'high': np.linspace(1.0, 2.0, 500), 'low': np.linspace(0.99, 1.99, 500)})
+        self.profiler.enable()
+        scan_fair_value_gaps(candles['high'], candles['low'])
+        self.profiler.disable()
+
+        report = self.profiler.report()
+        self.assertEqual(report[0]['function'], 'fvg_kernel.scan_fair_value_gaps')
+        self.assertEqual(report[0]['rows'], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
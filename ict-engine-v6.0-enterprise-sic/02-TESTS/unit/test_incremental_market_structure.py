@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - INCREMENTAL MARKET STRUCTURE
+===============================================
+
+Valida que el motor incremental de swings/BOS/CHoCH produce lo mismo que
+el recorrido batch, que re-procesa correctamente la vela en formación,
+que un frame más largo tras uno más corto recupera los swings antiguos y
+que snapshot/restore conserva el estado.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from core.analysis.incremental_market_structure import IncrementalMarketStructureEngine
+
+
+def _make_candles(n: int = 1500, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 0.0005, n))
+    return pd.DataFrame({
+        'open': close,
+        'high': close + np.abs(rng.normal(0, 0.0003, n)),
+        'low': close - np.abs(rng.normal(0, 0.0003, n)),
+        'close': close + rng.normal(0, 0.0001, n),
+    }, index=pd.date_range('2025-08-01', periods=n, freq='5min'))
+
+
+def _batch_swings(candles: pd.DataFrame, window: int = 5):
+    """Recorrido batch de referencia (misma regla que _detect_swing_points_for_bos)"""
+    highs, lows = candles['high'].to_numpy(), candles['low'].to_numpy()
+    swing_highs, swing_lows = [], []
+    for i in range(window, len(candles) - window):
+        others = [j for j in range(i - window, i + window + 1) if j != i]
+        if all(highs[j] < highs[i] for j in others):
+            swing_highs.append(i)
+        if all(lows[j] > lows[i] for j in others):
+            swing_lows.append(i)
+    return swing_highs, swing_lows
+
+
+class TestIncrementalMarketStructure(unittest.TestCase):
+
+    def setUp(self):
+        self.candles = _make_candles()
+        self.engine = IncrementalMarketStructureEngine(window=5)
+
+    def test_incremental_swings_match_batch(self):
+        self.engine.update('EURUSD', 'M5', self.candles.iloc[:1000])
+        frame = self.candles.iloc[300:]
+        self.engine.update('EURUSD', 'M5', frame)
+
+        swings = self.engine.get_swings_for_frame('EURUSD', 'M5', frame)
+        expected_highs, expected_lows = _batch_swings(frame)
+
+        self.assertEqual([s['index'] for s in swings['highs']], expected_highs)
+        self.assertEqual([s['index'] for s in swings['lows']], expected_lows)
+
+    def test_longer_frame_after_shorter_frame(self):
+        # Mismo último bar, pero el segundo frame empieza antes (10 días tras 7 días)
+        self.engine.update('EURUSD', 'M5', self.candles.iloc[-672:])
+        self.engine.update('EURUSD', 'M5', self.candles)
+
+        swings = self.engine.get_swings_for_frame('EURUSD', 'M5', self.candles)
+        expected_highs, expected_lows = _batch_swings(self.candles)
+        self.assertEqual([s['index'] for s in swings['highs']], expected_highs)
+        self.assertEqual([s['index'] for s in swings['lows']], expected_lows)
+
+        restored = IncrementalMarketStructureEngine(window=5)
+        restored.update('EURUSD', 'M5', self.candles.iloc[-672:])
+        restored.restore(json.loads(json.dumps(restored.snapshot())))
+        restored.update('EURUSD', 'M5', self.candles)
+        self.assertEqual(len(restored.get_swings('EURUSD', 'M5')[0]), len(expected_highs))
+
+    def test_long_frame_keeps_every_swing(self):
+        candles = _make_candles(6000, seed=11)
+        self.engine.replay('EURUSD', 'M5', candles)
+
+        swings = self.engine.get_swings_for_frame('EURUSD', 'M5', candles)
+        expected_highs, expected_lows = _batch_swings(candles)
+
+        self.assertGreater(len(expected_highs), self.engine.max_swings)
+        self.assertEqual([s['index'] for s in swings['highs']], expected_highs)
+        self.assertEqual([s['index'] for s in swings['lows']], expected_lows)
+
+    def test_live_updates_equal_replay(self):
+        for end in range(50, len(self.candles) + 1, 37):
+            self.engine.update('EURUSD', 'M5', self.candles.iloc[:end])
+        self.engine.update('EURUSD', 'M5', self.candles)
+
+        batch = IncrementalMarketStructureEngine(window=5)
+        batch.replay('EURUSD', 'M5', self.candles)
+
+        self.assertEqual(self.engine.get_structure('EURUSD', 'M5'),
+                         batch.get_structure('EURUSD', 'M5'))
+
+    def test_forming_bar_is_reprocessed(self):
+        partial = self.candles.iloc[:800].copy()
+        partial.iloc[-1, partial.columns.get_loc('close')] += 0.05  # cierre provisional extremo
+        self.engine.update('EURUSD', 'M5', partial)
+        self.engine.update('EURUSD', 'M5', self.candles.iloc[:800])
+
+        batch = IncrementalMarketStructureEngine(window=5)
+        batch.replay('EURUSD', 'M5', self.candles.iloc[:800])
+
+        self.assertEqual(self.engine.get_structure('EURUSD', 'M5'),
+                         batch.get_structure('EURUSD', 'M5'))
+
+    def test_bos_then_choch_sequence(self):
+        # Zigzag alcista: 8 velas arriba / 4 abajo (BOS alcistas), luego caída fuerte (CHoCH bajista)
+        prices = [1.0]
+        for _ in range(6):
+            prices += [prices[-1] + 0.01 * k for k in range(1, 9)]
+            prices += [prices[-1] - 0.01 * k for k in range(1, 5)]
+        prices += [prices[-1] - 0.03 * k for k in range(1, 20)]
+        prices = np.array(prices)
+        candles = pd.DataFrame({
+            'high': prices + 0.001, 'low': prices - 0.001, 'close': prices,
+        }, index=pd.date_range('2025-08-01', periods=len(prices), freq='15min'))
+
+        events = self.engine.replay('GBPUSD', 'M15', candles)
+        kinds = [e.event_type for e in events]
+
+        self.assertIn('BOS_BULLISH', kinds)
+        self.assertIn('CHOCH_BEARISH', kinds)
+        self.assertLess(kinds.index('BOS_BULLISH'), kinds.index('CHOCH_BEARISH'))
+        self.assertEqual(self.engine.get_structure('GBPUSD', 'M15')['trend'], 'BEARISH')
+
+    def test_snapshot_restore_roundtrip(self):
+        self.engine.replay('EURUSD', 'M5', self.candles.iloc[:1200])
+        snapshot = json.loads(json.dumps(self.engine.snapshot()))
+
+        restored = IncrementalMarketStructureEngine(window=5)
+        self.assertEqual(restored.restore(snapshot), 1)
+
+        self.engine.update('EURUSD', 'M5', self.candles)
+        restored.update('EURUSD', 'M5', self.candles)
+        self.assertEqual(restored.get_structure('EURUSD', 'M5')['last_bos'],
+                         self.engine.get_structure('EURUSD', 'M5')['last_bos'])
+
+    def test_restore_rejects_other_window(self):
+        snapshot = IncrementalMarketStructureEngine(window=3).snapshot()
+        with self.assertRaises(ValueError):
+            self.engine.restore(snapshot)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - KILLZONE PREFETCHER
+======================================
+
+Valida el prefetch predictivo de velas antes de las killzones:
+ventana de prefetch (horario del calendario de sesiones), frescura por
+timeframe, features derivadas, requisitos registrados por los analizadores
+al pedir frames y que download_candles sirva desde el cache sin volver a
+descargar.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from core.data_management.killzone_prefetcher import KillzonePrefetcher, WarmFrame, get_killzone_prefetcher
+
+
+class FakeDownloader:
+    """Downloader mínimo que cuenta las descargas"""
+
+    def __init__(self):
+        self.calls = []
+
+    def download_candles(self, symbol, timeframe, save_to_file=None, use_cache=True, **kwargs):
+        self.calls.append((symbol, timeframe, use_cache))
+        return {'success': True, 'data': [1.1, 1.2, 1.3], 'symbol': symbol}
+
+
+class FakeSetDownloader(FakeDownloader):
+    """Downloader con serie base: un get_timeframe_set por símbolo"""
+
+    def __init__(self):
+        super().__init__()
+        self.sets = []
+
+    def get_timeframe_set(self, symbol, timeframes, **kwargs):
+        self.sets.append((symbol, list(timeframes)))
+        return {'results': {tf: {'success': True, 'data': [1.0], 'source': 'derived'} for tf in timeframes}}
+
+
+class TestKillzonePrefetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.downloader = FakeDownloader()
+        self.prefetcher = KillzonePrefetcher(self.downloader, lead_minutes=10, hold_minutes=2)
+        self.prefetcher.register_analyzer('pattern_detector', ['EURUSD'], ['M15', 'H4'])
+        self.prefetcher.register_analyzer('silver_bullet', ['EURUSD', 'GBPUSD'], ['M15'])
+
+    def test_targets_are_unique_and_higher_timeframes_first(self):
+        targets = self.prefetcher.get_prefetch_targets()
+        self.assertEqual(targets, [('EURUSD', 'H4'), ('EURUSD', 'M15'), ('GBPUSD', 'M15')])
+
+    def test_prefetch_window_around_london_open(self):
+        before = datetime(2025, 8, 12, 6, 45, tzinfo=timezone.utc)
+        inside = datetime(2025, 8, 12, 6, 55, tzinfo=timezone.utc)
+        after_open = datetime(2025, 8, 12, 7, 1, tzinfo=timezone.utc)
+        late = datetime(2025, 8, 12, 7, 5, tzinfo=timezone.utc)
+
+        self.assertFalse(self.prefetcher.is_prefetch_window(before))
+        self.assertTrue(self.prefetcher.is_prefetch_window(inside))
+        self.assertTrue(self.prefetcher.is_prefetch_window(after_open))
+        self.assertFalse(self.prefetcher.is_prefetch_window(late))
+
+        name, open_dt = self.prefetcher.next_killzone_open(late)
+        self.assertEqual(name, 'NEWYORK_KILLZONE')
+        self.assertEqual(open_dt.hour, 12)
+
+    def test_killzones_follow_local_daylight_saving(self):
+        # Enero: London y New York en horario de invierno → una hora más tarde en UTC
+        self.assertTrue(self.prefetcher.is_prefetch_window(datetime(2025, 1, 14, 7, 55, tzinfo=timezone.utc)))
+        self.assertFalse(self.prefetcher.is_prefetch_window(datetime(2025, 1, 14, 6, 55, tzinfo=timezone.utc)))
+        name, open_dt = self.prefetcher.next_killzone_open(datetime(2025, 1, 14, 9, 0, tzinfo=timezone.utc))
+        self.assertEqual((name, open_dt.hour), ('NEWYORK_KILLZONE', 13))
+
+        # Marzo: New York ya cambió de hora y London todavía no
+        _, open_dt = self.prefetcher.next_killzone_open(datetime(2025, 3, 20, 9, 0, tzinfo=timezone.utc))
+        self.assertEqual(open_dt.hour, 12)
+
+    def test_schedule_comes_from_session_calendar(self):
+        from core.analysis.session_calendar import KILLZONES
+
+        self.assertTrue(set(KILLZONES) <= set(self.prefetcher.killzones))
+        # Silver Bullet PM (14:00 New York): 18:00 UTC en verano
+        name, open_dt = self.prefetcher.next_killzone_open(datetime(2025, 8, 12, 16, 0, tzinfo=timezone.utc))
+        self.assertEqual((name, open_dt.hour), ('SILVER_BULLET_1400', 18))
+
+    def test_tick_outside_window_does_not_download(self):
+        self.assertEqual(self.prefetcher.tick(datetime(2025, 8, 12, 3, 0, tzinfo=timezone.utc)), 0)
+        self.assertEqual(self.downloader.calls, [])
+
+    def test_prefetch_bypasses_cache_and_refreshes_only_stale_frames(self):
+        self.assertEqual(self.prefetcher.prefetch(), 3)
+        self.assertTrue(all(not use_cache for _, _, use_cache in self.downloader.calls))
+
+        # Segundo ciclo: todo fresco, no hay descargas
+        self.assertEqual(self.prefetcher.prefetch(), 0)
+        self.assertEqual(len(self.downloader.calls), 3)
+
+        # Vencer el frame M15 de EURUSD (más antiguo que una vela)
+        frame = self.prefetcher._frames[('EURUSD', 'M15')]
+        frame.fetched_at -= 901
+        self.assertEqual(self.prefetcher.prefetch(), 1)
+
+    def test_warm_result_and_features(self):
+        self.prefetcher.register_feature_builder('last', lambda s, tf, data: data[-1])
+        self.prefetcher.prefetch()
+
+        result = self.prefetcher.get_warm_result('EURUSD', 'M15')
+        self.assertTrue(result['cache_hit'])
+        self.assertEqual(self.prefetcher.get_features('EURUSD', 'M15'), {'last': 1.3})
+        self.assertIsNone(self.prefetcher.get_warm_result('XAUUSD', 'M15'))
+
+    def test_frame_expires_at_next_bar_close(self):
+        frame = WarmFrame('EURUSD', 'M5', {'success': True, 'data': []}, fetched_at=1000.0)
+        self.assertTrue(self.prefetcher.is_fresh(frame, now=1199.0))
+        self.assertFalse(self.prefetcher.is_fresh(frame, now=1200.0))
+
+        # H1 descargado a las 06:50 ya no sirve tras el cierre de las 07:00
+        fetched = datetime(2025, 8, 12, 6, 50, tzinfo=timezone.utc).timestamp()
+        frame = WarmFrame('EURUSD', 'H1', {'success': True, 'data': []}, fetched_at=fetched)
+        self.assertTrue(self.prefetcher.is_fresh(frame, now=fetched + 599))
+        self.assertFalse(self.prefetcher.is_fresh(frame, now=fetched + 600))
+
+
+    def test_recorded_demand_prefetches_through_analyzer_downloader(self):
+        prefetcher = KillzonePrefetcher(lead_minutes=10)
+        downloader = FakeSetDownloader()
+        prefetcher.record_demand('pattern_detector', 'EURUSD', ['M15', 'H1'], downloader=downloader)
+        prefetcher.record_demand('pattern_detector', 'GBPUSD', ['M15', 'H4'], downloader=downloader)
+
+        self.assertEqual(prefetcher.get_prefetch_targets(), [
+            ('EURUSD', 'H4'), ('GBPUSD', 'H4'), ('EURUSD', 'H1'), ('GBPUSD', 'H1'),
+            ('EURUSD', 'M15'), ('GBPUSD', 'M15')])
+        self.assertEqual(prefetcher.prefetch(), 6)
+        self.assertEqual(downloader.sets, [('EURUSD', ['H4', 'H1', 'M15']), ('GBPUSD', ['H4', 'H1', 'M15'])])
+        self.assertEqual(downloader.calls, [])
+        self.assertEqual(prefetcher.get_warm_result('GBPUSD', 'H1')['source'], 'derived')
+
+        # Downloader del analizador liberado: sus requisitos dejan de descargarse
+        prefetcher.invalidate()
+        del downloader
+        self.assertEqual(prefetcher.prefetch(), 0)
+
+
+class TestDownloaderUsesPrefetchCache(unittest.TestCase):
+
+    def test_download_candles_served_from_warm_frame(self):
+        from core.data_management.advanced_candle_downloader import AdvancedCandleDownloader
+
+        downloader = AdvancedCandleDownloader(config={'enable_debug': False})
+        prefetcher = downloader.get_killzone_prefetcher()
+        self.assertIs(prefetcher, get_killzone_prefetcher())
+        self.addCleanup(prefetcher.invalidate)
+
+        prefetcher.store('EURUSD', 'M15', {'success': True, 'data': [1.0, 1.1]})
+        result = downloader.download_candles('EURUSD', 'M15')
+
+        self.assertTrue(result['cache_hit'])
+        self.assertEqual(downloader.get_status()['cache_stats']['hits'], 1)
+
+        # Rango o número de velas explícito: el frame caliente no vale
+        self.assertFalse(downloader.download_candles('EURUSD', 'M15', bars_count=50).get('cache_hit'))
+        self.assertFalse(downloader.download_candles(
+            'EURUSD', 'M15', start_date=datetime(2025, 1, 1), end_date=datetime(2025, 1, 2)).get('cache_hit'))
+        self.assertEqual(downloader.get_status()['cache_stats']['hits'], 1)
+
+    def test_timeframe_set_registers_consumer_demand(self):
+        from core.data_management.advanced_candle_downloader import AdvancedCandleDownloader
+
+        downloader = AdvancedCandleDownloader(config={'enable_debug': False})
+        prefetcher = downloader.get_killzone_prefetcher()
+        self.addCleanup(prefetcher._requirements.pop, 'test_consumer', None)
+
+        downloader.get_timeframe_set('EURUSD', ['M15', 'H1'], consumer='test_consumer')
+        downloader.get_timeframe_set('GBPUSD', ['M15'], consumer='test_consumer')
+        requirement = prefetcher._requirements['test_consumer']
+        self.assertEqual((requirement['symbols'], requirement['timeframes']), (['EURUSD', 'GBPUSD'], ['M15', 'H1']))
+        self.assertIs(requirement['downloader'](), downloader)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - LAZY LOADING
+===============================
+
+Valida que lazy_import no importa hasta el primer acceso, que los
+componentes diferidos se construyen una sola vez (o se reemplazan sin
+construirse), que el fallback y la detección de recursión funcionan, y que
+PatternDetector / UnifiedMemorySystem ya no construyen nada al crearse.
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from utils.lazy_loading import (LazyModuleProxy, component_status, get_startup_profiler, is_module_available,
+                                lazy_component, lazy_import, parse_importtime, preload_components)
+
+
+class _Service:
+    builds = 0
+
+    @lazy_component
+    def engine(self):
+        type(self).builds += 1
+        return {'engine': type(self).builds}
+
+    @lazy_component(fallback=None)
+    def broken(self):
+        raise RuntimeError('sin MT5')
+
+    @lazy_component
+    def loop(self):
+        return self.loop
+
+
+class TestLazyModules(unittest.TestCase):
+
+    def test_lazy_import_defers_until_first_access(self):
+        sys.modules.pop('colorsys', None)
+        proxy = lazy_import('colorsys', 'rgb_to_hsv')
+        self.assertIsInstance(proxy, LazyModuleProxy)
+        self.assertNotIn('colorsys', sys.modules)
+
+        self.assertEqual(proxy(1.0, 0.0, 0.0), (0.0, 1.0, 1.0))
+        self.assertTrue(proxy.is_loaded)
+        self.assertIn('colorsys', sys.modules)
+        self.assertIs(lazy_import('colorsys'), sys.modules['colorsys'])  # Ya cargado → sin proxy
+
+    def test_module_availability_without_import(self):
+        sys.modules.pop('wave', None)
+        self.assertTrue(is_module_available('wave'))
+        self.assertNotIn('wave', sys.modules)
+        self.assertFalse(is_module_available('modulo_que_no_existe_ict'))
+
+    def test_parse_importtime(self):
+        stderr = ("import time: self [us] | cumulative | imported package\n"
+                  "import time:       150 |        150 |   numpy.core\n"
+                  "import time:      2000 |       2150 | numpy\n")
+        rows = parse_importtime(stderr)
+        self.assertEqual([row['module'] for row in rows], ['numpy.core', 'numpy'])
+        self.assertEqual(rows[0]['depth'], 1)
+        self.assertAlmostEqual(rows[1]['cumulative_ms'], 2.15)
+
+
+class TestLazyComponents(unittest.TestCase):
+
+    def setUp(self):
+        _Service.builds = 0
+
+    def test_built_once_and_cached_in_instance(self):
+        service = _Service()
+        self.assertEqual(component_status(service)['engine'], 'lazy')
+
+        threads = [threading.Thread(target=lambda: service.engine) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(_Service.builds, 1)
+        self.assertIs(service.engine, service.__dict__['engine'])
+        self.assertEqual(component_status(service)['engine'], 'built')
+        self.assertTrue(any(load['name'] == '_Service.engine' for load in get_startup_profiler().report()['lazy_loads']))
+
+    def test_assignment_replaces_without_building(self):
+        service = _Service()
+        service.engine = 'inyectado'
+        self.assertEqual(service.engine, 'inyectado')
+        self.assertEqual(_Service.builds, 0)
+
+    def test_fallback_recursion_and_preload(self):
+        service = _Service()
+        self.assertIsNone(service.broken)
+        with self.assertRaises(RuntimeError):
+            service.loop
+
+        preload_components(service, ['engine', 'broken'], background=False)
+        self.assertEqual(component_status(service), {'engine': 'built', 'broken': 'built', 'loop': 'lazy'})
+
+    def test_distinct_components_build_concurrently(self):
+        # Cada fábrica espera a que la otra haya empezado: con un lock global no terminaría
+        started = {'first': threading.Event(), 'second': threading.Event()}
+
+        class _Pair:
+            @lazy_component
+            def first(self):
+                started['first'].set()
+                return started['second'].wait(timeout=5)
+
+            @lazy_component
+            def second(self):
+                started['second'].set()
+                return started['first'].wait(timeout=5)
+
+        pair = _Pair()
+        results = {}
+        threads = [threading.Thread(target=lambda name=name: results.setdefault(name, getattr(pair, name)))
+                   for name in ('first', 'second')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, {'first': True, 'second': True})
+
+
+class TestDeferredConstruction(unittest.TestCase):
+
+    def test_pattern_detector_defers_components(self):
+        from core.analysis.pattern_detector import PatternDetector
+        detector = PatternDetector()
+        self.assertTrue(detector.is_initialized)
+        self.assertEqual(set(component_status(detector).values()), {'lazy'})
+
+        detector._data_manager = None  # Inyección sin construir el downloader
+        self.assertEqual(component_status(detector)['_downloader'], 'lazy')
+
+    def test_unified_memory_builds_components_together(self):
+        from core.analysis.unified_memory_system import UnifiedMemorySystem
+        memory = UnifiedMemorySystem()
+        self.assertEqual(set(memory.system_state['components_status'].values()), {'lazy'})
+        self.assertEqual(memory.system_state['memory_quality'], 'basic')
+
+        self.assertIsNotNone(memory.market_context)
+        self.assertEqual(set(component_status(memory).values()), {'built'})
+        # El estado se recalcula al leerlo, no queda el de la construcción
+        self.assertNotIn('lazy', memory.system_state['components_status'].values())
+        self.assertEqual(memory.system_state['memory_quality'], 'excellent')
+
+
+if __name__ == '__main__':
+    unittest.main()
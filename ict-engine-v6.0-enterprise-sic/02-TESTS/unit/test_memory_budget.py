@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - MEMORY BUDGET
+================================
+
+Valida que BoundedHistory retiene solo `maxlen` elementos y resume a disco
+lo que sale del anillo, que MemoryBudget desaloja por prioridad al superar
+el umbral de limpieza (y se detiene bajo el de alerta), y que los historiales
+de MarketContextV6, POISystem y TradingDecisionCacheV6 están acotados.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from utils.memory_budget import BoundedHistory, MemoryBudget, estimate_size
+
+_GB = 1024 ** 3
+
+
+class _Cache:
+    def __init__(self, items, log, name, rss):
+        self.items = list(range(items))
+        self.log = log
+        self.name = name
+        self.rss = rss
+
+    def evict(self, fraction):
+        count = int(len(self.items) * fraction)
+        del self.items[:count]
+        self.log.append(self.name)
+        self.rss[0] -= 0.1 * _GB
+        return count
+
+
+class TestBoundedHistory(unittest.TestCase):
+
+    def test_ring_keeps_last_items_and_spills_summaries(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            spill = os.path.join(tmp, 'history.jsonl')
+            history = BoundedHistory(3, name='t', summarize=lambda item: {'id': item}, spill_path=spill, spill_batch=2)
+            history.extend(range(7))
+
+            self.assertEqual(list(history), [4, 5, 6])
+            self.assertEqual(history[-2:], [5, 6])
+            self.assertEqual(history[0], 4)
+            self.assertEqual(history.stats()['dropped'], 4)
+            self.assertEqual([row['id'] for row in history.read_spilled()], [0, 1, 2, 3])
+
+            self.assertEqual(history.evict(0.5), 2)
+            self.assertEqual(list(history), [6])
+            self.assertEqual(history.spilled, 6)
+
+            history.replace(range(10))
+            self.assertEqual(list(history), [7, 8, 9])
+
+    def test_estimate_size_grows_with_content(self):
+        small = BoundedHistory(1000)
+        large = BoundedHistory(1000)
+        small.extend({'price': 1.1} for _ in range(10))
+        large.extend({'price': 1.1} for _ in range(1000))
+        self.assertGreater(large.memory_bytes(), small.memory_bytes() * 10)
+        self.assertGreater(estimate_size([b'x' * 1000] * 100), 100_000)
+
+
+class TestMemoryBudget(unittest.TestCase):
+
+    def _budget(self, rss):
+        return MemoryBudget(max_process_gb=1.0, alert_percent=85, cleanup_percent=90,
+                            rss_reader=lambda: int(rss[0]))
+
+    def test_thresholds_and_priority_eviction(self):
+        rss = [0.5 * _GB]
+        budget = self._budget(rss)
+        log = []
+        history = _Cache(100, log, 'history', rss)
+        cache = _Cache(100, log, 'cache', rss)
+        budget.register('history', history, priority=60)
+        budget.register('cache', cache, priority=10)
+
+        self.assertEqual(budget.check()['status'], 'OK')
+        rss[0] = 0.86 * _GB
+        self.assertEqual(budget.check()['status'], 'ALERT')
+        self.assertEqual(log, [])
+
+        rss[0] = 0.95 * _GB
+        result = budget.check()
+        self.assertEqual(result['status'], 'CLEANUP')
+        self.assertEqual(log, ['cache', 'history'])  # Menor prioridad primero
+        self.assertEqual(result['evicted'], {'cache': 50, 'history': 50})
+
+        rss[0] = 0.91 * _GB
+        log.clear()
+        budget.check()
+        self.assertEqual(log, ['cache'])  # Bajo el umbral de alerta tras el primer paso
+
+    def test_registry_is_weak_and_reports_components(self):
+        budget = self._budget([0])
+        cache = _Cache(10, [], 'a', [0])
+        budget.register('cache', cache)
+        self.assertIn('cache', budget.component_report())
+        del cache
+        self.assertEqual(budget.registered_names(), [])
+
+    def test_from_config(self):
+        budget = MemoryBudget.from_config({'limits': {'max_process_gb': 2},
+                                           'monitoring': {'cleanup_threshold_percent': 80}})
+        self.assertEqual(budget.limit_bytes, 2 * _GB)
+        self.assertEqual(budget.cleanup_percent, 80)
+
+
+class TestBoundedComponents(unittest.TestCase):
+
+    def test_market_context_histories_are_bounded(self):
+        from core.analysis.market_context_v6 import MarketContextV6
+        context = MarketContextV6()
+        for i in range(context.max_bos_events + 20):
+            context._update_pattern_memory({'bos_detected': {'i': i}, 'swing_points': {'high': i}})
+        self.assertEqual(len(context.bos_events), context.max_bos_events)
+        self.assertEqual(context.bos_events[-1]['data'], {'i': context.max_bos_events + 19})
+        self.assertEqual(len(context.swing_points['highs']), context.max_swing_points)
+
+        context.evict(0.5)
+        self.assertEqual(len(context.bos_events), context.max_bos_events // 2)
+
+    def test_poi_system_history_capped(self):
+        from core.analysis.poi_system import POI, POISystem, POIType
+        system = POISystem({'max_historical_pois': 5, 'enable_debug': False})
+        past = datetime.now() - timedelta(hours=1)
+        system.active_pois = [POI(poi_type=POIType.ORDER_BLOCK, price_level=1.1 + i * 1e-4, price_zone=(1.0, 1.2),
+                                  timestamp=past, symbol='EURUSD', timeframe='M15', expiry_time=past)
+                              for i in range(8)]
+        system._cleanup_expired_pois()
+        self.assertEqual(len(system.historical_pois), 5)
+        self.assertAlmostEqual(system.historical_pois[0].price_level, 1.1003)
+
+    def test_decision_cache_tracks_bounded_event_types(self):
+        from core.smart_trading_logger import TradingDecisionCacheV6
+        cache = TradingDecisionCacheV6({'cache_settings': {'max_tracked_events': 50}})
+        for i in range(200):
+            cache.should_log_event(f'evento_{i}', {'i': i})
+        self.assertLessEqual(len(cache.last_states), 50)
+        self.assertIn('evento_199', cache.last_states)
+
+
+if __name__ == '__main__':
+    unittest.main()
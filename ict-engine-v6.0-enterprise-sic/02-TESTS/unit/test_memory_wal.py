@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - MEMORY WAL
+=============================
+
+Valida el log de mutaciones de la memoria: reproducción desde snapshot + log
+igual al estado en memoria, descarte de un registro incompleto al final,
+log anterior al snapshot ignorado, guardados que solo escriben lo cambiado,
+un único escritor por log (otro proceso lo abre en solo lectura) y
+restauración de MarketContextV6 / ICTHistoricalAnalyzerV6 (incluida la
+migración del JSON heredado).
+"""
+
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+from collections import deque
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from utils.memory_wal import MemoryWAL, dumps, loads, open_wal
+
+
+class TestMemoryWAL(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_codec_roundtrip(self):
+        value = {'bias': 'BULLISH', 'levels': [1.1, None, True, 2 ** 70], 'n': np.int64(3),
+                 'when': datetime(2025, 8, 1, 9, 30, tzinfo=timezone.utc), 'raw': b'\x00\x01', 7: (1, 'ñ')}
+        self.assertEqual(loads(dumps(value)), {**value, 'n': 3, 7: [1, 'ñ']})
+
+    def test_replay_matches_state_across_compactions(self):
+        rng = random.Random(5)
+        wal = MemoryWAL(self.directory, 'state', compact_min_bytes=2000)
+        expected = {}
+        for i in range(2000):
+            key = f'k{rng.randint(0, 15)}'
+            roll = rng.random()
+            if roll < 0.5:
+                expected[key] = {'i': i, 'text': 'x' * rng.randint(0, 20)}
+                wal.set(key, expected[key])
+            elif roll < 0.9:
+                if not isinstance(expected.get('L' + key), deque):
+                    expected['L' + key] = deque(maxlen=6)
+                expected['L' + key].extend([i, -i])
+                wal.append('L' + key, [i, -i], maxlen=6)
+            else:
+                wal.delete(key)
+                expected.pop(key, None)
+            if i % 50 == 0:
+                wal.flush()
+        wal.close()
+        self.assertGreater(wal.stats['compactions'], 0)
+
+        expected = {key: list(value) if isinstance(value, deque) else value for key, value in expected.items()}
+        self.assertEqual(MemoryWAL(self.directory, 'state').to_dict(), expected)
+
+    def test_torn_tail_and_stale_log(self):
+        wal = MemoryWAL(self.directory, 'state')
+        wal.set('a', 1)
+        wal.flush()
+        stale_log = open(wal.log_path, 'rb').read()
+        wal.set('a', 2)
+        wal.compact()
+        wal.set('b', [1, 2])
+        wal.close()
+
+        with open(wal.log_path, 'ab') as f:
+            f.write(b'\x01\x40\x00\x00\x00roto')  # Proceso cortado a mitad de registro
+        restored = MemoryWAL(self.directory, 'state')
+        self.assertEqual(restored.to_dict(), {'a': 2, 'b': [1, 2]})
+        self.assertGreater(restored.stats['discarded_bytes'], 0)
+
+        # Corte entre el snapshot nuevo y el log nuevo: el log viejo no se reaplica
+        with open(wal.log_path, 'wb') as f:
+            f.write(stale_log)
+        self.assertEqual(MemoryWAL(self.directory, 'state').to_dict(), {'a': 2})
+
+    def test_saves_write_only_changes(self):
+        wal = MemoryWAL(self.directory, 'state')
+        context = {'market_bias': 'NEUTRAL', 'pools': list(range(500))}
+        self.assertTrue(wal.set('context', context))
+        wal.flush()
+        self.assertFalse(wal.set('context', context))
+        self.assertEqual(wal.pending_bytes, 0)
+
+        context['pools'].append(-1)  # Mutar después de set() no altera lo guardado
+        self.assertEqual(len(wal.get('context')['pools']), 500)
+
+        before = wal.log_bytes
+        wal.append('events', [{'price': 1.1}], maxlen=3)
+        wal.flush()
+        self.assertLess(wal.log_bytes - before, 64)
+
+    def test_single_writer_per_log(self):
+        wal = MemoryWAL(self.directory, 'state')
+        wal.set('a', 1)
+        wal.flush()
+
+        second = MemoryWAL(self.directory, 'state')  # Otro descriptor: no obtiene el bloqueo
+        self.assertTrue(second.read_only)
+        self.assertEqual(second.to_dict(), {'a': 1})
+        second.set('b', 2)
+        self.assertEqual((second.pending_bytes, second.flush()), (0, 0))
+        second.compact()
+        second.close()
+
+        wal.set('c', 3)
+        wal.close()
+        reopened = MemoryWAL(self.directory, 'state')
+        self.assertFalse(reopened.read_only)
+        self.assertEqual(reopened.to_dict(), {'a': 1, 'c': 3})
+        reopened.close()
+
+        # Otro proceso con el log abierto: aquí solo lectura hasta que lo cierre
+        code = ('import sys; sys.path.insert(0, sys.argv[1]); from utils.memory_wal import MemoryWAL; '
+                'wal = MemoryWAL(sys.argv[2], "state"); print(wal.read_only, flush=True); sys.stdin.read()')
+        core_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', '01-CORE')
+        holder = subprocess.Popen([sys.executable, '-c', code, core_dir, self.directory],
+                                  stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+        try:
+            self.assertEqual(holder.stdout.readline().strip(), 'False')
+            self.assertTrue(MemoryWAL(self.directory, 'state').read_only)
+        finally:
+            holder.communicate('')
+        released = MemoryWAL(self.directory, 'state')
+        self.assertFalse(released.read_only)
+        released.close()
+
+    def test_open_wal_shares_instance(self):
+        wal = open_wal(self.directory, 'shared')
+        self.assertIs(open_wal(self.directory, 'shared'), wal)
+        self.assertTrue(wal.is_running)
+        wal.close()
+
+        reopened = open_wal(self.directory, 'shared')
+        self.assertIsNot(reopened, wal)
+        self.assertFalse(reopened.read_only)
+        reopened.close()
+
+
+class TestMemoryPersistence(unittest.TestCase):
+
+    def setUp(self):
+        self.previous_cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)  # cache/memory relativo al directorio de trabajo
+
+    def tearDown(self):
+        os.chdir(self.previous_cwd)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_market_context_incremental_persist_and_restore(self):
+        from core.analysis.market_context_v6 import MarketContextV6
+
+        context = MarketContextV6()
+        for i in range(60):
+            context.update_market_context({'market_bias': 'BULLISH', 'current_price': 1.1 + i * 1e-4,
+                                           'bos_detected': {'index': i}})
+        context.persist_memory_state(wait=True)
+        first_size = context._memory_wal().log_bytes
+
+        context.update_market_context({'bos_detected': {'index': 60}})
+        context.persist_memory_state(wait=True)
+        self.assertLess(context._memory_wal().log_bytes - first_size, 400)  # Solo el evento nuevo + timestamp
+        context._memory_wal().close()
+
+        restored = MarketContextV6()
+        self.assertTrue(restored.restore_memory_state())
+        self.assertEqual(restored.market_bias, 'BULLISH')
+        self.assertEqual([event['data']['index'] for event in restored.bos_events], list(range(11, 61)))
+        self.assertIsInstance(restored.bos_events[-1]['timestamp'], datetime)
+
+    def test_legacy_json_is_migrated(self):
+        from core.analysis.ict_historical_analyzer_v6 import ICTHistoricalAnalyzerV6
+
+        legacy_dir = os.path.join('cache', 'memory', 'historical_analysis')
+        os.makedirs(legacy_dir)
+        with open(os.path.join(legacy_dir, 'historical_analysis_cache.json'), 'w', encoding='utf-8') as f:
+            json.dump({'cache_data': {'poi_performance_BOS_M15_EURUSD': 1.0},
+                       'smart_money_history': {'killzone_performance': {'london': [{'efficiency': 0.8}]},
+                                               'institutional_patterns': []}}, f)
+
+        analyzer = ICTHistoricalAnalyzerV6()
+        self.assertEqual(analyzer.cache['poi_performance_BOS_M15_EURUSD'], 1.0)
+        analyzer.integrate_smart_money_memory({'killzone_analysis': {'london': {'efficiency': 0.9}}})
+        analyzer.export_memory_cache(wait=True)
+        analyzer._memory_wal().close()
+        os.remove(os.path.join(legacy_dir, 'historical_analysis_cache.json'))
+
+        restored = ICTHistoricalAnalyzerV6()
+        self.assertEqual(restored.cache['poi_performance_BOS_M15_EURUSD'], 1.0)
+        london = restored.smart_money_history['killzone_performance']['london']
+        self.assertEqual([entry['efficiency'] for entry in london], [0.8, 0.9])
+
+
+if __name__ == '__main__':
+    unittest.main()
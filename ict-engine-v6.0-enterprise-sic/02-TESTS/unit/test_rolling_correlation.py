@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - ROLLING CORRELATION
+======================================
+
+Valida que la correlación incremental coincide con np.corrcoef sobre la
+ventana (también con huecos de datos y tras el recálculo periódico), que
+los símbolos nuevos amplían la matriz, y que RiskManager usa la correlación
+real y cae a la heurística de divisas sin historial.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from utils.rolling_correlation import RollingCorrelationEngine
+
+_SYMBOLS = ['EURUSD', 'GBPUSD', 'USDJPY', 'XAUUSD']
+
+
+def _closes(bars: int, seed: int = 3) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.001, bars)
+    returns = np.column_stack([common + rng.normal(0, 0.0003, bars),
+                               0.9 * common + rng.normal(0, 0.0005, bars),
+                               -common + rng.normal(0, 0.0004, bars),
+                               rng.normal(0, 0.002, bars)])
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)), columns=_SYMBOLS)
+
+
+class TestRollingCorrelationEngine(unittest.TestCase):
+
+    def test_matches_corrcoef_on_each_window(self):
+        closes = _closes(180)
+        engine = RollingCorrelationEngine(windows=(20, 50))
+        for row in closes.itertuples(index=False):
+            engine.update_bar(dict(zip(_SYMBOLS, row)))
+
+        log_returns = np.diff(np.log(closes.values), axis=0)
+        for window in (20, 50):
+            expected = np.corrcoef(log_returns[-window:].T)
+            symbols, matrix = engine.matrix(window)
+            self.assertEqual(symbols, _SYMBOLS)
+            np.testing.assert_allclose(matrix, expected, atol=1e-9)
+            self.assertAlmostEqual(engine.correlation('EURUSD', 'USDJPY', window), expected[0, 2], places=9)
+
+        seeded = RollingCorrelationEngine(windows=(20, 50))
+        seeded.seed_from_closes(closes)
+        np.testing.assert_allclose(seeded.matrix(50)[1], engine.matrix(50)[1], atol=1e-9)
+
+        self.assertLess(engine.correlation('EURUSD', 'USDJPY', 50), -0.8)
+        self.assertEqual(engine.correlated_symbols('EURUSD', 0.8, 50).keys(), {'GBPUSD', 'USDJPY'})
+        self.assertEqual(engine.max_abs_correlation('EURUSD', ['XAUUSD', 'GBPUSD'], 50)[0], 'GBPUSD')
+
+    def test_missing_prices_use_pairwise_complete_samples(self):
+        closes = _closes(60, seed=11)
+        engine = RollingCorrelationEngine(windows=(40,), min_periods=5)
+        for i, row in enumerate(closes.itertuples(index=False)):
+            prices = dict(zip(_SYMBOLS, row))
+            if i % 4 == 0:
+                del prices['GBPUSD']
+            engine.update_bar(prices)
+
+        returns = closes.apply(np.log).diff()
+        gbp = np.log(closes['GBPUSD'][closes.index % 4 != 0])
+        returns['GBPUSD'] = gbp.diff()  # Return contra el último cierre conocido
+        expected = returns.iloc[-40:].corr()
+        self.assertAlmostEqual(engine.correlation('EURUSD', 'GBPUSD'), expected.loc['EURUSD', 'GBPUSD'], places=9)
+        self.assertAlmostEqual(engine.correlation('EURUSD', 'USDJPY'), expected.loc['EURUSD', 'USDJPY'], places=9)
+
+    def test_new_symbols_and_warmup(self):
+        engine = RollingCorrelationEngine(windows=(10,), min_periods=5)
+        engine.track([f'SYM{i}' for i in range(20)])  # Supera la capacidad inicial
+        self.assertIsNone(engine.correlation('SYM0', 'SYM1'))
+        self.assertIsNone(engine.correlation('SYM0', 'DESCONOCIDO'))
+
+        rng = np.random.default_rng(5)
+        for value in rng.normal(0, 0.01, 12):
+            engine.update_returns({'SYM0': value, 'SYM19': 2 * value + 0.001})
+        self.assertAlmostEqual(engine.correlation('SYM0', 'SYM19'), 1.0, places=9)
+        self.assertEqual(engine.sample_size('SYM0', 'SYM19'), 10)
+        self.assertEqual(engine.snapshot(threshold=0.9)['correlated_pairs'][0]['pair'], ('SYM0', 'SYM19'))
+
+    def test_sync_closes_feeds_only_new_closed_bars(self):
+        closes = _closes(150)
+        closes.index = pd.date_range('2025-08-01', periods=len(closes), freq='h')
+        reference = RollingCorrelationEngine(windows=(20, 50))
+        reference.seed_from_closes(closes)
+
+        engine = RollingCorrelationEngine(windows=(20, 50))
+        self.assertTrue(engine.needs_history(_SYMBOLS))
+        self.assertEqual(engine.sync_closes(closes.iloc[:100]), 51)  # Calentamiento: ventana mayor + 1
+        self.assertFalse(engine.needs_history(_SYMBOLS))
+        self.assertEqual(engine.sync_closes(closes.iloc[90:100]), 0)  # Velas ya procesadas
+        self.assertEqual(engine.sync_closes(closes.iloc[95:150]), 50)  # Sólo la cola nueva
+        self.assertEqual(engine.last_bar_time, closes.index[-1])
+        np.testing.assert_allclose(engine.matrix(50)[1], reference.matrix(50)[1], atol=1e-9)
+
+        # Símbolo nuevo: reinicio y recalentamiento con su histórico
+        closes['USDCHF'] = 1 / closes['EURUSD']
+        self.assertTrue(engine.needs_history(closes.columns))
+        self.assertEqual(engine.sync_closes(closes), 51)
+        self.assertLess(engine.correlation('EURUSD', 'USDCHF'), -0.99)
+        self.assertEqual(engine.sample_size('EURUSD', 'USDCHF', 50), 50)
+
+
+class TestRiskManagerCorrelation(unittest.TestCase):
+
+    def test_rolling_correlation_replaces_currency_heuristic(self):
+        from core.risk_management.risk_manager import RiskManager
+
+        engine = RollingCorrelationEngine(windows=(50,))
+        manager = RiskManager(correlation_engine=engine)
+        # Sin historial: heurística de divisa compartida
+        self.assertTrue(manager._symbols_are_correlated('EURUSD', 'EURJPY'))
+        self.assertEqual(manager.calculate_correlation_risk([{'symbol': 'EURUSD'}], 'EURJPY'), 0.3)
+
+        for row in _closes(120).itertuples(index=False):
+            manager.update_market_prices(dict(zip(_SYMBOLS, row)))
+        self.assertTrue(manager._symbols_are_correlated('EURUSD', 'USDJPY'))
+        self.assertFalse(manager._symbols_are_correlated('EURUSD', 'XAUUSD'))  # Comparten USD, pero no correlacionan
+
+        risk = manager.calculate_correlation_risk([{'symbol': 'GBPUSD'}, {'symbol': 'XAUUSD'}], 'EURUSD')
+        rho = engine.correlation('EURUSD', 'GBPUSD')
+        self.assertAlmostEqual(risk, 0.3 * abs(rho))
+        self.assertEqual(set(manager.position_correlations), {'GBPUSD', 'XAUUSD'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - SESSION CALENDAR
+===================================
+
+Valida el calendario vectorizado de sesiones: etiquetas por vela, cambio
+de horario (DST), zonas de origen, solapamiento London/NY y cache por frame.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from core.analysis.session_calendar import SessionCalendar, get_session_calendar
+
+
+class _HostClock(datetime):
+    """Reloj de un host en UTC+3: 14:30 UTC (10:30 NY, Silver Bullet) son las 17:30 locales"""
+
+    @classmethod
+    def now(cls, tz=None):
+        utc_now = datetime(2025, 8, 12, 14, 30, tzinfo=timezone.utc)
+        if tz is None:
+            return (utc_now + timedelta(hours=3)).replace(tzinfo=None)
+        return utc_now.astimezone(tz)
+
+
+class TestSessionCalendar(unittest.TestCase):
+
+    def setUp(self):
+        self.calendar = SessionCalendar()
+
+    def test_summer_day_labels(self):
+        index = pd.date_range('2025-07-14 00:00', periods=24, freq='1h')
+        labels = self.calendar.annotate(index)
+
+        self.assertEqual(labels['session'].iat[7], 'LONDON')
+        self.assertEqual(labels['killzone'].iat[7], 'LONDON_KILLZONE')
+        self.assertEqual(labels['killzone'].iat[12], 'NEWYORK_KILLZONE')
+        self.assertEqual(labels['overlap'].iat[13], 'LONDON_NY')
+        self.assertEqual(labels['session'].iat[17], 'NEW_YORK')
+        self.assertEqual(labels['session'].iat[22], 'ASIA')
+        self.assertEqual(labels['killzone'].iat[1], 'ASIAN_KILLZONE')
+        self.assertTrue(labels['silver_bullet'].iat[14])      # 10:00 hora NY
+        self.assertEqual(str(labels['session'].dtype), 'category')
+
+    def test_london_open_shifts_with_dst(self):
+        winter = self.calendar.label_timestamp(pd.Timestamp('2025-01-14 07:30'))
+        summer = self.calendar.label_timestamp(pd.Timestamp('2025-07-14 07:30'))
+        self.assertEqual(winter['killzone'], 'NONE')
+        self.assertEqual(summer['killzone'], 'LONDON_KILLZONE')
+        self.assertEqual(self.calendar.label_timestamp(pd.Timestamp('2025-01-14 08:30'))['killzone'],
+                         'LONDON_KILLZONE')
+
+    def test_naive_broker_time_and_aware_timestamps(self):
+        broker = SessionCalendar(source_timezone='EET')
+        self.assertEqual(broker.label_timestamp(pd.Timestamp('2025-07-14 10:00'))['killzone'],
+                         'LONDON_KILLZONE')  # 07:00 UTC
+        aware = pd.Timestamp('2025-07-14 14:00', tz='Europe/Madrid')  # 12:00 UTC
+        self.assertEqual(self.calendar.label_timestamp(aware)['killzone'], 'NEWYORK_KILLZONE')
+
+    def test_annotation_is_cached_per_frame(self):
+        frame = pd.DataFrame({'close': range(96)},
+                             index=pd.date_range('2025-08-04', periods=96, freq='15min'))
+        first = self.calendar.annotate(frame)
+        self.assertIs(self.calendar.annotate(frame), first)
+        self.assertEqual(self.calendar.stats['cache_hits'], 1)
+        self.assertEqual(self.calendar.label_at(frame, 40)['session'], 'LONDON')  # 10:00 UTC
+        self.assertEqual(len(first), len(frame))
+
+    def test_cache_keyed_on_index_contents(self):
+        index = pd.date_range('2025-08-04', periods=96, freq='15min')
+        first = self.calendar.annotate(pd.DataFrame({'close': range(96)}, index=index))
+        # Un frame nuevo con las mismas velas (siguiente ciclo) reutiliza la anotación
+        self.assertIs(self.calendar.annotate(pd.DataFrame({'close': range(96)}, index=index.copy())), first)
+
+        shifted = self.calendar.annotate(pd.DataFrame({'close': range(96)}, index=index + pd.Timedelta(hours=1)))
+        self.assertIsNot(shifted, first)
+        self.assertEqual(self.calendar.stats['annotations'], 2)
+
+    def test_broker_source_timezone(self):
+        from core.analysis import session_calendar as module
+
+        detector = mock.Mock(timezone_info={'broker_timezone': 'UTC+2 (Europe/MT5)'})
+        with mock.patch.object(module, 'MARKET_STATUS_DETECTOR_AVAILABLE', True), \
+                mock.patch.object(module, 'MarketStatusDetector', return_value=detector, create=True):
+            broker = SessionCalendar(source_timezone='broker')
+
+        self.assertEqual(broker.source_timezone, 'EET')
+        # 10:00 hora del servidor MT5 en verano = 07:00 UTC
+        self.assertEqual(broker.label_timestamp(pd.Timestamp('2025-07-14 10:00'))['killzone'], 'LONDON_KILLZONE')
+        self.assertIs(get_session_calendar('broker'), get_session_calendar('broker'))
+        self.assertIsNot(get_session_calendar('broker'), get_session_calendar())
+
+
+class TestPatternDetectorSilverBulletClock(unittest.TestCase):
+
+    def test_window_uses_utc_not_host_local_time(self):
+        from core.analysis import pattern_detector as module
+
+        detector = module.PatternDetector.__new__(module.PatternDetector)
+        detector._session_calendar = get_session_calendar()
+        seen = []
+        detector._is_silver_bullet_time = lambda now: seen.append(now) or False
+
+        with mock.patch.object(module, 'datetime', _HostClock):
+            detector._detect_silver_bullet(pd.DataFrame(), 'EURUSD', 'M5')
+
+        self.assertEqual(seen, [datetime(2025, 8, 12, 14, 30, tzinfo=timezone.utc)])
+        self.assertTrue(module.PatternDetector._is_silver_bullet_time(detector, seen[0]))
+
+if __name__ == '__main__':
+    unittest.main()
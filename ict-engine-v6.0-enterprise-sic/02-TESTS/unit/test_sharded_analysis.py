@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - SHARDED ANALYSIS
+===================================
+
+Valida las velas en memoria compartida (ida y vuelta, reescritura en el
+mismo bloque, realocación al crecer), que el escaneo en procesos worker da
+lo mismo que en el proceso actual y que el motor de estructura directo, y
+que los shards sólo devuelven registros compactos.
+"""
+
+import os
+import pickle
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from core.analysis.incremental_market_structure import IncrementalMarketStructureEngine
+from core.analysis.sharded_analysis import ShardedAnalysisPool, register_analysis_task
+from core.data_management.shared_candles import SharedCandleStore, attach_frame, detach_all
+
+
+def make_candles(seed, rows, freq='15min'):
+    rng = np.random.default_rng(seed)
+    close = 1.10 + np.cumsum(rng.normal(0, 5e-4, rows))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({'open': open_,
+                         'high': np.maximum(open_, close) + rng.random(rows) * 3e-4,
+                         'low': np.minimum(open_, close) - rng.random(rows) * 3e-4,
+                         'close': close,
+                         'tick_volume': rng.integers(1, 500, rows).astype(float)},
+                        index=pd.date_range('2025-08-01', periods=rows, freq=freq))
+
+
+def _failing_task(frame, params):
+    raise RuntimeError('sin datos')
+
+
+class TestSharedCandles(unittest.TestCase):
+
+    def tearDown(self):
+        detach_all()
+
+    def test_roundtrip_and_in_place_rewrite(self):
+        candles = make_candles(1, 400)
+        with SharedCandleStore() as store:
+            handle = store.put('EURUSD', 'M15', candles)
+            frame = attach_frame(handle)
+            pd.testing.assert_frame_equal(frame.to_dataframe(), candles, check_names=False,
+                                          check_freq=False, check_index_type=False)
+            self.assertFalse(frame['close'].flags.writeable)
+            del frame  # Las vistas vivas impiden cerrar el bloque
+
+            # Una vela más cabe en la capacidad reservada: mismo bloque, nueva versión
+            grown = store.put('EURUSD', 'M15', make_candles(1, 401))
+            self.assertEqual((grown.shm_name, grown.version, grown.rows), (handle.shm_name, 1, 401))
+
+            # Más allá de la capacidad se realoca
+            bigger = store.put('EURUSD', 'M15', make_candles(1, 2000))
+            self.assertNotEqual(bigger.shm_name, handle.shm_name)
+            self.assertEqual(store.stats['allocations'], 2)
+            self.assertEqual(len(attach_frame(bigger)), 2000)
+        self.assertEqual(store.nbytes, 0)
+
+
+class TestShardedAnalysisPool(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.frames = {f'SYM{i}': {'M15': make_candles(i, 1500), 'H1': make_candles(50 + i, 800, 'h')}
+                      for i in range(3)}
+
+    def test_workers_match_inline_and_direct_engine(self):
+        with ShardedAnalysisPool(workers=0) as inline:
+            expected = inline.scan(self.frames)
+        with ShardedAnalysisPool(workers=2) as pool:
+            scan = pool.scan(self.frames)
+            self.assertEqual(pool.scan(self.frames)['results'], scan['results'])  # Bloques reutilizados
+
+        self.assertEqual(scan['errors'], [])
+        self.assertEqual(scan['shards'], 6)
+        self.assertEqual(scan['results'], expected['results'])
+
+        engine = IncrementalMarketStructureEngine(window=5)
+        for symbol, timeframe in (('SYM1', 'H1'), ('SYM2', 'M15')):
+            engine.replay(symbol, timeframe, self.frames[symbol][timeframe])
+            structure = dict(scan['results'][symbol][timeframe]['structure'])
+            structure.pop('events')
+            structure.pop('recent_events')
+            self.assertEqual(structure, engine.get_structure(symbol, timeframe))
+
+    def test_structure_keeps_all_swings_of_the_frame(self):
+        frame = make_candles(9, 4000)
+        with ShardedAnalysisPool(workers=0) as pool:
+            structure = pool.scan({'EURUSD': {'M15': frame}}, tasks=('structure',))['results']['EURUSD']['M15']['structure']
+
+        engine = IncrementalMarketStructureEngine(window=5)
+        engine.replay('EURUSD', 'M15', frame)
+        self.assertGreater(structure['swing_highs'], engine.max_swings)  # Más que el cap por defecto (200)
+        self.assertEqual((structure['swing_highs'], structure['swing_lows']),
+                         tuple(map(len, engine.get_swings('EURUSD', 'M15'))))
+
+    def test_results_are_compact_records(self):
+        with ShardedAnalysisPool(workers=0) as pool:
+            scan = pool.scan(self.frames, params={'max_records': 3})
+        shard = scan['results']['SYM0']['M15']
+        self.assertEqual(set(shard), {'structure', 'fvg', 'liquidity'})
+        self.assertLessEqual(len(shard['fvg']['recent_unfilled']), 3)
+        self.assertNotIn('indices', shard['liquidity']['recent_highs'][0])
+        self.assertLess(len(pickle.dumps(scan['results'])), 64 * 1024)
+
+    def test_task_errors_and_unknown_tasks(self):
+        register_analysis_task('failing', _failing_task)
+        with ShardedAnalysisPool(workers=0) as pool:
+            scan = pool.scan({'EURUSD': {'M15': make_candles(3, 100)}}, tasks=('fvg', 'failing'))
+            self.assertIn('fvg', scan['results']['EURUSD']['M15'])
+            self.assertEqual(scan['errors'], [{'symbol': 'EURUSD', 'timeframe': 'M15', 'task': 'failing',
+                                               'error': 'RuntimeError: sin datos'}])
+            with self.assertRaises(ValueError):
+                pool.scan(self.frames, tasks=('structure', 'inexistente'))
+
+
+if __name__ == '__main__':
+    unittest.main()
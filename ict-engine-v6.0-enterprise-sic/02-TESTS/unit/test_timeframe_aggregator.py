@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST UNITARIO - TIMEFRAME AGGREGATOR
+=======================================
+
+Valida las temporalidades derivadas de una serie M1: agregación contra
+pandas.resample, cortes en hora del broker, actualización incremental
+equivalente al cálculo completo y modo verificación contra el broker.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..', '01-CORE'))
+
+from core.data_management.timeframe_aggregator import (
+    IncrementalTimeframeBuilder,
+    aggregate_ohlcv,
+    can_derive,
+    compare_with_broker,
+)
+
+RESAMPLE_RULES = {'M5': '5min', 'M15': '15min', 'H1': '1h', 'H4': '4h', 'D1': '1D'}
+
+
+def _m1_series(periods: int = 45000, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2025-03-03 09:17', periods=periods, freq='1min', name='time')
+    index = index[index.dayofweek < 5]
+    close = 1.10 + np.cumsum(rng.normal(0, 1e-4, len(index)))
+    open_ = np.concatenate(([close[0]], close[:-1]))
+    frame = pd.DataFrame({
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.random(len(index)) * 1e-4,
+        'low': np.minimum(open_, close) - rng.random(len(index)) * 1e-4,
+        'close': close,
+        'tick_volume': rng.integers(1, 100, len(index)),
+    }, index=index)
+    return frame.drop(frame.index[rng.random(len(index)) < 0.02])  # Minutos sin ticks
+
+
+class TestTimeframeAggregator(unittest.TestCase):
+
+    def setUp(self):
+        self.m1 = _m1_series()
+
+    def test_matches_pandas_resample(self):
+        for timeframe, rule in RESAMPLE_RULES.items():
+            derived = aggregate_ohlcv(self.m1, timeframe)
+            expected = self.m1.resample(rule).agg({'open': 'first', 'high': 'max', 'low': 'min',
+                                                   'close': 'last', 'tick_volume': 'sum'}).dropna()
+            self.assertTrue(derived.index.equals(expected.index), timeframe)
+            np.testing.assert_allclose(derived.to_numpy(dtype=float), expected[derived.columns].to_numpy(dtype=float))
+
+        self.assertTrue(can_derive('H4', 'M5'))
+        self.assertFalse(can_derive('M1', 'M5'))
+
+    def test_broker_timezone_day_boundaries(self):
+        daily = aggregate_ohlcv(self.m1, 'D1', broker_timezone='EET')
+        # Medianoche EET = 22:00 UTC en invierno, 21:00 UTC tras el cambio de horario
+        self.assertEqual(daily.index[1], pd.Timestamp('2025-03-03 22:00'))
+        self.assertIn(pd.Timestamp('2025-03-31 21:00'), daily.index)
+
+        complete = aggregate_ohlcv(self.m1, 'H1', complete_only=True)
+        self.assertEqual(complete.index[0], pd.Timestamp('2025-03-03 10:00'))
+
+    def test_incremental_updates_equal_full_aggregation(self):
+        timeframes = ['M1', 'M15', 'H1', 'H4', 'D1']
+        builder = IncrementalTimeframeBuilder(timeframes, max_bars=100000)
+        position = 0
+        for step in (500, 1, 59, 61, 240, 1439, 3000):
+            builder.update(self.m1.iloc[max(0, position - 3):position + step])  # Solapes ignorados
+            position += step
+        builder.update(self.m1.iloc[position:-1], forming=self.m1.iloc[-1:])
+
+        for timeframe in timeframes:
+            derived = builder.frame(timeframe, include_forming=True)
+            expected = aggregate_ohlcv(self.m1, timeframe)
+            self.assertTrue(derived.index.equals(expected.index), timeframe)
+            np.testing.assert_allclose(derived.to_numpy(dtype=float), expected[derived.columns].to_numpy(dtype=float))
+
+        # La última H1 sigue abierta: sólo aparece con include_forming
+        hourly = aggregate_ohlcv(self.m1, 'H1')
+        self.assertEqual(builder.frame('H1').index[-1], hourly.index[-2])
+        self.assertEqual(builder.get_status()['forming']['H1'], True)
+
+    def test_verification_mode(self):
+        builder = IncrementalTimeframeBuilder(['H1'])
+        builder.update(self.m1)
+        broker = aggregate_ohlcv(self.m1, 'H1', complete_only=True)
+
+        report = builder.verify('H1', broker)
+        self.assertTrue(report['ok'])
+        self.assertEqual(report['bars_compared'], len(broker))
+
+        broker.iloc[5, broker.columns.get_loc('high')] += 0.0010
+        broker = broker.drop(broker.index[9])
+        report = compare_with_broker(builder.frame('H1').iloc[1:], broker)
+        self.assertFalse(report['ok'])
+        self.assertEqual(report['field_mismatches']['high'], 1)
+        self.assertEqual(report['extra_in_derived'], 1)
+        self.assertEqual(report['examples'][0]['time'], str(broker.index[5]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -32,6 +32,43 @@ CORE_PATH = PROJECT_ROOT / "01-CORE"
 sys.path.insert(0, str(PROJECT_ROOT))
 sys.path.insert(0, str(CORE_PATH))
 
+# Perfil de arranque: marcas de fase + cargas diferidas (--profile-startup)
+try:
+    from utils.lazy_loading import get_startup_profiler, is_module_available
+    STARTUP = get_startup_profiler()
+except ImportError:
+    STARTUP = None
+    is_module_available = None
+PROFILE_STARTUP = '--profile-startup' in sys.argv
+
+# Presupuesto de memoria (config/memory_config.json): vigilancia en segundo plano
+try:
+    from utils.memory_budget import get_memory_budget
+except ImportError:
+    get_memory_budget = None
+
+
+def mark_startup(phase: str):
+    """Registrar una fase del arranque si el profiler está disponible"""
+    if STARTUP is not None:
+        STARTUP.mark(phase)
+
+
+def start_killzone_prefetch():
+    """
+    Arrancar el prefetch de killzones compartido del proceso.
+    Los analizadores registran sus símbolos/timeframes al pedir frames; el
+    loop los refresca antes de cada apertura del calendario de sesiones.
+    """
+    try:
+        from core.data_management.killzone_prefetcher import get_killzone_prefetcher
+    except ImportError as e:
+        print(f"⚠️ Killzone prefetch no disponible: {e}")
+        return None
+    prefetcher = get_killzone_prefetcher()
+    prefetcher.start()
+    return prefetcher
+
 print("🚀 ICT ENGINE MASTER LAUNCHER v1.0")
 print("=" * 80)
 print("🎯 INICIANDO SISTEMA COMPLETO INTEGRADO...")
@@ -46,6 +83,16 @@ def main():
     print(f"� Core Path: {CORE_PATH}")
     print(f"�🕐 Timestamp: {datetime.now().isoformat()}")
     
+    if get_memory_budget is not None:
+        budget = get_memory_budget()
+        budget.start()
+        print(f"🧮 Memory budget: {budget.limit_bytes / 1024**3:.1f} GB (limpieza al {budget.cleanup_percent:.0f}%)")
+    
+    prefetcher = start_killzone_prefetch()
+    if prefetcher is not None:
+        killzone, open_dt = prefetcher.next_killzone_open()
+        print(f"🔮 Killzone prefetch activo (próxima apertura: {killzone} {open_dt:%H:%M} UTC)")
+    
     try:
         # 1. MÓDULO CORE - Pattern Detector Principal
         print(f"\n🔧 CARGANDO MÓDULO CORE...")
@@ -54,15 +101,20 @@ def main():
         core_pattern_detector = CORE_PATH / "core" / "ict_engine" / "pattern_detector.py"
         if core_pattern_detector.exists():
             print(f"✅ Core Pattern Detector encontrado: {core_pattern_detector}")
-            try:
-                from core.ict_engine.pattern_detector import ICTPatternDetector  # type: ignore
-                print(f"✅ ICTPatternDetector cargado exitosamente")
-            except ImportError as e:
-                print(f"⚠️ Error importando ICTPatternDetector: {e}")
-                print(f"🔄 Continuando con fallback mode...")
+            # Solo comprobar disponibilidad: el import real ocurre en el primer uso
+            if is_module_available and is_module_available('core.ict_engine.pattern_detector'):
+                print(f"✅ ICTPatternDetector disponible (carga diferida)")
+            else:
+                try:
+                    from core.ict_engine.pattern_detector import ICTPatternDetector  # type: ignore
+                    print(f"✅ ICTPatternDetector cargado exitosamente")
+                except ImportError as e:
+                    print(f"⚠️ Error importando ICTPatternDetector: {e}")
+                    print(f"🔄 Continuando con fallback mode...")
         else:
             print(f"⚠️ Core Pattern Detector no encontrado en: {core_pattern_detector}")
             print(f"🔄 Continuando sin módulo core...")
+        mark_startup('core verificado')
         
         # 2. MÓDULO MODULAR - FVG + Order Blocks Paralelo
         print(f"\n🔧 CARGANDO MÓDULO MODULAR FVG + ORDER BLOCKS...")
@@ -97,6 +149,7 @@ def main():
                 
         else:
             print(f"⚠️ Test modular no encontrado en: {test_modular_path}")
+        mark_startup('test modular')
         
         # 3. DASHBOARD PRINCIPAL - Sistema Unificado
         print(f"\n🔧 CARGANDO DASHBOARD PRINCIPAL...")
@@ -112,6 +165,7 @@ def main():
             
             if response in ['y', 'yes', 'si', 's', '']:
                 print(f"🚀 EJECUTANDO DASHBOARD ENTERPRISE...")
+                mark_startup('dashboard solicitado')
                 
                 # Import del dashboard
                 import importlib.util
@@ -158,6 +212,10 @@ def main():
         
         print(f"\n🏆 ICT ENGINE v6.0 ENTERPRISE - SISTEMA COMPLETAMENTE OPERATIVO")
         
+        mark_startup('sistema listo')
+        if PROFILE_STARTUP and STARTUP is not None:
+            print(f"\n{STARTUP.format_report()}")
+        
         return True
         
     except Exception as e:
@@ -184,6 +242,7 @@ def show_quick_start():
     print(f"2️⃣ El sistema cargará automáticamente todos los componentes")
     print(f"3️⃣ Test modular FVG + Order Blocks se ejecutará automáticamente")
     print(f"4️⃣ Opcionalmente ejecutar Dashboard Enterprise")
+    print(f"⏱️ Añadir --profile-startup para ver el tiempo de cada fase del arranque")
     print(f"5️⃣ Sistema quedará ready para uso en producción")
 
 if __name__ == "__main__":
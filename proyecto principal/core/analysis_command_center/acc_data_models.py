@@ -52,6 +52,7 @@ class AnalysisInput:
     confidence_threshold: float = 0.7
     poi_limit: int = 20
     enable_tct_measurement: bool = True
+    open_symbols: Optional[List[str]] = None  # Símbolos con posición abierta (None: se leen de MT5 al adquirir datos)
 
     # 🎛️ CONFIGURACIÓN AVANZADA
     use_cache: bool = True
@@ -10,11 +10,22 @@ from sistema.sic import time
 import uuid
 from sistema.sic import Dict, List, Optional, Any
 from sistema.sic import datetime
+from sistema.sic import Path
 import pandas as pd
 # 🔌 IMPORTS DEL ICT ENGINE
 from sistema.sic import enviar_senal_log
 from utils.mt5_data_manager import MT5DataManager
 from sistema.sic import get_trading_config
+from sistema.latency_histogram import get_tct_latency_registry
+from sistema.hot_path_profiler import get_hot_path_profiler, profile_hot_path
+from sistema.lazy_loading import component_status, lazy_component
+from sistema.memory_budget import BoundedHistory, estimate_size, get_memory_budget
+from sistema.timeframe_aggregator import (
+    IncrementalTimeframeBuilder,
+    TIMEFRAME_MINUTES,
+    can_derive,
+    select_base_timeframe
+)
 
 # 🧠 ESPECIALISTAS DE ANÁLISIS
 from sistema.sic import (
@@ -47,6 +58,21 @@ from .acc_data_models import (
 )
 from .tct_pipeline import TCTInterface
 
+
+def _summarize_analysis_output(analysis: AnalysisOutput) -> Dict[str, Any]:
+    """📚 Resumen compacto de un análisis que sale del historial en memoria"""
+    return {
+        "analysis_id": analysis.analysis_id,
+        "symbol": analysis.input_parameters.symbol,
+        "status": analysis.analysis_status.value,
+        "completed": analysis.completion_timestamp,
+        "success_rate": analysis.overall_success_rate,
+        "execution_time_ms": analysis.total_execution_time_ms,
+        "quality_score": analysis.analysis_quality_score,
+        "errors": len(analysis.errors_encountered),
+    }
+
+
 class AnalysisOrchestrator:
     """
     🎯 Centro de Mando de Análisis - Orquestador Principal
@@ -60,6 +86,10 @@ class AnalysisOrchestrator:
     - Manejar errores y timeouts de forma robusta
     """
 
+    ANALYSIS_HISTORY_SIZE = 200  # Análisis completos retenidos en memoria
+    MAX_BASE_BARS = 200000  # Velas M1/M5 de la serie base (como descargar_y_guardar_m1)
+    BASE_TAIL_MARGIN = 10  # Velas base extra por ciclo tras la carga inicial (vela en formación, desfase de reloj)
+
     def __init__(self,
                  enable_cache: bool = True,
                  max_concurrent_analyses: int = 3,
@@ -81,10 +111,20 @@ class AnalysisOrchestrator:
         # 📊 ESTADO Y CONTROL
         self.is_initialized = False
         self.active_analyses = {}  # analysis_id -> AnalysisOutput
-        self.analysis_history = []  # Historial de análisis completados
+        # Historial acotado: los análisis que salen del anillo quedan resumidos en disco
+        self.analysis_history = BoundedHistory(
+            self.ANALYSIS_HISTORY_SIZE,
+            name='acc.analysis_history',
+            summarize=_summarize_analysis_output,
+            spill_path=str(Path(__file__).parent.parent.parent / "data" / "memory" / "acc_analysis_history.jsonl")
+        )
+        self._history_totals = {'count': 0, 'success_rate': 0.0, 'execution_time_ms': 0.0}
         self.component_stats = {}  # Estadísticas de performance por componente
         self._component_execution_times = {}  # Tiempos de ejecución por componente
         self._component_success_rates = {}  # Tasas de éxito por componente
+        self.latency_registry = get_tct_latency_registry()  # Histogramas p50/p90/p99 por etapa (TCT)
+        self._timeframe_builders = {}  # (symbol, base_tf) -> IncrementalTimeframeBuilder
+        self._base_fetched_at = {}  # (symbol, base_tf) -> epoch de la última lectura de la serie base
 
         # 🎖️ INICIALIZAR ESPECIALISTAS
         self._initialize_specialists()
@@ -92,6 +132,7 @@ class AnalysisOrchestrator:
         # 💾 CACHE Y PERFORMANCE
         self.results_cache = {} if enable_cache else None
         self.performance_baseline = None
+        get_memory_budget().register('acc_orchestrator', self, priority=50)
 
         # 🧵 CONTROL DE CONCURRENCIA
         self._analysis_lock = threading.Lock()
@@ -116,29 +157,16 @@ class AnalysisOrchestrator:
         )
 
     def _initialize_specialists(self):
-        """🎖️ Inicializar todos los especialistas de análisis"""
+        """
+        🎖️ Registrar los especialistas de análisis
 
-        try:
-            # 📊 DATA MANAGER
-            self.data_manager = MT5DataManager()
-
-            # 🧠 ICT ENGINE COMPONENTS
-            self.ict_analysis = OptimizedICTAnalysis()
-            self.confidence_engine = ConfidenceEngine()
-            self.pattern_analyzer = ICTPatternAnalyzer()
-            self.veredicto_engine = VeredictoEngine()
-
-            # 🎯 POI SYSTEM - PROTOCOLO SYNAPSE 3.1
-            self.poi_detector = POIDetector()  # 🎯 NUEVO ESPECIALISTA INTEGRADO
-            self.poi_scoring_engine = POIScoringEngine()
-
-            # ⏱️ TCT PIPELINE
-            self.tct_interface = TCTInterface(
-                measurement_interval=1.0,
-                aggregation_interval=60.0,
-                enable_exports=True
-            )
+        La construcción es diferida (@lazy_component): cada especialista se crea
+        en su primer uso dentro del ciclo, así el orquestador está disponible
+        al instante y no conecta MT5 ni arranca el TCT hasta que hace falta.
+        Un error de construcción se propaga en ese primer uso.
+        """
 
+        try:
             # ⚙️ CONFIGURACIÓN
             self.trading_config = get_trading_config()
 
@@ -147,7 +175,7 @@ class AnalysisOrchestrator:
             # 📝 LOG ÉXITO
             enviar_senal_log(
                 'DEBUG',
-                "ACC Todos los especialistas inicializados correctamente",
+                f"ACC Especialistas registrados (construcción diferida): {list(component_status(self))}",
                 'acc_orchestrator',
                 'acc'
             )
@@ -162,6 +190,47 @@ class AnalysisOrchestrator:
             self.is_initialized = False
             raise
 
+    # 📊 DATA MANAGER
+    @lazy_component
+    def data_manager(self):
+        return MT5DataManager()
+
+    # 🧠 ICT ENGINE COMPONENTS
+    @lazy_component
+    def ict_analysis(self):
+        return OptimizedICTAnalysis()
+
+    @lazy_component
+    def confidence_engine(self):
+        return ConfidenceEngine()
+
+    @lazy_component
+    def pattern_analyzer(self):
+        return ICTPatternAnalyzer()
+
+    @lazy_component
+    def veredicto_engine(self):
+        return VeredictoEngine()
+
+    # 🎯 POI SYSTEM - PROTOCOLO SYNAPSE 3.1
+    @lazy_component
+    def poi_detector(self):
+        return POIDetector()  # 🎯 NUEVO ESPECIALISTA INTEGRADO
+
+    @lazy_component
+    def poi_scoring_engine(self):
+        return POIScoringEngine()
+
+    # ⏱️ TCT PIPELINE
+    @lazy_component
+    def tct_interface(self):
+        return TCTInterface(
+            measurement_interval=1.0,
+            aggregation_interval=60.0,
+            enable_exports=True
+        )
+
+    @profile_hot_path(name='acc.run_full_analysis_cycle')
     def run_full_analysis_cycle(self,
                               symbol: str,
                               timeframes: List[str],
@@ -279,8 +348,11 @@ class AnalysisOrchestrator:
                 if analysis_input.analysis_id in self.active_analyses:
                     del self.active_analyses[analysis_input.analysis_id]
 
-            # 📚 AÑADIR AL HISTORIAL
+            # 📚 AÑADIR AL HISTORIAL (totales acumulados para promedios de toda la sesión)
             self.analysis_history.append(analysis_output)
+            self._history_totals['count'] += 1
+            self._history_totals['success_rate'] += analysis_output.overall_success_rate
+            self._history_totals['execution_time_ms'] += analysis_output.total_execution_time_ms
 
             # 📊 ACTUALIZAR ESTADÍSTICAS
             self._update_component_stats(analysis_output)
@@ -338,9 +410,13 @@ class AnalysisOrchestrator:
         return {
             "acc_status": "OPERATIONAL" if self.is_initialized else "ERROR",
             "active_analyses": len(self.active_analyses),
-            "total_completed": len(self.analysis_history),
+            "total_completed": self._history_totals['count'],
             "avg_success_rate": self._calculate_avg_success_rate(),
             "avg_execution_time": self._calculate_avg_execution_time(),
+            "stage_latency": self.latency_registry.summary(by=('stage',)),
+            "hot_path_profile": get_hot_path_profiler().dashboard_snapshot(top=5),
+            "specialists": component_status(self),  # 'built' / 'lazy'
+            "history": self.analysis_history.stats(),
             "component_health": self._get_component_health_summary()
         }
 
@@ -367,6 +443,7 @@ class AnalysisOrchestrator:
             )
             return str(uuid.uuid4())  # Fallback ID
 
+    @profile_hot_path(name='acc.data_acquisition')
     def _execute_data_acquisition(self,
                                 analysis_input: AnalysisInput,
                                 analysis_output: AnalysisOutput) -> Dict[str, Any]:
@@ -377,21 +454,41 @@ class AnalysisOrchestrator:
         try:
             # 📈 OBTENER DATOS MULTI-TIMEFRAME
             data_payload = {}
+            lookback_periods = analysis_input.lookback_periods or {}
+
+            # 🧱 Una serie base (M1/M5); el resto de timeframes se agrega desde ella
+            base_timeframe = select_base_timeframe(analysis_input.timeframes)
+            derivable = [tf for tf in analysis_input.timeframes if can_derive(tf, base_timeframe)]
+            builder = self._update_base_series(analysis_input.symbol, base_timeframe,
+                                               derivable, lookback_periods) if derivable else None
 
             for timeframe in analysis_input.timeframes:
-                # 🔄 OBTENER DATOS POR TIMEFRAME
-                lookback_periods = analysis_input.lookback_periods or {}
-                df_data = self.data_manager.get_historical_data(
-                    symbol=analysis_input.symbol,
-                    timeframe=timeframe,
-                    lookback=lookback_periods.get(timeframe, 500)
-                )
+                lookback = lookback_periods.get(timeframe, 500)
+                df_data = None
+                if builder is not None and timeframe in derivable:
+                    df_data = builder.frame(timeframe, include_forming=True).tail(lookback)
+
+                if df_data is None or len(df_data) < lookback:
+                    # 🔄 Sin serie base o historia insuficiente: datos directos del timeframe
+                    df_data = self.data_manager.get_historical_data(
+                        symbol=analysis_input.symbol,
+                        timeframe=timeframe,
+                        lookback=lookback
+                    )
 
                 if df_data is not None and not df_data.empty:
                     data_payload[timeframe] = df_data
                 else:
                     analysis_output.warnings_generated.append(f"No data for {timeframe}")
 
+            # 🔗 Posiciones abiertas y velas cerradas para el motor de correlación compartido
+            if analysis_input.open_symbols is None:
+                analysis_input.open_symbols = self.data_manager.get_open_position_symbols()
+            try:
+                self.data_manager.feed_correlation_engine([analysis_input.symbol] + analysis_input.open_symbols)
+            except Exception as e:
+                analysis_output.warnings_generated.append(f"Correlation feed failed: {e}")
+
             execution_time = (time.time() - start_time) * 1000
 
             # 📊 REGISTRAR RESULTADO
@@ -400,7 +497,8 @@ class AnalysisOrchestrator:
                 component_name="MT5DataManager",
                 success=len(data_payload) > 0,
                 execution_time_ms=execution_time,
-                data={"timeframes_loaded": list(data_payload.keys())},
+                data={"timeframes_loaded": list(data_payload.keys()),
+                      "base_timeframe": base_timeframe if builder is not None else None},
                 items_processed=len(data_payload)
             )
 
@@ -422,6 +520,57 @@ class AnalysisOrchestrator:
             analysis_output.component_results.append(component_result)
             raise
 
+    def _update_base_series(self,
+                            symbol: str,
+                            base_timeframe: str,
+                            derivable: List[str],
+                            lookback_periods: Dict[str, int]) -> Optional[IncrementalTimeframeBuilder]:
+        """
+        🧱 Cargar la serie base y agregar sólo las velas cerradas desde el ciclo anterior
+
+        La primera vez se lee la historia necesaria para el lookback de cada
+        timeframe; después sólo las velas base transcurridas desde la lectura
+        anterior más BASE_TAIL_MARGIN. Si el tramo no enlaza con la última
+        vela procesada (hueco), se reconstruye desde la historia completa.
+        """
+
+        key = (symbol, base_timeframe)
+        builder = self._timeframe_builders.get(key)
+        base_minutes = TIMEFRAME_MINUTES[base_timeframe]
+        targets = sorted(set(derivable) | {base_timeframe} | set(builder.timeframes if builder else ()),
+                         key=TIMEFRAME_MINUTES.get)
+        max_bars = {tf: lookback_periods.get(tf, 500) for tf in targets}
+        base_bars = min(self.MAX_BASE_BARS, max(
+            max_bars[tf] * TIMEFRAME_MINUTES[tf] // base_minutes for tf in targets))
+        max_bars[base_timeframe] = max(max_bars[base_timeframe], base_bars)
+
+        fetched_at = self._base_fetched_at.get(key)
+        if builder is None or targets != builder.timeframes:
+            builder = IncrementalTimeframeBuilder(targets, base_timeframe, max_bars=max_bars)
+        if builder.last_base_time is None or fetched_at is None:
+            bars = base_bars
+        else:
+            elapsed_bars = int(max(0.0, datetime.now().timestamp() - fetched_at) // (base_minutes * 60))
+            bars = min(base_bars, elapsed_bars + self.BASE_TAIL_MARGIN)
+
+        requested_at = datetime.now().timestamp()
+        df_base = self.data_manager.get_historical_data(symbol=symbol, timeframe=base_timeframe, lookback=bars)
+        if (bars < base_bars and df_base is not None and not df_base.empty and
+                df_base.index[0] > builder.last_base_time):
+            # El tramo no cubre desde la última vela procesada: reconstruir desde la historia completa
+            builder = IncrementalTimeframeBuilder(targets, base_timeframe, max_bars=max_bars)
+            df_base = self.data_manager.get_historical_data(symbol=symbol, timeframe=base_timeframe,
+                                                            lookback=base_bars)
+        if df_base is None or df_base.empty:
+            return self._timeframe_builders.get(key)
+
+        # La última vela base puede seguir abierta: se agrega como vela en formación
+        builder.update(df_base.iloc[:-1], forming=df_base.iloc[-1:])
+        self._timeframe_builders[key] = builder
+        self._base_fetched_at[key] = requested_at
+        return builder
+
+    @profile_hot_path(name='acc.ict_analysis')
     def _execute_ict_analysis(self,
                             analysis_input: AnalysisInput,
                             data_payload: Dict[str, Any],
@@ -530,6 +679,7 @@ class AnalysisOrchestrator:
 
             return None
 
+    @profile_hot_path(name='acc.poi_detection')
     def _execute_poi_detection(self,
                              analysis_input: AnalysisInput,
                              data_payload: Dict[str, Any],
@@ -616,7 +766,9 @@ class AnalysisOrchestrator:
                             'structure': market_structure.market_structure,
                             'session': market_structure.session_type,
                             'volatility': market_structure.volatility_index,
-                            'strength': market_structure.structure_strength
+                            'strength': market_structure.structure_strength,
+                            'symbol': analysis_input.symbol,
+                            'open_symbols': analysis_input.open_symbols or []
                         }
 
                     score = self.poi_scoring_engine.calculate_intelligent_score(
@@ -707,6 +859,7 @@ class AnalysisOrchestrator:
 
             return None
 
+    @profile_hot_path(name='acc.confidence_analysis')
     def _execute_confidence_analysis(self,
                                    analysis_input: AnalysisInput,
                                    market_structure: Optional[MarketStructureData],
@@ -748,14 +901,16 @@ class AnalysisOrchestrator:
                             'trend': market_structure.trend,
                             'structure': market_structure.market_structure,
                             'session': market_structure.session_type,
-                            'volatility': market_structure.volatility_index
+                            'volatility': market_structure.volatility_index,
+                            'open_symbols': analysis_input.open_symbols or []
                         }
 
                         pattern_conf = self.confidence_engine.calculate_pattern_confidence(
                             pattern=pattern_dict,
                             market_context=market_context_dict,
                             poi_list=poi_data.pois_list if poi_data else [],
-                            current_price=current_market_price
+                            current_price=current_market_price,
+                            symbol=analysis_input.symbol
                         )
 
                         pattern_confidence[pattern] = pattern_conf
@@ -833,6 +988,7 @@ class AnalysisOrchestrator:
 
             return None
 
+    @profile_hot_path(name='acc.veredicto_generation')
     def _execute_veredicto_generation(self,
                                     analysis_input: AnalysisInput,
                                     market_structure: Optional[MarketStructureData],
@@ -867,7 +1023,8 @@ class AnalysisOrchestrator:
                     'trend': market_structure.trend,
                     'structure': market_structure.market_structure,
                     'session': market_structure.session_type,
-                    'volatility': market_structure.volatility_index
+                    'volatility': market_structure.volatility_index,
+                    'open_symbols': analysis_input.open_symbols or []
                 }
 
             veredicto_result = self.veredicto_engine.generate_market_veredicto(
@@ -936,6 +1093,7 @@ class AnalysisOrchestrator:
 
             return None
 
+    @profile_hot_path(name='acc.finalize_tct_measurement')
     def _finalize_tct_measurement(self,
                                 tct_measurement_id: str,
                                 analysis_input: AnalysisInput,
@@ -1114,19 +1272,30 @@ class AnalysisOrchestrator:
 
     def _calculate_avg_success_rate(self) -> float:
         """📊 Calcular tasa de éxito promedio"""
-        if not self.analysis_history:
+        if not self._history_totals['count']:
             return 0.0
 
-        total_success_rate = sum(analysis.overall_success_rate for analysis in self.analysis_history)
-        return total_success_rate / len(self.analysis_history)
+        return self._history_totals['success_rate'] / self._history_totals['count']
 
     def _calculate_avg_execution_time(self) -> float:
         """⏱️ Calcular tiempo de ejecución promedio"""
-        if not self.analysis_history:
+        if not self._history_totals['count']:
             return 0.0
 
-        total_time = sum(analysis.total_execution_time_ms for analysis in self.analysis_history)
-        return total_time / len(self.analysis_history)
+        return self._history_totals['execution_time_ms'] / self._history_totals['count']
+
+    def evict(self, fraction: float) -> int:
+        """🧮 Desalojo bajo presión de memoria: cache de resultados + fracción antigua del historial"""
+        freed = 0
+        if self.results_cache:
+            freed += len(self.results_cache)
+            self.results_cache.clear()
+        return freed + self.analysis_history.evict(fraction)
+
+    def memory_bytes(self) -> int:
+        """🧮 Bytes estimados de historial, análisis activos y cache"""
+        return (self.analysis_history.memory_bytes() + estimate_size(self.active_analyses)
+                + estimate_size(self.results_cache or {}))
 
     def _get_component_health_summary(self) -> Dict[str, str]:
         """🏥 Resumen de salud de componentes basado en estadísticas"""
@@ -1176,9 +1345,19 @@ class AnalysisOrchestrator:
         if not analysis_output or not analysis_output.component_results:
             return
 
+        # 🏷️ Etiquetas de latencia del ciclo (etapa = component_name)
+        analysis_input = analysis_output.input_parameters
+        latency_labels = {
+            'timeframe': analysis_input.timeframes[0] if analysis_input.timeframes else None,
+            'symbol': analysis_input.symbol,
+            'session': analysis_output.market_structure.session_type if analysis_output.market_structure
+                       else self._determine_real_trading_session(datetime.now().hour)
+        }
+
         # Tracking de rendimiento por componente
         for result in analysis_output.component_results:
             component_name = result.component_name
+            self.latency_registry.record(result.execution_time_ms, stage=component_name, **latency_labels)
 
             # Registrar tiempo de ejecución
             if hasattr(self, '_component_execution_times'):
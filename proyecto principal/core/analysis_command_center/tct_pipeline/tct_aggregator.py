@@ -12,7 +12,8 @@ from sistema.sic import dataclass, field
 
 # 🔌 IMPORTS DEL ICT ENGINE
 from sistema.sic import enviar_senal_log, log_tct
-from .tct_measurements import TCTMetrics
+from sistema.latency_histogram import LatencyHistogramRegistry, get_tct_latency_registry
+from .tct_measurements import TCTMetrics, TCT_STAGE
 
 @dataclass
 class AggregatedTCTMetrics:
@@ -26,6 +27,15 @@ class AggregatedTCTMetrics:
     global_max_tct_ms: float = 0.0
     global_min_tct_ms: float = float('inf')
 
+    # 📈 PERCENTILES GLOBALES (histograma fusionado, no promedios de promedios)
+    global_p50_tct_ms: float = 0.0
+    global_p90_tct_ms: float = 0.0
+    global_p99_tct_ms: float = 0.0
+
+    # 📊 PERCENTILES POR DIMENSIÓN {'stage': {...}, 'timeframe': {...}, ...} Y HISTOGRAMAS FUSIONABLES
+    latency_percentiles: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+    latency_histograms: Dict[str, Any] = field(default_factory=dict)
+
     # 🎯 ANÁLISIS DE TENDENCIAS
     tct_trend: str = "STABLE"  # IMPROVING, DEGRADING, STABLE
     performance_grade: str = "A"  # A, B, C, D, F
@@ -57,6 +67,13 @@ class AggregatedTCTMetrics:
             'global_avg_tct_ms': self.global_avg_tct_ms,
             'global_max_tct_ms': self.global_max_tct_ms,
             'global_min_tct_ms': self.global_min_tct_ms,
+            'global_p50_tct_ms': self.global_p50_tct_ms,
+            'global_p90_tct_ms': self.global_p90_tct_ms,
+            'global_p99_tct_ms': self.global_p99_tct_ms,
+
+            # 📈 LATENCIAS POR ETAPA / TIMEFRAME / SÍMBOLO / SESIÓN
+            'latency_percentiles': self.latency_percentiles,
+            'latency_histograms': self.latency_histograms,
 
             # 📊 MÉTRICAS POR TIMEFRAME
             'timeframe_metrics': timeframe_dict,
@@ -80,8 +97,16 @@ class TCTAggregator:
     Inspirado en _analyze_system_frequency del health_analyzer
     """
 
-    def __init__(self):
-        """Inicialización del agregador TCT"""
+    def __init__(self, latency_registry: Optional[LatencyHistogramRegistry] = None):
+        """
+        Inicialización del agregador TCT
+
+        Args:
+            latency_registry: Registro de histogramas (por defecto el compartido del pipeline)
+        """
+
+        # 📊 HISTOGRAMAS DE LATENCIA (alimentados por TCTMeasurementEngine y el ACC)
+        self.latency_registry = latency_registry if latency_registry is not None else get_tct_latency_registry()
 
         # 🗃️ ALMACENAMIENTO POR TIMEFRAME (como health_analyzer por categorías)
         self.timeframe_data = defaultdict(list)  # {timeframe: [TCTMetrics]}
@@ -161,7 +186,7 @@ class TCTAggregator:
                 continue
 
             # 📊 CALCULAR MÉTRICAS CONSOLIDADAS PARA ESTE TIMEFRAME
-            timeframe_avg = sum(m.avg_tct_ms for m in metrics_list) / len(metrics_list)
+            timeframe_avg = self._weighted_avg_tct(metrics_list)
             timeframe_max = max(m.max_tct_ms for m in metrics_list)
             timeframe_min = min(m.min_tct_ms for m in metrics_list if m.min_tct_ms != float('inf'))
 
@@ -174,12 +199,13 @@ class TCTAggregator:
             consolidated_metric.patterns_analyzed = sum(m.patterns_analyzed for m in metrics_list)
             consolidated_metric.pois_processed = sum(m.pois_processed for m in metrics_list)
             consolidated_metric.current_timeframe = timeframe
+            self._apply_percentiles(consolidated_metric, timeframe=timeframe)
 
             # 🗃️ ALMACENAR EN AGREGACIÓN
             aggregated.timeframe_metrics[timeframe] = consolidated_metric
 
             # 📊 ACUMULAR PARA GLOBALES
-            all_avg_times.append(timeframe_avg)
+            all_avg_times.append((timeframe_avg, consolidated_metric.measurements_taken))
             all_max_times.append(timeframe_max)
             if timeframe_min != float('inf'):
                 all_min_times.append(timeframe_min)
@@ -195,10 +221,13 @@ class TCTAggregator:
 
         # 🌍 CALCULAR MÉTRICAS GLOBALES
         if all_avg_times:
-            aggregated.global_avg_tct_ms = sum(all_avg_times) / len(all_avg_times)
+            aggregated.global_avg_tct_ms = self._weighted_mean(all_avg_times)
             aggregated.global_max_tct_ms = max(all_max_times)
             aggregated.global_min_tct_ms = min(all_min_times) if all_min_times else 0.0
 
+        # 📈 PERCENTILES GLOBALES Y POR DIMENSIÓN
+        self._apply_global_latency(aggregated)
+
         # 📈 CALCULAR FRECUENCIA (como health_analyzer)
         aggregated.measurements_per_minute, aggregated.analysis_frequency_hz = self._calculate_frequency()
 
@@ -217,6 +246,8 @@ class TCTAggregator:
         enviar_senal_log(
             nivel='DEBUG',
             mensaje=f"🔄 GLOBAL AGGREGATION | Avg: {aggregated.global_avg_tct_ms:.2f}ms | "
+                   f"p50/p90/p99: {aggregated.global_p50_tct_ms:.2f}/{aggregated.global_p90_tct_ms:.2f}/"
+                   f"{aggregated.global_p99_tct_ms:.2f}ms | "
                    f"Timeframes: {aggregated.total_timeframes} | Trend: {aggregated.tct_trend} | "
                    f"Grade: {aggregated.performance_grade}",
             fuente='tct_aggregator',
@@ -233,6 +264,46 @@ class TCTAggregator:
 
         return aggregated
 
+    @staticmethod
+    def _weighted_avg_tct(metrics_list: List[TCTMetrics]) -> float:
+        """Promedio ponderado por mediciones (cada TCTMetrics es ya un promedio)"""
+        return TCTAggregator._weighted_mean(
+            [(m.avg_tct_ms, max(m.measurements_taken, 1)) for m in metrics_list]
+        )
+
+    @staticmethod
+    def _weighted_mean(pairs: List[tuple[float, int]]) -> float:
+        """Media de (valor, peso); sin pesos válidos cae a media simple"""
+        total_weight = sum(weight for _, weight in pairs)
+        if total_weight <= 0:
+            return sum(value for value, _ in pairs) / len(pairs) if pairs else 0.0
+        return sum(value * weight for value, weight in pairs) / total_weight
+
+    def _apply_percentiles(self, metric: TCTMetrics, **filters: str):
+        """Rellena p50/p90/p99 de una métrica consolidada desde el registro de histogramas"""
+        histogram = self.latency_registry.get(stage=TCT_STAGE, **filters)
+        if histogram.count:
+            metric.p50_tct_ms, metric.p90_tct_ms, metric.p99_tct_ms = histogram.percentiles((50, 90, 99))
+
+    def _apply_global_latency(self, aggregated: AggregatedTCTMetrics):
+        """
+        Percentiles globales del histograma fusionado de mediciones TCT y
+        resúmenes p50/p90/p99/max por etapa, timeframe, símbolo y sesión
+        """
+        histogram = self.latency_registry.get(stage=TCT_STAGE)
+        if histogram.count:
+            (aggregated.global_p50_tct_ms,
+             aggregated.global_p90_tct_ms,
+             aggregated.global_p99_tct_ms) = histogram.percentiles((50, 90, 99))
+            aggregated.global_max_tct_ms = max(aggregated.global_max_tct_ms, histogram.max_ms)
+
+        aggregated.latency_percentiles = {'stage': self.latency_registry.summary(by=('stage',))}
+        for dimension in ('timeframe', 'symbol', 'session'):
+            aggregated.latency_percentiles[dimension] = self.latency_registry.summary(
+                by=(dimension,), stage=TCT_STAGE
+            )
+        aggregated.latency_histograms = self.latency_registry.to_dict()
+
     def _calculate_frequency(self) -> tuple[float, float]:
         """
         Calcula frecuencia de mediciones (lógica de health_analyzer)
@@ -430,7 +501,7 @@ class TCTAggregator:
             recent_metrics_found = True
 
             # 📊 CALCULAR MÉTRICAS CONSOLIDADAS PARA ESTE TIMEFRAME (RECIENTES)
-            tf_avg = sum(m.avg_tct_ms for m in recent_metrics) / len(recent_metrics)
+            tf_avg = self._weighted_avg_tct(recent_metrics)
             tf_max = max(m.max_tct_ms for m in recent_metrics)
             tf_min = min(m.min_tct_ms for m in recent_metrics if m.min_tct_ms != float('inf'))
 
@@ -448,7 +519,7 @@ class TCTAggregator:
             aggregated.timeframe_metrics[tf] = consolidated_metric
 
             # 📊 ACUMULAR PARA GLOBALES
-            all_avg_times.append(tf_avg)
+            all_avg_times.append((tf_avg, sum(max(m.measurements_taken, 1) for m in recent_metrics)))
             all_max_times.append(tf_max)
             if tf_min != float('inf'):
                 all_min_times.append(tf_min)
@@ -471,7 +542,7 @@ class TCTAggregator:
 
         # 🌍 CALCULAR MÉTRICAS GLOBALES RECIENTES
         if all_avg_times:
-            aggregated.global_avg_tct_ms = sum(all_avg_times) / len(all_avg_times)
+            aggregated.global_avg_tct_ms = self._weighted_mean(all_avg_times)
             aggregated.global_max_tct_ms = max(all_max_times)
             aggregated.global_min_tct_ms = min(all_min_times) if all_min_times else 0.0
 
@@ -59,8 +59,12 @@ class TCTFormatter:
                 "avg_tct_ms": aggregated_metrics.global_avg_tct_ms,
                 "max_tct_ms": aggregated_metrics.global_max_tct_ms,
                 "min_tct_ms": aggregated_metrics.global_min_tct_ms,
+                "p50_tct_ms": aggregated_metrics.global_p50_tct_ms,
+                "p90_tct_ms": aggregated_metrics.global_p90_tct_ms,
+                "p99_tct_ms": aggregated_metrics.global_p99_tct_ms,
                 "measurements_per_minute": aggregated_metrics.measurements_per_minute
             },
+            "tct_latency": aggregated_metrics.latency_percentiles,
             "tct_timeframes": {},
             "tct_summary": {
                 "total_timeframes": aggregated_metrics.total_timeframes,
@@ -74,6 +78,8 @@ class TCTFormatter:
             dashboard_data["tct_timeframes"][timeframe] = {
                 "avg_ms": round(metrics.avg_tct_ms, 2),
                 "max_ms": round(metrics.max_tct_ms, 2),
+                "p50_ms": round(metrics.p50_tct_ms, 2),
+                "p99_ms": round(metrics.p99_tct_ms, 2),
                 "measurements": metrics.measurements_taken,
                 "patterns": metrics.patterns_analyzed,
                 "pois": metrics.pois_processed,
@@ -116,6 +122,9 @@ class TCTFormatter:
             "avg_tct_ms": aggregated_metrics.global_avg_tct_ms,
             "max_tct_ms": aggregated_metrics.global_max_tct_ms,
             "min_tct_ms": aggregated_metrics.global_min_tct_ms,
+            "p50_tct_ms": aggregated_metrics.global_p50_tct_ms,
+            "p90_tct_ms": aggregated_metrics.global_p90_tct_ms,
+            "p99_tct_ms": aggregated_metrics.global_p99_tct_ms,
             "measurements_per_minute": aggregated_metrics.measurements_per_minute,
             "frequency_hz": aggregated_metrics.analysis_frequency_hz,
             "performance_grade": aggregated_metrics.performance_grade,
@@ -138,6 +147,9 @@ class TCTFormatter:
                 "avg_tct_ms": metrics.avg_tct_ms,
                 "max_tct_ms": metrics.max_tct_ms,
                 "min_tct_ms": metrics.min_tct_ms,
+                "p50_tct_ms": metrics.p50_tct_ms,
+                "p90_tct_ms": metrics.p90_tct_ms,
+                "p99_tct_ms": metrics.p99_tct_ms,
                 "measurements_per_minute": 0,  # No aplica por timeframe
                 "frequency_hz": 0,             # No aplica por timeframe  
                 "performance_grade": self._calculate_timeframe_grade(metrics.avg_tct_ms),
@@ -243,6 +255,8 @@ class TCTFormatter:
         lines.append("")
         lines.append("📊 MÉTRICAS GLOBALES:")
         lines.append(f"   ⚡ Tiempo promedio: {aggregated_metrics.global_avg_tct_ms:.2f} ms")
+        lines.append(f"   📏 p50/p90/p99: {aggregated_metrics.global_p50_tct_ms:.2f} / "
+                     f"{aggregated_metrics.global_p90_tct_ms:.2f} / {aggregated_metrics.global_p99_tct_ms:.2f} ms")
         lines.append(f"   📈 Frecuencia: {aggregated_metrics.measurements_per_minute:.2f} med/min")
         lines.append(f"   🔄 Timeframes activos: {aggregated_metrics.total_timeframes}")
         lines.append("")
@@ -12,8 +12,8 @@ try:
     from core.ict_engine.ict_detector import MarketContext, update_market_context
     from core.ict_engine.ict_analysis_optimized import OptimizedICTAnalysis
     from core.ict_engine.confidence_engine import ConfidenceEngine
-    from core.analysis_command_center.tct_pipeline.tct_measurement_engine import TCTMeasurementEngine
-    from core.analysis_command_center.tct_pipeline.tct_aggregation_engine import TCTAggregationEngine
+    from core.analysis_command_center.tct_pipeline.tct_measurements import TCTMeasurementEngine
+    from core.analysis_command_center.tct_pipeline.tct_aggregator import TCTAggregator as TCTAggregationEngine
     from core.analysis_command_center.tct_pipeline.tct_formatter import TCTFormatter
     enviar_senal_log("INFO", "✅ Componentes TCT importados correctamente", __name__, "init")
 except ImportError as e:
@@ -234,6 +234,7 @@ class TCTInterface:
                     "symbol": symbol,
                     "timeframe": timeframe,
                     "analysis_type": "single",
+                    "session": getattr(market_context, 'current_session', None) or self._get_current_session(),
                     "timestamp": datetime.now().isoformat()
                 }
             )
@@ -351,9 +352,14 @@ class TCTInterface:
     def export_tct_data(self, format_type: str = "json") -> Optional[str]:
         """
         Exporta datos TCT en formato especificado
+        Incluye percentiles e histogramas fusionables por etapa/timeframe/símbolo/sesión
         Returns: Path del archivo exportado
         """
 
+        # 📊 AGREGAR BAJO DEMANDA SI YA HAY LATENCIAS REGISTRADAS
+        if self._last_aggregation is None and len(getattr(self.aggregator, 'latency_registry', ())):
+            self._last_aggregation = self.aggregator.aggregate_all_timeframes()
+
         if self._last_aggregation is None:
             enviar_senal_log(
                 nivel='WARNING',
@@ -582,21 +588,12 @@ class TCTInterface:
             return 1.17500  # Fallback seguro
 
     def _get_current_session(self) -> str:
-        """Obtiene la sesión de mercado actual basada en hora UTC"""
+        """Obtiene la sesión de mercado actual (calendario de sesiones, hora UTC con DST)"""
         try:
+            from sistema.session_calendar import get_session_calendar
 
-            utc_now = datetime.now(timezone.utc)
-            hour_utc = utc_now.hour
-
-            # 🌏 SESIONES DE MERCADO (UTC)
-            if 0 <= hour_utc < 7:
-                return "ASIAN"
-            elif 7 <= hour_utc < 15:
-                return "LONDON"
-            elif 15 <= hour_utc < 22:
-                return "NEWYORK"
-            else:
-                return "ASIAN"
+            session = get_session_calendar().current_labels()['session']
+            return {'LONDON': "LONDON", 'NEW_YORK': "NEWYORK"}.get(session, "ASIAN")
 
         except Exception:
             return "ASIAN"  # Fallback seguro
@@ -15,6 +15,10 @@ from sistema.sic import Path
 
 # 🔌 IMPORTS DEL ICT ENGINE
 from sistema.sic import enviar_senal_log, log_tct
+from sistema.latency_histogram import LatencyHistogram, LatencyHistogramRegistry, get_tct_latency_registry
+
+# 🏷️ ETAPA DE LAS MEDICIONES TCT EXTREMO A EXTREMO (las etapas del ACC usan su component_name)
+TCT_STAGE = 'tct_total'
 
 @dataclass
 class TCTMetrics:
@@ -24,6 +28,9 @@ class TCTMetrics:
     avg_tct_ms: float = 0.0                    # Tiempo promedio completo
     max_tct_ms: float = 0.0                    # Tiempo máximo registrado
     min_tct_ms: float = float('inf')           # Tiempo mínimo registrado
+    p50_tct_ms: float = 0.0                    # Mediana (histograma)
+    p90_tct_ms: float = 0.0                    # Percentil 90 (histograma)
+    p99_tct_ms: float = 0.0                    # Percentil 99 - cola (histograma)
 
     # 📊 MÉTRICAS DE ANÁLISIS ICT
     analysis_start_time: Optional[str] = None  # Timestamp inicio análisis
@@ -54,8 +61,15 @@ class TCTMeasurementEngine:
     Mide el tiempo completo de análisis ICT desde inicio hasta finalización
     """
 
-    def __init__(self, logs_directory: str = "data/logs/tct"):
-        """Inicialización del motor TCT"""
+    def __init__(self, logs_directory: str = "data/logs/tct",
+                 latency_registry: Optional[LatencyHistogramRegistry] = None):
+        """
+        Inicialización del motor TCT
+
+        Args:
+            logs_directory: Directorio de logs TCT
+            latency_registry: Registro de histogramas (por defecto el compartido del pipeline)
+        """
         self.logs_dir = Path(logs_directory)
         self.logs_dir.mkdir(parents=True, exist_ok=True)
 
@@ -66,6 +80,10 @@ class TCTMeasurementEngine:
         self.tct_samples = deque(maxlen=100)      # Últimas 100 mediciones TCT
         self.analysis_history = deque(maxlen=50)  # Historial de análisis
 
+        # 📊 HISTOGRAMAS DE LATENCIA (todas las mediciones, sin ventana)
+        self.latency_histogram = LatencyHistogram()
+        self.latency_registry = latency_registry if latency_registry is not None else get_tct_latency_registry()
+
         # ⏱️ TRACKING DE TIEMPO
         self._measurement_start_time = None
         self._active_measurements = {}  # Para múltiples mediciones concurrentes
@@ -160,10 +178,25 @@ class TCTMeasurementEngine:
     def _update_metrics(self, duration_ms: float, start_data: Dict, results: Optional[Dict]):
         """Actualiza métricas internas (lógica de health_analyzer)"""
 
+        context = start_data.get('context', {})
+
         # 🕐 ACTUALIZAR MÉTRICAS DE TIEMPO
         if duration_ms > 0:  # Filtro de sanidad
             self.metrics.measurements_taken += 1
 
+            # 📊 HISTOGRAMAS: local + registro por etapa/timeframe/símbolo/sesión
+            self.latency_histogram.record(duration_ms)
+            self.latency_registry.record(
+                duration_ms,
+                stage=context.get('stage', TCT_STAGE),
+                timeframe=context.get('timeframe'),
+                symbol=context.get('symbol'),
+                session=context.get('session')
+            )
+            (self.metrics.p50_tct_ms,
+             self.metrics.p90_tct_ms,
+             self.metrics.p99_tct_ms) = self.latency_histogram.percentiles((50, 90, 99))
+
             # 📊 ESTADÍSTICAS DE TIEMPO (igual que health_analyzer)
             if self.metrics.measurements_taken == 1:
                 self.metrics.avg_tct_ms = duration_ms
@@ -179,7 +212,6 @@ class TCTMeasurementEngine:
                 self.metrics.min_tct_ms = min(self.metrics.min_tct_ms, duration_ms)
 
         # 🎯 ACTUALIZAR CONTEXTO
-        context = start_data.get('context', {})
         if 'symbol' in context:
             self.metrics.current_symbol = context['symbol']
         if 'timeframe' in context:
@@ -224,6 +256,9 @@ class TCTMeasurementEngine:
                 "avg_tct_ms": metrics.avg_tct_ms,
                 "max_tct_ms": metrics.max_tct_ms,
                 "min_tct_ms": metrics.min_tct_ms,
+                "p50_tct_ms": metrics.p50_tct_ms,
+                "p90_tct_ms": metrics.p90_tct_ms,
+                "p99_tct_ms": metrics.p99_tct_ms,
                 "measurements_taken": metrics.measurements_taken
             },
             "analysis": {
@@ -0,0 +1,12 @@
+"""
+Módulo de Backtesting - Replay de velas guardadas con bróker simulado
+Contiene el SimulatedBroker compatible con MT5 y el BacktestEngine
+"""
+
+from .sim_broker import SimulatedBroker, SimPosition, SimOrder
+from .backtest_engine import BacktestConfig, BacktestEngine, BarContext, DetectorStrategy, load_candles
+
+__all__ = [
+    'SimulatedBroker', 'SimPosition', 'SimOrder',
+    'BacktestConfig', 'BacktestEngine', 'BarContext', 'DetectorStrategy', 'load_candles',
+]
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏪ BACKTEST ENGINE - Replay de velas guardadas contra un bróker simulado
+=======================================================================
+
+Motor de backtesting orientado a eventos: recorre las velas almacenadas en
+04-DATA/data/candles una a una, las pasa al SimulatedBroker (llenado de
+órdenes límite, SL/TP), deja que la estrategia (detectores ICT +
+LimitOrderManager, o cualquier callable) opere y llama a
+RiskBot.check_and_act() para que gestione las posiciones igual que en vivo.
+
+- Bucle sobre arrays numpy: el frame de pandas sólo se corta cuando la
+  estrategia pide historial (ctx.history)
+- run_parallel(): un proceso por símbolo, cada uno con su cuenta simulada
+- Cruces (EURJPY...): el P&L y el margen pasan a USD con el par XXXUSD/USDXXX
+  guardado en data_dir (se reproduce vela a vela en el mismo bróker) o, si
+  no hay velas, con los tipos fijos de BacktestConfig.conversion_rates
+
+Uso:
+    engine = BacktestEngine(BacktestConfig(timeframe='M5', use_riskbot=True),
+                            strategy_factory=MiEstrategia)
+    results = engine.run_parallel(['EURUSD', 'GBPUSD'])
+
+Versión: v1.0.0
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sim_broker import COMISION_POR_LOTE, SimulatedBroker
+
+DATA_ROOT = Path(__file__).resolve().parents[3] / 'ict-engine-v6.0-enterprise-sic' / '04-DATA' / 'data'
+DEFAULT_CANDLES_DIR = DATA_ROOT / 'candles'
+DEFAULT_RESULTS_DIR = DATA_ROOT / 'backtest_results'
+
+
+@dataclass
+class BacktestConfig:
+    """⚙️ Configuración de un backtest"""
+    timeframe: str = 'M5'
+    data_dir: str = str(DEFAULT_CANDLES_DIR)
+    start: Optional[str] = None
+    end: Optional[str] = None
+    initial_balance: float = 10000.0
+    commission_per_lot: float = COMISION_POR_LOTE
+    slippage_points: float = 0.0
+    default_spread_points: float = 10.0
+    leverage: int = 100
+    warmup_bars: int = 0                 # Velas sin llamar a la estrategia
+    use_riskbot: bool = False            # RiskBot.check_and_act() gestiona las posiciones
+    riskbot_kwargs: Dict[str, Any] = field(default_factory=dict)
+    risk_check_interval: int = 1         # Cada cuántas velas se llama a check_and_act
+    close_at_end: bool = True            # Cerrar posiciones abiertas en la última vela
+    include_deals: bool = False          # Incluir cada deal en el resultado
+    conversion_rates: Dict[str, float] = field(default_factory=dict)  # Tipos fijos XXXUSD/USDXXX para cruces
+    load_conversion_pairs: bool = True   # Sin tipo fijo: reproducir las velas del par USD de data_dir
+
+
+class BarContext:
+    """🕯️ Vela actual que recibe la estrategia (un único objeto reutilizado)"""
+
+    __slots__ = ('symbol', 'timeframe', 'broker', 'index', 'time',
+                 'open', 'high', 'low', 'close', 'spread', '_frame')
+
+    def __init__(self, symbol: str, timeframe: str, broker: SimulatedBroker, frame: pd.DataFrame):
+        self.symbol = symbol
+        self.timeframe = timeframe
+        self.broker = broker
+        self._frame = frame
+        self.index = -1
+        self.time = 0
+        self.open = self.high = self.low = self.close = self.spread = 0.0
+
+    @property
+    def timestamp(self) -> pd.Timestamp:
+        return self._frame.index[self.index]
+
+    def history(self, bars: int) -> pd.DataFrame:
+        """📚 Últimas `bars` velas cerradas, incluida la actual"""
+        return self._frame.iloc[max(0, self.index - bars + 1):self.index + 1]
+
+
+class DetectorStrategy:
+    """
+    🔍 Estrategia de detectores → LimitOrderManager
+
+    Cada `interval` velas pasa el historial a `analyze` (p. ej. un wrapper
+    de ICTDetector) y entrega el resultado a
+    LimitOrderManager.analyze_and_place_orders(), que coloca las órdenes
+    límite en el bróker simulado. `analyze` debe ser una función de módulo
+    para poder usar run_parallel().
+    """
+
+    def __init__(self, analyze: Callable[[pd.DataFrame], Optional[dict]], lookback: int = 500,
+                 interval: int = 12, params: Optional[Dict[str, Any]] = None, order_manager: Any = None):
+        self.analyze = analyze
+        self.lookback = lookback
+        self.interval = max(1, interval)
+        self.params = params or {}
+        self.order_manager = order_manager
+
+    def on_start(self, broker: SimulatedBroker, symbol: str, candles: pd.DataFrame) -> None:
+        if self.order_manager is None:
+            from core.limit_order_manager import LimitOrderManager
+            self.order_manager = LimitOrderManager(symbol)
+        self.order_manager.set_backtest_mode(broker, symbol)
+
+    def on_bar(self, ctx: BarContext) -> None:
+        if ctx.index % self.interval:
+            return
+        ict_results = self.analyze(ctx.history(self.lookback))
+        if ict_results:
+            self.order_manager.analyze_and_place_orders(ict_results, ctx.close, self.params)
+
+
+def load_candles(symbol: str, timeframe: str, data_dir: Optional[str] = None,
+                 start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
+    """
+    📂 Unir todos los CSV guardados de un símbolo/timeframe
+
+    Los descargadores guardan varios archivos solapados
+    ({SYMBOL}_{TF}_{fecha}_{hora}.csv); se concatenan, se eliminan velas
+    duplicadas (gana el archivo más reciente) y se ordenan por tiempo.
+    """
+    files = sorted(Path(data_dir or DEFAULT_CANDLES_DIR).glob(f'{symbol}_{timeframe}_*.csv'))
+    if not files:
+        raise FileNotFoundError(f"Sin velas para {symbol} {timeframe} en {data_dir or DEFAULT_CANDLES_DIR}")
+
+    frames = [pd.read_csv(path, usecols=lambda c: c in ('time', 'open', 'high', 'low', 'close', 'spread'))
+              for path in files]
+    candles = pd.concat(frames, ignore_index=True)
+    candles['time'] = pd.to_datetime(candles['time'])
+    candles = candles.drop_duplicates('time', keep='last').set_index('time').sort_index()
+    if start:
+        candles = candles[candles.index >= pd.Timestamp(start)]
+    if end:
+        candles = candles[candles.index <= pd.Timestamp(end)]
+    return candles
+
+
+class BacktestEngine:
+    """
+    ⏪ MOTOR DE BACKTEST ORIENTADO A EVENTOS
+    ========================================
+
+    strategy_factory y risk_manager_factory son callables sin argumentos
+    (clases o funciones de módulo) para que cada proceso cree sus propias
+    instancias. La estrategia implementa on_bar(ctx) y, opcionalmente,
+    on_start(broker, symbol, candles); también vale un callable(ctx).
+    """
+
+    def __init__(self,
+                 config: Optional[BacktestConfig] = None,
+                 strategy_factory: Optional[Callable[[], Any]] = None,
+                 risk_manager_factory: Optional[Callable[[], Any]] = None):
+        self.config = config or BacktestConfig()
+        self.strategy_factory = strategy_factory
+        self.risk_manager_factory = risk_manager_factory
+
+    # ===============================
+    # EJECUCIÓN
+    # ===============================
+
+    def run(self, symbol: str, candles: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
+        """
+        ▶️ Backtest de un símbolo
+
+        Args:
+            symbol: Símbolo a simular
+            candles: Velas (índice datetime; open/high/low/close[/spread]).
+                     None = cargar de data_dir
+
+        Returns:
+            Dict con resumen de cuenta, drawdown y rendimiento
+        """
+        config = self.config
+        started = time.perf_counter()
+        if candles is None:
+            candles = load_candles(symbol, config.timeframe, config.data_dir, config.start, config.end)
+
+        broker = SimulatedBroker(
+            initial_balance=config.initial_balance,
+            commission_per_lot=config.commission_per_lot,
+            slippage_points=config.slippage_points,
+            default_spread_points=config.default_spread_points,
+            leverage=config.leverage,
+            conversion_rates=config.conversion_rates,
+        )
+        broker.symbol_select(symbol)
+        conversions = self._conversion_closes(broker, symbol, candles)
+
+        strategy = self.strategy_factory() if self.strategy_factory else None
+        if strategy is not None and hasattr(strategy, 'on_start'):
+            strategy.on_start(broker, symbol, candles)
+        on_bar = getattr(strategy, 'on_bar', strategy)
+        risk_manager = self._build_risk_manager(broker)
+
+        times = pd.DatetimeIndex(candles.index).as_unit('s').asi8
+        opens = candles['open'].to_numpy(dtype=float)
+        highs = candles['high'].to_numpy(dtype=float)
+        lows = candles['low'].to_numpy(dtype=float)
+        closes = candles['close'].to_numpy(dtype=float)
+        spreads = (candles['spread'].to_numpy(dtype=float) if 'spread' in candles
+                   else np.full(len(candles), config.default_spread_points))
+        equity = np.empty(len(candles))
+
+        ctx = BarContext(symbol, config.timeframe, broker, candles)
+        had_positions = False
+        interval = max(1, config.risk_check_interval)
+
+        for i in range(len(candles)):
+            for pair, pair_closes in conversions:
+                rate = pair_closes[i]
+                if rate == rate:  # NaN antes de la primera vela del par
+                    broker.on_bar(pair, times[i], rate, rate, rate, rate, 0.0)
+            broker.on_bar(symbol, times[i], opens[i], highs[i], lows[i], closes[i], spreads[i])
+
+            if on_bar is not None and i >= config.warmup_bars:
+                ctx.index, ctx.time = i, times[i]
+                ctx.open, ctx.high, ctx.low, ctx.close, ctx.spread = opens[i], highs[i], lows[i], closes[i], spreads[i]
+                on_bar(ctx)
+
+            has_positions = broker.positions_total() > 0
+            if risk_manager is not None and (has_positions or had_positions) and i % interval == 0:
+                risk_manager.check_and_act()
+                has_positions = broker.positions_total() > 0
+            had_positions = has_positions
+
+            equity[i] = broker.account_info().equity if has_positions else broker.balance
+
+        if config.close_at_end:
+            self._close_all(broker)
+
+        elapsed = time.perf_counter() - started
+        result = {
+            'symbol': symbol,
+            'timeframe': config.timeframe,
+            'status': 'SUCCESS',
+            'bars': len(candles),
+            'date_range': {
+                'start': str(candles.index[0]) if len(candles) else None,
+                'end': str(candles.index[-1]) if len(candles) else None,
+            },
+            'execution_time': elapsed,
+            'bars_per_second': len(candles) / elapsed if elapsed > 0 else 0.0,
+            'max_drawdown': self._max_drawdown(equity),
+            'account': broker.get_summary(),
+        }
+        if config.include_deals:
+            result['deals'] = list(broker.deals)
+        return result
+
+    def run_parallel(self, symbols: Sequence[str], max_workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        🚀 Backtest de varios símbolos, un proceso por símbolo
+
+        Cada símbolo corre con su propia cuenta simulada; el resumen suma los
+        resultados. Con un solo símbolo o max_workers=1 se ejecuta en serie.
+        """
+        started = time.perf_counter()
+        results: Dict[str, Dict[str, Any]] = {}
+        workers = max_workers or min(len(symbols), os.cpu_count() or 1)
+
+        if workers <= 1 or len(symbols) <= 1:
+            for symbol in symbols:
+                results[symbol] = _run_symbol(self, symbol)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = {symbol: pool.submit(_run_symbol, self, symbol) for symbol in symbols}
+                for symbol, future in futures.items():
+                    results[symbol] = future.result()
+
+        return {
+            'summary': self._aggregate(results, time.perf_counter() - started),
+            'symbol_results': results,
+            'config': asdict(self.config),
+        }
+
+    def save_results(self, results: Dict[str, Any], output_dir: Optional[str] = None) -> str:
+        """💾 Guardar resultados en 04-DATA/data/backtest_results"""
+        directory = Path(output_dir or DEFAULT_RESULTS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"event_backtest_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, ensure_ascii=False, default=str)
+        return str(path)
+
+    # ===============================
+    # UTILIDADES
+    # ===============================
+
+    def _conversion_closes(self, broker: SimulatedBroker, symbol: str,
+                           candles: pd.DataFrame) -> List[Tuple[str, np.ndarray]]:
+        """
+        💱 Cierres de los pares USD que necesita un cruce, alineados a `candles`
+
+        Por cada divisa del símbolo distinta de USD y sin tipo fijo en
+        conversion_rates se carga XXXUSD (o USDXXX) de data_dir; el último
+        cierre conocido en cada vela es el tipo de esa vela (sin mirar al futuro).
+        """
+        config = self.config
+        if not config.load_conversion_pairs:
+            return []
+        spec = broker.symbol_info(symbol)
+        conversions = []
+        for currency in dict.fromkeys((spec.currency_base, spec.currency_profit)):
+            candidates = (f'{currency}USD', f'USD{currency}')
+            if currency == 'USD' or symbol in candidates or any(p in config.conversion_rates for p in candidates):
+                continue
+            for pair in candidates:
+                try:
+                    frame = load_candles(pair, config.timeframe, config.data_dir, config.start, config.end)
+                except FileNotFoundError:
+                    continue
+                pair_closes = frame['close'].reindex(candles.index, method='ffill')
+                conversions.append((pair, pair_closes.to_numpy(dtype=float)))
+                break
+        return conversions
+
+    def _build_risk_manager(self, broker: SimulatedBroker) -> Any:
+        if self.risk_manager_factory is not None:
+            risk_manager = self.risk_manager_factory()
+        elif self.config.use_riskbot:
+            from core.risk_management.riskbot_mt5 import RiskBot
+            risk_manager = RiskBot(**self.config.riskbot_kwargs)
+        else:
+            return None
+        if hasattr(risk_manager, 'set_backtest_mode'):
+            risk_manager.set_backtest_mode(broker)
+        return risk_manager
+
+    @staticmethod
+    def _close_all(broker: SimulatedBroker) -> None:
+        for position in broker.positions_get():
+            broker.order_send({
+                'action': broker.TRADE_ACTION_DEAL,
+                'symbol': position.symbol,
+                'volume': position.volume,
+                'type': broker.ORDER_TYPE_SELL if position.type == broker.POSITION_TYPE_BUY else broker.ORDER_TYPE_BUY,
+                'position': position.ticket,
+                'comment': 'end_of_test',
+            })
+
+    @staticmethod
+    def _max_drawdown(equity: np.ndarray) -> Dict[str, float]:
+        if len(equity) == 0:
+            return {'amount': 0.0, 'percent': 0.0}
+        peaks = np.maximum.accumulate(equity)
+        drawdowns = peaks - equity
+        worst = int(np.argmax(drawdowns))
+        return {
+            'amount': float(drawdowns[worst]),
+            'percent': float(drawdowns[worst] / peaks[worst] * 100.0) if peaks[worst] else 0.0,
+        }
+
+    @staticmethod
+    def _aggregate(results: Dict[str, Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+        completed = [r for r in results.values() if r.get('status') == 'SUCCESS']
+        total_bars = sum(r['bars'] for r in completed)
+        trades = sum(r['account']['trades'] for r in completed)
+        wins = sum(r['account']['wins'] for r in completed)
+        return {
+            'symbols_processed': [r['symbol'] for r in completed],
+            'symbols_failed': [s for s, r in results.items() if r.get('status') != 'SUCCESS'],
+            'total_bars': total_bars,
+            'total_trades': trades,
+            'win_rate': (wins / trades * 100.0) if trades else 0.0,
+            'net_profit': sum(r['account']['net_profit'] for r in completed),
+            'commission': sum(r['account']['commission'] for r in completed),
+            'total_execution_time': elapsed,
+            'bars_per_second': total_bars / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+def _run_symbol(engine: BacktestEngine, symbol: str) -> Dict[str, Any]:
+    """Punto de entrada de cada proceso (función de módulo para poder serializarla)"""
+    try:
+        return engine.run(symbol)
+    except Exception as e:
+        return {'symbol': symbol, 'status': 'ERROR', 'error': f"{type(e).__name__}: {e}"}
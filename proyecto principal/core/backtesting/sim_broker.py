@@ -0,0 +1,571 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+🏦 SIMULATED BROKER - Bróker simulado compatible con MetaTrader5
+================================================================
+
+Bróker de backtesting con la misma API que el módulo MetaTrader5 que usan
+RiskBot y LimitOrderManager (positions_get, orders_get, account_info,
+symbol_info, symbol_info_tick, order_send y constantes ORDER_*/TRADE_*).
+Se conecta con RiskBot.set_backtest_mode(broker) y
+LimitOrderManager.set_backtest_mode(broker).
+
+Modelo de ejecución por vela (on_bar):
+1. Órdenes pendientes (limit/stop) se llenan si el rango de la vela toca
+   el precio; si la vela abre más allá del precio se llenan en la apertura
+2. SL/TP de las posiciones abiertas; si la vela toca ambos se asume SL
+3. Precio actual = cierre de la vela (bid) y cierre + spread (ask)
+
+Las órdenes a mercado se ejecutan al bid/ask actual más el slippage en
+contra. La comisión (COMISION_POR_LOTE por lote, ida y vuelta) se descuenta
+del balance al cerrar, igual que la calcula RiskBot.
+
+Versión: v1.0.0
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+try:
+    from sistema.config import COMISION_POR_LOTE
+except ImportError:
+    COMISION_POR_LOTE = 7.0
+
+
+@dataclass
+class SimPosition:
+    """📈 Posición abierta (mismos atributos que TradePosition de MT5)"""
+    ticket: int
+    symbol: str
+    type: int
+    volume: float
+    price_open: float
+    time: int
+    sl: float = 0.0
+    tp: float = 0.0
+    price_current: float = 0.0
+    profit: float = 0.0
+    swap: float = 0.0
+    magic: int = 0
+    comment: str = ""
+    identifier: int = 0
+
+
+@dataclass
+class SimOrder:
+    """📋 Orden pendiente (mismos atributos que TradeOrder de MT5)"""
+    ticket: int
+    symbol: str
+    type: int
+    volume_initial: float
+    price_open: float
+    time_setup: int
+    sl: float = 0.0
+    tp: float = 0.0
+    magic: int = 0
+    comment: str = ""
+
+    @property
+    def volume_current(self) -> float:
+        return self.volume_initial
+
+
+@dataclass
+class _SymbolState:
+    spec: SimpleNamespace
+    time: int = 0
+    open: float = 0.0
+    high: float = 0.0
+    low: float = 0.0
+    close: float = 0.0
+    spread: float = 0.0  # En precio (points * point)
+    has_bar: bool = False
+
+
+class SimulatedBroker:
+    """
+    🏦 BRÓKER SIMULADO
+    ==================
+
+    Una cuenta (hedging) con uno o varios símbolos. El motor de backtest
+    alimenta las velas con on_bar() y las estrategias operan con order_send()
+    exactamente como contra MetaTrader5.
+    """
+
+    # Constantes MT5 (mismos valores que el paquete MetaTrader5)
+    ORDER_TYPE_BUY = 0
+    ORDER_TYPE_SELL = 1
+    ORDER_TYPE_BUY_LIMIT = 2
+    ORDER_TYPE_SELL_LIMIT = 3
+    ORDER_TYPE_BUY_STOP = 4
+    ORDER_TYPE_SELL_STOP = 5
+    POSITION_TYPE_BUY = 0
+    POSITION_TYPE_SELL = 1
+    TRADE_ACTION_DEAL = 1
+    TRADE_ACTION_PENDING = 5
+    TRADE_ACTION_SLTP = 6
+    TRADE_ACTION_MODIFY = 7
+    TRADE_ACTION_REMOVE = 8
+    ORDER_TIME_GTC = 0
+    ORDER_FILLING_FOK = 0
+    ORDER_FILLING_IOC = 1
+    ORDER_FILLING_RETURN = 2
+    TRADE_RETCODE_DONE = 10009
+    TRADE_RETCODE_INVALID = 10013
+    TRADE_RETCODE_INVALID_VOLUME = 10014
+    TRADE_RETCODE_INVALID_PRICE = 10015
+    TRADE_RETCODE_NO_MONEY = 10019
+    TRADE_RETCODE_POSITION_CLOSED = 10036
+    TRADE_RETCODE_NO_QUOTES = 10021
+
+    def __init__(self,
+                 initial_balance: float = 10000.0,
+                 commission_per_lot: float = COMISION_POR_LOTE,
+                 slippage_points: float = 0.0,
+                 default_spread_points: float = 10.0,
+                 leverage: int = 100,
+                 symbol_specs: Optional[Dict[str, Dict[str, Any]]] = None,
+                 conversion_rates: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            initial_balance: Balance inicial de la cuenta (USD)
+            commission_per_lot: Comisión ida y vuelta por lote
+            slippage_points: Slippage en contra para órdenes a mercado y stops
+            default_spread_points: Spread si la vela no trae columna spread
+            leverage: Apalancamiento para el margen requerido
+            symbol_specs: Overrides de especificación por símbolo (point, digits, ...)
+            conversion_rates: Tipos fijos por par para pasar a USD cuando el par no
+                              se simula (ej. {'USDJPY': 147.0, 'EURUSD': 1.09})
+        """
+        self.initial_balance = float(initial_balance)
+        self.balance = float(initial_balance)
+        self.commission_per_lot = float(commission_per_lot)
+        self.slippage_points = float(slippage_points)
+        self.default_spread_points = float(default_spread_points)
+        self.leverage = leverage
+        self.symbol_specs = symbol_specs or {}
+        self.conversion_rates = dict(conversion_rates or {})
+
+        self._symbols: Dict[str, _SymbolState] = {}
+        self._positions: Dict[int, SimPosition] = {}
+        self._orders: Dict[int, SimOrder] = {}
+        self._next_ticket = 1
+        self._time = 0
+        self.deals: List[Dict[str, Any]] = []
+        self.stats = {'market_orders': 0, 'limit_fills': 0, 'stop_fills': 0,
+                      'sl_hits': 0, 'tp_hits': 0, 'rejected': 0}
+
+    # ===============================
+    # ALIMENTACIÓN DE VELAS
+    # ===============================
+
+    def on_bar(self, symbol: str, time: int, open_: float, high: float, low: float,
+               close: float, spread_points: Optional[float] = None) -> None:
+        """
+        🕯️ Avanzar el símbolo a una nueva vela cerrada
+
+        Args:
+            symbol: Símbolo
+            time: Apertura de la vela (epoch UTC en segundos)
+            open_/high/low/close: Precios bid de la vela
+            spread_points: Spread de la vela en points (None = por defecto)
+        """
+        state = self._state(symbol)
+        spec = state.spec
+        state.time, state.open, state.high, state.low, state.close = int(time), open_, high, low, close
+        points = self.default_spread_points if spread_points is None or spread_points != spread_points else spread_points
+        state.spread = points * spec.point
+        state.has_bar = True
+        self._time = max(self._time, state.time)
+
+        if self._orders:
+            self._fill_pending_orders(state)
+        if self._positions:
+            self._check_stops(state)
+            self._mark_to_market(symbol, state)
+
+    def current_time(self) -> datetime:
+        """⏰ Hora simulada (apertura de la última vela, UTC)"""
+        return datetime.fromtimestamp(self._time, tz=timezone.utc)
+
+    # ===============================
+    # API COMPATIBLE CON MT5
+    # ===============================
+
+    def initialize(self, *args: Any, **kwargs: Any) -> bool:
+        return True
+
+    def shutdown(self) -> None:
+        return None
+
+    def last_error(self):
+        return (1, 'Success')
+
+    def symbol_select(self, symbol: str, enable: bool = True) -> bool:
+        self._state(symbol)
+        return True
+
+    def symbol_info(self, symbol: str) -> Optional[SimpleNamespace]:
+        state = self._state(symbol)
+        if not state.has_bar:
+            return state.spec
+        info = SimpleNamespace(**vars(state.spec))
+        info.bid, info.ask = state.close, state.close + state.spread
+        info.spread = int(round(state.spread / state.spec.point))
+        return info
+
+    def symbol_info_tick(self, symbol: str) -> Optional[SimpleNamespace]:
+        state = self._symbols.get(symbol)
+        if state is None or not state.has_bar:
+            return None
+        return SimpleNamespace(time=state.time, bid=state.close, ask=state.close + state.spread,
+                               last=state.close, volume=0)
+
+    def account_info(self) -> SimpleNamespace:
+        profit = sum(p.profit for p in self._positions.values())
+        equity = self.balance + profit
+        margin = sum(self._required_margin(p.symbol, p.volume, p.price_open) for p in self._positions.values())
+        return SimpleNamespace(
+            login=0, currency='USD', leverage=self.leverage,
+            balance=self.balance, equity=equity, profit=profit, margin=margin,
+            margin_free=equity - margin,
+            margin_level=(equity / margin * 100.0) if margin else 0.0,
+        )
+
+    def positions_get(self, symbol: Optional[str] = None, ticket: Optional[int] = None,
+                      group: Optional[str] = None) -> tuple:
+        positions = self._positions.values()
+        if ticket is not None:
+            positions = [p for p in positions if p.ticket == ticket]
+        elif symbol is not None:
+            positions = [p for p in positions if p.symbol == symbol]
+        return tuple(positions)
+
+    def positions_total(self) -> int:
+        return len(self._positions)
+
+    def orders_get(self, symbol: Optional[str] = None, ticket: Optional[int] = None,
+                   group: Optional[str] = None) -> tuple:
+        orders = self._orders.values()
+        if ticket is not None:
+            orders = [o for o in orders if o.ticket == ticket]
+        elif symbol is not None:
+            orders = [o for o in orders if o.symbol == symbol]
+        return tuple(orders)
+
+    def orders_total(self) -> int:
+        return len(self._orders)
+
+    def order_send(self, request: Dict[str, Any]) -> SimpleNamespace:
+        """📨 Ejecutar una solicitud de trading con la semántica de mt5.order_send"""
+        action = request.get('action')
+        if action == self.TRADE_ACTION_DEAL:
+            if request.get('position'):
+                return self._close_position(request)
+            return self._open_position(request)
+        if action == self.TRADE_ACTION_PENDING:
+            return self._place_pending(request)
+        if action == self.TRADE_ACTION_REMOVE:
+            order = self._orders.pop(int(request.get('order', 0)), None)
+            if order is None:
+                return self._result(self.TRADE_RETCODE_INVALID, request, comment='Order not found')
+            return self._result(self.TRADE_RETCODE_DONE, request, order=order.ticket)
+        if action == self.TRADE_ACTION_SLTP:
+            position = self._positions.get(int(request.get('position', 0)))
+            if position is None:
+                return self._result(self.TRADE_RETCODE_POSITION_CLOSED, request, comment='Position not found')
+            position.sl = float(request.get('sl', position.sl) or 0.0)
+            position.tp = float(request.get('tp', position.tp) or 0.0)
+            return self._result(self.TRADE_RETCODE_DONE, request)
+        if action == self.TRADE_ACTION_MODIFY:
+            order = self._orders.get(int(request.get('order', 0)))
+            if order is None:
+                return self._result(self.TRADE_RETCODE_INVALID, request, comment='Order not found')
+            order.price_open = float(request.get('price', order.price_open))
+            order.sl = float(request.get('sl', order.sl) or 0.0)
+            order.tp = float(request.get('tp', order.tp) or 0.0)
+            return self._result(self.TRADE_RETCODE_DONE, request, order=order.ticket)
+        return self._result(self.TRADE_RETCODE_INVALID, request, comment=f'Unsupported action {action}')
+
+    # ===============================
+    # RESULTADOS
+    # ===============================
+
+    def get_summary(self) -> Dict[str, Any]:
+        """📊 Resumen de la cuenta y de los deals cerrados"""
+        profits = [d['net_profit'] for d in self.deals]
+        wins = [p for p in profits if p > 0]
+        losses = [p for p in profits if p <= 0]
+        gross_loss = abs(sum(losses))
+        return {
+            'initial_balance': self.initial_balance,
+            'final_balance': float(self.balance),
+            'equity': float(self.account_info().equity),
+            'net_profit': float(self.balance - self.initial_balance),
+            'trades': len(profits),
+            'wins': len(wins),
+            'losses': len(losses),
+            'win_rate': (len(wins) / len(profits) * 100.0) if profits else 0.0,
+            'profit_factor': float(sum(wins) / gross_loss) if gross_loss else (float('inf') if wins else 0.0),
+            'commission': float(sum(d['commission'] for d in self.deals)),
+            'open_positions': len(self._positions),
+            'pending_orders': len(self._orders),
+            'execution': dict(self.stats),
+        }
+
+    # ===============================
+    # EJECUCIÓN INTERNA
+    # ===============================
+
+    def _open_position(self, request: Dict[str, Any], price: Optional[float] = None,
+                       reason: str = 'market') -> SimpleNamespace:
+        symbol = request.get('symbol', '')
+        state = self._symbols.get(symbol)
+        if state is None or not state.has_bar:
+            return self._result(self.TRADE_RETCODE_NO_QUOTES, request, comment='No quotes')
+        volume = self._normalize_volume(state.spec, request.get('volume', 0.0))
+        if volume is None:
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request, comment='Invalid volume')
+
+        order_type = request.get('type')
+        is_buy = order_type in (self.ORDER_TYPE_BUY, self.ORDER_TYPE_BUY_LIMIT, self.ORDER_TYPE_BUY_STOP)
+        if price is None:
+            slippage = self.slippage_points * state.spec.point
+            price = state.close + state.spread + slippage if is_buy else state.close - slippage
+            self.stats['market_orders'] += 1
+
+        if self.account_info().margin_free < self._required_margin(symbol, volume, price):
+            return self._result(self.TRADE_RETCODE_NO_MONEY, request, comment='No money')
+
+        ticket = self._new_ticket()
+        position = SimPosition(
+            ticket=ticket, identifier=ticket, symbol=symbol,
+            type=self.POSITION_TYPE_BUY if is_buy else self.POSITION_TYPE_SELL,
+            volume=volume, price_open=price, price_current=price, time=state.time,
+            sl=float(request.get('sl', 0.0) or 0.0), tp=float(request.get('tp', 0.0) or 0.0),
+            magic=int(request.get('magic', 0) or 0), comment=str(request.get('comment', '')),
+        )
+        self._positions[ticket] = position
+        self._mark_to_market(symbol, state)
+        return self._result(self.TRADE_RETCODE_DONE, request, order=ticket, deal=ticket,
+                            volume=volume, price=price)
+
+    def _close_position(self, request: Dict[str, Any]) -> SimpleNamespace:
+        position = self._positions.get(int(request['position']))
+        if position is None:
+            return self._result(self.TRADE_RETCODE_POSITION_CLOSED, request, comment='Position not found')
+        state = self._symbols[position.symbol]
+        volume = self._normalize_volume(state.spec, request.get('volume', position.volume))
+        if volume is None:
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request, comment='Invalid volume')
+
+        slippage = self.slippage_points * state.spec.point
+        if position.type == self.POSITION_TYPE_BUY:
+            price = state.close - slippage
+        else:
+            price = state.close + state.spread + slippage
+        self.stats['market_orders'] += 1
+        closed = min(volume, position.volume)
+        self._realize(position, closed, price, str(request.get('comment', 'close')))
+        return self._result(self.TRADE_RETCODE_DONE, request, order=position.ticket,
+                            deal=position.ticket, volume=closed, price=price)
+
+    def _place_pending(self, request: Dict[str, Any]) -> SimpleNamespace:
+        symbol = request.get('symbol', '')
+        state = self._state(symbol)
+        volume = self._normalize_volume(state.spec, request.get('volume', 0.0))
+        if volume is None:
+            return self._result(self.TRADE_RETCODE_INVALID_VOLUME, request, comment='Invalid volume')
+        order_type = request.get('type')
+        if order_type not in (self.ORDER_TYPE_BUY_LIMIT, self.ORDER_TYPE_SELL_LIMIT,
+                              self.ORDER_TYPE_BUY_STOP, self.ORDER_TYPE_SELL_STOP):
+            return self._result(self.TRADE_RETCODE_INVALID, request, comment='Invalid order type')
+        price = float(request.get('price', 0.0) or 0.0)
+        if price <= 0:
+            return self._result(self.TRADE_RETCODE_INVALID_PRICE, request, comment='Invalid price')
+
+        ticket = self._new_ticket()
+        self._orders[ticket] = SimOrder(
+            ticket=ticket, symbol=symbol, type=order_type, volume_initial=volume,
+            price_open=price, time_setup=state.time,
+            sl=float(request.get('sl', 0.0) or 0.0), tp=float(request.get('tp', 0.0) or 0.0),
+            magic=int(request.get('magic', 0) or 0), comment=str(request.get('comment', '')),
+        )
+        return self._result(self.TRADE_RETCODE_DONE, request, order=ticket, volume=volume, price=price)
+
+    def _fill_pending_orders(self, state: _SymbolState) -> None:
+        """⚡ Llenar limit/stop cuyo precio toca el rango de la vela"""
+        point = state.spec.point
+        slippage = self.slippage_points * point
+        ask_open, ask_high, ask_low = state.open + state.spread, state.high + state.spread, state.low + state.spread
+        for order in [o for o in self._orders.values() if o.symbol == self._symbol_of(state)]:
+            price = order.price_open
+            fill = None
+            if order.type == self.ORDER_TYPE_BUY_LIMIT and ask_low <= price:
+                fill = min(price, ask_open)
+            elif order.type == self.ORDER_TYPE_SELL_LIMIT and state.high >= price:
+                fill = max(price, state.open)
+            elif order.type == self.ORDER_TYPE_BUY_STOP and ask_high >= price:
+                fill = max(price, ask_open) + slippage
+            elif order.type == self.ORDER_TYPE_SELL_STOP and state.low <= price:
+                fill = min(price, state.open) - slippage
+            if fill is None:
+                continue
+
+            del self._orders[order.ticket]
+            result = self._open_position({
+                'symbol': order.symbol, 'volume': order.volume_initial, 'type': order.type,
+                'sl': order.sl, 'tp': order.tp, 'magic': order.magic, 'comment': order.comment,
+            }, price=fill)
+            if result.retcode == self.TRADE_RETCODE_DONE:
+                is_limit = order.type in (self.ORDER_TYPE_BUY_LIMIT, self.ORDER_TYPE_SELL_LIMIT)
+                self.stats['limit_fills' if is_limit else 'stop_fills'] += 1
+
+    def _check_stops(self, state: _SymbolState) -> None:
+        """🛑 SL/TP dentro del rango de la vela (SL primero si toca ambos)"""
+        slippage = self.slippage_points * state.spec.point
+        symbol = self._symbol_of(state)
+        for position in [p for p in self._positions.values() if p.symbol == symbol and (p.sl or p.tp)]:
+            if position.type == self.POSITION_TYPE_BUY:
+                if position.sl and state.low <= position.sl:
+                    self._realize(position, position.volume, min(position.sl, state.open) - slippage, 'sl')
+                    self.stats['sl_hits'] += 1
+                elif position.tp and state.high >= position.tp:
+                    self._realize(position, position.volume, max(position.tp, state.open), 'tp')
+                    self.stats['tp_hits'] += 1
+            else:
+                ask_open = state.open + state.spread
+                if position.sl and state.high + state.spread >= position.sl:
+                    self._realize(position, position.volume, max(position.sl, ask_open) + slippage, 'sl')
+                    self.stats['sl_hits'] += 1
+                elif position.tp and state.low + state.spread <= position.tp:
+                    self._realize(position, position.volume, min(position.tp, ask_open), 'tp')
+                    self.stats['tp_hits'] += 1
+
+    def _mark_to_market(self, symbol: str, state: _SymbolState) -> None:
+        bid, ask = state.close, state.close + state.spread
+        for position in self._positions.values():
+            if position.symbol != symbol:
+                continue
+            if position.type == self.POSITION_TYPE_BUY:
+                position.price_current = bid
+                position.profit = self._price_to_usd(state, (bid - position.price_open) * position.volume)
+            else:
+                position.price_current = ask
+                position.profit = self._price_to_usd(state, (position.price_open - ask) * position.volume)
+
+    def _realize(self, position: SimPosition, volume: float, price: float, reason: str) -> None:
+        state = self._symbols[position.symbol]
+        direction = 1.0 if position.type == self.POSITION_TYPE_BUY else -1.0
+        gross = self._price_to_usd(state, (price - position.price_open) * direction * volume)
+        commission = volume * self.commission_per_lot
+        self.balance += gross - commission
+        self.deals.append({
+            'ticket': position.ticket, 'symbol': position.symbol,
+            'type': 'BUY' if position.type == self.POSITION_TYPE_BUY else 'SELL',
+            'volume': volume, 'price_open': position.price_open, 'price_close': price,
+            'time_open': position.time, 'time_close': state.time,
+            'profit': gross, 'commission': commission, 'net_profit': gross - commission,
+            'reason': reason, 'magic': position.magic, 'comment': position.comment,
+        })
+
+        remaining = round(position.volume - volume, 8)
+        if remaining <= 0:
+            del self._positions[position.ticket]
+        else:
+            position.volume = remaining
+            self._mark_to_market(position.symbol, state)
+
+    # ===============================
+    # UTILIDADES
+    # ===============================
+
+    def _state(self, symbol: str) -> _SymbolState:
+        state = self._symbols.get(symbol)
+        if state is None:
+            state = _SymbolState(spec=self._build_spec(symbol))
+            self._symbols[symbol] = state
+        return state
+
+    def _symbol_of(self, state: _SymbolState) -> str:
+        return state.spec.name
+
+    def _build_spec(self, symbol: str) -> SimpleNamespace:
+        """📐 Especificación por defecto según el tipo de símbolo"""
+        if symbol.startswith('XAU'):
+            digits, contract = 2, 100.0
+        elif 'JPY' in symbol:
+            digits, contract = 3, 100000.0
+        else:
+            digits, contract = 5, 100000.0
+        spec = {
+            'name': symbol, 'digits': digits, 'point': 10.0 ** -digits,
+            'trade_tick_size': 10.0 ** -digits, 'trade_contract_size': contract,
+            'volume_min': 0.01, 'volume_max': 100.0, 'volume_step': 0.01,
+            'trade_stops_level': 0, 'currency_base': symbol[:3], 'currency_profit': symbol[3:6],
+            'visible': True,
+        }
+        spec.update(self.symbol_specs.get(symbol, {}))
+        return SimpleNamespace(**spec)
+
+    @staticmethod
+    def _normalize_volume(spec: SimpleNamespace, volume: Any) -> Optional[float]:
+        try:
+            volume = float(volume)
+        except (TypeError, ValueError):
+            return None
+        if volume < spec.volume_min or volume > spec.volume_max:
+            return None
+        return round(round(volume / spec.volume_step) * spec.volume_step, 8)
+
+    def usd_rate(self, currency: str) -> float:
+        """
+        💱 USD por unidad de `currency`
+
+        Usa el cierre actual de XXXUSD / USDXXX si se simula ese par y si no
+        conversion_rates. Sin tipo disponible lanza ValueError: un cruce
+        convertido 1:1 daría P&L y margen falsos (EURJPY ~150x).
+        """
+        if currency == 'USD':
+            return 1.0
+        for pair, inverse in ((f'{currency}USD', False), (f'USD{currency}', True)):
+            state = self._symbols.get(pair)
+            rate = state.close if state is not None and state.has_bar else self.conversion_rates.get(pair)
+            if rate:
+                return 1.0 / rate if inverse else float(rate)
+        raise ValueError(f"Sin tipo de conversión {currency}→USD: simular {currency}USD/USD{currency} "
+                         f"o pasar conversion_rates")
+
+    def _price_to_usd(self, state: _SymbolState, price_diff_lots: float) -> float:
+        """💱 Diferencia de precio x lotes → USD (cuentas en USD)"""
+        amount = price_diff_lots * state.spec.trade_contract_size
+        return amount * self.usd_rate(state.spec.currency_profit)
+
+    def _required_margin(self, symbol: str, volume: float, price: float) -> float:
+        """🏦 Margen en USD: nocional en la divisa base x tipo base→USD / apalancamiento"""
+        spec = self._symbols[symbol].spec
+        notional = volume * spec.trade_contract_size
+        # XXXUSD: el tipo base→USD es el propio precio de apertura
+        rate = price if spec.currency_profit == 'USD' else self.usd_rate(spec.currency_base)
+        return notional * rate / self.leverage
+
+    def _new_ticket(self) -> int:
+        ticket = self._next_ticket
+        self._next_ticket += 1
+        return ticket
+
+    def _result(self, retcode: int, request: Dict[str, Any], order: int = 0, deal: int = 0,
+                volume: float = 0.0, price: float = 0.0, comment: str = '') -> SimpleNamespace:
+        if retcode != self.TRADE_RETCODE_DONE:
+            self.stats['rejected'] += 1
+        state = self._symbols.get(request.get('symbol', ''))
+        bid = state.close if state else 0.0
+        ask = state.close + state.spread if state else 0.0
+        return SimpleNamespace(retcode=retcode, deal=deal, order=order, volume=volume, price=price,
+                               bid=bid, ask=ask, comment=comment or 'Request executed',
+                               request=dict(request))
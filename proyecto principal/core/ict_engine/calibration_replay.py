@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+⏪ CALIBRATION REPLAY - Re-scoring de patrones históricos por configuración
+===========================================================================
+
+Calibración del motor de confianza contra patrones reales y su resultado:
+
+1. build_replay_features() → pasa una sola vez cada patrón guardado por el
+   ConfidenceEngine real y cachea los factores que no dependen de la
+   configuración (base, estructura, histórico) y los candidatos POI de
+   confluencia (distancia + score ponderado) hasta la distancia máxima.
+   El histórico de cada patrón usa solo resultados anteriores a su timestamp
+2. score_replay_features() → re-scoring vectorizado para una configuración:
+   solo pesos, distancia de confluencia y multiplicadores cambian
+3. evaluate_configs()      → evalúa muchas configuraciones (grid o random
+   search) en un ProcessPoolExecutor; cada proceso recibe las features una vez
+
+Formato de un registro (dict o línea JSONL):
+    {'pattern': {...}, 'timestamp': '2025-08-01T10:15:00', 'market_context': {...}, 'poi_list': [...],
+     'current_price': 1.1, 'session': 'london', 'symbol': 'EURUSD',
+     'max_correlation': 0.0, 'outcome': 'WIN' | 'LOSS' | pnl}
+
+Versión: v1.0.0 - Calibration Replay
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import copy
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+import numpy as np
+
+PIP_SIZE = 0.0001
+DEFAULT_MAX_DISTANCE_PIPS = 30
+
+# Espacio de búsqueda por defecto (base_pattern = 1 - resto de pesos core)
+DEFAULT_SEARCH_SPACE = {
+    'poi_confluence': (0.25, 0.30, 0.35, 0.40, 0.45),
+    'historical': (0.10, 0.15, 0.20, 0.25),
+    'market_structure': (0.05, 0.10, 0.15),
+    'confluence_distance_pips': (10, 15, 20, 25, 30),
+    'session_scale': (0.95, 1.0, 1.05),
+}
+MIN_BASE_WEIGHT = 0.10
+
+
+@dataclass
+class ReplayFeatures:
+    """🧮 Factores cacheados de los patrones históricos (arrays alineados por registro)"""
+    base: np.ndarray
+    structure: np.ndarray
+    historical: np.ndarray
+    session: np.ndarray            # Nombre de sesión en minúsculas ('' sin sesión)
+    volatility: np.ndarray         # Etiqueta de volatilidad del contexto
+    max_correlation: np.ndarray
+    outcome: np.ndarray            # 1.0 ganador / 0.0 perdedor
+    poi_owner: np.ndarray          # Candidatos de confluencia: índice del registro,
+    poi_distance: np.ndarray       # distancia absoluta al POI
+    poi_weighted: np.ndarray       # y score del POI ponderado por tipo
+    max_distance_pips: float
+
+    def __len__(self) -> int:
+        return len(self.base)
+
+
+def load_replay_records(source: Union[str, Iterable[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Registros desde una lista, un JSON con una lista o un fichero JSONL"""
+    if not isinstance(source, (str, os.PathLike)):
+        return list(source)
+    with open(source, 'r', encoding='utf-8') as f:
+        if str(source).endswith('.jsonl'):
+            return [json.loads(line) for line in f if line.strip()]
+        data = json.load(f)
+    return data.get('records', []) if isinstance(data, dict) else data
+
+
+def _outcome_value(record: Dict[str, Any]) -> Optional[float]:
+    outcome = record.get('outcome')
+    if isinstance(outcome, str):
+        return {'WIN': 1.0, 'TP': 1.0, 'LOSS': 0.0, 'SL': 0.0}.get(outcome.upper())
+    if isinstance(outcome, bool):
+        return float(outcome)
+    if isinstance(outcome, (int, float)):
+        return 1.0 if outcome > 0 else 0.0
+    return None
+
+
+def _record_time(record: Dict[str, Any]) -> datetime:
+    """Instante del patrón (timestamp del registro o del patrón); sin él no hay historia previa conocida"""
+    value = record.get('timestamp') or record['pattern'].get('timestamp')
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        return value.replace(tzinfo=None) if isinstance(value, datetime) else datetime.min
+    except ValueError:
+        return datetime.min
+
+
+def build_replay_features(records: Sequence[Dict[str, Any]], engine: Any,
+                          max_distance_pips: float = DEFAULT_MAX_DISTANCE_PIPS) -> ReplayFeatures:
+    """
+    Pasa cada registro por el ConfidenceEngine una vez y cachea sus factores
+
+    El patrón se evalúa en su propio instante: no se aplica el filtro de
+    edad máxima y el peso histórico se calcula solo con los resultados
+    anteriores a ese instante (sin fuga del estado actual del analizador).
+    Registros sin resultado o sin patrón se descartan.
+    """
+    rows = [r for r in records if r.get('pattern') and _outcome_value(r) is not None]
+    count = len(rows)
+    base, structure, historical = np.zeros(count), np.zeros(count), np.zeros(count)
+    owners, distances, weights = [], [], []
+    analyzer = getattr(engine, 'historical_analyzer', None)
+    history_cache: Dict[tuple, Optional[List[Dict[str, Any]]]] = {}
+    distance_limit = max_distance_pips * PIP_SIZE
+
+    for i, record in enumerate(rows):
+        pattern = record['pattern']
+        context = record.get('market_context') or {}
+        current_price = float(record.get('current_price') or pattern.get('price', 0.0))
+        direction = np.array([str(pattern.get('direction', 'NEUTRAL'))])
+
+        base[i] = engine._batch_base_scores([pattern], np.array([float(pattern.get('strength', 60))]),
+                                            direction, context)[0]
+        structure[i] = engine._batch_structure_bonus(direction, context)[0]
+
+        # Historial leído una vez por (tipo, timeframe, símbolo) y recortado al instante de cada patrón
+        key = (pattern.get('type', 'UNKNOWN'), pattern.get('timeframe', 'M15'), record.get('symbol', 'EURUSD'))
+        if key not in history_cache:
+            history_cache[key] = analyzer.load_poi_history(*key) if analyzer else None
+        historical[i] = engine._calculate_historical_weight(
+            {'type': key[0], 'timeframe': key[1]}, key[2], as_of=_record_time(record), history=history_cache[key])
+
+        owner, distance, weighted = engine._poi_confluence_candidates(
+            np.array([float(pattern.get('price', current_price))]), record.get('poi_list') or [], distance_limit)
+        owners.append(owner + i)
+        distances.append(distance)
+        weights.append(weighted)
+
+    return ReplayFeatures(
+        base=base, structure=structure, historical=historical,
+        session=np.array([str(r.get('session') or '').lower() for r in rows], dtype=object),
+        volatility=np.array([(r.get('market_context') or {}).get('volatility', 'MEDIUM') for r in rows], dtype=object),
+        max_correlation=np.array([float(r.get('max_correlation', 0.0)) for r in rows]),
+        outcome=np.array([_outcome_value(r) for r in rows]),
+        poi_owner=np.concatenate(owners) if owners else np.zeros(0, dtype=np.int64),
+        poi_distance=np.concatenate(distances) if distances else np.zeros(0),
+        poi_weighted=np.concatenate(weights) if weights else np.zeros(0),
+        max_distance_pips=float(max_distance_pips),
+    )
+
+
+def score_replay_features(features: ReplayFeatures, config: Dict[str, Any]) -> np.ndarray:
+    """Confianza 0.0-1.0 de cada registro con `config` (misma fórmula que calculate_pattern_confidence)"""
+    from core.ict_engine.confidence_engine import ConfidenceEngine, VOLATILITY_ADJUSTMENTS
+
+    distance_pips = config['confluence_distance_pips']
+    if distance_pips > features.max_distance_pips:
+        raise ValueError(f"confluence_distance_pips={distance_pips} supera las features "
+                         f"({features.max_distance_pips} pips)")
+    confluence = ConfidenceEngine._aggregate_poi_confluence(
+        features.poi_owner, features.poi_distance, features.poi_weighted, distance_pips * PIP_SIZE, len(features))
+
+    sessions = config.get('session_multipliers', {})
+    session = np.array([sessions.get(name, 1.0) if name else 1.0 for name in features.session])
+    volatility = np.ones(len(features))
+    if config.get('volatility_adjustment', True):
+        volatility = np.array([VOLATILITY_ADJUSTMENTS.get(label, 1.0) for label in features.volatility])
+    rho = features.max_correlation
+    correlation = np.where((rho > 0) & (rho >= config['correlation_threshold']),
+                           1.0 - config['correlation_max_reduction'] * rho, 1.0)
+
+    weights = config['weights']
+    final = (
+        features.base * weights['base_pattern'] +
+        confluence * weights['poi_confluence'] +
+        features.historical * weights['historical'] +
+        features.structure * weights['market_structure']
+    ) * session * volatility * correlation
+    return np.clip(final, 0.0, 1.0)
+
+
+def evaluate_scores(scores: np.ndarray, outcomes: np.ndarray, high_threshold: float = 0.75) -> Dict[str, float]:
+    """
+    Métricas de calibración de los scores frente a los resultados reales
+
+    objective = 1 - Brier score (mayor es mejor)
+    """
+    if len(scores) == 0:
+        return {'samples': 0, 'avg_confidence': 0.0, 'brier_score': 1.0, 'objective': 0.0,
+                'high_confidence_count': 0, 'high_confidence_win_rate': 0.0, 'separation': 0.0}
+    brier = float(np.mean((scores - outcomes) ** 2))
+    high = scores >= high_threshold
+    winners, losers = outcomes == 1.0, outcomes == 0.0
+    separation = (float(scores[winners].mean()) if winners.any() else 0.0) - \
+                 (float(scores[losers].mean()) if losers.any() else 0.0)
+    return {
+        'samples': int(len(scores)),
+        'avg_confidence': float(scores.mean()),
+        'brier_score': brier,
+        'objective': 1.0 - brier,
+        'high_confidence_count': int(high.sum()),
+        'high_confidence_win_rate': float(outcomes[high].mean()) if high.any() else 0.0,
+        'separation': separation,
+    }
+
+
+def evaluate_config(features: ReplayFeatures, config: Dict[str, Any]) -> Dict[str, float]:
+    scores = score_replay_features(features, config)
+    return evaluate_scores(scores, features.outcome, config['confidence_thresholds']['high'])
+
+
+# ===============================
+# BÚSQUEDA PARALELA
+# ===============================
+
+_worker_features: Optional[ReplayFeatures] = None
+
+
+def _init_worker(features: ReplayFeatures) -> None:
+    global _worker_features
+    _worker_features = features
+
+
+def _evaluate_chunk(configs: List[Dict[str, Any]]) -> List[Dict[str, float]]:
+    return [evaluate_config(_worker_features, config) for config in configs]
+
+
+def evaluate_configs(features: ReplayFeatures, configs: Sequence[Dict[str, Any]],
+                     max_workers: Optional[int] = None) -> List[Dict[str, float]]:
+    """
+    🚀 Evalúa las configuraciones en paralelo (mismo orden que `configs`)
+
+    Las features viajan una vez a cada proceso (initializer); a cada tarea
+    solo se le envía un bloque de configuraciones. Con max_workers=1 o pocas
+    configuraciones se ejecuta en serie.
+    """
+    workers = max_workers or os.cpu_count() or 1
+    if workers <= 1 or len(configs) < 2 * workers:
+        return [evaluate_config(features, config) for config in configs]
+
+    chunk = -(-len(configs) // (workers * 4))
+    chunks = [list(configs[i:i + chunk]) for i in range(0, len(configs), chunk)]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(features,)) as pool:
+        return [metrics for block in pool.map(_evaluate_chunk, chunks) for metrics in block]
+
+
+def generate_search_configs(base_config: Dict[str, Any], method: str = 'random', samples: int = 64,
+                            seed: Optional[int] = None,
+                            search_space: Optional[Dict[str, Sequence[float]]] = None) -> List[Dict[str, Any]]:
+    """
+    🔧 Candidatas por grid search (producto completo) o random search
+
+    Los cuatro pesos core suman 1.0: base_pattern toma el resto y las
+    combinaciones con base_pattern < MIN_BASE_WEIGHT se descartan.
+    """
+    space = {**DEFAULT_SEARCH_SPACE, **(search_space or {})}
+    keys = list(space)
+    if method == 'grid':
+        combos = list(itertools.product(*(space[key] for key in keys)))
+    elif method == 'random':
+        rng = np.random.default_rng(seed)
+        combos = [tuple(rng.choice(space[key]) for key in keys) for _ in range(samples)]
+    else:
+        raise ValueError(f"Método de búsqueda desconocido: {method}")
+
+    configs, seen = [], set()
+    for combo in combos:
+        params = dict(zip(keys, (float(value) for value in combo)))
+        base_weight = round(1.0 - params['poi_confluence'] - params['historical'] - params['market_structure'], 4)
+        signature = tuple(sorted(params.items()))
+        if base_weight < MIN_BASE_WEIGHT or signature in seen:
+            continue
+        seen.add(signature)
+
+        config = copy.deepcopy(base_config)
+        config['weights'] = {**config['weights'], 'base_pattern': base_weight,
+                             'poi_confluence': params['poi_confluence'], 'historical': params['historical'],
+                             'market_structure': params['market_structure']}
+        config['confluence_distance_pips'] = params['confluence_distance_pips']
+        config['session_multipliers'] = {name: round(value * params['session_scale'], 4)
+                                         for name, value in config['session_multipliers'].items()}
+        config['description'] = (f"{method.capitalize()} POI {params['poi_confluence']:.2f} "
+                                  f"Hist {params['historical']:.2f} Estr {params['market_structure']:.2f} "
+                                  f"Dist {params['confluence_distance_pips']:g} Ses x{params['session_scale']:g}")
+        configs.append(config)
+    return configs
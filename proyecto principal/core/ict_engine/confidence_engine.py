@@ -22,6 +22,7 @@ from sistema.sic import enviar_senal_log
 # Imports del ICT Engine - manejo seguro con type checking
 from sistema.sic import Dict, List, Optional, Tuple, Any, TYPE_CHECKING
 from sistema.sic import datetime, timedelta
+from sistema.rolling_correlation import get_correlation_engine
 import numpy as np
 
 # Type checking imports para evitar conflictos
@@ -68,6 +69,8 @@ CONFIDENCE_CONFIG = {
     'min_historical_samples': 5,         # Mínimo de samples para histórico
     'max_pattern_age_minutes': 120,      # Edad máxima del patrón (2 horas)
     'volatility_adjustment': True,       # Ajuste por volatilidad
+    'correlation_threshold': 0.7,        # |ρ| a partir del cual hay exposición correlacionada
+    'correlation_max_reduction': 0.2,    # Reducción máxima de confianza con |ρ| = 1
     'session_multipliers': {
         'asian': 0.95,           # ⭐ MEJORADO: 0.85 → 0.95 (mejor asiática)
         'london': 1.25,          # ⭐ MEJORADO: 1.1 → 1.25 (mejor Londres)
@@ -84,6 +87,15 @@ CONFIDENCE_CONFIG = {
     }
 }
 
+# Ajuste de confianza por volatilidad del contexto de mercado
+VOLATILITY_ADJUSTMENTS = {
+    'VERY_HIGH': 0.85,   # Reducir confianza en alta volatilidad
+    'HIGH': 0.92,
+    'MEDIUM': 1.0,       # Sin ajuste
+    'LOW': 1.05,         # Ligero aumento en baja volatilidad
+    'VERY_LOW': 1.08,
+}
+
 # =============================================================================
 # CLASE PRINCIPAL - CONFIDENCE ENGINE
 # =============================================================================
@@ -121,6 +133,9 @@ class ConfidenceEngine:
             'last_reset': datetime.now()
         }
 
+        # Correlación rodante compartida con RiskBot y POIScoringEngine
+        self.correlation_engine = get_correlation_engine()
+
         # Inicializar analizador histórico si está disponible
         if ICTHistoricalAnalyzer:
             try:
@@ -189,6 +204,9 @@ class ConfidenceEngine:
             # 6. AJUSTE POR VOLATILIDAD (si está habilitado)
             volatility_adjustment = self._calculate_volatility_adjustment(market_context, pattern)
 
+            # 6b. EXPOSICIÓN CORRELACIONADA (posiciones abiertas en símbolos correlacionados)
+            correlation_adjustment = self._calculate_correlation_adjustment(market_context, symbol)
+
             # 7. CÁLCULO FINAL PONDERADO
             weights = self.config['weights']
             final_confidence = (
@@ -196,7 +214,7 @@ class ConfidenceEngine:
                 confluence_bonus * weights['poi_confluence'] +
                 historical_weight * weights['historical'] +
                 structure_bonus * weights['market_structure']
-            ) * session_multiplier * volatility_adjustment
+            ) * session_multiplier * volatility_adjustment * correlation_adjustment
 
             # Asegurar que esté en rango válido
             final_confidence = max(0.0, min(final_confidence, 1.0))
@@ -209,7 +227,8 @@ class ConfidenceEngine:
                 f"🎯 Confianza calculada para {pattern_type}: {final_confidence:.3f} "
                 f"(Base: {base_score:.3f}, POI: {confluence_bonus:.3f}, "
                 f"Histórico: {historical_weight:.3f}, Estructura: {structure_bonus:.3f}, "
-                f"Sesión: {session_multiplier:.2f}, Volatilidad: {volatility_adjustment:.2f})",
+                f"Sesión: {session_multiplier:.2f}, Volatilidad: {volatility_adjustment:.2f}, "
+                f"Correlación: {correlation_adjustment:.2f})",
                 __name__, "confidence_engine"
             )
 
@@ -219,6 +238,219 @@ class ConfidenceEngine:
             enviar_senal_log("ERROR", f"❌ Error crítico calculando confianza del patrón: {e}", __name__, "confidence_engine")
             return 0.0
 
+    def calculate_batch_confidence(self,
+                                   patterns: List[Dict],
+                                   market_context: Dict,
+                                   poi_list: List[Dict],
+                                   current_price: float,
+                                   current_session: Optional[str] = None,
+                                   symbol: str = 'EURUSD') -> np.ndarray:
+        """
+        ⚡ Versión por lotes de calculate_pattern_confidence para todos los patrones de un ciclo.
+
+        Mismos factores y pesos que el camino escalar, pero:
+        - Los factores del patrón se calculan como arrays numpy
+        - El rendimiento histórico se consulta una vez por (tipo, timeframe, símbolo)
+        - La confluencia POI usa búsqueda binaria sobre los precios de POI ordenados
+        - Un solo log resumen por lote en lugar de logs por patrón
+
+        Args:
+            patterns: Patrones ICT detectados en el ciclo
+            market_context: Contexto de mercado (común a todos)
+            poi_list: Lista de POIs con scores inteligentes
+            current_price: Precio actual del mercado
+            current_session: Sesión actual de trading
+            symbol: Símbolo del instrumento financiero
+
+        Returns:
+            np.ndarray: Confianza 0.0-1.0 por patrón (0.0 para patrones inválidos)
+        """
+        count = len(patterns)
+        confidences = np.zeros(count)
+        if count == 0 or not isinstance(market_context, dict) or \
+                not isinstance(current_price, (int, float)) or current_price <= 0:
+            return confidences
+
+        valid = np.array([self._pattern_is_current(p) for p in patterns], dtype=bool)
+        if not valid.any():
+            return confidences
+        rows = np.flatnonzero(valid)
+        batch = [patterns[i] for i in rows]
+
+        try:
+            strength = np.array([float(p.get('strength', 60)) for p in batch])
+            direction = np.array([str(p.get('direction', 'NEUTRAL')) for p in batch])
+            prices = np.array([float(p.get('price', current_price)) for p in batch])
+        except (TypeError, ValueError):
+            # Datos no numéricos: el camino escalar aplica sus fallbacks por patrón
+            return np.array([self.calculate_pattern_confidence(p, market_context, poi_list, current_price,
+                                                               current_session, symbol) for p in patterns])
+
+        base_score = self._batch_base_scores(batch, strength, direction, market_context)
+        confluence = self._batch_poi_confluence(prices, poi_list)
+        historical_table = self._historical_lookup_table(batch, symbol)
+        historical = np.array([historical_table[(p.get('type', 'UNKNOWN'), p.get('timeframe', 'M15'))] for p in batch])
+        structure = self._batch_structure_bonus(direction, market_context)
+
+        multiplier = (self._get_session_multiplier(current_session) *
+                      self._calculate_volatility_adjustment(market_context, {}) *
+                      self._calculate_correlation_adjustment(market_context, symbol))
+        weights = self.config['weights']
+        final = (
+            base_score * weights['base_pattern'] +
+            confluence * weights['poi_confluence'] +
+            historical * weights['historical'] +
+            structure * weights['market_structure']
+        ) * multiplier
+        confidences[rows] = np.clip(final, 0.0, 1.0)
+
+        for pattern, confidence in zip(batch, confidences[rows]):
+            self.stats['calculations_total'] += 1
+            self._update_stats(pattern.get('type', 'UNKNOWN'), float(confidence))
+
+        enviar_senal_log("INFO", f"🎯 Confianza por lote: {len(rows)}/{count} patrones válidos, "
+                                 f"media {confidences[rows].mean():.3f}, máx {confidences[rows].max():.3f}",
+                         __name__, "confidence_engine")
+        return confidences
+
+    def _pattern_is_current(self, pattern: Dict) -> bool:
+        """Validación por patrón de _validate_inputs (tipo y antigüedad), sin logs por patrón"""
+        if not isinstance(pattern, dict) or not pattern:
+            return False
+        pattern_timestamp = pattern.get('timestamp')
+        if not pattern_timestamp:
+            return True
+        try:
+            if isinstance(pattern_timestamp, str):
+                pattern_time = datetime.fromisoformat(pattern_timestamp.replace('Z', '+00:00'))
+            else:
+                pattern_time = pattern_timestamp
+            age_minutes = (datetime.now() - pattern_time.replace(tzinfo=None)).total_seconds() / 60
+            return age_minutes <= self.config['max_pattern_age_minutes']
+        except Exception:
+            return True
+
+    def _batch_base_scores(self, patterns: List[Dict], strength: np.ndarray, direction: np.ndarray,
+                           market_context: Dict) -> np.ndarray:
+        """Versión vectorizada de _calculate_base_pattern_score (mismo orden de sumas)"""
+        base = np.full(len(patterns), 0.5)
+        base += np.select([strength >= 85, strength >= 75, strength >= 65, strength >= 55],
+                          [0.20, 0.15, 0.10, 0.05], 0.0)
+
+        structure_quality = market_context.get('structure_quality', 'MEDIUM')
+        base += {'HIGH': 0.15, 'MEDIUM': 0.08, 'LOW': 0.02}.get(structure_quality, 0.0)
+
+        h4_bias = market_context.get('h4_bias', 'NEUTRAL')
+        if h4_bias != 'NEUTRAL':
+            base += np.where(direction == h4_bias, 0.12, -0.08)
+
+        base += np.array([0.08 if p.get('timeframe_confirmation', False) else 0.0 for p in patterns])
+        base += np.array([{'HIGH': 0.10, 'MEDIUM': 0.05}.get(p.get('detection_quality', 'MEDIUM'), 0.0)
+                          for p in patterns])
+        return np.minimum(base, 1.0)
+
+    def _batch_poi_confluence(self, pattern_prices: np.ndarray, poi_list: List[Dict]) -> np.ndarray:
+        """
+        Versión vectorizada de _calculate_poi_confluence.
+
+        Los POI válidos se ordenan por precio una vez; cada patrón toma con
+        searchsorted la ventana [precio - distancia, precio + distancia] y los
+        agregados (mejor, suma, cantidad) se calculan con bincount.
+        """
+        distance_limit = self.config['confluence_distance_pips'] * 0.0001
+        owner, distance, weighted = self._poi_confluence_candidates(pattern_prices, poi_list, distance_limit)
+        return self._aggregate_poi_confluence(owner, distance, weighted, distance_limit, len(pattern_prices))
+
+    def _poi_confluence_candidates(self, pattern_prices: np.ndarray, poi_list: List[Dict],
+                                   distance_limit: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Pares (patrón, POI) dentro de `distance_limit`: índice del patrón,
+        distancia absoluta y score del POI ya ponderado por tipo.
+        """
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0), np.zeros(0))
+        n = len(pattern_prices)
+        if not poi_list or n == 0:
+            return empty
+
+        poi_prices, poi_scores, poi_multipliers = [], [], []
+        for poi in poi_list:
+            try:
+                price = poi.get('price', 0)
+                score = poi.get('intelligent_score', 0) / 100.0
+                if price <= 0 or score <= 0:
+                    continue
+                poi_prices.append(float(price))
+                poi_scores.append(score)
+                poi_multipliers.append(self._get_poi_type_multiplier(poi.get('type', 'UNKNOWN')))
+            except Exception:
+                continue
+        if not poi_prices:
+            return empty
+
+        order = np.argsort(poi_prices, kind='stable')
+        sorted_prices = np.asarray(poi_prices)[order]
+        weighted_scores = (np.asarray(poi_scores) * np.asarray(poi_multipliers))[order]
+
+        # Ventana ampliada un elemento por lado; el filtro exacto (<=) se aplica abajo
+        left = np.maximum(np.searchsorted(sorted_prices, pattern_prices - distance_limit, 'left') - 1, 0)
+        right = np.minimum(np.searchsorted(sorted_prices, pattern_prices + distance_limit, 'right') + 1,
+                           len(sorted_prices))
+        spans = np.maximum(right - left, 0)
+        owner = np.repeat(np.arange(n), spans)
+        starts = np.repeat(left - np.concatenate(([0], np.cumsum(spans)[:-1])), spans)
+        index = starts + np.arange(spans.sum())
+
+        distance = np.abs(pattern_prices[owner] - sorted_prices[index])
+        inside = distance <= distance_limit
+        return owner[inside], distance[inside], weighted_scores[index][inside]
+
+    @staticmethod
+    def _aggregate_poi_confluence(owner: np.ndarray, distance: np.ndarray, weighted: np.ndarray,
+                                  distance_limit: float, n: int) -> np.ndarray:
+        """Mejor score, media y bonus por cantidad de los POI dentro de `distance_limit` por patrón"""
+        inside = distance <= distance_limit
+        owner, scores = owner[inside], weighted[inside] * (1.0 - distance[inside] / distance_limit)
+
+        found = np.bincount(owner, minlength=n).astype(float)
+        total = np.bincount(owner, weights=scores, minlength=n)
+        best = np.zeros(n)
+        np.maximum.at(best, owner, scores)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = np.where(found > 0, total / found, 0.0)
+        result = best * 0.7 + average * 0.3
+        result += np.where(found > 1, np.minimum(found * 0.05, 0.2), 0.0)
+        return np.where(found > 0, np.minimum(result, 1.0), 0.0)
+
+    def _historical_lookup_table(self, patterns: List[Dict], symbol: str) -> Dict[Tuple[str, str], float]:
+        """Una consulta al analizador histórico por (tipo, timeframe) del lote"""
+        keys = {(p.get('type', 'UNKNOWN'), p.get('timeframe', 'M15')) for p in patterns}
+        return {key: self._calculate_historical_weight({'type': key[0], 'timeframe': key[1]}, symbol)
+                for key in keys}
+
+    def _batch_structure_bonus(self, direction: np.ndarray, market_context: Dict) -> np.ndarray:
+        """Versión vectorizada de _calculate_structure_bonus (mismo orden de sumas)"""
+        bonus = np.full(len(direction), 0.5)
+
+        market_trend = market_context.get('trend', 'NEUTRAL')
+        if market_trend != 'NEUTRAL':
+            bonus += np.where(direction == market_trend, 0.15, 0.0)
+
+        bonus += {'STRONG': 0.10, 'MEDIUM': 0.05}.get(market_context.get('trend_strength', 'MEDIUM'), 0.0)
+
+        sr_level = market_context.get('sr_level', 'NONE')
+        if sr_level in ['MAJOR', 'SIGNIFICANT']:
+            bonus += 0.12
+        elif sr_level in ['MINOR', 'WEAK']:
+            bonus += 0.06
+
+        momentum = market_context.get('momentum', 'NEUTRAL')
+        if momentum == 'STRONG_BULLISH':
+            bonus += np.where(direction == 'BULLISH', 0.08, 0.0)
+        elif momentum == 'STRONG_BEARISH':
+            bonus += np.where(direction == 'BEARISH', 0.08, 0.0)
+        return np.minimum(bonus, 1.0)
+
     def _validate_inputs(self, pattern: Dict, market_context: Dict, current_price: float) -> bool:
         """
         🔍 Valida que las entradas sean correctas y completas
@@ -435,13 +667,18 @@ class ConfidenceEngine:
         }
         return multipliers.get(poi_type.upper(), 0.8)
 
-    def _calculate_historical_weight(self, pattern: Dict, symbol: str = 'EURUSD') -> float:
+    def _calculate_historical_weight(self, pattern: Dict, symbol: str = 'EURUSD',
+                                     as_of: Optional[datetime] = None,
+                                     history: Optional[List[Dict]] = None) -> float:
         """
         📈 Calcula ponderación basada en rendimiento histórico del tipo de patrón.
 
         Args:
             pattern: Patrón a analizar
             symbol: Símbolo del instrumento
+            as_of: Instante del patrón en un replay: solo cuenta el historial
+                   anterior (None = rendimiento actual)
+            history: Historial ya cargado para el replay (None = leer los logs)
 
         Returns:
             float: Peso histórico entre 0.0 y 1.0
@@ -454,11 +691,16 @@ class ConfidenceEngine:
                 return 0.6  # Score neutro como fallback
 
             # Usar el analizador histórico para obtener rendimiento
-            historical_performance = self.historical_analyzer.get_historical_poi_performance(
-                pattern_type,
-                pattern.get('timeframe', 'M15'),
-                symbol
-            )
+            if as_of is not None:
+                historical_performance = self.historical_analyzer.get_historical_poi_performance_as_of(
+                    pattern_type, as_of, history, pattern.get('timeframe', 'M15'), symbol
+                )
+            else:
+                historical_performance = self.historical_analyzer.get_historical_poi_performance(
+                    pattern_type,
+                    pattern.get('timeframe', 'M15'),
+                    symbol
+                )
 
             # Convertir a score 0-1 (asumiendo que histórico retorna 0-100)
             if isinstance(historical_performance, (int, float)):
@@ -539,23 +781,31 @@ class ConfidenceEngine:
             volatility = market_context.get('volatility', 'MEDIUM')
 
             # Ajustes basados en volatilidad
-            if volatility == 'VERY_HIGH':
-                return 0.85  # Reducir confianza en alta volatilidad
-            elif volatility == 'HIGH':
-                return 0.92
-            elif volatility == 'MEDIUM':
-                return 1.0   # Sin ajuste
-            elif volatility == 'LOW':
-                return 1.05  # Ligero aumento en baja volatilidad
-            elif volatility == 'VERY_LOW':
-                return 1.08
-            else:
-                return 1.0
+            return VOLATILITY_ADJUSTMENTS.get(volatility, 1.0)
 
         except Exception as e:
             enviar_senal_log("ERROR", f"Error calculando ajuste de volatilidad: {e}", __name__, "confidence_engine")
             return 1.0
 
+    def _calculate_correlation_adjustment(self, market_context: Dict, symbol: str) -> float:
+        """
+        🔗 Reduce la confianza si ya hay posiciones abiertas en símbolos correlacionados
+
+        Args:
+            market_context: Contexto con 'open_symbols' (símbolos con posición abierta)
+            symbol: Símbolo del patrón
+
+        Returns:
+            float: Multiplicador entre (1 - correlation_max_reduction) y 1.0
+        """
+        open_symbols = market_context.get('open_symbols') if isinstance(market_context, dict) else None
+        if not open_symbols:
+            return 1.0
+        _, max_rho = self.correlation_engine.max_abs_correlation(symbol, open_symbols)
+        if max_rho < self.config['correlation_threshold']:
+            return 1.0
+        return 1.0 - self.config['correlation_max_reduction'] * max_rho
+
     def _get_session_multiplier(self, current_session: Optional[str]) -> float:
         """
         🕐 Obtiene multiplicador de confianza basado en la sesión actual.
@@ -928,6 +1178,26 @@ def calculate_pattern_confidence(pattern: Dict,
         enviar_senal_log("ERROR", f"Error en función de conveniencia calculate_pattern_confidence: {e}", __name__, "confidence_engine")
         return 0.0
 
+def calculate_batch_confidence(patterns: List[Dict],
+                               market_context: Dict,
+                               poi_list: List[Dict],
+                               current_price: float,
+                               current_session: Optional[str] = None,
+                               symbol: str = 'EURUSD') -> List[float]:
+    """
+    ⚡ Función de conveniencia para calcular la confianza de todos los patrones de un ciclo.
+
+    Returns:
+        List[float]: Scores de confianza (0.0-1.0) en el orden de `patterns`
+    """
+    try:
+        return confidence_engine.calculate_batch_confidence(
+            patterns, market_context, poi_list, current_price, current_session, symbol
+        ).tolist()
+    except Exception as e:
+        enviar_senal_log("ERROR", f"Error en función de conveniencia calculate_batch_confidence: {e}", __name__, "confidence_engine")
+        return [0.0] * len(patterns)
+
 def generate_confidence_report(pattern: Dict, confidence_score: float) -> Dict:
     """
     📋 Función de conveniencia para generar reporte de confianza.
@@ -986,8 +1256,10 @@ def update_engine_config(new_config: Dict) -> bool:
 __all__ = [
     'ConfidenceEngine',
     'CONFIDENCE_CONFIG',
+    'VOLATILITY_ADJUSTMENTS',
     'confidence_engine',
     'calculate_pattern_confidence',
+    'calculate_batch_confidence',
     'generate_confidence_report',
     'get_engine_stats',
     'update_engine_config'
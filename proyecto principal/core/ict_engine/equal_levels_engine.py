@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+💧 EQUAL LEVELS ENGINE - Equal Highs / Equal Lows
+=================================================
+
+Motor de detección de Equal Highs / Equal Lows para el Liquidity Engine de
+ICTDetector. La implementación es core/analysis/equal_levels_engine.py del
+árbol v6.0 Enterprise; este módulo la carga con su propio nombre para que
+ambos árboles usen el mismo motor.
+
+Versión: v1.0.0
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('core/analysis/equal_levels_engine.py', __name__)
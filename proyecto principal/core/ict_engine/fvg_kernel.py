@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+📏 FVG KERNEL - Fair Value Gaps vectorizados
+============================================
+
+Kernel de Fair Value Gaps para detectar_fair_value_gaps_local (ICTDetector)
+y detectar_fair_value_gaps (poi_detector). La implementación es
+core/analysis/fvg_kernel.py del árbol v6.0 Enterprise; este módulo la carga
+con su propio nombre para que ambos árboles usen el mismo kernel.
+
+Versión: v1.0.0
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('core/analysis/fvg_kernel.py', __name__)
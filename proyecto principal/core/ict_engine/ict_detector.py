@@ -33,6 +33,22 @@ except ImportError:
     FractalAnalyzer = None
     FractalAnalyzer_available = False
 
+try:
+    from sistema.session_calendar import get_session_calendar
+    SessionCalendar_available = True
+except ImportError:
+    get_session_calendar = None
+    SessionCalendar_available = False
+
+from core.ict_engine.fvg_kernel import BULLISH, scan_fair_value_gaps
+
+try:
+    from core.ict_engine.equal_levels_engine import EqualLevelsEngine
+    EqualLevelsEngine_available = True
+except ImportError:
+    EqualLevelsEngine = None
+    EqualLevelsEngine_available = False
+
 """
 📊 ICT DETECTOR - Sistema Consolidado de Análisis ICT
 ====================================================
@@ -1127,44 +1143,25 @@ def detectar_fair_value_gaps_local(df):
         if df is None or len(df) < 3:
             return []
 
-        fvgs = []
-
-        for i in range(1, len(df) - 1):
-            prev_candle = df.iloc[i-1]
-            current_candle = df.iloc[i]
-            next_candle = df.iloc[i+1]
-
-            # FVG Alcista: gap entre prev_high y next_low
-            if (prev_candle['high'] < next_candle['low'] and
-                current_candle['close'] > current_candle['open']):  # Vela alcista
-
-                gap_size = next_candle['low'] - prev_candle['high']
-                if gap_size > ICT_CONFIG['fvg_gap_threshold']:
-                    fvgs.append({
-                        'type': 'BULLISH_FVG',
-                        'high': next_candle['low'],
-                        'low': prev_candle['high'],
-                        'gap_size': gap_size,
-                        'index': i,
-                        'time': df.index[i],
-                        'mitigated': False
-                    })
+        # Kernel vectorizado: gap entre velas i-1 e i+1, vela central en la dirección del gap
+        records = scan_fair_value_gaps(
+            df['high'].to_numpy(), df['low'].to_numpy(), df['open'].to_numpy(), df['close'].to_numpy(),
+            min_size=ICT_CONFIG['fvg_gap_threshold'], inclusive=False, require_body=True,
+            track_mitigation=False
+        )
 
-            # FVG Bajista: gap entre prev_low y next_high
-            elif (prev_candle['low'] > next_candle['high'] and
-                  current_candle['close'] < current_candle['open']):  # Vela bajista
-
-                gap_size = prev_candle['low'] - next_candle['high']
-                if gap_size > ICT_CONFIG['fvg_gap_threshold']:
-                    fvgs.append({
-                        'type': 'BEARISH_FVG',
-                        'high': prev_candle['low'],
-                        'low': next_candle['high'],
-                        'gap_size': gap_size,
-                        'index': i,
-                        'time': df.index[i],
-                        'mitigated': False
-                    })
+        fvgs = []
+        for record in records:
+            i = int(record['index'])
+            fvgs.append({
+                'type': 'BULLISH_FVG' if record['direction'] == BULLISH else 'BEARISH_FVG',
+                'high': float(record['top']),
+                'low': float(record['bottom']),
+                'gap_size': float(record['size']),
+                'index': i,
+                'time': df.index[i],
+                'mitigated': False
+            })
 
         return fvgs
 
@@ -1274,6 +1271,9 @@ class ICTDetector:
             'order_block_lookback': 10
         }
 
+        # Motor de Equal Highs/Lows del Liquidity Engine (un pool único por nivel)
+        self._equal_levels_engine = EqualLevelsEngine(extreme_window=1) if EqualLevelsEngine_available else None
+
         enviar_senal_log("INFO", "🚀 [ICTDETECTOR] Implementación real inicializada (SPRINT 1.2)", __name__, "general")
         enviar_senal_log("DEBUG", "ICTDetector listo para análisis completo de patrones ICT", __name__, "general")
         enviar_senal_log("INFO", f"⚙️ Configuración cargada: threshold={self.config['min_confidence_threshold']}", __name__, "general")
@@ -2057,11 +2057,15 @@ class ICTDetector:
                                f"🕐 Sesión detectada: {session_name} | Activa: {is_active} | Killzone: {is_killzone}",
                                __name__, "session_detection")
 
+                overlap = (SessionCalendar_available and
+                           get_session_calendar().current_labels()['overlap'] != 'NONE')
+
                 return {
                     'session': session_name,
                     'is_active': is_active,
                     'volatility': volatility,
                     'is_killzone': is_killzone,
+                    'overlap': overlap,
                     'activity_level': volatility
                 }
             else:
@@ -2075,13 +2079,17 @@ class ICTDetector:
     def _is_killzone_active(self, session_name: str) -> bool:
         """
         Determina si estamos en killzone ICT
-        London Killzone: 2-5 AM EST (7-10 UTC)
-        NY Killzone: 8-11 AM EST (13-16 UTC)
+        London Killzone: 08:00-11:00 hora de Londres
+        NY Killzone: 08:00-11:00 hora de Nueva York
+        (calendario de sesiones, con cambio de horario automático)
         """
         try:
-            current_utc = datetime.now(timezone.utc)
-            current_hour = current_utc.hour
+            if SessionCalendar_available:
+                killzone = get_session_calendar().current_labels()['killzone']
+                return killzone == {'LONDON': 'LONDON_KILLZONE',
+                                    'NEW_YORK': 'NEWYORK_KILLZONE'}.get(session_name)
 
+            current_hour = datetime.now(timezone.utc).hour
             if session_name == 'LONDON':
                 # London Killzone: 7-10 UTC (2-5 AM EST)
                 return 7 <= current_hour <= 10
@@ -2095,6 +2103,12 @@ class ICTDetector:
             enviar_senal_log("ERROR", f"🕐 Error detectando killzone: {e}", __name__, "session_detection")
             return False
 
+    def get_session_labels(self, candles: pd.DataFrame) -> Optional[pd.DataFrame]:
+        """Etiquetas session/killzone/overlap por vela (calendario vectorizado, cacheado por frame)"""
+        if not SessionCalendar_available or candles is None or not isinstance(candles.index, pd.DatetimeIndex):
+            return None
+        return get_session_calendar('broker').annotate(candles)  # Velas MT5: hora del broker
+
     def _analyze_bias_confirmation_factors(self, candles, h4_bias, m15_bias) -> List[str]:
         """Analiza factores de confirmación de bias"""
         return ['price_action', 'volume_profile', 'market_structure']
@@ -2343,41 +2357,7 @@ class ICTDetector:
         Estos son zonas prime para stop hunts institucionales
         """
         try:
-            equal_highs = []
-            highs = df['high'].values
-            current_price = df['close'].iloc[-1]
-
-            # Buscar niveles tocados múltiples veces
-            for i in range(len(highs) - 10, len(highs) - 1):  # Últimas 10 velas
-                if i < 5:  # Necesitamos contexto previo
-                    continue
-
-                current_high = highs[i]
-
-                # Contar cuántas veces se ha tocado este nivel
-                tolerance = tolerance_pips * 0.00001  # Convertir pips a precio
-                touches = 0
-
-                for j in range(max(0, i-20), len(highs)):  # Buscar en 20 velas
-                    if abs(highs[j] - current_high) <= tolerance:
-                        touches += 1
-
-                # Si se ha tocado 2+ veces, es zona de liquidez
-                if touches >= 2:
-                    distance_pips = abs(current_price - current_high) / 0.00001
-
-                    equal_highs.append({
-                        'type': 'EQUAL_HIGHS',
-                        'level': current_high,
-                        'touches': touches,
-                        'distance_pips': distance_pips,
-                        'strength': min(touches * 25, 100),  # Max 100%
-                        'side': 'RESISTANCE',
-                        'freshness': 'FRESH' if distance_pips > 10 else 'CLOSE',
-                        'candle_index': i,
-                        'description': f"Equal Highs @ {current_high:.5f} ({touches} touches)"
-                    })
-
+            equal_highs = self._find_equal_levels(df, 'HIGH', tolerance_pips)
             enviar_senal_log("DEBUG", f"Equal Highs detectados: {len(equal_highs)}", __name__, "liquidity")
             return equal_highs
 
@@ -2391,41 +2371,7 @@ class ICTDetector:
         Zonas prime para stop hunts en el lado de compra
         """
         try:
-            equal_lows = []
-            lows = df['low'].values
-            current_price = df['close'].iloc[-1]
-
-            # Buscar niveles tocados múltiples veces
-            for i in range(len(lows) - 10, len(lows) - 1):  # Últimas 10 velas
-                if i < 5:  # Necesitamos contexto previo
-                    continue
-
-                current_low = lows[i]
-
-                # Contar cuántas veces se ha tocado este nivel
-                tolerance = tolerance_pips * 0.00001  # Convertir pips a precio
-                touches = 0
-
-                for j in range(max(0, i-20), len(lows)):  # Buscar en 20 velas
-                    if abs(lows[j] - current_low) <= tolerance:
-                        touches += 1
-
-                # Si se ha tocado 2+ veces, es zona de liquidez
-                if touches >= 2:
-                    distance_pips = abs(current_price - current_low) / 0.00001
-
-                    equal_lows.append({
-                        'type': 'EQUAL_LOWS',
-                        'level': current_low,
-                        'touches': touches,
-                        'distance_pips': distance_pips,
-                        'strength': min(touches * 25, 100),  # Max 100%
-                        'side': 'SUPPORT',
-                        'freshness': 'FRESH' if distance_pips > 10 else 'CLOSE',
-                        'candle_index': i,
-                        'description': f"Equal Lows @ {current_low:.5f} ({touches} touches)"
-                    })
-
+            equal_lows = self._find_equal_levels(df, 'LOW', tolerance_pips)
             enviar_senal_log("DEBUG", f"Equal Lows detectados: {len(equal_lows)}", __name__, "liquidity")
             return equal_lows
 
@@ -2433,6 +2379,47 @@ class ICTDetector:
             enviar_senal_log("ERROR", f"Error detectando Equal Lows: {e}", __name__, "liquidity")
             return []
 
+    def _find_equal_levels(self, df: pd.DataFrame, side: str, tolerance_pips: float) -> List[Dict[str, Any]]:
+        """
+        Niveles iguales con toques en las últimas 10 velas, buscando en las 30
+        velas previas y con toques a 20 velas como máximo entre sí. Un único
+        registro por nivel (antes uno por vela).
+        """
+        if self._equal_levels_engine is None or len(df) < 11:
+            return []
+
+        is_high = side == 'HIGH'
+        lookback_start = max(0, len(df) - 30)
+        recent_start = len(df) - 10
+        values = df['high' if is_high else 'low'].values[lookback_start:]
+        current_price = df['close'].iloc[-1]
+        tolerance = tolerance_pips * 0.00001  # Convertir pips a precio
+
+        levels = []
+        for pool in self._equal_levels_engine.find_levels(values, side, tolerance=tolerance, min_touches=2,
+                                                          max_bar_distance=20):
+            # Necesita al menos un toque reciente (excluyendo la vela en formación)
+            recent_touches = [lookback_start + i for i in pool.indices
+                              if recent_start <= lookback_start + i < len(df) - 1]
+            if not recent_touches:
+                continue
+
+            distance_pips = abs(current_price - pool.level) / 0.00001
+            label = 'Equal Highs' if is_high else 'Equal Lows'
+            levels.append({
+                'type': 'EQUAL_HIGHS' if is_high else 'EQUAL_LOWS',
+                'level': pool.level,
+                'touches': pool.touches,
+                'distance_pips': distance_pips,
+                'strength': min(pool.touches * 25, 100),  # Max 100%
+                'side': 'RESISTANCE' if is_high else 'SUPPORT',
+                'freshness': 'FRESH' if distance_pips > 10 else 'CLOSE',
+                'candle_index': recent_touches[-1],
+                'description': f"{label} @ {pool.level:.5f} ({pool.touches} touches)"
+            })
+
+        return levels
+
     def _find_session_liquidity_zones(self, df: pd.DataFrame) -> List[Dict[str, Any]]:
         """
         Detecta zonas de liquidez en extremos de sesión
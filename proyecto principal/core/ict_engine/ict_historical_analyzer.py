@@ -110,6 +110,40 @@ class ICTHistoricalAnalyzer:
             self.cache[cache_key] = weight
             return weight
 
+    def get_historical_poi_performance_as_of(self, poi_type: str, as_of: datetime,
+                                             entries: Optional[List[Dict]] = None, timeframe: str = "M15",
+                                             symbol: str = "EURUSD") -> float:
+        """
+        Factor de ponderación histórico tal como se conocía en `as_of` (replay/calibración).
+
+        Solo cuenta entradas con timestamp anterior a `as_of` y dentro del
+        lookback medido desde ese instante; el decaimiento temporal también se
+        mide desde `as_of`. No usa ni modifica la cache del modo en vivo.
+
+        Args:
+            poi_type: Tipo de POI
+            as_of: Instante del patrón re-evaluado
+            entries: Historial ya cargado con load_poi_history() (None = leer los logs)
+            timeframe: Marco temporal (solo si entries es None)
+            symbol: Símbolo del mercado (solo si entries es None)
+
+        Returns:
+            float: Factor de ponderación (mismas reglas que get_historical_poi_performance)
+        """
+        if entries is None:
+            entries = self.load_poi_history(poi_type, timeframe, symbol)
+        as_of = as_of.replace(tzinfo=None)
+        lookback = timedelta(days=self.config['max_lookback_days'])
+        cutoff_date = as_of - lookback if as_of - datetime.min > lookback else datetime.min
+        known = [entry for entry in entries if cutoff_date <= (self._entry_date(entry) or datetime.min) < as_of]
+
+        if len(known) < self.config['min_samples']:
+            return self.config['weight_multipliers'].get(poi_type, 1.0)
+
+        success_rate = self._calculate_success_rate(known)
+        time_weighted_rate = self._apply_time_decay(known, success_rate, now=as_of)
+        return self._success_rate_to_weight(time_weighted_rate, poi_type)
+
     def get_poi_confidence_score(self, poi_data: Dict) -> float:
         """
         Calcula un score de confianza basado en análisis histórico.
@@ -211,7 +245,30 @@ class ICTHistoricalAnalyzer:
             return {'error': f'Error generando reporte: {str(e)}'}
 
     def _load_historical_logs(self, poi_type: str, timeframe: str, symbol: str) -> List[Dict]:
-        """Carga logs históricos filtrados por tipo de POI."""
+        """Carga logs históricos filtrados por tipo de POI (últimos N días)."""
+        try:
+            logs = self.load_poi_history(poi_type, timeframe, symbol)
+
+            # Filtrar por fecha (últimos N días)
+            cutoff_date = datetime.now() - timedelta(days=self.config['max_lookback_days'])
+
+            filtered_logs = []
+            for entry in logs:
+                try:
+                    entry_date = datetime.fromisoformat(entry.get('timestamp', '').replace('Z', '+00:00'))
+                    if entry_date >= cutoff_date:
+                        filtered_logs.append(entry)
+                except (ValueError, TypeError):
+                    continue
+
+            return filtered_logs
+
+        except (JSONDecodeError, ValueError) as e:
+            enviar_senal_log("ERROR", f"Error cargando logs históricos: {e}", __name__, "general")
+            return []
+
+    def load_poi_history(self, poi_type: str, timeframe: str, symbol: str) -> List[Dict]:
+        """Todas las entradas de logs de un tipo de POI, sin filtro de fecha."""
         logs = []
 
         try:
@@ -248,19 +305,7 @@ class ICTHistoricalAnalyzer:
                 except (json.JSONDecodeError, FileNotFoundError):
                     continue
 
-            # Filtrar por fecha (últimos N días)
-            cutoff_date = datetime.now() - timedelta(days=self.config['max_lookback_days'])
-
-            filtered_logs = []
-            for entry in logs:
-                try:
-                    entry_date = datetime.fromisoformat(entry.get('timestamp', '').replace('Z', '+00:00'))
-                    if entry_date >= cutoff_date:
-                        filtered_logs.append(entry)
-                except (ValueError, TypeError):
-                    continue
-
-            return filtered_logs
+            return logs
 
         except (JSONDecodeError, ValueError) as e:
             enviar_senal_log("ERROR", f"Error cargando logs históricos: {e}", __name__, "general")
@@ -324,12 +369,12 @@ class ICTHistoricalAnalyzer:
         successes = sum(1 for entry in entries if entry.get('success', False))
         return successes / len(entries)
 
-    def _apply_time_decay(self, entries: List[Dict], base_rate: float) -> float:
-        """Aplica decaimiento temporal a la tasa de éxito."""
+    def _apply_time_decay(self, entries: List[Dict], base_rate: float, now: Optional[datetime] = None) -> float:
+        """Aplica decaimiento temporal a la tasa de éxito (edad medida desde `now`)."""
         if not entries:
             return base_rate
 
-        now = datetime.now()
+        now = now or datetime.now()
         weighted_sum = 0
         total_weight = 0
 
@@ -348,6 +393,14 @@ class ICTHistoricalAnalyzer:
 
         return weighted_sum / total_weight if total_weight > 0 else base_rate
 
+    @staticmethod
+    def _entry_date(entry: Dict) -> Optional[datetime]:
+        """Timestamp de una entrada como datetime naive (None si falta o no es válido)."""
+        try:
+            return datetime.fromisoformat(entry.get('timestamp', '').replace('Z', '+00:00')).replace(tzinfo=None)
+        except (ValueError, TypeError, AttributeError):
+            return None
+
     def _success_rate_to_weight(self, success_rate: float, poi_type: str) -> float:
         """Convierte tasa de éxito a factor de ponderación."""
         base_multiplier = self.config['weight_multipliers'].get(poi_type, 1.0)
@@ -6,7 +6,11 @@ Módulo para gestionar órdenes límite automáticas basadas en análisis ICT y
 Puede crear, actualizar y cancelar órdenes límite según las condiciones del mercado.
 """
 
-import MetaTrader5 as mt5
+# MetaTrader5 es opcional: sin terminal (backtest) el bróker llega por set_backtest_mode()
+try:
+    import MetaTrader5 as mt5
+except ImportError:
+    mt5 = None
 from sistema.sic import datetime
 from sistema.sic import Optional
 from sistema.sic import time
@@ -17,6 +21,7 @@ from sistema.sic import enviar_senal_log, log_info as log_info
 
 # RiskBot para cálculo dinámico de volumen
 from core.risk_management.riskbot_mt5 import RiskBot
+from core.order_book_mirror import OrderBookMirror
 
 # MT5 Connector - Import condicional
 mt5_connector_available = False
@@ -72,10 +77,18 @@ class LimitOrderManager:
             return
 
         self.symbol = symbol
+        self.broker = mt5  # MetaTrader5 en vivo o SimulatedBroker en backtest
+        self.backtest_mode = False
+        self.tick_feed = None  # TickFeed en vivo (attach_tick_feed)
         self.active_orders = {}  # Almacena órdenes activas
         self.last_analysis = {}  # Último análisis para comparar cambios
         self.update_threshold_pips = 10  # Umbral mínimo para actualizar órdenes (en pips)
         self.max_orders = 4  # Máximo número de órdenes pendientes (2 conservadoras + 2 agresivas)
+        self.grid_magic_number = 12345  # Magic del grid Bollinger (sus órdenes no se tocan)
+
+        # Espejo local de órdenes/posiciones: una lectura del terminal por reconciliación
+        # y cambios del ciclo enviados en un solo lote
+        self.book = OrderBookMirror(self.broker, self.symbol, reconcile_interval=5.0)
 
         # 🔍 DIAGNÓSTICO MT5 API - Verificar métodos disponibles
         self._diagnose_mt5_api()
@@ -108,6 +121,46 @@ class LimitOrderManager:
         # Marcar como inicializado
         self._initialized = True
 
+    def set_backtest_mode(self, sim_broker, symbol: Optional[str] = None):
+        """
+        Conecta el gestor (y su RiskBot) a un bróker simulado para backtesting.
+        Las órdenes límite se colocan y ejecutan contra las velas del backtest.
+        """
+        self.broker = sim_broker
+        self.backtest_mode = True
+        if symbol:
+            self.symbol = symbol
+        self.active_orders.clear()
+        self.last_analysis = {}
+        self.book.rebind(sim_broker, self.symbol, reconcile_interval=0.0)  # Los llenados ocurren en cada vela
+        if self.riskbot:
+            self.riskbot.set_backtest_mode(sim_broker)
+        enviar_senal_log("INFO", f"LimitOrderManager en modo backtest ({self.symbol})", __name__, "trading")
+
+    def attach_tick_feed(self, tick_feed):
+        """
+        Comparte un TickFeed (utils.tick_buffer) con el gestor y su RiskBot.
+        Sin precio explícito, analyze_and_place_orders usa el último tick del anillo.
+        """
+        self.tick_feed = tick_feed
+        if self.riskbot:
+            self.riskbot.attach_tick_feed(tick_feed)
+
+    def _live_price(self) -> Optional[float]:
+        """Precio medio del último tick en memoria (None sin feed o sin ticks)"""
+        if self.tick_feed is None or self.backtest_mode or not self.tick_feed.is_running:
+            return None
+        tick = self.tick_feed.latest(self.symbol)
+        if tick is None or not tick.bid:
+            return None
+        return (tick.bid + tick.ask) / 2 if tick.ask else tick.bid
+
+    def _now(self) -> datetime:
+        """Hora de referencia para la antigüedad de órdenes (vela simulada en backtest)."""
+        if self.backtest_mode:
+            return self.broker.current_time().replace(tzinfo=None)
+        return datetime.now()
+
     def get_dynamic_volume(self) -> float:
         """
         Obtiene volumen dinámico basado en balance y riesgo.
@@ -134,13 +187,13 @@ class LimitOrderManager:
     def _diagnose_mt5_api(self):
         """🔍 DIAGNÓSTICO: Verificar métodos MT5 disponibles"""
         try:
-            mt5_methods = [attr for attr in dir(mt5) if not attr.startswith('_')]
+            mt5_methods = [attr for attr in dir(self.broker) if not attr.startswith('_')]
             enviar_senal_log("DEBUG", f"Métodos MT5 disponibles: {mt5_methods}", __name__, "mt5")
 
             # Verificar métodos críticos
             critical_methods = ['symbol_info', 'order_send', 'orders_get', 'positions_get']
             for method in critical_methods:
-                if hasattr(mt5, method):
+                if hasattr(self.broker, method):
                     enviar_senal_log("DEBUG", f"✅ MT5.{method} DISPONIBLE", __name__, "mt5")
                 else:
                     enviar_senal_log("WARNING", f"❌ MT5.{method} NO DISPONIBLE", __name__, "mt5")
@@ -164,10 +217,13 @@ class LimitOrderManager:
             # 🔍 LOG DE ENTRADA - Confirmar que la nueva lógica se ejecuta
             enviar_senal_log("DEBUG", "analyze_and_place_orders INICIADO con nueva lógica de control", __name__, "trading")
 
+            if not current_price:
+                current_price = self._live_price()
             if not ict_results or not current_price:
                 return False
 
-            changes_made = False
+            # Estado de órdenes y posiciones desde el espejo (lee el terminal solo si toca)
+            self.book.reconcile()
 
             # IMPLEMENTAR LÓGICA DE CONTROL DE ÓRDENES SIMPLIFICADA
             # ========================================================
@@ -216,7 +272,7 @@ class LimitOrderManager:
                 # Temporalmente bloquear nuevas hasta que se estabilice
                 self.conservative_enabled = False
                 self.aggressive_enabled = False
-                return True
+                return bool(self._flush_order_batch()['cancelled'])
 
             # C. RESTAURAR ESTRATEGIAS SI SE DESHABILITARON TEMPORALMENTE
             if not self.conservative_enabled or not self.aggressive_enabled:
@@ -224,30 +280,39 @@ class LimitOrderManager:
                 self.aggressive_enabled = True
                 enviar_senal_log("INFO", "Estrategias restauradas para operación normal", __name__, "trading")
 
-            # D. EJECUTAR ESTRATEGIAS BAJO CONTROL
+            # D. EJECUTAR ESTRATEGIAS BAJO CONTROL (las órdenes quedan encoladas)
             # ====================================
 
             # Ejecutar ESTRATEGIA CONSERVADORA
             if self.conservative_enabled:
-                conservative_result = self._execute_conservative_strategy(ict_results, current_price, params)
-                if conservative_result:
-                    changes_made = True
+                self._execute_conservative_strategy(ict_results, current_price, params)
 
             # Ejecutar ESTRATEGIA AGRESIVA
             if self.aggressive_enabled:
-                aggressive_result = self._execute_aggressive_strategy(ict_results, current_price, params)
-                if aggressive_result:
-                    changes_made = True
+                self._execute_aggressive_strategy(ict_results, current_price, params)
 
             # Limpiar órdenes obsoletas
             self._cancel_obsolete_orders()
 
-            return changes_made
+            # Solo hay cambios si el bróker aceptó alguna orden nueva del lote
+            return bool(self._flush_order_batch()['placed'])
 
         except (ValueError, KeyError, TypeError) as e:
             enviar_senal_log("ERROR", f"Error en análisis dual de órdenes: {e}", __name__, "trading")
             return False
 
+        finally:
+            # Un solo lote por ciclo: bajas y altas decididas arriba
+            self._flush_order_batch()
+
+    def _flush_order_batch(self) -> dict:
+        """Envía al bróker las cancelaciones y colocaciones acumuladas en el ciclo."""
+        if not self.book.has_pending_changes():
+            return {'cancelled': [], 'placed': [], 'failed': []}
+        report = self.book.flush()
+        enviar_senal_log("DEBUG", f"Lote de órdenes: {len(report['cancelled'])} canceladas, {len(report['placed'])} colocadas, {len(report['failed'])} fallidas", __name__, "trading")
+        return report
+
     def _execute_conservative_strategy(self, ict_results: dict, current_price: float, params: dict) -> bool:
         """
         Ejecuta la estrategia CONSERVADORA (lógica original).
@@ -286,7 +351,7 @@ class LimitOrderManager:
                 )
 
                 if order_result:
-                    enviar_senal_log("INFO", f"CONSERVADOR: {trade_direction} limit en {optimal_level:.5f} (POI Score: {best_poi.get('score', 0)})", __name__, "trading")
+                    enviar_senal_log("INFO", f"CONSERVADOR: {trade_direction} limit encolada en {optimal_level:.5f} (POI Score: {best_poi.get('score', 0)})", __name__, "trading")
                     return True
 
             return False
@@ -333,7 +398,7 @@ class LimitOrderManager:
                 )
 
                 if order_result:
-                    enviar_senal_log("INFO", f"AGRESIVO: {trade_direction} limit en {optimal_level:.5f} (POI Score: {best_poi.get('score', 0)})", __name__, "trading")
+                    enviar_senal_log("INFO", f"AGRESIVO: {trade_direction} limit encolada en {optimal_level:.5f} (POI Score: {best_poi.get('score', 0)})", __name__, "trading")
                     return True
 
             return False
@@ -572,16 +637,18 @@ class LimitOrderManager:
             strategy: "CONSERVATIVE" o "AGGRESSIVE"
 
         Returns:
-            dict: Resultado de la orden o None si falló
+            dict: Orden con status 'QUEUED' (ticket None) hasta que el lote del ciclo
+                  la envía; _on_limit_order_placed la pasa a 'PLACED' o 'FAILED'.
+                  None si no pudo encolarse.
         """
         try:
             # Verificar conexión MT5
-            if not inicializar_mt5():
+            if not (self.broker.initialize() if self.backtest_mode else inicializar_mt5()):
                 enviar_senal_log("CRITICAL", "Error: MT5 no inicializado (FundedNext)", __name__, "trading")
                 return None
 
-            # Obtener información del símbolo
-            symbol_info = mt5.symbol_info(self.symbol)  # type: ignore
+            # Obtener información del símbolo (cacheada en el espejo)
+            symbol_info = self.book.symbol_info()
             if not symbol_info:
                 enviar_senal_log("CRITICAL", f"Error: Símbolo {self.symbol} no encontrado", __name__, "trading")
                 return None
@@ -591,10 +658,10 @@ class LimitOrderManager:
 
             # Configurar tipo de orden
             if direction == 'BUY':
-                order_type = mt5.ORDER_TYPE_BUY_LIMIT
+                order_type = self.broker.ORDER_TYPE_BUY_LIMIT
                 action = "Compra límite"
             else:
-                order_type = mt5.ORDER_TYPE_SELL_LIMIT
+                order_type = self.broker.ORDER_TYPE_SELL_LIMIT
                 action = "Venta límite"
 
             # Seleccionar magic number según estrategia
@@ -615,7 +682,7 @@ class LimitOrderManager:
 
             # Preparar request SIN SL/TP
             request = {
-                "action": mt5.TRADE_ACTION_PENDING,
+                "action": self.broker.TRADE_ACTION_PENDING,
                 "symbol": self.symbol,
                 "volume": dynamic_volume,
                 "type": order_type,
@@ -624,44 +691,49 @@ class LimitOrderManager:
                 "deviation": 20,
                 "magic": magic_number,
                 "comment": comment,
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_RETURN,
+                "type_time": self.broker.ORDER_TIME_GTC,
+                "type_filling": self.broker.ORDER_FILLING_RETURN,
             }
 
-            # Enviar orden
-            result = mt5.order_send(request)  # type: ignore
-
-            if result.retcode == mt5.TRADE_RETCODE_DONE:
-                # Almacenar información de la orden
-                order_info = {
-                    'ticket': result.order,
-                    'direction': direction,
-                    'level': level,
-                    'volume': dynamic_volume,
-                    'sl': 0.0,  # Sin SL - gestionado por RiskBot
-                    'tp': 0.0,  # Sin TP - gestionado por Bollinger
-                    'poi_score': poi_score,
-                    'strategy': strategy,
-                    'comment': comment,
-                    'timestamp': datetime.now()
-                }
-
-                self.active_orders[result.order] = order_info
-
-                # Log del evento con sistema centralizado
-                enviar_senal_log("INFO", f"ORDEN LÍMITE EJECUTADA: {strategy} {action} en {self.symbol} - Precio: {level:.5f}, Volumen: {dynamic_volume}, Ticket: #{result.order}", __name__, "general")
-                enviar_senal_log("INFO", f"{strategy_prefix} {action} ejecutada: Ticket #{result.order} en {level:.5f} (SIN SL/TP - RiskBot gestiona)", __name__, "trading")
-
-                return order_info
+            # Información de la orden; el ticket se asigna al enviar el lote del ciclo
+            order_info = {
+                'ticket': None,
+                'status': 'QUEUED',
+                'direction': direction,
+                'level': level,
+                'volume': dynamic_volume,
+                'sl': 0.0,  # Sin SL - gestionado por RiskBot
+                'tp': 0.0,  # Sin TP - gestionado por Bollinger
+                'poi_score': poi_score,
+                'strategy': strategy,
+                'comment': comment,
+                'timestamp': self._now()
+            }
 
-            else:
-                enviar_senal_log("ERROR", f"Error creando orden {strategy}: {result.retcode} - {result.comment}", __name__, "trading")
-                return None
+            self.book.queue_place(request, lambda req, result: self._on_limit_order_placed(order_info, action, result))
+            return order_info
 
         except (ValueError, KeyError, TypeError) as e:
             enviar_senal_log("ERROR", f"Error colocando orden límite {strategy}: {e}", __name__, "trading")
             return None
 
+    def _on_limit_order_placed(self, order_info: dict, action: str, result) -> None:
+        """Registra la orden límite una vez enviada en el lote del ciclo."""
+        strategy = order_info['strategy']
+        strategy_prefix = "CONS" if strategy == "CONSERVATIVE" else "AGR"
+        if result is not None and result.retcode == self.broker.TRADE_RETCODE_DONE:
+            order_info['ticket'] = result.order
+            order_info['status'] = 'PLACED'
+            self.active_orders[result.order] = order_info
+
+            # Log del evento con sistema centralizado
+            enviar_senal_log("INFO", f"ORDEN LÍMITE EJECUTADA: {strategy} {action} en {self.symbol} - Precio: {order_info['level']:.5f}, Volumen: {order_info['volume']}, Ticket: #{result.order}", __name__, "general")
+            enviar_senal_log("INFO", f"{strategy_prefix} {action} ejecutada: Ticket #{result.order} en {order_info['level']:.5f} (SIN SL/TP - RiskBot gestiona)", __name__, "trading")
+        else:
+            order_info['status'] = 'FAILED'
+            error = f"{result.retcode} - {result.comment}" if result is not None else "sin respuesta del bróker"
+            enviar_senal_log("ERROR", f"Error creando orden {strategy}: {error}", __name__, "trading")
+
     def _cancel_orders_by_strategy_and_direction(self, strategy: str, direction: str):
         """Cancela órdenes existentes de una estrategia y dirección específica."""
         try:
@@ -681,17 +753,18 @@ class LimitOrderManager:
     def _cancel_obsolete_orders(self):
         """Cancela órdenes que ya no son relevantes."""
         try:
-            # Obtener órdenes pendientes actuales
-            orders = mt5.orders_get(symbol=self.symbol)  # type: ignore
+            # Obtener órdenes pendientes actuales (espejo local)
+            orders = self.book.orders_for(self.symbol)
             if not orders:
                 self.active_orders.clear()
                 return
 
+            live_tickets = {order.ticket for order in orders}
             orders_to_cancel = []
 
             # Verificar si nuestras órdenes guardadas aún existen
             for ticket, order_info in list(self.active_orders.items()):
-                order_exists = any(order.ticket == ticket for order in orders)
+                order_exists = ticket in live_tickets
 
                 if not order_exists:
                     # La orden ya no existe (fue ejecutada o cancelada)
@@ -699,7 +772,7 @@ class LimitOrderManager:
                     continue
 
                 # Verificar si la orden es muy antigua (más de 4 horas)
-                age = datetime.now() - order_info['timestamp']
+                age = self._now() - order_info['timestamp']
                 if age.total_seconds() > 4 * 3600:  # 4 horas
                     orders_to_cancel.append(ticket)
 
@@ -707,9 +780,10 @@ class LimitOrderManager:
             for ticket in orders_to_cancel:
                 self._cancel_order(ticket)
 
-            # Limitar número máximo de órdenes por estrategia
-            conservative_orders = [t for t, o in self.active_orders.items() if o.get('strategy') == 'CONSERVATIVE']
-            aggressive_orders = [t for t, o in self.active_orders.items() if o.get('strategy') == 'AGGRESSIVE']
+            # Limitar número máximo de órdenes por estrategia (sin contar las ya encoladas para cancelar)
+            remaining = {t: o for t, o in self.active_orders.items() if not self.book.is_pending_cancel(t)}
+            conservative_orders = [t for t, o in remaining.items() if o.get('strategy') == 'CONSERVATIVE']
+            aggressive_orders = [t for t, o in remaining.items() if o.get('strategy') == 'AGGRESSIVE']
 
             # Máximo 2 órdenes por estrategia
             if len(conservative_orders) > 2:
@@ -733,37 +807,30 @@ class LimitOrderManager:
 
     def _cancel_order(self, ticket: int) -> bool:
         """
-        Cancela una orden específica.
+        Encola la cancelación de una orden específica (se envía en el lote del ciclo).
 
         Args:
             ticket: Número de ticket de la orden
 
         Returns:
-            bool: True si se canceló exitosamente
+            bool: True si quedó encolada (False si ya lo estaba)
         """
-        try:
-            request = {
-                "action": mt5.TRADE_ACTION_REMOVE,
-                "order": ticket,
-            }
-
-            result = mt5.order_send(request)  # type: ignore
+        return self.book.queue_cancel(ticket, self._on_order_cancelled)
 
-            if result.retcode == mt5.TRADE_RETCODE_DONE:
-                if ticket in self.active_orders:
-                    order_info = self.active_orders[ticket]
-                    strategy = order_info.get('strategy', 'UNKNOWN')
-                    strategy_prefix = "CONS" if strategy == "CONSERVATIVE" else "AGR"
-                    enviar_senal_log("INFO", f"{strategy_prefix} Orden #{ticket} cancelada ({order_info['direction']} en {order_info['level']:.5f})", __name__, "trading")
-                    del self.active_orders[ticket]
-                return True
+    def _on_order_cancelled(self, ticket: int, result) -> None:
+        """Actualiza active_orders con el resultado de una cancelación del lote."""
+        if result is not None and result.retcode == self.broker.TRADE_RETCODE_DONE:
+            if ticket in self.active_orders:
+                order_info = self.active_orders[ticket]
+                strategy = order_info.get('strategy', 'UNKNOWN')
+                strategy_prefix = "CONS" if strategy == "CONSERVATIVE" else "AGR"
+                enviar_senal_log("INFO", f"{strategy_prefix} Orden #{ticket} cancelada ({order_info['direction']} en {order_info['level']:.5f})", __name__, "trading")
+                del self.active_orders[ticket]
             else:
-                enviar_senal_log("ERROR", f"Error cancelando orden #{ticket}: {result.comment}", __name__, "trading")
-                return False
-
-        except (ValueError, KeyError, TypeError) as e:
-            enviar_senal_log("ERROR", f"Error cancelando orden #{ticket}: {e}", __name__, "trading")
-            return False
+                enviar_senal_log("INFO", f"Orden limit cancelada: #{ticket}", __name__, "trading")
+        else:
+            error = result.comment if result is not None else "sin respuesta del bróker"
+            enviar_senal_log("ERROR", f"Error cancelando orden #{ticket}: {error}", __name__, "trading")
 
     def get_active_orders_summary(self) -> str:
         """
@@ -786,7 +853,7 @@ class LimitOrderManager:
                 strategy = order_info.get('strategy', 'UNKNOWN')
 
                 # Calcular edad de la orden
-                age = datetime.now() - order_info['timestamp']
+                age = self._now() - order_info['timestamp']
                 age_hours = age.total_seconds() / 3600
 
                 order_line = f"#{ticket}: {direction} @ {level:.5f} (Score: {score}, {age_hours:.1f}h)"
@@ -819,143 +886,52 @@ class LimitOrderManager:
 
     def _check_active_positions(self) -> bool:
         """Verifica si hay posiciones abiertas (trades ejecutados)."""
-        try:
-            positions = mt5.positions_get()  # type: ignore
-            return positions and len(positions) > 0
-        except (ValueError, KeyError, TypeError):
-            return False
+        return bool(self.book.positions)
+
+    def _is_limit_entry(self, order) -> bool:
+        """Órdenes limit de entrada (0.05 lotes, no grid)."""
+        volume = getattr(order, 'volume_initial', 0)
+        comment = (getattr(order, 'comment', '') or '').upper()
+        magic = getattr(order, 'magic', 0)
+        return (
+            volume == 0.05 and
+            'GRID' not in comment and
+            'BOLLINGER' not in comment and
+            magic != self.grid_magic_number
+        )
+
+    def _limit_entry_orders(self) -> list:
+        """Órdenes limit de entrada vivas en el espejo (excluye las encoladas para cancelar)."""
+        return [order for order in self.book.orders.values()
+                if self._is_limit_entry(order) and not self.book.is_pending_cancel(order.ticket)]
 
     def _check_active_limit_orders(self) -> bool:
         """Verifica si hay órdenes limit activas (pendientes de 0.05 lotes)."""
-        try:
-            orders = mt5.orders_get()  # type: ignore
-            if not orders:
-                return False
-
-            for order in orders:
-                volume = getattr(order, 'volume_initial', 0)
-                comment = getattr(order, 'comment', '').upper()
-                magic = getattr(order, 'magic', 0)
-
-                # Identificar órdenes limit de entrada (0.05 lotes, no grid)
-                is_limit_entry = (
-                    volume == 0.05 and
-                    'GRID' not in comment and
-                    'BOLLINGER' not in comment and
-                    magic != 12345  # Magic del grid
-                )
-
-                if is_limit_entry:
-                    return True
-
-            return False
-        except (ValueError, KeyError, TypeError):
-            return False
+        return bool(self._limit_entry_orders())
 
     def _count_limit_orders(self) -> int:
         """Cuenta el número de órdenes limit de entrada activas."""
-        try:
-            orders = mt5.orders_get()  # type: ignore
-            if not orders:
-                return 0
-
-            count = 0
-            for order in orders:
-                volume = getattr(order, 'volume_initial', 0)
-                comment = getattr(order, 'comment', '').upper()
-                magic = getattr(order, 'magic', 0)
-
-                # Identificar órdenes limit de entrada (0.05 lotes, no grid)
-                is_limit_entry = (
-                    volume == 0.05 and
-                    'GRID' not in comment and
-                    'BOLLINGER' not in comment and
-                    magic != 12345  # Magic del grid
-                )
-
-                if is_limit_entry:
-                    count += 1
-
-            return count
-        except (ValueError, KeyError, TypeError):
-            return 0
+        return len(self._limit_entry_orders())
 
     def _cancel_limit_orders_only(self):
         """Cancela solo órdenes limit de entrada, preserva las del grid."""
-        try:
-            orders = mt5.orders_get()  # type: ignore
-            if not orders:
-                return
-
-            for order in orders:
-                volume = getattr(order, 'volume_initial', 0)
-                comment = getattr(order, 'comment', '').upper()
-                magic = getattr(order, 'magic', 0)
-
-                # Identificar órdenes limit de entrada (0.05 lotes, no grid)
-                is_limit_entry = (
-                    volume == 0.05 and
-                    'GRID' not in comment and
-                    'BOLLINGER' not in comment and
-                    magic != 12345  # Magic del grid
-                )
-
-                if is_limit_entry:
-                    result = mt5.order_send({  # type: ignore
-                        "action": mt5.TRADE_ACTION_REMOVE,
-                        "order": order.ticket,
-                    })
-                    if result.retcode == mt5.TRADE_RETCODE_DONE:
-                        enviar_senal_log("INFO", f"Orden limit cancelada: #{order.ticket}", __name__, "trading")
-                    else:
-                        enviar_senal_log("ERROR", f"Error cancelando limit #{order.ticket}: {result.comment}", __name__, "trading")
-        except (ValueError, KeyError, TypeError) as e:
-            enviar_senal_log("ERROR", f"Error cancelando órdenes limit: {e}", __name__, "trading")
+        for order in self._limit_entry_orders():
+            self._cancel_order(order.ticket)
 
     def _keep_only_one_limit_order(self):
         """Mantiene solo la orden limit más reciente, cancela las demás."""
-        try:
-            orders = mt5.orders_get()  # type: ignore
-            if not orders:
-                return
-
-            limit_orders = []
-            for order in orders:
-                volume = getattr(order, 'volume_initial', 0)
-                comment = getattr(order, 'comment', '').upper()
-                magic = getattr(order, 'magic', 0)
-
-                # Identificar órdenes limit de entrada
-                is_limit_entry = (
-                    volume == 0.05 and
-                    'GRID' not in comment and
-                    'BOLLINGER' not in comment and
-                    magic != 12345
-                )
-
-                if is_limit_entry:
-                    limit_orders.append(order)
+        limit_orders = self._limit_entry_orders()
 
-            # Si hay más de 1, cancelar todas menos la más reciente
-            if len(limit_orders) > 1:
-                # Ordenar por tiempo de creación (más antiguas primero)
-                sorted_orders = sorted(limit_orders, key=lambda x: x.time_setup)
-                orders_to_cancel = sorted_orders[:-1]  # Todas menos la última
+        # Si hay más de 1, cancelar todas menos la más reciente
+        if len(limit_orders) > 1:
+            # Ordenar por tiempo de creación (más antiguas primero)
+            sorted_orders = sorted(limit_orders, key=lambda x: x.time_setup)
+            orders_to_cancel = sorted_orders[:-1]  # Todas menos la última
 
-                enviar_senal_log("INFO", f"Cancelando {len(orders_to_cancel)} órdenes limit excesivas", __name__, "trading")
+            enviar_senal_log("INFO", f"Cancelando {len(orders_to_cancel)} órdenes limit excesivas", __name__, "trading")
 
-                for order in orders_to_cancel:
-                    result = mt5.order_send({  # type: ignore
-                        "action": mt5.TRADE_ACTION_REMOVE,
-                        "order": order.ticket,
-                    })
-                    if result.retcode == mt5.TRADE_RETCODE_DONE:
-                        enviar_senal_log("INFO", f"Orden limit excesiva cancelada: #{order.ticket}", __name__, "trading")
-                    else:
-                        enviar_senal_log("ERROR", f"Error cancelando orden #{order.ticket}: {result.comment}", __name__, "trading")
-
-        except (ValueError, KeyError, TypeError) as e:
-            enviar_senal_log("ERROR", f"Error en limpieza de órdenes: {e}", __name__, "trading")
+            for order in orders_to_cancel:
+                self._cancel_order(order.ticket)
 
 
 # =============================================================================
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+📒 ORDER BOOK MIRROR - Espejo local de órdenes pendientes y posiciones
+======================================================================
+
+Copia en memoria de las órdenes pendientes y posiciones de la cuenta, por
+ticket y por magic, para que LimitOrderManager decida sin preguntar al
+terminal en cada paso:
+
+1. reconcile()   → una lectura orders_get() + positions_get() (+ symbol_info
+                   del símbolo principal) cada `reconcile_interval` segundos,
+                   o antes si una orden a mercado dejó el espejo sucio
+2. send()        → order_send y aplicación inmediata del resultado al espejo
+                   (alta o baja de pendiente; el resto marca el espejo sucio)
+3. queue_*()     → cancelaciones y colocaciones del ciclo; flush() las envía
+                   en un solo lote (primero bajas, luego altas) sin duplicados
+
+Funciona con MetaTrader5 y con core.backtesting.SimulatedBroker (misma API).
+
+Versión: v1.0.0 - Order Book Mirror
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+
+class OrderBookMirror:
+    """
+    📒 Espejo de órdenes/posiciones con reconciliación periódica y lotes de cambios
+    """
+
+    def __init__(self, broker: Any, symbol: Optional[str] = None, reconcile_interval: float = 5.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            broker: Módulo MetaTrader5 o SimulatedBroker
+            symbol: Símbolo principal (su symbol_info se cachea en cada reconcile)
+            reconcile_interval: Segundos entre lecturas completas del terminal (0 = cada ciclo)
+            clock: Reloj monotónico (inyectable para tests/backtest)
+        """
+        self.broker = broker
+        self.symbol = symbol
+        self.reconcile_interval = float(reconcile_interval)
+        self._clock = clock
+
+        self.orders: Dict[int, Any] = {}
+        self.positions: Dict[int, Any] = {}
+        self._symbol_info: Any = None
+        self._last_reconcile: Optional[float] = None
+        self._dirty = True
+
+        self._cancel_queue: Dict[int, Optional[Callable[[int, Any], None]]] = {}
+        self._place_queue: List[tuple] = []
+
+        self.stats = {'reconciles': 0, 'broker_reads': 0, 'orders_sent': 0, 'batches': 0,
+                      'external_changes': 0}
+
+    # ===============================
+    # RECONCILIACIÓN
+    # ===============================
+
+    def rebind(self, broker: Any, symbol: Optional[str] = None, reconcile_interval: Optional[float] = None) -> None:
+        """Cambia de bróker (p.ej. modo backtest) y fuerza una reconciliación"""
+        self.broker = broker
+        if symbol:
+            self.symbol = symbol
+        if reconcile_interval is not None:
+            self.reconcile_interval = float(reconcile_interval)
+        self.orders.clear()
+        self.positions.clear()
+        self._symbol_info = None
+        self._cancel_queue.clear()
+        self._place_queue.clear()
+        self.invalidate()
+
+    def invalidate(self) -> None:
+        """Marca el espejo como sucio: el próximo reconcile() lee el terminal"""
+        self._dirty = True
+
+    def needs_reconcile(self) -> bool:
+        if self._dirty or self._last_reconcile is None:
+            return True
+        return self._clock() - self._last_reconcile >= self.reconcile_interval
+
+    def reconcile(self, force: bool = False) -> Dict[str, List[int]]:
+        """
+        Sincroniza con el terminal si toca (o si force=True)
+
+        Returns:
+            Dict con tickets de órdenes que aparecieron/desaparecieron fuera de
+            este espejo (llenadas, canceladas a mano, etc.)
+        """
+        if not force and not self.needs_reconcile():
+            return {'appeared': [], 'vanished': []}
+
+        orders = {int(order.ticket): order for order in (self.broker.orders_get() or ())}
+        positions = {int(position.ticket): position for position in (self.broker.positions_get() or ())}
+        if self.symbol:
+            self._symbol_info = self.broker.symbol_info(self.symbol)
+            self.stats['broker_reads'] += 1
+        self.stats['broker_reads'] += 2
+
+        appeared = [ticket for ticket in orders if ticket not in self.orders]
+        vanished = [ticket for ticket in self.orders if ticket not in orders]
+        self.stats['external_changes'] += len(appeared) + len(vanished)
+
+        self.orders, self.positions = orders, positions
+        self._last_reconcile = self._clock()
+        self._dirty = False
+        self.stats['reconciles'] += 1
+        return {'appeared': appeared, 'vanished': vanished}
+
+    # ===============================
+    # CONSULTAS EN MEMORIA
+    # ===============================
+
+    def symbol_info(self) -> Any:
+        """symbol_info del símbolo principal (cacheado hasta el próximo reconcile)"""
+        if self._symbol_info is None and self.symbol:
+            self._symbol_info = self.broker.symbol_info(self.symbol)
+            self.stats['broker_reads'] += 1
+        return self._symbol_info
+
+    def orders_for(self, symbol: Optional[str] = None, magic: Optional[int] = None) -> List[Any]:
+        return [order for order in self.orders.values()
+                if (symbol is None or order.symbol == symbol) and (magic is None or order.magic == magic)]
+
+    def positions_for(self, symbol: Optional[str] = None, magic: Optional[int] = None) -> List[Any]:
+        return [position for position in self.positions.values()
+                if (symbol is None or position.symbol == symbol) and (magic is None or position.magic == magic)]
+
+    def is_pending_cancel(self, ticket: int) -> bool:
+        return ticket in self._cancel_queue
+
+    # ===============================
+    # ENVÍO Y LOTES
+    # ===============================
+
+    def send(self, request: Dict[str, Any]) -> Any:
+        """order_send inmediato; el resultado se aplica al espejo"""
+        result = self.broker.order_send(request)
+        self.stats['orders_sent'] += 1
+        self._apply_result(request, result)
+        return result
+
+    def queue_cancel(self, ticket: int, on_done: Optional[Callable[[int, Any], None]] = None) -> bool:
+        """Encola la baja de una orden pendiente (una vez por ticket y ciclo)"""
+        ticket = int(ticket)
+        if ticket in self._cancel_queue:
+            return False
+        self._cancel_queue[ticket] = on_done
+        return True
+
+    def queue_place(self, request: Dict[str, Any], on_done: Optional[Callable[[Dict[str, Any], Any], None]] = None) -> None:
+        """Encola una orden nueva"""
+        self._place_queue.append((dict(request), on_done))
+
+    def has_pending_changes(self) -> bool:
+        return bool(self._cancel_queue or self._place_queue)
+
+    def flush(self) -> Dict[str, List[Any]]:
+        """Envía el lote del ciclo: primero bajas, luego altas"""
+        done = getattr(self.broker, 'TRADE_RETCODE_DONE', 10009)
+        report: Dict[str, List[Any]] = {'cancelled': [], 'placed': [], 'failed': []}
+        if not self.has_pending_changes():
+            return report
+
+        cancels, self._cancel_queue = self._cancel_queue, {}
+        placements, self._place_queue = self._place_queue, []
+        self.stats['batches'] += 1
+
+        # order_send devuelve None si el terminal no responde: cuenta como fallo y el lote sigue
+        for ticket, on_done in cancels.items():
+            result = self.send({"action": self.broker.TRADE_ACTION_REMOVE, "order": ticket})
+            (report['cancelled'] if result is not None and result.retcode == done else report['failed']).append(ticket)
+            if on_done:
+                on_done(ticket, result)
+
+        for request, on_done in placements:
+            result = self.send(request)
+            if result is not None and result.retcode == done:
+                report['placed'].append(result.order)
+            else:
+                report['failed'].append(request)
+            if on_done:
+                on_done(request, result)
+        return report
+
+    def _apply_result(self, request: Dict[str, Any], result: Any) -> None:
+        if result is None or result.retcode != getattr(self.broker, 'TRADE_RETCODE_DONE', 10009):
+            self.invalidate()
+            return
+        action = request.get('action')
+        if action == self.broker.TRADE_ACTION_PENDING:
+            self.orders[int(result.order)] = SimpleNamespace(
+                ticket=int(result.order), symbol=request.get('symbol'), type=request.get('type'),
+                volume_initial=request.get('volume'), volume_current=request.get('volume'),
+                price_open=request.get('price'), sl=request.get('sl', 0.0), tp=request.get('tp', 0.0),
+                magic=request.get('magic', 0), comment=request.get('comment', ''),
+                time_setup=self._broker_time(request.get('symbol')))
+        elif action == self.broker.TRADE_ACTION_REMOVE:
+            self.orders.pop(int(request.get('order', 0)), None)
+        else:
+            # Operaciones a mercado, SLTP o modificación: se relee en el próximo reconcile
+            self.invalidate()
+
+    def _broker_time(self, symbol: Optional[str]) -> int:
+        """Hora del servidor (último tick) para time_setup, comparable con las órdenes reconciliadas"""
+        tick = self.broker.symbol_info_tick(symbol) if symbol else None
+        if tick is None:
+            # Sin reloj del bróker: la próxima reconciliación trae el time_setup real
+            self.invalidate()
+            return 0
+        return int(tick.time)
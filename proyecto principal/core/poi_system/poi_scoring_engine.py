@@ -12,15 +12,20 @@ Funcionalidades:
 - Clasificación por grados (A+, A, B, C)
 - Confidence scoring basado en múltiples factores
 - Narrativa inteligente para cada POI
+- Scoring por lotes sobre arrays (precio, código de tipo, código de
+  timeframe, antigüedad) con top-k y narrativas solo para los POIs mostrados
 
 Versión: v3.5.1 (Nueva implementación)
 Fecha: 27 Julio 2025
 """
 
+from typing import Iterable
 from sistema.sic import List, Dict, Optional
 from sistema.sic import datetime
+import numpy as np
 # Logger especializado
 from sistema.sic import enviar_senal_log, log_poi
+from sistema.rolling_correlation import get_correlation_engine
 # Usar sistema de logging central
 
 class POIScoringEngine:
@@ -55,8 +60,12 @@ class POIScoringEngine:
                 'BEARISH_BREAKER': 1.1,
                 'LIQUIDITY_VOID': 0.9,
                 'PRICE_IMBALANCE': 0.8
-            }
+            },
+            # Penalización si ya hay exposición abierta en símbolos correlacionados
+            'CORRELATION_THRESHOLD': 0.7,
+            'CORRELATION_MAX_PENALTY': 15.0
         }
+        self.correlation_engine = get_correlation_engine()
 
         log_poi("INFO", "POI Scoring Engine inicializado", "poi_scoring_engine")
 
@@ -94,6 +103,10 @@ class POIScoringEngine:
                 context_score * 0.25         # 25% contexto
             ) * type_multiplier
 
+            # 5b. PENALIZACIÓN POR EXPOSICIÓN CORRELACIONADA
+            correlation_penalty = self._calculate_correlation_penalty(poi, market_context)
+            final_score -= correlation_penalty
+
             # Limitar entre 0-100
             final_score = max(0, min(100, final_score))
 
@@ -113,7 +126,8 @@ class POIScoringEngine:
                 'color': grade_info['color'],
                 'distance_pips': round(distance_pips, 1),
                 'narrative': narrative,
-                'type_multiplier': type_multiplier
+                'type_multiplier': type_multiplier,
+                'correlation_penalty': round(correlation_penalty, 1)
             }
 
             log_poi("DEBUG", f"POI {poi['type']} scored: {final_score:.1f} ({grade_info['grade']})", "poi_scoring_engine")
@@ -166,6 +180,18 @@ class POIScoringEngine:
         except (ValueError, KeyError, TypeError):
             return 60  # Score neutro en caso de error
 
+    def _calculate_correlation_penalty(self, poi: Dict, market_context: Optional[Dict]) -> float:
+        """Penaliza POIs de símbolos correlacionados con posiciones abiertas (market_context['open_symbols'])."""
+        if not market_context or not market_context.get('open_symbols'):
+            return 0.0
+        symbol = poi.get('symbol') or market_context.get('symbol')
+        if not symbol:
+            return 0.0
+        _, max_rho = self.correlation_engine.max_abs_correlation(symbol, market_context['open_symbols'])
+        if max_rho < self.config['CORRELATION_THRESHOLD']:
+            return 0.0
+        return self.config['CORRELATION_MAX_PENALTY'] * max_rho
+
     def _determine_grade(self, score: float) -> Dict:
         """Determina el grado basado en el score final."""
         for grade, config in self.config['QUALITY_GRADES'].items():
@@ -231,59 +257,215 @@ class POIScoringEngine:
             log_poi("WARNING", f"Error generando narrativa: {e}", "poi_scoring_engine")
             return f"POI {poi_type} detectado en {poi.get('price', 0):.5f}"
 
+    def build_poi_arrays(self, pois_list: List[Dict]) -> Dict:
+        """
+        Convierte la lista de POIs en arrays alineados para el scoring por lotes.
+
+        Tipos y timeframes se codifican como índices sobre tablas de valores
+        únicos (type_table/timeframe_table). Las filas sin precio/tipo válido
+        quedan marcadas en `valid` y reciben el fallback del camino escalar.
+        """
+        count = len(pois_list)
+        price = np.zeros(count)
+        base_score = np.zeros(count)
+        valid = np.zeros(count, dtype=bool)
+        type_codes, timeframe_codes = {}, {}
+        type_code = np.zeros(count, dtype=np.int32)
+        timeframe_code = np.zeros(count, dtype=np.int32)
+
+        for i, poi in enumerate(pois_list):
+            try:
+                price[i] = float(poi['price'])
+                base_score[i] = float(poi.get('score', 50))
+                poi_type = poi['type']
+                type_code[i] = type_codes.setdefault(poi_type, len(type_codes))
+                timeframe_code[i] = timeframe_codes.setdefault(poi.get('timeframe'), len(timeframe_codes))
+                valid[i] = True
+            except (ValueError, KeyError, TypeError):
+                continue
+
+        return {
+            'price': price,
+            'base_score': base_score,
+            'type_code': type_code,
+            'timeframe_code': timeframe_code,
+            'valid': valid,
+            'type_table': list(type_codes),
+            'timeframe_table': list(timeframe_codes),
+        }
+
+    def _poi_age_minutes(self, pois_list: List[Dict], now: Optional[datetime] = None) -> np.ndarray:
+        """Antigüedad en minutos desde created_at/timestamp (NaN si no se puede leer)"""
+        now = now or datetime.now()
+        parsed = {}
+        ages = np.full(len(pois_list), np.nan)
+        for i, poi in enumerate(pois_list):
+            stamp = poi.get('created_at') or poi.get('timestamp')
+            if stamp is None:
+                continue
+            if stamp not in parsed:
+                try:
+                    moment = datetime.fromisoformat(stamp) if isinstance(stamp, str) else stamp
+                    parsed[stamp] = (now - moment.replace(tzinfo=None)).total_seconds() / 60
+                except (ValueError, TypeError, AttributeError):
+                    parsed[stamp] = np.nan
+            ages[i] = parsed[stamp]
+        return ages
+
+    def score_poi_arrays(self, arrays: Dict, current_price: float,
+                         market_context: Optional[Dict] = None,
+                         symbols: Optional[List[Optional[str]]] = None) -> Dict:
+        """
+        Scoring vectorizado: mismos factores y pesos que calculate_intelligent_score.
+
+        Multiplicador de tipo, contexto y penalización por correlación se
+        calculan una vez por tipo/símbolo único y se expanden con los códigos.
+
+        Returns:
+            Dict de arrays: distance_pips, proximity_score, context_score,
+            type_multiplier, correlation_penalty, final_score (sin redondear)
+            y grade_index (índice en QUALITY_GRADES)
+        """
+        distance_pips = np.abs(current_price - arrays['price']) * 10000
+        proximity_score = np.select(
+            [distance_pips <= 10, distance_pips <= 25, distance_pips <= 50, distance_pips <= 100],
+            [100, 85, 70, 50], 30).astype(float)
+
+        type_table = arrays['type_table']
+        multipliers = np.array([self.config['POI_TYPE_MULTIPLIERS'].get(t, 1.0) for t in type_table] or [1.0])
+        contexts = np.array([self._calculate_context_score({'type': t}, market_context) for t in type_table] or [60.0])
+        type_multiplier = multipliers[arrays['type_code']]
+        context_score = contexts[arrays['type_code']].astype(float)
+
+        correlation_penalty = np.zeros(len(distance_pips))
+        if market_context and market_context.get('open_symbols'):
+            symbols = symbols or [None] * len(distance_pips)
+            penalties = {}
+            for i, symbol in enumerate(symbols):
+                if symbol not in penalties:
+                    penalties[symbol] = self._calculate_correlation_penalty({'symbol': symbol}, market_context)
+                correlation_penalty[i] = penalties[symbol]
+
+        final_score = (
+            arrays['base_score'] * 0.4 +
+            proximity_score * 0.35 +
+            context_score * 0.25
+        ) * type_multiplier - correlation_penalty
+        final_score = np.clip(final_score, 0, 100)
+
+        min_scores = np.array([grade['min_score'] for grade in self.config['QUALITY_GRADES'].values()])
+        meets = final_score[:, None] >= min_scores[None, :]
+        grade_index = np.where(meets.any(axis=1), meets.argmax(axis=1), len(min_scores) - 1)
+
+        return {
+            'distance_pips': distance_pips,
+            'proximity_score': proximity_score,
+            'context_score': context_score,
+            'type_multiplier': type_multiplier,
+            'correlation_penalty': correlation_penalty,
+            'final_score': final_score,
+            'grade_index': grade_index,
+        }
+
+    @staticmethod
+    def _top_k_indices(scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+        """Índices de los k mejores (orden descendente, empates por posición original)"""
+        if top_k is None or top_k >= len(scores):
+            candidates = np.arange(len(scores))
+        elif top_k <= 0:
+            return np.zeros(0, dtype=np.int64)
+        else:
+            candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+            # Empates en el corte: quedarse con los de menor posición (como el sort estable)
+            cutoff = scores[candidates].min()
+            above = np.flatnonzero(scores > cutoff)
+            tied = np.flatnonzero(scores == cutoff)[:top_k - len(above)]
+            candidates = np.concatenate((above, tied))
+        return candidates[np.lexsort((candidates, -scores[candidates]))]
+
     def process_pois_for_dashboard(self, pois_list: List[Dict], current_price: float,
-                                  market_context: Optional[Dict] = None) -> List[Dict]:
+                                  market_context: Optional[Dict] = None,
+                                  top_k: Optional[int] = None,
+                                  min_grade: Optional[str] = None,
+                                  timeframes: Optional[Iterable[str]] = None,
+                                  max_age_minutes: Optional[float] = None) -> List[Dict]:
         """
         Procesa una lista de POIs aplicando scoring inteligente para el dashboard.
 
         GARANTIZA que el dashboard SIEMPRE reciba datos procesables.
+
+        Scoring por lotes sobre arrays; solo los POIs devueltos (top_k) se
+        copian como dict y reciben narrativa.
+
+        Args:
+            top_k: Número de POIs a devolver (None = todos, ordenados por score)
+            min_grade: Grado mínimo a devolver (p.ej. 'B')
+            timeframes: Restringir a estos timeframes
+            max_age_minutes: Descartar POIs más antiguos (created_at/timestamp)
         """
         if not pois_list:
             log_poi("WARNING", "Lista de POIs vacía recibida", "poi_scoring_engine")
             return []
 
-        processed_pois = []
-
-        for poi in pois_list:
-            try:
-                # Aplicar scoring inteligente
-                scoring_result = self.calculate_intelligent_score(poi, current_price, market_context)
-
-                # Combinar datos originales con scoring
-                enhanced_poi = {
-                    **poi,  # Datos originales
-                    'intelligent_score': scoring_result['final_score'],
-                    'grade': scoring_result['grade'],
-                    'confidence': scoring_result['confidence'],
-                    'color': scoring_result['color'],
-                    'distance_pips': scoring_result['distance_pips'],
-                    'narrative': scoring_result['narrative'],
-                    'dashboard_ready': True,  # Flag de que está listo para dashboard
-                    'last_scored': datetime.now().isoformat()
-                }
-
-                processed_pois.append(enhanced_poi)
-
-            except (ValueError, KeyError, TypeError) as e:
-                log_poi("ERROR", f"Error procesando POI: {e}", "poi_scoring_engine")
-                # Incluir POI con datos mínimos para evitar lista vacía
-                fallback_poi = {
-                    **poi,
-                    'intelligent_score': 50.0,
-                    'grade': 'C',
-                    'confidence': 0.5,
-                    'color': 'orange',
-                    'narrative': f"POI {poi.get('type', 'UNKNOWN')} (procesamiento fallback)",
-                    'dashboard_ready': True
-                }
-                processed_pois.append(fallback_poi)
+        arrays = self.build_poi_arrays(pois_list)
+        symbols = [poi.get('symbol') or (market_context or {}).get('symbol') if isinstance(poi, dict) else None
+                   for poi in pois_list]
+        scored = self.score_poi_arrays(arrays, current_price, market_context, symbols)
+        valid = arrays['valid']
+
+        # Score de ranking: redondeado como intelligent_score (round de Python, no np.round,
+        # para empatar igual que el sort); los inválidos llevan el fallback (50.0)
+        rounded = np.fromiter((round(score, 1) for score in scored['final_score'].tolist()),
+                              dtype=float, count=len(pois_list))
+        ranking = np.where(valid, rounded, 50.0)
+        grades = list(self.config['QUALITY_GRADES'])
+        keep = np.ones(len(pois_list), dtype=bool)
+        if min_grade is not None:
+            keep &= np.where(valid, scored['grade_index'], grades.index('C')) <= grades.index(min_grade)
+        if timeframes is not None:
+            wanted = [code for code, timeframe in enumerate(arrays['timeframe_table']) if timeframe in set(timeframes)]
+            keep &= valid & np.isin(arrays['timeframe_code'], wanted)
+        if max_age_minutes is not None:
+            ages = self._poi_age_minutes(pois_list)
+            keep &= ~(ages > max_age_minutes)
+
+        kept = np.flatnonzero(keep)
+        selected = kept[self._top_k_indices(ranking[kept], top_k)]
+        now = datetime.now().isoformat()
+        processed_pois = [self._enhance_scored_poi(pois_list[i], i, scored, valid[i], now) for i in selected]
+
+        log_poi("INFO", f"✅ {len(processed_pois)}/{len(pois_list)} POIs procesados para dashboard", "poi_scoring_engine")
 
-        # Ordenar por score inteligente
-        processed_pois.sort(key=lambda x: x['intelligent_score'], reverse=True)
+        return processed_pois
 
-        log_poi("INFO", f"✅ {len(processed_pois)} POIs procesados para dashboard", "poi_scoring_engine")
+    def _enhance_scored_poi(self, poi: Dict, row: int, scored: Dict, valid: bool, scored_at: str) -> Dict:
+        """POI original + scoring de la fila `row`; la narrativa se genera aquí (solo POIs devueltos)."""
+        if not valid:
+            # Incluir POI con datos mínimos para evitar lista vacía
+            return {
+                **poi,
+                'intelligent_score': 50.0,
+                'grade': 'C',
+                'confidence': 0.5,
+                'color': 'orange',
+                'narrative': f"POI {poi.get('type', 'UNKNOWN')} (procesamiento fallback)",
+                'dashboard_ready': True
+            }
 
-        return processed_pois
+        grade = list(self.config['QUALITY_GRADES'])[scored['grade_index'][row]]
+        grade_info = {'grade': grade, **{k: self.config['QUALITY_GRADES'][grade][k] for k in ('confidence', 'color')}}
+        distance_pips = float(scored['distance_pips'][row])
+        return {
+            **poi,  # Datos originales
+            'intelligent_score': round(float(scored['final_score'][row]), 1),
+            'grade': grade,
+            'confidence': grade_info['confidence'],
+            'color': grade_info['color'],
+            'distance_pips': round(distance_pips, 1),
+            'narrative': self._generate_poi_narrative(poi, grade_info, distance_pips),
+            'dashboard_ready': True,  # Flag de que está listo para dashboard
+            'last_scored': scored_at
+        }
 
 # Instancia global del motor de scoring
 poi_scoring_engine = POIScoringEngine()
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+📸 ACCOUNT SNAPSHOT - Foto de cuenta y posiciones por ciclo de RiskBot
+=====================================================================
+
+Una sola lectura del terminal por ciclo de riesgo: positions_get(),
+account_info() y, para los símbolos con posición, symbol_info() y
+symbol_info_tick(). Las posiciones se guardan además en arrays numpy
+(volumen, profit, swap, tipo, precio de apertura...) para calcular el
+profit neto, los lotes totales y las decisiones de reducción en bloque.
+
+RiskBot invalida la foto solo tras sus propias órdenes (cierre/modificación);
+la siguiente lectura vuelve a capturar. to_dict()/from_dict() permiten
+guardar la foto de cada ciclo y reproducir las decisiones sin terminal.
+
+Funciona con MetaTrader5 y con core.backtesting.SimulatedBroker (misma API).
+
+Versión: v1.0.0 - Account Snapshot
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import time
+from dataclasses import asdict, is_dataclass
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+_POSITION_FIELDS = ('ticket', 'symbol', 'type', 'volume', 'price_open', 'sl', 'tp',
+                    'price_current', 'profit', 'swap', 'time', 'magic', 'comment')
+
+
+def _record_to_dict(record: Any) -> Dict[str, Any]:
+    """namedtuple de MT5, dataclass del bróker simulado o SimpleNamespace → dict"""
+    if record is None:
+        return {}
+    if hasattr(record, '_asdict'):
+        return dict(record._asdict())
+    if is_dataclass(record):
+        return asdict(record)
+    return dict(vars(record))
+
+
+class AccountSnapshot:
+    """
+    📸 Foto consistente de cuenta, posiciones, ticks y specs de símbolo
+
+    `positions` conserva los objetos originales (los métodos de cierre los
+    necesitan); las columnas numpy están alineadas con ese orden.
+    """
+
+    def __init__(self, positions: Iterable[Any], account: Any = None,
+                 ticks: Optional[Dict[str, Any]] = None, symbol_infos: Optional[Dict[str, Any]] = None,
+                 commission_per_lot: float = 0.0, taken_at: Optional[float] = None):
+        self.positions: Tuple[Any, ...] = tuple(positions or ())
+        self.account = account
+        self.ticks = ticks or {}
+        self.symbol_infos = symbol_infos or {}
+        self.commission_per_lot = float(commission_per_lot)
+        self.taken_at = time.time() if taken_at is None else taken_at
+
+        count = len(self.positions)
+        self.ticket = np.fromiter((p.ticket for p in self.positions), dtype=np.int64, count=count)
+        self.type = np.fromiter((p.type for p in self.positions), dtype=np.int8, count=count)
+        self.volume = np.fromiter((p.volume for p in self.positions), dtype=float, count=count)
+        self.profit = np.fromiter((p.profit for p in self.positions), dtype=float, count=count)
+        self.swap = np.fromiter((getattr(p, 'swap', 0.0) for p in self.positions), dtype=float, count=count)
+        self.price_open = np.fromiter((p.price_open for p in self.positions), dtype=float, count=count)
+        self.symbols: List[str] = [p.symbol for p in self.positions]
+
+    @classmethod
+    def capture(cls, broker: Any, commission_per_lot: float = 0.0,
+                include_account: bool = True, include_market: bool = True,
+                tick_source: Any = None) -> 'AccountSnapshot':
+        """
+        Lee el terminal una vez
+
+        Args:
+            broker: Módulo MetaTrader5 o SimulatedBroker
+            commission_per_lot: Comisión ida y vuelta por lote (para el neto)
+            include_account: Leer account_info()
+            include_market: Leer symbol_info()/symbol_info_tick() de los símbolos con posición
+            tick_source: Objeto con symbol_info_tick() (p.ej. utils.tick_buffer.TickFeed);
+                         los ticks salen de él y solo se pregunta al bróker si no tiene el símbolo
+        """
+        positions = broker.positions_get() or ()
+        account = broker.account_info() if include_account else None
+        ticks, infos = {}, {}
+        if include_market:
+            for symbol in dict.fromkeys(p.symbol for p in positions):
+                tick = tick_source.symbol_info_tick(symbol) if tick_source is not None else None
+                ticks[symbol] = tick if tick is not None else broker.symbol_info_tick(symbol)
+                infos[symbol] = broker.symbol_info(symbol)
+        return cls(positions, account, ticks, infos, commission_per_lot)
+
+    # ===============================
+    # TOTALES VECTORIZADOS
+    # ===============================
+
+    def __len__(self) -> int:
+        return len(self.positions)
+
+    @property
+    def balance(self) -> float:
+        return float(self.account.balance) if self.account is not None else 0.0
+
+    @property
+    def equity(self) -> float:
+        return float(self.account.equity) if self.account is not None else 0.0
+
+    @property
+    def commission(self) -> np.ndarray:
+        """Comisión por posición"""
+        return self.volume * self.commission_per_lot
+
+    @property
+    def net_profit(self) -> np.ndarray:
+        """Profit neto de comisión por posición (mismo criterio que RiskBot)"""
+        return self.profit - self.commission
+
+    def totals(self) -> Tuple[float, float, float, float, float]:
+        """(profit bruto, comisión, profit neto, lotes, swap) — firma de get_total_profit_and_lots"""
+        total_profit = float(self.profit.sum())
+        total_lots = float(self.volume.sum())
+        commission = total_lots * self.commission_per_lot
+        return total_profit, commission, total_profit - commission, total_lots, float(self.swap.sum())
+
+    def real_net_profit(self) -> float:
+        """P_net_real = P_bruto - (C_lotes + C_swap)"""
+        total_profit, commission, _, _, total_swap = self.totals()
+        return total_profit - (commission + total_swap)
+
+    def select(self, mask: np.ndarray) -> List[Any]:
+        """Posiciones originales donde `mask` es True (o en el orden de un array de índices)"""
+        indices = np.flatnonzero(mask) if np.asarray(mask).dtype == bool else np.asarray(mask)
+        return [self.positions[i] for i in indices]
+
+    def pip_values(self) -> np.ndarray:
+        """Valor de un pip por posición: (pip_size / bid) * contrato * volumen (0 sin datos)"""
+        values = np.zeros(len(self.positions))
+        for i, symbol in enumerate(self.symbols):
+            values[i] = self.pip_value(symbol, self.volume[i])
+        return values
+
+    def pip_value(self, symbol: str, volume: float) -> float:
+        tick, info = self.ticks.get(symbol), self.symbol_infos.get(symbol)
+        if not tick or not info or not tick.bid:
+            return 0.0
+        pip_size = 0.01 if "JPY" in symbol else 0.0001
+        return (pip_size / tick.bid) * info.trade_contract_size * volume
+
+    # ===============================
+    # REPLAY
+    # ===============================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Foto serializable (JSON) para guardar el ciclo y reproducirlo"""
+        return {
+            'taken_at': self.taken_at,
+            'commission_per_lot': self.commission_per_lot,
+            'account': _record_to_dict(self.account),
+            'positions': [{key: value for key, value in _record_to_dict(p).items() if key in _POSITION_FIELDS}
+                          for p in self.positions],
+            'ticks': {symbol: _record_to_dict(tick) for symbol, tick in self.ticks.items()},
+            'symbol_infos': {symbol: _record_to_dict(info) for symbol, info in self.symbol_infos.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'AccountSnapshot':
+        def _ns(record):
+            return SimpleNamespace(**record) if record else None
+
+        return cls([SimpleNamespace(**p) for p in data.get('positions', [])],
+                   _ns(data.get('account')),
+                   {symbol: _ns(tick) for symbol, tick in data.get('ticks', {}).items()},
+                   {symbol: _ns(info) for symbol, info in data.get('symbol_infos', {}).items()},
+                   data.get('commission_per_lot', 0.0), data.get('taken_at'))
+
+
+class SnapshotBroker:
+    """
+    🔁 Bróker de solo lectura sobre una foto guardada
+
+    Permite ejecutar RiskBot.check_and_act contra la foto de un ciclo: las
+    lecturas salen de la foto y las órdenes se registran en `orders` (se
+    responden como ejecutadas) sin tocar ningún terminal.
+    """
+
+    TRADE_RETCODE_DONE = 10009
+
+    def __init__(self, snapshot: AccountSnapshot, constants: Any = None):
+        self.snapshot = snapshot
+        self.orders: List[Dict[str, Any]] = []
+        if constants is not None:
+            for name in dir(constants):
+                if name.isupper():
+                    setattr(self, name, getattr(constants, name))
+
+    def initialize(self, *args: Any, **kwargs: Any) -> bool:
+        return True
+
+    def positions_get(self, *args: Any, **kwargs: Any):
+        return self.snapshot.positions
+
+    def account_info(self):
+        return self.snapshot.account
+
+    def symbol_info(self, symbol: str):
+        return self.snapshot.symbol_infos.get(symbol)
+
+    def symbol_info_tick(self, symbol: str):
+        return self.snapshot.ticks.get(symbol)
+
+    def order_send(self, request: Dict[str, Any]):
+        self.orders.append(dict(request))
+        tick = self.snapshot.ticks.get(request.get('symbol'))
+        return SimpleNamespace(retcode=self.TRADE_RETCODE_DONE, comment='replay', request=request,
+                               price=getattr(tick, 'bid', 0.0) if tick else 0.0)
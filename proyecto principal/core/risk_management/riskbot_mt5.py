@@ -1,4 +1,5 @@
 from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
 from sistema.sic import Optional
 # MIGRADO A SLUC v2.0
 from sistema.sic import enviar_senal_log, log_info
@@ -8,11 +9,17 @@ from sistema.sic import enviar_senal_log, log_info
 # =============================================================================
 # SECCIÓN 1: IMPORTACIONES DE LIBRERÍAS Y MÓDULOS
 # =============================================================================
-import MetaTrader5 as mt5
+# MetaTrader5 es opcional: sin terminal (backtest) el bróker llega por set_backtest_mode()
+try:
+    import MetaTrader5 as mt5
+except ImportError:
+    mt5 = None
 from sistema.sic import datetime
 import pytz
 from sistema.config import COMISION_POR_LOTE, log_debug
 from sistema.data_logger import log_posicion_cerrada, log_error_critico
+from sistema.rolling_correlation import get_correlation_engine
+from core.risk_management.account_snapshot import AccountSnapshot
 
 # =============================================================================
 # SECCIÓN 2: CLASE RISKBOTMT5
@@ -30,8 +37,34 @@ class RiskBot:
         """
         self.backtest_mode = True
         self.sim_broker = sim_broker
+        self.broker = sim_broker
         log_debug("RiskBot", "Modo backtest activado y broker simulado conectado.", "INFO")
 
+    def attach_tick_feed(self, tick_feed):
+        """
+        Usa un TickFeed (utils.tick_buffer) como fuente de ticks.
+        Las fotos de cuenta y el valor del pip leen del anillo en memoria en
+        lugar de llamar a symbol_info_tick() por símbolo y ciclo.
+        """
+        self.tick_feed = tick_feed
+
+    def attach_correlation_feed(self, data_manager):
+        """
+        Usa un MT5DataManager (feed_correlation_engine) para llevar al motor
+        de correlación las velas cerradas antes de dimensionar en vivo.
+        """
+        self.correlation_feed = data_manager
+
+    def _tick_feed_live(self) -> bool:
+        """True si hay TickFeed en marcha (en backtest o con el loop detenido se lee el bróker)."""
+        return self.tick_feed is not None and self.tick_feed.is_running and not self.backtest_mode
+
+    def _now_utc(self):
+        """Hora UTC actual: la de la vela en curso en backtest, la del reloj en vivo."""
+        if self.backtest_mode and hasattr(self.sim_broker, 'current_time'):
+            return self.sim_broker.current_time()
+        return datetime.now(pytz.utc)
+
     def __init__(self, risk_target_profit=10.0, max_profit_target=130.0, risk_percent=1.0, comision_por_lote=COMISION_POR_LOTE):
         # Parámetros originales
         self.risk_target_profit = risk_target_profit
@@ -53,6 +86,29 @@ class RiskBot:
         # Flags de control interno
         self.reduction_triggered_flag = False
 
+        # Exposición correlacionada: motor compartido con los scorers de POI/confianza
+        self.correlation_engine = get_correlation_engine()
+        self.correlation_threshold = 0.7
+        self.correlation_max_reduction = 0.5  # |ρ| = 1 → mitad de lotaje
+
+        # Broker: MetaTrader5 en vivo o un SimulatedBroker vía set_backtest_mode()
+        self.backtest_mode = False
+        self.sim_broker = None
+        self.broker = mt5
+
+        # Ticks en vivo: TickFeed compartido (attach_tick_feed); sin él se lee el bróker
+        self.tick_feed = None
+
+        # Velas cerradas para la correlación en vivo (attach_correlation_feed)
+        self.correlation_feed = None
+
+        # Foto de cuenta por ciclo: una lectura del terminal por check_and_act,
+        # invalidada solo tras las órdenes propias de RiskBot
+        self._snapshot = None
+        self._snapshot_cycle = False
+        self.last_snapshot = None
+        self.snapshot_stats = {'captures': 0, 'invalidations': 0}
+
         log_debug("RiskBotMT5", "RiskBotMT5 inicializado con parámetros de riesgo avanzado.", "INFO")
 
     # =========================================================================
@@ -95,7 +151,7 @@ class RiskBot:
         Función de compatibilidad.
         """
         # Verificar que MT5 esté conectado
-        if not mt5.initialize():  # type: ignore
+        if not self.broker.initialize():  # type: ignore
             return False
 
         # Verificar balance mínimo
@@ -153,12 +209,36 @@ class RiskBot:
             enviar_senal_log("ERROR", f"Error calculando volumen dinámico: {e}", __name__, "trading")
             return min_volume
 
-    def calculate_position_size(self, price: float, stop_loss_pips: Optional[float] = None):
+    def calculate_position_size(self, price: float, stop_loss_pips: Optional[float] = None, symbol: Optional[str] = None):
         """
         Calcula el tamaño de posición.
         Función de compatibilidad.
         """
-        return self.calcular_lotaje_optimo_por_riesgo(price, stop_loss_pips)
+        return self.calcular_lotaje_optimo_por_riesgo(price, stop_loss_pips, symbol=symbol)
+
+    def actualizar_precios_correlacion(self, precios, timestamp=None):
+        """Alimenta el motor de correlación con el cierre del bar de cada símbolo."""
+        self.correlation_engine.update_bar(precios, timestamp)
+
+    def factor_correlacion(self, symbol, open_symbols=None):
+        """
+        Factor (0-1] a aplicar al lotaje de una nueva posición en `symbol`.
+
+        Si alguna posición abierta está correlacionada por encima del umbral,
+        el lotaje se reduce en proporción a |ρ|. Sin datos suficientes → 1.0.
+        """
+        if open_symbols is None:
+            open_symbols = [getattr(p, 'symbol', None) for p in self.get_open_positions()]
+        open_symbols = [s for s in open_symbols if s]
+        if self.correlation_feed is not None and not self.backtest_mode and open_symbols:
+            try:
+                self.correlation_feed.feed_correlation_engine([symbol] + open_symbols, engine=self.correlation_engine)
+            except Exception as e:
+                log_debug("RiskBot", f"No se pudo actualizar la correlación: {e}", "WARNING")
+        _, max_rho = self.correlation_engine.max_abs_correlation(symbol, open_symbols)
+        if max_rho < self.correlation_threshold:
+            return 1.0
+        return 1.0 - self.correlation_max_reduction * max_rho
 
 
     # =========================================================================
@@ -166,7 +246,7 @@ class RiskBot:
     # =========================================================================
     def get_account_balance(self):
         """Obtiene el balance actual de la cuenta."""
-        account_info = mt5.account_info()  # type: ignore
+        account_info = self.get_snapshot().account if self._snapshot_cycle else self.broker.account_info()  # type: ignore
         if account_info is None:
             log_debug("RiskBot", "No se pudo obtener la información de la cuenta. Retornando balance 0.0.", "ERROR")
             return 0.0
@@ -179,7 +259,7 @@ class RiskBot:
         """
         from types import SimpleNamespace
 
-        account_info = mt5.account_info()  # type: ignore
+        account_info = self.broker.account_info()  # type: ignore
         if account_info is None:
             log_debug("RiskBot", "No se pudo obtener la información de la cuenta.", "ERROR")
             # Retornar objeto simulado con valores por defecto
@@ -196,7 +276,7 @@ class RiskBot:
             balance=account_info.balance
         )
 
-    def calcular_lotaje_optimo_por_riesgo(self, precio_entrada, stop_loss_pips=None, lotaje_base=0.01):
+    def calcular_lotaje_optimo_por_riesgo(self, precio_entrada, stop_loss_pips=None, lotaje_base=0.01, symbol=None):
         """
         Calcula el lotaje óptimo basado en el porcentaje de riesgo de la cuenta.
 
@@ -204,6 +284,8 @@ class RiskBot:
             precio_entrada: Precio al que se planea entrar
             stop_loss_pips: Número de pips de stop loss (opcional)
             lotaje_base: Lotaje base mínimo a usar
+            symbol: Símbolo de la nueva posición (reduce el lotaje si está
+                correlacionado con posiciones abiertas)
 
         Returns:
             float: Lotaje calculado según el riesgo
@@ -222,7 +304,7 @@ class RiskBot:
                 stop_loss_pips = 20  # 20 pips por defecto para cálculo conservador
 
             # Obtener información del símbolo para calcular el valor del pip
-            symbol_info = mt5.symbol_info("EURUSD")  # type: ignore
+            symbol_info = self.broker.symbol_info("EURUSD")  # type: ignore
             if symbol_info is None:
                 log_debug("RiskBot", "No se pudo obtener info del símbolo, usando lotaje base", "WARNING")
                 return lotaje_base
@@ -237,6 +319,8 @@ class RiskBot:
 
             # Calcular lotaje óptimo
             lotaje_optimo = riesgo_dinero / (stop_loss_pips * valor_pip_por_lote)
+            if symbol:
+                lotaje_optimo *= self.factor_correlacion(symbol)
 
             # Aplicar límites de seguridad
             lotaje_optimo = max(lotaje_base, min(lotaje_optimo, 1.0))  # Entre lotaje_base y 1.0
@@ -281,8 +365,10 @@ class RiskBot:
             return float(fallback_lote)
 
     def get_open_positions(self):
-        """Obtiene todas las posiciones abiertas."""
-        positions = mt5.positions_get()  # type: ignore
+        """Obtiene todas las posiciones abiertas (de la foto del ciclo si hay uno en curso)."""
+        if self._snapshot_cycle:
+            return self.get_snapshot().positions
+        positions = self.broker.positions_get()  # type: ignore
         if positions is None:
             log_debug("RiskBot", "No se pudieron obtener posiciones abiertas.", "WARNING")
             return []
@@ -290,29 +376,53 @@ class RiskBot:
 
     def get_total_profit_and_lots(self):
         """Calcula el profit total, comisión, swap y lotes de todas las posiciones abiertas."""
-        total_profit = 0.0
-        total_lots = 0.0
-        total_swap = 0.0
-        positions = self.get_open_positions()
-        for pos in positions:
-            try:
-                total_profit += float(pos.profit)
-                total_lots += float(pos.volume)
-                total_swap += float(pos.swap)
-            except (ValueError, TypeError) as e:
-                log_debug("RiskBot", f"Error procesando posición {pos.ticket}: {e}", "ERROR")
-                log_error_critico("RiskBot", "Procesando Posición", f"Error al procesar posición {pos.ticket}: {e}", str(e))
-                continue
+        if self._snapshot_cycle:
+            snapshot = self.get_snapshot()
+        else:
+            snapshot = AccountSnapshot.capture(self.broker, self.comision_por_lote,
+                                               include_account=False, include_market=False)
+        return snapshot.totals()
 
-        try:
-            comision_total = total_lots * self.comision_por_lote
-        except (TypeError, ValueError) as e:
-            log_debug("RiskBot", f"Error calculando comisión total: {e}", "ERROR")
-            log_error_critico("RiskBot", "Cálculo Comisión", f"Error calculando comisión: {e}", str(e))
-            comision_total = 0.0
+    # =========================================================================
+    # SECCIÓN 2.1.1: Foto de Cuenta por Ciclo
+    # =========================================================================
+    def get_snapshot(self, refresh=False):
+        """
+        Foto de cuenta, posiciones y ticks del ciclo en curso.
 
-        profit_neto = total_profit - comision_total
-        return total_profit, comision_total, profit_neto, total_lots, total_swap
+        Dentro de check_and_act se captura una vez y se reutiliza hasta que una
+        orden de RiskBot la invalida. Fuera de un ciclo siempre es una lectura nueva.
+        """
+        if refresh or self._snapshot is None or not self._snapshot_cycle:
+            tick_source = self.tick_feed if self._tick_feed_live() else None
+            snapshot = AccountSnapshot.capture(self.broker, self.comision_por_lote, tick_source=tick_source)
+            self.snapshot_stats['captures'] += 1
+            if not self._snapshot_cycle:
+                return snapshot
+            self._snapshot = snapshot
+            self.last_snapshot = snapshot
+        return self._snapshot
+
+    def invalidate_snapshot(self):
+        """Descarta la foto del ciclo (tras cerrar o modificar posiciones)."""
+        if self._snapshot is not None:
+            self._snapshot = None
+            self.snapshot_stats['invalidations'] += 1
+
+    def _send_order(self, request):
+        """Envía una orden al bróker e invalida la foto: las posiciones ya cambiaron."""
+        try:
+            return self.broker.order_send(request)  # type: ignore
+        finally:
+            self.invalidate_snapshot()
+
+    def _symbol_info(self, symbol):
+        """symbol_info desde la foto del ciclo (sin ida y vuelta al terminal)."""
+        if self._snapshot_cycle:
+            info = self.get_snapshot().symbol_infos.get(symbol)
+            if info is not None:
+                return info
+        return self.broker.symbol_info(symbol)  # type: ignore
 
     def _get_real_net_profit(self):
         """
@@ -334,9 +444,9 @@ class RiskBot:
 
         log_debug("RiskBot", f"Cerrando todas las {len(positions)} posiciones abiertas por motivo: {motivo_cierre}.", "WARNING")
         for pos in positions:
-            order_type = mt5.ORDER_TYPE_SELL if pos.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY
+            order_type = self.broker.ORDER_TYPE_SELL if pos.type == self.broker.POSITION_TYPE_BUY else self.broker.ORDER_TYPE_BUY
             request = {
-                "action": mt5.TRADE_ACTION_DEAL,
+                "action": self.broker.TRADE_ACTION_DEAL,
                 "symbol": pos.symbol,
                 "volume": pos.volume,
                 "type": order_type,
@@ -344,24 +454,24 @@ class RiskBot:
                 "deviation": 10,
                 "magic": 1001,
                 "comment": f"RiskBot close ({motivo_cierre})",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_time": self.broker.ORDER_TIME_GTC,
+                "type_filling": self.broker.ORDER_FILLING_IOC,
             }
-            result = mt5.order_send(request)  # type: ignore
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
+            result = self._send_order(request)
+            if result.retcode != self.broker.TRADE_RETCODE_DONE:
                 log_debug("RiskBot", f"Error al cerrar posición {pos.ticket} ({pos.symbol}): {result.retcode} - {result.comment}", "ERROR")
                 log_error_critico("RiskBot", "Cierre Posición", f"Error al cerrar posición {pos.ticket}: {result.comment}", str(result))
             else:
                 log_debug("RiskBot", f"Posición {pos.ticket} en {pos.symbol} cerrada.", "SUCCESS")
 
                 time_apertura_pos_utc = datetime.fromtimestamp(pos.time, tz=pytz.utc)
-                time_cierre_utc = datetime.utcnow()
+                time_cierre_utc = self._now_utc()
                 duracion_segundos = (time_cierre_utc - time_apertura_pos_utc).total_seconds()
 
                 profit_neto_calc = float(pos.profit) - (float(pos.volume) * self.comision_por_lote)
 
                 log_posicion_cerrada(
-                    pos.symbol, pos.ticket, "BUY" if pos.type == mt5.POSITION_TYPE_BUY else "SELL",
+                    pos.symbol, pos.ticket, "BUY" if pos.type == self.broker.POSITION_TYPE_BUY else "SELL",
                     pos.volume, pos.price_open, result.price,
                     profit_neto_calc, motivo_cierre
                 )
@@ -416,7 +526,7 @@ class RiskBot:
                 volume_to_close = current_volume * reduction_factor
 
                 # Verificar volumen mínimo
-                symbol_info = mt5.symbol_info(pos.symbol)  # type: ignore
+                symbol_info = self._symbol_info(pos.symbol)
                 if symbol_info and volume_to_close < symbol_info.volume_min:
                     log_debug("RiskBot", f"Volumen a cerrar {volume_to_close} menor que mínimo {symbol_info.volume_min} para {pos.symbol}", "WARNING")
                     continue
@@ -427,10 +537,10 @@ class RiskBot:
                     volume_to_close = round(volume_to_close / volume_step) * volume_step
 
                 # Determinar tipo de orden de cierre
-                order_type = mt5.ORDER_TYPE_SELL if pos.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY
+                order_type = self.broker.ORDER_TYPE_SELL if pos.type == self.broker.POSITION_TYPE_BUY else self.broker.ORDER_TYPE_BUY
 
                 request = {
-                    "action": mt5.TRADE_ACTION_DEAL,
+                    "action": self.broker.TRADE_ACTION_DEAL,
                     "symbol": pos.symbol,
                     "volume": volume_to_close,
                     "type": order_type,
@@ -438,12 +548,12 @@ class RiskBot:
                     "deviation": 10,
                     "magic": 1001,
                     "comment": f"Reducción Proporcional {self.reduction_percentage}%",
-                    "type_time": mt5.ORDER_TIME_GTC,
-                    "type_filling": mt5.ORDER_FILLING_IOC,
+                    "type_time": self.broker.ORDER_TIME_GTC,
+                    "type_filling": self.broker.ORDER_FILLING_IOC,
                 }
 
-                result = mt5.order_send(request)  # type: ignore
-                if result.retcode == mt5.TRADE_RETCODE_DONE:
+                result = self._send_order(request)
+                if result.retcode == self.broker.TRADE_RETCODE_DONE:
                     successful_reductions += 1
                     log_debug("RiskBot", f"Reducción exitosa en posición {pos.ticket}: {volume_to_close} lotes cerrados", "SUCCESS")
                 else:
@@ -476,7 +586,12 @@ class RiskBot:
         Calcula el valor de un pip para el símbolo y volumen dados.
         """
         try:
-            symbol_info = mt5.symbol_info(symbol)  # type: ignore
+            if self._snapshot_cycle:
+                pip_value = self.get_snapshot().pip_value(symbol, volume)
+                if pip_value > 0:
+                    return pip_value
+
+            symbol_info = self.broker.symbol_info(symbol)  # type: ignore
             if not symbol_info:
                 log_debug("RiskBot", f"No se pudo obtener información del símbolo {symbol}", "ERROR")
                 return 0.0
@@ -485,7 +600,11 @@ class RiskBot:
             # (0.0001 / precio_actual) * tamaño_contrato * volumen
             # Para pares que terminan en JPY, usar 0.01 en lugar de 0.0001
 
-            tick_info = mt5.symbol_info_tick(symbol)  # type: ignore
+            tick_info = None
+            if self._tick_feed_live():
+                tick_info = self.tick_feed.symbol_info_tick(symbol)
+            if tick_info is None:
+                tick_info = self.broker.symbol_info_tick(symbol)  # type: ignore
             if not tick_info:
                 return 0.0
 
@@ -533,14 +652,14 @@ class RiskBot:
                 pips_needed = cost_per_position / pip_value
 
                 # Determinar dirección del ajuste según tipo de posición
-                if pos.type == mt5.POSITION_TYPE_BUY:
+                if pos.type == self.broker.POSITION_TYPE_BUY:
                     # Para BUY, el SL debe estar por debajo del precio de entrada
-                    symbol_info = mt5.symbol_info(pos.symbol)  # type: ignore
+                    symbol_info = self._symbol_info(pos.symbol)
                     point = symbol_info.point if symbol_info else 0.00001
                     new_sl = pos.price_open - (pips_needed * point * 10)  # *10 para convertir pips a points
                 else:
                     # Para SELL, el SL debe estar por encima del precio de entrada
-                    symbol_info = mt5.symbol_info(pos.symbol)  # type: ignore
+                    symbol_info = self._symbol_info(pos.symbol)
                     point = symbol_info.point if symbol_info else 0.00001
                     new_sl = pos.price_open + (pips_needed * point * 10)
 
@@ -551,15 +670,15 @@ class RiskBot:
 
                 # Modificar la posición
                 request = {
-                    "action": mt5.TRADE_ACTION_SLTP,
+                    "action": self.broker.TRADE_ACTION_SLTP,
                     "symbol": pos.symbol,
                     "position": pos.ticket,
                     "sl": new_sl,
                     "tp": pos.tp  # Mantener el TP existente
                 }
 
-                result = mt5.order_send(request)  # type: ignore
-                if result.retcode == mt5.TRADE_RETCODE_DONE:
+                result = self._send_order(request)
+                if result.retcode == self.broker.TRADE_RETCODE_DONE:
                     successful_modifications += 1
                     log_debug("RiskBot", f"BE+ aplicado a posición {pos.ticket}: nuevo SL = {new_sl}", "SUCCESS")
                 else:
@@ -596,7 +715,20 @@ class RiskBot:
         1. Máxima Prioridad: Drawdown y Riesgo Máximo
         2. Prioridad Media: Reducción Proporcional + BE+
         3. Prioridad Baja: Otras estrategias
+
+        Todo el ciclo trabaja sobre una única foto de cuenta (AccountSnapshot);
+        la foto queda en `last_snapshot` para auditoría o replay.
         """
+        self._snapshot = None
+        self._snapshot_cycle = True
+        try:
+            return self._run_risk_cycle()
+        finally:
+            self._snapshot_cycle = False
+            self._snapshot = None
+
+    def _run_risk_cycle(self):
+        """Flujo de prioridades de check_and_act sobre la foto del ciclo."""
         # Resetear flags si no hay posiciones
         self._reset_flags_if_no_positions()
 
@@ -669,7 +801,7 @@ class RiskBot:
     @property
     def account_equity(self):
         """Propiedad dinámica que obtiene el equity actual."""
-        account_info = mt5.account_info()  # type: ignore
+        account_info = self.broker.account_info()  # type: ignore
         if account_info is None:
             log_debug("RiskBot", "No se pudo obtener la información de la cuenta para equity.", "ERROR")
             return 0.0
@@ -846,8 +978,8 @@ class RiskBot:
             log_debug("RiskBot", f"Activando estrategia de 2 posiciones. P&L: ${p_net_real:.2f}, Mín: ${ganancia_minima:.2f}", "INFO")
 
             # Separar posiciones por tipo
-            buy_positions = [pos for pos in positions if pos.type == mt5.POSITION_TYPE_BUY]
-            sell_positions = [pos for pos in positions if pos.type == mt5.POSITION_TYPE_SELL]
+            buy_positions = [pos for pos in positions if pos.type == self.broker.POSITION_TYPE_BUY]
+            sell_positions = [pos for pos in positions if pos.type == self.broker.POSITION_TYPE_SELL]
 
             position_to_close = None
 
@@ -906,11 +1038,11 @@ class RiskBot:
         """
         try:
             # Determinar tipo de orden opuesta
-            order_type = mt5.ORDER_TYPE_SELL if position.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY
+            order_type = self.broker.ORDER_TYPE_SELL if position.type == self.broker.POSITION_TYPE_BUY else self.broker.ORDER_TYPE_BUY
 
             # Crear solicitud de cierre
             request = {
-                "action": mt5.TRADE_ACTION_DEAL,
+                "action": self.broker.TRADE_ACTION_DEAL,
                 "symbol": position.symbol,
                 "volume": position.volume,
                 "type": order_type,
@@ -918,14 +1050,14 @@ class RiskBot:
                 "deviation": 10,
                 "magic": 1001,
                 "comment": f"RiskBot: {motivo_cierre}",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_time": self.broker.ORDER_TIME_GTC,
+                "type_filling": self.broker.ORDER_FILLING_IOC,
             }
 
             # Enviar orden
-            result = mt5.order_send(request)  # type: ignore
+            result = self._send_order(request)
 
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
+            if result.retcode != self.broker.TRADE_RETCODE_DONE:
                 log_debug("RiskBot", f"Error cerrando posición {position.ticket}: {result.retcode} - {result.comment}", "ERROR")
                 return False
             else:
@@ -935,12 +1067,12 @@ class RiskBot:
 
                 # Log detallado para CSV
                 time_apertura_pos_utc = datetime.fromtimestamp(position.time, tz=pytz.utc)
-                time_cierre_utc = datetime.utcnow()
+                time_cierre_utc = self._now_utc()
                 duracion_segundos = (time_cierre_utc - time_apertura_pos_utc).total_seconds()
 
                 log_posicion_cerrada(
                     position.symbol, position.ticket,
-                    "BUY" if position.type == mt5.POSITION_TYPE_BUY else "SELL",
+                    "BUY" if position.type == self.broker.POSITION_TYPE_BUY else "SELL",
                     position.volume, position.price_open, result.price,
                     profit_neto, motivo_cierre
                 )
@@ -975,7 +1107,8 @@ class RiskBot:
                 return False
 
             # Buscar posiciones pequeñas (< 0.05 lotes)
-            small_positions = [pos for pos in positions if pos.volume < 0.05]
+            snapshot = self.get_snapshot()
+            small_positions = snapshot.select(snapshot.volume < 0.05)
 
             if not small_positions:
                 return False
@@ -1039,28 +1172,22 @@ class RiskBot:
         """
         try:
             # Obtener posiciones actuales (excluyendo la que ya se cerró)
-            all_positions = self.get_open_positions()
-            positions = [pos for pos in all_positions if pos.ticket != excluded_ticket]
+            snapshot = self.get_snapshot()
+            available = snapshot.ticket != excluded_ticket
 
-            if not positions:
+            if not available.any():
                 log_debug("RiskBot", "No hay posiciones disponibles para cubrir pérdida", "WARNING")
                 return False
 
-            # Filtrar solo posiciones rentables
-            profitable_positions = [
-                pos for pos in positions
-                if (pos.profit - (pos.volume * self.comision_por_lote)) > 0
-            ]
+            # Solo posiciones rentables, ordenadas por rentabilidad descendente (más rentables primero)
+            net_profit = snapshot.net_profit
+            candidates = np.flatnonzero(available & (net_profit > 0))
 
-            if not profitable_positions:
+            if candidates.size == 0:
                 log_debug("RiskBot", "No hay posiciones rentables para cubrir pérdida", "WARNING")
                 return False
 
-            # Ordenar por rentabilidad descendente (más rentables primero)
-            profitable_positions.sort(
-                key=lambda p: p.profit - (p.volume * self.comision_por_lote),
-                reverse=True
-            )
+            profitable_positions = snapshot.select(candidates[np.argsort(-net_profit[candidates], kind='stable')])
 
             total_covered = 0.0
             positions_used = 0
@@ -1091,7 +1218,7 @@ class RiskBot:
                     volume_to_close = pos.volume * volume_percentage
 
                     # Asegurar volumen mínimo del símbolo
-                    symbol_info = mt5.symbol_info(pos.symbol)  # type: ignore
+                    symbol_info = self._symbol_info(pos.symbol)
                     if symbol_info and volume_to_close < symbol_info.volume_min:
                         volume_to_close = symbol_info.volume_min
 
@@ -1153,11 +1280,11 @@ class RiskBot:
                 return False
 
             # Determinar tipo de orden opuesta
-            order_type = mt5.ORDER_TYPE_SELL if position.type == mt5.POSITION_TYPE_BUY else mt5.ORDER_TYPE_BUY
+            order_type = self.broker.ORDER_TYPE_SELL if position.type == self.broker.POSITION_TYPE_BUY else self.broker.ORDER_TYPE_BUY
 
             # Crear solicitud de cierre parcial
             request = {
-                "action": mt5.TRADE_ACTION_DEAL,
+                "action": self.broker.TRADE_ACTION_DEAL,
                 "symbol": position.symbol,
                 "volume": volume_to_close,
                 "type": order_type,
@@ -1165,14 +1292,14 @@ class RiskBot:
                 "deviation": 10,
                 "magic": 1001,
                 "comment": f"RiskBot: {motivo_cierre}",
-                "type_time": mt5.ORDER_TIME_GTC,
-                "type_filling": mt5.ORDER_FILLING_IOC,
+                "type_time": self.broker.ORDER_TIME_GTC,
+                "type_filling": self.broker.ORDER_FILLING_IOC,
             }
 
             # Enviar orden
-            result = mt5.order_send(request)  # type: ignore
+            result = self._send_order(request)
 
-            if result.retcode != mt5.TRADE_RETCODE_DONE:
+            if result.retcode != self.broker.TRADE_RETCODE_DONE:
                 log_debug("RiskBot", f"Error en cierre parcial {position.ticket}: {result.retcode} - {result.comment}", "ERROR")
                 return False
             else:
@@ -11,6 +11,7 @@ Características:
 - Control en tiempo real del sistema de trading
 - WebSocket support para dashboards web
 - Thread-safe communication
+- Difusión incremental: solo secciones cambiadas, con número de secuencia
 """
 
 import threading
@@ -24,13 +25,21 @@ from sistema.sic import time
 # MIGRADO A SLUC v2.0
 from sistema.sic import enviar_senal_log
 
+# 🔢 VERSIONADO DE ESTADO POR SECCIONES
+from dashboard.state_versioning import DirtyFieldsMixin, StateVersionTracker
+
 # 🎯 INTEGRACIÓN ACC - CENTRO DE MANDO DE ANÁLISIS
 from core.analysis_command_center import AnalysisOrchestrator
 # run_comprehensive_analysis reservado para futuras extensiones
 
 @dataclass
-class DashboardState:
-    """Estado compartido del dashboard"""
+class DashboardState(DirtyFieldsMixin):
+    """
+    Estado compartido del dashboard
+
+    Cada asignación marca el campo como sucio; las mutaciones in-place de
+    listas/dicts deben llamar a mark_dirty(campo).
+    """
     # Estados del sistema
     trading_active: bool = False
     dashboard_active: bool = False
@@ -79,6 +88,9 @@ class DashboardController:
         self.state = DashboardState()
         self.state_lock = threading.RLock()
 
+        # 🔢 Versionado: secuencia monotónica y secciones cambiadas por dashboard
+        self.state_tracker = StateVersionTracker()
+
         # 🎯 INICIALIZAR ACC - CENTRO DE MANDO DE ANÁLISIS
         self.acc_orchestrator = AnalysisOrchestrator(
             enable_cache=True,
@@ -102,6 +114,7 @@ class DashboardController:
         # Métricas
         self.start_time = time.time()
         self.updates_sent = 0
+        self.updates_skipped = 0
         self.commands_processed = 0
 
         # 📝 LOG INICIALIZACIÓN ACC
@@ -123,12 +136,14 @@ class DashboardController:
     def register_dashboard(self, dashboard_id: str, dashboard_instance):
         """Registrar un dashboard para recibir actualizaciones"""
         self.active_dashboards[dashboard_id] = dashboard_instance
+        self.state_tracker.register_client(dashboard_id)
         enviar_senal_log("INFO", f"📊 Dashboard registrado: {dashboard_id}", __name__, "general")
 
     def unregister_dashboard(self, dashboard_id: str):
         """Desregistrar dashboard"""
         if dashboard_id in self.active_dashboards:
             del self.active_dashboards[dashboard_id]
+            self.state_tracker.unregister_client(dashboard_id)
             enviar_senal_log("INFO", f"📊 Dashboard desregistrado: {dashboard_id}", __name__, "general")
 
     def start(self):
@@ -370,27 +385,54 @@ class DashboardController:
         except (JSONDecodeError, ValueError) as e:
             enviar_senal_log("ERROR", f"Error sincronizando estado: {e}", __name__, "general")
 
+    def _commit_state(self) -> List[str]:
+        """Publicar los campos sucios que cambiaron; retorna las secciones cambiadas"""
+        with self.state_lock:
+            return self.state_tracker.commit(self.state, self.state.pop_dirty())
+
     def _broadcast_updates(self):
-        """Enviar actualizaciones a todos los dashboards activos"""
+        """Enviar a cada dashboard activo solo las secciones cambiadas desde su última secuencia"""
         if not self.active_dashboards:
             return
 
         try:
-            # Preparar datos para envío
-            state_dict = asdict(self.state)
+            self._commit_state()
 
             # Enviar a cada dashboard registrado
-            for dashboard_id, dashboard in self.active_dashboards.items():
+            for dashboard_id, dashboard in list(self.active_dashboards.items()):
                 try:
-                    if hasattr(dashboard, 'update_from_controller'):
-                        dashboard.update_from_controller(state_dict)
-                    self.updates_sent += 1
+                    self._send_state_delta(dashboard_id, dashboard)
                 except (JSONDecodeError, ValueError) as e:
                     enviar_senal_log("ERROR", f"Error enviando update a {dashboard_id}: {e}", __name__, "general")
 
         except (JSONDecodeError, ValueError) as e:
             enviar_senal_log("ERROR", f"Error en broadcast: {e}", __name__, "general")
 
+    def _send_state_delta(self, dashboard_id: str, dashboard) -> bool:
+        """
+        Entregar el delta pendiente a un dashboard
+
+        - update_from_controller_delta(delta): recibe solo las secciones cambiadas
+        - update_from_controller(state): estado publicado completo + '_sequence'
+          y '_changed_sections' para que el widget salte paneles sin cambios
+
+        Retorna False si el dashboard ya tenía la última versión (no se llama).
+        """
+        delta = self.state_tracker.delta_for(dashboard_id)
+        if delta is None:
+            self.updates_skipped += 1
+            return False
+
+        if hasattr(dashboard, 'update_from_controller_delta'):
+            dashboard.update_from_controller_delta(delta)
+        elif hasattr(dashboard, 'update_from_controller'):
+            state_dict = self.state_tracker.published_state()
+            state_dict['_sequence'] = delta['sequence']
+            state_dict['_changed_sections'] = delta['changed_sections']
+            dashboard.update_from_controller(state_dict)
+        self.updates_sent += 1
+        return True
+
     # API Pública para dashboards
     def send_command(self, command_type: str, data: Optional[Dict[str, Any]] = None):
         """Enviar comando al sistema de trading"""
@@ -407,11 +449,23 @@ class DashboardController:
         with self.state_lock:
             return asdict(self.state)
 
+    def get_state_delta(self, since_sequence: int = 0) -> Dict[str, Any]:
+        """
+        Secciones cambiadas desde una secuencia (para dashboards web por polling)
+
+        Args:
+            since_sequence: Última secuencia vista por el cliente (0 = estado completo)
+        """
+        self._commit_state()
+        return self.state_tracker.delta_since(since_sequence)
+
     def get_metrics(self) -> Dict[str, Any]:
         """Obtener métricas del controlador"""
         return {
             'uptime': time.time() - self.start_time,
             'updates_sent': self.updates_sent,
+            'updates_skipped': self.updates_skipped,
+            'state_sequence': self.state_tracker.sequence,
             'commands_processed': self.commands_processed,
             'active_dashboards': len(self.active_dashboards),
             'last_sync': self.state.last_update
@@ -428,6 +482,7 @@ class DashboardController:
 
         with self.state_lock:
             self.state.alerts.append(alert)
+            self.state.mark_dirty('alerts')
             # Mantener solo las últimas 20 alertas
             if len(self.state.alerts) > 20:
                 self.state.alerts = self.state.alerts[-20:]
@@ -443,6 +498,7 @@ class DashboardController:
 
         with self.state_lock:
             self.state.recent_logs.append(log_entry)
+            self.state.mark_dirty('recent_logs')
             # Mantener solo los últimos 50 logs
             if len(self.state.recent_logs) > 50:
                 self.state.recent_logs = self.state.recent_logs[-50:]
@@ -634,11 +690,12 @@ class DashboardController:
                     enviar_senal_log("INFO", f"   ✅ [WIDGET-SUCCESS] {dashboard_type} refrescado exitosamente", __name__, "general")
                     successful_notifications += 1
 
-                elif hasattr(dashboard, 'update_from_controller'):
+                elif hasattr(dashboard, 'update_from_controller') or hasattr(dashboard, 'update_from_controller_delta'):
                     enviar_senal_log("INFO", f"   🔄 [WIDGET-UPDATE] Actualizando {dashboard_type} (ID: {dashboard_id})", __name__, "general")
-                    # Método genérico para widgets
-                    dashboard.update_from_controller(self.get_state())
-                    enviar_senal_log("INFO", f"   ✅ [WIDGET-SUCCESS] {dashboard_type} actualizado con estado del controller", __name__, "general")
+                    # Método genérico para widgets: solo secciones cambiadas
+                    self._commit_state()
+                    if self._send_state_delta(dashboard_id, dashboard):
+                        enviar_senal_log("INFO", f"   ✅ [WIDGET-SUCCESS] {dashboard_type} actualizado con estado del controller", __name__, "general")
                     successful_notifications += 1
 
                 else:
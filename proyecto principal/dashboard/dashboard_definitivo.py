@@ -46,6 +46,8 @@ from sistema.sic import (
     ImportsCentral, get_dashboard, get_logging, get_mt5_manager,
     get_ict_components, get_system_status, ConfigManager
 )
+from sistema.lazy_loading import (component_status, get_startup_profiler, is_component_built, lazy_component,
+                                  preload_components)
 
 # === IMPORTS TEXTUAL PRIMERO ===
 try:
@@ -324,6 +326,9 @@ class SentinelDashboardDefinitivo(App):
     con el análisis ICT completo y avanzado del sistema.
     """
 
+    # 🎯 Filas de POI que muestra el panel ICT (top por score)
+    POI_DISPLAY_ROWS = 10
+
     # 🎨 CSS profesional
     CSS = """
     Screen {
@@ -452,56 +457,12 @@ class SentinelDashboardDefinitivo(App):
         self.current_price = 0.0
         self.initialize_mt5_connection()
 
-        # 🧠 CAJA NEGRA ICT COMPLETA - TODOS LOS ESPECIALISTAS CONECTADOS
-        self.ict_analyzer = ICTPatternAnalyzer()
-        self.ict_detector = ICTDetector()  # Detector principal ICT
-        self.confidence_engine = ConfidenceEngine()  # Motor de confianza
-        self.veredicto_engine = VeredictoEngine()  # Motor de veredicto final
-        self.historical_analyzer = ICTHistoricalAnalyzer()  # Análisis histórico
+        # 🧠 CAJA NEGRA ICT COMPLETA - especialistas diferidos (@lazy_component más abajo):
+        # se construyen en su primer uso o en segundo plano tras el primer pintado
         self.ict_widget = ICTProfessionalWidget()
 
-        # 🚀 SPRINT 1.7 - ADVANCED PATTERNS v2.0
-        try:
-            self.advanced_silver_bullet = AdvancedSilverBulletDetector()  # Silver Bullet v2.0
-            self.judas_swing_analyzer = JudasSwingAnalyzer()  # Judas Swing v2.0
-            self.market_structure_engine = MarketStructureEngine()  # Market Structure v2.0
-            enviar_senal_log("INFO", "🚀 Sprint 1.7 Advanced Patterns v2.0 inicializados", "dashboard_definitivo", "sprint_1_7")
-        except Exception as e:
-            enviar_senal_log("ERROR", f"❌ Error inicializando Advanced Patterns: {e}", "dashboard_definitivo", "sprint_1_7")
-            self.advanced_silver_bullet = None
-            self.judas_swing_analyzer = None
-            self.market_structure_engine = None
-
         # 🎯 SISTEMA POI - ESPECIALISTAS COMPLETOS (usando imports del header)
         self.poi_detector_functions = poi_detector  # Módulo de funciones POI
-        self.poi_scoring_engine = POIScoringEngine()  # Motor de calificación
-
-        # 💼 TRADING CORE - MOTORES DE DECISIÓN
-        try:
-            self.trading_engine = TradingDecisionEngine()  # Motor principal de trading
-            self.decision_cache = TradingDecisionCache()  # Cache inteligente
-            enviar_senal_log("INFO", "💼 Trading Core conectado exitosamente", "dashboard_definitivo", "migration")
-        except (FileNotFoundError, PermissionError, IOError) as e:
-            enviar_senal_log("INFO", f"⚠️ Trading Core no disponible: {e}", "dashboard_definitivo", "migration")
-            self.trading_engine = None
-            self.decision_cache = None
-
-        # 🔗 MANAGERS Y CONECTORES ESPECIALIZADOS
-        try:
-            self.limit_order_manager = LimitOrderManager()
-            self.config_manager = ConfigManager()
-            self.riskbot = RiskBot(
-                risk_target_profit=10.0,
-                max_profit_target=130.0,
-                risk_percent=1.0
-            )
-            enviar_senal_log("INFO", "✅ Managers especializados conectados", "dashboard_definitivo", "migration")
-            enviar_senal_log("INFO", "🛡️ RiskBot integrado - Gestión de riesgo avanzada activa", "dashboard_definitivo", "migration")
-        except (FileNotFoundError, PermissionError, IOError) as e:
-            enviar_senal_log("INFO", f"⚠️ Algunos managers no disponibles: {e}", "dashboard_definitivo", "migration")
-            self.limit_order_manager = None
-            self.config_manager = None
-            self.riskbot = None
 
         # 📊 LOGGERS INTELIGENTES (Usar sistema SLUC v2.1)
         # Solo usar el sistema de logging centralizado
@@ -519,6 +480,7 @@ class SentinelDashboardDefinitivo(App):
         enviar_senal_log("INFO", "🔗 Managers: Limit Orders, Config", "dashboard_definitivo", "migration")
         enviar_senal_log("INFO", "🛡️ Risk Management: RiskBot MT5, Position Management", "dashboard_definitivo", "migration")
         enviar_senal_log("INFO", "📊 Logging: Smart Logger activo", "dashboard_definitivo", "migration")
+        enviar_senal_log("INFO", f"🐢 Construcción diferida: {component_status(self)}", "dashboard_definitivo", "migration")
         enviar_senal_log("INFO", "🚀 TODOS LOS ESPECIALISTAS LISTOS PARA ACCIÓN", "dashboard_definitivo", "migration")
 
         # 🔗 DASHBOARD CONTROLLER INTEGRATION - CRÍTICO PARA COMUNICACIÓN CON BACKEND
@@ -565,6 +527,84 @@ class SentinelDashboardDefinitivo(App):
         # Initialize attributes that might be defined later
         self.market_context_obj = None
         self.last_update_time = None
+        get_startup_profiler().mark('dashboard construido')
+
+    # ===============================
+    # 🧠 ESPECIALISTAS DIFERIDOS (primer uso)
+    # ===============================
+
+    @lazy_component
+    def ict_analyzer(self):
+        return ICTPatternAnalyzer()
+
+    @lazy_component
+    def ict_detector(self):
+        return ICTDetector()  # Detector principal ICT
+
+    @lazy_component
+    def confidence_engine(self):
+        return ConfidenceEngine()  # Motor de confianza
+
+    @lazy_component
+    def veredicto_engine(self):
+        return VeredictoEngine()  # Motor de veredicto final
+
+    @lazy_component
+    def historical_analyzer(self):
+        return ICTHistoricalAnalyzer()  # Análisis histórico
+
+    # 🚀 SPRINT 1.7 - ADVANCED PATTERNS v2.0 (None si fallan)
+    @lazy_component(fallback=None)
+    def advanced_silver_bullet(self):
+        return AdvancedSilverBulletDetector()  # Silver Bullet v2.0
+
+    @lazy_component(fallback=None)
+    def judas_swing_analyzer(self):
+        return JudasSwingAnalyzer()  # Judas Swing v2.0
+
+    @lazy_component(fallback=None)
+    def market_structure_engine(self):
+        return MarketStructureEngine()  # Market Structure v2.0
+
+    @lazy_component
+    def poi_scoring_engine(self):
+        return POIScoringEngine()  # Motor de calificación
+
+    # 💼 TRADING CORE - MOTORES DE DECISIÓN (None si no disponibles)
+    @lazy_component(fallback=None)
+    def trading_engine(self):
+        return TradingDecisionEngine()  # Motor principal de trading
+
+    @lazy_component(fallback=None)
+    def decision_cache(self):
+        return TradingDecisionCache()  # Cache inteligente
+
+    # 🔗 MANAGERS Y CONECTORES ESPECIALIZADOS (None si no disponibles)
+    @lazy_component(fallback=None)
+    def limit_order_manager(self):
+        return self._with_tick_feed(LimitOrderManager())
+
+    @lazy_component(fallback=None)
+    def config_manager(self):
+        return ConfigManager()
+
+    @lazy_component(fallback=None)
+    def riskbot(self):
+        riskbot = RiskBot(
+            risk_target_profit=10.0,
+            max_profit_target=130.0,
+            risk_percent=1.0
+        )
+        if self.mt5_manager:
+            riskbot.attach_correlation_feed(self.mt5_manager)  # Velas cerradas para la correlación en vivo
+        return self._with_tick_feed(riskbot)
+
+    def _with_tick_feed(self, component):
+        """Comparte el TickFeed del MT5DataManager (si el stream ya arrancó) con un componente."""
+        tick_feed = getattr(self.mt5_manager, 'tick_feed', None) if self.mt5_manager else None
+        if tick_feed is not None:
+            component.attach_tick_feed(tick_feed)
+        return component
 
     def initialize_mt5_connection(self):
         """Inicializa la conexión real con MetaTrader5"""
@@ -595,6 +635,17 @@ class SentinelDashboardDefinitivo(App):
 
                     self.mt5_connected = True
                     self.system_metrics['mt5_connections'] += 1
+
+                    # Loop único de ticks: precio, spread y velas en formación desde memoria,
+                    # compartido con RiskBot y LimitOrderManager (los aún no construidos lo reciben al crearse)
+                    tick_feed = self.mt5_manager.start_tick_stream([self.symbol])
+                    if tick_feed is not None:
+                        for name in ('riskbot', 'limit_order_manager'):
+                            component = getattr(self, name) if is_component_built(self, name) else None
+                            if component is not None:
+                                component.attach_tick_feed(tick_feed)
+                    if is_component_built(self, 'riskbot') and self.riskbot is not None:
+                        self.riskbot.attach_correlation_feed(self.mt5_manager)
                     enviar_senal_log("INFO", "🚀 Dashboard conectado a datos reales MT5", "dashboard_definitivo", "migration")
 
                     # Log usando sistema SLUC
@@ -627,6 +678,11 @@ class SentinelDashboardDefinitivo(App):
         """Actualiza el precio actual desde MT5"""
         try:
             if self.mt5_manager and self.mt5_connected:
+                tick = self.mt5_manager.get_symbol_tick(self.symbol)
+                if tick and tick.get('bid'):
+                    self.current_price = tick['bid']
+                    return True
+
                 # Obtener datos recientes para extraer precio actual
                 recent_data = self.mt5_manager.get_historical_data(self.symbol, "M1", 1)
                 if recent_data is not None and not recent_data.empty:
@@ -856,6 +912,10 @@ class SentinelDashboardDefinitivo(App):
         else:
             enviar_senal_log("WARNING", "⚠️ Dashboard Controller no disponible - modo independiente", "dashboard_definitivo", "mount")
 
+        # 🔥 Primer pintado listo: construir el resto de especialistas en segundo plano
+        get_startup_profiler().mark('dashboard montado')
+        preload_components(self)
+
         enviar_senal_log("INFO", "✅ Dashboard completamente inicializado y operativo", "dashboard_definitivo", "mount")
         enviar_senal_log("INFO", f"🔗 MT5 conectado: {self.mt5_connected}", "dashboard_definitivo", "mount")
         enviar_senal_log("INFO", f"📊 Símbolo activo: {self.symbol}", "dashboard_definitivo", "mount")
@@ -1978,35 +2038,14 @@ class SentinelDashboardDefinitivo(App):
 
             enviar_senal_log("INFO", f"🎯 Aplicando scoring avanzado a {len(raw_pois)} POIs...", "dashboard_definitivo", "poi_scoring")
 
-            for poi in raw_pois:
-                try:
-                    # Usar el scoring engine avanzado
-                    intelligent_score = self.poi_scoring_engine.calculate_intelligent_score(
-                        poi, current_price, market_context
-                    )
-
-                    # Mejorar el POI con el scoring avanzado
-                    enhanced_poi = poi.copy()
-                    enhanced_poi.update({
-                        'intelligent_score': intelligent_score.get('final_score', poi.get('score', 50)),
-                        'grade': intelligent_score.get('grade', 'C'),
-                        'confidence': intelligent_score.get('confidence', 0.5),
-                        'narrative': intelligent_score.get('narrative', f"POI {poi.get('type', 'UNKNOWN')} detectado"),
-                        'color': intelligent_score.get('color', 'white'),
-                        'distance_pips': intelligent_score.get('distance_pips', 0),
-                        'enhanced': True
-                    })
-
-                    enhanced_pois.append(enhanced_poi)
-
-                except (FileNotFoundError, PermissionError, IOError) as scoring_error:
-                    enviar_senal_log("WARNING", f"⚠️ Error en scoring POI individual: {scoring_error}", "dashboard_definitivo", "poi_scoring")
-                    enhanced_pois.append(poi)  # Fallback al POI original
+            # Scoring por lotes; solo las filas visibles de calidad (grado B o mejor) reciben narrativa
+            for poi in self.poi_scoring_engine.process_pois_for_dashboard(
+                    raw_pois, current_price, market_context, top_k=self.POI_DISPLAY_ROWS, min_grade='B'):
+                poi['enhanced'] = True
+                enhanced_pois.append(poi)
+            quality_pois = enhanced_pois
 
-            # Filtrar POIs por calidad (solo grado B o mejor)
-            quality_pois = [poi for poi in enhanced_pois if poi.get('grade', 'D') in ['A+', 'A', 'B']]
-
-            enviar_senal_log("INFO", f"✅ Scoring avanzado completado: {len(enhanced_pois)} procesados → {len(quality_pois)} de calidad", "dashboard_definitivo", "poi_scoring")
+            enviar_senal_log("INFO", f"✅ Scoring avanzado completado: {len(raw_pois)} procesados → {len(quality_pois)} de calidad", "dashboard_definitivo", "poi_scoring")
 
             return quality_pois
 
@@ -2071,15 +2110,17 @@ class SentinelDashboardDefinitivo(App):
         try:
             enriched_patterns = []
 
-            for pattern in patterns:
-                # Usar el Confidence Engine para calcular confianza
-                confidence_score = self.confidence_engine.calculate_pattern_confidence(
-                    pattern=pattern,
-                    market_context=market_context,
-                    poi_list=pois,
-                    current_price=self.current_price,
-                    current_session=self.get_current_session_type()
-                )
+            # Usar el Confidence Engine: todos los patrones del ciclo en un solo lote
+            confidence_scores = self.confidence_engine.calculate_batch_confidence(
+                patterns=patterns,
+                market_context=market_context,
+                poi_list=pois,
+                current_price=self.current_price,
+                current_session=self.get_current_session_type()
+            )
+
+            for pattern, confidence_score in zip(patterns, confidence_scores):
+                confidence_score = float(confidence_score)
 
                 # Enriquecer patrón con score de confianza
                 enriched_pattern = pattern.copy()
@@ -2380,7 +2421,7 @@ class SentinelDashboardDefinitivo(App):
 
             # Ordenar por score descendente
             unique_pois.sort(key=lambda x: x.get('score', 0), reverse=True)
-            return unique_pois[:10]  # Top 10 POIs
+            return unique_pois[:self.POI_DISPLAY_ROWS]  # Top POIs visibles
 
         except (FileNotFoundError, PermissionError, IOError) as e:
             if self.debug_mode:
@@ -2947,20 +2988,25 @@ class SentinelDashboardDefinitivo(App):
     def update_from_controller(self, controller_state):
         """
         🎯 MÉTODO REQUERIDO POR DASHBOARDCONTROLLER
-        Este método es llamado por el DashboardController para enviar actualizaciones
+        Este método es llamado por el DashboardController para enviar actualizaciones.
+        '_changed_sections' indica qué secciones cambiaron desde la última secuencia
+        recibida: las que no cambiaron no se reprocesan ni se re-renderizan.
         """
         try:
             enviar_senal_log("INFO", "🔄 [DASHBOARD-CALLBACK] Recibiendo estado del controller", "dashboard_definitivo", "callbacks")
 
             # Verificar si hay datos válidos en el estado del controller
             if controller_state:
+                changed_sections = controller_state.get('_changed_sections')
+                changed = set(changed_sections) if changed_sections is not None else {'prices', 'pois', 'patterns'}
+
                 # Actualizar precio actual
-                if 'current_price' in controller_state and controller_state['current_price'] > 0:
+                if 'prices' in changed and 'current_price' in controller_state and controller_state['current_price'] > 0:
                     self.current_price = controller_state['current_price']
                     enviar_senal_log("INFO", f"💰 Precio actualizado: {self.current_price}", "dashboard_definitivo", "callbacks")
 
                 # Actualizar POIs desde poi_results
-                if 'poi_results' in controller_state and controller_state['poi_results']:
+                if 'pois' in changed and 'poi_results' in controller_state and controller_state['poi_results']:
                     poi_data = controller_state['poi_results']
                     if 'pois' in poi_data:
                         self.real_market_data['pois_detected'] = poi_data['pois']
@@ -2968,7 +3014,7 @@ class SentinelDashboardDefinitivo(App):
                         enviar_senal_log("INFO", f"🎯 POIs actualizados: {self.patterns_detected} detectados", "dashboard_definitivo", "callbacks")
 
                 # Actualizar análisis ICT desde ict_results
-                if 'ict_results' in controller_state and controller_state['ict_results']:
+                if 'patterns' in changed and 'ict_results' in controller_state and controller_state['ict_results']:
                     self.real_market_data['market_context'] = controller_state['ict_results']
                     enviar_senal_log("INFO", "📊 Análisis ICT actualizado", "dashboard_definitivo", "callbacks")
 
@@ -2979,8 +3025,9 @@ class SentinelDashboardDefinitivo(App):
                 # Incrementar contador de actualizaciones
                 self.system_metrics['data_updates'] += 1
 
-                # Forzar actualización de todos los paneles
-                self.update_active_panel()
+                # Re-renderizar solo si cambió algún panel visible
+                if changed & {'prices', 'pois', 'patterns'}:
+                    self.update_active_panel()
 
                 enviar_senal_log("INFO", "✅ [DASHBOARD-CALLBACK] Estado del controller procesado exitosamente", "dashboard_definitivo", "callbacks")
             else:
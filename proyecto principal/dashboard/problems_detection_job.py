@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+⚡ PROBLEMS DETECTION JOB - Detección de errores en segundo plano
+=================================================================
+Ejecuta el detector de errores (modo incremental) en un hilo daemon y
+publica cada resultado, parcial o final, a los suscriptores. La pestaña
+🚨 Problemas se suscribe y pinta lo último recibido: abrirla nunca espera
+al detector ni recorre el directorio de diagnósticos.
+
+- start(): lanza una ejecución si no hay otra en curso (no bloquea)
+- subscribe(callback): callback(report) en cada publicación
+- latest: último reporte en memoria; al arrancar se lee una sola vez
+  deteccion_errores_latest.json (o la bitácora más reciente si no existe)
+
+Versión: v1.0.0
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import importlib.util
+import json
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+WORKSPACE_ROOT = Path(__file__).parent.parent
+ERROR_DETECTOR_SCRIPT = WORKSPACE_ROOT / "docs" / "scripts" / "error_detection" / "error_detector.py"
+DIAGNOSTICS_DIR = WORKSPACE_ROOT / "docs" / "bitacoras" / "diagnosticos"
+LATEST_REPORT_FILE = "deteccion_errores_latest.json"
+
+_detector_module = None
+
+
+def _load_error_detector(workspace_root: Path) -> Any:
+    """ErrorDetector del script de detección (importado una vez, sin subprocess)"""
+    global _detector_module
+    if _detector_module is None:
+        spec = importlib.util.spec_from_file_location("error_detector", ERROR_DETECTOR_SCRIPT)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _detector_module = module
+    return _detector_module.ErrorDetector(str(workspace_root), quiet=True)
+
+
+class ProblemsDetectionJob:
+    """⚡ Ejecución en segundo plano del detector con publicación a suscriptores"""
+
+    def __init__(self, workspace_root: Path = WORKSPACE_ROOT, diagnostics_dir: Path = DIAGNOSTICS_DIR,
+                 detector_factory: Callable[[Path], Any] = _load_error_detector):
+        """
+        Args:
+            workspace_root: Raíz analizada por el detector
+            diagnostics_dir: Directorio de bitácoras de diagnóstico
+            detector_factory: Crea el detector (objeto con analyze_incremental)
+        """
+        self.workspace_root = Path(workspace_root)
+        self.diagnostics_dir = Path(diagnostics_dir)
+        self.detector_factory = detector_factory
+
+        self._lock = threading.Lock()
+        self._subscribers: List[Callable[[Dict[str, Any]], None]] = []
+        self._latest: Optional[Dict[str, Any]] = None
+        self._cache_loaded = False
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self.runs = 0
+
+    # ===============================
+    # SUSCRIPCIÓN
+    # ===============================
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None]) -> Callable[[], None]:
+        """Registra callback(report); devuelve la función para darse de baja"""
+        with self._lock:
+            self._subscribers.append(callback)
+
+        def _unsubscribe():
+            with self._lock:
+                if callback in self._subscribers:
+                    self._subscribers.remove(callback)
+        return _unsubscribe
+
+    @property
+    def latest(self) -> Optional[Dict[str, Any]]:
+        """Último reporte (en memoria; la primera vez se lee el último guardado)"""
+        if not self._cache_loaded:
+            self._load_cached_report()
+        return self._latest
+
+    def _publish(self, report: Dict[str, Any]) -> None:
+        with self._lock:
+            self._latest = report
+            self._cache_loaded = True
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(report)
+            except Exception:
+                pass  # Un suscriptor roto no detiene la detección
+
+    def _load_cached_report(self) -> None:
+        """Lectura única del último reporte en disco"""
+        report = None
+        latest_file = self.diagnostics_dir / LATEST_REPORT_FILE
+        try:
+            if not latest_file.exists() and self.diagnostics_dir.exists():
+                history = sorted(self.diagnostics_dir.glob("deteccion_errores_2*.json"))
+                latest_file = history[-1] if history else latest_file
+            if latest_file.exists():
+                with open(latest_file, 'r', encoding='utf-8') as f:
+                    report = json.load(f)
+        except (OSError, ValueError):
+            report = None
+        with self._lock:
+            if not self._cache_loaded:
+                self._latest = report
+                self._cache_loaded = True
+
+    # ===============================
+    # EJECUCIÓN
+    # ===============================
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, quick_mode: bool = True) -> bool:
+        """Lanza la detección en un hilo daemon; False si ya hay una en curso"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(target=self._run, args=(quick_mode,),
+                                            name='problems-detection', daemon=True)
+            self._thread.start()
+        return True
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Espera a que termine la ejecución en curso (True si terminó)"""
+        thread = self._thread
+        if thread is None:
+            return True
+        thread.join(timeout)
+        return not thread.is_alive()
+
+    def _run(self, quick_mode: bool) -> None:
+        try:
+            detector = self.detector_factory(self.workspace_root)
+            detector.analyze_incremental(quick_mode=quick_mode, on_progress=self._publish)
+            self.last_error = None
+        except Exception as e:
+            self.last_error = str(e)
+        finally:
+            self.runs += 1
+
+
+_detection_job: Optional[ProblemsDetectionJob] = None
+
+
+def get_detection_job() -> ProblemsDetectionJob:
+    """Job compartido por todas las instancias de la pestaña"""
+    global _detection_job
+    if _detection_job is None:
+        _detection_job = ProblemsDetectionJob()
+    return _detection_job
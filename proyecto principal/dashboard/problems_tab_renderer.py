@@ -17,6 +17,8 @@
 🎨 INTEGRACIÓN:
    - Función principal: render_problems_tab()
    - Auto-detección y carga de problemas
+   - Detección en segundo plano (ProblemsDetectionJob): la pestaña se
+     suscribe a los resultados y nunca espera al detector
    - UI responsiva y clara
    - Botones de acción
 
@@ -46,16 +48,21 @@ try:
 except ImportError:
     RICH_AVAILABLE = False
 
+try:
+    from dashboard.problems_detection_job import ProblemsDetectionJob, get_detection_job
+except ImportError:
+    from problems_detection_job import ProblemsDetectionJob, get_detection_job
+
 # Configuración global
 WORKSPACE_ROOT = Path(__file__).parent.parent
-ERROR_DETECTOR_SCRIPT = WORKSPACE_ROOT / "scripts" / "error_detection" / "error_detector.py"
+ERROR_DETECTOR_SCRIPT = WORKSPACE_ROOT / "docs" / "scripts" / "error_detection" / "error_detector.py"
 DIAGNOSTICS_DIR = WORKSPACE_ROOT / "docs" / "bitacoras" / "diagnosticos"
 
 
 class ProblemsTabRenderer:
     """🚨 Renderizador de la pestaña Problemas del Dashboard"""
 
-    def __init__(self):
+    def __init__(self, detection_job: Optional[ProblemsDetectionJob] = None):
         self.console = Console() if RICH_AVAILABLE else None
         self.current_problems: List[Dict] = []
         self.current_stats: Dict = {}
@@ -65,6 +72,27 @@ class ProblemsTabRenderer:
             'show_resolved': False
         }
 
+        # Resultados por suscripción: el job publica, la pestaña solo pinta
+        self.detection_job = detection_job or get_detection_job()
+        self._unsubscribe = self.detection_job.subscribe(self._on_detection_results)
+        self._has_results = False
+
+    def close(self):
+        """🔌 Cancelar la suscripción al job de detección"""
+        self._unsubscribe()
+
+    def _on_detection_results(self, report: Dict[str, Any]):
+        """📥 Resultado (parcial o final) publicado por el job de detección"""
+        self._apply_report(report)
+
+    def _apply_report(self, data: Dict[str, Any]):
+        self.current_problems = data.get('problems', [])
+        self.current_stats = {**data.get('summary', {}), **data.get('statistics', {})}
+        if 'status' in data:
+            self.current_stats['status'] = data['status']
+            self.current_stats['progress'] = data.get('progress', {})
+        self._has_results = True
+
     def render_tab(self) -> str:
         """🎨 Renderizar pestaña completa de problemas"""
         if not RICH_AVAILABLE:
@@ -174,6 +202,11 @@ class ProblemsTabRenderer:
         analysis_time = self.current_stats.get('analysis_time', 0)
         stats_table.add_row("⏱️ Tiempo", f"{analysis_time:.1f}s")
 
+        # Progreso de la detección en segundo plano
+        if self.current_stats.get('status') == 'running':
+            progress = self.current_stats.get('progress', {})
+            stats_table.add_row("🔄 Detectando", f"{progress.get('done', 0)}/{progress.get('total', 0)}")
+
         return Panel(
             stats_table,
             title="📊 Estadísticas",
@@ -246,20 +279,15 @@ class ProblemsTabRenderer:
         )
 
     def _load_latest_detection_data(self):
-        """📂 Cargar datos más recientes de detección"""
-        try:
-            # Buscar archivo más reciente en diagnosticos
-            if DIAGNOSTICS_DIR.exists():
-                detection_files = list(DIAGNOSTICS_DIR.glob("deteccion_errores_*.json"))
-                if detection_files:
-                    latest_file = max(detection_files, key=lambda f: f.stat().st_mtime)
+        """📂 Cargar datos más recientes de detección (memoria del job, sin recorrer el directorio)"""
+        if self._has_results:
+            return  # Las publicaciones del job ya actualizan el estado
 
-                    with open(latest_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-
-                    self.current_problems = data.get('problems', [])
-                    self.current_stats = data.get('statistics', {})
-                    return
+        try:
+            data = self.detection_job.latest
+            if data:
+                self._apply_report(data)
+                return
 
             # Si no hay datos, establecer vacío (no ejecutar detección automática)
             self.current_problems = []
@@ -269,36 +297,9 @@ class ProblemsTabRenderer:
             self.current_problems = []
             self.current_stats = {'error': str(e)}
 
-    def _run_quick_detection(self):
-        """⚡ Ejecutar detección rápida"""
-        try:
-            if not ERROR_DETECTOR_SCRIPT.exists():
-                return
-
-            # Ejecutar detector en modo rápido
-            result = subprocess.run([
-                sys.executable,
-                str(ERROR_DETECTOR_SCRIPT),
-                "--workspace", str(WORKSPACE_ROOT),
-                "--quick"
-            ], capture_output=True, text=True, timeout=30)
-
-            if result.returncode in [0, 1]:  # 0 = ok, 1 = problemas encontrados
-                # Buscar el archivo más reciente después de la ejecución
-                time.sleep(1)  # Dar tiempo para que se escriba el archivo
-                if DIAGNOSTICS_DIR.exists():
-                    detection_files = list(DIAGNOSTICS_DIR.glob("deteccion_errores_*.json"))
-                    if detection_files:
-                        latest_file = max(detection_files, key=lambda f: f.stat().st_mtime)
-
-                        with open(latest_file, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-
-                        self.current_problems = data.get('problems', [])
-                        self.current_stats = data.get('statistics', {})
-
-        except Exception:
-            pass  # Silenciar errores de detección automática
+    def _run_quick_detection(self) -> bool:
+        """⚡ Lanzar detección rápida en segundo plano (los resultados llegan por suscripción)"""
+        return self.detection_job.start(quick_mode=True)
 
     def _apply_filters(self) -> List[Dict]:
         """🔍 Aplicar filtros a la lista de problemas"""
@@ -368,14 +369,16 @@ class ProblemsTabRenderer:
 
     def _action_refresh(self) -> Dict[str, Any]:
         """🔄 Acción refrescar datos"""
+        self._has_results = False
         self._load_latest_detection_data()
         return {'status': 'success', 'message': 'Datos actualizados'}
 
     def _action_detect(self) -> Dict[str, Any]:
         """🔍 Acción ejecutar detección"""
         try:
-            self._run_quick_detection()
-            return {'status': 'success', 'message': 'Detección ejecutada'}
+            if self._run_quick_detection():
+                return {'status': 'success', 'message': 'Detección iniciada en segundo plano'}
+            return {'status': 'info', 'message': 'Detección ya en curso'}
         except Exception as e:
             return {'status': 'error', 'message': f'Error en detección: {str(e)}'}
 
@@ -420,19 +423,26 @@ class ProblemsTabRenderer:
 def render_problems_tab() -> str:
     """🎨 Función principal para renderizar pestaña de problemas"""
     renderer = ProblemsTabRenderer()
-    return renderer.render_tab()
+    try:
+        return renderer.render_tab()
+    finally:
+        renderer.close()
 
 
 def render_problems_tab_simple() -> str:
     """📝 Función simple para integración básica"""
     renderer = ProblemsTabRenderer()
-    return renderer._render_simple_tab()
+    try:
+        return renderer._render_simple_tab()
+    finally:
+        renderer.close()
 
 
 def get_problems_summary() -> Dict[str, Any]:
     """📊 Obtener resumen de problemas para dashboard"""
     renderer = ProblemsTabRenderer()
     renderer._load_latest_detection_data()
+    renderer.close()
 
     return {
         'total_problems': len(renderer.current_problems),
@@ -449,7 +459,8 @@ def execute_detection(quick_mode: bool = True) -> Dict[str, Any]:
         args = [
             sys.executable,
             str(ERROR_DETECTOR_SCRIPT),
-            "--workspace", str(WORKSPACE_ROOT)
+            "--workspace", str(WORKSPACE_ROOT),
+            "--incremental"
         ]
 
         if quick_mode:
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+🔢 STATE VERSIONING - Difusión incremental del estado del dashboard
+===================================================================
+Versionado por secciones del estado compartido del DashboardController.
+
+En lugar de asdict(state) completo cada 1.5s para cada dashboard, el estado
+marca los campos asignados (dirty), el tracker confirma qué cambió realmente
+contra la última copia publicada y asigna un número de secuencia monotónico.
+Cada dashboard recibe solo las secciones que cambiaron desde su última
+secuencia, o nada si no hubo cambios.
+
+Características:
+- Campos sucios por __setattr__ + mark_dirty() para mutaciones in-place
+- Copia profunda solo de los campos que cambiaron (no de todo el estado)
+- Secuencia por sección para que los widgets salten paneles sin cambios
+- Clientes registrados con su última secuencia (los nuevos reciben todo)
+
+Versión: v1.0.0
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import copy
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set
+
+# 🗂️ SECCIONES DEL ESTADO DEL DASHBOARD (campo -> panel que lo muestra)
+STATE_SECTIONS: Dict[str, Sequence[str]] = {
+    'system': ('trading_active', 'dashboard_active', 'mt5_connected', 'cycle_count', 'uptime', 'last_update'),
+    'prices': ('current_price', 'spread', 'symbols'),
+    'patterns': ('ict_results',),
+    'pois': ('poi_results',),
+    'acc': ('acc_analysis', 'acc_performance', 'acc_status'),
+    'risk': ('positions_open', 'grid_active', 'risk_level'),
+    'alerts': ('alerts',),
+    'logs': ('recent_logs',),
+}
+
+
+class DirtyFieldsMixin:
+    """
+    Mixin para dataclasses: registra cada atributo asignado como sucio.
+
+    Las mutaciones in-place (lista.append, dict[k] = v) no pasan por
+    __setattr__ y deben señalarse con mark_dirty().
+    """
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        object.__setattr__(self, name, value)
+        self.__dict__.setdefault('_dirty_fields', set()).add(name)
+
+    def mark_dirty(self, *names: str) -> None:
+        """Marcar campos modificados in-place"""
+        self.__dict__.setdefault('_dirty_fields', set()).update(names)
+
+    def pop_dirty(self) -> Set[str]:
+        """Devolver y limpiar los campos sucios"""
+        dirty = self.__dict__.get('_dirty_fields') or set()
+        self.__dict__['_dirty_fields'] = set()
+        return dirty
+
+
+def _same_value(previous: Any, current: Any) -> bool:
+    """Igualdad tolerante: estructuras con arrays/DataFrames se consideran cambiadas"""
+    if previous is current:
+        return True
+    try:
+        return bool(previous == current)
+    except (ValueError, TypeError):
+        return False
+
+
+class StateVersionTracker:
+    """
+    🔢 Tracker de versiones por sección con secuencia monotónica
+
+    commit() publica los cambios del estado; delta_for() entrega a cada
+    cliente solo las secciones con versión posterior a la que ya vio.
+    """
+
+    def __init__(self, sections: Optional[Dict[str, Sequence[str]]] = None):
+        self.sections = {name: tuple(fields) for name, fields in (sections or STATE_SECTIONS).items()}
+        self.field_section = {field: name for name, fields in self.sections.items() for field in fields}
+
+        self.sequence = 0
+        self.section_versions: Dict[str, int] = {name: 0 for name in self.sections}
+        self._published: Dict[str, Any] = {}
+        self._client_sequences: Dict[str, int] = {}
+        self._lock = threading.RLock()
+
+        # 📊 Métricas
+        self.commits_with_changes = 0
+        self.commits_without_changes = 0
+        self.deltas_sent = 0
+        self.deltas_skipped = 0
+
+    # ===============================
+    # PUBLICACIÓN
+    # ===============================
+
+    def commit(self, state: Any, dirty_fields: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Publicar los campos sucios que realmente cambiaron
+
+        Args:
+            state: Objeto de estado (atributos = campos de las secciones)
+            dirty_fields: Campos a revisar (None = todos los registrados)
+
+        Returns:
+            Secciones que cambiaron (vacío si no hubo cambios reales)
+        """
+        candidates = self.field_section.keys() if dirty_fields is None else dirty_fields
+        changed: Set[str] = set()
+
+        with self._lock:
+            for field in candidates:
+                section = self.field_section.get(field)
+                if section is None or not hasattr(state, field):
+                    continue
+                value = getattr(state, field)
+                if field in self._published and _same_value(self._published[field], value):
+                    continue
+                self._published[field] = copy.deepcopy(value)
+                changed.add(section)
+
+            if changed:
+                self.sequence += 1
+                for section in changed:
+                    self.section_versions[section] = self.sequence
+                self.commits_with_changes += 1
+            else:
+                self.commits_without_changes += 1
+
+        return sorted(changed)
+
+    # ===============================
+    # CLIENTES
+    # ===============================
+
+    def register_client(self, client_id: str) -> None:
+        """Nuevo cliente: su primer delta será el estado completo"""
+        with self._lock:
+            self._client_sequences[client_id] = 0
+
+    def unregister_client(self, client_id: str) -> None:
+        with self._lock:
+            self._client_sequences.pop(client_id, None)
+
+    def delta_for(self, client_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Delta pendiente para un cliente y avance de su secuencia
+
+        Returns:
+            None si el cliente ya tiene la última versión de todo
+        """
+        with self._lock:
+            since = self._client_sequences.get(client_id, 0)
+            delta = self.delta_since(since)
+            if not delta['changed_sections']:
+                self.deltas_skipped += 1
+                return None
+            self._client_sequences[client_id] = self.sequence
+            self.deltas_sent += 1
+            return delta
+
+    def delta_since(self, since: int) -> Dict[str, Any]:
+        """
+        Secciones publicadas con versión > since
+
+        Returns:
+            {'sequence', 'since', 'full', 'changed_sections', 'sections': {sección: {campo: valor}}}
+        """
+        with self._lock:
+            changed = [name for name, version in self.section_versions.items() if version > since]
+            return {
+                'sequence': self.sequence,
+                'since': since,
+                'full': since == 0,
+                'changed_sections': changed,
+                'sections': {
+                    name: {field: self._published[field] for field in self.sections[name] if field in self._published}
+                    for name in changed
+                },
+            }
+
+    def published_state(self) -> Dict[str, Any]:
+        """Estado plano publicado (copia superficial: los valores son de solo lectura)"""
+        with self._lock:
+            return dict(self._published)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            'sequence': self.sequence,
+            'section_versions': dict(self.section_versions),
+            'commits_with_changes': self.commits_with_changes,
+            'commits_without_changes': self.commits_without_changes,
+            'deltas_sent': self.deltas_sent,
+            'deltas_skipped': self.deltas_skipped,
+        }
@@ -12,6 +12,8 @@
    - ✅ Análisis de riesgos de runtime
    - ✅ Calidad de código especializada
    - ✅ Detección de dependencias circulares
+   - ✅ Modo incremental: solo re-analiza archivos cambiados (mtime/tamaño +
+        hash SHA-1) y publica resultados parciales mientras avanza
 
 📋 CLASIFICACIÓN JERÁRQUICA:
    - Severidad: CRITICAL → HIGH → MEDIUM → LOW → INFO
@@ -31,6 +33,7 @@
 from sistema.sic import enviar_senal_log, log_info, log_warning
 
 import ast
+import hashlib
 from sistema.sic import os
 from sistema.sic import sys
 from sistema.sic import json
@@ -58,6 +61,11 @@ except ImportError:
     rprint = print
 
 
+# Archivos del modo incremental (en docs/bitacoras/diagnosticos/)
+LATEST_REPORT_FILE = "deteccion_errores_latest.json"
+INCREMENTAL_STATE_FILE = "deteccion_estado.json"
+
+
 class Severity(Enum):
     """Niveles de severidad de problemas detectados"""
     CRITICAL = "🚨 CRITICAL"
@@ -101,9 +109,11 @@ class DetectedProblem:
 class ErrorDetector:
     """🔍 Motor Principal de Detección de Errores Jerárquico"""
 
-    def __init__(self, workspace_root: str):
+    def __init__(self, workspace_root: str, quiet: bool = False):
         self.workspace_root = Path(workspace_root)
-        self.console = Console() if RICH_AVAILABLE else None
+        self.diagnostics_dir = self.workspace_root / "docs" / "bitacoras" / "diagnosticos"
+        # quiet=True: sin salida Rich (ejecución en segundo plano bajo el dashboard)
+        self.console = Console() if RICH_AVAILABLE and not quiet else None
         self.problems: List[DetectedProblem] = []
         self.stats = {
             'files_analyzed': 0,
@@ -180,7 +190,7 @@ class ErrorDetector:
 
         python_files = list(dir_path.rglob("*.py"))
 
-        if RICH_AVAILABLE and python_files:
+        if self.console and python_files:
             for file_path in track(python_files, description=f"Analizando {directory}..."):
                 self._analyze_python_file(file_path)
         else:
@@ -399,20 +409,24 @@ class ErrorDetector:
 
         # Detectar ciclos simples (A -> B -> A)
         for file_path, imports in dependencies.items():
-            for import_line in imports:
-                # Simplificado: buscar imports que podrían crear ciclos
-                if 'from .' in import_line or 'from ..' in import_line:
-                    self._add_problem(
-                        file_path=file_path,
-                        line_number=1,
-                        severity=Severity.MEDIUM,
-                        category=Category.SISTEMA,
-                        problem_type="POTENTIAL_CIRCULAR_DEPENDENCY",
-                        title="Posible dependencia circular",
-                        description=f"Import relativo que podría crear ciclo: {import_line}",
-                        suggestion="Revisar arquitectura de módulos",
-                        code_snippet=import_line
-                    )
+            self._check_relative_import_cycles(file_path, imports)
+
+    def _check_relative_import_cycles(self, file_path: str, imports: List[str]):
+        """🔄 Imports relativos de un archivo que podrían crear ciclos"""
+        for import_line in imports:
+            # Simplificado: buscar imports que podrían crear ciclos
+            if 'from .' in import_line or 'from ..' in import_line:
+                self._add_problem(
+                    file_path=file_path,
+                    line_number=1,
+                    severity=Severity.MEDIUM,
+                    category=Category.SISTEMA,
+                    problem_type="POTENTIAL_CIRCULAR_DEPENDENCY",
+                    title="Posible dependencia circular",
+                    description=f"Import relativo que podría crear ciclo: {import_line}",
+                    suggestion="Revisar arquitectura de módulos",
+                    code_snippet=import_line
+                )
 
     def _analyze_code_quality(self):
         """✨ Análisis de calidad de código"""
@@ -615,15 +629,15 @@ class ErrorDetector:
 
         return recommendations
 
-    def _save_diagnostics_log(self):
+    def _save_diagnostics_log(self, report_data: Optional[Dict[str, Any]] = None):
         """💾 Guardar bitácora de diagnósticos"""
-        diagnostics_dir = self.workspace_root / "docs" / "bitacoras" / "diagnosticos"
+        diagnostics_dir = self.diagnostics_dir
         diagnostics_dir.mkdir(parents=True, exist_ok=True)
 
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         log_file = diagnostics_dir / f"deteccion_errores_{timestamp}.json"
 
-        report_data = self._generate_report()
+        report_data = report_data or self._generate_report()
 
         with open(log_file, 'w', encoding='utf-8') as f:
             json.dump(report_data, f, indent=2, ensure_ascii=False)
@@ -631,6 +645,148 @@ class ErrorDetector:
         if self.console:
             self.console.print(f"💾 Bitácora guardada: {log_file}")
 
+    # ===================================================================
+    # ⚡ MODO INCREMENTAL
+    # ===================================================================
+
+    def analyze_incremental(self, quick_mode: bool = False,
+                            on_progress: Optional[Any] = None,
+                            flush_every: int = 25) -> Dict[str, Any]:
+        """
+        ⚡ Análisis incremental: re-analiza solo archivos cambiados desde la última ejecución
+
+        Por archivo se guarda (mtime_ns, tamaño, SHA-1, problemas) en
+        deteccion_estado.json. Si mtime y tamaño coinciden se reutilizan los
+        problemas sin leer el archivo; si cambió el mtime pero no el hash,
+        también. Cada `flush_every` archivos re-analizados se escribe
+        deteccion_errores_latest.json (status 'running') y se llama a
+        on_progress(report); al terminar, status 'complete' y bitácora con fecha.
+        """
+        start_time = time.time()
+        previous = self._load_incremental_state().get('files', {})
+        targets = self._collect_target_files(quick_mode)
+
+        files_state: Dict[str, Dict[str, Any]] = {}
+        cached: List[Dict[str, Any]] = []
+        reanalyzed = 0
+        for done, (file_path, is_critical) in enumerate(targets, 1):
+            key = str(file_path)
+            entry = self._incremental_entry(file_path, is_critical, quick_mode, previous.get(key))
+            if entry.pop('_reanalyzed', False):
+                reanalyzed += 1
+                if on_progress and reanalyzed % flush_every == 0:
+                    self._publish_incremental(files_state, entry, done, len(targets), start_time, on_progress)
+            files_state[key] = entry
+            cached.extend(entry['problems'])
+
+        # La configuración se comprueba siempre (solo existencia de archivos)
+        self.problems = [DetectedProblem(**problem) for problem in cached]
+        self._analyze_configuration()
+        self._rebuild_stats(files_analyzed=len(targets))
+        self.stats['files_reanalyzed'] = reanalyzed
+        self.stats['analysis_time'] = time.time() - start_time
+
+        report = self._generate_report()
+        report['status'] = 'complete'
+        report['progress'] = {'done': len(targets), 'total': len(targets), 'reanalyzed': reanalyzed}
+        self._write_json_atomic(self.diagnostics_dir / LATEST_REPORT_FILE, report)
+        # En modo rápido se conservan las entradas de los archivos no visitados
+        saved_files = {**previous, **files_state} if quick_mode else files_state
+        self._write_json_atomic(self.diagnostics_dir / INCREMENTAL_STATE_FILE, {'files': saved_files})
+        if reanalyzed:
+            self._save_diagnostics_log(report)
+        if on_progress:
+            on_progress(report)
+        return report
+
+    def _collect_target_files(self, quick_mode: bool) -> List[Tuple[Path, bool]]:
+        """📋 Archivos del análisis: críticos y, en modo completo, los de analyze_dirs"""
+        targets = [(self.workspace_root / name, True) for name in self.critical_files
+                   if (self.workspace_root / name).exists()]
+        if not quick_mode:
+            for directory in self.analyze_dirs:
+                dir_path = self.workspace_root / directory
+                if dir_path.exists():
+                    targets.extend((file_path, False) for file_path in sorted(dir_path.rglob("*.py")))
+        return targets
+
+    def _incremental_entry(self, file_path: Path, is_critical: bool, quick_mode: bool,
+                           previous: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """🗂️ Entrada de estado del archivo: reutiliza sus problemas o lo re-analiza"""
+        try:
+            stat = file_path.stat()
+        except OSError:
+            stat = None
+        signature = {'mtime_ns': stat.st_mtime_ns if stat else 0, 'size': stat.st_size if stat else -1}
+
+        if previous and previous.get('critical') == is_critical:
+            if previous.get('mtime_ns') == signature['mtime_ns'] and previous.get('size') == signature['size']:
+                return previous
+        try:
+            digest = hashlib.sha1(file_path.read_bytes()).hexdigest()
+        except OSError:
+            digest = None
+        if previous and digest and previous.get('sha1') == digest and previous.get('critical') == is_critical:
+            return {**previous, **signature}
+
+        # Re-análisis: los problemas nuevos quedan al final de self.problems
+        start = len(self.problems)
+        self._analyze_python_file(file_path, is_critical)
+        if not is_critical and not quick_mode:
+            self._check_relative_import_cycles(str(file_path), self._read_import_lines(file_path))
+            self._analyze_code_patterns(file_path)
+        problems = [problem.to_dict() for problem in self.problems[start:]]
+        return {**signature, 'sha1': digest, 'critical': is_critical, 'problems': problems, '_reanalyzed': True}
+
+    @staticmethod
+    def _read_import_lines(file_path: Path) -> List[str]:
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                return [line.strip() for line in f
+                        if line.strip().startswith('from ') or line.strip().startswith('import ')]
+        except Exception:
+            return []
+
+    def _rebuild_stats(self, files_analyzed: int):
+        """📊 Estadísticas a partir de self.problems (incluye los reutilizados)"""
+        severity_names = {severity.value: severity.name for severity in Severity}
+        category_names = {category.value: category.name for category in Category}
+        self.stats['files_analyzed'] = files_analyzed
+        self.stats['problems_found'] = len(self.problems)
+        self.stats['by_severity'] = {severity.name: 0 for severity in Severity}
+        self.stats['by_category'] = {category.name: 0 for category in Category}
+        for problem in self.problems:
+            self.stats['by_severity'][severity_names.get(problem.severity, 'INFO')] += 1
+            self.stats['by_category'][category_names.get(problem.category, 'UNKNOWN')] += 1
+
+    def _publish_incremental(self, files_state: Dict[str, Dict[str, Any]], current: Dict[str, Any],
+                             done: int, total: int, start_time: float, on_progress: Any):
+        """📤 Reporte parcial (status 'running') con los archivos procesados hasta ahora"""
+        self.problems = [DetectedProblem(**problem)
+                         for entry in (*files_state.values(), current) for problem in entry['problems']]
+        self._rebuild_stats(files_analyzed=done)
+        self.stats['analysis_time'] = time.time() - start_time
+        report = self._generate_report()
+        report['status'] = 'running'
+        report['progress'] = {'done': done, 'total': total}
+        self._write_json_atomic(self.diagnostics_dir / LATEST_REPORT_FILE, report)
+        on_progress(report)
+
+    def _load_incremental_state(self) -> Dict[str, Any]:
+        try:
+            with open(self.diagnostics_dir / INCREMENTAL_STATE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_json_atomic(self, path: Path, data: Dict[str, Any]):
+        """💾 Escritura atómica (tmp + replace): los lectores nunca ven un JSON a medias"""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
     def get_dashboard_summary(self) -> Dict[str, Any]:
         """📊 Resumen para integración con dashboard"""
         return {
@@ -652,6 +808,8 @@ def main():
     parser.add_argument("--workspace", default=".", help="Directorio workspace (default: actual)")
     parser.add_argument("--quick", action="store_true", help="Análisis rápido (solo archivos críticos)")
     parser.add_argument("--output", help="Archivo de salida JSON (optional)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Re-analizar solo archivos cambiados desde la última ejecución")
 
     args = parser.parse_args()
 
@@ -659,7 +817,10 @@ def main():
     detector = ErrorDetector(args.workspace)
 
     # Ejecutar análisis
-    report = detector.analyze_full_system(quick_mode=args.quick)
+    if args.incremental:
+        report = detector.analyze_incremental(quick_mode=args.quick)
+    else:
+        report = detector.analyze_full_system(quick_mode=args.quick)
 
     # Mostrar resumen
     if RICH_AVAILABLE and detector.console:
@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+🗃️ COLUMNAR STORE - REGISTROS COMPACTOS (STRUCT-OF-ARRAYS)
+==========================================================
+
+Almacén columnar para registros que se crean por miles en cada análisis.
+La implementación es utils/columnar_store.py del árbol v6.0 (ver
+sistema.v6_shared); aquí la usa core/poi_system/poi_detector.py para los
+POI dict:
+
+    store = ColumnarStore(POI_RECORD_SCHEMA, name='POI', allow_extras=True)
+    store.extend(pois)
+
+Versión: v1.0.0 - Columnar Store
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('utils/columnar_store.py', __name__)
@@ -27,7 +27,10 @@ ENTRY_CONFIRMATION_CONFIG = {
 # =============================================================================
 # SECCIÓN 1: IMPORTACIONES DE LIBRERÍAS
 # =============================================================================
-import MetaTrader5 as mt5
+try:
+    import MetaTrader5 as mt5
+except ImportError:
+    mt5 = None  # Backtest / entornos sin terminal MT5
 import pandas as pd
 # MIGRADO A SLUC v2.0
 from sistema.sic import enviar_senal_log
@@ -115,7 +118,7 @@ def log_event(evento, detalles=""):
 
 def obtener_precio_actual(simbolo):
     """Obtiene el precio actual de un símbolo."""
-    tick = mt5.symbol_info_tick(simbolo)  # type: ignore
+    tick = mt5.symbol_info_tick(simbolo) if mt5 else None  # type: ignore
     if tick is None:
         return None
     return (tick.bid + tick.ask) / 2
\ No newline at end of file
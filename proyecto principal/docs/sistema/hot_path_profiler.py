@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+🔥 HOT PATH PROFILER - INSTRUMENTACIÓN DE RUTAS CALIENTES
+========================================================
+
+Superficie única de instrumentación para el orquestador ACC y los
+detectores. La implementación es utils/hot_path_profiler.py del árbol v6.0
+(ver sistema.v6_shared): mismo decorador, mismo formato JSON y folded
+stacks, así los perfiles de ambos árboles se pueden fusionar.
+
+    python -m sistema.hot_path_profiler run --out perfil.folded --json perfil.json script.py
+    python -m sistema.hot_path_profiler top perfil.json -n 20
+
+Versión: v1.0.0 - Hot Path Profiler
+Fecha: Agosto 2025
+"""
+
+import importlib
+import sys
+
+if __name__ == '__main__':
+    # Con "python -m" el shim es __main__: la CLI corre sobre el módulo importable
+    # para que los detectores instrumentados compartan el mismo singleton
+    sys.exit(importlib.import_module('sistema.hot_path_profiler').main())
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('utils/hot_path_profiler.py', __name__)
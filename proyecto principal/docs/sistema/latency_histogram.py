@@ -0,0 +1,361 @@
+#!/usr/bin/env python3
+"""
+📊 LATENCY HISTOGRAM - HISTOGRAMAS DE LATENCIA FUSIONABLES
+=========================================================
+
+Histograma logarítmico estilo HDR para tiempos de ejecución (ms) con error
+relativo acotado, y registro de histogramas por etapa / timeframe / símbolo /
+sesión. Sustituye a los "promedios de promedios" del pipeline TCT: la cola
+(p90/p99/max) es la que arruina las entradas en la apertura de killzone.
+
+Características:
+- ✅ Buckets geométricos fijos: error relativo <= precision (1% por defecto)
+- ✅ Fusión O(buckets) sumando contadores (threads, procesos, sesiones)
+- ✅ Serializable a dict/JSON disperso y picklable (ProcessPoolExecutor)
+- ✅ p50 / p90 / p99 / max / mean exactos en count, min, max y total
+
+Versión: v1.0.0 - Latency Histogram
+Fecha: Agosto 2025
+"""
+
+import math
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+DEFAULT_LOWEST_MS = 0.001          # 1 µs
+DEFAULT_HIGHEST_MS = 3_600_000.0   # 1 hora
+DEFAULT_PRECISION = 0.01           # 1% de error relativo
+
+DEFAULT_PERCENTILES = (50.0, 90.0, 99.0)
+DEFAULT_DIMENSIONS = ('stage', 'timeframe', 'symbol', 'session')
+UNKNOWN_LABEL = 'UNKNOWN'
+
+
+class LatencyHistogram:
+    """
+    📊 Histograma de latencias con buckets logarítmicos
+
+    El bucket i cubre (lowest * (1+precision)^(i-1), lowest * (1+precision)^i];
+    valores por debajo de lowest caen en el bucket 0 y por encima de highest
+    en el último. min, max, count y total se guardan exactos.
+    """
+
+    def __init__(self,
+                 lowest_ms: float = DEFAULT_LOWEST_MS,
+                 highest_ms: float = DEFAULT_HIGHEST_MS,
+                 precision: float = DEFAULT_PRECISION):
+        if lowest_ms <= 0 or highest_ms <= lowest_ms:
+            raise ValueError("Se requiere 0 < lowest_ms < highest_ms")
+        if not 0 < precision < 1:
+            raise ValueError("precision debe estar en (0, 1)")
+
+        self.lowest_ms = float(lowest_ms)
+        self.highest_ms = float(highest_ms)
+        self.precision = float(precision)
+        self._log_base = math.log1p(self.precision)
+        self.bucket_count = int(math.ceil(math.log(self.highest_ms / self.lowest_ms) / self._log_base)) + 1
+
+        self.counts = np.zeros(self.bucket_count, dtype=np.int64)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    # ===============================
+    # REGISTRO
+    # ===============================
+
+    def record(self, value_ms: float, count: int = 1) -> None:
+        """⏱️ Registrar una latencia (count veces)"""
+        value_ms = max(float(value_ms), 0.0)
+        self.counts[self._bucket_index(value_ms)] += count
+        self.count += count
+        self.total_ms += value_ms * count
+        self.min_ms = min(self.min_ms, value_ms)
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def record_many(self, values_ms: Union[Sequence[float], np.ndarray]) -> None:
+        """⏱️ Registrar un bloque de latencias de una vez (vectorizado)"""
+        values = np.maximum(np.asarray(values_ms, dtype=float).ravel(), 0.0)
+        if not len(values):
+            return
+        self.counts += np.bincount(self._bucket_indices(values), minlength=self.bucket_count)
+        self.count += len(values)
+        self.total_ms += float(values.sum())
+        self.min_ms = min(self.min_ms, float(values.min()))
+        self.max_ms = max(self.max_ms, float(values.max()))
+
+    def merge(self, other: 'LatencyHistogram') -> 'LatencyHistogram':
+        """🔗 Sumar otro histograma con la misma geometría (in-place)"""
+        if not self.is_compatible(other):
+            raise ValueError("Histogramas con geometría distinta (lowest/highest/precision)")
+        self.counts += other.counts
+        self.count += other.count
+        self.total_ms += other.total_ms
+        self.min_ms = min(self.min_ms, other.min_ms)
+        self.max_ms = max(self.max_ms, other.max_ms)
+        return self
+
+    def is_compatible(self, other: 'LatencyHistogram') -> bool:
+        return (self.lowest_ms, self.highest_ms, self.precision) == \
+               (other.lowest_ms, other.highest_ms, other.precision)
+
+    def copy(self) -> 'LatencyHistogram':
+        clone = self.empty_like()
+        return clone.merge(self)
+
+    def empty_like(self) -> 'LatencyHistogram':
+        return LatencyHistogram(self.lowest_ms, self.highest_ms, self.precision)
+
+    def reset(self) -> None:
+        self.counts[:] = 0
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = float('inf')
+        self.max_ms = 0.0
+
+    # ===============================
+    # CONSULTAS
+    # ===============================
+
+    @property
+    def mean_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile(self, q: float) -> float:
+        """📈 Percentil q (0-100) con error relativo <= precision"""
+        return self.percentiles((q,))[0]
+
+    def percentiles(self, qs: Iterable[float] = DEFAULT_PERCENTILES) -> List[float]:
+        """📈 Varios percentiles con una sola suma acumulada"""
+        qs = list(qs)
+        if not self.count:
+            return [0.0] * len(qs)
+
+        cumulative = np.cumsum(self.counts)
+        ranks = np.clip(np.ceil(np.asarray(qs, dtype=float) / 100.0 * self.count), 1, self.count)
+        buckets = np.searchsorted(cumulative, ranks, side='left')
+        upper = self.lowest_ms * np.power(1.0 + self.precision, buckets)
+        return [float(v) for v in np.clip(upper, self.min_ms, self.max_ms)]
+
+    def summary(self, qs: Iterable[float] = DEFAULT_PERCENTILES) -> Dict[str, Any]:
+        """📋 Resumen para dashboard / export: count, mean, min, pXX, max"""
+        qs = list(qs)
+        result = {
+            'count': int(self.count),
+            'mean_ms': self.mean_ms,
+            'min_ms': self.min_ms if self.count else 0.0,
+        }
+        for q, value in zip(qs, self.percentiles(qs)):
+            result[f"p{q:g}_ms"] = value
+        result['max_ms'] = self.max_ms
+        return result
+
+    # ===============================
+    # SERIALIZACIÓN
+    # ===============================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """💾 Representación dispersa (solo buckets no vacíos), apta para JSON"""
+        occupied = np.flatnonzero(self.counts)
+        return {
+            'lowest_ms': self.lowest_ms,
+            'highest_ms': self.highest_ms,
+            'precision': self.precision,
+            'count': int(self.count),
+            'total_ms': self.total_ms,
+            'min_ms': self.min_ms if self.count else None,
+            'max_ms': self.max_ms,
+            'bucket_index': occupied.tolist(),
+            'bucket_count': self.counts[occupied].tolist(),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogram':
+        histogram = cls(data['lowest_ms'], data['highest_ms'], data['precision'])
+        histogram.counts[np.asarray(data['bucket_index'], dtype=np.int64)] = \
+            np.asarray(data['bucket_count'], dtype=np.int64)
+        histogram.count = int(data['count'])
+        histogram.total_ms = float(data['total_ms'])
+        histogram.min_ms = float(data['min_ms']) if data.get('min_ms') is not None else float('inf')
+        histogram.max_ms = float(data['max_ms'])
+        return histogram
+
+    # ===============================
+    # INTERNOS
+    # ===============================
+
+    def _bucket_index(self, value_ms: float) -> int:
+        if value_ms <= self.lowest_ms:
+            return 0
+        index = int(math.ceil(math.log(value_ms / self.lowest_ms) / self._log_base))
+        return min(index, self.bucket_count - 1)
+
+    def _bucket_indices(self, values: np.ndarray) -> np.ndarray:
+        ratio = np.maximum(values, self.lowest_ms) / self.lowest_ms
+        indices = np.ceil(np.log(ratio) / self._log_base)
+        return np.clip(indices, 0, self.bucket_count - 1).astype(np.int64)
+
+    def __repr__(self) -> str:
+        return (f"LatencyHistogram(count={self.count}, p50={self.percentile(50):.3f}ms, "
+                f"p99={self.percentile(99):.3f}ms, max={self.max_ms:.3f}ms)")
+
+
+class LatencyHistogramRegistry:
+    """
+    🗂️ Histogramas por (stage, timeframe, symbol, session)
+
+    Thread-safe. Las claves ausentes se registran como UNKNOWN; las consultas
+    fusionan al vuelo todos los histogramas que casan con los filtros.
+    """
+
+    def __init__(self,
+                 dimensions: Sequence[str] = DEFAULT_DIMENSIONS,
+                 lowest_ms: float = DEFAULT_LOWEST_MS,
+                 highest_ms: float = DEFAULT_HIGHEST_MS,
+                 precision: float = DEFAULT_PRECISION):
+        self.dimensions = tuple(dimensions)
+        self._geometry = (lowest_ms, highest_ms, precision)
+        self._histograms: Dict[Tuple[str, ...], LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    # ===============================
+    # REGISTRO
+    # ===============================
+
+    def record(self, value_ms: float, **labels: Optional[str]) -> None:
+        """⏱️ Registrar una latencia bajo las etiquetas dadas (stage=, timeframe=, ...)"""
+        key = self._key(labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = LatencyHistogram(*self._geometry)
+            histogram.record(value_ms)
+
+    def merge(self, other: Union['LatencyHistogramRegistry', Dict[str, Any]]) -> 'LatencyHistogramRegistry':
+        """🔗 Fusionar otro registro (o su to_dict() de otro proceso)"""
+        if isinstance(other, dict):
+            other = LatencyHistogramRegistry.from_dict(other)
+        if other.dimensions != self.dimensions:
+            raise ValueError(f"Dimensiones distintas: {other.dimensions} != {self.dimensions}")
+
+        incoming = other.snapshot()
+        with self._lock:
+            for key, histogram in incoming.items():
+                if key in self._histograms:
+                    self._histograms[key].merge(histogram)
+                else:
+                    self._histograms[key] = histogram
+        return self
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    # ===============================
+    # CONSULTAS
+    # ===============================
+
+    def snapshot(self) -> Dict[Tuple[str, ...], LatencyHistogram]:
+        """📸 Copia consistente de todos los histogramas"""
+        with self._lock:
+            return {key: histogram.copy() for key, histogram in self._histograms.items()}
+
+    def get(self, **filters: str) -> LatencyHistogram:
+        """📊 Histograma fusionado de todas las claves que cumplen los filtros"""
+        merged = LatencyHistogram(*self._geometry)
+        for key, histogram in self._select(filters):
+            merged.merge(histogram)
+        return merged
+
+    def rollup(self, by: Sequence[str] = ('stage',), **filters: str) -> Dict[Tuple[str, ...], LatencyHistogram]:
+        """🧮 Histogramas fusionados agrupando por un subconjunto de dimensiones"""
+        positions = [self.dimensions.index(dim) for dim in by]
+        groups: Dict[Tuple[str, ...], LatencyHistogram] = {}
+        for key, histogram in self._select(filters):
+            group = tuple(key[p] for p in positions)
+            if group in groups:
+                groups[group].merge(histogram)
+            else:
+                groups[group] = histogram.copy()
+        return groups
+
+    def summary(self, by: Sequence[str] = ('stage',), **filters: str) -> Dict[str, Dict[str, Any]]:
+        """📋 {'M5' | 'poi_detection|M5' ...: resumen p50/p90/p99/max}"""
+        return {'|'.join(group): histogram.summary()
+                for group, histogram in sorted(self.rollup(by, **filters).items())}
+
+    def __len__(self) -> int:
+        return len(self._histograms)
+
+    # ===============================
+    # SERIALIZACIÓN
+    # ===============================
+
+    def to_dict(self) -> Dict[str, Any]:
+        """💾 Export completo fusionable: {'dimensions', 'histograms': [{labels, histogram}]}"""
+        return {
+            'dimensions': list(self.dimensions),
+            'histograms': [
+                {'labels': dict(zip(self.dimensions, key)), 'histogram': histogram.to_dict()}
+                for key, histogram in sorted(self.snapshot().items())
+            ],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LatencyHistogramRegistry':
+        entries = data.get('histograms', [])
+        if entries:
+            first = entries[0]['histogram']
+            registry = cls(data['dimensions'], first['lowest_ms'], first['highest_ms'], first['precision'])
+        else:
+            registry = cls(data['dimensions'])
+        for entry in entries:
+            key = registry._key(entry['labels'])
+            registry._histograms[key] = LatencyHistogram.from_dict(entry['histogram'])
+        return registry
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {'dimensions': self.dimensions, 'geometry': self._geometry, 'histograms': self.snapshot()}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.dimensions = state['dimensions']
+        self._geometry = state['geometry']
+        self._histograms = state['histograms']
+        self._lock = threading.Lock()
+
+    # ===============================
+    # INTERNOS
+    # ===============================
+
+    def _key(self, labels: Dict[str, Optional[str]]) -> Tuple[str, ...]:
+        unknown = set(labels) - set(self.dimensions)
+        if unknown:
+            raise ValueError(f"Dimensiones no registradas: {sorted(unknown)}")
+        return tuple(str(labels.get(dim) or UNKNOWN_LABEL) for dim in self.dimensions)
+
+    def _select(self, filters: Dict[str, str]) -> List[Tuple[Tuple[str, ...], LatencyHistogram]]:
+        positions = [(self.dimensions.index(dim), str(value)) for dim, value in filters.items()]
+        with self._lock:
+            return [(key, histogram) for key, histogram in self._histograms.items()
+                    if all(key[p] == value for p, value in positions)]
+
+
+# ===============================
+# REGISTRO COMPARTIDO
+# ===============================
+
+_tct_latency_registry: Optional[LatencyHistogramRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_tct_latency_registry() -> LatencyHistogramRegistry:
+    """🏭 Registro compartido (singleton) del pipeline TCT y del orquestador ACC"""
+    global _tct_latency_registry
+    if _tct_latency_registry is None:
+        with _registry_lock:
+            if _tct_latency_registry is None:
+                _tct_latency_registry = LatencyHistogramRegistry()
+    return _tct_latency_registry
@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+"""
+🐢 LAZY LOADING - ARRANQUE EN FRÍO RÁPIDO
+=========================================
+
+Módulos pesados y componentes caros se cargan en el primer uso, no al
+importar ni al construir. La implementación es utils/lazy_loading.py del
+árbol v6.0 (ver sistema.v6_shared), usada aquí por el orquestador ACC, el
+dashboard definitivo y MT5DataManager.
+
+    python -m sistema.lazy_loading importtime dashboard.dashboard_definitivo --top 15
+
+Versión: v1.0.0 - Lazy Loading
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import importlib
+import os
+import sys
+
+if __name__ == '__main__':
+    # CLI sobre el módulo importable (profiler global compartido), con docs/ y
+    # la raíz del proyecto v5 como raíces de importación del intérprete perfilado
+    docs_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    sys.exit(importlib.import_module('sistema.lazy_loading').main(
+        extra_paths=[docs_dir, os.path.dirname(docs_dir)]))
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('utils/lazy_loading.py', __name__)
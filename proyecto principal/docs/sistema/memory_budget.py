@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+"""
+🧮 MEMORY BUDGET - MEMORIA ACOTADA PARA SESIONES LARGAS
+=======================================================
+
+La implementación es utils/memory_budget.py del árbol v6.0 (ver
+sistema.v6_shared); aquí la usan el orquestador ACC (historial de análisis)
+y el monitor del sistema:
+
+    budget = get_memory_budget()
+    budget.register('acc_orchestrator', orchestrator)   # usa orchestrator.evict(fraction)
+    budget.check()
+
+El límite sale de config/memory_config.json del proyecto v5 (4 GB si no
+existe), no de la configuración del árbol v6.
+
+Versión: v1.0.0 - Memory Budget
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import os
+
+from sistema.v6_shared import load_v6_module
+
+_shared = load_v6_module('utils/memory_budget.py', __name__)
+_shared.DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                           '..', '..', 'config', 'memory_config.json')
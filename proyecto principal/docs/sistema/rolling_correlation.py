@@ -0,0 +1,21 @@
+#!/usr/bin/env python3
+"""
+🔗 ROLLING CORRELATION - CORRELACIÓN INCREMENTAL ENTRE SÍMBOLOS
+===============================================================
+
+La implementación es utils/rolling_correlation.py del árbol v6.0 (ver
+sistema.v6_shared); aquí la comparten RiskBot (lotaje con exposición
+correlacionada), POIScoringEngine y ConfidenceEngine:
+
+    engine = get_correlation_engine()
+    engine.update_bar({'EURUSD': 1.0950, 'GBPUSD': 1.2710})
+    rho = engine.correlation('EURUSD', 'GBPUSD')   # None si no hay datos
+
+Versión: v1.0.0 - Rolling Correlation
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('utils/rolling_correlation.py', __name__)
@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+"""
+🗓️ SESSION CALENDAR - CALENDARIO VECTORIZADO DE SESIONES
+=======================================================
+
+Etiquetas de sesión, killzone y solapamiento por vela calculadas para todo
+un frame en una sola operación y cacheadas por frame. La implementación es
+core/analysis/session_calendar.py del árbol v6.0; este módulo la carga con
+su propio nombre (ver sistema.v6_shared) para que ICTDetector y el pipeline
+TCT usen el mismo calendario que los detectores v6.
+
+Versión: v1.0.0 - Session Calendar
+Fecha: Agosto 2025
+"""
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('core/analysis/session_calendar.py', __name__)
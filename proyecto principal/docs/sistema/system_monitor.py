@@ -32,6 +32,7 @@ from sistema.sic_clean import dataclass
 from enum import Enum
 from sistema.sic_clean import json
 from sistema.sic_clean import Path
+from sistema.memory_budget import get_memory_budget
 
 # ✅ Eliminando import duplicado de sic_clean - ya tenemos enviar_senal_log de SIC v3.0
 
@@ -103,6 +104,7 @@ class ICTSystemMonitor:
         # 📊 Estado de componentes
         self.components: Dict[str, ComponentHealth] = {}
         self.system_metrics: Dict[str, Any] = {}
+        self.memory_budget = get_memory_budget()  # Presupuesto del proceso + memoria por componente
         self.alerts: List[SystemAlert] = []
 
         # 🎯 Umbrales de alerta
@@ -242,7 +244,8 @@ class ICTSystemMonitor:
                     'packets_sent': network.packets_sent,
                     'packets_recv': network.packets_recv
                 } if network else {},
-                'uptime_hours': uptime.total_seconds() / 3600
+                'uptime_hours': uptime.total_seconds() / 3600,
+                'process_memory': self._collect_process_memory()
             }
 
             # ⚠️ Verificar umbrales
@@ -251,6 +254,21 @@ class ICTSystemMonitor:
         except Exception as e:
             enviar_senal_log("ERROR", f"Error recopilando métricas del sistema: {e}", __name__, "monitor")
 
+    def _collect_process_memory(self) -> Dict[str, Any]:
+        """🧮 RSS del proceso contra el presupuesto (desaloja si supera el umbral) + bytes por componente"""
+        check = self.memory_budget.check()
+        return {
+            'rss_mb': round(check['rss_bytes'] / (1024**2), 1),
+            'limit_gb': round(check['limit_bytes'] / (1024**3), 2),
+            'usage_percent': check['usage_percent'],
+            'status': check['status'],
+            'evicted': check['evicted'],
+            'components_mb': {
+                name: round(entry['bytes'] / (1024**2), 2)
+                for name, entry in self.memory_budget.component_report().items()
+            }
+        }
+
     def _check_component_health(self):
         """Verifica la salud de cada componente ICT"""
         with self._lock:
@@ -334,6 +352,16 @@ class ICTSystemMonitor:
                 {"memory_usage": metrics['memory']['usage_percent']}
             )
 
+        # 🧮 Presupuesto de memoria del proceso
+        process_memory = metrics.get('process_memory', {})
+        if process_memory.get('status') in ('ALERT', 'CLEANUP'):
+            self._create_alert(
+                AlertLevel.CRITICAL if process_memory['status'] == 'CLEANUP' else AlertLevel.WARNING,
+                "process_memory",
+                f"Memoria del proceso: {process_memory['usage_percent']:.1f}% de {process_memory['limit_gb']} GB",
+                {"evicted": process_memory.get('evicted', {})}
+            )
+
         # 💾 Disco
         if metrics['disk']['usage_percent'] > self.thresholds['disk_usage']:
             self._create_alert(
@@ -452,7 +480,8 @@ class ICTSystemMonitor:
                 'critical': len([a for a in active_alerts if a.level == AlertLevel.CRITICAL]),
                 'warning': len([a for a in active_alerts if a.level == AlertLevel.WARNING])
             },
-            'thresholds': self.thresholds
+            'thresholds': self.thresholds,
+            'memory_budget': self.memory_budget.snapshot()
         }
 
     def get_component_details(self, component_name: str) -> Optional[Dict[str, Any]]:
@@ -536,6 +565,13 @@ class ICTSystemMonitor:
 
             report += f"• {name}: {status_icon} {status}\n"
 
+        process_memory = summary['system_metrics'].get('process_memory', {})
+        if process_memory:
+            report += (f"\n🧮 MEMORIA DEL PROCESO: {process_memory['rss_mb']} MB "
+                       f"({process_memory['usage_percent']:.1f}% de {process_memory['limit_gb']} GB)\n")
+            for name, megabytes in process_memory['components_mb'].items():
+                report += f"• {name}: {megabytes} MB\n"
+
         report += f"""
 🚨 ALERTAS:
 • Total: {summary['alerts']['total']}
@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+🧱 TIMEFRAME AGGREGATOR - TEMPORALIDADES DERIVADAS DE UNA SERIE BASE
+===================================================================
+
+La implementación es core/data_management/timeframe_aggregator.py del árbol
+v6.0 (ver sistema.v6_shared). M5, M15, H1, H4 y D1 se agregan desde una sola
+serie M1 (o M5): la adquisición de datos del ACC carga la serie base una vez
+por ciclo y sólo agrega las velas que cerraron desde el ciclo anterior.
+
+    builder = IncrementalTimeframeBuilder(['M1', 'M15', 'H1'], 'M1')
+    builder.update(df_m1.iloc[:-1], forming=df_m1.iloc[-1:])
+    df_h1 = builder.frame('H1', include_forming=True)
+
+Versión: v1.0.0 - Timeframe Aggregator
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+from sistema.v6_shared import load_v6_module
+
+load_v6_module('core/data_management/timeframe_aggregator.py', __name__)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+🔗 V6 SHARED - MÓDULOS COMPARTIDOS CON EL ÁRBOL v6.0 ENTERPRISE
+===============================================================
+
+Los motores que existen en ambos árboles (calendario de sesiones, equal
+levels, kernel FVG, profiler, correlación...) tienen una sola implementación
+en ict-engine-v6.0-enterprise-sic/01-CORE. Cada módulo v5 equivalente es un
+shim que la carga con su propio nombre:
+
+    # docs/sistema/rolling_correlation.py
+    from sistema.v6_shared import load_v6_module
+    load_v6_module('utils/rolling_correlation.py', __name__)
+
+El módulo cargado reemplaza al shim en sys.modules, así que las clases
+quedan registradas como sistema.rolling_correlation.* (pickle entre
+procesos) y los singletons del módulo son únicos dentro del proceso v5.
+
+Versión: v1.0.0 - V6 Shared
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import importlib.util
+import os
+import sys
+from types import ModuleType
+
+V6_CORE_DIR = os.path.abspath(os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', '..', '..',
+    'ict-engine-v6.0-enterprise-sic', '01-CORE'))
+
+
+def v6_module_path(relative_path: str) -> str:
+    """Ruta absoluta de un módulo del árbol v6 ('utils/memory_budget.py')"""
+    return os.path.join(V6_CORE_DIR, *relative_path.split('/'))
+
+
+def load_v6_module(relative_path: str, module_name: str) -> ModuleType:
+    """
+    📦 Ejecutar un módulo v6 con el nombre del shim v5 que lo expone
+
+    Args:
+        relative_path: Ruta relativa a 01-CORE ('core/analysis/fvg_kernel.py')
+        module_name: Nombre con el que queda registrado (el __name__ del shim)
+
+    Returns:
+        El módulo cargado, ya registrado en sys.modules[module_name]
+    """
+    path = v6_module_path(relative_path)
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Módulo v6 no encontrado: {path}", name=module_name, path=path)
+
+    module = importlib.util.module_from_spec(spec)
+    previous = sys.modules.get(module_name)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        if previous is not None:
+            sys.modules[module_name] = previous
+        else:
+            sys.modules.pop(module_name, None)
+        raise
+    return module
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST ACCOUNT SNAPSHOT - Foto de cuenta por ciclo de RiskBot
+==============================================================
+Verifica que la foto lee el bróker una sola vez, que los totales
+vectorizados coinciden con el cálculo posición a posición de RiskBot y que
+la foto serializada se reproduce sin terminal.
+"""
+
+import json
+import os
+import sys
+import unittest
+
+# Agregar docs/ (sistema) y la raíz del proyecto (core) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from core.backtesting import SimulatedBroker
+from core.risk_management.account_snapshot import AccountSnapshot, SnapshotBroker
+
+
+class CountingBroker:
+    """Cuenta las lecturas al bróker simulado"""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.calls = {}
+
+    def __getattr__(self, name):
+        attr = getattr(self.broker, name)
+        if not callable(attr):
+            return attr
+
+        def _counted(*args, **kwargs):
+            self.calls[name] = self.calls.get(name, 0) + 1
+            return attr(*args, **kwargs)
+        return _counted
+
+
+class TestAccountSnapshot(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = SimulatedBroker(initial_balance=10000.0, commission_per_lot=7.0)
+        self.broker.on_bar('EURUSD', 0, 1.1000, 1.1000, 1.1000, 1.1000, 0)
+        self.broker.on_bar('USDJPY', 0, 150.00, 150.00, 150.00, 150.00, 0)
+        for symbol, volume, side in (('EURUSD', 0.5, 0), ('EURUSD', 0.02, 1), ('USDJPY', 0.3, 1)):
+            self.broker.order_send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': symbol,
+                                    'volume': volume, 'type': side})
+        self.broker.on_bar('EURUSD', 300, 1.1000, 1.1020, 1.0995, 1.1015, 0)
+        self.broker.on_bar('USDJPY', 300, 150.00, 150.10, 149.70, 149.80, 0)
+
+    def test_single_read_and_vectorized_totals(self):
+        counting = CountingBroker(self.broker)
+        snapshot = AccountSnapshot.capture(counting, commission_per_lot=7.0)
+        self.assertEqual(counting.calls, {'positions_get': 1, 'account_info': 1,
+                                          'symbol_info_tick': 2, 'symbol_info': 2})
+
+        positions = self.broker.positions_get()
+        gross = sum(p.profit for p in positions)
+        lots = sum(p.volume for p in positions)
+        swap = sum(p.swap for p in positions)
+        total_profit, commission, net, total_lots, total_swap = snapshot.totals()
+        self.assertAlmostEqual(total_profit, gross)
+        self.assertAlmostEqual(total_lots, lots)
+        self.assertAlmostEqual(commission, lots * 7.0)
+        self.assertAlmostEqual(net, gross - lots * 7.0)
+        self.assertAlmostEqual(snapshot.real_net_profit(), gross - (lots * 7.0 + swap))
+        self.assertAlmostEqual(snapshot.balance, 10000.0)
+
+        small = snapshot.select(snapshot.volume < 0.05)
+        self.assertEqual([p.volume for p in small], [0.02])
+        self.assertAlmostEqual(snapshot.pip_value('EURUSD', 0.5), 0.0001 / 1.1015 * 100000 * 0.5)
+        self.assertEqual(len(snapshot.pip_values()), 3)
+
+    def test_replay_from_serialized_snapshot(self):
+        snapshot = AccountSnapshot.capture(self.broker, commission_per_lot=7.0)
+        restored = AccountSnapshot.from_dict(json.loads(json.dumps(snapshot.to_dict())))
+
+        self.assertEqual(restored.totals(), snapshot.totals())
+        self.assertEqual(list(restored.ticket), list(snapshot.ticket))
+        self.assertEqual(restored.symbol_infos['USDJPY'].trade_contract_size,
+                         snapshot.symbol_infos['USDJPY'].trade_contract_size)
+
+        replay = SnapshotBroker(restored, constants=SimulatedBroker)
+        self.assertEqual(replay.ORDER_TYPE_SELL, SimulatedBroker.ORDER_TYPE_SELL)
+        self.assertEqual(AccountSnapshot.capture(replay, 7.0).totals(), snapshot.totals())
+        result = replay.order_send({'action': replay.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'position': 1})
+        self.assertEqual(result.retcode, replay.TRADE_RETCODE_DONE)
+        self.assertEqual(len(replay.orders), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
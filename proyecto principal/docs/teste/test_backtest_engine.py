@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST BACKTEST ENGINE - Bróker simulado y replay de velas
+===========================================================
+Verifica llenado de órdenes límite, SL/TP, comisión, conversión a USD de
+cruces (tipos fijos o pares USD de data_dir), el bucle del motor y RiskBot real contra el bróker simulado.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Agregar docs/ (sistema) y la raíz del proyecto (core) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from core.backtesting import BacktestConfig, BacktestEngine, SimulatedBroker
+
+
+def _candles(closes, spread=0.0):
+    closes = np.asarray(closes, dtype=float)
+    return pd.DataFrame({
+        'open': closes, 'high': closes + 0.0005, 'low': closes - 0.0005, 'close': closes,
+        'spread': spread,
+    }, index=pd.date_range('2025-08-01', periods=len(closes), freq='5min'))
+
+
+class BuyOnceStrategy:
+    """Compra 1 lote en la primera vela con SL/TP a 20 pips"""
+
+    def on_bar(self, ctx):
+        if ctx.index == 0:
+            ctx.broker.order_send({
+                'action': ctx.broker.TRADE_ACTION_DEAL, 'symbol': ctx.symbol, 'volume': 1.0,
+                'type': ctx.broker.ORDER_TYPE_BUY, 'sl': ctx.close - 0.0020, 'tp': ctx.close + 0.0020,
+            })
+
+
+class MarketBuyOnceStrategy:
+    """Compra 1 lote en la primera vela sin SL/TP (se cierra al final)"""
+
+    def on_bar(self, ctx):
+        if ctx.index == 0:
+            ctx.broker.order_send({'action': ctx.broker.TRADE_ACTION_DEAL, 'symbol': ctx.symbol, 'volume': 1.0,
+                                   'type': ctx.broker.ORDER_TYPE_BUY})
+
+
+class CloseInProfitRiskManager:
+    """Gestor mínimo con la interfaz de RiskBot: cierra todo con +5 USD"""
+
+    def set_backtest_mode(self, broker):
+        self.broker = broker
+
+    def check_and_act(self):
+        for pos in self.broker.positions_get():
+            if pos.profit >= 5.0:
+                self.broker.order_send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': pos.symbol,
+                                        'volume': pos.volume, 'type': self.broker.ORDER_TYPE_SELL,
+                                        'position': pos.ticket})
+        return 'ok'
+
+
+class TestSimulatedBroker(unittest.TestCase):
+
+    def setUp(self):
+        self.broker = SimulatedBroker(initial_balance=10000.0, commission_per_lot=7.0)
+
+    def test_buy_limit_fills_when_range_touches_price(self):
+        self.broker.on_bar('EURUSD', 0, 1.1000, 1.1005, 1.0995, 1.1000, 0)
+        result = self.broker.order_send({'action': self.broker.TRADE_ACTION_PENDING, 'symbol': 'EURUSD',
+                                         'volume': 0.5, 'type': self.broker.ORDER_TYPE_BUY_LIMIT,
+                                         'price': 1.0980})
+        self.assertEqual(result.retcode, self.broker.TRADE_RETCODE_DONE)
+        self.assertEqual(len(self.broker.orders_get(symbol='EURUSD')), 1)
+
+        self.broker.on_bar('EURUSD', 300, 1.0990, 1.0992, 1.0985, 1.0988, 0)
+        self.assertEqual(len(self.broker.positions_get()), 0)
+
+        self.broker.on_bar('EURUSD', 600, 1.0988, 1.0990, 1.0970, 1.0975, 0)
+        positions = self.broker.positions_get()
+        self.assertEqual(len(positions), 1)
+        self.assertAlmostEqual(positions[0].price_open, 1.0980)
+        self.assertEqual(self.broker.orders_total(), 0)
+
+    def test_stop_loss_charges_commission(self):
+        self.broker.on_bar('EURUSD', 0, 1.1000, 1.1000, 1.1000, 1.1000, 0)
+        self.broker.order_send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 1.0,
+                                'type': self.broker.ORDER_TYPE_BUY, 'sl': 1.0990})
+        self.broker.on_bar('EURUSD', 300, 1.0995, 1.0996, 1.0980, 1.0985, 0)
+
+        deal = self.broker.deals[-1]
+        self.assertEqual(deal['reason'], 'sl')
+        self.assertAlmostEqual(deal['profit'], -100.0, places=6)
+        self.assertAlmostEqual(self.broker.balance, 10000.0 - 100.0 - 7.0, places=6)
+
+    def test_market_order_pays_spread_and_slippage(self):
+        broker = SimulatedBroker(slippage_points=2)
+        broker.on_bar('EURUSD', 0, 1.1000, 1.1000, 1.1000, 1.1000, 10)
+        result = broker.order_send({'action': broker.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                                    'type': broker.ORDER_TYPE_BUY})
+        self.assertAlmostEqual(result.price, 1.1000 + 0.00010 + 0.00002)
+
+    def test_jpy_cross_converts_through_simulated_usdjpy(self):
+        self.broker.on_bar('USDJPY', 0, 150.0, 150.0, 150.0, 150.0, 0)
+        self.broker.on_bar('EURUSD', 0, 1.08, 1.08, 1.08, 1.08, 0)
+        self.broker.on_bar('EURJPY', 0, 160.0, 160.0, 160.0, 160.0, 0)
+        self.broker.order_send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': 'EURJPY', 'volume': 1.0,
+                                'type': self.broker.ORDER_TYPE_BUY})
+        self.broker.on_bar('EURJPY', 300, 161.0, 161.0, 161.0, 161.0, 0)
+
+        # 1 lote x 1.000 JPY = 100.000 JPY = 666,67 USD (no 100.000 USD)
+        self.assertAlmostEqual(self.broker.positions_get()[0].profit, 100000.0 / 150.0, places=6)
+        # Margen: 100.000 EUR; EURUSD desde la tabla de tipos
+        broker = SimulatedBroker(conversion_rates={'EURUSD': 1.08})
+        broker.on_bar('EURJPY', 0, 160.0, 160.0, 160.0, 160.0, 0)
+        self.assertAlmostEqual(broker._required_margin('EURJPY', 1.0, 160.0), 100000.0 * 1.08 / 100, places=6)
+
+    def test_close_reports_closed_volume(self):
+        self.broker.on_bar('EURUSD', 0, 1.1000, 1.1000, 1.1000, 1.1000, 0)
+        opened = self.broker.order_send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': 'EURUSD',
+                                         'volume': 0.5, 'type': self.broker.ORDER_TYPE_BUY})
+        result = self.broker.order_send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': 'EURUSD',
+                                         'volume': 2.0, 'type': self.broker.ORDER_TYPE_SELL,
+                                         'position': opened.order})
+        self.assertEqual(result.volume, 0.5)
+        self.assertEqual(self.broker.positions_total(), 0)
+
+    def test_cross_without_conversion_rate_raises(self):
+        self.broker.on_bar('EURJPY', 0, 160.0, 160.0, 160.0, 160.0, 0)
+        with self.assertRaises(ValueError):
+            self.broker.order_send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': 'EURJPY', 'volume': 1.0,
+                                    'type': self.broker.ORDER_TYPE_BUY})
+
+
+class TestBacktestEngine(unittest.TestCase):
+
+    def test_take_profit_through_engine(self):
+        closes = 1.1000 + np.arange(60) * 0.0001
+        engine = BacktestEngine(BacktestConfig(commission_per_lot=7.0), strategy_factory=BuyOnceStrategy)
+        result = engine.run('EURUSD', _candles(closes))
+
+        self.assertEqual(result['bars'], 60)
+        self.assertEqual(result['account']['trades'], 1)
+        self.assertEqual(result['account']['execution']['tp_hits'], 1)
+        self.assertAlmostEqual(result['account']['net_profit'], 200.0 - 7.0, places=4)
+
+    def test_risk_manager_closes_positions(self):
+        closes = 1.1000 + np.arange(30) * 0.00002
+        engine = BacktestEngine(BacktestConfig(), strategy_factory=BuyOnceStrategy,
+                                risk_manager_factory=CloseInProfitRiskManager)
+        result = engine.run('EURUSD', _candles(closes))
+
+        self.assertEqual(result['account']['trades'], 1)
+        self.assertEqual(result['account']['open_positions'], 0)
+        self.assertGreaterEqual(result['account']['net_profit'], 5.0 - 7.0)
+
+    def test_riskbot_closes_at_max_risk_on_simulated_broker(self):
+        closes = 1.1000 - np.arange(200) * 0.0001
+        config = BacktestConfig(use_riskbot=True, riskbot_kwargs={'risk_percent': 1.0},
+                                include_deals=True, close_at_end=False)
+        result = BacktestEngine(config, strategy_factory=BuyOnceStrategy).run('EURUSD', _candles(closes))
+
+        # RiskBot cierra al superar el 1% de pérdida neta, antes del SL a 20 pips
+        deal = result['deals'][0]
+        self.assertEqual(deal['reason'], 'RiskBot close (RIESGO_MAXIMO)')
+        self.assertAlmostEqual(deal['price_close'], 1.0990, places=6)
+        self.assertEqual(result['account']['open_positions'], 0)
+        self.assertEqual(result['account']['execution']['sl_hits'], 0)
+
+
+class TestCrossPairBacktest(unittest.TestCase):
+    """EURJPY: el margen necesita EUR→USD y el P&L JPY→USD"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.closes = 160.0 + np.arange(60) * 0.01
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _save(self, symbol, closes):
+        frame = _candles(closes)
+        frame.index.name = 'time'
+        frame.to_csv(os.path.join(self.tmp.name, f'{symbol}_M5_20250801_000000.csv'))
+
+    def test_fixed_conversion_rates_from_config(self):
+        config = BacktestConfig(conversion_rates={'USDJPY': 150.0, 'EURUSD': 1.08}, data_dir=self.tmp.name)
+        result = BacktestEngine(config, strategy_factory=MarketBuyOnceStrategy).run('EURJPY', _candles(self.closes))
+        self.assertEqual(result['account']['trades'], 1)
+        self.assertAlmostEqual(result['account']['net_profit'],
+                               (self.closes[-1] - self.closes[0]) * 100000 / 150.0 - 7.0, places=4)
+
+    def test_run_parallel_replays_usd_pairs_from_data_dir(self):
+        self._save('EURJPY', self.closes)
+        self._save('USDJPY', np.full(60, 150.0))
+        self._save('EURUSD', np.full(60, 1.08))
+        results = BacktestEngine(BacktestConfig(data_dir=self.tmp.name),
+                                 strategy_factory=MarketBuyOnceStrategy).run_parallel(['EURJPY'])
+
+        result = results['symbol_results']['EURJPY']
+        self.assertEqual(result['status'], 'SUCCESS')
+        self.assertAlmostEqual(result['account']['net_profit'],
+                               (self.closes[-1] - self.closes[0]) * 100000 / 150.0 - 7.0, places=4)
+
+        # Sin velas del par USD ni tipo fijo el cruce sigue fallando de forma explícita
+        os.remove(os.path.join(self.tmp.name, 'USDJPY_M5_20250801_000000.csv'))
+        results = BacktestEngine(BacktestConfig(data_dir=self.tmp.name),
+                                 strategy_factory=MarketBuyOnceStrategy).run_parallel(['EURJPY'])
+        self.assertIn('JPY→USD', results['symbol_results']['EURJPY']['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST CALIBRATION REPLAY - Re-scoring histórico y sprint de calibración
+=========================================================================
+Verifica que el replay da el mismo score que calculate_pattern_confidence,
+que el peso histórico de cada patrón solo usa resultados anteriores a su
+instante y que run_calibration_sprint elige la mejor configuración por
+1 - Brier sobre los registros reales (en serie y en paralelo).
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Agregar docs/ (sistema) y la raíz del proyecto (core) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from core.ict_engine import confidence_engine as confidence_module
+from core.ict_engine.calibration_replay import (build_replay_features, evaluate_configs, generate_search_configs,
+                                                score_replay_features)
+from core.ict_engine.confidence_calibrator import ConfidenceCalibrator
+from core.ict_engine.confidence_engine import ConfidenceEngine
+from core.ict_engine.ict_historical_analyzer import ICTHistoricalAnalyzer
+
+PATTERN_TYPES = ['ORDER_BLOCK', 'FAIR_VALUE_GAP', 'LIQUIDITY_POOL', 'BOS']
+SESSIONS = ['london', 'new_york', 'asian', None]
+
+
+def make_records(seed, count, age=timedelta(minutes=5)):
+    rng = np.random.default_rng(seed)
+    timestamp = (datetime.now() - age).isoformat()
+    records = []
+    for _ in range(count):
+        strength = float(rng.uniform(40, 100))
+        pattern = {'type': str(rng.choice(PATTERN_TYPES)), 'timeframe': str(rng.choice(['M15', 'H1'])),
+                   'direction': str(rng.choice(['BULLISH', 'BEARISH'])), 'strength': strength,
+                   'price': float(1.1 + rng.normal(0, 0.002)), 'detection_quality': str(rng.choice(['HIGH', 'LOW'])),
+                   'timeframe_confirmation': bool(rng.random() < 0.5), 'timestamp': timestamp}
+        records.append({
+            'pattern': pattern,
+            'market_context': {'h4_bias': str(rng.choice(['BULLISH', 'BEARISH', 'NEUTRAL'])),
+                               'trend': 'BULLISH', 'sr_level': str(rng.choice(['MAJOR', 'MINOR', 'NONE'])),
+                               'volatility': str(rng.choice(['HIGH', 'MEDIUM', 'LOW']))},
+            'poi_list': [{'price': float(1.1 + rng.normal(0, 0.002)), 'intelligent_score': float(rng.uniform(10, 100)),
+                          'type': str(rng.choice(PATTERN_TYPES))} for _ in range(int(rng.integers(0, 6)))],
+            'current_price': 1.1, 'session': SESSIONS[int(rng.integers(0, len(SESSIONS)))], 'symbol': 'EURUSD',
+            'outcome': 'WIN' if rng.random() < strength / 100 else 'LOSS',
+        })
+    return records
+
+
+def write_history(logs_dir, entries):
+    os.makedirs(os.path.join(logs_dir, 'analysis'), exist_ok=True)
+    with open(os.path.join(logs_dir, 'analysis', 'poi_history.jsonl'), 'w', encoding='utf-8') as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + '\n')
+
+
+class TestCalibrationReplay(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = ConfidenceEngine()
+        self.engine.historical_analyzer = ICTHistoricalAnalyzer(logs_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_replay_matches_scalar_engine(self):
+        records = make_records(44, 300)
+        features = build_replay_features(records, self.engine, max_distance_pips=30)
+        replay = score_replay_features(features, self.engine.config)
+
+        scalar = np.array([self.engine.calculate_pattern_confidence(
+            r['pattern'], r['market_context'], r['poi_list'], r['current_price'], r['session'], r['symbol'])
+            for r in records])
+        self.assertEqual(len(features), 300)
+        np.testing.assert_allclose(replay, scalar, rtol=0, atol=1e-12)
+
+    def test_historical_weight_uses_only_prior_outcomes(self):
+        now = datetime.now()
+        pattern_time = now - timedelta(days=10)
+        history = [{'poi_type': 'ORDER_BLOCK', 'timeframe': 'M15', 'symbol': 'EURUSD', 'success': False,
+                    'timestamp': (pattern_time - timedelta(days=2, hours=i)).isoformat()} for i in range(5)]
+        history += [{'poi_type': 'ORDER_BLOCK', 'timeframe': 'M15', 'symbol': 'EURUSD', 'success': True,
+                     'timestamp': (now - timedelta(days=5, hours=i)).isoformat()} for i in range(20)]
+        write_history(self.tmp.name, history)
+
+        record = {'pattern': {'type': 'ORDER_BLOCK', 'timeframe': 'M15', 'direction': 'BULLISH'},
+                  'timestamp': pattern_time.isoformat(), 'current_price': 1.1, 'outcome': 'WIN'}
+        features = build_replay_features([record], self.engine)
+
+        # Antes del patrón solo había 5 fallos: peso 0.5 (normalizado /100), no el actual con 20 aciertos
+        self.assertAlmostEqual(features.historical[0], 0.5 / 100.0)
+        self.assertGreater(self.engine._calculate_historical_weight(record['pattern']), features.historical[0])
+
+        # Sin instante conocido no hay historia previa: peso base del tipo
+        features = build_replay_features([dict(record, timestamp=None)], self.engine)
+        self.assertAlmostEqual(features.historical[0], 1.0 / 100.0)
+
+
+class TestCalibrationSprint(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.engine = confidence_module.confidence_engine
+        self.analyzer = self.engine.historical_analyzer
+        self.engine.historical_analyzer = ICTHistoricalAnalyzer(logs_dir=self.tmp.name)
+
+    def tearDown(self):
+        self.engine.historical_analyzer = self.analyzer
+        self.tmp.cleanup()
+
+    def test_sprint_picks_best_replay_objective(self):
+        calibrator = ConfidenceCalibrator(replay_records=make_records(7, 200), max_workers=1)
+        self.assertEqual(len(calibrator.replay_features), 200)
+
+        report = calibrator.run_calibration_sprint()
+        results = report['test_results']
+        self.assertNotIn('error', report)
+        self.assertGreater(report['tested_configurations'], 5)
+        self.assertTrue(all(r['evaluation'] == 'replay' for r in results))
+        self.assertEqual(report['best_result']['objective'], max(r['objective'] for r in results))
+
+    def test_parallel_search_matches_serial(self):
+        features = build_replay_features(make_records(8, 120), self.engine)
+        configs = generate_search_configs(self.engine.config, 'random', samples=16, seed=3)
+        self.assertEqual(evaluate_configs(features, configs, max_workers=2),
+                         evaluate_configs(features, configs, max_workers=1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST CONFIDENCE ENGINE - Confianza por lotes vs camino escalar
+=================================================================
+Verifica que calculate_batch_confidence da el mismo score que
+calculate_pattern_confidence patrón a patrón (factores, confluencia POI,
+histórico y multiplicadores) y que los patrones inválidos valen 0.0.
+"""
+
+import os
+import sys
+import unittest
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# Agregar docs/ (sistema) y la raíz del proyecto (core) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from core.ict_engine.confidence_engine import ConfidenceEngine
+
+PATTERN_TYPES = ['ORDER_BLOCK', 'FAIR_VALUE_GAP', 'BOS', 'CHOCH', 'JUDAS_SWING', 'SILVER_BULLET']
+POI_TYPES = ['ORDER_BLOCK', 'FAIR_VALUE_GAP', 'BREAKER_BLOCK', 'LIQUIDITY_POOL', 'UNKNOWN']
+DIRECTIONS = ['BULLISH', 'BEARISH', 'NEUTRAL']
+QUALITIES = ['HIGH', 'MEDIUM', 'LOW']
+
+
+def make_patterns(rng, count, price=1.1000):
+    patterns = []
+    for _ in range(count):
+        pattern = {
+            'type': str(rng.choice(PATTERN_TYPES)),
+            'timeframe': str(rng.choice(['M5', 'M15', 'H1', 'H4'])),
+            'direction': str(rng.choice(DIRECTIONS)),
+            'strength': float(rng.uniform(40, 100)),
+            'price': float(price + rng.normal(0, 0.0030)),
+            'detection_quality': str(rng.choice(QUALITIES)),
+            'timeframe_confirmation': bool(rng.random() < 0.5),
+        }
+        if rng.random() < 0.1:  # Algunos patrones caducados
+            pattern['timestamp'] = (datetime.now() - timedelta(days=3)).isoformat()
+        patterns.append(pattern)
+    return patterns
+
+
+def make_pois(rng, count, price=1.1000):
+    return [{'price': float(price + rng.normal(0, 0.0030)), 'intelligent_score': float(rng.uniform(0, 100)),
+             'type': str(rng.choice(POI_TYPES))} for _ in range(count)]
+
+
+class TestBatchConfidence(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.engine = ConfidenceEngine()
+
+    def test_batch_matches_scalar(self):
+        rng = np.random.default_rng(43)
+        contexts = [
+            {'structure_quality': 'HIGH', 'h4_bias': 'BULLISH', 'trend': 'BULLISH', 'trend_strength': 'STRONG',
+             'sr_level': 'MAJOR', 'momentum': 'STRONG_BULLISH'},
+            {'structure_quality': 'LOW', 'h4_bias': 'BEARISH', 'trend': 'BEARISH', 'trend_strength': 'WEAK',
+             'sr_level': 'MINOR', 'momentum': 'STRONG_BEARISH'},
+            {},
+        ]
+        for context, session in zip(contexts, ['LONDON', 'NEW_YORK', None]):
+            patterns = make_patterns(rng, 100)
+            pois = make_pois(rng, 40)
+
+            batch = self.engine.calculate_batch_confidence(patterns, context, pois, 1.1000, session)
+            scalar = np.array([self.engine.calculate_pattern_confidence(p, context, pois, 1.1000, session)
+                               for p in patterns])
+            np.testing.assert_allclose(batch, scalar, rtol=0, atol=1e-12)
+            self.assertTrue((batch[[('timestamp' in p) for p in patterns]] == 0.0).all())
+
+    def test_invalid_inputs_score_zero(self):
+        patterns = make_patterns(np.random.default_rng(7), 5)
+        self.assertEqual(self.engine.calculate_batch_confidence([], {}, [], 1.1).tolist(), [])
+        self.assertEqual(self.engine.calculate_batch_confidence(patterns, {}, [], 0.0).tolist(), [0.0] * 5)
+        self.assertEqual(self.engine.calculate_batch_confidence(patterns + [{}], None, [], 1.1).tolist(), [0.0] * 6)
+
+        # Datos no numéricos: cae al camino escalar patrón a patrón
+        odd = [dict(patterns[0], strength='fuerte')]
+        self.assertEqual(self.engine.calculate_batch_confidence(odd, {}, [], 1.1000).tolist(),
+                         [self.engine.calculate_pattern_confidence(odd[0], {}, [], 1.1000)])
+
+
+if __name__ == '__main__':
+    unittest.main()
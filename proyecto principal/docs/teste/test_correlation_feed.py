@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST CORRELATION FEED - Velas cerradas de MT5 al motor de correlación
+========================================================================
+Verifica que MT5DataManager.feed_correlation_engine calienta el motor con
+la ventana mayor, después lee sólo la cola nueva, nunca procesa la vela en
+formación y recalienta si la cola no enlaza; y que RiskBot sincroniza el
+motor antes de reducir el lotaje por exposición correlacionada.
+"""
+
+import os
+import sys
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Agregar docs/ (sistema, utils) y la raíz del proyecto (core) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from core.risk_management.riskbot_mt5 import RiskBot
+from sistema.rolling_correlation import RollingCorrelationEngine
+from utils.mt5_data_manager import MT5DataManager
+
+_BARS = 400
+
+
+def _history(seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 0.001, _BARS)
+    returns = np.column_stack([common + rng.normal(0, 0.0002, _BARS),
+                               0.9 * common + rng.normal(0, 0.0004, _BARS),
+                               rng.normal(0, 0.001, _BARS)])
+    return pd.DataFrame(np.exp(np.cumsum(returns, axis=0)), columns=['EURUSD', 'GBPUSD', 'USDJPY'],
+                        index=pd.date_range('2025-08-01', periods=_BARS, freq='h'))
+
+
+class HistoryManager(MT5DataManager):
+    """MT5DataManager sobre un histórico fijo: la vela `now` es la que está en formación"""
+
+    def __init__(self, history: pd.DataFrame, now: int):
+        super().__init__()
+        self.history = history
+        self.now = now
+        self.requests = []
+
+    def download_historical_data(self, symbol, timeframe, count=None):
+        self.requests.append((symbol, count))
+        rows = self.history[symbol].iloc[max(0, self.now + 1 - count):self.now + 1]
+        return pd.DataFrame({'close': rows})
+
+
+class TestCorrelationFeed(unittest.TestCase):
+
+    def test_feed_reads_closed_tail_only(self):
+        history = _history()
+        manager = HistoryManager(history, now=300)
+        engine = RollingCorrelationEngine(windows=(20, 50))
+
+        self.assertEqual(manager.feed_correlation_engine(['EURUSD', 'GBPUSD'], engine=engine), 51)
+        self.assertEqual(manager.requests, [('EURUSD', 52), ('GBPUSD', 52)])
+        self.assertEqual(engine.last_bar_time, history.index[299])  # La vela 300 sigue en formación
+
+        # Cinco velas después: sólo la cola transcurrida más el margen
+        manager.requests.clear()
+        manager.now = 305
+        manager._correlation_fetched_at -= 5 * 3600
+        self.assertEqual(manager.feed_correlation_engine(['EURUSD', 'GBPUSD'], engine=engine), 5)
+        self.assertTrue(all(count == 8 for _, count in manager.requests))
+
+        reference = RollingCorrelationEngine(windows=(20, 50))
+        reference.seed_from_closes(history.iloc[:305])
+        self.assertAlmostEqual(engine.correlation('EURUSD', 'GBPUSD', 50),
+                               reference.correlation('EURUSD', 'GBPUSD', 50), places=9)
+
+        # La cola no enlaza con la última vela procesada: recalentar desde el histórico
+        manager.requests.clear()
+        manager.now = 330
+        self.assertEqual(manager.feed_correlation_engine(['EURUSD', 'GBPUSD'], engine=engine), 51)
+        self.assertEqual([count for _, count in manager.requests], [3, 3, 52, 52])
+        self.assertEqual(engine.last_bar_time, history.index[329])
+
+        # Símbolo nuevo (posición abierta en USDJPY): historial completo
+        self.assertTrue(engine.needs_history(['EURUSD', 'USDJPY']))
+        self.assertEqual(manager.feed_correlation_engine(['EURUSD', 'GBPUSD', 'USDJPY'], engine=engine), 51)
+        self.assertEqual(engine.sample_size('EURUSD', 'USDJPY', 50), 50)
+
+        self.assertEqual(manager.feed_correlation_engine(['EURUSD'], engine=engine), 0)
+
+    def test_riskbot_syncs_engine_before_sizing(self):
+        manager = HistoryManager(_history(), now=300)
+        riskbot = RiskBot()
+        riskbot.correlation_engine = RollingCorrelationEngine(windows=(20, 50))
+        self.assertEqual(riskbot.factor_correlacion('EURUSD', ['GBPUSD']), 1.0)  # Sin historial
+
+        riskbot.attach_correlation_feed(manager)
+        rho = riskbot.correlation_engine.correlation
+        factor = riskbot.factor_correlacion('EURUSD', ['GBPUSD'])
+        self.assertGreater(rho('EURUSD', 'GBPUSD'), riskbot.correlation_threshold)
+        self.assertAlmostEqual(factor, 1.0 - riskbot.correlation_max_reduction * rho('EURUSD', 'GBPUSD'))
+        self.assertEqual(riskbot.factor_correlacion('EURUSD', ['USDJPY']), 1.0)  # Sin correlación
+
+
+if __name__ == '__main__':
+    unittest.main()
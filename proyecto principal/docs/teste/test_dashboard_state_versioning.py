@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST STATE VERSIONING - Difusión incremental del DashboardController
+======================================================================
+Verifica campos sucios, secuencia monotónica y deltas por dashboard.
+"""
+
+import os
+import sys
+import unittest
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List
+
+import numpy as np
+
+# Agregar docs/ (sistema) y la raíz del proyecto (dashboard) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from dashboard.state_versioning import STATE_SECTIONS, DirtyFieldsMixin, StateVersionTracker
+
+
+@dataclass
+class _State(DirtyFieldsMixin):
+    """Subconjunto de DashboardState con la misma semántica"""
+    current_price: float = 0.0
+    spread: float = 0.0
+    symbols: List[str] = field(default_factory=list)
+    poi_results: Dict[str, Any] = field(default_factory=dict)
+    alerts: List[Dict[str, Any]] = field(default_factory=list)
+    uptime: float = 0.0
+
+
+class TestStateVersioning(unittest.TestCase):
+
+    def setUp(self):
+        self.state = _State()
+        self.tracker = StateVersionTracker()
+        self.tracker.register_client('tui')
+
+    def _commit(self):
+        return self.tracker.commit(self.state, self.state.pop_dirty())
+
+    def test_first_delta_is_full_then_nothing(self):
+        self._commit()
+        delta = self.tracker.delta_for('tui')
+        self.assertTrue(delta['full'])
+        self.assertEqual(delta['sequence'], 1)
+        self.assertIn('pois', delta['sections'])
+
+        self.assertEqual(self._commit(), [])
+        self.assertIsNone(self.tracker.delta_for('tui'))
+        self.assertEqual(self.tracker.sequence, 1)
+
+    def test_only_changed_sections_are_sent(self):
+        self._commit()
+        self.tracker.delta_for('tui')
+
+        self.state.current_price = 1.1000
+        self.state.poi_results = {}  # Reasignado pero igual: no es cambio
+        self.assertEqual(self._commit(), ['prices'])
+
+        delta = self.tracker.delta_for('tui')
+        self.assertEqual(delta['changed_sections'], ['prices'])
+        self.assertEqual(delta['sections']['prices']['current_price'], 1.1000)
+        self.assertEqual(delta['sequence'], 2)
+
+    def test_in_place_mutation_needs_mark_dirty(self):
+        self._commit()
+        self.state.alerts.append({'message': 'x'})
+        self.assertEqual(self._commit(), [])
+
+        self.state.mark_dirty('alerts')
+        self.assertEqual(self._commit(), ['alerts'])
+        # La copia publicada no se ve afectada por mutaciones posteriores
+        self.state.alerts.append({'message': 'y'})
+        self.assertEqual(len(self.tracker.published_state()['alerts']), 1)
+
+    def test_clients_track_their_own_sequence(self):
+        self._commit()
+        self.tracker.delta_for('tui')
+        self.state.uptime = 10.0
+        self._commit()
+
+        self.tracker.register_client('web')
+        self.assertTrue(self.tracker.delta_for('web')['full'])
+        self.assertEqual(self.tracker.delta_for('tui')['changed_sections'], ['system'])
+        self.assertEqual(self.tracker.delta_since(2)['changed_sections'], [])
+
+    def test_unhashable_values_count_as_changed(self):
+        self.state.poi_results = {'levels': np.array([1.0, 2.0])}
+        self._commit()
+        self.state.poi_results = {'levels': np.array([1.0, 2.0])}
+        self.assertEqual(self._commit(), ['pois'])
+
+    def test_sections_cover_dashboard_state_fields(self):
+        tracked = {f for section in STATE_SECTIONS.values() for f in section}
+        self.assertTrue({f.name for f in fields(_State)} <= tracked)
+        self.assertEqual(len(tracked), sum(len(section) for section in STATE_SECTIONS.values()))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST LATENCY HISTOGRAM - Percentiles TCT fusionables
+======================================================
+Verifica precisión de percentiles, fusión entre threads/procesos y export.
+"""
+
+import json
+import os
+import pickle
+import sys
+import threading
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Agregar docs/ (sistema) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+
+from sistema.latency_histogram import LatencyHistogram, LatencyHistogramRegistry
+
+
+def _latencies(n, seed):
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(mean=3.0, sigma=0.8, size=n)  # ~20ms con cola larga
+
+
+def _record_in_process(seed):
+    registry = LatencyHistogramRegistry()
+    for value in _latencies(2000, seed):
+        registry.record(value, stage='poi_detection', timeframe='M5', symbol='EURUSD', session='LONDON')
+    return registry
+
+
+class TestLatencyHistogram(unittest.TestCase):
+
+    def test_percentiles_within_precision(self):
+        values = _latencies(50_000, seed=1)
+        histogram = LatencyHistogram(precision=0.01)
+        histogram.record_many(values)
+
+        for q in (50, 90, 99):
+            exact = np.percentile(values, q, method='inverted_cdf')
+            self.assertAlmostEqual(histogram.percentile(q), exact, delta=exact * 0.0101)
+        self.assertEqual(histogram.count, len(values))
+        self.assertAlmostEqual(histogram.mean_ms, values.mean(), places=6)
+        self.assertEqual(histogram.percentile(100), values.max())
+
+    def test_merge_equals_single_histogram(self):
+        values = _latencies(9000, seed=2)
+        whole = LatencyHistogram()
+        whole.record_many(values)
+
+        parts = [LatencyHistogram() for _ in range(3)]
+        for part, chunk in zip(parts, np.array_split(values, 3)):
+            for value in chunk:
+                part.record(value)
+        merged = parts[0].merge(parts[1]).merge(parts[2])
+
+        np.testing.assert_array_equal(merged.counts, whole.counts)
+        self.assertEqual(merged.percentiles(), whole.percentiles())
+        with self.assertRaises(ValueError):
+            whole.merge(LatencyHistogram(precision=0.05))
+
+    def test_registry_threads_and_rollup(self):
+        registry = LatencyHistogramRegistry()
+
+        def worker(timeframe):
+            for value in _latencies(1000, seed=len(timeframe)):
+                registry.record(value, stage='tct_total', timeframe=timeframe, symbol='EURUSD')
+
+        threads = [threading.Thread(target=worker, args=(tf,)) for tf in ('M1', 'M5', 'M15', 'H1')]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(registry.get().count, 4000)
+        self.assertEqual(registry.get(timeframe='M5').count, 1000)
+        by_timeframe = registry.summary(by=('timeframe',))
+        self.assertEqual(set(by_timeframe), {'M1', 'M5', 'M15', 'H1'})
+        self.assertIn('p99_ms', by_timeframe['H1'])
+        self.assertEqual(list(registry.summary(by=('session',))), ['UNKNOWN'])
+
+    def test_merge_across_processes_and_json_export(self):
+        with ProcessPoolExecutor(max_workers=2) as pool:
+            partials = list(pool.map(_record_in_process, [10, 11]))
+
+        combined = LatencyHistogramRegistry()
+        for partial in partials:
+            combined.merge(pickle.loads(pickle.dumps(partial)))
+        self.assertEqual(combined.get(stage='poi_detection').count, 4000)
+
+        exported = json.loads(json.dumps(combined.to_dict()))
+        restored = LatencyHistogramRegistry().merge(exported)
+        self.assertEqual(restored.summary(), combined.summary())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST ORDER BOOK MIRROR - Espejo de órdenes de LimitOrderManager
+==================================================================
+Verifica que el espejo se actualiza con los resultados de order_send, que
+solo relee el terminal al vencer el intervalo (o tras un cambio externo) y
+que el lote del ciclo envía primero bajas y luego altas, sin duplicados,
+aunque el terminal no responda a alguna orden, y que LimitOrderManager solo
+da por colocada una orden cuando el bróker la acepta en el lote.
+"""
+
+import os
+import sys
+import unittest
+
+# Agregar docs/ (sistema) y la raíz del proyecto (core) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from core.backtesting import SimulatedBroker
+from core.limit_order_manager import LimitOrderManager
+from core.order_book_mirror import OrderBookMirror
+
+
+class RecordingBroker(SimulatedBroker):
+    """Bróker simulado que registra cada llamada de la API"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.calls = []
+
+    def orders_get(self, *args, **kwargs):
+        self.calls.append('orders_get')
+        return super().orders_get(*args, **kwargs)
+
+    def positions_get(self, *args, **kwargs):
+        self.calls.append('positions_get')
+        return super().positions_get(*args, **kwargs)
+
+    def order_send(self, request):
+        self.calls.append(('order_send', request['action']))
+        return super().order_send(request)
+
+
+class SilentBroker(RecordingBroker):
+    """order_send devuelve None (terminal sin respuesta) para los tickets/precios indicados"""
+
+    def __init__(self, *args, silent=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.silent = set(silent)
+
+    def order_send(self, request):
+        if request.get('order') in self.silent or request.get('price') in self.silent:
+            self.calls.append(('order_send', request['action']))
+            return None
+        return super().order_send(request)
+
+
+def _limit(broker, price, magic=123456):
+    return {'action': broker.TRADE_ACTION_PENDING, 'symbol': 'EURUSD', 'volume': 0.05,
+            'type': broker.ORDER_TYPE_BUY_LIMIT, 'price': price, 'magic': magic, 'comment': 'CONS_POI80_ICT'}
+
+
+class TestOrderBookMirror(unittest.TestCase):
+
+    def setUp(self):
+        self.now = [0.0]
+        self.broker = RecordingBroker()
+        self.broker.on_bar('EURUSD', 0, 1.1000, 1.1005, 1.0995, 1.1000, 0)
+        self.book = OrderBookMirror(self.broker, 'EURUSD', reconcile_interval=5.0, clock=lambda: self.now[0])
+
+    def test_results_update_mirror_without_rereading(self):
+        self.book.reconcile()
+        result = self.book.send(_limit(self.broker, 1.0980))
+        self.book.send(_limit(self.broker, 1.0970, magic=654321))
+
+        self.assertIn(result.order, self.book.orders)
+        self.assertEqual([o.ticket for o in self.book.orders_for('EURUSD', magic=654321)], [result.order + 1])
+        self.assertEqual(self.book.reconcile(), {'appeared': [], 'vanished': []})  # Intervalo no vencido
+        self.assertEqual(self.broker.calls.count('orders_get'), 1)
+
+        # Llenado en el bróker: el espejo lo ve en la siguiente reconciliación
+        self.broker.on_bar('EURUSD', 300, 1.0990, 1.0992, 1.0975, 1.0978, 0)
+        self.now[0] = 6.0
+        self.assertEqual(self.book.reconcile(), {'appeared': [], 'vanished': [result.order]})
+        self.assertEqual(len(self.book.positions), 1)
+
+    def test_batch_sends_cancels_before_placements_once(self):
+        first = self.book.send(_limit(self.broker, 1.0980)).order
+        self.broker.calls.clear()
+        cancelled = []
+
+        self.assertTrue(self.book.queue_cancel(first, lambda ticket, result: cancelled.append(ticket)))
+        self.assertFalse(self.book.queue_cancel(first))
+        self.assertTrue(self.book.is_pending_cancel(first))
+        self.book.queue_place(_limit(self.broker, 1.0975))
+        self.assertEqual(self.broker.calls, [])  # Nada sale hasta el flush
+
+        report = self.book.flush()
+        self.assertEqual(report['cancelled'], [first])
+        self.assertEqual(len(report['placed']), 1)
+        self.assertEqual(cancelled, [first])
+        self.assertEqual([call[1] for call in self.broker.calls],
+                         [self.broker.TRADE_ACTION_REMOVE, self.broker.TRADE_ACTION_PENDING])
+        self.assertEqual(list(self.book.orders), report['placed'])
+        self.assertFalse(self.book.has_pending_changes())
+
+    def test_none_result_is_a_failure_and_batch_continues(self):
+        broker = SilentBroker(silent={1.0980})
+        broker.on_bar('EURUSD', 0, 1.1000, 1.1005, 1.0995, 1.1000, 0)
+        book = OrderBookMirror(broker, 'EURUSD')
+        results = []
+        book.queue_place(_limit(broker, 1.0980), lambda request, result: results.append(result))
+        book.queue_place(_limit(broker, 1.0970))
+
+        report = book.flush()
+        self.assertEqual(results, [None])
+        self.assertEqual(len(report['failed']), 1)
+        self.assertEqual(len(report['placed']), 1)
+        self.assertEqual(list(book.orders), report['placed'])
+
+    def test_time_setup_uses_broker_clock(self):
+        self.broker.on_bar('EURUSD', 7200, 1.1000, 1.1005, 1.0995, 1.1000, 0)
+        ticket = self.book.send(_limit(self.broker, 1.0980)).order
+        local = self.book.orders[ticket].time_setup
+
+        self.book.reconcile(force=True)
+        self.assertEqual(local, 7200)
+        self.assertEqual(self.book.orders[ticket].time_setup, local)
+
+    def test_market_orders_mark_mirror_dirty(self):
+        self.book.reconcile()
+        self.book.send({'action': self.broker.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1,
+                        'type': self.broker.ORDER_TYPE_BUY})
+        self.assertTrue(self.book.needs_reconcile())
+        self.book.reconcile()
+        self.assertEqual(len(self.book.positions_for('EURUSD')), 1)
+        self.assertIsNotNone(self.book.symbol_info())
+
+
+class TestLimitOrderManagerBatch(unittest.TestCase):
+
+    def _manager(self, broker):
+        broker.on_bar('EURUSD', 0, 1.1000, 1.1005, 1.0995, 1.1000, 0)
+        manager = LimitOrderManager('EURUSD')
+        manager.set_backtest_mode(broker, 'EURUSD')
+        return manager
+
+    def test_order_is_queued_until_broker_accepts_it(self):
+        manager = self._manager(RecordingBroker())
+        order = manager._place_limit_order('BUY', 1.0980, 1.1000, {'score': 80})
+        self.assertEqual((order['status'], order['ticket']), ('QUEUED', None))
+        self.assertEqual(manager.active_orders, {})
+
+        report = manager._flush_order_batch()
+        self.assertEqual(order['status'], 'PLACED')
+        self.assertEqual(report['placed'], [order['ticket']])
+        self.assertIn(order['ticket'], manager.active_orders)
+
+    def test_failed_placement_is_not_reported_as_placed(self):
+        manager = self._manager(SilentBroker(silent={1.0980}))
+        order = manager._place_limit_order('BUY', 1.0980, 1.1000, {'score': 80})
+
+        report = manager._flush_order_batch()
+        self.assertEqual(order['status'], 'FAILED')
+        self.assertEqual(report['placed'], [])
+        self.assertEqual(manager.active_orders, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST PROBLEMS DETECTION JOB - Detección de errores en segundo plano
+=====================================================================
+Verifica que start() no bloquea, que los suscriptores reciben los reportes
+parciales y el final, y que el último reporte guardado se lee una sola vez.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+
+# Agregar docs/ (sistema) y la raíz del proyecto (dashboard) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from dashboard.problems_detection_job import LATEST_REPORT_FILE, ProblemsDetectionJob
+
+
+class SlowDetector:
+    """Detector que publica dos parciales y espera a que el test lo libere"""
+
+    def __init__(self, release: threading.Event):
+        self.release = release
+
+    def analyze_incremental(self, quick_mode=False, on_progress=None):
+        for done in (1, 2):
+            on_progress({'status': 'running', 'progress': {'done': done, 'total': 3}, 'problems': [{}] * done})
+        self.release.wait(5)
+        report = {'status': 'complete', 'progress': {'done': 3, 'total': 3}, 'problems': [{}] * 3}
+        on_progress(report)
+        return report
+
+
+class TestProblemsDetectionJob(unittest.TestCase):
+
+    def setUp(self):
+        self.diagnostics = Path(tempfile.mkdtemp())
+        self.release = threading.Event()
+        self.job = ProblemsDetectionJob(self.diagnostics, self.diagnostics,
+                                        detector_factory=lambda root: SlowDetector(self.release))
+
+    def test_start_does_not_block_and_publishes_progress(self):
+        received = []
+        unsubscribe = self.job.subscribe(lambda report: received.append(report['status']))
+
+        started = time.perf_counter()
+        self.assertTrue(self.job.start())
+        self.assertLess(time.perf_counter() - started, 0.5)
+        self.assertFalse(self.job.start())  # Ya en curso
+
+        self.release.set()
+        self.assertTrue(self.job.wait(5))
+        self.assertEqual(received, ['running', 'running', 'complete'])
+        self.assertEqual(len(self.job.latest['problems']), 3)
+        self.assertIsNone(self.job.last_error)
+
+        unsubscribe()
+        self.job.start()
+        self.job.wait(5)
+        self.assertEqual(len(received), 3)
+
+    def test_latest_reads_saved_report_once(self):
+        with open(self.diagnostics / LATEST_REPORT_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'status': 'complete', 'problems': [{'title': 'guardado'}]}, f)
+
+        self.assertEqual(self.job.latest['problems'][0]['title'], 'guardado')
+        os.remove(self.diagnostics / LATEST_REPORT_FILE)
+        self.assertEqual(self.job.latest['problems'][0]['title'], 'guardado')  # En memoria
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+🧪 TEST TICK BUFFER - Historial de ticks en memoria y velas en vivo
+===================================================================
+Verifica el anillo de ticks (vuelta completa, ventanas, spread), que las
+velas en vivo coinciden con la agregación de la serie completa, que el
+feed no duplica ticks entre lecturas de copy_ticks_from y que un feed
+detenido o sin lecturas recientes deja de responder por el terminal.
+"""
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+
+# Agregar docs/ (sistema, utils) y la raíz del proyecto (core) al path
+DOCS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, DOCS_DIR)
+sys.path.insert(0, os.path.dirname(DOCS_DIR))
+
+from core.backtesting import SimulatedBroker
+from core.risk_management.account_snapshot import AccountSnapshot
+from core.risk_management.riskbot_mt5 import RiskBot
+from sistema.timeframe_aggregator import aggregate_ohlcv
+from utils.tick_buffer import LiveBarBuilder, TickFeed, TickRingBuffer
+
+TICK_DTYPE = np.dtype([('time', 'i8'), ('bid', 'f8'), ('ask', 'f8'), ('last', 'f8'), ('volume', 'u8'),
+                       ('time_msc', 'i8'), ('flags', 'u4'), ('volume_real', 'f8')])
+
+
+class CopyTicksSource:
+    """Terminal mínimo: copy_ticks_from sobre una lista de (time_msc, bid, ask)"""
+
+    COPY_TICKS_ALL = -1
+
+    def __init__(self):
+        self.ticks = []
+
+    def copy_ticks_from(self, symbol, date_from, count, flags):
+        rows = [(msc // 1000, bid, ask, 0.0, 0, msc, 6, 0.0)
+                for msc, bid, ask in self.ticks if msc // 1000 >= date_from]
+        return np.array(rows[:count], dtype=TICK_DTYPE)
+
+    def symbol_info_tick(self, symbol):
+        if not self.ticks:
+            return None
+        msc, bid, ask = self.ticks[-1]
+        return SimpleNamespace(time=msc // 1000, time_msc=msc, bid=bid, ask=ask)
+
+
+class TestTickBuffer(unittest.TestCase):
+
+    def test_ring_wraps_and_windows(self):
+        ring = TickRingBuffer('EURUSD', capacity=8)
+        ring.extend(np.arange(1000, 1012), np.arange(12) * 1.0, np.arange(12) + 0.5)
+
+        self.assertEqual(len(ring), 8)
+        self.assertEqual(ring.total, 12)
+        self.assertEqual(ring.latest().time_msc, 1011)
+        np.testing.assert_array_equal(ring.window()['time_msc'], np.arange(1004, 1012))
+        np.testing.assert_array_equal(ring.window(3)['bid'], [9.0, 10.0, 11.0])
+        np.testing.assert_array_equal(ring.window(seconds=0.002)['time_msc'], [1009, 1010, 1011])
+        self.assertAlmostEqual(ring.spread_stats()['mean'], 0.5)
+
+    def test_live_bars_match_full_aggregation(self):
+        rng = np.random.default_rng(3)
+        time_msc = np.unique(rng.integers(0, 2 * 86400_000, 20000)) + 1_750_000_000_000
+        prices = 1.10 + np.cumsum(rng.normal(0, 1e-5, len(time_msc)))
+
+        builder = LiveBarBuilder(['M1', 'H1', 'D1'], max_closed=100000)
+        for chunk in np.array_split(np.arange(len(time_msc)), 23):
+            builder.update(time_msc[chunk], prices[chunk])
+
+        ticks = pd.DataFrame({'open': prices, 'high': prices, 'low': prices, 'close': prices, 'tick_volume': 1},
+                             index=pd.to_datetime(time_msc, unit='ms'))
+        for timeframe in ('M1', 'H1', 'D1'):
+            live = builder.frame(timeframe)
+            expected = aggregate_ohlcv(ticks, timeframe)
+            self.assertTrue(live.index.equals(expected.index), timeframe)
+            np.testing.assert_allclose(live.to_numpy(dtype=float), expected[live.columns].to_numpy(dtype=float))
+
+    def test_late_tick_keeps_forming_bar(self):
+        builder = LiveBarBuilder(['M1'])
+        builder.update(np.array([60_000, 61_000]), np.array([1.10, 1.12]))
+        builder.update(np.array([59_000]), np.array([1.50]))  # Tick tardío de la vela anterior
+
+        forming = builder.forming('M1')
+        self.assertEqual((forming['time'], forming['high'], forming['tick_volume']), (60, 1.12, 2))
+        self.assertEqual(len(builder.frame('M1')), 1)
+
+        builder.update(np.array([59_500, 62_000, 125_000]), np.array([1.50, 1.13, 1.14]))
+        frame = builder.frame('M1')
+        self.assertEqual(list(frame['high']), [1.13, 1.14])
+        self.assertEqual(list(frame['tick_volume']), [3, 1])
+
+    def test_feed_deduplicates_copy_ticks(self):
+        source = CopyTicksSource()
+        source.ticks = [(5000, 1.00, 1.10)]
+        feed = TickFeed(source, ['EURUSD'], timeframes=['M1'])
+        self.assertEqual(feed.poll_once(), {'EURUSD': 1})
+
+        # Mismo milisegundo que el último leído: solo entran los nuevos
+        source.ticks += [(5000, 1.01, 1.11), (5500, 1.02, 1.12)]
+        self.assertEqual(feed.poll_once(), {'EURUSD': 2})
+        self.assertEqual(feed.poll_once(), {'EURUSD': 0})
+        np.testing.assert_array_equal(feed.buffer('EURUSD').window()['bid'], [1.00, 1.01, 1.02])
+
+        tick = feed.symbol_info_tick('EURUSD')
+        self.assertEqual((tick.bid, tick.ask, tick.time), (1.02, 1.12, 5))
+        self.assertEqual(feed.bars('EURUSD').forming('M1')['high'], 1.02)
+
+    def test_stale_or_stopped_feed_falls_back_to_source(self):
+        now = [100.0]
+        source = CopyTicksSource()
+        source.ticks = [(5000, 1.00, 1.10)]
+        feed = TickFeed(source, ['EURUSD'], max_tick_age=2.0, clock=lambda: now[0])
+        self.assertIsNone(feed.latest('EURUSD'))  # Aún sin leer
+
+        feed.poll_once()
+        source.ticks.append((9000, 1.05, 1.15))  # El terminal avanza, el feed no lee
+        self.assertEqual(feed.symbol_info_tick('EURUSD').bid, 1.00)
+
+        now[0] += 2.5
+        self.assertFalse(feed.is_fresh('EURUSD'))
+        self.assertIsNone(feed.latest('EURUSD'))
+        self.assertEqual(feed.symbol_info_tick('EURUSD').bid, 1.05)
+        self.assertEqual(feed.buffer('EURUSD').latest().bid, 1.00)  # El historial se conserva
+
+        feed.poll_once()
+        self.assertEqual(feed.latest('EURUSD').bid, 1.05)
+        feed.stop()
+        source.ticks.append((9500, 1.07, 1.17))
+        self.assertEqual(feed.symbol_info_tick('EURUSD').bid, 1.07)
+
+        # Si la lectura falla, el último tick caduca igual
+        feed.poll_once()
+        source.copy_ticks_from = lambda *args: (_ for _ in ()).throw(RuntimeError('sin conexión'))
+        now[0] += 2.5
+        feed.poll_once()
+        self.assertIsNone(feed.latest('EURUSD'))
+
+    def test_snapshot_reads_ticks_from_feed(self):
+        broker = SimulatedBroker(initial_balance=10000.0)
+        broker.on_bar('EURUSD', 0, 1.1000, 1.1000, 1.1000, 1.1000, 0)
+        broker.order_send({'action': broker.TRADE_ACTION_DEAL, 'symbol': 'EURUSD', 'volume': 0.1, 'type': 0})
+
+        # Sin copy_ticks_from el feed cae a symbol_info_tick del bróker
+        feed = TickFeed(broker, ['EURUSD'])
+        feed.poll_once()
+        feed.buffer('EURUSD').append(10_000_000, 1.2500, 1.2501)
+
+        snapshot = AccountSnapshot.capture(broker, tick_source=feed)
+        self.assertEqual(snapshot.ticks['EURUSD'].bid, 1.2500)
+        self.assertEqual(AccountSnapshot.capture(broker).ticks['EURUSD'].bid, 1.1000)
+
+    def test_riskbot_ignores_stopped_feed(self):
+        broker = SimulatedBroker(initial_balance=10000.0)
+        broker.on_bar('EURUSD', 0, 1.1000, 1.1000, 1.1000, 1.1000, 0)
+        feed = TickFeed(broker, ['EURUSD'])
+        feed.poll_once()
+        feed.buffer('EURUSD').append(10_000_000, 1.2500, 1.2501)
+
+        riskbot = RiskBot()
+        riskbot.broker = broker
+        riskbot.attach_tick_feed(feed)  # Loop sin arrancar: el precio sale del bróker
+        self.assertFalse(feed.is_running)
+        self.assertAlmostEqual(riskbot._calculate_pip_value('EURUSD', 1.0), 0.0001 / 1.1000 * 100000)
+
+
+if __name__ == '__main__':
+    unittest.main()
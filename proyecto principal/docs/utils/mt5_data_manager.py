@@ -40,13 +40,17 @@ Fecha: 2025
 from sistema.sic import Optional, Any, Dict, List, pd, Path, os
 from sistema.sic import enviar_senal_log, get_account_validator, AccountType
 
-# Importación segura de MT5 y configuración FundedNext
-try:
-    import MetaTrader5 as mt5
-    mt5_available = True
-except ImportError:
-    mt5_available = False
-    mt5 = None
+import time
+
+from sistema.lazy_loading import is_module_available, lazy_import
+from sistema.rolling_correlation import RollingCorrelationEngine, get_correlation_engine
+from sistema.timeframe_aggregator import TIMEFRAME_MINUTES
+from utils.tick_buffer import TickFeed
+
+# Importación segura y diferida de MT5: se comprueba que existe sin cargarlo,
+# el import real ocurre en la primera llamada (connect, copy_rates...)
+mt5_available = is_module_available('MetaTrader5')
+mt5 = lazy_import('MetaTrader5') if mt5_available else None
 
 # Configuración específica para FundedNext MT5
 FUNDEDNEXT_MT5_PATH = r"C:\Program Files\FundedNext MT5 Terminal\terminal64.exe"
@@ -113,6 +117,10 @@ TIMEFRAME_MAPPING = {
     'D1': 16408
 }
 
+# Correlación entre símbolos: velas cerradas de este timeframe alimentan el motor compartido
+CORRELATION_TIMEFRAME = 'H1'
+CORRELATION_TAIL_MARGIN = 3  # Velas extra por lectura tras el calentamiento (vela en formación, desfase de reloj)
+
 class MT5DataManager:
     """
     Gestor centralizado para operaciones con MetaTrader5.
@@ -125,6 +133,8 @@ class MT5DataManager:
         self.account_validator = get_account_validator()
         self.account_type = None
         self.account_config = None
+        self.tick_feed: Optional[TickFeed] = None  # Loop único de ticks (start_tick_stream)
+        self._correlation_fetched_at: Optional[float] = None  # Epoch de la última lectura para el motor de correlación
 
         # 🔒 VERIFICACIÓN DE SEGURIDAD INICIAL
         ensure_only_fundednext_connection()
@@ -261,16 +271,63 @@ class MT5DataManager:
             enviar_senal_log("ERROR", f"❌ Error validando tipo de cuenta: {e}", "mt5_data_manager", "migration")
             self.account_type = AccountType.UNKNOWN
 
+    def start_tick_stream(self,
+                          symbols: List[str],
+                          poll_interval: float = 0.25,
+                          capacity: int = 8192) -> Optional[TickFeed]:
+        """
+        Arranca (o amplía) el loop único de ticks.
+
+        Mientras corre, get_symbol_tick() de esos símbolos se responde desde el
+        anillo en memoria, y el feed guarda el historial de ticks (spread,
+        volatilidad) y las velas en formación de cada timeframe.
+
+        Args:
+            symbols: Símbolos a seguir
+            poll_interval: Segundos entre lecturas de copy_ticks_from
+            capacity: Ticks retenidos por símbolo
+
+        Returns:
+            El TickFeed o None si MT5 no está conectado
+        """
+        if not mt5_available or mt5 is None or not self.is_connected:
+            enviar_senal_log("WARNING", "MT5 no conectado: stream de ticks no iniciado", "mt5_data_manager", "tick")
+            return None
+
+        if self.tick_feed is None:
+            self.tick_feed = TickFeed(mt5, symbols, capacity=capacity, poll_interval=poll_interval)
+        else:
+            for symbol in symbols:
+                self.tick_feed.add_symbol(symbol)
+
+        if self.tick_feed.start():
+            enviar_senal_log("INFO", f"📡 Stream de ticks activo: {', '.join(self.tick_feed.symbols)}",
+                             "mt5_data_manager", "tick")
+        return self.tick_feed
+
+    def stop_tick_stream(self) -> None:
+        """Detiene el loop de ticks (el historial en memoria se conserva)."""
+        if self.tick_feed is not None:
+            self.tick_feed.stop()
+
     def get_symbol_tick(self, symbol: str) -> Optional[Dict[str, Any]]:
         """
         Obtiene el tick actual de un símbolo de forma segura.
 
+        Con el stream de ticks activo y al día se lee del anillo en memoria
+        (O(1)); si el stream está detenido o su último tick caducó, del terminal.
+
         Args:
             symbol: Símbolo a consultar (ej: "EURUSD")
 
         Returns:
             Diccionario con información del tick o None si falla
         """
+        if self.tick_feed is not None and self.tick_feed.is_running:
+            tick = self.tick_feed.latest(symbol)
+            if tick is not None:
+                return self._tick_to_dict(symbol, tick)
+
         if not mt5_available or mt5 is None:
             enviar_senal_log("ERROR", f"MT5 no disponible para obtener tick de {symbol}", "mt5_data_manager", "tick")
             return None
@@ -291,21 +348,26 @@ class MT5DataManager:
                 return None
 
             # Convertir a diccionario para facilitar el uso
-            return {
-                'symbol': symbol,
-                'bid': tick.bid,
-                'ask': tick.ask,
-                'last': tick.last,
-                'volume': tick.volume,
-                'time': tick.time,
-                'flags': tick.flags,
-                'volume_real': getattr(tick, 'volume_real', 0.0)
-            }
+            return self._tick_to_dict(symbol, tick)
 
         except (ImportError, AttributeError, Exception) as e:
             enviar_senal_log("ERROR", f"Error obteniendo tick para {symbol}: {e}", "mt5_data_manager", "tick")
             return None
 
+    @staticmethod
+    def _tick_to_dict(symbol: str, tick: Any) -> Dict[str, Any]:
+        """Tick de MT5 (o del anillo) como diccionario."""
+        return {
+            'symbol': symbol,
+            'bid': tick.bid,
+            'ask': tick.ask,
+            'last': tick.last,
+            'volume': tick.volume,
+            'time': tick.time,
+            'flags': tick.flags,
+            'volume_real': getattr(tick, 'volume_real', 0.0)
+        }
+
     def get_account_info(self) -> Dict[str, Any]:
         """
         Obtiene información completa de la cuenta desde MT5 directamente.
@@ -449,6 +511,7 @@ class MT5DataManager:
 
     def disconnect(self) -> None:
         """Desconecta de MetaTrader5."""
+        self.stop_tick_stream()
         if self.is_connected and self.available_functions.get('shutdown', False):
             try:
                 mt5.shutdown()  # type: ignore
@@ -656,6 +719,74 @@ class MT5DataManager:
 
         return df
 
+    def get_open_position_symbols(self) -> List[str]:
+        """Símbolos con posición abierta en la cuenta (sin repetir); [] sin conexión"""
+        if not mt5_available or mt5 is None or not self.is_connected:
+            return []
+        try:
+            positions = mt5.positions_get()  # type: ignore
+        except (ImportError, AttributeError, Exception) as e:
+            enviar_senal_log("WARNING", f"No se pudieron leer las posiciones abiertas: {e}", "mt5_data_manager", "risk")
+            return []
+        return list(dict.fromkeys(position.symbol for position in positions or ()))
+
+    def feed_correlation_engine(self,
+                                symbols: List[str],
+                                timeframe: str = CORRELATION_TIMEFRAME,
+                                engine: Optional[RollingCorrelationEngine] = None) -> int:
+        """
+        Lleva al motor de correlación los cierres de las velas cerradas de `symbols`.
+
+        La primera lectura (o la de un símbolo sin historial en el motor)
+        descarga la ventana mayor del motor; después sólo las velas
+        transcurridas desde la lectura anterior más CORRELATION_TAIL_MARGIN.
+        Si ese tramo no enlaza con la última vela procesada, se recalienta
+        desde el histórico. La vela en formación nunca entra en el motor.
+
+        Args:
+            symbols: Símbolo analizado y símbolos con posición abierta
+            timeframe: Timeframe de las velas (uno por motor)
+            engine: Motor destino (por defecto el compartido del proceso)
+
+        Returns:
+            Velas cerradas procesadas (0 con menos de dos símbolos o sin datos)
+        """
+        engine = engine or get_correlation_engine()
+        symbols = list(dict.fromkeys(symbol for symbol in symbols if symbol))
+        if len(symbols) < 2:
+            return 0
+
+        history_bars = engine.windows[-1] + 2  # Return inicial + vela en formación
+        if engine.needs_history(symbols) or self._correlation_fetched_at is None:
+            bars = history_bars
+        else:
+            elapsed = max(0.0, time.time() - self._correlation_fetched_at)
+            bars = min(history_bars, int(elapsed // (TIMEFRAME_MINUTES[timeframe] * 60)) + CORRELATION_TAIL_MARGIN)
+
+        requested_at = time.time()
+        closes = self._closed_closes(symbols, timeframe, bars)
+        if bars < history_bars and closes is not None and closes.index[0] > engine.last_bar_time:
+            # El tramo no cubre desde la última vela procesada: recalentar desde el histórico
+            engine.reset()
+            closes = self._closed_closes(symbols, timeframe, history_bars)
+        if closes is None:
+            return 0
+
+        fed = engine.sync_closes(closes)
+        self._correlation_fetched_at = requested_at
+        return fed
+
+    def _closed_closes(self, symbols: List[str], timeframe: str, count: int) -> Optional[pd.DataFrame]:
+        """Cierres por símbolo (columnas) alineados por hora de vela, sin la vela en formación"""
+        closes = {}
+        for symbol in symbols:
+            df = self.download_historical_data(symbol, timeframe, count)
+            if df is not None and len(df) > 1:
+                closes[symbol] = df['close'].iloc[:-1]
+        if len(closes) < 2:
+            return None
+        return pd.DataFrame(closes)
+
 
 # Instancia global del manager
 _mt5_manager_instance: Optional[MT5DataManager] = None
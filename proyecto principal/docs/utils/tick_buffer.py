@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+"""
+📡 TICK BUFFER - Historial de ticks en memoria y velas en vivo
+==============================================================
+
+Un solo loop de lectura (copy_ticks_from o, si no existe, symbol_info_tick)
+alimenta por símbolo:
+
+1. TickRingBuffer  → anillo de ticks en arrays numpy preasignados. Un único
+                     escritor publica con un contador; los lectores no toman
+                     lock y reintentan si el escritor les pisó la ventana.
+                     latest() es O(1) y window()/spread_stats()/volatility()
+                     trabajan vectorizados sobre los últimos N ticks o segundos
+2. LiveBarBuilder  → vela en formación de cada timeframe (M1...D1) actualizada
+                     tick a tick, sin llamar a copy_rates_*
+3. TickFeed        → el loop: symbol_info_tick(symbol) para RiskBot, el
+                     dashboard o LimitOrderManager sale del anillo sin ir al
+                     terminal mientras el símbolo se lea con éxito; si el loop
+                     se detiene o falla más de `max_tick_age` segundos se
+                     vuelve a preguntar al terminal
+
+Los timestamps son los del terminal (hora del servidor), así las velas en
+vivo tienen los mismos cortes que las de MT5.
+
+Versión: v1.0.0 - Tick Buffer
+Fecha: Agosto 2025
+Autor: ICT Engine Team
+"""
+
+import threading
+import time
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from sistema.timeframe_aggregator import TIMEFRAME_MINUTES
+
+DEFAULT_LIVE_TIMEFRAMES = ('M1', 'M5', 'M15', 'H1', 'H4', 'D1')
+COPY_TICKS_ALL = -1  # Constante de MetaTrader5
+
+
+class TickRingBuffer:
+    """
+    📡 Anillo de ticks de un símbolo (un escritor, lectores sin lock)
+
+    El escritor reserva posiciones (`_reserved`), escribe y luego publica
+    (`_written`). Un lector que copió las posiciones [start, end) sabe que
+    nadie las pisó si `_reserved - capacity <= start` al terminar la copia.
+    """
+
+    READ_RETRIES = 5
+
+    def __init__(self, symbol: str = '', capacity: int = 8192):
+        self.symbol = symbol
+        self.capacity = int(capacity)
+        self._time_msc = np.zeros(self.capacity, dtype=np.int64)
+        self._bid = np.zeros(self.capacity, dtype=float)
+        self._ask = np.zeros(self.capacity, dtype=float)
+        self._last = np.zeros(self.capacity, dtype=float)
+        self._volume = np.zeros(self.capacity, dtype=float)
+        self._flags = np.zeros(self.capacity, dtype=np.uint32)
+        self._written = 0
+        self._reserved = 0
+
+    # ===============================
+    # ESCRITURA (un solo hilo)
+    # ===============================
+
+    def append(self, time_msc: int, bid: float, ask: float, last: float = 0.0,
+               volume: float = 0.0, flags: int = 0) -> None:
+        """Agrega un tick (O(1))"""
+        position = self._written
+        self._reserved = position + 1
+        slot = position % self.capacity
+        self._time_msc[slot] = time_msc
+        self._bid[slot] = bid
+        self._ask[slot] = ask
+        self._last[slot] = last
+        self._volume[slot] = volume
+        self._flags[slot] = flags
+        self._written = position + 1
+
+    def extend(self, time_msc: np.ndarray, bid: np.ndarray, ask: np.ndarray,
+               last: Optional[np.ndarray] = None, volume: Optional[np.ndarray] = None,
+               flags: Optional[np.ndarray] = None) -> None:
+        """Agrega un lote de ticks (p.ej. el resultado de copy_ticks_from)"""
+        count = len(time_msc)
+        if count == 0:
+            return
+        zeros = np.zeros(count)
+        columns = [(self._time_msc, time_msc), (self._bid, bid), (self._ask, ask),
+                   (self._last, zeros if last is None else last),
+                   (self._volume, zeros if volume is None else volume),
+                   (self._flags, zeros if flags is None else flags)]
+
+        position = self._written
+        self._reserved = position + count
+        keep = min(count, self.capacity)
+        start = (position + count - keep) % self.capacity
+        head = min(keep, self.capacity - start)
+        for target, values in columns:
+            values = np.asarray(values)[count - keep:]
+            target[start:start + head] = values[:head]
+            target[:keep - head] = values[head:]
+        self._written = position + count
+
+    # ===============================
+    # LECTURA (sin lock)
+    # ===============================
+
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+
+    @property
+    def total(self) -> int:
+        """Ticks recibidos desde el inicio (incluye los ya sobrescritos)"""
+        return self._written
+
+    def latest(self) -> Optional[SimpleNamespace]:
+        """⚡ Último tick con los atributos de mt5.symbol_info_tick (O(1))"""
+        for _ in range(self.READ_RETRIES):
+            written = self._written
+            if written == 0:
+                return None
+            slot = (written - 1) % self.capacity
+            tick = SimpleNamespace(
+                time=int(self._time_msc[slot] // 1000), time_msc=int(self._time_msc[slot]),
+                bid=float(self._bid[slot]), ask=float(self._ask[slot]), last=float(self._last[slot]),
+                volume=float(self._volume[slot]), flags=int(self._flags[slot]))
+            if self._reserved - self.capacity <= written - 1:
+                return tick
+        return tick
+
+    def window(self, n: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, np.ndarray]:
+        """
+        📊 Copia de los últimos `n` ticks y/o de los últimos `seconds` segundos
+
+        Returns:
+            Dict con arrays time_msc, bid, ask, last, volume y flags (más antiguo primero)
+        """
+        for _ in range(self.READ_RETRIES):
+            written = self._written
+            count = min(written, self.capacity)
+            if n is not None:
+                count = min(count, int(n))
+            start = written - count
+            data = {name: self._slice(array, start, count) for name, array in (
+                ('time_msc', self._time_msc), ('bid', self._bid), ('ask', self._ask),
+                ('last', self._last), ('volume', self._volume), ('flags', self._flags))}
+            if self._reserved - self.capacity <= start:
+                break
+
+        if seconds is not None and len(data['time_msc']):
+            cutoff = data['time_msc'][-1] - int(seconds * 1000)
+            first = int(np.searchsorted(data['time_msc'], cutoff, side='left'))
+            data = {name: values[first:] for name, values in data.items()}
+        return data
+
+    def _slice(self, array: np.ndarray, start: int, count: int) -> np.ndarray:
+        begin = start % self.capacity
+        if begin + count <= self.capacity:
+            return array[begin:begin + count].copy()
+        return np.concatenate((array[begin:], array[:begin + count - self.capacity]))
+
+    # ===============================
+    # ESTADÍSTICAS VECTORIZADAS
+    # ===============================
+
+    def spread_stats(self, n: Optional[int] = None, seconds: Optional[float] = None,
+                     point: Optional[float] = None) -> Dict[str, float]:
+        """📏 Spread (ask - bid) de la ventana; en puntos si se pasa `point`"""
+        data = self.window(n, seconds)
+        spread = data['ask'] - data['bid']
+        if point:
+            spread = spread / point
+        if not len(spread):
+            return {'count': 0, 'last': 0.0, 'mean': 0.0, 'min': 0.0, 'max': 0.0, 'p50': 0.0, 'p90': 0.0}
+        p50, p90 = np.percentile(spread, [50, 90])
+        return {'count': int(len(spread)), 'last': float(spread[-1]), 'mean': float(spread.mean()),
+                'min': float(spread.min()), 'max': float(spread.max()), 'p50': float(p50), 'p90': float(p90)}
+
+    def volatility(self, n: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, float]:
+        """🌊 Volatilidad del precio medio en la ventana (desvío de retornos, rango y desplazamiento)"""
+        data = self.window(n, seconds)
+        mid = (data['bid'] + data['ask']) / 2.0
+        if len(mid) < 2:
+            return {'count': int(len(mid)), 'std_returns': 0.0, 'range': 0.0,
+                    'displacement': 0.0, 'mean_abs_change': 0.0}
+        returns = np.diff(np.log(mid))
+        return {
+            'count': int(len(mid)),
+            'std_returns': float(returns.std()),
+            'range': float(mid.max() - mid.min()),
+            'displacement': float(mid[-1] - mid[0]),
+            'mean_abs_change': float(np.abs(np.diff(mid)).mean()),
+        }
+
+
+class LiveBarBuilder:
+    """
+    🕯️ Vela en formación por timeframe construida desde los ticks
+
+    Cada vela: time (segundos, como copy_rates), open/high/low/close sobre el
+    precio elegido (bid, como MT5) y tick_volume = ticks recibidos. Los ticks
+    de una vela anterior a la que está en formación se ignoran.
+    """
+
+    def __init__(self, timeframes: Iterable[str] = DEFAULT_LIVE_TIMEFRAMES,
+                 price: str = 'bid', max_closed: int = 500):
+        self.timeframes = [tf for tf in timeframes if tf in TIMEFRAME_MINUTES]
+        self.price = price
+        self.max_closed = int(max_closed)
+        self._period_ms = {tf: TIMEFRAME_MINUTES[tf] * 60_000 for tf in self.timeframes}
+        self._forming: Dict[str, Optional[Dict[str, float]]] = {tf: None for tf in self.timeframes}
+        self._closed: Dict[str, List[Dict[str, float]]] = {tf: [] for tf in self.timeframes}
+        self._lock = threading.Lock()
+
+    def update(self, time_msc: np.ndarray, prices: np.ndarray) -> Dict[str, int]:
+        """
+        🔄 Aplica un lote de ticks (ordenados) a todas las velas
+
+        Returns:
+            Dict timeframe -> velas que cerraron con este lote
+        """
+        time_msc = np.asarray(time_msc, dtype=np.int64)
+        prices = np.asarray(prices, dtype=float)
+        closed_now = {tf: 0 for tf in self.timeframes}
+        if not len(time_msc):
+            return closed_now
+
+        with self._lock:
+            for timeframe in self.timeframes:
+                period = self._period_ms[timeframe]
+                buckets = time_msc - time_msc % period
+                tf_prices = prices
+
+                # Ticks tardíos de velas ya cerradas: se ignoran, la vela en formación no se toca
+                forming = self._forming[timeframe]
+                if forming is not None:
+                    skip = int(np.searchsorted(buckets, forming['time'] * 1000, side='left'))
+                    if skip == len(buckets):
+                        continue
+                    buckets, tf_prices = buckets[skip:], prices[skip:]
+
+                edges = np.flatnonzero(np.diff(buckets)) + 1
+                starts = np.concatenate(([0], edges))
+                ends = np.concatenate((edges, [len(buckets)]))
+                highs = np.maximum.reduceat(tf_prices, starts)
+                lows = np.minimum.reduceat(tf_prices, starts)
+
+                bars = [{'time': int(buckets[s] // 1000), 'open': float(tf_prices[s]), 'high': float(h),
+                         'low': float(l), 'close': float(tf_prices[e - 1]), 'tick_volume': int(e - s)}
+                        for s, e, h, l in zip(starts, ends, highs, lows)]
+
+                if forming is not None:
+                    first = bars[0]
+                    if first['time'] == forming['time']:
+                        forming['high'] = max(forming['high'], first['high'])
+                        forming['low'] = min(forming['low'], first['low'])
+                        forming['close'] = first['close']
+                        forming['tick_volume'] += first['tick_volume']
+                        bars[0] = forming
+                    else:
+                        bars.insert(0, forming)
+
+                closed = self._closed[timeframe]
+                closed.extend(bars[:-1])
+                if len(closed) > self.max_closed:
+                    del closed[:len(closed) - self.max_closed]
+                self._forming[timeframe] = bars[-1]
+                closed_now[timeframe] = len(bars) - 1
+        return closed_now
+
+    def forming(self, timeframe: str) -> Optional[Dict[str, float]]:
+        """🕯️ Copia de la vela en formación"""
+        with self._lock:
+            bar = self._forming.get(timeframe)
+            return dict(bar) if bar is not None else None
+
+    def closed(self, timeframe: str, n: Optional[int] = None) -> List[Dict[str, float]]:
+        """📚 Velas cerradas desde que arrancó el feed (las más recientes al final)"""
+        with self._lock:
+            bars = self._closed.get(timeframe, [])
+            return [dict(bar) for bar in (bars[-n:] if n else bars)]
+
+    def frame(self, timeframe: str, include_forming: bool = True):
+        """📊 DataFrame con columnas de copy_rates (índice = time)"""
+        import pandas as pd
+        bars = self.closed(timeframe)
+        forming = self.forming(timeframe) if include_forming else None
+        if forming is not None:
+            bars.append(forming)
+        frame = pd.DataFrame(bars, columns=['time', 'open', 'high', 'low', 'close', 'tick_volume'])
+        frame['time'] = pd.to_datetime(frame['time'], unit='s')
+        return frame.set_index('time')
+
+
+class TickFeed:
+    """
+    🔁 LOOP ÚNICO DE TICKS
+    ======================
+
+    poll_once() lee los ticks nuevos de cada símbolo (copy_ticks_from desde el
+    último recibido; symbol_info_tick si el bróker no lo expone) y alimenta el
+    anillo y las velas en vivo. start() lo ejecuta en un hilo daemon.
+
+    latest()/symbol_info_tick() solo sirven el anillo si el símbolo se leyó
+    con éxito hace menos de `max_tick_age` segundos: con el loop detenido o
+    fallando, el último tick guardado deja de ser el precio actual.
+    """
+
+    def __init__(self, source: Any, symbols: Iterable[str] = (), capacity: int = 8192,
+                 poll_interval: float = 0.25, timeframes: Iterable[str] = DEFAULT_LIVE_TIMEFRAMES,
+                 max_ticks_per_poll: int = 5000, use_copy_ticks: bool = True,
+                 max_tick_age: float = 2.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            source: Módulo MetaTrader5 o SimulatedBroker
+            symbols: Símbolos iniciales
+            capacity: Ticks retenidos por símbolo
+            poll_interval: Segundos entre lecturas del loop
+            timeframes: Velas en vivo a mantener
+            max_ticks_per_poll: Máximo de ticks pedidos por símbolo y lectura
+            use_copy_ticks: Usar copy_ticks_from si el bróker lo tiene
+            max_tick_age: Segundos sin una lectura correcta del símbolo tras los
+                          que el anillo deja de responder por el terminal
+            clock: Reloj monotónico (inyectable para tests)
+        """
+        self.source = source
+        self.capacity = int(capacity)
+        self.poll_interval = float(poll_interval)
+        self.timeframes = tuple(timeframes)
+        self.max_ticks_per_poll = int(max_ticks_per_poll)
+        self.use_copy_ticks = use_copy_ticks and hasattr(source, 'copy_ticks_from')
+        self.max_tick_age = float(max_tick_age)
+        self._clock = clock
+
+        self._buffers: Dict[str, TickRingBuffer] = {}
+        self._bars: Dict[str, LiveBarBuilder] = {}
+        self._cursor: Dict[str, tuple] = {}  # symbol -> (último time_msc, ticks vistos en ese ms)
+        self._polled_at: Dict[str, float] = {}  # symbol -> reloj de la última lectura correcta
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self.stats = {'polls': 0, 'ticks': 0, 'errors': 0, 'last_error': None}
+
+        for symbol in symbols:
+            self.add_symbol(symbol)
+
+    def add_symbol(self, symbol: str) -> TickRingBuffer:
+        if symbol not in self._buffers:
+            self._bars[symbol] = LiveBarBuilder(self.timeframes)
+            self._buffers[symbol] = TickRingBuffer(symbol, self.capacity)
+        return self._buffers[symbol]
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self._buffers)
+
+    # ===============================
+    # LOOP
+    # ===============================
+
+    def poll_once(self) -> Dict[str, int]:
+        """📥 Una lectura de todos los símbolos; devuelve ticks nuevos por símbolo"""
+        received = {}
+        for symbol in list(self._buffers):
+            try:
+                received[symbol] = self._poll_symbol(symbol)
+                self._polled_at[symbol] = self._clock()
+            except Exception as e:
+                received[symbol] = 0
+                self.stats['errors'] += 1
+                self.stats['last_error'] = f"{symbol}: {e}"
+        self.stats['polls'] += 1
+        self.stats['ticks'] += sum(received.values())
+        return received
+
+    def _poll_symbol(self, symbol: str) -> int:
+        if self.use_copy_ticks:
+            ticks = self._read_copy_ticks(symbol)
+        else:
+            ticks = self._read_last_tick(symbol)
+        if ticks is None or not len(ticks['time_msc']):
+            return 0
+
+        self._buffers[symbol].extend(ticks['time_msc'], ticks['bid'], ticks['ask'],
+                                     ticks['last'], ticks['volume'], ticks['flags'])
+        self._bars[symbol].update(ticks['time_msc'], ticks['bid'])
+        return len(ticks['time_msc'])
+
+    def _read_copy_ticks(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        cursor = self._cursor.get(symbol)
+        if cursor is None:
+            tick = self.source.symbol_info_tick(symbol)
+            if tick is None:
+                return None
+            since = int(getattr(tick, 'time_msc', int(tick.time) * 1000))
+            cursor = (since - 1, 0)
+        last_msc, seen_at_last = cursor
+
+        raw = self.source.copy_ticks_from(symbol, int(last_msc // 1000), self.max_ticks_per_poll,
+                                          getattr(self.source, 'COPY_TICKS_ALL', COPY_TICKS_ALL))
+        if raw is None or len(raw) == 0:
+            self._cursor[symbol] = cursor
+            return None
+
+        time_msc = np.asarray(raw['time_msc'], dtype=np.int64)
+        # Los ticks del mismo milisegundo que ya se guardaron vienen repetidos
+        keep = time_msc > last_msc
+        same = np.flatnonzero(time_msc == last_msc)
+        keep[same[seen_at_last:]] = True
+        if not keep.any():
+            self._cursor[symbol] = cursor
+            return None
+
+        ticks = {name: np.asarray(raw[name])[keep] if name in raw.dtype.names else np.zeros(int(keep.sum()))
+                 for name in ('bid', 'ask', 'last', 'volume', 'flags')}
+        ticks['time_msc'] = time_msc[keep]
+        newest = int(ticks['time_msc'][-1])
+        at_newest = int((time_msc == newest).sum())
+        self._cursor[symbol] = (newest, at_newest)
+        return ticks
+
+    def _read_last_tick(self, symbol: str) -> Optional[Dict[str, np.ndarray]]:
+        tick = self.source.symbol_info_tick(symbol)
+        if tick is None:
+            return None
+        time_msc = int(getattr(tick, 'time_msc', 0) or int(tick.time) * 1000)
+        key = (time_msc, tick.bid, tick.ask)
+        if self._cursor.get(symbol) == key:
+            return None
+        self._cursor[symbol] = key
+        return {'time_msc': np.array([time_msc], dtype=np.int64), 'bid': np.array([tick.bid], dtype=float),
+                'ask': np.array([tick.ask], dtype=float), 'last': np.array([getattr(tick, 'last', 0.0)], dtype=float),
+                'volume': np.array([getattr(tick, 'volume', 0.0)], dtype=float),
+                'flags': np.array([getattr(tick, 'flags', 0)], dtype=np.uint32)}
+
+    def start(self) -> bool:
+        """▶️ Arranca el loop en un hilo daemon (False si ya corría)"""
+        if self.is_running:
+            return False
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='tick-feed', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self, timeout: float = 2.0) -> None:
+        """⏹️ Detiene el loop (el historial se conserva, pero deja de ser el precio actual)"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self._polled_at.clear()
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            started = time.monotonic()
+            self.poll_once()
+            self._stop.wait(max(0.0, self.poll_interval - (time.monotonic() - started)))
+
+    # ===============================
+    # LECTURAS
+    # ===============================
+
+    def buffer(self, symbol: str) -> Optional[TickRingBuffer]:
+        return self._buffers.get(symbol)
+
+    def bars(self, symbol: str) -> Optional[LiveBarBuilder]:
+        return self._bars.get(symbol)
+
+    def is_fresh(self, symbol: str) -> bool:
+        """True si el símbolo se leyó con éxito hace menos de max_tick_age segundos"""
+        polled_at = self._polled_at.get(symbol)
+        return polled_at is not None and self._clock() - polled_at <= self.max_tick_age
+
+    def latest(self, symbol: str) -> Optional[SimpleNamespace]:
+        """⚡ Último tick del símbolo (None si aún no hay o si el feed dejó de leerlo)"""
+        buffer = self._buffers.get(symbol)
+        if buffer is None or not self.is_fresh(symbol):
+            return None
+        return buffer.latest()
+
+    def symbol_info_tick(self, symbol: str) -> Optional[SimpleNamespace]:
+        """Misma firma que mt5.symbol_info_tick: anillo si está al día, terminal si no"""
+        tick = self.latest(symbol)
+        return tick if tick is not None else self.source.symbol_info_tick(symbol)
+
+    def spread_stats(self, symbol: str, n: Optional[int] = None, seconds: Optional[float] = None,
+                     point: Optional[float] = None) -> Dict[str, float]:
+        """📏 Spread del símbolo (si no estaba en el feed, se agrega)"""
+        return self.add_symbol(symbol).spread_stats(n, seconds, point)
+
+    def volatility(self, symbol: str, n: Optional[int] = None, seconds: Optional[float] = None) -> Dict[str, float]:
+        """🌊 Volatilidad del símbolo (si no estaba en el feed, se agrega)"""
+        return self.add_symbol(symbol).volatility(n, seconds)
+
+    def get_status(self) -> Dict[str, Any]:
+        """📊 Estado del feed"""
+        return {
+            'running': self.is_running,
+            'mode': 'copy_ticks_from' if self.use_copy_ticks else 'symbol_info_tick',
+            'symbols': {symbol: {'buffered': len(buffer), 'total': buffer.total, 'fresh': self.is_fresh(symbol)}
+                        for symbol, buffer in self._buffers.items()},
+            'stats': dict(self.stats),
+        }